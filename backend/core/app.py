@@ -158,87 +158,100 @@ ws_manager = ConnectionManager()
 
 
 async def _ws_broadcaster():
-    """Background task: read events from ws_events table, broadcast to WebSocket clients."""
-    from core.ws_hub import read_events_since
+    """Background task: broadcast events pushed through ws_hub to WebSocket clients."""
+    from core.ws_hub import consume
 
-    last_id = 0
-    while True:
-        await asyncio.sleep(1)
-        if not ws_manager.active:
-            continue
-        events, last_id = read_events_since(last_id)
-        for evt in events:
+    async def _broadcast(evt: dict):
+        if ws_manager.active:
             await ws_manager.broadcast(evt)
 
+    await consume(_broadcast)
+
+
+def _run_periodic_cleanup():
+    """One pass of the hourly cleanup. Synchronous — run it off the event loop."""
+    from core.db import SessionLocal
+
+    db = SessionLocal()
+    try:
+        now = datetime.now(timezone.utc)
+        db.execute(
+            text("DELETE FROM login_attempts WHERE attempted_at < :cutoff"),
+            {"cutoff": (now - timedelta(minutes=30)).timestamp()},
+        )
+        db.execute(
+            text("DELETE FROM active_sessions WHERE created_at < :cutoff"),
+            {"cutoff": (now - timedelta(hours=48)).isoformat()},
+        )
+        db.execute(
+            text("DELETE FROM token_blacklist WHERE expires_at < :now"),
+            {"now": now.isoformat()},
+        )
+        # v1.8.6 (codex pass 4): the digest-sends idempotency tables
+        # grow monotonically without this — one row per user per
+        # quiet-hours window forever. 30-day retention is well past
+        # any reasonable troubleshooting window for "did I get the
+        # 2026-Q1-04-13 digest?" while keeping the row count bounded.
+        # Tables are guarded with `IF EXISTS` since older
+        # deployments may not have run migrations 002/003 yet.
+        # Inlined to avoid a semgrep false-positive on f-string
+        # interpolation into text() — the alternative was a
+        # hardcoded-allowlist loop, which semgrep flags anyway.
+        # Wrapped each in its own try so a missing table on an
+        # older deployment doesn't kill the other delete.
+        _digest_cutoff = (now - timedelta(days=30)).isoformat()
+        try:
+            db.execute(
+                text("DELETE FROM quiet_hours_digest_sends WHERE window_ended_at < :cutoff"),
+                {"cutoff": _digest_cutoff},
+            )
+        except Exception:
+            db.rollback()
+        try:
+            db.execute(
+                text("DELETE FROM quiet_hours_org_digest_sends WHERE window_ended_at < :cutoff"),
+                {"cutoff": _digest_cutoff},
+            )
+        except Exception:
+            db.rollback()
+        db.commit()
+
+        # v1.8.9: prune expired idempotency-cache rows. 24h TTL
+        # is enforced at read time too, but the hourly prune
+        # keeps the table from growing unbounded. Wrapped in its
+        # own try so a missing table on an older deployment
+        # (migration 005 not applied) doesn't block the rest.
+        try:
+            from core.middleware.idempotency import prune_expired_idempotency_keys
+            pruned = prune_expired_idempotency_keys(db)
+            if pruned:
+                log.info("Pruned %d expired idempotency-key rows", pruned)
+        except Exception:
+            db.rollback()
+            log.debug("idempotency-key prune skipped (table may not exist yet)")
+
+        # Scoped-token last_used_at is batched in memory; make sure
+        # an idle token's final use still lands.
+        from core.token_cache import flush_token_usage
+        flush_token_usage(db, force=True)
+
+        log.info("Periodic cleanup completed: stale sessions, login attempts, expired tokens, old digest-send rows, idempotency cache")
+    finally:
+        db.close()
+
 
 async def _periodic_cleanup():
     """Background task: hourly cleanup of stale login attempts, sessions, and expired tokens."""
-    from core.db import SessionLocal
+    from core import workers
 
     while True:
         await asyncio.sleep(3600)
+        # With several API workers only the leader cleans up; the others
+        # check again next hour in case the leader has gone.
+        if not workers.is_leader():
+            continue
         try:
-            db = SessionLocal()
-            try:
-                now = datetime.now(timezone.utc)
-                db.execute(
-                    text("DELETE FROM login_attempts WHERE attempted_at < :cutoff"),
-                    {"cutoff": (now - timedelta(minutes=30)).timestamp()},
-                )
-                db.execute(
-                    text("DELETE FROM active_sessions WHERE created_at < :cutoff"),
-                    {"cutoff": (now - timedelta(hours=48)).isoformat()},
-                )
-                db.execute(
-                    text("DELETE FROM token_blacklist WHERE expires_at < :now"),
-                    {"now": now.isoformat()},
-                )
-                # v1.8.6 (codex pass 4): the digest-sends idempotency tables
-                # grow monotonically without this — one row per user per
-                # quiet-hours window forever. 30-day retention is well past
-                # any reasonable troubleshooting window for "did I get the
-                # 2026-Q1-04-13 digest?" while keeping the row count bounded.
-                # Tables are guarded with `IF EXISTS` since older
-                # deployments may not have run migrations 002/003 yet.
-                # Inlined to avoid a semgrep false-positive on f-string
-                # interpolation into text() — the alternative was a
-                # hardcoded-allowlist loop, which semgrep flags anyway.
-                # Wrapped each in its own try so a missing table on an
-                # older deployment doesn't kill the other delete.
-                _digest_cutoff = (now - timedelta(days=30)).isoformat()
-                try:
-                    db.execute(
-                        text("DELETE FROM quiet_hours_digest_sends WHERE window_ended_at < :cutoff"),
-                        {"cutoff": _digest_cutoff},
-                    )
-                except Exception:
-                    db.rollback()
-                try:
-                    db.execute(
-                        text("DELETE FROM quiet_hours_org_digest_sends WHERE window_ended_at < :cutoff"),
-                        {"cutoff": _digest_cutoff},
-                    )
-                except Exception:
-                    db.rollback()
-                db.commit()
-
-                # v1.8.9: prune expired idempotency-cache rows. 24h TTL
-                # is enforced at read time too, but the hourly prune
-                # keeps the table from growing unbounded. Wrapped in its
-                # own try so a missing table on an older deployment
-                # (migration 005 not applied) doesn't block the rest.
-                try:
-                    from core.middleware.idempotency import prune_expired_idempotency_keys
-                    pruned = prune_expired_idempotency_keys(db)
-                    if pruned:
-                        log.info("Pruned %d expired idempotency-key rows", pruned)
-                except Exception:
-                    db.rollback()
-                    log.debug("idempotency-key prune skipped (table may not exist yet)")
-
-                log.info("Periodic cleanup completed: stale sessions, login attempts, expired tokens, old digest-send rows, idempotency cache")
-            finally:
-                db.close()
+            await asyncio.to_thread(_run_periodic_cleanup)
         except Exception:
             log.warning("Periodic cleanup failed", exc_info=True)
 
@@ -352,6 +365,9 @@ def _register_http_middleware(app: FastAPI) -> None:
     first passes the live auth chain (JWT expiry, token expiry,
     is_active, blacklist, session cookie). The idempotency and
     dry-run layers sit inside, only reached by authorized callers.
+
+    `query_count` wraps everything, including auth. It makes no access
+    decisions — it only counts SQL statements for the request.
     """
     from core.config import settings
     from core.middleware.dry_run import dry_run_middleware
@@ -403,6 +419,7 @@ def _register_http_middleware(app: FastAPI) -> None:
     async def authenticate_request(request: Request, call_next):
         """Check IP allowlist and API key for all routes."""
         from core.db import SessionLocal
+        from fastapi.concurrency import run_in_threadpool
         from fastapi.responses import JSONResponse
 
         path = request.url.path
@@ -426,34 +443,39 @@ def _register_http_middleware(app: FastAPI) -> None:
         ):
             return await call_next(request)
 
-        # IP allowlist check
+        # IP allowlist check. The system_config read is synchronous
+        # SQLAlchemy, so it runs in the threadpool rather than stalling the
+        # event loop (and every other request) behind SQLite.
         if path.startswith("/api/"):
-            try:
+            def _load_ip_allowlist():
                 _db = SessionLocal()
                 try:
-                    ip_row = _db.execute(
+                    return _db.execute(
                         text("SELECT value FROM system_config WHERE key = 'ip_allowlist'")
                     ).fetchone()
-                    if ip_row:
-                        import ipaddress
-                        ip_config = (
-                            json.loads(ip_row[0]) if isinstance(ip_row[0], str) else ip_row[0]
-                        )
-                        if ip_config and ip_config.get("enabled") and ip_config.get("cidrs"):
-                            client_ip = request.client.host if request.client else "127.0.0.1"
-                            if client_ip not in ("127.0.0.1", "::1"):
-                                allowed = any(
-                                    ipaddress.ip_address(client_ip)
-                                    in ipaddress.ip_network(c, strict=False)
-                                    for c in ip_config["cidrs"]
-                                )
-                                if not allowed:
-                                    return JSONResponse(
-                                        status_code=403,
-                                        content={"detail": "IP address not allowed"},
-                                    )
                 finally:
                     _db.close()
+
+            try:
+                ip_row = await run_in_threadpool(_load_ip_allowlist)
+                if ip_row:
+                    import ipaddress
+                    ip_config = (
+                        json.loads(ip_row[0]) if isinstance(ip_row[0], str) else ip_row[0]
+                    )
+                    if ip_config and ip_config.get("enabled") and ip_config.get("cidrs"):
+                        client_ip = request.client.host if request.client else "127.0.0.1"
+                        if client_ip not in ("127.0.0.1", "::1"):
+                            allowed = any(
+                                ipaddress.ip_address(client_ip)
+                                in ipaddress.ip_network(c, strict=False)
+                                for c in ip_config["cidrs"]
+                            )
+                            if not allowed:
+                                return JSONResponse(
+                                    status_code=403,
+                                    content={"detail": "IP address not allowed"},
+                                )
             except Exception as e:
                 log.error("IP allowlist check failed — denying request (fail-closed): %s", e)
                 # IP allowlist: fail-closed
@@ -483,24 +505,34 @@ def _register_http_middleware(app: FastAPI) -> None:
         # subsequent browser requests include it automatically via credentials:'include'.
         session_cookie = request.cookies.get("session")
         if session_cookie:
-            from core.auth import decode_token
-            import jwt as _jwt
-            from core.auth import SECRET_KEY, ALGORITHM
-            try:
-                token_data = decode_token(session_cookie)
-                if token_data:
-                    # Reject mfa_pending and ws-only tokens at the perimeter
-                    payload = _jwt.decode(session_cookie, SECRET_KEY, algorithms=[ALGORITHM])
-                    if not payload.get("mfa_pending") and not payload.get("ws"):
-                        return await call_next(request)
-            except Exception:
-                pass  # malformed / expired cookie → fall through to 401
+            from core.auth_context import decode_jwt
+            # One verified decode (same acceptance rule as decode_token),
+            # memoized on request.state so the idempotency middleware and
+            # get_current_user reuse it. None for malformed / expired.
+            payload = decode_jwt(session_cookie, request)
+            # Reject mfa_pending and ws-only tokens at the perimeter
+            if payload and not payload.get("mfa_pending") and not payload.get("ws"):
+                return await call_next(request)
 
         return JSONResponse(
             status_code=401,
             content={"detail": "Invalid or missing API key"},
         )
 
+    # Registered last → outermost, so the count covers the auth,
+    # idempotency and dry-run layers as well as the route itself.
+    @app.middleware("http")
+    async def query_count(request: Request, call_next):
+        """Count SQL statements per request (request.state.query_count)."""
+        from core.db import count_queries
+
+        with count_queries() as counter:
+            request.state.query_count = counter
+            response = await call_next(request)
+        if settings.query_count_header:
+            response.headers["X-Query-Count"] = str(counter.count)
+        return response
+
 
 # ---------------------------------------------------------------------------
 # App factory
@@ -562,18 +594,29 @@ def create_app() -> FastAPI:
     # -----------------------------------------------------------------------
     @asynccontextmanager
     async def lifespan(app: FastAPI):
+        from core import workers
         from core.event_bus import get_event_bus
         from core.ws_hub import subscribe_to_bus as ws_subscribe
         from modules.printers import register_subscribers as printers_register
         from modules.notifications import register_subscribers as notifications_register
         from modules.archives import register_subscribers as archives_register
+        from modules.reporting import register_subscribers as reporting_register
 
-        Base.metadata.create_all(bind=engine)
+        # ODIN_API_WORKERS > 1: workers start concurrently; create tables
+        # one at a time so they don't race each other's CREATE TABLE.
+        with workers.startup_lock():
+            Base.metadata.create_all(bind=engine)
 
-        from core.ws_hub import ensure_table as _ws_ensure
-        _ws_ensure()
+            from core.ws_hub import ensure_table as _ws_ensure
+            _ws_ensure()
 
-        _check_schema_drift(engine, Base)
+            # Full-text search indexes and the normalized archive tags
+            from core import search_index
+            from modules.archives import archive_tags
+            search_index.ensure_schema(engine)
+            archive_tags.backfill(engine)
+
+            _check_schema_drift(engine, Base)
 
         # v1.8.9 codex pass 4: second ITAR audit, now that DB is
         # populated. The early `create_app`-level check only sees
@@ -600,6 +643,7 @@ def create_app() -> FastAPI:
         printers_register(_bus)
         notifications_register(_bus)
         archives_register(_bus)
+        reporting_register(_bus)
 
         log.info("Event bus initialized with module subscribers")
 
@@ -610,13 +654,22 @@ def create_app() -> FastAPI:
                 "Set API_KEY in your environment or docker-compose.yml for production use."
             )
 
-        # Sync go2rtc camera config on startup
-        try:
-            from modules.printers.route_utils import sync_go2rtc_config_standalone
-            sync_go2rtc_config_standalone()
-            log.info("go2rtc config synced on startup")
-        except Exception as e:
-            log.warning(f"go2rtc config sync failed on startup: {e}")
+        # Sync go2rtc camera config on startup (once, not once per worker)
+        if workers.is_leader():
+            try:
+                from modules.printers.route_utils import sync_go2rtc_config_standalone
+                sync_go2rtc_config_standalone()
+                log.info("go2rtc config synced on startup")
+            except Exception as e:
+                log.warning(f"go2rtc config sync failed on startup: {e}")
+            # Print file uploads whose mesh/thumbnail extraction a restart interrupted
+            try:
+                from modules.models_library import ingest
+                ingest.queue.resume()
+            except Exception as e:
+                log.warning(f"Print file ingest resume failed on startup: {e}")
+        if workers.multi_worker():
+            log.info("API worker %d started (%d workers)", os.getpid(), workers.WORKERS)
 
         broadcast_task = asyncio.create_task(_ws_broadcaster())
         cleanup_task = asyncio.create_task(_periodic_cleanup())
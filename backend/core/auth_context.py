@@ -0,0 +1,270 @@
+"""
+O.D.I.N. — Per-request auth memoization and short-TTL auth caches.
+
+One authenticated mutating request used to repeat the same auth work in
+three layers:
+
+  - authenticate_request (perimeter) decoded the session cookie twice
+    (decode_token, then jwt.decode for the purpose claims);
+  - the idempotency middleware decoded it again, checked token_blacklist
+    and loaded the user;
+  - get_current_user decoded it again, checked token_blacklist again and
+    ran SELECT * FROM users.
+
+Every layer now goes through the helpers below. Results are memoized on
+`request.state.auth` (a RequestAuth), so a token is decoded and its jti
+and user looked up at most once per request no matter how many layers
+ask. Across requests, blacklist misses and user rows are cached in
+process for a few seconds — dashboards poll several endpoints per second
+with the same token.
+
+Staleness is bounded by the TTL and, within this process, removed
+outright: logout and session revocation call `mark_revoked`, and role /
+active / org / password changes call `invalidate_user`. Both are passed
+on to sibling API workers (core/workers.py); any other process sees the
+change within _AUTH_CACHE_TTL_SECONDS.
+
+Callers must treat returned user dicts as their own — every lookup hands
+out a fresh copy because get_current_user decorates it (e.g. with
+`_token_scopes`).
+
+Deliberately free of FastAPI imports; `request` is duck-typed so the
+idempotency helpers keep working with the lightweight fakes in tests.
+"""
+
+import threading
+import time
+from typing import Any, Optional
+
+import jwt
+from jwt.exceptions import PyJWTError
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+import core.auth as auth_module
+from core import workers
+
+_AUTH_CACHE_TTL_SECONDS = 5
+_AUTH_CACHE_MAX_ENTRIES = 4096
+
+_MISSING = object()
+
+
+class RequestAuth:
+    """Auth work already done for one request. Lives on request.state.auth."""
+
+    __slots__ = ("jwt", "blacklisted", "users")
+
+    def __init__(self):
+        self.jwt: dict[str, Optional[dict]] = {}
+        self.blacklisted: dict[str, bool] = {}
+        self.users: dict[tuple, Optional[dict]] = {}
+
+
+def request_auth(request: Any) -> Optional[RequestAuth]:
+    """Return the request's RequestAuth, creating it on first use.
+
+    None when `request` has no usable `state` (bare fakes, background
+    callers) — helpers then just skip the per-request memo.
+    """
+    state = getattr(request, "state", None)
+    if state is None:
+        return None
+    memo = getattr(state, "auth", None)
+    if memo is None:
+        memo = RequestAuth()
+        try:
+            state.auth = memo
+        except Exception:
+            return None
+    return memo
+
+
+# ---------------------------------------------------------------------------
+# Process-wide TTL caches
+# ---------------------------------------------------------------------------
+
+_lock = threading.Lock()
+# jti -> (monotonic cached_at). Only *misses* are cached with a TTL;
+# revoked jtis are remembered until restart (a jti is never un-revoked).
+_not_blacklisted: dict[str, float] = {}
+_revoked: set[str] = set()
+# ("username", name) | ("id", id) | ("admin",) -> (row dict or None, cached_at)
+_users: dict[tuple, tuple[Optional[dict], float]] = {}
+
+
+def _fresh(cached_at: float) -> bool:
+    return time.monotonic() - cached_at < _AUTH_CACHE_TTL_SECONDS
+
+
+def _bounded_put(cache: dict, key, value) -> None:
+    cache.pop(key, None)
+    while len(cache) >= _AUTH_CACHE_MAX_ENTRIES:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+
+def mark_revoked(jti: Optional[str]) -> None:
+    """Record a jti just written to token_blacklist (logout / session revoke)."""
+    if not jti:
+        return
+    with _lock:
+        _not_blacklisted.pop(jti, None)
+        _revoked.add(jti)
+    workers.propagate("auth.mark_revoked", jti)
+
+
+def invalidate_user(user_id: Optional[int] = None) -> None:
+    """Drop cached user rows after a role / active / org / password change.
+
+    With no id, or when the id isn't cached under its username yet, the
+    whole user cache is cleared — these writes are rare and the cache
+    refills in one query per user.
+    """
+    with _lock:
+        # Negative entries go too — a renamed or re-created user must not
+        # be shadowed by a cached "no such user".
+        stale = [] if user_id is None else [
+            key for key, (row, _) in _users.items()
+            if key[0] == "admin" or row is None or row.get("id") == user_id
+        ]
+        if not stale:
+            _users.clear()
+        for key in stale:
+            _users.pop(key, None)
+    workers.propagate("auth.invalidate_user", user_id)
+
+
+def clear() -> None:
+    """Empty all process-wide auth caches (tests, secret rotation)."""
+    with _lock:
+        _not_blacklisted.clear()
+        _revoked.clear()
+        _users.clear()
+
+
+# ---------------------------------------------------------------------------
+# Memoized lookups
+# ---------------------------------------------------------------------------
+
+def decode_jwt(token: str, request: Any = None) -> Optional[dict]:
+    """Verify and decode a JWT once per request.
+
+    Returns the payload dict, or None for malformed / expired / bad-signature
+    tokens and tokens without a `sub` — the same acceptance rule as
+    core.auth.decode_token. Purpose claims (ws, mfa_pending, ...) are left
+    for the caller to judge.
+    """
+    if not token:
+        return None
+    memo = request_auth(request)
+    if memo is not None:
+        hit = memo.jwt.get(token, _MISSING)
+        if hit is not _MISSING:
+            return hit
+    try:
+        payload = jwt.decode(
+            token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM]
+        )
+        if payload.get("sub") is None:
+            payload = None
+    except PyJWTError:
+        payload = None
+    if memo is not None:
+        memo.jwt[token] = payload
+    return payload
+
+
+def is_jti_blacklisted(db: Session, jti: str, request: Any = None) -> bool:
+    """token_blacklist lookup, memoized per request and TTL-cached per process."""
+    if not jti:
+        return False
+    memo = request_auth(request)
+    if memo is not None and jti in memo.blacklisted:
+        return memo.blacklisted[jti]
+
+    with _lock:
+        if jti in _revoked:
+            result = True
+        else:
+            cached_at = _not_blacklisted.get(jti)
+            result = False if cached_at is not None and _fresh(cached_at) else None
+
+    if result is None:
+        result = db.execute(
+            text("SELECT 1 FROM token_blacklist WHERE jti = :jti"),
+            {"jti": jti},
+        ).fetchone() is not None
+        with _lock:
+            if result:
+                _revoked.add(jti)
+            else:
+                _bounded_put(_not_blacklisted, jti, time.monotonic())
+
+    if memo is not None:
+        memo.blacklisted[jti] = result
+    return result
+
+
+def _load_user(db: Session, key: tuple, request: Any, query: str, params: dict) -> Optional[dict]:
+    memo = request_auth(request)
+    if memo is not None and key in memo.users:
+        row = memo.users[key]
+        return dict(row) if row is not None else None
+
+    with _lock:
+        entry = _users.get(key)
+        row = entry[0] if entry is not None and _fresh(entry[1]) else _MISSING
+
+    if row is _MISSING:
+        result = db.execute(text(query), params).fetchone()
+        row = dict(result._mapping) if result is not None else None
+        # File the row under its other keys too: the idempotency
+        # middleware finds a user by username, then asks again by id.
+        keys = [key]
+        if row is not None:
+            keys += [k for k in (("id", row.get("id")), ("username", row.get("username")))
+                     if k[1] is not None and k != key]
+        now = time.monotonic()
+        with _lock:
+            for k in keys:
+                _bounded_put(_users, k, (row, now))
+        if memo is not None:
+            for k in keys:
+                memo.users[k] = row
+    elif memo is not None:
+        memo.users[key] = row
+
+    return dict(row) if row is not None else None
+
+
+def get_user_by_username(db: Session, username: str, request: Any = None) -> Optional[dict]:
+    """SELECT * FROM users WHERE username = ..., cached. Returns a fresh dict."""
+    if not username:
+        return None
+    return _load_user(
+        db, ("username", username), request,
+        "SELECT * FROM users WHERE username = :username", {"username": username},
+    )
+
+
+def get_user_by_id(db: Session, user_id: int, request: Any = None) -> Optional[dict]:
+    """SELECT * FROM users WHERE id = ..., cached. Returns a fresh dict."""
+    if user_id is None:
+        return None
+    return _load_user(
+        db, ("id", int(user_id)), request,
+        "SELECT * FROM users WHERE id = :id", {"id": int(user_id)},
+    )
+
+
+def get_first_active_admin(db: Session, request: Any = None) -> Optional[dict]:
+    """The user the global API_KEY acts as, cached."""
+    return _load_user(
+        db, ("admin",), request,
+        "SELECT * FROM users WHERE role = 'admin' AND is_active = 1 ORDER BY id LIMIT 1", {},
+    )
+
+
+workers.on("auth.mark_revoked", mark_revoked)
+workers.on("auth.invalidate_user", invalidate_user)
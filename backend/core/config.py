@@ -29,6 +29,9 @@ class Settings(BaseSettings):
     host: str = "0.0.0.0"
     port: int = 8000
     debug: bool = False
+    # Adds X-Query-Count (SQL statements run for the request) to every
+    # response. Diagnostic — leave off in production.
+    query_count_header: bool = False
 
     # Security - leave empty to disable auth (trusted network mode)
     api_key: Optional[str] = None
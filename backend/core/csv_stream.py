@@ -0,0 +1,77 @@
+"""Streaming CSV responses.
+
+CSV exports used to load every row with `.all()`, render the whole file
+into an `io.StringIO` and only then hand it to a `StreamingResponse`, so
+memory grew with the table and nothing was sent until the last row was
+written. `csv_response()` instead renders rows as the database cursor
+yields them and sends the file in CHUNK_BYTES pieces.
+
+Usage:
+    from core.csv_stream import csv_response
+    from core.db import YIELD_PER
+
+    rows = db.query(Job.id, Job.item_name).order_by(Job.id).yield_per(YIELD_PER)
+    return csv_response(["ID", "Item Name"], ([r.id, r.item_name] for r in rows),
+                        "jobs_export.csv", request)
+
+`yield_per` streams the query result in batches (a server-side cursor on
+PostgreSQL) instead of materializing it. Responses are gzip-compressed
+on the fly when the client sends `Accept-Encoding: gzip`.
+
+The row generator runs while the response is sent, after the endpoint
+returned; the request's `get_db` session stays open until then.
+"""
+
+import csv
+import io
+import zlib
+from typing import Iterable, Iterator, Optional, Sequence
+
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+CHUNK_BYTES = 64 * 1024   # bytes rendered before a chunk is sent
+GZIP_LEVEL = 6
+
+
+def iter_csv(header: Sequence, rows: Iterable[Sequence], chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """Render a header and rows as UTF-8 CSV, chunk_bytes at a time."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    writer.writerow(header)
+    for row in rows:
+        writer.writerow(row)
+        if buf.tell() >= chunk_bytes:
+            yield buf.getvalue().encode("utf-8")
+            buf.seek(0)
+            buf.truncate()
+    if buf.tell():
+        yield buf.getvalue().encode("utf-8")
+
+
+def iter_gzip(chunks: Iterable[bytes], level: int = GZIP_LEVEL) -> Iterator[bytes]:
+    """gzip-compress a byte stream chunk by chunk."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        out = compressor.compress(chunk)
+        if out:
+            yield out
+    yield compressor.flush()
+
+
+def accepts_gzip(request: Optional[Request]) -> bool:
+    if request is None:
+        return False
+    encodings = request.headers.get("accept-encoding", "")
+    return any(e.split(";")[0].strip() == "gzip" for e in encodings.split(","))
+
+
+def csv_response(header: Sequence, rows: Iterable[Sequence], filename: str,
+                 request: Optional[Request] = None) -> StreamingResponse:
+    """A CSV download streamed from rows, gzip-encoded if the client accepts it."""
+    body = iter_csv(header, rows)
+    headers = {"Content-Disposition": f"attachment; filename={filename}", "Vary": "Accept-Encoding"}
+    if accepts_gzip(request):
+        body = iter_gzip(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="text/csv", headers=headers)
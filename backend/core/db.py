@@ -10,13 +10,18 @@ Provides the SQLAlchemy engine, session factory, declarative base,
 and the FastAPI get_db dependency.
 
 Also provides the module migration runner used by docker/entrypoint.sh to
-apply per-module SQL migration files idempotently.
+apply per-module SQL migration files idempotently, and `count_queries`, the
+per-request query-count hook used by the query-count middleware and tests.
 """
 
 import sqlite3
+from contextlib import contextmanager
+from contextvars import ContextVar
 from pathlib import Path
+from typing import Iterator, Optional
 
 from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import NullPool, QueuePool
 
@@ -27,6 +32,9 @@ from core.base import Base  # noqa: F401 — Single Base instance shared across
 IS_SQLITE = settings.database_url.startswith("sqlite")
 IS_POSTGRES = settings.database_url.startswith("postgresql")
 
+# Rows fetched per batch by streamed exports (Query.yield_per)
+YIELD_PER = 1000
+
 # Configure engine based on database type
 if IS_SQLITE:
     engine = create_engine(
@@ -76,6 +84,52 @@ def get_db():
         db.close()
 
 
+# ---------------------------------------------------------------------------
+# Query counting
+# ---------------------------------------------------------------------------
+#
+# A listener on every Engine (not just ours — tests build their own
+# in-memory engines) bumps the counter held in a ContextVar. The counter
+# is a mutable object, so sync dependencies and routes that Starlette
+# runs in its threadpool (which copies the context) still add to the
+# request's count. Outside count_queries() the listener is one
+# ContextVar lookup.
+
+class QueryCounter:
+    """Number of SQL statements executed inside a count_queries() block."""
+
+    __slots__ = ("count",)
+
+    def __init__(self):
+        self.count = 0
+
+
+_query_counter: ContextVar[Optional[QueryCounter]] = ContextVar(
+    "odin_query_counter", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _count_query(conn, cursor, statement, parameters, context, executemany):
+    counter = _query_counter.get()
+    if counter is not None:
+        counter.count += 1
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count SQLAlchemy statements executed in this block (and its threads).
+
+    Raw sqlite3 connections from core.db_utils are not counted.
+    """
+    counter = QueryCounter()
+    token = _query_counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _query_counter.reset(token)
+
+
 def get_db_type() -> str:
     """Return 'sqlite' or 'postgresql' based on the configured database."""
     if IS_SQLITE:
@@ -181,6 +235,7 @@ def _run_pg_migration(sql_file: Path) -> None:
     sql = sql.replace("datetime('now', 'localtime')", "NOW()")
     sql = sql.replace("BOOLEAN DEFAULT 0", "BOOLEAN DEFAULT FALSE")
     sql = sql.replace("BOOLEAN DEFAULT 1", "BOOLEAN DEFAULT TRUE")
+    sql = sql.replace(" BLOB", " BYTEA")
     sql = sql.replace("TEXT NOT NULL DEFAULT ''", "TEXT NOT NULL DEFAULT ''")
 
     with engine.begin() as conn:
@@ -94,6 +94,17 @@ class _SQLCompat:
             return f"date({column})"
         return f"DATE_TRUNC('{unit}', {column})"
 
+    @staticmethod
+    def epoch(column: str) -> str:
+        """Timestamp column as integer unix epoch seconds.
+
+        SQLite: CAST(strftime('%s', column) AS INTEGER)
+        PostgreSQL: CAST(EXTRACT(EPOCH FROM column) AS BIGINT)
+        """
+        if IS_SQLITE:
+            return f"CAST(strftime('%s', {column}) AS INTEGER)"
+        return f"CAST(EXTRACT(EPOCH FROM {column}) AS BIGINT)"
+
     @staticmethod
     def ilike(column: str, pattern: str) -> str:
         """Case-insensitive LIKE.
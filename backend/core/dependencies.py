@@ -12,18 +12,24 @@ import hmac
 import json
 import logging
 import os
-from datetime import datetime, timezone
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Any, Optional
 
 from fastapi import Depends, Request
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-import core.auth as auth_module
-from core.auth import decode_token, verify_password
+from core.auth_context import (
+    decode_jwt,
+    get_first_active_admin,
+    get_user_by_id,
+    get_user_by_username,
+    is_jti_blacklisted,
+)
 from core.models import AuditLog
 from core.db import get_db
+from core.token_cache import flush_token_usage, record_token_use, resolve_api_token
 
 log = logging.getLogger("odin.api")
 
@@ -48,10 +54,10 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login", auto_error=F
 # problems.
 #
 # The cache is intentionally process-local: each worker tracks its own
-# recent writes. Worst case with multiple workers, the same jti may get
-# written up to N times per interval (once per worker). That's still
-# orders of magnitude fewer writes than the original "every request"
-# behavior.
+# recent writes. With ODIN_API_WORKERS > 1 the DB is the shared state:
+# the UPDATE only matches a row whose last_seen_at is older than the
+# interval, so whichever worker gets there first writes and the other
+# workers' UPDATEs for the same interval change nothing.
 import threading as _threading
 
 _LAST_SEEN_MIN_INTERVAL_SECONDS = 300  # 5 minutes
@@ -76,6 +82,18 @@ def _should_write_last_seen(jti: str) -> bool:
         return False
 
 
+_LAST_SEEN_STALE = " AND (last_seen_at IS NULL OR last_seen_at < :stale_before)"
+
+
+def _last_seen_params(jti: str) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "now": now,
+        "jti": jti,
+        "stale_before": now - timedelta(seconds=_LAST_SEEN_MIN_INTERVAL_SECONDS),
+    }
+
+
 def _forget_last_seen(jti: str) -> None:
     """Drop a jti from the cache — call this on logout so the next login's
     first request immediately writes last_seen_at instead of waiting for
@@ -104,38 +122,20 @@ def validate_access_token(token: str, db: Session) -> Optional[dict]:
     """
     if not token:
         return None
-    token_data = decode_token(token)
-    if not token_data:
-        return None
-    import jwt as _jwt
-    try:
-        payload = _jwt.decode(
-            token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM]
-        )
-    except Exception:
+    payload = decode_jwt(token)
+    if not payload:
         return None
     # Reject special-purpose tokens (ws, mfa_pending, mfa_setup_required)
     if payload.get("ws") or payload.get("mfa_pending") or payload.get("mfa_setup_required"):
         return None
-    # Reject blacklisted tokens (revoked sessions)
+    # Reject token_blacklist entries (revoked sessions)
     jti = payload.get("jti")
-    if jti:
-        blacklisted = db.execute(
-            text("SELECT 1 FROM token_blacklist WHERE jti = :jti"),
-            {"jti": jti},
-        ).fetchone()
-        if blacklisted:
-            return None
-    user = db.execute(
-        text("SELECT * FROM users WHERE username = :username"),
-        {"username": token_data.username},
-    ).fetchone()
-    if not user:
+    if jti and is_jti_blacklisted(db, jti):
         return None
-    return dict(user._mapping)
+    return get_user_by_username(db, payload["sub"])
 
 
-async def get_current_user(
+def get_current_user(
     request: Request,
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db),
@@ -146,17 +146,17 @@ async def get_current_user(
       0. httpOnly session cookie (browser-based SPA auth)
       1. Authorization: Bearer <JWT> header (API clients, fallback)
       2. X-API-Key header — global key (perimeter auth) or per-user scoped token
+
+    JWT decode, blacklist and user lookups go through core.auth_context, so
+    work already done by authenticate_request / the idempotency middleware
+    for this request is reused rather than repeated.
     """
     # Try 0: httpOnly session cookie (browser-based auth)
     session_token = request.cookies.get("session")
     if session_token:
-        token_data = decode_token(session_token)
-        if token_data:
-            import jwt as _jwt
+        payload = decode_jwt(session_token, request)
+        if payload:
             try:
-                payload = _jwt.decode(
-                    session_token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM]
-                )
                 if payload.get("ws"):
                     pass  # ws-tokens are not valid for REST API access — fall through
                 elif payload.get("mfa_pending") or payload.get("mfa_setup_required"):
@@ -164,11 +164,7 @@ async def get_current_user(
                 else:
                     jti = payload.get("jti")
                     if jti:
-                        blacklisted = db.execute(
-                            text("SELECT 1 FROM token_blacklist WHERE jti = :jti"),
-                            {"jti": jti},
-                        ).fetchone()
-                        if blacklisted:
+                        if is_jti_blacklisted(db, jti, request):
                             pass  # fall through to next auth method
                         else:
                             # R6: only write last_seen_at if it's been >= 5 min
@@ -176,55 +172,41 @@ async def get_current_user(
                             # serializes every authenticated read behind a writer.
                             if _should_write_last_seen(jti):
                                 db.execute(
-                                    text("UPDATE active_sessions SET last_seen_at = :now WHERE token_jti = :jti"),
-                                    {"now": datetime.now(timezone.utc), "jti": jti},
+                                    text("UPDATE active_sessions SET last_seen_at = :now WHERE token_jti = :jti" + _LAST_SEEN_STALE),
+                                    _last_seen_params(jti),
                                 )
                                 db.commit()
-                            user = db.execute(
-                                text("SELECT * FROM users WHERE username = :username"),
-                                {"username": token_data.username},
-                            ).fetchone()
+                            user = get_user_by_username(db, payload["sub"], request)
                             if user:
-                                return dict(user._mapping)
+                                return user
             except Exception:
                 log.debug("Cookie auth failed", exc_info=True)
 
     # Try 1: JWT Bearer token (primary auth)
     if token:
-        token_data = decode_token(token)
-        if token_data:
-            import jwt as _jwt
+        payload = decode_jwt(token, request)
+        if payload:
             try:
-                payload = _jwt.decode(
-                    token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM]
-                )
                 # Reject ws-tokens, mfa_pending, and mfa_setup_required tokens from normal routes
                 if payload.get("ws") or payload.get("mfa_pending") or payload.get("mfa_setup_required"):
                     return None
                 # Check token blacklist (revoked sessions)
                 jti = payload.get("jti")
                 if jti:
-                    blacklisted = db.execute(
-                        text("SELECT 1 FROM token_blacklist WHERE jti = :jti"),
-                        {"jti": jti},
-                    ).fetchone()
-                    if blacklisted:
+                    if is_jti_blacklisted(db, jti, request):
                         return None
                     # R6: batched last_seen_at — write only if cache says it's stale.
                     if _should_write_last_seen(jti):
                         db.execute(
-                            text("UPDATE active_sessions SET last_seen_at = :now WHERE token_jti = :jti"),
-                            {"now": datetime.now(timezone.utc), "jti": jti},
+                            text("UPDATE active_sessions SET last_seen_at = :now WHERE token_jti = :jti" + _LAST_SEEN_STALE),
+                            _last_seen_params(jti),
                         )
                         db.commit()
             except Exception:
                 log.debug("Failed to update session last_seen_at", exc_info=True)
-            user = db.execute(
-                text("SELECT * FROM users WHERE username = :username"),
-                {"username": token_data.username},
-            ).fetchone()
+            user = get_user_by_username(db, payload["sub"], request)
             if user:
-                return dict(user._mapping)
+                return user
 
     # Try 2: X-API-Key header — check global key first, then scoped user tokens
     api_key = request.headers.get("X-API-Key")
@@ -232,83 +214,56 @@ async def get_current_user(
         # 2a: Global API key (legacy, constant-time comparison)
         configured_key = os.getenv("API_KEY", "")
         if configured_key and hmac.compare_digest(api_key, configured_key):
-            admin = db.execute(
-                text("SELECT * FROM users WHERE role = 'admin' AND is_active = 1 ORDER BY id LIMIT 1")
-            ).fetchone()
+            admin = get_first_active_admin(db, request)
             if admin:
-                return dict(admin._mapping)
+                return admin
 
-        # 2b: Per-user scoped tokens (odin_xxx format)
+        # 2b: Per-user scoped tokens (odin_xxx format). bcrypt runs only
+        # on the first request per token — see core/token_cache.py.
         if api_key.startswith("odin_"):
-            prefix = api_key[:10]
-            candidates = db.execute(
-                text("SELECT * FROM api_tokens WHERE token_prefix = :prefix"),
-                {"prefix": prefix},
-            ).fetchall()
-            for candidate in candidates:
-                if verify_password(api_key, candidate.token_hash):
-                    # Check expiry.
-                    #
-                    # Historical (v1.9.1 prod incident 2026-04-16): this
-                    # block previously imported `dateutil.parser.parse` which
-                    # isn't in requirements.txt. The ModuleNotFoundError
-                    # raised on EVERY scoped-token auth, returning 500 on
-                    # every agent-surface call. Silent for ~days because no
-                    # end-to-end test exercised the X-API-Key path against
-                    # a real container. Switched to stdlib
-                    # `datetime.fromisoformat` which Python 3.11 supports
-                    # natively for the shapes SQLAlchemy emits here
-                    # (tz-aware ISO-8601 with offset, or tz-naive which we
-                    # coerce to UTC before comparing).
-                    if candidate.expires_at:
-                        try:
-                            raw = candidate.expires_at
-                            if isinstance(raw, str):
-                                exp = datetime.fromisoformat(raw)
-                            else:
-                                exp = raw
-                            if exp.tzinfo is None:
-                                exp = exp.replace(tzinfo=timezone.utc)
-                            if exp < datetime.now(timezone.utc):
-                                continue
-                        except Exception:
-                            # Malformed expires_at — don't expire, let it
-                            # through. Worst case: a token that should have
-                            # expired keeps working; operator can revoke.
-                            pass
-                    # Update last_used_at — best effort. This is telemetry,
-                    # not part of the auth decision. If it races with another
-                    # writer (idempotency middleware, another auth call) and
-                    # SQLite returns `database is locked`, we must NOT fail
-                    # the auth — the agent would see a 500 on every scoped-
-                    # token call under any concurrent write load, which is
-                    # exactly what the v1.9.1 sweep 2026-04-16 surfaced.
+            candidate = resolve_api_token(db, api_key)
+            if candidate is not None:
+                expired = False
+                # Check expiry.
+                #
+                # Historical (v1.9.1 prod incident 2026-04-16): this
+                # block previously imported `dateutil.parser.parse` which
+                # isn't in requirements.txt. The ModuleNotFoundError
+                # raised on EVERY scoped-token auth, returning 500 on
+                # every agent-surface call. Silent for ~days because no
+                # end-to-end test exercised the X-API-Key path against
+                # a real container. Switched to stdlib
+                # `datetime.fromisoformat` which Python 3.11 supports
+                # natively for the shapes SQLAlchemy emits here
+                # (tz-aware ISO-8601 with offset, or tz-naive which we
+                # coerce to UTC before comparing).
+                if candidate.expires_at:
                     try:
-                        db.execute(
-                            text("UPDATE api_tokens SET last_used_at = :now WHERE id = :id"),
-                            {"now": datetime.now(timezone.utc), "id": candidate.id},
-                        )
-                        db.commit()
-                    except Exception as exc:
-                        # Roll back the failed UPDATE so the session is
-                        # clean for the handler that runs next. Log at
-                        # debug — this race is expected under load; we
-                        # only care if it happens on EVERY call.
-                        try:
-                            db.rollback()
-                        except Exception:
-                            pass
-                        log.debug(
-                            "Best-effort api_tokens.last_used_at update failed "
-                            "(likely SQLite WAL contention): %s", exc,
-                        )
+                        raw = candidate.expires_at
+                        if isinstance(raw, str):
+                            exp = datetime.fromisoformat(raw)
+                        else:
+                            exp = raw
+                        if exp.tzinfo is None:
+                            exp = exp.replace(tzinfo=timezone.utc)
+                        expired = exp < datetime.now(timezone.utc)
+                    except Exception:
+                        # Malformed expires_at — don't expire, let it
+                        # through. Worst case: a token that should have
+                        # expired keeps working; operator can revoke.
+                        pass
+                if not expired:
+                    # Update last_used_at — best effort, batched. This is
+                    # telemetry, not part of the auth decision. Writing it
+                    # on every call raced the idempotency middleware for
+                    # the SQLite writer lock (v1.9.1 sweep 2026-04-16);
+                    # flush_token_usage writes all pending uses in one
+                    # UPDATE at most once a minute and swallows lock errors.
+                    record_token_use(candidate.id)
+                    flush_token_usage(db)
                     # Fetch the user
-                    user = db.execute(
-                        text("SELECT * FROM users WHERE id = :id"),
-                        {"id": candidate.user_id},
-                    ).fetchone()
-                    if user:
-                        user_dict = dict(user._mapping)
+                    user_dict = get_user_by_id(db, candidate.user_id, request)
+                    if user_dict:
                         user_dict["_token_scopes"] = (
                             json.loads(candidate.scopes) if candidate.scopes else []
                         )
@@ -317,6 +272,20 @@ async def get_current_user(
     return None
 
 
+async def get_json_body(request: Request) -> Any:
+    """Parsed JSON request body, as a dependency.
+
+    Reading the body needs `await`, which used to force handlers that take
+    a free-form JSON body to be `async def` — and then their synchronous
+    SQLAlchemy calls ran on the event loop, stalling every other request
+    and the WebSocket broadcaster. FastAPI awaits this on the loop, so the
+    handler itself can be a plain `def` that runs in the threadpool.
+    Declare it after the auth dependencies so unauthenticated requests are
+    rejected before the body is parsed.
+    """
+    return await request.json()
+
+
 def log_audit(
     db: Session,
     action: str,
@@ -14,6 +14,7 @@ JOB_STARTED = "job.started"                           # {job_id, printer_id}
 JOB_COMPLETED = "job.completed"                       # {job_id, printer_id, duration, filament_used}
 JOB_FAILED = "job.failed"                             # {job_id, printer_id, error}
 JOB_CANCELLED = "job.cancelled"                       # {job_id, reason}
+JOB_EDITED = "job.edited"                             # {job_id, previous_end} (epoch, before the edit)
 
 # Vision events
 DETECTION_TRIGGERED = "vision.detection"              # {printer_id, detection_type, confidence, frame_url}
@@ -0,0 +1,209 @@
+"""
+O.D.I.N. — Shared camera frame cache.
+
+The vision daemon and the timelapse daemon each pulled
+/api/frame.jpeg from go2rtc for the same printer on their own schedule,
+so go2rtc grabbed and encoded a keyframe per consumer per interval, and
+every camera that had stopped answering cost each daemon its own timeout.
+
+Consumers now ask this cache for a frame no older than what they can
+tolerate. The latest JPEG of each camera is a file in a tmpfs directory
+shared by every process (ODIN_FRAME_CACHE_DIR, /dev/shm by default):
+printer_<id>.jpg, replaced atomically, its mtime being the capture time.
+When the cached frame is too old the caller takes that camera's lock
+file, looks again (another process may have just fetched it), and only
+then fetches from go2rtc and publishes the result, so consumers asking
+at the same time share one fetch. The JPEG is decoded to an ndarray only
+when a consumer asks for `Frame.image`, once per Frame.
+
+Deliberately free of FastAPI and database imports — both daemons use it.
+"""
+
+import asyncio
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import httpx
+
+try:
+    import fcntl
+except ImportError:  # no cross-process lock; consumers may fetch the same frame
+    fcntl = None
+
+log = logging.getLogger("odin.frames")
+
+GO2RTC_BASE = "http://127.0.0.1:1984"
+FETCH_TIMEOUT = 5  # seconds for one go2rtc frame
+MIN_JPEG_BYTES = 1000  # anything smaller is an error body, not a frame
+_LOCK_POLL = 0.05
+
+
+def cache_dir() -> Path:
+    default = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+    return Path(os.environ.get("ODIN_FRAME_CACHE_DIR", os.path.join(default, "odin-frames")))
+
+
+def default_max_age() -> float:
+    """Default age (seconds) up to which a cached frame is served instead of fetched."""
+    try:
+        return max(0.0, float(os.environ.get("ODIN_FRAME_MAX_AGE", "5")))
+    except ValueError:
+        return 5.0
+
+
+class Frame:
+    """One camera frame: the JPEG, when it was captured, and a lazy decode."""
+
+    __slots__ = ("printer_id", "jpeg", "captured_at", "_image")
+
+    def __init__(self, printer_id: int, jpeg: bytes, captured_at: float):
+        self.printer_id = printer_id
+        self.jpeg = jpeg
+        self.captured_at = captured_at
+        self._image = None
+
+    @property
+    def age(self) -> float:
+        """Seconds since the frame was captured."""
+        return time.time() - self.captured_at
+
+    @property
+    def image(self):
+        """BGR ndarray (None if the JPEG does not decode), decoded on first use."""
+        if self._image is None:
+            import cv2
+            import numpy as np
+            self._image = cv2.imdecode(np.frombuffer(self.jpeg, dtype=np.uint8), cv2.IMREAD_COLOR)
+        return self._image
+
+
+def _jpeg(resp) -> Optional[bytes]:
+    if resp.status_code != 200 or len(resp.content) < MIN_JPEG_BYTES:
+        return None
+    return resp.content
+
+
+class FrameCache:
+    """Latest frame per camera, shared across processes through cache_dir()."""
+
+    def __init__(self, root: Optional[Path] = None, base: str = GO2RTC_BASE, timeout: float = FETCH_TIMEOUT):
+        self.root = Path(root) if root else cache_dir()
+        self.base = base
+        self.timeout = timeout
+        # Frame last read or published per camera, keyed by file identity,
+        # so re-reading an unchanged file keeps its decoded image.
+        self._latest: Dict[int, Tuple[tuple, Frame]] = {}
+        self._mutex = threading.Lock()
+
+    def url(self, printer_id: int) -> str:
+        return f"{self.base}/api/frame.jpeg?src=printer_{printer_id}"
+
+    def _path(self, printer_id: int) -> Path:
+        return self.root / f"printer_{printer_id}.jpg"
+
+    def peek(self, printer_id: int) -> Optional[Frame]:
+        """Latest published frame of a camera, however old; None if there is none."""
+        try:
+            with open(self._path(printer_id), "rb") as f:
+                st = os.fstat(f.fileno())
+                key = (st.st_ino, st.st_mtime_ns, st.st_size)
+                with self._mutex:
+                    cached = self._latest.get(printer_id)
+                if cached and cached[0] == key:
+                    return cached[1]
+                frame = Frame(printer_id, f.read(), st.st_mtime)
+        except FileNotFoundError:
+            return None
+        with self._mutex:
+            self._latest[printer_id] = (key, frame)
+        return frame
+
+    def publish(self, printer_id: int, jpeg: bytes) -> Frame:
+        """Store a freshly fetched frame for every consumer; returns it."""
+        frame = Frame(printer_id, jpeg, time.time())
+        path = self._path(printer_id)
+        tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}")
+        try:
+            self.root.mkdir(parents=True, exist_ok=True)
+            tmp.write_bytes(jpeg)
+            os.utime(tmp, (frame.captured_at, frame.captured_at))
+            st = tmp.stat()
+            os.replace(tmp, path)
+        except OSError as e:
+            # Still usable by this caller; other consumers fetch their own.
+            log.warning(f"Cannot publish frame for printer {printer_id}: {e}")
+            tmp.unlink(missing_ok=True)
+            return frame
+        frame.captured_at = st.st_mtime
+        with self._mutex:
+            self._latest[printer_id] = ((st.st_ino, st.st_mtime_ns, st.st_size), frame)
+        return frame
+
+    def _fresh(self, printer_id: int, limit: float) -> Optional[Frame]:
+        frame = self.peek(printer_id)
+        return frame if frame is not None and frame.age <= limit else None
+
+    def _open_lock(self, printer_id: int) -> int:
+        self.root.mkdir(parents=True, exist_ok=True)
+        return os.open(self.root / f"printer_{printer_id}.lock", os.O_CREAT | os.O_RDWR, 0o600)
+
+    @contextmanager
+    def _camera_lock(self, printer_id: int):
+        if fcntl is None:
+            yield
+            return
+        fd = self._open_lock(printer_id)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            yield
+        finally:
+            os.close(fd)  # releases the lock
+
+    def get(self, printer_id: int, max_age: Optional[float] = None) -> Optional[Frame]:
+        """A frame at most `max_age` seconds old, fetched if needed; None if the camera fails."""
+        limit = default_max_age() if max_age is None else max_age
+        frame = self._fresh(printer_id, limit)
+        if frame is not None:
+            return frame
+        with self._camera_lock(printer_id):
+            frame = self._fresh(printer_id, limit)
+            if frame is not None:
+                return frame
+            try:
+                jpeg = _jpeg(httpx.get(self.url(printer_id), timeout=self.timeout))
+            except Exception as e:
+                log.debug(f"Frame fetch failed for printer {printer_id}: {e}")
+                return None
+            return self.publish(printer_id, jpeg) if jpeg else None
+
+    async def aget(self, printer_id: int, client, max_age: Optional[float] = None) -> Optional[Frame]:
+        """get() for asyncio callers, fetching with `client` (an httpx.AsyncClient).
+
+        Errors propagate; callers bound it with their own deadline.
+        """
+        limit = default_max_age() if max_age is None else max_age
+        frame = self._fresh(printer_id, limit)
+        if frame is not None:
+            return frame
+        fd = self._open_lock(printer_id) if fcntl is not None else None
+        try:
+            while fd is not None:
+                try:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:  # another consumer is fetching this camera
+                    await asyncio.sleep(_LOCK_POLL)
+            frame = self._fresh(printer_id, limit)
+            if frame is not None:
+                return frame
+            jpeg = _jpeg(await client.get(self.url(printer_id)))
+            return self.publish(printer_id, jpeg) if jpeg else None
+        finally:
+            if fd is not None:
+                os.close(fd)
@@ -184,16 +184,19 @@ def _resolve_user_id(request: Any, db: Session) -> Optional[int]:
     depending on deployment.
     """
 
+    from core import auth_context
+
     def _check_jwt(token: str) -> Optional[int]:
-        """JWT → user_id, running every validation get_current_user does."""
+        """JWT → user_id, running every validation get_current_user does.
+
+        Shares core.auth_context with get_current_user: the decode,
+        blacklist and user lookups done here are reused by the route's
+        dependency for the same request instead of being repeated.
+        """
         try:
-            from core.auth import decode_token
-            import jwt as _jwt
-            from core.auth import SECRET_KEY, ALGORITHM
-            token_data = decode_token(token)
-            if not token_data:
+            payload = auth_context.decode_jwt(token, request)
+            if not payload:
                 return None
-            payload = _jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
             # Purpose claims: any of these means the token is not valid
             # for normal routes (matches get_current_user behavior).
             if payload.get("ws") or payload.get("mfa_pending") or payload.get("mfa_setup_required"):
@@ -211,23 +214,12 @@ def _resolve_user_id(request: Any, db: Session) -> Optional[int]:
             # (revocation is real auth); skip the active_sessions
             # gate so our auth matches the route's.
             jti = payload.get("jti")
-            if jti:
-                bl = db.execute(
-                    text("SELECT 1 FROM token_blacklist WHERE jti = :jti"),
-                    {"jti": jti},
-                ).fetchone()
-                if bl:
-                    return None
-            username = token_data.username
-            if not username:
+            if jti and auth_context.is_jti_blacklisted(db, jti, request):
                 return None
-            row = db.execute(
-                text("SELECT id, is_active FROM users WHERE username = :u"),
-                {"u": username},
-            ).fetchone()
-            if not row or not row.is_active:
+            user = auth_context.get_user_by_username(db, payload["sub"], request)
+            if not user or not user.get("is_active"):
                 return None
-            return int(row.id)
+            return int(user["id"])
         except Exception:
             return None
 
@@ -249,44 +241,32 @@ def _resolve_user_id(request: Any, db: Session) -> Optional[int]:
         if uid is not None:
             return uid
 
-    # X-API-Key — per-user scoped token
+    # X-API-Key — per-user scoped token. Shares get_current_user's
+    # verified-token cache, so bcrypt runs once per token, not per layer.
     api_key = request.headers.get("X-API-Key", "")
     if api_key.startswith("odin_"):
         try:
-            from core.auth import verify_password
-            prefix = api_key[:10]
-            candidates = db.execute(
-                text(
-                    "SELECT id, user_id, token_hash, expires_at "
-                    "FROM api_tokens WHERE token_prefix = :p"
-                ),
-                {"p": prefix},
-            ).fetchall()
-            now = datetime.now(timezone.utc)
-            for row in candidates:
-                if not verify_password(api_key, row.token_hash):
-                    continue
-                if row.expires_at:
-                    try:
-                        from dateutil.parser import parse as parse_dt
-                        exp = (
-                            parse_dt(row.expires_at)
-                            if isinstance(row.expires_at, str)
-                            else row.expires_at
-                        )
-                        if exp.tzinfo is None:
-                            exp = exp.replace(tzinfo=timezone.utc)
-                        if exp < now:
-                            return None
-                    except Exception:
+            from core.token_cache import resolve_api_token
+            row = resolve_api_token(db, api_key)
+            if row is None:
+                return None
+            if row.expires_at:
+                try:
+                    exp = (
+                        datetime.fromisoformat(row.expires_at)
+                        if isinstance(row.expires_at, str)
+                        else row.expires_at
+                    )
+                    if exp.tzinfo is None:
+                        exp = exp.replace(tzinfo=timezone.utc)
+                    if exp < datetime.now(timezone.utc):
                         return None
-                user_row = db.execute(
-                    text("SELECT is_active FROM users WHERE id = :id"),
-                    {"id": row.user_id},
-                ).fetchone()
-                if not user_row or not user_row.is_active:
+                except Exception:
                     return None
-                return int(row.user_id)
+            user = auth_context.get_user_by_id(db, row.user_id, request)
+            if not user or not user.get("is_active"):
+                return None
+            return int(row.user_id)
         except Exception:
             return None
 
@@ -294,14 +274,9 @@ def _resolve_user_id(request: Any, db: Session) -> Optional[int]:
     if api_key and api_key != "undefined":
         configured = os.getenv("API_KEY", "")
         if configured and hmac.compare_digest(api_key, configured):
-            row = db.execute(
-                text(
-                    "SELECT id FROM users WHERE role = 'admin' "
-                    "AND is_active = 1 ORDER BY id LIMIT 1"
-                )
-            ).fetchone()
-            if row:
-                return int(row[0])
+            admin = auth_context.get_first_active_admin(db, request)
+            if admin:
+                return int(admin["id"])
 
     return None
 
@@ -316,26 +291,23 @@ def _resolve_user_context(request: Any, db: Session) -> Optional[dict]:
     Callers who only need the ID can use `_resolve_user_id`; callers
     who need the authz fingerprint for cache consistency use this.
     """
+    from core import auth_context
+
     uid = _resolve_user_id(request, db)
     if uid is None:
         return None
 
-    row = db.execute(
-        text(
-            "SELECT id, username, role, group_id, is_active "
-            "FROM users WHERE id = :id"
-        ),
-        {"id": uid},
-    ).fetchone()
-    if not row or not row.is_active:
+    # Served from the per-request memo `_resolve_user_id` just filled.
+    row = auth_context.get_user_by_id(db, uid, request)
+    if not row or not row.get("is_active"):
         return None
 
     ctx: dict = {
-        "id": int(row.id),
-        "username": row.username,
-        "role": row.role,
-        "group_id": row.group_id,
-        "is_active": bool(row.is_active),
+        "id": int(row["id"]),
+        "username": row.get("username"),
+        "role": row.get("role"),
+        "group_id": row.get("group_id"),
+        "is_active": bool(row["is_active"]),
         "_token_scopes": [],
     }
 
@@ -344,24 +316,15 @@ def _resolve_user_context(request: Any, db: Session) -> Optional[dict]:
     api_key_header = request.headers.get("X-API-Key", "")
     if api_key_header.startswith("odin_"):
         try:
-            from core.auth import verify_password
-            prefix = api_key_header[:10]
-            candidates = db.execute(
-                text(
-                    "SELECT token_hash, scopes FROM api_tokens "
-                    "WHERE token_prefix = :p AND user_id = :u"
-                ),
-                {"p": prefix, "u": uid},
-            ).fetchall()
-            for candidate in candidates:
-                if verify_password(api_key_header, candidate.token_hash):
-                    try:
-                        ctx["_token_scopes"] = (
-                            json.loads(candidate.scopes) if candidate.scopes else []
-                        )
-                    except Exception:
-                        ctx["_token_scopes"] = []
-                    break
+            from core.token_cache import resolve_api_token
+            candidate = resolve_api_token(db, api_key_header)
+            if candidate is not None and int(candidate.user_id) == uid:
+                try:
+                    ctx["_token_scopes"] = (
+                        json.loads(candidate.scopes) if candidate.scopes else []
+                    )
+                except Exception:
+                    ctx["_token_scopes"] = []
         except Exception:
             pass
 
@@ -996,6 +959,7 @@ async def idempotency_middleware(request: Any, call_next: Callable):
     for that deploy window, but the service stays up. `_schema_ready`
     is cached process-local for 60s to keep the hot path cheap.
     """
+    from fastapi.concurrency import run_in_threadpool  # noqa: WPS433
     from fastapi.responses import Response  # noqa: WPS433
 
     # Fast-path: non-mutating method. No work.
@@ -1006,7 +970,7 @@ async def idempotency_middleware(request: Any, call_next: Callable):
     if not key:
         return await call_next(request)
 
-    if not _idempotency_schema_ready():
+    if not await run_in_threadpool(_idempotency_schema_ready):
         # Migration 005 hasn't applied yet. Degrade cleanly — no
         # caching, but the request still executes.
         log.warning(
@@ -1096,10 +1060,13 @@ async def idempotency_middleware(request: Any, call_next: Callable):
 
     request._receive = _receive  # type: ignore[assignment]
 
+    # Every helper below runs synchronous SQLAlchemy against the
+    # session, so each call is handed to the threadpool — the middleware
+    # wraps every mutating request and must not block the event loop.
     from core.db import SessionLocal
     db = SessionLocal()
     try:
-        user_ctx = _resolve_user_context(request, db)
+        user_ctx = await run_in_threadpool(_resolve_user_context, request, db)
         if user_ctx is None:
             # Anonymous / unresolvable / expired — pass through; auth
             # will reject downstream and we don't want to cache under
@@ -1116,8 +1083,8 @@ async def idempotency_middleware(request: Any, call_next: Callable):
             query=(request.url.query or ""),
         )
 
-        classification, status, body_text, created_at_str, stored_fp, stored_mt = _lookup_row(
-            db, key, user_id, request_hash
+        classification, status, body_text, created_at_str, stored_fp, stored_mt = await run_in_threadpool(
+            _lookup_row, db, key, user_id, request_hash
         )
 
         # Codex pass 10 (2026-04-15): authz drift must NOT re-execute.
@@ -1185,14 +1152,15 @@ async def idempotency_middleware(request: Any, call_next: Callable):
         # miss / stuck_pending / expired — claim the key before the handler.
         claimed = False
         if classification == _LOOKUP_MISS:
-            claimed = _try_claim(
-                db, key, user_id,
+            claimed = await run_in_threadpool(
+                _try_claim, db, key, user_id,
                 request.method, request.url.path, request_hash,
                 auth_fingerprint=current_fp,
             )
             if not claimed:
                 # Race lost at INSERT time. Re-read to see who won.
-                return _concurrent_loser_response(
+                return await run_in_threadpool(
+                    _concurrent_loser_response,
                     db, key, user_id, request_hash, current_fp,
                 )
         else:
@@ -1201,14 +1169,15 @@ async def idempotency_middleware(request: Any, call_next: Callable):
                     "idempotency_in_progress",
                     "Transient corruption on Idempotency-Key slot. Retry.",
                 )
-            claimed = _reclaim_expired(
-                db, key, user_id,
+            claimed = await run_in_threadpool(
+                _reclaim_expired, db, key, user_id,
                 request.method, request.url.path, request_hash,
                 prior_created_at=created_at_str,
                 auth_fingerprint=current_fp,
             )
             if not claimed:
-                return _concurrent_loser_response(
+                return await run_in_threadpool(
+                    _concurrent_loser_response,
                     db, key, user_id, request_hash, current_fp,
                 )
 
@@ -1223,7 +1192,7 @@ async def idempotency_middleware(request: Any, call_next: Callable):
         try:
             response = await call_next(request)
         except BaseException:
-            _release_row(db, key, user_id)
+            await run_in_threadpool(_release_row, db, key, user_id)
             raise
 
         if 200 <= response.status_code < 300:
@@ -1254,7 +1223,7 @@ async def idempotency_middleware(request: Any, call_next: Callable):
                     "idempotency: marking uncacheable for %s %s — %s",
                     request.method, request.url.path, reason,
                 )
-                _mark_uncacheable(db, key, user_id)
+                await run_in_threadpool(_mark_uncacheable, db, key, user_id)
                 return Response(
                     content=captured,
                     status_code=response.status_code,
@@ -1263,8 +1232,8 @@ async def idempotency_middleware(request: Any, call_next: Callable):
                 )
 
             try:
-                _finalize_row(
-                    db, key, user_id, response.status_code, captured,
+                await run_in_threadpool(
+                    _finalize_row, db, key, user_id, response.status_code, captured,
                     response_media_type=getattr(response, "media_type", None) or "application/json",
                 )
             except IdempotencyFinalizeError as exc:
@@ -1299,10 +1268,10 @@ async def idempotency_middleware(request: Any, call_next: Callable):
             )
 
         # Non-2xx — release the key so the caller can retry freshly.
-        _release_row(db, key, user_id)
+        await run_in_threadpool(_release_row, db, key, user_id)
         return response
     finally:
-        db.close()
+        await run_in_threadpool(db.close)
 
 
 def prune_expired_idempotency_keys(db: Session) -> int:
@@ -0,0 +1,172 @@
+"""Full-text search over print archives, models and jobs.
+
+Global search (GET /search) and the archive list/log `search` filter
+used to match `LIKE '%q%'` against names and notes, which no index can
+serve, so every search scanned the whole history.
+
+Each source table now has a full-text index kept current by the
+database itself on every insert, update and delete, whichever code path
+writes the row:
+
+  SQLite      an FTS5 external-content table `<table>_fts` (the text is
+              not copied, only the index) kept in sync by triggers.
+  PostgreSQL  a GIN index on the weighted tsvector expression; queries
+              repeat the expression so the planner uses the index.
+
+`ensure_schema()` creates what is missing and indexes existing rows
+once; the API lifespan calls it after the tables exist.
+
+Queries match every word of the search text as a prefix ("spag plate"
+finds "Spaghetti test plate"), in any indexed column, and rank earlier
+columns higher (names over tags over notes):
+
+    from core import search_index
+
+    hits = search_index.hits("models", q)            # ORM: (id, rank) subquery
+    db.query(Model).join(hits, hits.c.id == Model.id).order_by(hits.c.rank)
+
+    conditions.append(search_index.filter_sql("print_archives", "a"))
+    params["search_q"] = search_index.match_query(q)  # raw SQL filter
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy import Float, Integer, text
+
+from core.db import IS_SQLITE
+
+log = logging.getLogger("odin.search_index")
+
+MAX_TERMS = 16          # words of the search text that are matched
+_TERM = re.compile(r"[^\W_]+")   # what the FTS5 unicode61 tokenizer keeps as a token
+
+
+@dataclass(frozen=True)
+class _Source:
+    table: str
+    columns: Tuple[str, ...]    # most significant first
+    weights: Tuple[float, ...]  # FTS5 bm25 column weights
+
+    @property
+    def fts(self) -> str:
+        return f"{self.table}_fts"
+
+
+SOURCES = {s.table: s for s in (
+    _Source("print_archives", ("print_name", "tags", "notes"), (10.0, 4.0, 1.0)),
+    _Source("models", ("name", "notes"), (10.0, 1.0)),
+    _Source("jobs", ("item_name", "notes"), (10.0, 1.0)),
+)}
+
+
+def _tsvector(src: _Source, alias: str = "") -> str:
+    """Weighted tsvector expression; identical in the index and in queries."""
+    prefix = f"{alias}." if alias else ""
+    return " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({prefix}{col}, '')), '{weight}')"
+        for col, weight in zip(src.columns, "ABCD")
+    )
+
+
+def match_query(q: str) -> Optional[str]:
+    """Search text as a dialect match expression; None if it has no words."""
+    terms = _TERM.findall(q.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    if IS_SQLITE:
+        return " ".join(f'"{t}"*' for t in terms)
+    return " & ".join(f"{t}:*" for t in terms)
+
+
+def filter_sql(table: str, alias: str, param: str = "search_q") -> str:
+    """WHERE condition: the `alias` row of `table` matches :param (a match_query())."""
+    src = SOURCES[table]
+    if IS_SQLITE:
+        return f"{alias}.id IN (SELECT rowid FROM {src.fts} WHERE {src.fts} MATCH :{param})"
+    return f"{_tsvector(src, alias)} @@ to_tsquery('simple', :{param})"
+
+
+def hits_sql(table: str, param: str = "search_q") -> str:
+    """SELECT id, rank of the `table` rows matching :param; lower rank is better."""
+    src = SOURCES[table]
+    if IS_SQLITE:
+        return f"SELECT rowid AS id, rank FROM {src.fts} WHERE {src.fts} MATCH :{param}"
+    tsv = _tsvector(src)
+    return (
+        f"SELECT id, -ts_rank({tsv}, to_tsquery('simple', :{param})) AS rank "
+        f"FROM {src.table} WHERE {tsv} @@ to_tsquery('simple', :{param})"
+    )
+
+
+def hits(table: str, q: str):
+    """(id, rank) subquery of the `table` rows matching q, for ORM joins; None if q has no words."""
+    query = match_query(q)
+    if query is None:
+        return None
+    return (
+        text(hits_sql(table))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+        .bindparams(search_q=query)
+        .columns(id=Integer, rank=Float)
+        .subquery()
+    )
+
+
+# ---------------------------------------------------------------------------
+# Schema
+# ---------------------------------------------------------------------------
+
+def _fts5_ddl(src: _Source) -> list:
+    cols = ", ".join(src.columns)
+    new = ", ".join(f"new.{c}" for c in src.columns)
+    old = ", ".join(f"old.{c}" for c in src.columns)
+    delete = f"INSERT INTO {src.fts}({src.fts}, rowid, {cols}) VALUES ('delete', old.id, {old});"
+    insert = f"INSERT INTO {src.fts}(rowid, {cols}) VALUES (new.id, {new});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {src.fts} USING fts5({cols}, "
+        f"content='{src.table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {src.fts}_ai AFTER INSERT ON {src.table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {src.fts}_ad AFTER DELETE ON {src.table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {src.fts}_au AFTER UPDATE OF {cols} ON {src.table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def _exists(conn, name: str) -> bool:
+    if IS_SQLITE:
+        row = conn.execute(text("SELECT 1 FROM sqlite_master WHERE name = :n"), {"n": name}).first()
+    else:
+        row = conn.execute(text("SELECT to_regclass(:n)"), {"n": name}).scalar()
+    return bool(row)
+
+
+def ensure_schema(engine) -> None:
+    """Create the search indexes for every source table that exists.
+
+    A new SQLite index is filled from the existing rows; PostgreSQL
+    builds an expression index from the table when it is created.
+    """
+    with engine.begin() as conn:
+        for src in SOURCES.values():
+            if not _exists(conn, src.table):
+                continue
+            if IS_SQLITE:
+                created = not _exists(conn, src.fts)
+                for stmt in _fts5_ddl(src):
+                    conn.execute(text(stmt))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                if created:
+                    weights = ", ".join(str(w) for w in src.weights)
+                    conn.execute(
+                        text(f"INSERT INTO {src.fts}({src.fts}, rank) VALUES ('rank', :rank)"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                        {"rank": f"bm25({weights})"},
+                    )
+                    conn.execute(text(f"INSERT INTO {src.fts}({src.fts}) VALUES ('rebuild')"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                    log.info(f"Built full-text index {src.fts}")
+            else:
+                conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                    f"CREATE INDEX IF NOT EXISTS idx_{src.table}_search "
+                    f"ON {src.table} USING GIN (({_tsvector(src)}))"
+                ))
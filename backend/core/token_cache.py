@@ -0,0 +1,205 @@
+"""
+O.D.I.N. — Verified API-token cache.
+
+Per-user scoped tokens (`odin_xxx`) are stored as bcrypt hashes (12 rounds).
+Resolving one used to mean loading every `api_tokens` row with the same
+10-char prefix and running bcrypt against each — ~250 ms of CPU on every
+request, twice for mutating calls (get_current_user and the idempotency
+middleware each did it). Agents poll several times a second.
+
+This module keeps an in-process map of "tokens we've already bcrypt-verified"
+keyed on an HMAC-SHA256 digest of the presented token (the raw token is
+never held in memory past the request). A cache hit skips bcrypt but still
+re-reads the token row by primary key and checks its hash is unchanged, so
+a revoked or re-minted token is rejected on the very next request — in this
+process or any other — without waiting for the TTL. Routes that revoke
+tokens also call `invalidate_token` / `invalidate_user` so entries don't
+linger; sibling API workers drop theirs too (core/workers.py).
+
+`api_tokens.last_used_at` is telemetry, not an auth decision. Uses are
+recorded in memory and written as one batched UPDATE at most once per
+flush interval, so agent polling no longer turns every request into a
+SQLite writer (same reasoning as the last_seen_at batching in
+core/dependencies.py).
+
+Deliberately free of FastAPI imports — the idempotency middleware uses it
+from helper code that runs without FastAPI in tests.
+"""
+
+import hashlib
+import hmac
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, NamedTuple, Optional
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from core import workers
+
+log = logging.getLogger("odin.api")
+
+_TOKEN_CACHE_TTL_SECONDS = 300
+_TOKEN_CACHE_MAX_ENTRIES = 1024
+_USAGE_FLUSH_INTERVAL_SECONDS = 60
+
+# Digest key. Process-local and random so digests are useless outside this
+# process even if memory is dumped.
+_DIGEST_KEY = os.urandom(32)
+
+
+class _CachedToken(NamedTuple):
+    token_id: int
+    user_id: int
+    token_hash: str
+    cached_at: float
+
+
+_cache: dict[str, _CachedToken] = {}
+_cache_lock = threading.Lock()
+
+_pending_usage: dict[int, datetime] = {}
+_last_usage_flush = 0.0
+_usage_lock = threading.Lock()
+
+
+def _digest(api_key: str) -> str:
+    return hmac.new(_DIGEST_KEY, api_key.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def _cache_get(digest: str) -> Optional[_CachedToken]:
+    with _cache_lock:
+        entry = _cache.get(digest)
+        if entry is None:
+            return None
+        if time.monotonic() - entry.cached_at >= _TOKEN_CACHE_TTL_SECONDS:
+            _cache.pop(digest, None)
+            return None
+        return entry
+
+
+def _cache_put(digest: str, row: Any) -> None:
+    with _cache_lock:
+        _cache.pop(digest, None)
+        while len(_cache) >= _TOKEN_CACHE_MAX_ENTRIES:
+            # dicts keep insertion order — drop the oldest entry.
+            _cache.pop(next(iter(_cache)))
+        _cache[digest] = _CachedToken(
+            int(row.id), int(row.user_id), row.token_hash, time.monotonic()
+        )
+
+
+def invalidate_token(token_id: int) -> None:
+    """Drop any cached verification for this token id (call on revoke)."""
+    with _cache_lock:
+        for digest in [d for d, e in _cache.items() if e.token_id == token_id]:
+            _cache.pop(digest, None)
+    workers.propagate("token_cache.invalidate_token", token_id)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop every cached token owned by this user (deactivate/delete/erase)."""
+    with _cache_lock:
+        for digest in [d for d, e in _cache.items() if e.user_id == user_id]:
+            _cache.pop(digest, None)
+    workers.propagate("token_cache.invalidate_user", user_id)
+
+
+def clear() -> None:
+    """Empty the verification cache and pending usage (tests, key rotation)."""
+    global _last_usage_flush
+    with _cache_lock:
+        _cache.clear()
+    with _usage_lock:
+        _pending_usage.clear()
+        _last_usage_flush = 0.0
+
+
+def resolve_api_token(db: Session, api_key: str) -> Optional[Any]:
+    """Return the `api_tokens` row whose hash matches `api_key`, or None.
+
+    Only proves possession of the token. Callers still check expiry and the
+    owning user's status — those can change while the entry is cached.
+    """
+    if not api_key or not api_key.startswith("odin_"):
+        return None
+
+    from core.auth import verify_password
+
+    digest = _digest(api_key)
+    entry = _cache_get(digest)
+    if entry is not None:
+        row = db.execute(
+            text("SELECT * FROM api_tokens WHERE id = :id"),
+            {"id": entry.token_id},
+        ).fetchone()
+        if row is not None and row.token_hash == entry.token_hash:
+            return row
+        # Revoked or re-hashed since we verified it — forget and re-check.
+        with _cache_lock:
+            _cache.pop(digest, None)
+
+    candidates = db.execute(
+        text("SELECT * FROM api_tokens WHERE token_prefix = :prefix"),
+        {"prefix": api_key[:10]},
+    ).fetchall()
+    for candidate in candidates:
+        if verify_password(api_key, candidate.token_hash):
+            _cache_put(digest, candidate)
+            return candidate
+    return None
+
+
+def record_token_use(token_id: int) -> None:
+    """Note that a token was just used. Written by flush_token_usage."""
+    with _usage_lock:
+        _pending_usage[int(token_id)] = datetime.now(timezone.utc)
+
+
+def flush_token_usage(db: Session, force: bool = False) -> int:
+    """Write pending last_used_at values in one batched UPDATE.
+
+    No-op unless the flush interval has passed (or `force`). Best effort:
+    on failure (typically SQLite WAL contention) the session is rolled
+    back and the batch is re-queued for the next flush. Returns the number
+    of tokens written.
+    """
+    global _last_usage_flush
+    now = time.monotonic()
+    with _usage_lock:
+        if not _pending_usage:
+            return 0
+        if not force and now - _last_usage_flush < _USAGE_FLUSH_INTERVAL_SECONDS:
+            return 0
+        batch = dict(_pending_usage)
+        _pending_usage.clear()
+        _last_usage_flush = now
+
+    try:
+        db.execute(
+            text("UPDATE api_tokens SET last_used_at = :now WHERE id = :id"),
+            [{"now": ts, "id": tid} for tid, ts in batch.items()],
+        )
+        db.commit()
+        return len(batch)
+    except Exception as exc:
+        try:
+            db.rollback()
+        except Exception:
+            pass
+        with _usage_lock:
+            for tid, ts in batch.items():
+                if tid not in _pending_usage or _pending_usage[tid] < ts:
+                    _pending_usage[tid] = ts
+        log.debug(
+            "Best-effort api_tokens.last_used_at flush failed "
+            "(likely SQLite WAL contention): %s", exc,
+        )
+        return 0
+
+
+workers.on("token_cache.invalidate_token", invalidate_token)
+workers.on("token_cache.invalidate_user", invalidate_user)
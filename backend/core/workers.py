@@ -0,0 +1,163 @@
+"""
+O.D.I.N. — Coordination between API worker processes.
+
+The API used to run as a single uvicorn worker, and several things relied
+on that: WebSocket clients connected to the one process that received
+monitor events, and process-local caches (auth, scoped tokens, quiet
+hours, MQTT republish config) were invalidated in the process that made
+the change. With ODIN_API_WORKERS=N (N > 1) uvicorn runs N worker
+processes, and this module supplies what they need to share:
+
+  - WebSocket fan-out. Each worker binds its own ws_hub socket
+    (ODIN_WS_SOCKET.<pid>) and publishers send every event to every live
+    worker socket, so each worker broadcasts to its own clients
+    (core/ws_hub.py).
+  - Cache invalidation. Caches register a handler with `on()` and call
+    `propagate()` after a local invalidation. Sibling workers receive it
+    as a control datagram on the same sockets. A lost datagram leaves a
+    cache stale for at most its TTL, the same bound as before.
+  - Singleton duties. Startup DDL runs under `startup_lock()`, one worker
+    at a time. The hourly cleanup and the go2rtc startup sync run only in
+    the worker holding the leader lock (`is_leader()`). If the leader
+    dies, another worker takes over on its next check.
+
+Event-bus subscribers need no coordination: an event published while
+handling a request runs its subscribers once, in that worker.
+
+Single-worker mode (the default) skips all of this. propagate() does
+nothing, startup_lock() is a no-op and the only worker is the leader.
+
+Deliberately free of FastAPI imports.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover — non-POSIX dev hosts
+    fcntl = None
+
+log = logging.getLogger("odin.workers")
+
+CONTROL_EVENT = "_odin.worker"
+
+
+def _worker_count() -> int:
+    try:
+        return max(1, int(os.environ.get("ODIN_API_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+WORKERS = _worker_count()
+LOCK_DIR = os.environ.get("ODIN_LOCK_DIR", tempfile.gettempdir())
+
+_handlers: dict[str, Callable[..., Any]] = {}
+_applying = threading.local()
+_leader_fd: Optional[int] = None
+_leader_lock = threading.Lock()
+
+
+def multi_worker() -> bool:
+    """True when the API runs as more than one worker process."""
+    return WORKERS > 1
+
+
+# ---------------------------------------------------------------------------
+# Cache invalidation
+# ---------------------------------------------------------------------------
+
+def on(name: str, handler: Callable[..., Any]) -> None:
+    """Register the local handler for an invalidation `name`."""
+    _handlers[name] = handler
+
+
+def propagate(name: str, *args: Any) -> None:
+    """Ask sibling workers to run `name`'s handler with `args`.
+
+    Call after invalidating locally. No-op in single-worker mode, and
+    while applying an invalidation received from a sibling (so handlers
+    can call propagate() unconditionally without echoing it back).
+    Args must be JSON-serializable.
+    """
+    if not multi_worker() or getattr(_applying, "active", False):
+        return
+    from core import ws_hub
+
+    payload = json.dumps({
+        "type": CONTROL_EVENT,
+        "data": {"name": name, "args": list(args), "origin": os.getpid()},
+    })
+    try:
+        ws_hub.send_to_workers(payload)
+    except Exception:
+        log.debug("worker invalidation %s not sent", name, exc_info=True)
+
+
+def apply(data: Any) -> None:
+    """Run a control message received from a sibling worker."""
+    if not isinstance(data, dict) or data.get("origin") == os.getpid():
+        return
+    handler = _handlers.get(data.get("name"))
+    if handler is None:
+        return
+    _applying.active = True
+    try:
+        handler(*data.get("args") or [])
+    except Exception:
+        log.warning("worker invalidation %s failed", data.get("name"), exc_info=True)
+    finally:
+        _applying.active = False
+
+
+# ---------------------------------------------------------------------------
+# Singleton duties
+# ---------------------------------------------------------------------------
+
+def _lock_path(name: str) -> str:
+    return os.path.join(LOCK_DIR, f"odin_api_{name}.lock")
+
+
+@contextmanager
+def startup_lock():
+    """Serialize a block across workers (schema creation at startup)."""
+    if not multi_worker() or fcntl is None:
+        yield
+        return
+    fd = os.open(_lock_path("startup"), os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+        os.close(fd)
+
+
+def is_leader() -> bool:
+    """True if this worker runs the singleton background duties.
+
+    The first worker to take the leader file lock keeps it for its
+    lifetime. Others retry on each call, so one of them takes over when
+    the leader exits (the kernel drops the lock with the process).
+    """
+    global _leader_fd
+    if not multi_worker() or fcntl is None:
+        return True
+    with _leader_lock:
+        if _leader_fd is not None:
+            return True
+        fd = os.open(_lock_path("leader"), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        _leader_fd = fd
+        log.info("API worker %d is the leader", os.getpid())
+        return True
@@ -2,29 +2,71 @@
 WebSocket Event Hub — IPC between monitor processes and FastAPI WebSocket.
 
 Monitor processes (mqtt_monitor, moonraker_monitor, etc.) call push_event()
-to write events to a shared SQLite table. The FastAPI WebSocket handler
-reads new events by ID and broadcasts them.
-
-Replaces the previous file-based IPC (/tmp/odin_ws_events with fcntl locks)
-with a reliable SQLite table that never silently drops events.
+to publish events. The FastAPI process runs consume() as a background task
+and hands every event to the WebSocket broadcaster.
+
+Two transports, selected with ODIN_WS_TRANSPORT:
+
+  socket (default) — every event is one datagram on a Unix-domain socket
+      (ODIN_WS_SOCKET) bound by the API process. The broadcaster awaits the
+      socket, so events reach browsers as soon as they are published and
+      monitors never touch the database on the hot path.
+  sqlite — the legacy path. Every event is an INSERT into the shared
+      ws_events table and the API polls it by id once a second.
+
+The ws_events table stays as a durable fallback for the socket transport:
+when a datagram can't be delivered (API process not up yet, receive buffer
+full, payload too large for one datagram) the event is written to the table
+and the API drains it on a slower cadence. Set ODIN_WS_DURABLE=0 to drop
+those events instead. Fallback rows may arrive out of order relative to
+socket events — the frontend treats every event as a full state update, so
+ordering across transports doesn't matter.
+
+With ODIN_API_WORKERS > 1 each API worker binds its own socket
+(ODIN_WS_SOCKET.<pid>) and publishers send every event to every live
+worker socket, so WebSocket clients get events whichever worker they are
+connected to. The same sockets carry cache-invalidation control messages
+between workers (core/workers.py); those never reach browsers.
+
+Replaces the previous file-based IPC (/tmp/odin_ws_events with fcntl locks).
 
 Copied to core/ as part of the modular architecture refactor.
 Old import path (from ws_hub import ...) continues to work via re-exports in ws_hub.py.
 """
 
+import asyncio
+import errno
+import glob
 import json
+import os
+import socket
+import threading
 import time
 import logging
-from typing import List, Tuple
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
 
+from core import workers
 from core.db_utils import get_db
 
 log = logging.getLogger("ws_hub")
 
+TRANSPORT = os.environ.get("ODIN_WS_TRANSPORT", "socket").strip().lower()
+SOCKET_PATH = os.environ.get("ODIN_WS_SOCKET", "/tmp/odin_ws_hub.sock")
+DURABLE_FALLBACK = os.environ.get("ODIN_WS_DURABLE", "1").strip().lower() in ("1", "true", "yes", "on")
+
 _CLEANUP_INTERVAL = 30   # seconds between cleanup runs
 _EVENT_TTL = 60           # delete events older than this (seconds)
 _last_cleanup = 0
 
+_MAX_DATAGRAM = 60 * 1024   # larger payloads go through the ws_events table
+_SOCKET_RCVBUF = 1 << 20    # 1 MiB kernel buffer absorbs bursts from all monitors
+_SEND_TIMEOUT = 0.25        # max time a publisher waits on a full receive queue
+_QUEUE_MAXSIZE = 10_000     # in-process backlog before the oldest events are dropped
+_TARGET_REFRESH = 1.0       # seconds between rescans for worker sockets
+_SQLITE_POLL_INTERVAL = 1.0   # legacy transport: table is the only source
+_FALLBACK_POLL_INTERVAL = 5.0  # socket transport: table only holds undeliverable events
+_TABLE_ACTIVE_WINDOW = 60.0    # socket transport: poll at 1s for this long after a table row
+
 
 def ensure_table():
     """Create ws_events table if it doesn't exist. Called from main.py lifespan."""
@@ -43,6 +85,114 @@ def ensure_table():
         conn.commit()
 
 
+# ---------------------------------------------------------------------------
+# Publisher side
+# ---------------------------------------------------------------------------
+
+class _SocketPublisher:
+    """Process-wide non-blocking datagram sender.
+
+    One unbound AF_UNIX/SOCK_DGRAM socket per process, created lazily so
+    importing ws_hub stays side-effect free. A missing listener fails
+    immediately; a full receive queue blocks the sender for at most
+    _SEND_TIMEOUT (backpressure on bursts) before the caller falls back.
+    """
+
+    def __init__(self):
+        self._sock: Optional[socket.socket] = None
+        self._lock = threading.Lock()
+        self._targets: List[str] = []
+        self._targets_at = 0.0
+
+    def _socket(self) -> socket.socket:
+        if self._sock is None:
+            with self._lock:
+                if self._sock is None:
+                    sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+                    sock.settimeout(_SEND_TIMEOUT)
+                    self._sock = sock
+        return self._sock
+
+    def send(self, payload: bytes, path: str) -> bool:
+        return self._send_one(payload, path) == "ok"
+
+    def _send_one(self, payload: bytes, path: str) -> str:
+        """Returns "ok", "gone" (nobody bound at `path`) or "failed"."""
+        if len(payload) > _MAX_DATAGRAM:
+            return "failed"
+        try:
+            self._socket().sendto(payload, path)
+            return "ok"
+        except OSError as e:
+            # ENOENT / ECONNREFUSED: nobody listening. Timeout: queue stayed full.
+            if e.errno in (errno.ENOENT, errno.ECONNREFUSED):
+                return "gone"
+            return "failed"
+
+    def targets(self, path: str) -> List[str]:
+        """The single-worker socket plus any per-worker sockets, rescanned every second."""
+        now = time.monotonic()
+        if now - self._targets_at >= _TARGET_REFRESH:
+            self._targets = [path] + sorted(glob.glob(glob.escape(path) + ".*"))
+            self._targets_at = now
+        return self._targets
+
+    def send_all(self, payload: bytes, path: str, exclude: Optional[str] = None) -> Optional[bool]:
+        """Send to every listening API worker.
+
+        Returns None when nobody is listening, True when every listener
+        took the datagram, False when at least one didn't (full queue,
+        oversized payload). Per-worker sockets left behind by a dead
+        worker are removed.
+        """
+        results = []
+        for target in self.targets(path):
+            if target == exclude:
+                continue
+            result = self._send_one(payload, target)
+            if result == "gone":
+                if target != path:
+                    try:
+                        os.unlink(target)
+                    except OSError:
+                        pass
+                    self._targets_at = 0.0
+                continue
+            results.append(result == "ok")
+        if not results:
+            return None
+        return all(results)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+
+
+_publisher = _SocketPublisher()
+
+# Set while an EventListener is running in this process (the API). Events
+# published in-process (event bus subscribers) skip the socket entirely.
+_local_listener: Optional["EventListener"] = None
+
+
+def _insert_event(event_type: str, payload: str) -> None:
+    with get_db() as conn:
+        conn.execute(
+            "INSERT INTO ws_events (event_type, data, created_at) VALUES (?, ?, ?)",
+            (event_type, payload, time.time()),
+        )
+        conn.commit()
+
+
+def listener_path() -> str:
+    """Socket path this process's EventListener binds."""
+    if workers.multi_worker():
+        return f"{SOCKET_PATH}.{os.getpid()}"
+    return SOCKET_PATH
+
+
 def push_event(event_type: str, data: dict):
     """
     Called by monitor processes to publish an event.
@@ -50,16 +200,36 @@ def push_event(event_type: str, data: dict):
     """
     try:
         payload = json.dumps({"type": event_type, "data": data})
-        with get_db() as conn:
-            conn.execute(
-                "INSERT INTO ws_events (event_type, data, created_at) VALUES (?, ?, ?)",
-                (event_type, payload, time.time()),
+        if TRANSPORT == "socket":
+            listener = _local_listener
+            local = listener is not None and listener.deliver(payload)
+            if local and not workers.multi_worker():
+                return
+            sent = _publisher.send_all(
+                payload.encode(), SOCKET_PATH,
+                exclude=listener.path if local else None,
             )
-            conn.commit()
+            # Nobody else listening is fine once this worker has it.
+            if sent or (local and sent is None):
+                return
+            if not DURABLE_FALLBACK:
+                return
+        _insert_event(event_type, payload)
     except Exception:
         pass  # Non-critical — don't crash monitors
 
 
+def send_to_workers(payload: str) -> None:
+    """Send a control message to every other API worker. Best effort, no table fallback."""
+    if TRANSPORT != "socket":
+        return
+    listener = _local_listener
+    _publisher.send_all(
+        payload.encode(), SOCKET_PATH,
+        exclude=listener.path if listener is not None else None,
+    )
+
+
 def read_events_since(last_id: int) -> Tuple[List[dict], int]:
     """
     Read events with id > last_id.
@@ -106,6 +276,197 @@ def _cleanup(before_ts: float):
         pass
 
 
+# ---------------------------------------------------------------------------
+# Listener side (API process)
+# ---------------------------------------------------------------------------
+
+class EventListener:
+    """Receives pushed events in the API process and queues them for consume().
+
+    With the socket transport, binds SOCKET_PATH and registers the fd with
+    the running event loop, so datagrams are read as soon as they arrive.
+    The queue is bounded: under a sustained burst with a stalled broadcaster
+    the oldest events are dropped (and counted) rather than growing memory.
+    """
+
+    def __init__(self, path: Optional[str] = None, maxsize: int = _QUEUE_MAXSIZE):
+        self.path = path or listener_path()
+        self.listening = False
+        self.dropped = 0
+        self._maxsize = maxsize
+        self._sock: Optional[socket.socket] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue] = None
+
+    def start(self) -> None:
+        """Bind the socket and start reading. Must run inside the event loop."""
+        global _local_listener
+
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue(maxsize=self._maxsize)
+        if TRANSPORT != "socket":
+            return
+
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        try:
+            try:
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, _SOCKET_RCVBUF)
+            except OSError:
+                pass
+            sock.bind(self.path)
+            os.chmod(self.path, 0o600)
+            sock.setblocking(False)
+        except OSError as e:
+            # Publishers will fail to send and fall back to the table.
+            sock.close()
+            log.warning("ws_hub could not bind %s (%s) — using ws_events table only", self.path, e)
+            return
+        self._sock = sock
+        self._loop.add_reader(sock.fileno(), self._on_readable)
+        self.listening = True
+        _local_listener = self
+        log.info("ws_hub listening on %s", self.path)
+
+    def close(self) -> None:
+        global _local_listener
+
+        if _local_listener is self:
+            _local_listener = None
+        if self._sock is not None:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.remove_reader(self._sock.fileno())
+            self._sock.close()
+            self._sock = None
+            self.listening = False
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def deliver(self, payload: str) -> bool:
+        """Thread-safe in-process publish. Returns False if the loop is gone."""
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            return False
+        try:
+            loop.call_soon_threadsafe(self._enqueue, payload)
+            return True
+        except RuntimeError:
+            return False
+
+    def _on_readable(self) -> None:
+        while self._sock is not None:
+            try:
+                data = self._sock.recv(_MAX_DATAGRAM)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError:
+                log.debug("ws_hub socket recv failed", exc_info=True)
+                return
+            self._enqueue(data)
+
+    def _enqueue(self, raw) -> None:
+        try:
+            evt = json.loads(raw)
+        except ValueError:
+            return
+        if evt.get("type") == workers.CONTROL_EVENT:
+            workers.apply(evt.get("data"))
+            return
+        self._put(evt)
+
+    def _put(self, evt: dict) -> None:
+        if self._queue.full():
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(evt)
+
+    async def next_batch(self, timeout: float) -> List[dict]:
+        """Wait up to `timeout` seconds for an event, then return everything queued."""
+        batch: List[dict] = []
+        try:
+            batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+        except asyncio.TimeoutError:
+            return batch
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+
+_observers: Dict[str, List[Callable[[dict], None]]] = {}
+
+
+def observe(event_type: str, callback: Callable[[dict], None]) -> None:
+    """
+    Call `callback(data)` for every `event_type` event consume() receives.
+
+    Lets API-side caches follow monitor events (e.g. the printers module's
+    live-status snapshots). Callbacks run on the event loop before the
+    WebSocket broadcast, so they must be quick and never block.
+    """
+    callbacks = _observers.setdefault(event_type, [])
+    if callback not in callbacks:
+        callbacks.append(callback)
+
+
+def _notify_observers(evt: dict) -> None:
+    for callback in _observers.get(evt.get("type"), ()):
+        try:
+            callback(evt.get("data"))
+        except Exception:
+            log.debug("ws_hub observer failed for %s", evt.get("type"), exc_info=True)
+
+
+async def consume(
+    handler: Callable[[dict], Awaitable[None]],
+    listener: Optional[EventListener] = None,
+) -> None:
+    """
+    Run forever, passing every published event to `handler`.
+
+    Socket events are handled as they arrive. The ws_events table is drained
+    every second when no socket is bound (sqlite transport, or bind failed)
+    or rows reached it in the last minute, and every few seconds as the
+    durable fallback otherwise.
+    """
+    listener = listener or EventListener()
+    listener.start()
+
+    if listener.listening:
+        drain_table = DURABLE_FALLBACK
+        poll_interval = _FALLBACK_POLL_INTERVAL
+    else:
+        drain_table = True
+        poll_interval = _SQLITE_POLL_INTERVAL
+
+    last_id = 0
+    next_drain = 0.0
+    table_active_until = 0.0
+    try:
+        while True:
+            timeout = max(0.0, next_drain - time.monotonic()) if drain_table else poll_interval
+            events = await listener.next_batch(timeout)
+            if drain_table and time.monotonic() >= next_drain:
+                table_events, last_id = read_events_since(last_id)
+                # Publishers that can't reach the socket (another container
+                # without the socket volume) keep writing the table: while
+                # rows keep arriving, drain it at the legacy cadence.
+                now = time.monotonic()
+                if table_events:
+                    table_active_until = now + _TABLE_ACTIVE_WINDOW
+                next_drain = now + (_SQLITE_POLL_INTERVAL if now < table_active_until else poll_interval)
+                events.extend(table_events)
+            for evt in events:
+                _notify_observers(evt)
+                await handler(evt)
+    finally:
+        listener.close()
+
+
 # ---------------------------------------------------------------------------
 # Event bus integration
 # ---------------------------------------------------------------------------
@@ -113,6 +474,8 @@ def _cleanup(before_ts: float):
 # Events that have dedicated handlers with legacy name translation.
 # The wildcard handler skips these to avoid double-publishing.
 _TRANSLATED_EVENTS = frozenset()
+# Bus-internal events with no frontend consumer, never forwarded
+_INTERNAL_EVENTS = frozenset()
 
 
 def _handle_job_started(event) -> None:
@@ -134,9 +497,10 @@ def _handle_other_events(event) -> None:
     """
     Catch-all handler for events that do not need name translation.
     Forwards the event to ws_events under its canonical event_type.
-    Skips events handled by dedicated translators to avoid duplicates.
+    Skips events handled by dedicated translators to avoid duplicates,
+    and bus-internal events.
     """
-    if event.event_type not in _TRANSLATED_EVENTS:
+    if event.event_type not in _TRANSLATED_EVENTS and event.event_type not in _INTERNAL_EVENTS:
         push_event(event.event_type, event.data)
 
 
@@ -146,7 +510,7 @@ def subscribe_to_bus(bus) -> None:
 
     Called once from main.py lifespan after the bus singleton is ready.
     """
-    global _TRANSLATED_EVENTS
+    global _TRANSLATED_EVENTS, _INTERNAL_EVENTS
     from core import events as ev
 
     # Job lifecycle events — translate to legacy ws event names the frontend expects
@@ -164,6 +528,8 @@ def subscribe_to_bus(bus) -> None:
         ev.JOB_FAILED,
         "notifications.alert_dispatched",
     })
+    # job.edited only tells the analytics rollups to re-roll a bucket
+    _INTERNAL_EVENTS = frozenset({ev.JOB_EDITED})
 
     # All other events forwarded as-is (printer.*, vision.*, inventory.*, system.*)
     bus.subscribe("*", _handle_other_events)
@@ -8,6 +8,7 @@ ROUTES = [
 
 TABLES = [
     "print_archives",
+    "print_archive_tags",
     "projects",
     "timelapses",
 ]
@@ -0,0 +1,57 @@
+"""Normalized archive tags.
+
+print_archives.tags holds an archive's tags as the comma-separated
+string the API returns ("calibration, PETG"). print_archive_tags
+(archives/migrations/002_archive_tags.sql) holds the same tags as one
+row per archive and tag, so filtering archives by tag and listing tags
+are index lookups instead of LIKE scans over every archive.
+
+Every tag write goes through set_tags(), which updates both. backfill()
+adds the rows of archives tagged before the table existed; the API
+lifespan runs it at startup.
+"""
+
+import logging
+from typing import Iterable, List, Optional
+
+from sqlalchemy import inspect, text
+
+log = logging.getLogger("odin.archives")
+
+_INSERT = text("INSERT INTO print_archive_tags (archive_id, tag) VALUES (:id, :tag)")
+
+
+def split_tags(raw: Optional[str]) -> List[str]:
+    """Tags of a comma-separated tags value, trimmed and deduplicated."""
+    return list(dict.fromkeys(t.strip() for t in (raw or "").split(",") if t.strip()))
+
+
+def set_tags(db, archive_id: int, tags: Iterable[str]) -> List[str]:
+    """Replace an archive's tags; returns them trimmed and deduplicated. The caller commits."""
+    clean = split_tags(",".join(tags))
+    db.execute(
+        text("UPDATE print_archives SET tags = :tags WHERE id = :id"),
+        {"tags": ", ".join(clean), "id": archive_id},
+    )
+    db.execute(text("DELETE FROM print_archive_tags WHERE archive_id = :id"), {"id": archive_id})
+    if clean:
+        db.execute(_INSERT, [{"id": archive_id, "tag": t} for t in clean])
+    return clean
+
+
+def backfill(engine) -> int:
+    """Add tag rows for tagged archives that have none. Returns the archives filled."""
+    if not inspect(engine).has_table("print_archive_tags"):
+        return 0
+    with engine.begin() as conn:
+        rows = conn.execute(text(
+            "SELECT a.id, a.tags FROM print_archives a "
+            "WHERE a.tags IS NOT NULL AND a.tags != '' "
+            "AND NOT EXISTS (SELECT 1 FROM print_archive_tags t WHERE t.archive_id = a.id)"
+        )).fetchall()
+        params = [{"id": r.id, "tag": t} for r in rows for t in split_tags(r.tags)]
+        if params:
+            conn.execute(_INSERT, params)
+    if params:
+        log.info(f"Indexed tags of {len(rows)} archives")
+    return len(rows)
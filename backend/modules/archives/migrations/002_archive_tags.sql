@@ -0,0 +1,12 @@
+-- archives/migrations/002_archive_tags.sql
+-- One row per archive and tag, so tag filters and tag counts are index
+-- lookups. print_archives.tags keeps the comma-separated copy the API
+-- returns. See modules/archives/archive_tags.py.
+
+CREATE TABLE IF NOT EXISTS print_archive_tags (
+    archive_id INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, archive_id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_print_archive_tags_archive ON print_archive_tags(archive_id);
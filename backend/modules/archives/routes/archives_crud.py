@@ -4,22 +4,23 @@
 # Depends on: core, printers, jobs, organizations
 # Owns tables: print_archives
 
-import csv
-import io
 import json
 import logging
 import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import FileResponse
 from pydantic import BaseModel as PydanticBaseModel
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from core.db import get_db
+from core import search_index
+from core.csv_stream import csv_response
+from core.db import get_db, YIELD_PER
 from core.dependencies import get_current_user
 from core.rbac import check_org_access, get_org_scope, require_role
+from modules.archives import archive_tags
 
 log = logging.getLogger("odin.api")
 router = APIRouter()
@@ -60,8 +61,7 @@ def _archive_row_to_dict(r):
         or f"Printer {d.get('printer_id')}"
     )
     # Parse tags from comma-separated string
-    raw_tags = d.get("tags") or ""
-    d["tags"] = [t.strip() for t in raw_tags.split(",") if t.strip()] if raw_tags else []
+    d["tags"] = archive_tags.split_tags(d.get("tags"))
     return d
 
 
@@ -75,8 +75,13 @@ def _build_archive_query(conditions, params, printer_id, status, search,
         conditions.append("a.status = :status")
         params["status"] = status
     if search:
-        conditions.append("a.print_name LIKE :search")
-        params["search"] = f"%{search}%"
+        # Full-text match on name, tags and notes (core/search_index.py)
+        query = search_index.match_query(search)
+        if query:
+            conditions.append(search_index.filter_sql("print_archives", "a"))
+            params["search_q"] = query
+        else:
+            conditions.append("1 = 0")  # nothing searchable, e.g. only punctuation
     if start_date:
         conditions.append("a.completed_at >= :start_date")
         params["start_date"] = start_date
@@ -87,15 +92,9 @@ def _build_archive_query(conditions, params, printer_id, status, search,
         conditions.append("a.user_id = :user_id")
         params["user_id"] = user_id
     if tag:
-        # Match comma-separated tag field (exact tag match, not substring)
-        conditions.append(
-            "(a.tags = :tag_exact OR a.tags LIKE :tag_start "
-            "OR a.tags LIKE :tag_mid OR a.tags LIKE :tag_end)"
-        )
-        params["tag_exact"] = tag
-        params["tag_start"] = f"{tag},%"
-        params["tag_mid"] = f"%, {tag},%"
-        params["tag_end"] = f"%, {tag}"
+        # Exact tag match through the normalized tag table (archive_tags.py)
+        conditions.append("a.id IN (SELECT archive_id FROM print_archive_tags WHERE tag = :tag)")
+        params["tag"] = tag.strip()
 
 
 def _check_archive_org_access(db, archive_printer_id, current_user):
@@ -286,8 +285,7 @@ def archive_log(
             d.get("printer_nickname") or d.get("printer_name")
             or f"Printer {d.get('printer_id')}"
         )
-        raw_tags = d.get("tags") or ""
-        d["tags"] = [t.strip() for t in raw_tags.split(",") if t.strip()] if raw_tags else []
+        d["tags"] = archive_tags.split_tags(d.get("tags"))
         items.append(d)
 
     return {"items": items, "total": total, "page": page, "per_page": per_page}
@@ -295,6 +293,7 @@ def archive_log(
 
 @router.get("/archives/log/export", tags=["Archives"])
 def export_archive_log(
+    request: Request,
     printer_id: Optional[int] = Query(None),
     user_id: Optional[int] = Query(None),
     status: Optional[str] = Query(None),
@@ -329,38 +328,24 @@ def export_archive_log(
             f"LEFT JOIN users u ON u.id = a.user_id "
             f"WHERE {where} "
             f"ORDER BY a.completed_at DESC"
-        ),
+        ).execution_options(yield_per=YIELD_PER),
         params,
-    ).fetchall()
+    )
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow([
+    header = [
         "Print Name", "Printer", "User", "Status",
         "Started", "Completed", "Duration (s)",
         "Filament (g)", "Cost", "Tags",
-    ])
-    for r in rows:
-        d = dict(r._mapping)
-        writer.writerow([
-            d.get("print_name", ""),
-            d.get("printer_name", ""),
-            d.get("user_name", ""),
-            d.get("status", ""),
-            d.get("started_at", ""),
-            d.get("completed_at", ""),
-            d.get("actual_duration_seconds", ""),
-            d.get("filament_used_grams", ""),
-            d.get("cost_estimate", ""),
-            d.get("tags", ""),
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=print_log.csv"},
+    ]
+    out = (
+        [
+            r.print_name, r.printer_name, r.user_name, r.status,
+            r.started_at, r.completed_at, r.actual_duration_seconds,
+            r.filament_used_grams, r.cost_estimate, r.tags,
+        ]
+        for r in rows
     )
+    return csv_response(header, out, "print_log.csv", request)
 
 
 @router.get("/archives/{archive_id}", tags=["Archives"])
@@ -422,6 +407,7 @@ def delete_archive(
         raise HTTPException(status_code=404, detail="Archive not found")
     _check_archive_org_access(db, existing.printer_id, user)
 
+    db.execute(text("DELETE FROM print_archive_tags WHERE archive_id = :id"), {"id": archive_id})
     db.execute(text("DELETE FROM print_archives WHERE id = :id"), {"id": archive_id})
     db.commit()
     return {"status": "deleted"}
@@ -446,14 +432,8 @@ def update_archive_tags(
         raise HTTPException(status_code=404, detail="Archive not found")
     _check_archive_org_access(db, existing.printer_id, user)
 
-    # Store as comma-separated, trimmed, deduplicated
-    clean = list(dict.fromkeys(t.strip() for t in body.tags if t.strip()))
-    tags_str = ", ".join(clean) if clean else ""
-
-    db.execute(
-        text("UPDATE print_archives SET tags = :tags WHERE id = :id"),
-        {"tags": tags_str, "id": archive_id},
-    )
+    # Stored comma-separated, trimmed, deduplicated, plus one print_archive_tags row each
+    clean = archive_tags.set_tags(db, archive_id, body.tags)
     db.commit()
     return {"tags": clean}
 
@@ -299,7 +299,7 @@ def export_project(
 
 
 @router.post("/projects/import", tags=["Projects"])
-async def import_project(
+def import_project(
     file: UploadFile = File(...),
     user=Depends(require_role("operator")),
     db: Session = Depends(get_db),
@@ -308,7 +308,7 @@ async def import_project(
     if not file.filename or not file.filename.endswith(".zip"):
         raise HTTPException(status_code=400, detail="Upload must be a .zip file")
 
-    contents = await file.read()
+    contents = file.file.read()
     try:
         zf = zipfile.ZipFile(io.BytesIO(contents))
     except zipfile.BadZipFile:
@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from core.db import get_db
 from core.rbac import get_org_scope, require_role
+from modules.archives import archive_tags
 
 router = APIRouter()
 
@@ -26,26 +27,43 @@ def list_tags(
     if org is not None:
         rows = db.execute(
             text(
-                "SELECT a.tags FROM print_archives a "
+                "SELECT t.tag, COUNT(*) FROM print_archive_tags t "
+                "JOIN print_archives a ON a.id = t.archive_id "
                 "LEFT JOIN printers p ON a.printer_id = p.id "
-                "WHERE a.tags IS NOT NULL AND a.tags != '' "
-                "AND (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1)"
+                "WHERE (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1) "
+                "GROUP BY t.tag ORDER BY t.tag"
             ),
             {"org": org},
         ).fetchall()
     else:
         rows = db.execute(
-            text("SELECT tags FROM print_archives WHERE tags IS NOT NULL AND tags != ''")
+            text("SELECT tag, COUNT(*) FROM print_archive_tags GROUP BY tag ORDER BY tag")
         ).fetchall()
 
-    counts = {}
-    for r in rows:
-        for t in r[0].split(","):
-            tag = t.strip()
-            if tag:
-                counts[tag] = counts.get(tag, 0) + 1
+    return {"tags": [{"name": r[0], "count": r[1]} for r in rows]}
+
 
-    return {"tags": [{"name": k, "count": v} for k, v in sorted(counts.items())]}
+def _tagged_archives(db, user, tag):
+    """(id, tags) of the archives carrying `tag` that the user can see."""
+    org = get_org_scope(user)
+    if org is not None:
+        return db.execute(
+            text(
+                "SELECT a.id, a.tags FROM print_archive_tags t "
+                "JOIN print_archives a ON a.id = t.archive_id "
+                "LEFT JOIN printers p ON a.printer_id = p.id "
+                "WHERE t.tag = :tag "
+                "AND (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1)"
+            ),
+            {"tag": tag, "org": org},
+        ).fetchall()
+    return db.execute(
+        text(
+            "SELECT a.id, a.tags FROM print_archive_tags t "
+            "JOIN print_archives a ON a.id = t.archive_id WHERE t.tag = :tag"
+        ),
+        {"tag": tag},
+    ).fetchall()
 
 
 @router.post("/tags/rename", tags=["Archives"])
@@ -61,37 +79,13 @@ def rename_tag(
     old_tag = body.old.strip()
     new_tag = body.new.strip()
 
-    org = get_org_scope(user)
-    if org is not None:
-        rows = db.execute(
-            text(
-                "SELECT a.id, a.tags FROM print_archives a "
-                "LEFT JOIN printers p ON a.printer_id = p.id "
-                "WHERE a.tags IS NOT NULL AND a.tags != '' "
-                "AND (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1)"
-            ),
-            {"org": org},
-        ).fetchall()
-    else:
-        rows = db.execute(
-            text("SELECT id, tags FROM print_archives WHERE tags IS NOT NULL AND tags != ''")
-        ).fetchall()
-
-    updated = 0
+    rows = _tagged_archives(db, user, old_tag)
     for r in rows:
-        tags = [t.strip() for t in r[1].split(",") if t.strip()]
-        if old_tag in tags:
-            tags = [new_tag if t == old_tag else t for t in tags]
-            # Deduplicate after rename
-            tags = list(dict.fromkeys(tags))
-            db.execute(
-                text("UPDATE print_archives SET tags = :tags WHERE id = :id"),
-                {"tags": ", ".join(tags), "id": r[0]},
-            )
-            updated += 1
+        tags = [new_tag if t == old_tag else t for t in archive_tags.split_tags(r[1])]
+        archive_tags.set_tags(db, r[0], tags)  # deduplicates after rename
 
     db.commit()
-    return {"updated": updated}
+    return {"updated": len(rows)}
 
 
 @router.delete("/tags/{tag}", tags=["Archives"])
@@ -105,32 +99,9 @@ def delete_tag(
     if not tag:
         raise HTTPException(status_code=400, detail="Tag name cannot be empty")
 
-    org = get_org_scope(user)
-    if org is not None:
-        rows = db.execute(
-            text(
-                "SELECT a.id, a.tags FROM print_archives a "
-                "LEFT JOIN printers p ON a.printer_id = p.id "
-                "WHERE a.tags IS NOT NULL AND a.tags != '' "
-                "AND (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1)"
-            ),
-            {"org": org},
-        ).fetchall()
-    else:
-        rows = db.execute(
-            text("SELECT id, tags FROM print_archives WHERE tags IS NOT NULL AND tags != ''")
-        ).fetchall()
-
-    updated = 0
+    rows = _tagged_archives(db, user, tag)
     for r in rows:
-        tags = [t.strip() for t in r[1].split(",") if t.strip()]
-        if tag in tags:
-            tags = [t for t in tags if t != tag]
-            db.execute(
-                text("UPDATE print_archives SET tags = :tags WHERE id = :id"),
-                {"tags": ", ".join(tags), "id": r[0]},
-            )
-            updated += 1
+        archive_tags.set_tags(db, r[0], [t for t in archive_tags.split_tags(r[1]) if t != tag])
 
     db.commit()
-    return {"updated": updated}
+    return {"updated": len(rows)}
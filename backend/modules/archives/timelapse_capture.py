@@ -4,20 +4,36 @@ Timelapse Capture Daemon
 Periodically captures JPEG frames from go2rtc camera streams for printers
 with timelapse_enabled=True while they are actively printing. When a print
 completes, stitches frames into an MP4 video using ffmpeg.
+
+Captures run on one asyncio loop. Every CAPTURE_INTERVAL all printers'
+frames are fetched concurrently, each with its own CAPTURE_TIMEOUT, so
+unreachable cameras no longer delay the rest of the fleet. Frame numbers
+come from an in-memory counter per timelapse (the frames directory is
+listed once, when a capture is resumed after a restart), and
+timelapses.frame_count is written once per tick for all printers.
+ffmpeg runs on a bounded pool of encode workers
+(ODIN_TIMELAPSE_ENCODERS), never in the capture loop.
+
+Frames come through the shared camera frame cache (core/frame_cache.py):
+a frame the vision daemon fetched within the last third of an interval
+is used instead of asking go2rtc again.
 """
 
+import asyncio
 import os
-import time
 import logging
 import subprocess
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Dict, Optional, Set, Tuple
 
 import httpx
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from core.db_compat import sql
+from core.frame_cache import FrameCache
 
 logging.basicConfig(
     level=logging.INFO,
@@ -26,9 +42,9 @@ logging.basicConfig(
 log = logging.getLogger("odin.timelapse")
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:////data/odin.db")
-GO2RTC_BASE = "http://127.0.0.1:1984"
 TIMELAPSE_DIR = Path("/data/timelapses")
 CAPTURE_INTERVAL = 30  # seconds between frames
+CAPTURE_TIMEOUT = 5  # per-printer deadline for one frame
 FFMPEG_FPS = 30  # output video framerate
 
 engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
@@ -72,7 +88,8 @@ def get_or_create_timelapse(session, printer_id: int, job_id: int) -> int:
     # Create new timelapse
     ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     filename = f"printer_{printer_id}/{ts}.mp4"
-    session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+    session.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+        f"""
         INSERT INTO timelapses (printer_id, print_job_id, filename, frame_count, status, created_at)
         VALUES (:pid, :jid, :fname, 0, 'capturing', {sql.now()})
     """), {"pid": printer_id, "jid": job_id, "fname": filename})
@@ -86,28 +103,21 @@ def get_or_create_timelapse(session, printer_id: int, job_id: int) -> int:
     return row[0]
 
 
-def capture_frame(printer_id: int, timelapse_id: int) -> bool:
-    """Capture a single JPEG frame from go2rtc."""
-    url = f"{GO2RTC_BASE}/api/frame.jpeg?src=printer_{printer_id}"
-    try:
-        resp = httpx.get(url, timeout=5)
-        if resp.status_code != 200:
-            return False
-        if len(resp.content) < 1000:  # too small, probably error
-            return False
+def _encoders() -> int:
+    return max(1, int(os.getenv("ODIN_TIMELAPSE_ENCODERS", "1")))
 
-        frame_dir = TIMELAPSE_DIR / str(timelapse_id) / "frames"
-        frame_dir.mkdir(parents=True, exist_ok=True)
 
-        # Sequential numbering for ffmpeg
-        existing = list(frame_dir.glob("*.jpg"))
-        frame_num = len(existing) + 1
-        frame_path = frame_dir / f"frame_{frame_num:06d}.jpg"
-        frame_path.write_bytes(resp.content)
-        return True
-    except Exception as e:
-        log.debug(f"Frame capture failed for printer {printer_id}: {e}")
-        return False
+def frame_dir(timelapse_id: int) -> Path:
+    return TIMELAPSE_DIR / str(timelapse_id) / "frames"
+
+
+def count_frames(timelapse_id: int) -> int:
+    """Frames already on disk for a timelapse (numbered 1..n without gaps)."""
+    try:
+        with os.scandir(frame_dir(timelapse_id)) as entries:
+            return sum(1 for e in entries if e.name.endswith(".jpg"))
+    except FileNotFoundError:
+        return 0
 
 
 def encode_timelapse(timelapse_id: int) -> bool:
@@ -120,11 +130,12 @@ def encode_timelapse(timelapse_id: int) -> bool:
         if not row:
             return False
 
-        frame_dir = TIMELAPSE_DIR / str(timelapse_id) / "frames"
-        frames = sorted(frame_dir.glob("*.jpg"))
+        frames_path = frame_dir(timelapse_id)
+        frames = sorted(frames_path.glob("*.jpg"))
         if len(frames) < 2:
             # Not enough frames, mark as failed
-            session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+            session.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                f"""
                 UPDATE timelapses SET status = 'failed', completed_at = {sql.now()}
                 WHERE id = :tid
             """), {"tid": timelapse_id})
@@ -145,7 +156,7 @@ def encode_timelapse(timelapse_id: int) -> bool:
         cmd = [
             "ffmpeg", "-y",
             "-framerate", str(FFMPEG_FPS),
-            "-i", str(frame_dir / "frame_%06d.jpg"),
+            "-i", str(frames_path / "frame_%06d.jpg"),
             "-c:v", "libx264",
             "-preset", "fast",
             "-crf", "23",
@@ -157,7 +168,8 @@ def encode_timelapse(timelapse_id: int) -> bool:
         result = subprocess.run(cmd, capture_output=True, timeout=300)
         if result.returncode != 0:
             log.error(f"ffmpeg failed for timelapse {timelapse_id}: {result.stderr.decode()[-500:]}")
-            session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+            session.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+                f"""
                 UPDATE timelapses SET status = 'failed', completed_at = {sql.now()}
                 WHERE id = :tid
             """), {"tid": timelapse_id})
@@ -167,7 +179,8 @@ def encode_timelapse(timelapse_id: int) -> bool:
         # Update record
         file_size = output_path.stat().st_size / (1024 * 1024)
         duration = len(frames) / FFMPEG_FPS
-        session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+        session.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+            f"""
             UPDATE timelapses
             SET status = 'ready',
                 frame_count = :fc,
@@ -185,7 +198,8 @@ def encode_timelapse(timelapse_id: int) -> bool:
 
     except Exception as e:
         log.error(f"Encode error for timelapse {timelapse_id}: {e}")
-        session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+        session.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+            f"""
             UPDATE timelapses SET status = 'failed', completed_at = {sql.now()}
             WHERE id = :tid
         """), {"tid": timelapse_id})
@@ -195,7 +209,7 @@ def encode_timelapse(timelapse_id: int) -> bool:
         session.close()
 
 
-def finalize_stale_timelapses():
+def finalize_stale_timelapses(encode: Callable[[int], object] = encode_timelapse):
     """Find timelapses still in 'capturing' state whose print has ended and encode them."""
     session = SessionLocal()
     try:
@@ -214,7 +228,7 @@ def finalize_stale_timelapses():
 
             if not job or job[0] != 'printing':
                 log.info(f"Timelapse {tid}: print job {jid} no longer printing, encoding...")
-                encode_timelapse(tid)
+                encode(tid)
 
     except Exception as e:
         log.error(f"Error finalizing stale timelapses: {e}")
@@ -222,62 +236,134 @@ def finalize_stale_timelapses():
         session.close()
 
 
-def main_loop():
-    """Main capture loop."""
-    TIMELAPSE_DIR.mkdir(parents=True, exist_ok=True)
-    log.info("Timelapse capture daemon started")
+class CaptureScheduler:
+    """Captures every active printer's frame per tick; hands finished prints to the encoders."""
+
+    def __init__(self, interval: float = CAPTURE_INTERVAL, timeout: float = CAPTURE_TIMEOUT,
+                 encoders: Optional[int] = None, camera: Optional[FrameCache] = None,
+                 frame_age: Optional[float] = None):
+        self.interval = interval
+        self.timeout = timeout
+        self.camera = camera or FrameCache()
+        # A frame the vision daemon took this recently is as good as a new
+        # one; well under the interval, so no frame is used twice.
+        self.frame_age = interval / 3 if frame_age is None else frame_age
+        self.active: Dict[Tuple[int, int], int] = {}  # (printer_id, job_id) -> timelapse_id
+        self.frames: Dict[int, int] = {}  # timelapse_id -> frames written
+        self.encoding: Set[int] = set()
+        self._pool = ThreadPoolExecutor(max_workers=encoders or _encoders(),
+                                        thread_name_prefix="timelapse-encode")
+        self._ticks = 0
+
+    def encode(self, timelapse_id: int):
+        """Queue an encode unless that timelapse is already queued or encoding."""
+        if timelapse_id in self.encoding:
+            return None
+        self.encoding.add(timelapse_id)
+        self.frames.pop(timelapse_id, None)
+        future = self._pool.submit(encode_timelapse, timelapse_id)
+        future.add_done_callback(lambda _: self.encoding.discard(timelapse_id))
+        return future
+
+    def _targets(self, session) -> list:
+        """(printer, timelapse_id) for every printer to capture this tick; ends the others."""
+        targets = []
+        current_keys = set()
+        for printer in get_active_printers(session):
+            job = get_active_job_for_printer(session, printer["id"])
+            if not job:
+                continue
+            key = (printer["id"], job["id"])
+            current_keys.add(key)
+            tid = self.active.get(key)
+            if not tid:
+                tid = get_or_create_timelapse(session, printer["id"], job["id"])
+                self.active[key] = tid
+                log.info(f"Capturing timelapse {tid} for {printer['name']} (job {job['id']})")
+            targets.append((printer, tid))
+
+        # Prints that just ended
+        for key in set(self.active) - current_keys:
+            tid = self.active.pop(key)
+            log.info(f"Print ended for timelapse {tid}, queueing encode...")
+            self.encode(tid)
+        return targets
+
+    async def capture(self, client, printer_id: int, timelapse_id: int) -> bool:
+        """Get and store one frame, within the per-printer deadline."""
+        try:
+            frame = await asyncio.wait_for(self.camera.aget(printer_id, client, max_age=self.frame_age),
+                                           timeout=self.timeout)
+        except Exception as e:
+            log.debug(f"Frame capture failed for printer {printer_id}: {e!r}")
+            return False
+        if frame is None:
+            return False
 
-    # Track active captures: {(printer_id, job_id): timelapse_id}
-    active = {}
-    tick = 0
+        frame_num = self.frames.get(timelapse_id)
+        if frame_num is None:
+            frame_num = count_frames(timelapse_id)  # resumed after a restart
+        try:
+            path = frame_dir(timelapse_id)
+            path.mkdir(parents=True, exist_ok=True)
+            # Sequential numbering for ffmpeg
+            (path / f"frame_{frame_num + 1:06d}.jpg").write_bytes(frame.jpeg)
+        except OSError as e:
+            log.error(f"Cannot store frame for timelapse {timelapse_id}: {e}")
+            return False
+        self.frames[timelapse_id] = frame_num + 1
+        return True
 
-    while True:
-        session = None
+    def _plan(self) -> list:
+        session = SessionLocal()
         try:
-            session = SessionLocal()
-            printers = get_active_printers(session)
-
-            current_keys = set()
-            for printer in printers:
-                job = get_active_job_for_printer(session, printer["id"])
-                if not job:
-                    continue
-
-                key = (printer["id"], job["id"])
-                current_keys.add(key)
-
-                tid = active.get(key)
-                if not tid:
-                    tid = get_or_create_timelapse(session, printer["id"], job["id"])
-                    active[key] = tid
-                    log.info(f"Capturing timelapse {tid} for {printer['name']} (job {job['id']})")
-
-                if capture_frame(printer["id"], tid):
-                    session.execute(text("""
-                        UPDATE timelapses SET frame_count = frame_count + 1 WHERE id = :tid
-                    """), {"tid": tid})
-                    session.commit()
-
-            # Check for prints that just ended
-            ended = set(active.keys()) - current_keys
-            for key in ended:
-                tid = active.pop(key)
-                log.info(f"Print ended for timelapse {tid}, starting encode...")
-                encode_timelapse(tid)
-
-            # Every 5 minutes, check for stale timelapses (e.g. daemon was restarted)
-            if tick % 10 == 0:
-                finalize_stale_timelapses()
-
-            tick += 1
+            return self._targets(session)
+        finally:
+            session.close()
 
-        except Exception as e:
-            log.error(f"Main loop error: {e}")
+    def _record(self, captured: list):
+        """Persist the frame counters of this tick's captures in one statement."""
+        session = SessionLocal()
+        try:
+            session.execute(text("UPDATE timelapses SET frame_count = :n WHERE id = :tid"),
+                            [{"tid": tid, "n": self.frames[tid]} for tid in captured])
+            session.commit()
         finally:
-            if session is not None:
-                session.close()
+            session.close()
+
+    async def tick(self, client):
+        targets = await asyncio.to_thread(self._plan)
+        results = await asyncio.gather(*(self.capture(client, p["id"], tid) for p, tid in targets))
+        captured = [tid for (_, tid), ok in zip(targets, results) if ok]
+        if captured:
+            await asyncio.to_thread(self._record, captured)
+
+        # Every 5 minutes, check for stale timelapses (e.g. daemon was restarted)
+        if self._ticks % 10 == 0:
+            await asyncio.to_thread(finalize_stale_timelapses, self.encode)
+        self._ticks += 1
+        return len(captured)
+
+    async def run(self):
+        TIMELAPSE_DIR.mkdir(parents=True, exist_ok=True)
+        log.info("Timelapse capture daemon started")
+        loop = asyncio.get_running_loop()
+        async with httpx.AsyncClient() as client:
+            next_tick = loop.time()
+            while True:
+                try:
+                    await self.tick(client)
+                except Exception as e:
+                    log.error(f"Main loop error: {e}")
+                # Keep the cadence: the next tick is due an interval after
+                # this one started, not after it finished.
+                next_tick = max(next_tick + self.interval, loop.time())
+                await asyncio.sleep(next_tick - loop.time())
 
-        time.sleep(CAPTURE_INTERVAL)
+
+def main_loop():
+    """Main capture loop."""
+    asyncio.run(CaptureScheduler().run())
 
 
 if __name__ == "__main__":
@@ -60,7 +60,7 @@ def add_custom_filament(data: FilamentCreateRequest, current_user: dict = Depend
 
 
 @router.get("/combined", tags=["Filaments"])
-async def get_combined_filaments(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def get_combined_filaments(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Get filaments from both Spoolman (if available) and local library."""
     import httpx
     from core.config import settings
@@ -71,8 +71,8 @@ async def get_combined_filaments(current_user: dict = Depends(require_role("view
         try:
             from core.itar import pin_for_request, should_trust_env
             with pin_for_request(settings.spoolman_url):
-                async with httpx.AsyncClient(trust_env=should_trust_env()) as client:
-                    resp = await client.get(f"{settings.spoolman_url}/api/v1/spool", timeout=5)
+                with httpx.Client(trust_env=should_trust_env()) as client:
+                    resp = client.get(f"{settings.spoolman_url}/api/v1/spool", timeout=5)
                     if resp.status_code == 200:
                         spools = resp.json()
                         for spool in spools:
@@ -5,13 +5,14 @@ from typing import Optional
 import logging
 
 import qrcode
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
 from PIL import Image, ImageDraw, ImageFont
 from sqlalchemy import text
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
 
-from core.db import get_db
+from core.csv_stream import csv_response
+from core.db import get_db, YIELD_PER
 from core.dependencies import log_audit
 from core.rbac import require_role
 from modules.inventory.models import Spool
@@ -24,23 +25,19 @@ router = APIRouter(prefix="/spools", tags=["Spools"])
 
 @router.get("/export", tags=["Spools"])
 def export_spools_csv(
+    request: Request,
     current_user: dict = Depends(require_role("viewer")),
     db: Session = Depends(get_db),
 ):
     """Export all spools as CSV."""
-    import csv as csv_mod
-    import io as io_mod
-
-    spools = db.query(Spool).all()
-    output = io_mod.StringIO()
-    writer = csv_mod.writer(output)
-    writer.writerow([
+    spools = db.query(Spool).options(joinedload(Spool.filament)).order_by(Spool.id).yield_per(YIELD_PER)
+    header = [
         "ID", "Brand", "Name", "Material", "Color", "Initial Weight (g)",
         "Remaining Weight (g)", "% Remaining", "Status", "Vendor", "Price",
         "Storage Location", "Notes",
-    ])
-    for s in spools:
-        writer.writerow([
+    ]
+    rows = (
+        [
             s.id,
             s.filament.brand if s.filament else "",
             s.filament.name if s.filament else "",
@@ -54,13 +51,10 @@ def export_spools_csv(
             s.price or "",
             s.storage_location or "",
             s.notes or "",
-        ])
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=spools_export.csv"},
+        ]
+        for s in spools
     )
+    return csv_response(header, rows, "spools_export.csv", request)
 
 
 @router.get("/labels/batch", tags=["Spools"])
@@ -228,7 +222,7 @@ def scan_assign_spool(
 
 
 @router.post("/bulk-update", tags=["Spools"])
-async def bulk_update_spools(body: dict, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def bulk_update_spools(body: dict, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Bulk update spool fields for multiple spools."""
     spool_ids = body.get("spool_ids", [])
     if not spool_ids or not isinstance(spool_ids, list):
@@ -21,6 +21,7 @@ PUBLISHES = [
     "job.completed",
     "job.failed",
     "job.cancelled",
+    "job.edited",
 ]
 
 SUBSCRIBES = [
@@ -0,0 +1,38 @@
+"""
+Job edit events.
+
+Finished jobs are counted in the analytics rollups under the bucket of
+COALESCE(actual_end, created_at). Routes that reset, edit, re-finish or
+delete a job publish job.edited after committing, with the time the job
+was counted under before the change, so the reporting module can re-roll
+the old bucket as well as the current one.
+"""
+
+import calendar
+import logging
+from datetime import datetime
+from typing import Optional
+
+from core import events as ev
+from core.event_bus import get_event_bus
+from core.interfaces.event_bus import Event
+
+log = logging.getLogger("odin.jobs")
+
+
+def counted_at(job) -> Optional[datetime]:
+    """The timestamp a job's rollup bucket comes from."""
+    return job.actual_end or job.created_at
+
+
+def publish_job_edited(job_id: int, previous_end: Optional[datetime]) -> None:
+    """Publish job.edited; naive timestamps are UTC, as stored."""
+    epoch = calendar.timegm(previous_end.utctimetuple()) if previous_end else None
+    try:
+        get_event_bus().publish(Event(
+            event_type=ev.JOB_EDITED,
+            source_module="jobs",
+            data={"job_id": job_id, "previous_end": epoch},
+        ))
+    except Exception as e:
+        log.warning(f"Failed to publish job.edited for job {job_id}: {e}")
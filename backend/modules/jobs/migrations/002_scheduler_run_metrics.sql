@@ -0,0 +1,9 @@
+-- Per-run cost metrics for scheduler_runs (ORM-managed, see models.py).
+-- mode is 'full' or 'incremental', delta_size counts the plan changes an
+-- incremental run applied and changed_count the jobs it wrote.
+-- Fresh installs get these columns from create_all, and the runner
+-- ignores the duplicate-column error.
+ALTER TABLE scheduler_runs ADD COLUMN mode VARCHAR(20) DEFAULT 'full';
+ALTER TABLE scheduler_runs ADD COLUMN delta_size INTEGER;
+ALTER TABLE scheduler_runs ADD COLUMN changed_count INTEGER;
+ALTER TABLE scheduler_runs ADD COLUMN duration_ms FLOAT;
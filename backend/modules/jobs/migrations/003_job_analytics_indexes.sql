@@ -0,0 +1,5 @@
+-- jobs/migrations/003_job_analytics_indexes.sql
+-- GET /analytics groups the last 30 days of jobs by day
+-- (modules/reporting/routes/analytics.py). The other aggregates scan
+-- the table once each, which beats an index walk plus row lookups.
+CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
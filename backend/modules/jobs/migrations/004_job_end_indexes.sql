@@ -0,0 +1,6 @@
+-- jobs/migrations/004_job_end_indexes.sql
+-- Analytics rollups bucket finished jobs and prints by when they ended
+-- and read the newest, not yet rolled-up hours raw
+-- (modules/reporting/analytics_rollups.py).
+CREATE INDEX IF NOT EXISTS idx_jobs_actual_end ON jobs(actual_end);
+CREATE INDEX IF NOT EXISTS idx_print_jobs_ended ON print_jobs(ended_at);
@@ -0,0 +1,9 @@
+-- jobs/migrations/005_print_file_metadata_status.sql
+-- Mesh extraction for uploaded .3mf files runs on a background queue
+-- (modules/models_library/ingest.py); the thumbnail is still read during
+-- the upload. metadata_status tracks the mesh: 'pending', 'processing',
+-- 'ready' or 'failed', and metadata_error holds why extraction failed.
+-- Existing rows were extracted during upload, hence the 'ready' default.
+ALTER TABLE print_files ADD COLUMN metadata_status VARCHAR(20) DEFAULT 'ready';
+ALTER TABLE print_files ADD COLUMN metadata_error TEXT;
+CREATE INDEX IF NOT EXISTS idx_print_files_metadata_status ON print_files(metadata_status);
@@ -0,0 +1,7 @@
+-- jobs/migrations/006_print_file_mesh_bin.sql
+-- 3D viewer meshes are stored as a compact binary buffer
+-- (modules/models_library/mesh.py) instead of JSON text in mesh_data.
+-- mesh_etag is the buffer's digest, sent as the mesh endpoints' ETag.
+-- Rows that still have JSON mesh_data are converted when first viewed.
+ALTER TABLE print_files ADD COLUMN mesh_bin BLOB;
+ALTER TABLE print_files ADD COLUMN mesh_etag VARCHAR(64);
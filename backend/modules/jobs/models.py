@@ -152,6 +152,13 @@ class SchedulerRun(Base):
     # Debug info
     notes = Column(Text)
 
+    # Run cost: "full" re-plan or "incremental" delta, how many plan
+    # changes the delta held, how many jobs were written, and latency.
+    mode = Column(String(20), default="full")
+    delta_size = Column(Integer, nullable=True)
+    changed_count = Column(Integer, nullable=True)
+    duration_ms = Column(Float, nullable=True)
+
 
 class PrintPreset(Base):
     """Reusable print job preset/template."""
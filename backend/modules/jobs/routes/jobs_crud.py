@@ -25,6 +25,7 @@ from core.rbac import (
 from core.responses import build_next_actions, next_action
 from core.quota import _get_period_key, _get_quota_usage
 from core.base import JobStatus, AlertType, AlertSeverity
+from modules.jobs.job_events import counted_at, publish_job_edited
 from modules.jobs.models import Job
 from modules.printers.models import Printer
 from modules.jobs.schemas import (
@@ -199,7 +200,7 @@ def create_jobs_batch(
 # Static route registered before /jobs/{job_id} to prevent FastAPI from
 # treating "reorder" as a job_id integer.
 @router.patch("/reorder", tags=["Jobs"])
-async def reorder_jobs_static(req: JobReorderRequest, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def reorder_jobs_static(req: JobReorderRequest, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Reorder job queue. Sets queue_position on each job based on array index."""
     reordered = 0
     for position, job_id in enumerate(req.job_ids):
@@ -216,7 +217,7 @@ async def reorder_jobs_static(req: JobReorderRequest, current_user: dict = Depen
 
 
 @router.post("/bulk-update", tags=["Jobs"])
-async def bulk_update_jobs(body: dict, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def bulk_update_jobs(body: dict, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Bulk update job fields (status, priority) for multiple jobs."""
     job_ids = body.get("job_ids", [])
     if not job_ids or not isinstance(job_ids, list):
@@ -519,10 +520,12 @@ def update_job(job_id: int, updates: JobUpdate, current_user: dict = Depends(req
     if not check_org_access(current_user, job.charged_to_org_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
+    previous_end = counted_at(job)
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(job, field, value)
 
     db.commit()
+    publish_job_edited(job_id, previous_end)
     db.refresh(job)
     return job
 
@@ -536,13 +539,15 @@ def delete_job(job_id: int, current_user: dict = Depends(require_role("operator"
     if not check_org_access(current_user, job.charged_to_org_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
+    previous_end = counted_at(job)
     log_audit(db, "job.deleted", "job", job.id, {"item_name": job.item_name})
     db.delete(job)
     db.commit()
+    publish_job_edited(job_id, previous_end)
 
 
 @router.post("/{job_id}/repeat", tags=["Jobs"])
-async def repeat_job(job_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def repeat_job(job_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Clone a job for printing again. Creates a new pending job with same settings."""
     original = db.query(Job).filter(Job.id == job_id).first()
     if not original:
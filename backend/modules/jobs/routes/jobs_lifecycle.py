@@ -11,9 +11,10 @@ import logging
 
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import get_current_user, log_audit
+from core.dependencies import get_current_user, get_json_body, log_audit
 from core.rbac import require_role, check_org_access
 from core.base import JobStatus, AlertType, AlertSeverity
+from modules.jobs.job_events import counted_at, publish_job_edited
 from modules.jobs.models import Job
 from modules.printers.models import Printer
 from modules.inventory.models import Spool, SpoolUsage
@@ -113,6 +114,7 @@ def complete_job(job_id: int, current_user: dict = Depends(require_role("operato
     # (not TRUE), so a bare `status != COMPLETED` would silently skip
     # those rows and `/complete` would return them un-completed — a
     # regression vs the previous behavior. or_(... IS NULL) covers them.
+    previous_end = counted_at(job)
     now = datetime.now(timezone.utc)
     result = db.execute(
         update(Job)
@@ -222,6 +224,7 @@ def complete_job(job_id: int, current_user: dict = Depends(require_role("operato
 
     log_audit(db, "job.completed", "job", job.id, {"printer_id": job.printer_id, "deductions": len(deductions)})
     db.commit()
+    publish_job_edited(job_id, previous_end)
     db.refresh(job)
 
     # v1.8.5: push consumption back to Spoolman for any deductions whose
@@ -304,6 +307,7 @@ def fail_job(job_id: int, notes: Optional[str] = None, current_user: dict = Depe
     if not check_org_access(current_user, job.charged_to_org_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
+    previous_end = counted_at(job)
     job.status = JobStatus.FAILED
     job.actual_end = datetime.now(timezone.utc)
     job.is_locked = True
@@ -312,6 +316,7 @@ def fail_job(job_id: int, notes: Optional[str] = None, current_user: dict = Depe
 
     log_audit(db, "job.failed", "job", job.id, {"printer_id": job.printer_id, "notes": notes})
     db.commit()
+    publish_job_edited(job_id, previous_end)
     db.refresh(job)
     return job
 
@@ -328,6 +333,7 @@ def reset_job(job_id: int, current_user: dict = Depends(require_role("operator")
     if not check_org_access(current_user, job.charged_to_org_id):
         raise HTTPException(status_code=404, detail="Job not found")
 
+    previous_end = counted_at(job)
     job.status = JobStatus.PENDING
     job.printer_id = None
     job.scheduled_start = None
@@ -339,6 +345,7 @@ def reset_job(job_id: int, current_user: dict = Depends(require_role("operator")
 
     log_audit(db, "job.reset", "job", job.id)
     db.commit()
+    publish_job_edited(job_id, previous_end)
     db.refresh(job)
     return job
 
@@ -528,14 +535,14 @@ def move_job(
 
 
 @router.patch("/{job_id}/failure", tags=["Jobs"])
-async def update_job_failure(
+def update_job_failure(
     job_id: int,
     request: Request,
     current_user: dict = Depends(require_role("operator")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    data: dict = Depends(get_json_body),
 ):
     """Add or update failure reason and notes on a failed job."""
-    data = await request.json()
 
     job = db.execute(text("SELECT id, status, charged_to_org_id FROM jobs WHERE id = :id"), {"id": job_id}).fetchone()
     if not job:
@@ -565,5 +572,7 @@ async def update_job_failure(
         updates.append(f"updated_at = {sql.now()}")
         db.execute(text(f"UPDATE jobs SET {', '.join(updates)} WHERE id = :id"), params)  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
         db.commit()
+        # fail_reason is a rollup key; the bucket itself is unchanged.
+        publish_job_edited(job_id, None)
 
     return {"success": True, "message": "Failure info updated"}
@@ -7,8 +7,10 @@ while optimizing for minimal filament changes.
 Ported from the Google Apps Script logic with improvements.
 """
 
+import os
+import time
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional, Tuple
+from typing import List, Dict, Optional, Set
 from dataclasses import dataclass, field
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -17,6 +19,8 @@ from core.base import JobStatus
 from modules.printers.models import Printer
 from modules.jobs.models import Job, SchedulerRun
 
+DEFAULT_ENGINE = os.environ.get("ODIN_SCHEDULER_ENGINE", "greedy")
+
 
 @dataclass
 class SchedulerConfig:
@@ -28,6 +32,9 @@ class SchedulerConfig:
     setup_duration_slots: int = 1  # 15-min slots for color change
     slot_duration_minutes: int = 15
     horizon_days: int = 7
+    engine: str = DEFAULT_ENGINE  # "greedy" or "optimize" (see scheduler_optimizer)
+    lookahead_jobs: int = 32  # optimize: queue window searched together
+    time_budget_ms: int = 2000  # optimize: past this, the rest is placed greedily
     
     @classmethod
     def from_time_strings(cls, blackout_start: str = "22:30", blackout_end: str = "05:30", **kwargs):
@@ -99,6 +106,103 @@ class PrinterState:
         self.colors = [c.lower() for c in new_colors] if new_colors else []
 
 
+class SlotOccupancy:
+    """
+    Busy slots per printer, one int bitset each (bit s = slot s).
+
+    `start_mask` has a bit set for every slot a job may start in (outside
+    the blackout window); it is computed once per run. A first-fit lookup
+    is a handful of shift/AND operations over the printer's bitset rather
+    than a probe of every start slot.
+    """
+
+    def __init__(self, total_slots: int, start_mask: int):
+        self.total_slots = total_slots
+        self.start_mask = start_mask
+        self._all = (1 << total_slots) - 1
+        self.busy: Dict[int, int] = {}
+
+    def mark(self, printer_id: int, start_slot: int, end_slot: int):
+        """Mark slots [start_slot, end_slot) busy, clipped to the horizon."""
+        start_slot = max(0, start_slot)
+        end_slot = min(self.total_slots, end_slot)
+        if end_slot > start_slot:
+            bits = ((1 << (end_slot - start_slot)) - 1) << start_slot
+            self.busy[printer_id] = self.busy.get(printer_id, 0) | bits
+
+    def clear(self, printer_id: int, start_slot: int, end_slot: int):
+        """Mark slots [start_slot, end_slot) free again."""
+        start_slot = max(0, start_slot)
+        end_slot = min(self.total_slots, end_slot)
+        if end_slot > start_slot and printer_id in self.busy:
+            self.busy[printer_id] &= ~(((1 << (end_slot - start_slot)) - 1) << start_slot)
+
+    def close_before(self, slot: int):
+        """No job may start before `slot` (the plan's horizon began earlier)."""
+        self.start_mask &= ~((1 << max(0, slot)) - 1)
+
+    def is_busy(self, printer_id: int, slot: int) -> bool:
+        return bool(self.busy.get(printer_id, 0) >> slot & 1)
+
+    def first_fit(self, printer_id: int, duration_slots: int, search_start: int = 0) -> Optional[int]:
+        """First slot >= search_start where a job may start and the next
+        duration_slots slots are free, or None."""
+        # Bit s of `run` is set when slots s .. s + width - 1 are all free.
+        # Doubling the width takes log2(duration_slots) steps.
+        run = ~self.busy.get(printer_id, 0) & self._all
+        width = 1
+        while width < duration_slots and run:
+            step = min(width, duration_slots - width)
+            run &= run >> step
+            width += step
+        candidates = (run & self.start_mask) >> search_start << search_start
+        if not candidates:
+            return None
+        return (candidates & -candidates).bit_length() - 1
+
+
+@dataclass
+class Booking:
+    """Slots a job holds on a printer. job_slot is where the print itself
+    starts (after any setup slot); status is the job's last known status."""
+    printer_id: int
+    start_slot: int
+    end_slot: int
+    job_slot: int
+    status: JobStatus
+
+
+@dataclass
+class SchedulePlan:
+    """
+    The state a scheduler run builds: printer states, slot occupancy and
+    every job holding slots. Scheduler.run() leaves it on `Scheduler.plan`
+    so the incremental scheduler can keep it between runs.
+    """
+    start_date: datetime
+    printer_states: Dict[int, PrinterState]
+    occupancy: SlotOccupancy
+    bookings: Dict[int, Booking] = field(default_factory=dict)
+    unplaced: Set[int] = field(default_factory=set)  # pending jobs that did not fit
+
+    def book(self, job_id: int, booking: Booking):
+        self.bookings[job_id] = booking
+        self.occupancy.mark(booking.printer_id, booking.start_slot, booking.end_slot)
+
+    def release(self, job_id: int) -> Optional[Booking]:
+        """Free a job's slots. Returns its booking, or None if it had none."""
+        booking = self.bookings.pop(job_id, None)
+        if booking is None:
+            return None
+        self.occupancy.clear(booking.printer_id, booking.start_slot, booking.end_slot)
+        # Jobs booked over the same slots by hand keep theirs.
+        for other in self.bookings.values():
+            if (other.printer_id == booking.printer_id and other.start_slot < booking.end_slot
+                    and other.end_slot > booking.start_slot):
+                self.occupancy.mark(other.printer_id, other.start_slot, other.end_slot)
+        return booking
+
+
 class Scheduler:
     """
     The main scheduler that assigns jobs to printers.
@@ -110,9 +214,12 @@ class Scheduler:
     def __init__(self, config: Optional[SchedulerConfig] = None):
         self.config = config or SchedulerConfig()
         self.slot_minutes = self.config.slot_duration_minutes
+        self.plan: Optional[SchedulePlan] = None
         
     def _time_to_slot(self, dt: datetime, start_date: datetime) -> int:
         """Convert a datetime to a slot index."""
+        if dt.tzinfo is None and start_date.tzinfo is not None:
+            dt = dt.replace(tzinfo=timezone.utc)  # SQLite hands back naive UTC
         delta = dt - start_date
         return int(delta.total_seconds() / (self.slot_minutes * 60))
     
@@ -139,6 +246,14 @@ class Scheduler:
             return minutes >= blackout_start or minutes < blackout_end
         else:
             return blackout_start <= minutes < blackout_end
+
+    def _start_mask(self, start_date: datetime, total_slots: int) -> int:
+        """Bitset of the slots a job may start in (not in the blackout window)."""
+        mask = 0
+        for slot in range(total_slots):
+            if not self._is_blackout_time(self._slot_to_time(slot, start_date)):
+                mask |= 1 << slot
+        return mask
     
     def _calculate_color_score(self, loaded_colors: List[str], required_colors: List[str]) -> int:
         """
@@ -174,30 +289,15 @@ class Scheduler:
         self,
         printer_id: int,
         duration_slots: int,
-        usage_map: Dict[Tuple[int, int], str],
-        start_date: datetime,
-        total_slots: int,
+        occupancy: SlotOccupancy,
         search_start: int = 0
     ) -> Optional[int]:
-        """Find the first available slot for a job on a specific printer."""
-        for start_slot in range(search_start, total_slots - duration_slots + 1):
-            start_time = self._slot_to_time(start_slot, start_date)
-            
-            # Skip blackout times for the START of the job
-            if self._is_blackout_time(start_time):
-                continue
-            
-            # Check for conflicts across all needed slots
-            conflict = False
-            for s in range(start_slot, start_slot + duration_slots):
-                if (printer_id, s) in usage_map:
-                    conflict = True
-                    break
-            
-            if not conflict:
-                return start_slot
-        
-        return None
+        """Find the first available slot for a job on a specific printer.
+
+        The job's START must fall outside the blackout window; the job
+        itself may run through it.
+        """
+        return occupancy.first_fit(printer_id, duration_slots, search_start)
     
     def _cleanup_stale_schedules(self, db: Session) -> int:
         """Reset SCHEDULED jobs whose time window has passed (>2hrs past scheduled_start)."""
@@ -228,31 +328,24 @@ class Scheduler:
             SchedulerResult with assignments and metrics
         """
         result = SchedulerResult(success=True)
+        started = time.perf_counter()
 
         # Default start to now, rounded up to next slot
         if start_date is None:
             start_date = self._round_up_to_next_slot(datetime.now(timezone.utc))
 
         # Proactive stale schedule cleanup — reset SCHEDULED jobs past their window
-        self._cleanup_stale_schedules(db)
-
-        # Calculate total slots in horizon
-        total_slots = self.config.horizon_days * 24 * (60 // self.slot_minutes)
+        stale = self._cleanup_stale_schedules(db)
 
         # Load printers
         printers = db.query(Printer).filter(Printer.is_active.is_(True)).all()
         if not printers:
             result.success = False
             result.errors.append("No active printers found")
+            self.plan = None
             return result
-        
-        # Initialize printer states
-        printer_states: Dict[int, PrinterState] = {
-            p.id: PrinterState(p) for p in printers
-        }
-        
-        # Track slot usage: {(printer_id, slot_index): job_id or "SETUP"}
-        usage_map: Dict[Tuple[int, int], str] = {}
+
+        plan = self._new_plan(printers, start_date)
         
         # Load locked jobs first (Completed, Printing, AND Scheduled)
         # This prevents double-booking!
@@ -263,38 +356,66 @@ class Scheduler:
         ).all()
         
         for job in locked_jobs:
-            if job.printer_id not in printer_states:
-                continue
-                
-            state = printer_states[job.printer_id]
-            start_slot = self._time_to_slot(job.scheduled_start, start_date)
-            duration_slots = max(1, int(job.effective_duration * (60 / self.slot_minutes)))
-            end_slot = start_slot + duration_slots
-            
-            # Mark slots as used
-            for s in range(max(0, start_slot), min(total_slots, end_slot)):
-                usage_map[(job.printer_id, s)] = str(job.id)
-            
-            # Update printer state
-            if job.colors_list:
-                state.colors = [c.lower() for c in job.colors_list]
-            state.job_count += 1
-            state.last_item = job.item_name
-            state.last_end_slot = max(state.last_end_slot, end_slot)
+            self._lock_job(plan, job)
         
         # Get pending jobs to schedule
         pending_jobs = db.query(Job).filter(
             Job.status == JobStatus.PENDING,
             Job.hold.is_(False)
         ).order_by(Job.priority, Job.created_at).all()
+
+        self._place_jobs(db, plan, pending_jobs, result)
         
-        # Pre-fetch printer model requirements from uploaded print files.
-        # This is the safety gate data: a job that uses an H2D file must not
-        # be assigned to an X1C printer. We look up print_files.printer_model
-        # via the job's model_id (print_files.model_id FK). We only block on
-        # known mismatches — if a printer's model is unset we let it through.
+        # Commit changes
+        db.commit()
+        self.plan = plan
+
+        self._log_run(db, result, total_jobs=len(pending_jobs), mode="full",
+                      changed_count=result.scheduled_count + stale, started=started)
+        return result
+
+    def _new_plan(self, printers: List[Printer], start_date: datetime) -> SchedulePlan:
+        """Empty plan for these printers, horizon starting at start_date."""
+        total_slots = self.config.horizon_days * 24 * (60 // self.slot_minutes)
+        return SchedulePlan(
+            start_date=start_date,
+            printer_states={p.id: PrinterState(p) for p in printers},
+            # Blackout start slots precomputed once
+            occupancy=SlotOccupancy(total_slots, self._start_mask(start_date, total_slots)),
+        )
+
+    def _lock_job(self, plan: SchedulePlan, job: Job) -> bool:
+        """Book an already-placed (scheduled/printing/completed) job's slots."""
+        if job.printer_id not in plan.printer_states:
+            return False
+
+        state = plan.printer_states[job.printer_id]
+        start_slot = self._time_to_slot(job.scheduled_start, plan.start_date)
+        duration_slots = max(1, int(job.effective_duration * (60 / self.slot_minutes)))
+        end_slot = start_slot + duration_slots
+
+        # Mark slots as used
+        plan.book(job.id, Booking(job.printer_id, start_slot, end_slot, start_slot, job.status))
+
+        # Update printer state
+        if job.colors_list:
+            state.colors = [c.lower() for c in job.colors_list]
+        state.job_count += 1
+        state.last_item = job.item_name
+        state.last_end_slot = max(state.last_end_slot, end_slot)
+        return True
+
+    def _model_requirements(self, db: Session, jobs: List[Job]) -> Dict[int, str]:
+        """
+        Pre-fetch printer model requirements from uploaded print files.
+
+        This is the safety gate data: a job that uses an H2D file must not
+        be assigned to an X1C printer. We look up print_files.printer_model
+        via the job's model_id (print_files.model_id FK). We only block on
+        known mismatches — if a printer's model is unset we let it through.
+        """
         job_model_requirements: Dict[int, str] = {}
-        model_ids = [j.model_id for j in pending_jobs if j.model_id]
+        model_ids = [j.model_id for j in jobs if j.model_id]
         if model_ids:
             placeholders = ",".join(str(m) for m in set(model_ids))
             rows = db.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
@@ -309,85 +430,136 @@ class Scheduler:
                 if row[0] not in seen:
                     job_model_requirements[row[0]] = row[1]
                     seen.add(row[0])
+        return job_model_requirements
+
+    def _place_jobs(self, db: Session, plan: SchedulePlan, jobs: List[Job], result: SchedulerResult):
+        """Place pending jobs, in order, around the plan's bookings."""
+        job_model_requirements = self._model_requirements(db, jobs)
 
         # Schedule each job
-        for job in pending_jobs:
+        for job in jobs:
             best_fit = self._find_best_fit(
                 job=job,
-                printer_states=printer_states,
-                usage_map=usage_map,
-                start_date=start_date,
-                total_slots=total_slots,
+                printer_states=plan.printer_states,
+                occupancy=plan.occupancy,
+                start_date=plan.start_date,
                 required_printer_model=job_model_requirements.get(job.model_id)
             )
             
             if best_fit:
-                # Apply the assignment
-                self._apply_assignment(
-                    job=job,
-                    fit=best_fit,
-                    printer_states=printer_states,
-                    usage_map=usage_map
-                )
-                
-                # Update the job in database
-                job.status = JobStatus.SCHEDULED
-                job.printer_id = best_fit["printer_id"]
-                job.scheduled_start = best_fit["start_time"]
-                job.scheduled_end = best_fit["end_time"]
-                job.match_score = best_fit["match_score"]
-                
-                # Track metrics
-                result.scheduled_count += 1
-                result.total_match_score += best_fit["match_score"]
-                result.total_duration += job.effective_duration
-                if best_fit["requires_setup"]:
-                    result.setup_blocks += 1
-                
-                # Record assignment
-                result.assignments.append(SlotAssignment(
-                    printer_id=best_fit["printer_id"],
-                    printer_name=best_fit["printer_name"],
-                    job_id=job.id,
-                    start_slot=best_fit["start_slot"],
-                    end_slot=best_fit["end_slot"],
-                    start_time=best_fit["start_time"],
-                    end_time=best_fit["end_time"],
-                    match_score=best_fit["match_score"]
-                ))
+                self._commit_fit(plan, job, best_fit, result)
             else:
-                result.skipped_count += 1
-                req = job_model_requirements.get(job.model_id)
-                if req:
-                    result.errors.append(f"Could not schedule job {job.id} ({job.item_name}): requires {req} printer, none available")
-                else:
-                    result.errors.append(f"Could not schedule job {job.id}: {job.item_name}")
+                self._record_skip(plan, job, job_model_requirements.get(job.model_id), result)
+
+    def _commit_fit(self, plan: SchedulePlan, job: Job, fit: Dict, result: SchedulerResult):
+        """Book a chosen fit in the plan, write it to the job, count it."""
+        # Apply the assignment
+        self._apply_assignment(
+            job=job,
+            fit=fit,
+            printer_states=plan.printer_states,
+            occupancy=plan.occupancy
+        )
+        plan.bookings[job.id] = Booking(
+            fit["printer_id"], fit["start_slot"], fit["end_slot"],
+            fit["job_start_slot"], JobStatus.SCHEDULED,
+        )
+        plan.unplaced.discard(job.id)
         
-        # Commit changes
-        db.commit()
+        # Update the job in database
+        job.status = JobStatus.SCHEDULED
+        job.printer_id = fit["printer_id"]
+        job.scheduled_start = fit["start_time"]
+        job.scheduled_end = fit["end_time"]
+        job.match_score = fit["match_score"]
         
-        # Log the run
+        # Track metrics
+        result.scheduled_count += 1
+        result.total_match_score += fit["match_score"]
+        result.total_duration += job.effective_duration
+        if fit["requires_setup"]:
+            result.setup_blocks += 1
+        
+        # Record assignment
+        result.assignments.append(SlotAssignment(
+            printer_id=fit["printer_id"],
+            printer_name=fit["printer_name"],
+            job_id=job.id,
+            start_slot=fit["start_slot"],
+            end_slot=fit["end_slot"],
+            start_time=fit["start_time"],
+            end_time=fit["end_time"],
+            match_score=fit["match_score"]
+        ))
+
+    def _record_skip(self, plan: SchedulePlan, job: Job, required_printer_model: Optional[str],
+                     result: SchedulerResult):
+        plan.unplaced.add(job.id)
+        result.skipped_count += 1
+        if required_printer_model:
+            result.errors.append(f"Could not schedule job {job.id} ({job.item_name}): requires {required_printer_model} printer, none available")
+        else:
+            result.errors.append(f"Could not schedule job {job.id}: {job.item_name}")
+
+    def _log_run(self, db: Session, result: SchedulerResult, total_jobs: int, mode: str,
+                 changed_count: int, started: float, delta_size: Optional[int] = None):
+        """Record the run (with its latency) in scheduler_runs and commit."""
         run_log = SchedulerRun(
-            total_jobs=len(pending_jobs),
+            total_jobs=total_jobs,
             scheduled_count=result.scheduled_count,
             skipped_count=result.skipped_count,
             setup_blocks=result.setup_blocks,
             avg_match_score=result.avg_match_score,
             avg_job_duration=result.avg_duration,
-            notes="; ".join(result.errors[:5]) if result.errors else None
+            notes="; ".join(result.errors[:5]) if result.errors else None,
+            mode=mode,
+            delta_size=delta_size,
+            changed_count=changed_count,
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
         )
         db.add(run_log)
         db.commit()
-        
-        return result
     
+    def _is_eligible(
+        self,
+        state: PrinterState,
+        required_printer_model: Optional[str],
+        required_tags: List[str],
+        job_target_type: str,
+        job_target_filter: Optional[str]
+    ) -> bool:
+        """Whether a job's model, tag and target constraints allow this printer."""
+        # Model constraint: skip printers whose model is known and doesn't match.
+        # If printer model is unset (not yet auto-detected), we allow it through —
+        # blocking on unknown model would exclude all non-Bambu printers.
+        if required_printer_model:
+            printer_model = (state.printer.model or '').strip()
+            if printer_model and printer_model != required_printer_model:
+                return False
+
+        # Tag constraint: skip printers missing required tags
+        if required_tags:
+            printer_tags = state.printer.tags or []
+            if not all(t in printer_tags for t in required_tags):
+                return False
+
+        # Target type constraint: filter by machine_type or protocol
+        if job_target_type == 'model' and job_target_filter:
+            machine_type = getattr(state.printer, 'machine_type', None) or ''
+            if machine_type.lower() != job_target_filter.lower():
+                return False
+        elif job_target_type == 'protocol' and job_target_filter:
+            printer_protocol = getattr(state.printer, 'api_type', None) or ''
+            if printer_protocol.lower() != job_target_filter.lower():
+                return False
+        return True
+
     def _find_best_fit(
         self,
         job: Job,
         printer_states: Dict[int, PrinterState],
-        usage_map: Dict[Tuple[int, int], str],
+        occupancy: SlotOccupancy,
         start_date: datetime,
-        total_slots: int,
         required_printer_model: Optional[str] = None
     ) -> Optional[Dict]:
         """
@@ -405,33 +577,13 @@ class Scheduler:
         required_colors = job.colors_list or []
         required_tags = job.required_tags or []
         duration_slots = max(1, int(job.effective_duration * (60 / self.slot_minutes)))
+        job_target_type = getattr(job, 'target_type', 'specific') or 'specific'
+        job_target_filter = getattr(job, 'target_filter', None)
 
         for printer_id, state in printer_states.items():
-            # Model constraint: skip printers whose model is known and doesn't match.
-            # If printer model is unset (not yet auto-detected), we allow it through —
-            # blocking on unknown model would exclude all non-Bambu printers.
-            if required_printer_model:
-                printer_model = (state.printer.model or '').strip()
-                if printer_model and printer_model != required_printer_model:
-                    continue
-
-            # Tag constraint: skip printers missing required tags
-            if required_tags:
-                printer_tags = state.printer.tags or []
-                if not all(t in printer_tags for t in required_tags):
-                    continue
-
-            # Target type constraint: filter by machine_type or protocol
-            job_target_type = getattr(job, 'target_type', 'specific') or 'specific'
-            job_target_filter = getattr(job, 'target_filter', None)
-            if job_target_type == 'model' and job_target_filter:
-                machine_type = getattr(state.printer, 'machine_type', None) or ''
-                if machine_type.lower() != job_target_filter.lower():
-                    continue
-            elif job_target_type == 'protocol' and job_target_filter:
-                printer_protocol = getattr(state.printer, 'api_type', None) or ''
-                if printer_protocol.lower() != job_target_filter.lower():
-                    continue
+            if not self._is_eligible(state, required_printer_model, required_tags,
+                                     job_target_type, job_target_filter):
+                continue
 
             # Calculate color match score (0-100)
             color_score = self._calculate_color_score(state.colors, required_colors)
@@ -446,9 +598,7 @@ class Scheduler:
             start_slot = self._find_first_available_slot(
                 printer_id=printer_id,
                 duration_slots=total_slots_needed,
-                usage_map=usage_map,
-                start_date=start_date,
-                total_slots=total_slots
+                occupancy=occupancy
             )
             
             if start_slot is None:
@@ -456,9 +606,7 @@ class Scheduler:
             
             # Calculate actual job start (after setup if needed)
             job_start_slot = start_slot + (self.config.setup_duration_slots if requires_setup else 0)
-            job_start_time = self._slot_to_time(job_start_slot, start_date)
             end_slot = job_start_slot + duration_slots
-            end_time = self._slot_to_time(end_slot, start_date)
             
             # Calculate priority score
             # Higher score = better fit
@@ -486,8 +634,6 @@ class Scheduler:
                 "start_slot": start_slot,
                 "job_start_slot": job_start_slot,
                 "end_slot": end_slot,
-                "start_time": job_start_time,
-                "end_time": end_time,
                 "requires_setup": requires_setup,
                 "match_score": color_score,
                 "score": score
@@ -498,27 +644,24 @@ class Scheduler:
         
         # Sort by score (highest first) and return best
         candidates.sort(key=lambda x: x["score"], reverse=True)
-        return candidates[0]
+        best = candidates[0]
+        best["start_time"] = self._slot_to_time(best["job_start_slot"], start_date)
+        best["end_time"] = self._slot_to_time(best["end_slot"], start_date)
+        return best
     
     def _apply_assignment(
         self,
         job: Job,
         fit: Dict,
         printer_states: Dict[int, PrinterState],
-        usage_map: Dict[Tuple[int, int], str]
+        occupancy: SlotOccupancy
     ):
         """Apply a job assignment to the state tracking structures."""
         printer_id = fit["printer_id"]
         state = printer_states[printer_id]
         
-        # Mark setup slots if needed
-        if fit["requires_setup"]:
-            for s in range(fit["start_slot"], fit["job_start_slot"]):
-                usage_map[(printer_id, s)] = "SETUP"
-        
-        # Mark job slots
-        for s in range(fit["job_start_slot"], fit["end_slot"]):
-            usage_map[(printer_id, s)] = str(job.id)
+        # Mark setup slots (if any) and job slots
+        occupancy.mark(printer_id, fit["start_slot"], fit["end_slot"])
         
         # Update printer state
         if job.colors_list:
@@ -528,7 +671,16 @@ class Scheduler:
         state.last_end_slot = fit["end_slot"]
 
 
+def make_scheduler(config: Optional[SchedulerConfig] = None) -> Scheduler:
+    """Scheduler for the config's engine: greedy first-fit or the optimizer."""
+    config = config or SchedulerConfig()
+    if config.engine == "optimize":
+        from modules.jobs.scheduler_optimizer import OptimizingScheduler
+        return OptimizingScheduler(config)
+    return Scheduler(config)
+
+
 def run_scheduler(db: Session, config: Optional[SchedulerConfig] = None) -> SchedulerResult:
     """Convenience function to run the scheduler."""
-    scheduler = Scheduler(config)
+    scheduler = make_scheduler(config)
     return scheduler.run(db)
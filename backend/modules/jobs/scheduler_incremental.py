@@ -0,0 +1,247 @@
+"""
+O.D.I.N. — Incremental Scheduler
+
+Scheduler.run() re-plans from scratch: it reloads every active printer,
+every locked job and every pending job, rebuilds slot occupancy and
+places the queue. The monitors fire it (POST /scheduler/run) whenever a
+job start bumps or sweeps a schedule, so most runs rebuild a plan that
+barely changed.
+
+IncrementalScheduler keeps the SchedulePlan of the last full run in
+memory. Each run reads a narrow snapshot of the active jobs (id, status,
+printer, start, hold) and the active printer ids, diffs it against the
+plan and applies only the delta:
+
+  job added, re-queued or released  placed around the current bookings
+  job cancelled, failed or deleted  its slots are released
+  job moved by hand                 re-booked where it now sits
+  job completed                     keeps its slots, as in a full run
+  printer deactivated or removed    its scheduled jobs go back to pending
+                                    and are placed on other printers
+  printer added or re-activated     joins the plan
+
+Pending jobs that did not fit are retried only when slots were freed or
+a printer joined. Only the jobs the delta touches are loaded and written.
+
+A full re-plan still runs when there is no plan yet, the config changed,
+the plan is older than FULL_REPLAN_MINUTES, or the caller asks for one
+(POST /scheduler/run?mode=full). The periodic full re-plan is the
+consistency check: it rebuilds the plan from the database, resets the
+shrinking horizon, and discards anything the diff cannot see (loaded
+colors, edited durations). How many bookings it moved is logged.
+
+Every run is logged to scheduler_runs with its mode, delta size, jobs
+written and latency. GET /metrics exports the latest run of each mode.
+
+Plans are per process. With several API workers each keeps its own, and
+each run diffs against the database, not against events.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Optional, Set
+
+from sqlalchemy.orm import Session
+
+from core.base import JobStatus
+from modules.jobs.models import Job
+from modules.jobs.scheduler import (
+    PrinterState, SchedulePlan, SchedulerConfig, SchedulerResult, make_scheduler,
+)
+from modules.printers.models import Printer
+
+log = logging.getLogger("odin.scheduler")
+
+INCREMENTAL = os.environ.get("ODIN_SCHEDULER_INCREMENTAL", "1") != "0"
+FULL_REPLAN_MINUTES = float(os.environ.get("ODIN_SCHEDULER_FULL_REPLAN_MINUTES", "60"))
+
+_ACTIVE = (JobStatus.PENDING, JobStatus.SCHEDULED, JobStatus.PRINTING)
+_BOOKED = (JobStatus.SCHEDULED, JobStatus.PRINTING)
+
+
+class IncrementalScheduler:
+    """Keeps a schedule plan between runs and applies database deltas to it."""
+
+    def __init__(self, config: Optional[SchedulerConfig] = None):
+        self.scheduler = make_scheduler(config)
+        self.config = self.scheduler.config
+        self.plan: Optional[SchedulePlan] = None
+        self.planned_at = 0.0
+        self._lock = threading.Lock()
+
+    def run(self, db: Session, full: bool = False) -> SchedulerResult:
+        """Apply the delta since the last run, or re-plan from scratch."""
+        with self._lock:
+            if full or self._needs_full_replan():
+                return self._run_full(db)
+            return self._run_delta(db)
+
+    def _needs_full_replan(self) -> bool:
+        if self.plan is None:
+            return True
+        if time.monotonic() - self.planned_at > FULL_REPLAN_MINUTES * 60:
+            return True
+        # Less than a day of horizon left.
+        day_slots = 24 * (60 // self.scheduler.slot_minutes)
+        return self._now_slot() > self.plan.occupancy.total_slots - day_slots
+
+    def _now_slot(self) -> int:
+        s = self.scheduler
+        return s._time_to_slot(s._round_up_to_next_slot(datetime.now(timezone.utc)), self.plan.start_date)
+
+    def _run_full(self, db: Session) -> SchedulerResult:
+        old = self.plan
+        result = self.scheduler.run(db)
+        self.plan = self.scheduler.plan
+        self.planned_at = time.monotonic()
+        if old is not None and self.plan is not None:
+            drift = self._drift(old, self.plan)
+            if drift:
+                log.info(f"Full re-plan: {drift} booking(s) differ from the kept plan")
+        return result
+
+    def _drift(self, old: SchedulePlan, new: SchedulePlan) -> int:
+        """Bookings in the kept plan that the re-plan has elsewhere or not at
+        all: changes since the last run plus anything the diff missed."""
+        offset = self.scheduler._time_to_slot(new.start_date, old.start_date)
+        drift = 0
+        for job_id, booking in old.bookings.items():
+            if booking.end_slot <= offset:
+                continue  # ended before the new horizon
+            current = new.bookings.get(job_id)
+            if (current is None or current.printer_id != booking.printer_id
+                    or current.job_slot + offset != booking.job_slot):
+                drift += 1
+        return drift
+
+    def _run_delta(self, db: Session) -> SchedulerResult:
+        s = self.scheduler
+        plan = self.plan
+        result = SchedulerResult(success=True)
+        started = time.perf_counter()
+
+        stale = s._cleanup_stale_schedules(db)
+        plan.occupancy.close_before(self._now_slot())
+
+        delta = 0
+        freed = False
+        to_place: Set[int] = set()
+        requeue: Set[int] = set()
+        relock: Set[int] = set()
+
+        # ---- Printers ----
+        active = {pid for (pid,) in db.query(Printer.id).filter(Printer.is_active.is_(True))}
+        removed = set(plan.printer_states) - active
+        for printer_id in removed:
+            plan.printer_states.pop(printer_id)
+            plan.occupancy.busy.pop(printer_id, None)
+            for job_id in [j for j, b in plan.bookings.items() if b.printer_id == printer_id]:
+                del plan.bookings[job_id]
+            delta += 1
+        added = active - set(plan.printer_states)
+        if added:
+            for printer in db.query(Printer).filter(Printer.id.in_(added)):
+                plan.printer_states[printer.id] = PrinterState(printer)
+            delta += len(added)
+            freed = True
+
+        # ---- Jobs ----
+        rows = db.query(Job.id, Job.status, Job.printer_id, Job.scheduled_start, Job.hold).filter(
+            Job.status.in_(_ACTIVE)
+        ).all()
+        seen: Set[int] = set()
+        pending: Set[int] = set()
+        for job_id, status, printer_id, scheduled_start, hold in rows:
+            seen.add(job_id)
+            booking = plan.bookings.get(job_id)
+            if status == JobStatus.PENDING:
+                if booking is not None:  # bumped or swept back to the queue
+                    plan.release(job_id)
+                    freed = True
+                    delta += 1
+                if hold:
+                    plan.unplaced.discard(job_id)
+                    continue
+                pending.add(job_id)
+                if job_id not in plan.unplaced:
+                    to_place.add(job_id)
+                    delta += 1
+                continue
+
+            if printer_id in removed and status == JobStatus.SCHEDULED:
+                requeue.add(job_id)
+                to_place.add(job_id)
+                pending.add(job_id)
+                delta += 1
+                continue
+            if printer_id not in plan.printer_states or scheduled_start is None:
+                if plan.release(job_id) is not None:
+                    freed = True
+                    delta += 1
+                continue  # a full run ignores these too
+            if (booking is not None and booking.printer_id == printer_id
+                    and booking.job_slot == s._time_to_slot(scheduled_start, plan.start_date)):
+                booking.status = status
+                continue
+            if plan.release(job_id) is not None:
+                freed = True
+            relock.add(job_id)
+            delta += 1
+
+        # Booked jobs that left the active statuses
+        gone = [j for j, b in plan.bookings.items() if b.status in _BOOKED and j not in seen]
+        if gone:
+            completed = {j for (j,) in db.query(Job.id).filter(
+                Job.id.in_(gone), Job.status == JobStatus.COMPLETED
+            )}
+            for job_id in gone:
+                if job_id in completed:
+                    plan.bookings[job_id].status = JobStatus.COMPLETED  # keeps its slots
+                else:
+                    plan.release(job_id)
+                    freed = True
+                delta += 1
+        plan.unplaced &= pending
+
+        if relock:
+            for job in db.query(Job).filter(Job.id.in_(relock)):
+                s._lock_job(plan, job)
+
+        # ---- Place ----
+        if freed:
+            to_place |= plan.unplaced
+        if to_place:
+            jobs = db.query(Job).filter(Job.id.in_(to_place)).order_by(Job.priority, Job.created_at).all()
+            for job in jobs:
+                if job.id in requeue:
+                    job.status = JobStatus.PENDING
+                    job.printer_id = None
+                    job.scheduled_start = None
+                    job.scheduled_end = None
+                    job.match_score = None
+            s._place_jobs(db, plan, jobs, result)
+
+        db.commit()
+        s._log_run(db, result, total_jobs=len(to_place), mode="incremental", delta_size=delta,
+                   changed_count=result.scheduled_count + len(requeue & plan.unplaced) + stale,
+                   started=started)
+        return result
+
+
+_planner: Optional[IncrementalScheduler] = None
+_planner_lock = threading.Lock()
+
+
+def run_incremental(db: Session, config: Optional[SchedulerConfig] = None,
+                    full: bool = False) -> SchedulerResult:
+    """Run the process-wide incremental scheduler; a new config re-plans."""
+    global _planner
+    config = config or SchedulerConfig()
+    with _planner_lock:
+        if _planner is None or _planner.config != config:
+            _planner = IncrementalScheduler(config)
+        planner = _planner
+    return planner.run(db, full=full)
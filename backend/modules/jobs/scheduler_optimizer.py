@@ -0,0 +1,151 @@
+"""
+O.D.I.N. — Optimizing Scheduler Engine
+
+The greedy engine (Scheduler._place_jobs) takes the queue one job at a
+time in priority, created_at order and gives each job its best printer
+there and then. When similar-colour jobs are interleaved in the queue,
+each is placed before the next is looked at, so printers flip colours
+back and forth and the plan fills with setup blocks.
+
+OptimizingScheduler looks ahead. It takes the queue in windows of
+`lookahead_jobs` and, inside a window, repeatedly commits the one
+(job, printer) pair with the lowest cost across the whole window:
+
+    cost = finish slot
+         + SETUP_COST_SLOTS               if the printer needs a colour change
+         + PRIORITY_COST_SLOTS * priority
+
+A printer that has just taken a red job pulls the window's other red
+jobs onto itself before anything forces a colour change, and the finish
+term spreads the load (makespan). Windows follow queue order, so a job
+never waits behind a later window.
+
+Colour scores for every window job x printer are one matrix product of
+job and printer colour-indicator matrices; after each commit only the
+chosen printer's column is recomputed. First-fit starts are kept in a
+printer x slots-needed table and only the chosen printer's row is
+refreshed.
+
+Window by window until `time_budget_ms` is spent; the rest of the queue
+is then placed by the greedy engine, so a run costs at most the budget
+plus one greedy pass.
+
+Selected with SchedulerConfig.engine = "optimize" (ODIN_SCHEDULER_ENGINE,
+or "engine" in the POST /scheduler/run body). It fills the same
+SchedulerResult and SchedulePlan, so incremental runs work with either
+engine.
+"""
+
+import time
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from modules.jobs.models import Job
+from modules.jobs.scheduler import SchedulePlan, Scheduler, SchedulerResult
+
+SETUP_COST_SLOTS = 64     # a colour change costs as much as finishing 16h later
+PRIORITY_COST_SLOTS = 8   # each priority level is worth 2h of finish time
+
+
+class OptimizingScheduler(Scheduler):
+    """Lookahead engine: min-cost (job, printer) commits over queue windows."""
+
+    def _place_jobs(self, db: Session, plan: SchedulePlan, jobs: List[Job], result: SchedulerResult):
+        requirements = self._model_requirements(db, jobs)
+        deadline = time.perf_counter() + self.config.time_budget_ms / 1000
+        window = max(1, self.config.lookahead_jobs)
+        placed = 0
+        while placed < len(jobs) and time.perf_counter() < deadline:
+            self._place_window(plan, jobs[placed:placed + window], requirements, result)
+            placed += window
+        if placed < len(jobs):
+            super()._place_jobs(db, plan, jobs[placed:], result)
+
+    def _place_window(self, plan: SchedulePlan, jobs: List[Job], requirements: Dict[int, str],
+                      result: SchedulerResult):
+        printer_ids = list(plan.printer_states)
+        states = [plan.printer_states[p] for p in printer_ids]
+        setup_slots = self.config.setup_duration_slots
+
+        # Colour indicators: R[j, c] = job j needs colour c, L[p, c] = printer p has it loaded.
+        required = [{c.lower() for c in (job.colors_list or [])} for job in jobs]
+        vocab: Dict[str, int] = {}
+        for colors in required + [set(st.colors) for st in states]:
+            for c in colors:
+                vocab.setdefault(c, len(vocab))
+        R = np.zeros((len(jobs), len(vocab)), dtype=np.int32)
+        for j, colors in enumerate(required):
+            R[j, [vocab[c] for c in colors]] = 1
+        L = np.zeros((len(states), len(vocab)), dtype=np.int32)
+        for p, st in enumerate(states):
+            L[p, [vocab[c] for c in st.colors]] = 1
+        req_count = R.sum(axis=1)[:, None]
+        matched = R @ L.T
+
+        eligible = np.array([[self._is_eligible(
+            st, requirements.get(job.model_id), job.required_tags or [],
+            getattr(job, 'target_type', 'specific') or 'specific', getattr(job, 'target_filter', None),
+        ) for st in states] for job in jobs], dtype=bool).reshape(len(jobs), len(states))
+        priority = np.array([3 if job.priority is None else job.priority for job in jobs], dtype=float)[:, None]
+        duration = np.array([max(1, int(job.effective_duration * (60 / self.slot_minutes)))
+                             for job in jobs])
+
+        # First-fit start per printer and slots needed (job alone, or with setup).
+        needs = sorted(set(duration) | set(duration + setup_slots))
+        k_of = {n: k for k, n in enumerate(needs)}
+        k_plain = np.array([k_of[d] for d in duration])
+        k_setup = np.array([k_of[d + setup_slots] for d in duration])
+        starts = np.full((len(states), len(needs)), np.inf)
+
+        def refresh(p: int):
+            for k, n in enumerate(needs):
+                slot = self._find_first_available_slot(printer_ids[p], int(n), plan.occupancy)
+                starts[p, k] = np.inf if slot is None else slot
+
+        for p in range(len(states)):
+            refresh(p)
+
+        open_jobs = np.ones(len(jobs), dtype=bool)
+        while open_jobs.any():
+            setup = (req_count > 0) & (matched < req_count)
+            need = duration[:, None] + setup * setup_slots
+            start = np.where(setup, starts[:, k_setup].T, starts[:, k_plain].T)
+            cost = start + need + SETUP_COST_SLOTS * setup + PRIORITY_COST_SLOTS * priority
+            cost[~eligible] = np.inf
+            cost[~open_jobs] = np.inf
+            j, p = np.unravel_index(np.argmin(cost), cost.shape)
+            if not np.isfinite(cost[j, p]):
+                break
+
+            job, needs_setup = jobs[j], bool(setup[j, p])
+            start_slot = int(start[j, p])
+            job_start_slot = start_slot + (setup_slots if needs_setup else 0)
+            end_slot = job_start_slot + int(duration[j])
+            if req_count[j, 0]:
+                color_score = int(matched[j, p] * 100 // req_count[j, 0])
+            else:
+                color_score = 50
+            self._commit_fit(plan, job, {
+                "printer_id": printer_ids[p],
+                "printer_name": states[p].name,
+                "start_slot": start_slot,
+                "job_start_slot": job_start_slot,
+                "end_slot": end_slot,
+                "start_time": self._slot_to_time(job_start_slot, plan.start_date),
+                "end_time": self._slot_to_time(end_slot, plan.start_date),
+                "requires_setup": needs_setup,
+                "match_score": color_score,
+                "score": -float(cost[j, p]),
+            }, result)
+            open_jobs[j] = False
+
+            # The printer now holds this job's colours and these slots.
+            L[p] = 0
+            L[p, [vocab[c] for c in states[p].colors]] = 1
+            matched[:, p] = R @ L[p]
+            refresh(p)
+
+        for j in np.flatnonzero(open_jobs):
+            self._record_skip(plan, jobs[j], requirements.get(jobs[j].model_id), result)
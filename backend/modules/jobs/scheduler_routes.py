@@ -23,6 +23,7 @@ from modules.jobs.schemas import (
 )
 from modules.printers.schemas import PrinterSummary
 from modules.jobs.scheduler import Scheduler, SchedulerConfig, run_scheduler
+from modules.jobs import scheduler_incremental
 
 log = logging.getLogger("odin.api")
 
@@ -36,19 +37,28 @@ router = APIRouter()
 @router.post("/scheduler/run", response_model=ScheduleResult, tags=["Scheduler"])
 def run_scheduler_endpoint(
     config: Optional[SchedulerConfigSchema] = None,
+    mode: str = Query(default="incremental", pattern="^(incremental|full)$"),
     current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)
 ):
-    """Run the scheduler to assign pending jobs to printers."""
+    """Run the scheduler to assign pending jobs to printers.
+
+    By default only the changes since the last run are applied to the kept
+    plan; mode=full re-plans from scratch (see scheduler_incremental).
+    """
     scheduler_config = None
     if config:
         scheduler_config = SchedulerConfig.from_time_strings(
             blackout_start=config.blackout_start,
             blackout_end=config.blackout_end,
             setup_duration_slots=config.setup_duration_slots,
-            horizon_days=config.horizon_days
+            horizon_days=config.horizon_days,
+            **({"engine": config.engine} if config.engine else {})
         )
 
-    result = run_scheduler(db, scheduler_config)
+    if scheduler_incremental.INCREMENTAL:
+        result = scheduler_incremental.run_incremental(db, scheduler_config, full=(mode == "full"))
+    else:
+        result = run_scheduler(db, scheduler_config)
 
     # Get the run ID from the most recent log
     run_log = db.query(SchedulerRun).order_by(SchedulerRun.id.desc()).first()
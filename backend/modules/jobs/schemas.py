@@ -3,7 +3,7 @@ modules/jobs/schemas.py — Pydantic schemas for the jobs domain.
 """
 
 from datetime import datetime
-from typing import Optional, List, Union, Any
+from typing import Optional, List, Literal, Union, Any
 from pydantic import BaseModel, Field, ConfigDict, field_validator
 
 from core.base import JobStatus, FilamentType
@@ -178,6 +178,7 @@ class SchedulerConfig(BaseModel):
     blackout_end: str = "05:30"
     setup_duration_slots: int = 1  # 30-min slots for color change
     horizon_days: int = 7  # How far ahead to schedule
+    engine: Optional[Literal["greedy", "optimize"]] = None  # None = ODIN_SCHEDULER_ENGINE
 
 
 class SchedulerRunResponse(BaseModel):
@@ -192,6 +193,10 @@ class SchedulerRunResponse(BaseModel):
     avg_match_score: Optional[float] = None
     avg_job_duration: Optional[float] = None
     notes: Optional[str] = None
+    mode: Optional[str] = None
+    delta_size: Optional[int] = None
+    changed_count: Optional[int] = None
+    duration_ms: Optional[float] = None
 
 
 class ScheduleResult(BaseModel):
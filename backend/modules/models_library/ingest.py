@@ -0,0 +1,179 @@
+"""Print file ingestion — streamed uploads, background mesh extraction.
+
+An upload used to be read whole into memory (up to 100 MB), hashed,
+written to a temp file, opened as a zip three times (zip-bomb check,
+metadata, mesh), copied to /data/print_files and opened a fourth time
+for the bed size — all before the request returned. Parsing the mesh
+XML dominated: upload latency grew with model complexity, not size.
+
+Now:
+
+  - `receive()` copies the upload to a temp file inside PRINT_FILES_DIR
+    CHUNK_BYTES at a time, hashing as it goes, and `store()` renames it
+    into place — no second copy.
+  - The request opens the zip once for the cheap metadata the response
+    and the model record need (slice_info, plate objects, bed size,
+    the plate thumbnail).
+  - The mesh is extracted by `queue`, a small thread pool, from the
+    stored file. `print_files.metadata_status` tracks it: pending →
+    processing → ready, or failed with `metadata_error` set.
+
+`resume()` re-queues files left pending or processing by a restart.
+"""
+
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import BinaryIO, Optional, Tuple
+
+from sqlalchemy import text
+
+log = logging.getLogger("odin.ingest")
+
+PRINT_FILES_DIR = "/data/print_files"
+MAX_UPLOAD_BYTES = 100 * 1024 * 1024
+MAX_UNCOMPRESSED = 500 * 1024 * 1024
+CHUNK_BYTES = 1024 * 1024
+
+PENDING = "pending"
+PROCESSING = "processing"
+READY = "ready"
+FAILED = "failed"
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+def receive(src: BinaryIO, suffix: str, directory: Optional[str] = None,
+            max_bytes: Optional[int] = None) -> Tuple[str, str]:
+    """Copy an upload to a temp file next to the stored files.
+
+    Returns (temp path, sha256 hex digest). Raises UploadTooLarge, and
+    leaves nothing behind, once more than max_bytes (default
+    MAX_UPLOAD_BYTES) have been read.
+    """
+    directory = directory or PRINT_FILES_DIR
+    max_bytes = max_bytes or MAX_UPLOAD_BYTES
+    os.makedirs(directory, exist_ok=True)
+    digest = hashlib.sha256()
+    size = 0
+    fd, path = tempfile.mkstemp(prefix=".upload-", suffix=suffix, dir=directory)
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = src.read(CHUNK_BYTES)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(size)
+                digest.update(chunk)
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, digest.hexdigest()
+
+
+def store(tmp_path: str, file_id: int, safe_name: str, directory: Optional[str] = None) -> str:
+    """Move a received upload to its permanent name."""
+    stored_path = os.path.join(directory or PRINT_FILES_DIR, f"{file_id}_{safe_name}")
+    os.replace(tmp_path, stored_path)
+    return stored_path
+
+
+def check_zip(zf: zipfile.ZipFile) -> bool:
+    """False if the archive would decompress to more than MAX_UNCOMPRESSED."""
+    return sum(e.file_size for e in zf.infolist()) <= MAX_UNCOMPRESSED
+
+
+def extract(path: str) -> dict:
+    """The heavy part of a .3mf: the mesh (binary, see mesh.py)."""
+    from modules.models_library import mesh
+
+    with zipfile.ZipFile(path, "r") as zf:
+        mesh_bin = mesh.extract(zf)
+    return {"mesh_bin": mesh_bin, "mesh_etag": mesh.etag(mesh_bin) if mesh_bin else None}
+
+
+def _workers() -> int:
+    return max(1, int(os.environ.get("ODIN_INGEST_WORKERS", "1")))
+
+
+class IngestQueue:
+    def __init__(self, engine=None, workers: Optional[int] = None):
+        self._engine = engine
+        self._workers = workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_engine(self):
+        if self._engine is None:
+            from core.db import engine
+            self._engine = engine
+        return self._engine
+
+    def submit(self, file_id: int):
+        """Queue a pending print file for extraction. Returns the future."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self._workers or _workers(),
+                                                    thread_name_prefix="ingest")
+        return self._executor.submit(self.process, file_id)
+
+    def process(self, file_id: int) -> Optional[str]:
+        """Extract one file; returns the status it ended in (None if not claimed)."""
+        engine = self._get_engine()
+        with engine.begin() as conn:
+            claimed = conn.execute(text(
+                "UPDATE print_files SET metadata_status = :processing "
+                "WHERE id = :id AND metadata_status = :pending"
+            ), {"id": file_id, "processing": PROCESSING, "pending": PENDING}).rowcount
+            row = conn.execute(text("SELECT stored_path FROM print_files WHERE id = :id"),
+                               {"id": file_id}).fetchone()
+        if not claimed or row is None:
+            return None
+
+        try:
+            result = extract(row[0])
+        except Exception as e:
+            log.warning(f"Print file {file_id}: extraction failed: {e}")
+            with engine.begin() as conn:
+                conn.execute(text(
+                    "UPDATE print_files SET metadata_status = :failed, metadata_error = :err WHERE id = :id"
+                ), {"id": file_id, "failed": FAILED, "err": str(e)[:500]})
+            return FAILED
+
+        with engine.begin() as conn:
+            conn.execute(text(
+                "UPDATE print_files SET mesh_bin = :mesh, mesh_etag = :etag, mesh_data = NULL, "
+                "metadata_status = :ready, metadata_error = NULL WHERE id = :id"
+            ), {"id": file_id, "mesh": result["mesh_bin"], "etag": result["mesh_etag"], "ready": READY})
+        return READY
+
+    def resume(self) -> int:
+        """Re-queue files a previous process left pending or processing."""
+        with self._get_engine().begin() as conn:
+            conn.execute(text("UPDATE print_files SET metadata_status = :pending WHERE metadata_status = :processing"),
+                         {"pending": PENDING, "processing": PROCESSING})
+            ids = [r[0] for r in conn.execute(text("SELECT id FROM print_files WHERE metadata_status = :pending"),
+                                              {"pending": PENDING})]
+        for file_id in ids:
+            self.submit(file_id)
+        if ids:
+            log.info(f"Re-queued {len(ids)} print file(s) for metadata extraction")
+        return len(ids)
+
+    def shutdown(self, wait: bool = True) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+queue = IngestQueue()
@@ -0,0 +1,216 @@
+"""3D viewer meshes — streamed 3MF extraction, decimation, binary encoding.
+
+The viewer mesh used to be built by loading the whole .model XML into a
+DOM, walking every <vertex>/<triangle> into Python lists, keeping every
+Nth triangle of large models and storing the rounded numbers as JSON
+text (`print_files.mesh_data`). Seconds and hundreds of MB per large
+model, and a multi-MB JSON document per view.
+
+Now:
+
+  - `read_model()` streams the XML through expat straight into flat
+    arrays turned into NumPy arrays; no element tree is built.
+  - `cluster()` decimates models over MAX_TRIANGLES by vertex
+    clustering: vertices are snapped to a grid, each cell becomes one
+    vertex (their mean), collapsed and duplicate triangles are dropped.
+    The grid is coarsened until the mesh fits. It keeps the shape, not
+    every Nth triangle.
+  - `encode()` packs the result into a small binary buffer stored in
+    `print_files.mesh_bin` and served as application/octet-stream.
+
+Buffer layout (little-endian):
+
+    0   4s   magic b"OMSH"
+    4   u8   format version (1)
+    5   u8   flags: 1 = positions quantized to uint16, 2 = uint16 indices
+    6   u16  reserved
+    8   u32  vertex count
+    12  u32  triangle count
+    16  3f4  origin
+    28  3f4  scale       position = origin + stored value * scale
+    40       positions   vertex count * 3, uint16 or float32
+             padding to a multiple of 4 bytes
+             indices     triangle count * 3, uint16 or uint32
+
+Quantized positions are exact to 1/65535 of the bounding box (4 µm on a
+256 mm bed).
+"""
+
+import hashlib
+import json
+import struct
+from array import array
+from typing import IO, Optional, Tuple
+from xml.parsers import expat
+
+import numpy as np
+
+from defusedxml import DTDForbidden
+
+MAX_TRIANGLES = 50000
+FORMAT_VERSION = 1
+MEDIA_TYPE = "application/octet-stream"
+
+_HEADER = struct.Struct("<4sBBHII3f3f")
+_MAGIC = b"OMSH"
+_QUANTIZED = 1
+_SHORT_INDICES = 2
+
+
+def find_model(names) -> Optional[str]:
+    """The archive member holding the mesh: a .model under 3D/, else any .model."""
+    for name in names:
+        if name.lower().endswith('.model') and '3d/' in name.lower():
+            return name
+    for name in names:
+        if name.lower().endswith('.model'):
+            return name
+    return None
+
+
+def _forbid_dtd(name, sysid, pubid, has_internal_subset):
+    raise DTDForbidden(name, sysid, pubid)
+
+
+def read_model(f: IO[bytes]) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (float64, n x 3) and triangles (int64, m x 3) of every <mesh>.
+
+    Triangle indices are made global across meshes; triangles pointing
+    outside their own mesh are dropped.
+    """
+    vertices = array('d')
+    triangles = array('q')
+    meshes = []  # (first triangle, first vertex) per <mesh>
+    add_vertex, add_triangle = vertices.extend, triangles.extend
+    base = 0
+
+    def start(name, attrs):
+        nonlocal base
+        tag = name.rpartition('}')[2]
+        if tag == 'vertex':
+            get = attrs.get
+            add_vertex((float(get('x', 0)), float(get('y', 0)), float(get('z', 0))))
+        elif tag == 'triangle':
+            get = attrs.get
+            add_triangle((int(get('v1', 0)) + base, int(get('v2', 0)) + base, int(get('v3', 0)) + base))
+        elif tag == 'mesh':
+            base = len(vertices) // 3
+            meshes.append((len(triangles) // 3, base))
+
+    # Plain expat: no element objects at all, just the attributes of the
+    # elements we want. 3MF models have no DTD; refusing one rules out
+    # entity expansion (what defusedxml guards against).
+    parser = expat.ParserCreate(namespace_separator='}')
+    parser.StartDoctypeDeclHandler = _forbid_dtd
+    parser.StartElementHandler = start
+    parser.ParseFile(f)
+
+    v = np.frombuffer(vertices, dtype=np.float64).reshape(-1, 3)
+    t = np.frombuffer(triangles, dtype=np.int64).reshape(-1, 3)
+    if len(t) and meshes:
+        first, lo = np.array(meshes, dtype=np.int64).T
+        hi = np.append(lo[1:], len(v))  # a mesh's vertices end where the next one's start
+        counts = np.diff(np.append(first, len(t)))
+        lo, hi = np.repeat(lo, counts)[:, None], np.repeat(hi, counts)[:, None]
+        t = t[((t >= lo) & (t < hi)).all(axis=1)]
+    return v, t
+
+
+def compact(vertices: np.ndarray, triangles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Drop vertices no triangle uses, renumbering the triangles."""
+    used, inverse = np.unique(triangles, return_inverse=True)
+    return vertices[used], inverse.reshape(-1, 3)
+
+
+def _weld(vertices: np.ndarray, triangles: np.ndarray, cell: np.ndarray):
+    """Merge the vertices of each grid cell; drop collapsed and repeated triangles."""
+    _, inverse, counts = np.unique(cell, return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    merged = np.stack([np.bincount(inverse, weights=vertices[:, i]) for i in range(3)], axis=1)
+    merged /= counts[:, None]
+    t = inverse[triangles]
+    t = t[(t[:, 0] != t[:, 1]) & (t[:, 1] != t[:, 2]) & (t[:, 0] != t[:, 2])]
+    _, first = np.unique(np.sort(t, axis=1), axis=0, return_index=True)
+    return merged, t[np.sort(first)]
+
+
+def cluster(vertices: np.ndarray, triangles: np.ndarray,
+            max_triangles: int = MAX_TRIANGLES) -> Tuple[np.ndarray, np.ndarray]:
+    """Decimate to at most max_triangles triangles by vertex clustering."""
+    if len(triangles) <= max_triangles:
+        return vertices, triangles
+    lo = vertices.min(axis=0)
+    size = float(np.ptp(vertices, axis=0).max()) or 1.0
+    cells = int(np.sqrt(max_triangles))  # grid cells along the longest side
+    while True:
+        grid = np.minimum(((vertices - lo) * (cells / size)).astype(np.int64), cells)
+        cell = (grid[:, 0] * (cells + 1) + grid[:, 1]) * (cells + 1) + grid[:, 2]
+        v, t = _weld(vertices, triangles, cell)
+        if len(t) <= max_triangles or cells <= 2:
+            return compact(v, t)
+        # Triangle count scales with the square of the grid resolution.
+        cells = max(2, min(cells - 1, int(cells * 0.95 * np.sqrt(max_triangles / len(t)))))
+
+
+def encode(vertices: np.ndarray, triangles: np.ndarray, quantize: bool = True) -> bytes:
+    """Pack a mesh into the binary layout described above."""
+    flags = 0
+    if quantize and len(vertices):
+        origin = vertices.min(axis=0)
+        scale = np.ptp(vertices, axis=0) / 65535.0
+        scale[scale == 0] = 1.0
+        positions = np.rint((vertices - origin) / scale).astype('<u2')
+        flags |= _QUANTIZED
+    else:
+        origin, scale = np.zeros(3), np.ones(3)
+        positions = vertices.astype('<f4')
+    if len(vertices) <= 0xFFFF:
+        indices = triangles.astype('<u2')
+        flags |= _SHORT_INDICES
+    else:
+        indices = triangles.astype('<u4')
+    body = positions.tobytes()
+    body += b"\0" * (-len(body) % 4)
+    return _HEADER.pack(_MAGIC, FORMAT_VERSION, flags, 0, len(vertices), len(triangles),
+                        *origin.tolist(), *scale.tolist()) + body + indices.tobytes()
+
+
+def decode(buf: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """Vertices (float32, n x 3) and triangles (n x 3) of an encode() buffer."""
+    magic, version, flags, _, nv, nt, *rest = _HEADER.unpack_from(buf)
+    if magic != _MAGIC or version != FORMAT_VERSION:
+        raise ValueError("not a mesh buffer")
+    origin, scale = np.array(rest[:3], dtype=np.float32), np.array(rest[3:], dtype=np.float32)
+    offset = _HEADER.size
+    dtype = '<u2' if flags & _QUANTIZED else '<f4'
+    positions = np.frombuffer(buf, dtype=dtype, count=nv * 3, offset=offset).reshape(-1, 3)
+    offset += positions.nbytes + (-positions.nbytes % 4)
+    triangles = np.frombuffer(buf, dtype='<u2' if flags & _SHORT_INDICES else '<u4', count=nt * 3, offset=offset)
+    return origin + positions.astype(np.float32) * scale, triangles.reshape(-1, 3)
+
+
+def extract(zf, max_triangles: int = MAX_TRIANGLES) -> Optional[bytes]:
+    """The encoded viewer mesh of an open .3mf, or None if it has none."""
+    name = find_model(zf.namelist())
+    if name is None:
+        return None
+    with zf.open(name) as f:
+        vertices, triangles = read_model(f)
+    if not len(triangles):
+        return None
+    vertices, triangles = compact(vertices, triangles)
+    return encode(*cluster(vertices, triangles, max_triangles))
+
+
+def from_json(mesh_json: str) -> Optional[bytes]:
+    """Re-encode a mesh stored as JSON by earlier versions."""
+    data = json.loads(mesh_json)
+    vertices = np.asarray(data.get("vertices") or [], dtype=np.float64).reshape(-1, 3)
+    triangles = np.asarray(data.get("triangles") or [], dtype=np.int64).reshape(-1, 3)
+    if not len(triangles):
+        return None
+    return encode(vertices, triangles)
+
+
+def etag(buf: bytes) -> str:
+    return hashlib.sha256(buf).hexdigest()[:32]
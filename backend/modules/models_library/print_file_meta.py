@@ -4,13 +4,15 @@ Parses uploaded print files to extract bed dimensions and compatible printer
 API types. No DB imports — pure file parsing only.
 
 Public API:
-    extract_print_file_meta(file_path, extension) -> dict
+    extract_print_file_meta(file_path, extension, zf=None) -> dict
         Returns {bed_x_mm, bed_y_mm, compatible_api_types}
+        Pass zf to read a .3mf the caller already has open.
         All values are nullable — extraction failures return None, not exceptions.
 """
 
 import zipfile
 import logging
+from typing import Optional
 
 log = logging.getLogger("odin.print_file_meta")
 
@@ -102,8 +104,8 @@ def _extract_gcode_meta(file_path: str):
     return (x, y)
 
 
-def _extract_3mf_meta(file_path: str):
-    """Extract bed dimensions from a .3mf (zip) file.
+def _extract_3mf_meta(file_path: str, zf: Optional[zipfile.ZipFile] = None):
+    """Extract bed dimensions from a .3mf (zip) file, or from zf if open.
 
     Tries:
     1. Metadata/slice_info.config — Bambu-specific: has machine_model string.
@@ -112,61 +114,72 @@ def _extract_3mf_meta(file_path: str):
 
     Returns (x, y) tuple of floats or (None, None).
     """
+    if zf is not None:
+        return _read_3mf_meta(zf, file_path)
+    try:
+        with zipfile.ZipFile(file_path, "r") as zf:
+            return _read_3mf_meta(zf, file_path)
+    except Exception as e:
+        log.debug(f"[print_file_meta] 3mf open error for {file_path}: {e}")
+    return (None, None)
+
+
+def _read_3mf_meta(zf: zipfile.ZipFile, file_path: str):
+    """_extract_3mf_meta() on an open archive."""
     x = None
     y = None
     try:
-        with zipfile.ZipFile(file_path, "r") as zf:
-            names_lower = {n.lower(): n for n in zf.namelist()}
-
-            # --- Attempt 1: Bambu slice_info.config ---
-            slice_key = names_lower.get("metadata/slice_info.config")
-            if slice_key:
-                try:
-                    content = zf.read(slice_key).decode("utf-8", errors="replace")
-                    # Look for machine_model or printer_model attribute
-                    import re
-                    match = re.search(
-                        r'(?:machine_model|printer_model)\s*=\s*"?([^"\n]+)"?',
-                        content,
-                        re.IGNORECASE,
-                    )
-                    if match:
-                        model_str = match.group(1).strip().lower()
-                        result = _lookup_known_bed(model_str)
-                        if result != (None, None):
-                            return result
-                except Exception as e:
-                    log.debug(f"[print_file_meta] slice_info parse error: {e}")
-
-            # --- Attempt 2: PrusaSlicer model_settings.config bed_shape ---
-            settings_key = names_lower.get("metadata/model_settings.config")
-            if settings_key:
-                try:
-                    content = zf.read(settings_key).decode("utf-8", errors="replace")
-                    import re
-                    # bed_shape = 0x0,220x0,220x220,0x220
-                    match = re.search(r"bed_shape\s*=\s*([^\n]+)", content)
-                    if match:
-                        coords_str = match.group(1).strip()
-                        coords = []
-                        for pair in coords_str.split(","):
-                            pair = pair.strip()
-                            if "x" in pair:
-                                parts = pair.split("x")
-                                try:
-                                    coords.append((float(parts[0]), float(parts[1])))
-                                except ValueError:
-                                    pass
-                        if coords:
-                            max_x = max(c[0] for c in coords)
-                            max_y = max(c[1] for c in coords)
-                            if max_x > 0 and max_y > 0:
-                                x, y = max_x, max_y
-                except Exception as e:
-                    log.debug(f"[print_file_meta] model_settings parse error: {e}")
+        names_lower = {n.lower(): n for n in zf.namelist()}
+
+        # --- Attempt 1: Bambu slice_info.config ---
+        slice_key = names_lower.get("metadata/slice_info.config")
+        if slice_key:
+            try:
+                content = zf.read(slice_key).decode("utf-8", errors="replace")
+                # Look for machine_model or printer_model attribute
+                import re
+                match = re.search(
+                    r'(?:machine_model|printer_model)\s*=\s*"?([^"\n]+)"?',
+                    content,
+                    re.IGNORECASE,
+                )
+                if match:
+                    model_str = match.group(1).strip().lower()
+                    result = _lookup_known_bed(model_str)
+                    if result != (None, None):
+                        return result
+            except Exception as e:
+                log.debug(f"[print_file_meta] slice_info parse error: {e}")
+
+        # --- Attempt 2: PrusaSlicer model_settings.config bed_shape ---
+        settings_key = names_lower.get("metadata/model_settings.config")
+        if settings_key:
+            try:
+                content = zf.read(settings_key).decode("utf-8", errors="replace")
+                import re
+                # bed_shape = 0x0,220x0,220x220,0x220
+                match = re.search(r"bed_shape\s*=\s*([^\n]+)", content)
+                if match:
+                    coords_str = match.group(1).strip()
+                    coords = []
+                    for pair in coords_str.split(","):
+                        pair = pair.strip()
+                        if "x" in pair:
+                            parts = pair.split("x")
+                            try:
+                                coords.append((float(parts[0]), float(parts[1])))
+                            except ValueError:
+                                pass
+                    if coords:
+                        max_x = max(c[0] for c in coords)
+                        max_y = max(c[1] for c in coords)
+                        if max_x > 0 and max_y > 0:
+                            x, y = max_x, max_y
+            except Exception as e:
+                log.debug(f"[print_file_meta] model_settings parse error: {e}")
 
     except Exception as e:
-        log.debug(f"[print_file_meta] 3mf open error for {file_path}: {e}")
+        log.debug(f"[print_file_meta] 3mf read error for {file_path}: {e}")
 
     return (x, y)
 
@@ -198,12 +211,13 @@ def _resolve_api_types(extension: str) -> str:
     return ""
 
 
-def extract_print_file_meta(file_path: str, extension: str) -> dict:
+def extract_print_file_meta(file_path: str, extension: str, zf: Optional[zipfile.ZipFile] = None) -> dict:
     """Extract bed dimensions and compatible API types from a print file.
 
     Args:
         file_path: Absolute path to the file on disk.
         extension: File extension including leading dot (e.g. ".3mf", ".gcode").
+        zf: The .3mf already opened by the caller, if any.
 
     Returns:
         dict with keys:
@@ -219,7 +233,7 @@ def extract_print_file_meta(file_path: str, extension: str) -> dict:
 
     try:
         if ext == "3mf":
-            bed_x, bed_y = _extract_3mf_meta(file_path)
+            bed_x, bed_y = _extract_3mf_meta(file_path, zf)
         elif ext == "gcode":
             bed_x, bed_y = _extract_gcode_meta(file_path)
         elif ext == "bgcode":
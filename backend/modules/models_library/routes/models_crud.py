@@ -288,7 +288,7 @@ def schedule_from_model(
 # ──────────────────────────────────────────────
 
 @router.get("/{model_id}/revisions")
-async def list_model_revisions(model_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def list_model_revisions(model_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """List all revisions for a model."""
     model = db.query(Model).filter(Model.id == model_id).first()
     if not model:
@@ -309,7 +309,7 @@ async def list_model_revisions(model_id: int, current_user: dict = Depends(requi
 
 
 @router.post("/{model_id}/revisions")
-async def create_model_revision(
+def create_model_revision(
     model_id: int, changelog: str = "", file: UploadFile = File(None),
     current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)
 ):
@@ -333,7 +333,7 @@ async def create_model_revision(
         safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', file.filename or "file")
         file_path = f"{rev_dir}/v{next_rev}_{safe_name}"
         with open(file_path, "wb") as f:
-            content = await file.read(_MAX_REVISION_BYTES + 1)
+            content = file.file.read(_MAX_REVISION_BYTES + 1)
             if len(content) > _MAX_REVISION_BYTES:
                 raise HTTPException(status_code=413, detail="File exceeds 100 MB limit")
             f.write(content)
@@ -349,7 +349,7 @@ async def create_model_revision(
 
 
 @router.post("/{model_id}/revisions/{rev_number}/revert")
-async def revert_model_revision(
+def revert_model_revision(
     model_id: int, rev_number: int,
     current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)
 ):
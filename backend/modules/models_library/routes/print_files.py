@@ -1,6 +1,7 @@
 """O.D.I.N. — Print File Upload and Management."""
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File
+from fastapi.responses import JSONResponse, Response
 from core.rate_limit import limiter
 from sqlalchemy.orm import Session
 from sqlalchemy import text
@@ -9,7 +10,7 @@ import json
 import logging
 import os
 import re
-import tempfile
+import zipfile
 
 from core.db import get_db
 from core.rbac import require_role
@@ -37,12 +38,18 @@ def _normalize_model_name(name: str) -> str:
 
 @router.post("/print-files/upload")
 @limiter.limit("30/minute")
-async def upload_3mf(
+def upload_3mf(
     request: Request,
     file: UploadFile = File(...),
     current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)
 ):
-    """Upload and parse a print file (.3mf, .gcode, or .bgcode)."""
+    """Upload and parse a print file (.3mf, .gcode, or .bgcode).
+
+    The file is streamed to disk and hashed as it arrives; the mesh of a
+    .3mf is extracted in the background (see ingest.py) and
+    `metadata_status` says when it is ready.
+    """
+    from modules.models_library import ingest
     from modules.models_library import print_file_meta as pfm
 
     fname = file.filename or ""
@@ -52,16 +59,12 @@ async def upload_3mf(
     if ext not in ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail="Only .3mf, .gcode, and .bgcode files are supported")
 
-    # Enforce upload size limit (100 MB)
-    MAX_UPLOAD_BYTES = 100 * 1024 * 1024
-    content = await file.read(MAX_UPLOAD_BYTES + 1)
-    if len(content) > MAX_UPLOAD_BYTES:
+    # Stream to disk with incremental hash, enforcing the upload size limit (100 MB)
+    try:
+        tmp_path, file_hash = ingest.receive(file.file, ext)
+    except ingest.UploadTooLarge:
         raise HTTPException(status_code=413, detail="File too large. Maximum upload size is 100 MB.")
 
-    # Compute file hash for duplicate detection
-    import hashlib
-    file_hash = hashlib.sha256(content).hexdigest()
-
     # Check for existing file with same hash
     existing = db.execute(
         text("SELECT id, filename FROM print_files WHERE file_hash = :h LIMIT 1"),
@@ -71,52 +74,44 @@ async def upload_3mf(
     if existing:
         duplicate_info = {"duplicate": True, "existing_file_id": existing[0], "existing_file_name": existing[1]}
 
-    # Save to temp file
-    with tempfile.NamedTemporaryFile(delete=False, suffix=ext) as tmp:
-        tmp.write(content)
-        tmp_path = tmp.name
+    safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', fname)
+    stored_path = None
 
     try:
         if ext == ".3mf":
-            # --- .3mf path: full metadata parse ---
-            from modules.models_library.threemf_parser import parse_3mf, extract_objects_from_plate, extract_mesh_from_3mf
+            # --- .3mf path: metadata and thumbnail, one zip open; mesh in the background ---
+            from modules.models_library.threemf_parser import parse_3mf_zip, extract_objects_from_plate
 
-            # Zip bomb check: reject files where uncompressed size exceeds 500 MB
-            import zipfile as _zf
-            MAX_UNCOMPRESSED = 500 * 1024 * 1024
             try:
-                with _zf.ZipFile(tmp_path, 'r') as _z:
-                    total_size = sum(e.file_size for e in _z.infolist())
-                    if total_size > MAX_UNCOMPRESSED:
+                with zipfile.ZipFile(tmp_path, 'r') as zf:
+                    # Zip bomb check: reject files where uncompressed size exceeds 500 MB
+                    if not ingest.check_zip(zf):
                         raise HTTPException(status_code=400, detail="File rejected: decompressed size exceeds 500 MB limit.")
-            except _zf.BadZipFile:
-                raise HTTPException(status_code=400, detail="Invalid .3mf file (bad zip structure).")
 
-            metadata = parse_3mf(tmp_path)
-            if not metadata:
-                raise HTTPException(status_code=400, detail="Failed to parse .3mf file")
+                    metadata = parse_3mf_zip(zf, fname)
+                    if not metadata:
+                        raise HTTPException(status_code=400, detail="Failed to parse .3mf file")
 
-            # Extract objects for quantity counting
-            import zipfile
-            with zipfile.ZipFile(tmp_path, 'r') as zf:
-                plate_objects = extract_objects_from_plate(zf)
+                    # Extract objects for quantity counting
+                    plate_objects = extract_objects_from_plate(zf)
 
-            # Extract 3D mesh for viewer
-            mesh_data = extract_mesh_from_3mf(tmp_path)
-            mesh_json = json.dumps(mesh_data) if mesh_data else None
+                    # Extract bed/compatibility metadata
+                    meta = pfm.extract_print_file_meta(tmp_path, ext, zf=zf)
+            except zipfile.BadZipFile:
+                raise HTTPException(status_code=400, detail="Invalid .3mf file (bad zip structure).")
 
             # Store in database
             result = db.execute(text("""
                 INSERT INTO print_files (
-                    filename, project_name, print_time_seconds, total_weight_grams,
+                    filename, original_filename, project_name, print_time_seconds, total_weight_grams,
                     layer_count, layer_height, nozzle_diameter, printer_model,
-                    supports_used, bed_type, filaments_json, thumbnail_b64, mesh_data,
-                    file_hash
+                    supports_used, bed_type, filaments_json, thumbnail_b64, file_hash,
+                    bed_x_mm, bed_y_mm, compatible_api_types, metadata_status
                 ) VALUES (
-                    :filename, :project_name, :print_time_seconds, :total_weight_grams,
+                    :filename, :filename, :project_name, :print_time_seconds, :total_weight_grams,
                     :layer_count, :layer_height, :nozzle_diameter, :printer_model,
-                    :supports_used, :bed_type, :filaments_json, :thumbnail_b64, :mesh_json,
-                    :file_hash
+                    :supports_used, :bed_type, :filaments_json, :thumbnail_b64, :file_hash,
+                    :bed_x_mm, :bed_y_mm, :compatible_api_types, :metadata_status
                 )
             """), {
                 "filename": file.filename,
@@ -137,13 +132,19 @@ async def upload_3mf(
                     "used_grams": f.used_grams
                 } for f in metadata.filaments]),
                 "thumbnail_b64": metadata.thumbnail_b64,
-                "mesh_json": mesh_json,
                 "file_hash": file_hash,
+                "bed_x_mm": meta["bed_x_mm"],
+                "bed_y_mm": meta["bed_y_mm"],
+                "compatible_api_types": meta["compatible_api_types"],
+                "metadata_status": ingest.PENDING,
             })
-            db.commit()
-
             file_id = result.lastrowid
 
+            # Persist file to disk
+            stored_path = ingest.store(tmp_path, file_id, safe_name)
+            db.execute(text("UPDATE print_files SET stored_path = :p WHERE id = :id"),
+                       {"p": stored_path, "id": file_id})
+
             # Check for existing model with same name (multi-variant support)
             normalized_name = _normalize_model_name(metadata.project_name)
             existing_model = db.execute(text(
@@ -165,9 +166,6 @@ async def upload_3mf(
                 # Attach as variant to existing model
                 model_id = existing_model[0]
                 is_new_model = False
-                db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
-                           {"mid": model_id, "fid": file_id})
-                db.commit()
             else:
                 # Create new model
                 model_result = db.execute(text("""
@@ -187,30 +185,13 @@ async def upload_3mf(
                     "print_file_id": file_id,
                     "category": "Uploaded"
                 })
-                db.commit()
                 model_id = model_result.lastrowid
                 is_new_model = True
-                db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
-                           {"mid": model_id, "fid": file_id})
-                db.commit()
-
-            # Persist file to disk
-            import shutil
-            file_dir = "/data/print_files"
-            os.makedirs(file_dir, exist_ok=True)
-            safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', file.filename)
-            stored_path = f"{file_dir}/{file_id}_{safe_name}"
-            shutil.copy2(tmp_path, stored_path)
-            db.execute(text("UPDATE print_files SET stored_path = :p, original_filename = :fn WHERE id = :id"),
-                       {"p": stored_path, "fn": file.filename, "id": file_id})
+            db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
+                       {"mid": model_id, "fid": file_id})
             db.commit()
 
-            # Extract bed/compatibility metadata and persist
-            meta = pfm.extract_print_file_meta(stored_path, ext)
-            db.execute(text(
-                "UPDATE print_files SET bed_x_mm = :x, bed_y_mm = :y, compatible_api_types = :types WHERE id = :id"
-            ), {"x": meta["bed_x_mm"], "y": meta["bed_y_mm"], "types": meta["compatible_api_types"], "id": file_id})
-            db.commit()
+            ingest.queue.submit(file_id)
 
             return {
                 "id": file_id,
@@ -232,7 +213,8 @@ async def upload_3mf(
                 "is_new_model": is_new_model,
                 "printer_model": metadata.printer_model,
                 "objects": plate_objects,
-                "has_mesh": mesh_data is not None,
+                "has_mesh": False,
+                "metadata_status": ingest.PENDING,
                 "bed_x_mm": meta["bed_x_mm"],
                 "bed_y_mm": meta["bed_y_mm"],
                 "compatible_api_types": meta["compatible_api_types"],
@@ -241,34 +223,36 @@ async def upload_3mf(
 
         else:
             # --- .gcode / .bgcode path: minimal record, no 3mf parsing ---
-            import shutil
             project_name = os.path.splitext(fname)[0]
             normalized_name = _normalize_model_name(project_name)
 
+            # Extract bed/compatibility metadata (first 100 lines at most)
+            meta = pfm.extract_print_file_meta(tmp_path, ext)
+
             result = db.execute(text("""
                 INSERT INTO print_files (
-                    filename, project_name, filaments_json, file_hash
+                    filename, original_filename, project_name, filaments_json, file_hash,
+                    bed_x_mm, bed_y_mm, compatible_api_types, metadata_status
                 ) VALUES (
-                    :filename, :project_name, :filaments_json, :file_hash
+                    :filename, :filename, :project_name, :filaments_json, :file_hash,
+                    :bed_x_mm, :bed_y_mm, :compatible_api_types, :metadata_status
                 )
             """), {
                 "filename": file.filename,
                 "project_name": project_name,
                 "filaments_json": json.dumps([]),
                 "file_hash": file_hash,
+                "bed_x_mm": meta["bed_x_mm"],
+                "bed_y_mm": meta["bed_y_mm"],
+                "compatible_api_types": meta["compatible_api_types"],
+                "metadata_status": ingest.READY,
             })
-            db.commit()
             file_id = result.lastrowid
 
             # Persist file to disk
-            file_dir = "/data/print_files"
-            os.makedirs(file_dir, exist_ok=True)
-            safe_name = re.sub(r'[^a-zA-Z0-9._-]', '_', file.filename)
-            stored_path = f"{file_dir}/{file_id}_{safe_name}"
-            shutil.copy2(tmp_path, stored_path)
-            db.execute(text("UPDATE print_files SET stored_path = :p, original_filename = :fn WHERE id = :id"),
-                       {"p": stored_path, "fn": file.filename, "id": file_id})
-            db.commit()
+            stored_path = ingest.store(tmp_path, file_id, safe_name)
+            db.execute(text("UPDATE print_files SET stored_path = :p WHERE id = :id"),
+                       {"p": stored_path, "id": file_id})
 
             # Check for existing model or create new
             existing_model = db.execute(text(
@@ -278,26 +262,15 @@ async def upload_3mf(
             if existing_model:
                 model_id = existing_model[0]
                 is_new_model = False
-                db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
-                           {"mid": model_id, "fid": file_id})
-                db.commit()
             else:
                 model_result = db.execute(text("""
                     INSERT INTO models (name, default_filament_type, print_file_id, category)
                     VALUES (:name, 'PLA', :print_file_id, 'Uploaded')
                 """), {"name": normalized_name, "print_file_id": file_id})
-                db.commit()
                 model_id = model_result.lastrowid
                 is_new_model = True
-                db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
-                           {"mid": model_id, "fid": file_id})
-                db.commit()
-
-            # Extract bed/compatibility metadata and persist
-            meta = pfm.extract_print_file_meta(stored_path, ext)
-            db.execute(text(
-                "UPDATE print_files SET bed_x_mm = :x, bed_y_mm = :y, compatible_api_types = :types WHERE id = :id"
-            ), {"x": meta["bed_x_mm"], "y": meta["bed_y_mm"], "types": meta["compatible_api_types"], "id": file_id})
+            db.execute(text("UPDATE print_files SET model_id = :mid WHERE id = :fid"),
+                       {"mid": model_id, "fid": file_id})
             db.commit()
 
             return {
@@ -316,14 +289,21 @@ async def upload_3mf(
                 "printer_model": None,
                 "objects": [],
                 "has_mesh": False,
+                "metadata_status": ingest.READY,
                 "bed_x_mm": meta["bed_x_mm"],
                 "bed_y_mm": meta["bed_y_mm"],
                 "compatible_api_types": meta["compatible_api_types"],
                 "duplicate": duplicate_info,
             }
+    except Exception:
+        db.rollback()
+        if stored_path and os.path.exists(stored_path):
+            os.unlink(stored_path)
+        raise
     finally:
-        # Clean up temp file
-        os.unlink(tmp_path)
+        # Clean up temp file (already moved into place on success)
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
 
 
 @router.get("/print-files")
@@ -351,6 +331,7 @@ def list_print_files(
         r['filaments'] = json.loads(r['filaments_json']) if r['filaments_json'] else []
         del r['filaments_json']
         r.pop('stored_path', None)  # server filesystem path — not for clients
+        r.pop('mesh_bin', None)  # served by /print-files/{id}/mesh
         pts = r['print_time_seconds']
         r['print_time_formatted'] = (f"{pts // 3600}h {(pts % 3600) // 60}m" if pts and pts >= 3600 else f"{pts // 60}m" if pts else None)
         files.append(r)
@@ -369,6 +350,7 @@ def get_print_file(file_id: int, current_user: dict = Depends(require_role("view
     r['filaments'] = json.loads(r['filaments_json']) if r['filaments_json'] else []
     del r['filaments_json']
     r.pop('stored_path', None)  # server filesystem path — not for clients
+    r.pop('mesh_bin', None)  # served by /print-files/{id}/mesh
     r['print_time_formatted'] = f"{r['print_time_seconds'] // 3600}h {(r['print_time_seconds'] % 3600) // 60}m" if r['print_time_seconds'] >= 3600 else f"{r['print_time_seconds'] // 60}m"
 
     return r
@@ -441,22 +423,75 @@ def schedule_print_file(
 # Mesh / 3D Viewer
 # ──────────────────────────────────────────────
 
-@router.get("/print-files/{file_id}/mesh", tags=["3D Viewer"])
-async def get_print_file_mesh(file_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
-    """Get mesh geometry data for 3D viewer from a print file."""
-    result = db.execute(text(
-        "SELECT mesh_data FROM print_files WHERE id = :id"
+def _mesh_etag(db: Session, file_id: int):
+    """(ETag, metadata_status) of a file's mesh; None if there's no such file.
+
+    Meshes stored as JSON by earlier versions are converted to the
+    binary form on first read.
+    """
+    from modules.models_library import mesh
+
+    row = db.execute(text(
+        "SELECT mesh_etag, metadata_status, mesh_data IS NOT NULL FROM print_files WHERE id = :id"
     ), {"id": file_id}).fetchone()
+    if not row:
+        return None
+    etag, metadata_status, legacy = row
+    if etag is None and legacy:
+        mesh_json = db.execute(text("SELECT mesh_data FROM print_files WHERE id = :id"), {"id": file_id}).scalar()
+        buf = mesh.from_json(mesh_json)
+        etag = mesh.etag(buf) if buf else None
+        db.execute(text(
+            "UPDATE print_files SET mesh_bin = :b, mesh_etag = :e, mesh_data = NULL WHERE id = :id"
+        ), {"b": buf, "e": etag, "id": file_id})
+        db.commit()
+    return etag, metadata_status
+
+
+def _mesh_response(request: Request, db: Session, file_id: Optional[int], detail: str):
+    """A file's mesh as application/octet-stream (see mesh.py), with ETag.
+
+    202 while it is still being extracted. Clients that only accept
+    application/json get the older {vertices, triangles, ...} object.
+    """
+    from modules.models_library import ingest, mesh
+
+    found = _mesh_etag(db, file_id) if file_id else None
+    if found and found[0] is None and found[1] in (ingest.PENDING, ingest.PROCESSING):
+        return JSONResponse(status_code=202, content={"metadata_status": found[1]}, headers={"Retry-After": "2"})
+    if not found or found[0] is None:
+        raise HTTPException(status_code=404, detail=detail)
+
+    headers = {"ETag": f'"{found[0]}"', "Cache-Control": "private, no-cache", "Vary": "Accept"}
+    accept = request.headers.get("accept", "")
+    as_json = "application/json" in accept and mesh.MEDIA_TYPE not in accept
+    if not as_json:
+        tags = [t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")]
+        if headers["ETag"] in tags or "*" in tags:
+            return Response(status_code=304, headers=headers)
+
+    buf = bytes(db.execute(text("SELECT mesh_bin FROM print_files WHERE id = :id"), {"id": file_id}).scalar())
+    if as_json:
+        vertices, triangles = mesh.decode(buf)
+        return JSONResponse(content={
+            "vertices": vertices.ravel().round(3).tolist(),
+            "triangles": triangles.ravel().tolist(),
+            "vertex_count": len(vertices),
+            "triangle_count": len(triangles),
+        })
+    return Response(content=buf, media_type=mesh.MEDIA_TYPE, headers=headers)
 
-    if not result or not result[0]:
-        raise HTTPException(status_code=404, detail="No mesh data available for this file")
 
-    import json as json_stdlib
-    return json_stdlib.loads(result[0])
+@router.get("/print-files/{file_id}/mesh", tags=["3D Viewer"])
+def get_print_file_mesh(file_id: int, request: Request, current_user: dict = Depends(require_role("viewer")),
+                        db: Session = Depends(get_db)):
+    """Get mesh geometry data for 3D viewer from a print file."""
+    return _mesh_response(request, db, file_id, "No mesh data available for this file")
 
 
 @router.get("/models/{model_id}/mesh", tags=["3D Viewer"])
-async def get_model_mesh(model_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def get_model_mesh(model_id: int, request: Request, current_user: dict = Depends(require_role("viewer")),
+                   db: Session = Depends(get_db)):
     """Get mesh geometry for a model (via its linked print_file)."""
     # Find print_file_id from model
     model = db.execute(text(
@@ -466,12 +501,4 @@ async def get_model_mesh(model_id: int, current_user: dict = Depends(require_rol
     if not model or not model[0]:
         raise HTTPException(status_code=404, detail="Model has no linked print file")
 
-    result = db.execute(text(
-        "SELECT mesh_data FROM print_files WHERE id = :id"
-    ), {"id": model[0]}).fetchone()
-
-    if not result or not result[0]:
-        raise HTTPException(status_code=404, detail="No mesh data available")
-
-    import json as json_stdlib
-    return json_stdlib.loads(result[0])
+    return _mesh_response(request, db, model[0], "No mesh data available")
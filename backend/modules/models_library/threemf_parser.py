@@ -103,62 +103,75 @@ def parse_3mf(file_path: str) -> Optional[PrintFileMetadata]:
     """
     try:
         with zipfile.ZipFile(file_path, 'r') as zf:
-            # Check if this is a sliced file (has gcode)
-            file_list = zf.namelist()
-            has_gcode = any('plate_1.gcode' in f for f in file_list)
-            
-            if not has_gcode:
-                # Try to parse as unsliced project
-                return parse_unsliced_3mf(zf, file_path)
-            
-            # Parse slice_info.config for main metadata
-            slice_info = parse_slice_info(zf)
-            if not slice_info:
-                return None
-            
-            # Parse plate_1.json for additional info
-            plate_info = parse_plate_json(zf)
-            
-            # Extract thumbnail
-            thumbnail_b64 = extract_thumbnail(zf)
-            
-            # Get project name from 3dmodel.model
-            project_name = extract_project_name(zf) or Path(file_path).stem
-            
-            # Build filament list
-            filaments = []
-            for fil in slice_info.get('filaments', []):
-                filaments.append(FilamentInfo(
-                    slot=fil.get('id', 1),
-                    type=fil.get('type', 'Unknown'),
-                    color=fil.get('color', '#888888'),
-                    used_meters=float(fil.get('used_m', 0)),
-                    used_grams=float(fil.get('used_g', 0))
-                ))
-            
-            # Parse layer count from layer_ranges
-            layer_count = 0
-            layer_ranges = slice_info.get('layer_ranges', '')
-            if layer_ranges:
-                parts = layer_ranges.split()
-                if len(parts) >= 2:
-                    layer_count = int(parts[-1]) + 1  # 0-indexed, so add 1
-            
-            return PrintFileMetadata(
-                filename=Path(file_path).name,
-                project_name=project_name,
-                print_time_seconds=int(slice_info.get('prediction', 0)),
-                total_weight_grams=float(slice_info.get('weight', 0)),
-                layer_count=layer_count,
-                layer_height=plate_info.get('layer_height', 0.2) if plate_info else 0.2,
-                nozzle_diameter=float(str(slice_info.get('nozzle_diameters', 0.4)).split(',')[0]),
-                printer_model=extract_printer_model_from_settings(zf) or slice_info.get('printer_model_id', 'Unknown'),
-                supports_used=slice_info.get('support_used', 'false').lower() == 'true',
-                bed_type=plate_info.get('bed_type', 'Unknown') if plate_info else 'Unknown',
-                filaments=filaments,
-                thumbnail_b64=thumbnail_b64
-            )
-            
+            return parse_3mf_zip(zf, file_path)
+    except Exception as e:
+        print(f"Error parsing 3mf: {e}")
+        return None
+
+
+def parse_3mf_zip(zf: zipfile.ZipFile, file_path: str) -> Optional[PrintFileMetadata]:
+    """
+    parse_3mf() on an already open archive.
+
+    file_path only names the file (filename, project name fallback).
+    """
+    try:
+        # Check if this is a sliced file (has gcode)
+        file_list = zf.namelist()
+        has_gcode = any('plate_1.gcode' in f for f in file_list)
+        
+        if not has_gcode:
+            # Try to parse as unsliced project
+            return parse_unsliced_3mf(zf, file_path)
+        
+        # Parse slice_info.config for main metadata
+        slice_info = parse_slice_info(zf)
+        if not slice_info:
+            return None
+        
+        # Parse plate_1.json for additional info
+        plate_info = parse_plate_json(zf)
+        
+        # Extract thumbnail
+        thumbnail_b64 = extract_thumbnail(zf)
+        
+        # Get project name from 3dmodel.model
+        project_name = extract_project_name(zf) or Path(file_path).stem
+        
+        # Build filament list
+        filaments = []
+        for fil in slice_info.get('filaments', []):
+            filaments.append(FilamentInfo(
+                slot=fil.get('id', 1),
+                type=fil.get('type', 'Unknown'),
+                color=fil.get('color', '#888888'),
+                used_meters=float(fil.get('used_m', 0)),
+                used_grams=float(fil.get('used_g', 0))
+            ))
+        
+        # Parse layer count from layer_ranges
+        layer_count = 0
+        layer_ranges = slice_info.get('layer_ranges', '')
+        if layer_ranges:
+            parts = layer_ranges.split()
+            if len(parts) >= 2:
+                layer_count = int(parts[-1]) + 1  # 0-indexed, so add 1
+        
+        return PrintFileMetadata(
+            filename=Path(file_path).name,
+            project_name=project_name,
+            print_time_seconds=int(slice_info.get('prediction', 0)),
+            total_weight_grams=float(slice_info.get('weight', 0)),
+            layer_count=layer_count,
+            layer_height=plate_info.get('layer_height', 0.2) if plate_info else 0.2,
+            nozzle_diameter=float(str(slice_info.get('nozzle_diameters', 0.4)).split(',')[0]),
+            printer_model=extract_printer_model_from_settings(zf) or slice_info.get('printer_model_id', 'Unknown'),
+            supports_used=slice_info.get('support_used', 'false').lower() == 'true',
+            bed_type=plate_info.get('bed_type', 'Unknown') if plate_info else 'Unknown',
+            filaments=filaments,
+            thumbnail_b64=thumbnail_b64
+        )
+        
     except Exception as e:
         print(f"Error parsing 3mf: {e}")
         return None
@@ -256,15 +269,20 @@ def extract_thumbnail(zf: zipfile.ZipFile) -> Optional[str]:
 
 
 def extract_project_name(zf: zipfile.ZipFile) -> Optional[str]:
-    """Extract project name from 3D/3dmodel.model."""
+    """Extract project name from 3D/3dmodel.model.
+
+    The model file also holds the whole mesh; the metadata comes first,
+    so read it incrementally and stop at <resources>.
+    """
+    ns = '{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}'
     try:
         with zf.open('3D/3dmodel.model') as f:
-            content = f.read().decode('utf-8')
             # Look for Title metadata
-            tree = ET.fromstring(content)
-            for meta in tree.findall('.//{http://schemas.microsoft.com/3dmanufacturing/core/2015/02}metadata'):
-                if meta.get('name') == 'Title':
-                    return meta.text
+            for event, elem in ET.iterparse(f, events=('start', 'end')):
+                if event == 'start' and elem.tag == ns + 'resources':
+                    break
+                if event == 'end' and elem.tag == ns + 'metadata' and elem.get('name') == 'Title':
+                    return elem.text
             return None
     except Exception as e:
         print(f"Error extracting project name: {e}")
@@ -367,139 +385,34 @@ def extract_mesh_from_3mf(file_path: str) -> Optional[dict]:
     Extract mesh geometry (vertices + triangles) from a .3mf file.
     Returns a dict with 'vertices' (flat [x,y,z,x,y,z,...]) and
     'triangles' (flat [v1,v2,v3,v1,v2,v3,...]) for Three.js BufferGeometry.
-    Keeps only every Nth vertex for large models to stay under ~500KB.
+    Large models are decimated to mesh.MAX_TRIANGLES triangles.
+
+    The 3D viewer uses the binary form, mesh.extract(); this is the
+    same mesh as plain lists.
     """
     try:
         with zipfile.ZipFile(file_path, 'r') as zf:
-            # Find the 3D model file
-            model_path = None
-            for name in zf.namelist():
-                if name.lower().endswith('.model') and '3d/' in name.lower():
-                    model_path = name
-                    break
-            
-            if not model_path:
-                # Try root-level .model file
-                for name in zf.namelist():
-                    if name.lower().endswith('.model'):
-                        model_path = name
-                        break
-            
-            if not model_path:
-                return None
-            
-            xml_data = zf.read(model_path).decode('utf-8')
-            
-            # Parse XML — handle namespace
-            # 3MF uses namespace: http://schemas.microsoft.com/3dmanufacturing/core/2015/02
-            ns = {'m': 'http://schemas.microsoft.com/3dmanufacturing/core/2015/02'}
-            root = ET.fromstring(xml_data)
-            
-            all_vertices = []
-            all_triangles = []
-            vertex_offset = 0
-            
-            # Find all mesh elements (could be multiple objects)
-            meshes = root.findall('.//m:mesh', ns)
-            if not meshes:
-                # Try without namespace (some files don't use it)
-                meshes = root.findall('.//mesh')
-            
-            for mesh in meshes:
-                # Extract vertices
-                vertices_elem = mesh.find('m:vertices', ns)
-                if vertices_elem is None:
-                    vertices_elem = mesh.find('vertices')
-                if vertices_elem is None:
-                    continue
-                
-                local_verts = []
-                for v in vertices_elem.findall('m:vertex', ns):
-                    local_verts.extend([
-                        float(v.get('x', 0)),
-                        float(v.get('y', 0)),
-                        float(v.get('z', 0))
-                    ])
-                if not local_verts:
-                    for v in vertices_elem.findall('vertex'):
-                        local_verts.extend([
-                            float(v.get('x', 0)),
-                            float(v.get('y', 0)),
-                            float(v.get('z', 0))
-                        ])
-                
-                # Extract triangles
-                triangles_elem = mesh.find('m:triangles', ns)
-                if triangles_elem is None:
-                    triangles_elem = mesh.find('triangles')
-                if triangles_elem is None:
-                    continue
-                
-                local_tris = []
-                for t in triangles_elem.findall('m:triangle', ns):
-                    local_tris.extend([
-                        int(t.get('v1', 0)) + vertex_offset,
-                        int(t.get('v2', 0)) + vertex_offset,
-                        int(t.get('v3', 0)) + vertex_offset
-                    ])
-                if not local_tris:
-                    for t in triangles_elem.findall('triangle'):
-                        local_tris.extend([
-                            int(t.get('v1', 0)) + vertex_offset,
-                            int(t.get('v2', 0)) + vertex_offset,
-                            int(t.get('v3', 0)) + vertex_offset
-                        ])
-                
-                all_vertices.extend(local_verts)
-                all_triangles.extend(local_tris)
-                vertex_offset += len(local_verts) // 3
-            
-            if not all_vertices or not all_triangles:
-                return None
-            
-            num_verts = len(all_vertices) // 3
-            num_tris = len(all_triangles) // 3
-            
-            # Decimation for large models — keep mesh under ~500KB JSON
-            MAX_TRIANGLES = 50000
-            if num_tris > MAX_TRIANGLES:
-                # Simple decimation: take every Nth triangle
-                step = (num_tris // MAX_TRIANGLES) + 1
-                decimated_tris = []
-                used_verts = set()
-                for i in range(0, len(all_triangles), step * 3):
-                    if i + 2 < len(all_triangles):
-                        v1, v2, v3 = all_triangles[i], all_triangles[i+1], all_triangles[i+2]
-                        decimated_tris.extend([v1, v2, v3])
-                        used_verts.update([v1, v2, v3])
-                
-                # Remap vertices to compact array
-                vert_map = {}
-                compact_verts = []
-                new_idx = 0
-                for old_idx in sorted(used_verts):
-                    vert_map[old_idx] = new_idx
-                    base = old_idx * 3
-                    if base + 2 < len(all_vertices):
-                        compact_verts.extend(all_vertices[base:base+3])
-                        new_idx += 1
-                
-                remapped_tris = [vert_map.get(t, 0) for t in decimated_tris]
-                all_vertices = compact_verts
-                all_triangles = remapped_tris
-                num_verts = len(all_vertices) // 3
-                num_tris = len(all_triangles) // 3
-            
-            # Round floats to reduce JSON size
-            all_vertices = [round(v, 3) for v in all_vertices]
-            
-            return {
-                "vertices": all_vertices,
-                "triangles": all_triangles,
-                "vertex_count": num_verts,
-                "triangle_count": num_tris
-            }
-    
+            return extract_mesh_from_zip(zf)
+    except Exception as e:
+        print(f"Error extracting mesh: {e}")
+        return None
+
+
+def extract_mesh_from_zip(zf: zipfile.ZipFile) -> Optional[dict]:
+    """extract_mesh_from_3mf() on an already open archive."""
+    from modules.models_library import mesh
+
+    try:
+        buf = mesh.extract(zf)
+        if buf is None:
+            return None
+        vertices, triangles = mesh.decode(buf)
+        return {
+            "vertices": [round(v, 3) for v in vertices.ravel().tolist()],
+            "triangles": triangles.ravel().tolist(),
+            "vertex_count": len(vertices),
+            "triangle_count": len(triangles)
+        }
     except Exception as e:
         print(f"Error extracting mesh: {e}")
         return None
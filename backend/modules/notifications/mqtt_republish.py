@@ -25,6 +25,7 @@ from typing import Optional, Dict, Any
 
 from sqlalchemy import text
 
+from core import workers
 from core.db import engine
 
 log = logging.getLogger("mqtt_republish")
@@ -274,7 +275,7 @@ def test_connection(host: str, port: int, username: str = "", password: str = ""
 
 
 def invalidate_cache():
-    """Force config reload on next publish."""
+    """Force config reload on next publish, here and in the other API workers."""
     global _config_cache, _config_ts, _client
     _config_cache = None
     _config_ts = 0
@@ -287,6 +288,10 @@ def invalidate_cache():
             except Exception as e:
                 log.debug(f"Error during MQTT cache invalidation disconnect: {e}")
             _client = None
+    workers.propagate("mqtt_republish.invalidate_cache")
+
+
+workers.on("mqtt_republish.invalidate_cache", invalidate_cache)
 
 
 # ---------------------------------------------------------------------------
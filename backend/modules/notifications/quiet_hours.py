@@ -17,6 +17,7 @@ from typing import Optional, Dict, Any, Tuple
 
 from sqlalchemy import text
 
+from core import workers
 from core.db import engine
 
 log = logging.getLogger("quiet_hours")
@@ -233,10 +234,14 @@ def format_digest_text(alerts: list) -> str:
 
 
 def invalidate_cache():
-    """Force config reload."""
+    """Force config reload, here and in the other API workers."""
     global _config_cache, _config_ts
     _config_cache = None
     _config_ts = 0
+    workers.propagate("quiet_hours.invalidate_cache")
+
+
+workers.on("quiet_hours.invalidate_cache", invalidate_cache)
 
 
 # ─────────────────────────────────────────────────────────────────────────
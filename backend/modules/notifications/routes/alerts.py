@@ -102,7 +102,7 @@ def get_digest_status(
 
 
 @router.get("/alerts", response_model=List[AlertResponse])
-async def list_alerts(
+def list_alerts(
     severity: Optional[str] = None,
     alert_type: Optional[str] = None,
     is_read: Optional[bool] = None,
@@ -149,7 +149,7 @@ async def list_alerts(
 
 
 @router.get("/alerts/unread-count")
-async def get_unread_count(
+def get_unread_count(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -164,7 +164,7 @@ async def get_unread_count(
 
 
 @router.get("/alerts/summary", response_model=AlertSummary)
-async def get_alert_summary(
+def get_alert_summary(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -192,7 +192,7 @@ async def get_alert_summary(
 
 
 @router.patch("/alerts/{alert_id}/read")
-async def mark_alert_read(
+def mark_alert_read(
     alert_id: int,
     request: Request,
     # Stacked auth (Phase 2 canonical) — viewer floor for JWT, agent:write
@@ -251,7 +251,7 @@ async def mark_alert_read(
 
 
 @router.post("/alerts/mark-all-read")
-async def mark_all_read(
+def mark_all_read(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -267,7 +267,7 @@ async def mark_all_read(
 
 
 @router.patch("/alerts/{alert_id}/dismiss")
-async def dismiss_alert(
+def dismiss_alert(
     alert_id: int,
     request: Request,
     # Stacked auth (Phase 2 canonical).
@@ -330,7 +330,7 @@ async def dismiss_alert(
 # ============== Alert Preferences ==============
 
 @router.get("/alert-preferences", response_model=List[AlertPreferenceResponse])
-async def get_alert_preferences(
+def get_alert_preferences(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -353,7 +353,7 @@ async def get_alert_preferences(
 
 
 @router.put("/alert-preferences")
-async def update_alert_preferences(
+def update_alert_preferences(
     data: AlertPreferencesUpdate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -391,7 +391,7 @@ async def update_alert_preferences(
 # ============== SMTP Config (Admin Only) ==============
 
 @router.get("/smtp-config")
-async def get_smtp_config(
+def get_smtp_config(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
 ):
@@ -412,7 +412,7 @@ async def get_smtp_config(
 
 
 @router.put("/smtp-config")
-async def update_smtp_config(
+def update_smtp_config(
     data: SmtpConfigBase,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
@@ -439,7 +439,7 @@ async def update_smtp_config(
 
 
 @router.post("/alerts/test-email")
-async def send_test_email(
+def send_test_email(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
 ):
@@ -19,7 +19,7 @@ router = APIRouter(tags=["Alerts"])
 # ============== Browser Push Subscription ==============
 
 @router.get("/push/vapid-key")
-async def get_vapid_key(db: Session = Depends(get_db)):
+def get_vapid_key(db: Session = Depends(get_db)):
     """Get VAPID public key for browser push subscription."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'vapid_keys'")).fetchone()
     if not row:
@@ -32,7 +32,7 @@ async def get_vapid_key(db: Session = Depends(get_db)):
 
 
 @router.post("/push/subscribe")
-async def subscribe_push(
+def subscribe_push(
     data: PushSubscriptionCreate,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
@@ -62,7 +62,7 @@ async def subscribe_push(
 
 
 @router.delete("/push/subscribe")
-async def unsubscribe_push(
+def unsubscribe_push(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
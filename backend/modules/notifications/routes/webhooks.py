@@ -10,7 +10,7 @@ import threading
 import core.crypto as crypto
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import log_audit
+from core.dependencies import get_json_body, log_audit
 from core.rbac import require_role
 from core.webhook_utils import _validate_webhook_url, resolve_and_check_webhook_url, safe_post, trusted_post, WebhookSSRFError
 
@@ -42,7 +42,7 @@ def _encrypt_webhook_url(url: str) -> str:
 # ============== Webhooks ==============
 
 @router.get("")
-async def list_webhooks(
+def list_webhooks(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
 ):
@@ -57,13 +57,13 @@ async def list_webhooks(
 
 
 @router.post("")
-async def create_webhook(
+def create_webhook(
     request: Request,
     current_user: dict = Depends(require_role("admin")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    data: dict = Depends(get_json_body),
 ):
     """Create a new webhook."""
-    data = await request.json()
 
     name = data.get("name", "Webhook")
     url = data.get("url")
@@ -99,14 +99,14 @@ async def create_webhook(
 
 
 @router.patch("/{webhook_id}")
-async def update_webhook(
+def update_webhook(
     webhook_id: int,
     request: Request,
     current_user: dict = Depends(require_role("admin")),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_db),
+    data: dict = Depends(get_json_body),
 ):
     """Update a webhook."""
-    data = await request.json()
 
     updates = []
     params = {"id": webhook_id}
@@ -135,7 +135,7 @@ async def update_webhook(
 
 
 @router.delete("/{webhook_id}")
-async def delete_webhook(
+def delete_webhook(
     webhook_id: int,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
@@ -148,7 +148,7 @@ async def delete_webhook(
 
 
 @router.post("/{webhook_id}/test")
-async def test_webhook(
+def test_webhook(
     webhook_id: int,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
@@ -14,6 +14,7 @@ import json
 import logging
 
 import core.crypto as crypto
+from core import auth_context
 from core.db import get_db
 from core.db_compat import sql
 from core.rbac import require_role, require_superadmin, get_org_scope
@@ -59,7 +60,7 @@ def _get_org_settings(db, org_id: int) -> dict:
 # =============================================================================
 
 @router.get("/orgs", tags=["Organizations"])
-async def list_orgs(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def list_orgs(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """List all organizations. Org-scoped admins see only their own org."""
     user_group = current_user.get("group_id")
     if user_group:
@@ -86,7 +87,7 @@ async def list_orgs(current_user: dict = Depends(require_role("admin")), db: Ses
 
 
 @router.post("/orgs", tags=["Organizations"])
-async def create_org(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def create_org(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Create a new organization. Superadmin only."""
     name = body.get("name", "").strip()
     if not name:
@@ -113,7 +114,7 @@ async def create_org(body: dict, current_user: dict = Depends(require_superadmin
 
 
 @router.patch("/orgs/{org_id}", tags=["Organizations"])
-async def update_org(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def update_org(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Update an organization. Org-scoped admins can only update their own org."""
     if current_user.get("group_id") and current_user["group_id"] != org_id:
         raise HTTPException(status_code=404, detail="Organization not found")
@@ -135,7 +136,7 @@ async def update_org(org_id: int, body: dict, current_user: dict = Depends(requi
 
 
 @router.delete("/orgs/{org_id}", tags=["Organizations"])
-async def delete_org(org_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def delete_org(org_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Delete an organization. Superadmin only."""
     org = db.execute(text("SELECT * FROM groups WHERE id = :id AND is_org = 1"), {"id": org_id}).fetchone()
     if not org:
@@ -151,11 +152,12 @@ async def delete_org(org_id: int, current_user: dict = Depends(require_superadmi
 
     log_audit(db, "org_deleted", "org", org_id, f"Organization '{org.name}' deleted")
     db.commit()
+    auth_context.invalidate_user()  # every member's group_id changed
     return {"status": "ok"}
 
 
 @router.post("/orgs/{org_id}/members", tags=["Organizations"])
-async def add_org_member(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def add_org_member(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Add a user to an organization.
 
     Authorization rules (R2 from 2026-04-12 adversarial review):
@@ -211,6 +213,7 @@ async def add_org_member(org_id: int, body: dict, current_user: dict = Depends(r
     log_audit(db, "org_member_added", "user", user_id,
               {"org_id": org_id, "previous_org_id": target.group_id, "actor_id": current_user.get("id")})
     db.commit()
+    auth_context.invalidate_user(user_id)
     return {"status": "ok"}
 
 
@@ -219,7 +222,7 @@ class AssignPrinterRequest(PydanticBaseModel):
 
 
 @router.post("/orgs/{org_id}/printers", tags=["Organizations"])
-async def assign_printer_to_org(org_id: int, body: AssignPrinterRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def assign_printer_to_org(org_id: int, body: AssignPrinterRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Assign a printer to an organization. Superadmin only."""
     printer_id = body.printer_id
     db.execute(text("UPDATE printers SET org_id = :oid WHERE id = :pid"),
@@ -233,7 +236,7 @@ async def assign_printer_to_org(org_id: int, body: AssignPrinterRequest, current
 # =============================================================================
 
 @router.get("/orgs/{org_id}/settings", tags=["Organizations"])
-async def get_org_settings(org_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def get_org_settings(org_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Get org-level settings. Org-scoped admins can only view their own org."""
     if current_user.get("group_id") and current_user["group_id"] != org_id:
         raise HTTPException(status_code=404, detail="Organization not found")
@@ -244,7 +247,7 @@ async def get_org_settings(org_id: int, current_user: dict = Depends(require_rol
 
 
 @router.put("/orgs/{org_id}/settings", tags=["Organizations"])
-async def update_org_settings(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def update_org_settings(org_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Update org-level settings. Org-scoped admins can only update their own org."""
     if current_user.get("group_id") and current_user["group_id"] != org_id:
         raise HTTPException(status_code=404, detail="Organization not found")
@@ -12,8 +12,9 @@ from sqlalchemy.orm import Session
 
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import get_current_user, log_audit
+from core.dependencies import get_current_user, get_json_body, log_audit
 from core.rbac import require_role
+from core import auth_context
 from core.auth_helpers import (
     _validate_password, _check_rate_limit, _record_login_attempt, _is_locked_out
 )
@@ -48,7 +49,7 @@ def _record_session(db, user_id, access_token, ip, user_agent):
 
 @router.post("/auth/login", tags=["Auth"])
 @limiter.limit("10/minute")
-async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
     client_ip = request.client.host if hasattr(request, 'client') and request.client else "unknown"
     if _check_rate_limit(db, client_ip):
         raise HTTPException(status_code=429, detail="Too many login attempts. Try again in 5 minutes.")
@@ -106,11 +107,13 @@ async def login(request: Request, form_data: OAuth2PasswordRequestForm = Depends
 # ============== Logout ==============
 
 @router.post("/auth/logout", tags=["Auth"])
-async def logout(request: Request, response: Response, db: Session = Depends(get_db),
-                 current_user: dict = Depends(get_current_user)):
+def logout(request: Request, response: Response, db: Session = Depends(get_db),
+           current_user: dict = Depends(get_current_user)):
     """Clear session cookie and blacklist the JWT (if present)."""
     import jwt as _jwt
 
+    revoked = []
+
     def _blacklist_token(token: str) -> None:
         try:
             payload = _jwt.decode(token, auth_module.SECRET_KEY, algorithms=[auth_module.ALGORITHM])
@@ -122,6 +125,7 @@ async def logout(request: Request, response: Response, db: Session = Depends(get
                     {"jti": jti, "exp": datetime.fromtimestamp(exp, tz=timezone.utc).isoformat()},
                 )
                 db.execute(text("DELETE FROM active_sessions WHERE token_jti = :jti"), {"jti": jti})
+                revoked.append(jti)
         except Exception:
             log.debug("Could not blacklist token on logout", exc_info=True)
 
@@ -139,6 +143,8 @@ async def logout(request: Request, response: Response, db: Session = Depends(get
         log_audit(db, "auth.logout", "user", current_user.get("id"),
                   details={"username": current_user.get("username")})
     db.commit()
+    for jti in revoked:
+        auth_context.mark_revoked(jti)
     response.delete_cookie(key="session", path="/")
     return {"detail": "Logged out"}
 
@@ -147,7 +153,7 @@ async def logout(request: Request, response: Response, db: Session = Depends(get
 
 @router.post("/auth/mfa/verify", tags=["Auth"])
 @limiter.limit("10/minute")
-async def mfa_verify(request: Request, body: dict, db: Session = Depends(get_db)):
+def mfa_verify(request: Request, body: dict, db: Session = Depends(get_db)):
     """Verify TOTP code during login. Requires mfa_pending token."""
     import pyotp
     import jwt as _jwt
@@ -190,6 +196,7 @@ async def mfa_verify(request: Request, body: dict, db: Session = Depends(get_db)
         db.execute(text(f"{sql.insert_or_ignore_prefix()} token_blacklist (jti, expires_at) VALUES (:jti, :exp){sql.on_conflict_ignore('jti')}"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                    {"jti": mfa_jti, "exp": datetime.fromtimestamp(mfa_exp, tz=timezone.utc).isoformat()})
         db.commit()
+        auth_context.mark_revoked(mfa_jti)
 
     access_token = create_access_token(data={"sub": user.username, "role": user.role})
     client_ip = request.client.host if hasattr(request, 'client') and request.client else "unknown"
@@ -204,7 +211,7 @@ async def mfa_verify(request: Request, body: dict, db: Session = Depends(get_db)
 
 
 @router.post("/auth/mfa/setup", tags=["Auth"])
-async def mfa_setup(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def mfa_setup(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Generate TOTP secret and provisioning URI for MFA setup."""
     import pyotp, qrcode, io, base64
 
@@ -227,12 +234,13 @@ async def mfa_setup(current_user: dict = Depends(require_role("viewer")), db: Se
     db.execute(text("UPDATE users SET mfa_secret = :secret WHERE id = :id"),
                {"secret": encrypted_secret, "id": current_user["id"]})
     db.commit()
+    auth_context.invalidate_user(current_user["id"])
 
     return {"secret": secret, "provisioning_uri": provisioning_uri, "qr_code": f"data:image/png;base64,{qr_b64}"}
 
 
 @router.post("/auth/mfa/confirm", tags=["Auth"])
-async def mfa_confirm(body: dict, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def mfa_confirm(body: dict, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Confirm MFA setup by verifying a TOTP code. Enables MFA on the account."""
     import pyotp
 
@@ -255,11 +263,12 @@ async def mfa_confirm(body: dict, current_user: dict = Depends(require_role("vie
     db.execute(text("UPDATE users SET mfa_enabled = 1 WHERE id = :id"), {"id": current_user["id"]})
     log_audit(db, "mfa_enabled", "user", current_user["id"], "MFA enabled")
     db.commit()
+    auth_context.invalidate_user(current_user["id"])
     return {"status": "ok", "message": "MFA enabled successfully"}
 
 
 @router.delete("/auth/mfa", tags=["Auth"])
-async def mfa_disable(body: dict = None, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def mfa_disable(body: dict = None, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Disable MFA. Requires current TOTP code or admin role."""
     import pyotp
 
@@ -280,11 +289,12 @@ async def mfa_disable(body: dict = None, current_user: dict = Depends(require_ro
     db.execute(text("UPDATE users SET mfa_enabled = 0, mfa_secret = NULL WHERE id = :id"), {"id": current_user["id"]})
     log_audit(db, "mfa_disabled", "user", current_user["id"], "MFA disabled")
     db.commit()
+    auth_context.invalidate_user(current_user["id"])
     return {"status": "ok", "message": "MFA disabled"}
 
 
 @router.delete("/admin/users/{user_id}/mfa", tags=["Auth"])
-async def admin_mfa_disable(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def admin_mfa_disable(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin: force-disable MFA for a user (no TOTP required)."""
     user = db.execute(text("SELECT * FROM users WHERE id = :id"), {"id": user_id}).fetchone()
     if not user:
@@ -295,17 +305,18 @@ async def admin_mfa_disable(user_id: int, current_user: dict = Depends(require_r
     db.execute(text("UPDATE users SET mfa_enabled = 0, mfa_secret = NULL WHERE id = :id"), {"id": user_id})
     log_audit(db, "mfa_disabled_admin", "user", user_id, f"Admin force-disabled MFA for user {user.username}")
     db.commit()
+    auth_context.invalidate_user(user_id)
     return {"status": "ok", "message": f"MFA disabled for {user.username}"}
 
 
 @router.get("/auth/mfa/status", tags=["Auth"])
-async def mfa_status(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def mfa_status(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Get MFA status for the current user."""
     return {"mfa_enabled": bool(current_user.get("mfa_enabled"))}
 
 
 @router.get("/config/require-mfa", tags=["Config"])
-async def get_require_mfa(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def get_require_mfa(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Get whether MFA is required for all users."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'require_mfa'")).fetchone()
     return {"require_mfa": row[0] == "true" if row else False}
@@ -316,7 +327,7 @@ class RequireMFARequest(PydanticBaseModel):
 
 
 @router.put("/config/require-mfa", tags=["Config"])
-async def set_require_mfa(body: RequireMFARequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def set_require_mfa(body: RequireMFARequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Set whether MFA is required for all users."""
     require = body.require_mfa
     db.execute(text("INSERT INTO system_config (key, value) VALUES ('require_mfa', :val) ON CONFLICT(key) DO UPDATE SET value = :val"),
@@ -336,7 +347,7 @@ async def get_me(current_user: dict = Depends(get_current_user)):
 
 
 @router.get("/auth/me/theme", tags=["Auth"])
-async def get_theme(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def get_theme(current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
     """Get the current user's theme preferences."""
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
@@ -351,12 +362,11 @@ async def get_theme(current_user: dict = Depends(get_current_user), db: Session
 
 
 @router.put("/auth/me/theme", tags=["Auth"])
-async def set_theme(request: Request, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db)):
+def set_theme(request: Request, current_user: dict = Depends(get_current_user), db: Session = Depends(get_db), body: dict = Depends(get_json_body)):
     """Set the current user's theme preferences."""
     if not current_user:
         raise HTTPException(status_code=401, detail="Not authenticated")
     import json as _json
-    body = await request.json()
     theme_json = _json.dumps(body)
     db.execute(text("UPDATE users SET theme_json = :t WHERE id = :id"), {"t": theme_json, "id": current_user["id"]})
     db.commit()
@@ -436,7 +446,7 @@ def _send_odin_email(db, to_email: str, subject: str, html_body: str):
 
 @router.post("/auth/forgot-password", tags=["Auth"])
 @limiter.limit("5/minute")
-async def forgot_password(request: Request, body: ForgotPasswordRequest, db: Session = Depends(get_db)):
+def forgot_password(request: Request, body: ForgotPasswordRequest, db: Session = Depends(get_db)):
     """Request a password reset link. Always returns 200 to prevent user enumeration."""
     import secrets as _secrets
 
@@ -478,7 +488,7 @@ async def forgot_password(request: Request, body: ForgotPasswordRequest, db: Ses
 
 @router.post("/auth/reset-password", tags=["Auth"])
 @limiter.limit("5/minute")
-async def reset_password(request: Request, body: ResetPasswordRequest, db: Session = Depends(get_db)):
+def reset_password(request: Request, body: ResetPasswordRequest, db: Session = Depends(get_db)):
     """Reset password using a valid token."""
     row = db.execute(
         text("SELECT id, user_id, expires_at, used FROM password_reset_tokens WHERE token = :tok"),
@@ -506,12 +516,15 @@ async def reset_password(request: Request, body: ResetPasswordRequest, db: Sessi
                    {"jti": s[0], "exp": expiry})
     db.execute(text("DELETE FROM active_sessions WHERE user_id = :uid"), {"uid": user_id})
     db.commit()
+    auth_context.invalidate_user(user_id)
+    for s in sessions:
+        auth_context.mark_revoked(s[0])
 
     return {"status": "ok", "message": "Password updated. Please log in."}
 
 
 @router.get("/auth/capabilities", tags=["Auth"])
-async def auth_capabilities(db: Session = Depends(get_db)):
+def auth_capabilities(db: Session = Depends(get_db)):
     """Public endpoint to check available auth features (SMTP, OIDC, etc.)."""
     config = db.query(SystemConfig).filter(SystemConfig.key == "smtp_config").first()
     smtp = config.value if config else {}
@@ -5,12 +5,13 @@ from datetime import datetime, timedelta, timezone
 from urllib.parse import quote
 
 from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import get_current_user, log_audit
+from core.dependencies import get_current_user, get_json_body, log_audit
 from core.rbac import require_role, require_superadmin
 import core.auth as auth_module
 from core.auth import create_access_token
@@ -38,7 +39,7 @@ def _record_session(db, user_id, access_token, ip, user_agent):
 # ============== OIDC public config ==============
 
 @router.get("/auth/oidc/config", tags=["Auth"])
-async def get_oidc_public_config(db: Session = Depends(get_db)):
+def get_oidc_public_config(db: Session = Depends(get_db)):
     """Get public OIDC config for login page (is SSO enabled, display name)."""
     row = db.execute(text("SELECT is_enabled, display_name FROM oidc_config LIMIT 1")).fetchone()
     if not row:
@@ -46,13 +47,79 @@ async def get_oidc_public_config(db: Session = Depends(get_db)):
     return {"enabled": bool(row[0]), "display_name": row[1] or "Single Sign-On"}
 
 
+def _enabled_oidc_config(db: Session):
+    return db.execute(text("SELECT * FROM oidc_config WHERE is_enabled = 1 LIMIT 1")).fetchone()
+
+
+def _finish_oidc_login(db: Session, config: dict, oidc_subject: str, email: str):
+    """Find or provision the OIDC user and issue a one-time auth code.
+
+    Synchronous; oidc_callback runs it in the threadpool.
+    """
+    from fastapi.responses import RedirectResponse
+
+    oidc_provider = config.get("display_name", "oidc").lower().replace(" ", "_")
+    existing = db.execute(
+        text("SELECT * FROM users WHERE oidc_subject = :sub AND oidc_provider = :provider"),
+        {"sub": oidc_subject, "provider": oidc_provider}
+    ).fetchone()
+
+    if existing:
+        user_id = existing[0]
+        db.execute(text("UPDATE users SET last_login = :now, email = :email WHERE id = :id"),
+                   {"now": datetime.now(timezone.utc).isoformat(), "email": email, "id": user_id})
+        db.commit()
+        user_role = existing._mapping.get("role", "operator")
+    elif config.get("auto_create_users", False):
+        username = email.split("@")[0]
+        default_role = config.get("default_role", "viewer")
+        base_username = username
+        counter = 1
+        while db.execute(text("SELECT id FROM users WHERE username = :u"), {"u": username}).fetchone():
+            username = f"{base_username}{counter}"
+            counter += 1
+        insert_sql = """
+            INSERT INTO users (username, email, password_hash, role, oidc_subject, oidc_provider, last_login)
+            VALUES (:username, :email, '', :role, :sub, :provider, :now)
+        """
+        insert_params = {"username": username, "email": email, "role": default_role,
+                         "sub": oidc_subject, "provider": oidc_provider,
+                         "now": datetime.now(timezone.utc).isoformat()}
+        if sql.is_sqlite:
+            db.execute(text(insert_sql), insert_params)
+            db.commit()
+            user_id = db.execute(text("SELECT last_insert_rowid()")).fetchone()[0]
+        else:
+            user_id = db.execute(text(insert_sql + " RETURNING id"), insert_params).scalar()  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
+            db.commit()
+        user_role = default_role
+        log.info(f"Created OIDC user: {username} ({email})")
+    else:
+        log.warning(f"OIDC user not found and auto-create disabled: {email}")
+        return RedirectResponse(url="/?error=user_not_found", status_code=302)
+
+    access_token = create_access_token(data={
+        "sub": existing._mapping.get("username") if existing else username,
+        "role": user_role,
+    })
+
+    import secrets as _secrets
+    from core.crypto import encrypt as _crypto_encrypt
+    oidc_code = _secrets.token_urlsafe(48)
+    expires_at = (datetime.now(timezone.utc) + timedelta(minutes=2)).isoformat()
+    db.execute(text("INSERT INTO oidc_auth_codes (code, access_token, expires_at) VALUES (:code, :token, :exp)"),
+               {"code": oidc_code, "token": _crypto_encrypt(access_token), "exp": expires_at})
+    db.commit()
+    return RedirectResponse(url=f"/?oidc_code={oidc_code}", status_code=302)
+
+
 # ============== OIDC login flow ==============
 
 @router.get("/auth/oidc/login", tags=["Auth"])
 async def oidc_login(request: Request, db: Session = Depends(get_db)):
     """Initiate OIDC login flow. Redirects to identity provider."""
     from modules.organizations.oidc_handler import create_handler_from_config
-    row = db.execute(text("SELECT * FROM oidc_config WHERE is_enabled = 1 LIMIT 1")).fetchone()
+    row = await run_in_threadpool(_enabled_oidc_config, db)
     if not row:
         raise HTTPException(status_code=400, detail="OIDC not configured")
     config = dict(row._mapping)
@@ -82,7 +149,7 @@ async def oidc_callback(request: Request, code: str = None, state: str = None,
     if not code or not state:
         return RedirectResponse(url="/?error=missing_params", status_code=302)
 
-    row = db.execute(text("SELECT * FROM oidc_config WHERE is_enabled = 1 LIMIT 1")).fetchone()
+    row = await run_in_threadpool(_enabled_oidc_config, db)
     if not row:
         return RedirectResponse(url="/?error=oidc_not_configured", status_code=302)
     config = dict(row._mapping)
@@ -94,7 +161,7 @@ async def oidc_callback(request: Request, code: str = None, state: str = None,
         redirect_uri = f"{base_url}/api/auth/oidc/callback"
 
     handler = create_handler_from_config(config, redirect_uri)
-    if not handler.validate_state(state):
+    if not await run_in_threadpool(handler.validate_state, state):  # DB-backed
         return RedirectResponse(url="/?error=invalid_state", status_code=302)
 
     try:
@@ -108,59 +175,9 @@ async def oidc_callback(request: Request, code: str = None, state: str = None,
             log.error(f"Missing required claims: sub={oidc_subject}, email={email}")
             return RedirectResponse(url="/?error=missing_claims", status_code=302)
 
-        oidc_provider = config.get("display_name", "oidc").lower().replace(" ", "_")
-        existing = db.execute(
-            text("SELECT * FROM users WHERE oidc_subject = :sub AND oidc_provider = :provider"),
-            {"sub": oidc_subject, "provider": oidc_provider}
-        ).fetchone()
-
-        if existing:
-            user_id = existing[0]
-            db.execute(text("UPDATE users SET last_login = :now, email = :email WHERE id = :id"),
-                       {"now": datetime.now(timezone.utc).isoformat(), "email": email, "id": user_id})
-            db.commit()
-            user_role = existing._mapping.get("role", "operator")
-        elif config.get("auto_create_users", False):
-            username = email.split("@")[0]
-            default_role = config.get("default_role", "viewer")
-            base_username = username
-            counter = 1
-            while db.execute(text("SELECT id FROM users WHERE username = :u"), {"u": username}).fetchone():
-                username = f"{base_username}{counter}"
-                counter += 1
-            insert_sql = """
-                INSERT INTO users (username, email, password_hash, role, oidc_subject, oidc_provider, last_login)
-                VALUES (:username, :email, '', :role, :sub, :provider, :now)
-            """
-            insert_params = {"username": username, "email": email, "role": default_role,
-                             "sub": oidc_subject, "provider": oidc_provider,
-                             "now": datetime.now(timezone.utc).isoformat()}
-            if sql.is_sqlite:
-                db.execute(text(insert_sql), insert_params)
-                db.commit()
-                user_id = db.execute(text("SELECT last_insert_rowid()")).fetchone()[0]
-            else:
-                user_id = db.execute(text(insert_sql + " RETURNING id"), insert_params).scalar()  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-                db.commit()
-            user_role = default_role
-            log.info(f"Created OIDC user: {username} ({email})")
-        else:
-            log.warning(f"OIDC user not found and auto-create disabled: {email}")
-            return RedirectResponse(url="/?error=user_not_found", status_code=302)
-
-        access_token = create_access_token(data={
-            "sub": existing._mapping.get("username") if existing else username,
-            "role": user_role,
-        })
-
-        import secrets as _secrets
-        from core.crypto import encrypt as _crypto_encrypt
-        oidc_code = _secrets.token_urlsafe(48)
-        expires_at = (datetime.now(timezone.utc) + timedelta(minutes=2)).isoformat()
-        db.execute(text("INSERT INTO oidc_auth_codes (code, access_token, expires_at) VALUES (:code, :token, :exp)"),
-                   {"code": oidc_code, "token": _crypto_encrypt(access_token), "exp": expires_at})
-        db.commit()
-        return RedirectResponse(url=f"/?oidc_code={oidc_code}", status_code=302)
+        # Provisioning and the auth-code write are synchronous DB work —
+        # run them off the event loop.
+        return await run_in_threadpool(_finish_oidc_login, db, config, oidc_subject, email)
 
     except Exception as e:
         log.error(f"OIDC callback error: {e}", exc_info=True)
@@ -170,7 +187,7 @@ async def oidc_callback(request: Request, code: str = None, state: str = None,
 # ============== OIDC code exchange ==============
 
 @router.post("/auth/oidc/exchange", tags=["Auth"])
-async def oidc_exchange_code(body: dict, request: Request, db: Session = Depends(get_db)):
+def oidc_exchange_code(body: dict, request: Request, db: Session = Depends(get_db)):
     """Exchange a one-time OIDC auth code for a JWT access token."""
     code = body.get("code", "")
     if not code:
@@ -221,7 +238,7 @@ async def oidc_exchange_code(body: dict, request: Request, db: Session = Depends
 # ============== Admin OIDC config ==============
 
 @router.get("/admin/oidc", tags=["Admin"])
-async def get_oidc_config(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def get_oidc_config(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Get full OIDC configuration. Superadmin only — system-wide auth config."""
     row = db.execute(text("SELECT * FROM oidc_config LIMIT 1")).fetchone()
     if not row:
@@ -234,9 +251,8 @@ async def get_oidc_config(current_user: dict = Depends(require_superadmin()), db
 
 
 @router.put("/admin/oidc", tags=["Admin"])
-async def update_oidc_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def update_oidc_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db), data: dict = Depends(get_json_body)):
     """Update OIDC configuration. Superadmin only."""
-    data = await request.json()
     client_secret = data.get("client_secret")
     if client_secret:
         from core.crypto import encrypt
@@ -16,6 +16,7 @@ from core.db_compat import sql
 from core.dependencies import get_current_user, log_audit
 from core.errors import ErrorCode, OdinError
 from core.rbac import require_role
+from core import auth_context, token_cache
 from core.auth import hash_password
 import core.auth as auth_module
 from core.quota import _get_quota_usage
@@ -30,7 +31,7 @@ router = APIRouter()
 # ============== Session Management ==============
 
 @router.get("/sessions", tags=["Sessions"])
-async def list_sessions(request: Request, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def list_sessions(request: Request, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """List active sessions for the current user."""
     rows = db.execute(text(
         "SELECT s.id, s.token_jti, s.ip_address, s.user_agent, s.created_at, s.last_seen_at "
@@ -60,7 +61,7 @@ async def list_sessions(request: Request, current_user: dict = Depends(require_r
 
 
 @router.delete("/sessions/{session_id}", tags=["Sessions"])
-async def revoke_session(session_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def revoke_session(session_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Revoke a specific session."""
     row = db.execute(text("SELECT * FROM active_sessions WHERE id = :id AND user_id = :uid"),
                      {"id": session_id, "uid": current_user["id"]}).fetchone()
@@ -78,11 +79,12 @@ async def revoke_session(session_id: int, current_user: dict = Depends(require_r
                {"jti": row.token_jti, "exp": expires_at})
     db.execute(text("DELETE FROM active_sessions WHERE id = :id"), {"id": session_id})
     db.commit()
+    auth_context.mark_revoked(row.token_jti)
     return {"status": "ok"}
 
 
 @router.delete("/sessions", tags=["Sessions"])
-async def revoke_all_sessions(request: Request, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def revoke_all_sessions(request: Request, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Revoke all sessions except the current one."""
     current_jti = None
     session_cookie = request.cookies.get("session")
@@ -98,7 +100,7 @@ async def revoke_all_sessions(request: Request, current_user: dict = Depends(req
 
     rows = db.execute(text("SELECT token_jti, created_at FROM active_sessions WHERE user_id = :uid"),
                       {"uid": current_user["id"]}).fetchall()
-    count = 0
+    revoked = []
     for r in rows:
         if r.token_jti == current_jti:
             continue
@@ -110,16 +112,19 @@ async def revoke_all_sessions(request: Request, current_user: dict = Depends(req
             expires_at = datetime.now(timezone.utc) + timedelta(hours=24)
         db.execute(text(f"{sql.insert_or_ignore_prefix()} token_blacklist (jti, expires_at) VALUES (:jti, :exp){sql.on_conflict_ignore('jti')}"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                    {"jti": r.token_jti, "exp": expires_at})
-        count += 1
+        revoked.append(r.token_jti)
 
     db.execute(text("DELETE FROM active_sessions WHERE user_id = :uid AND token_jti != :jti"),
                {"uid": current_user["id"], "jti": current_jti or ""})
     db.commit()
+    for jti in revoked:
+        auth_context.mark_revoked(jti)
+    count = len(revoked)
     return {"status": "ok", "revoked": count}
 
 
 @router.get("/admin/sessions", tags=["Sessions"])
-async def admin_list_sessions(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def admin_list_sessions(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin: list all active sessions across all users."""
     if _is_superadmin(current_user):
         rows = db.execute(text(
@@ -141,7 +146,7 @@ async def admin_list_sessions(current_user: dict = Depends(require_role("admin")
 
 
 @router.delete("/admin/sessions/{session_id}", tags=["Sessions"])
-async def admin_revoke_session(session_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def admin_revoke_session(session_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin: force-revoke any session."""
     row = db.execute(text("SELECT * FROM active_sessions WHERE id = :id"), {"id": session_id}).fetchone()
     if not row:
@@ -165,6 +170,7 @@ async def admin_revoke_session(session_id: int, current_user: dict = Depends(req
     db.execute(text("DELETE FROM active_sessions WHERE id = :id"), {"id": session_id})
     log_audit(db, "session_revoked_admin", "session", session_id, f"Admin revoked session for user_id={row.user_id}")
     db.commit()
+    auth_context.mark_revoked(row.token_jti)
     return {"status": "ok"}
 
 
@@ -190,7 +196,7 @@ VALID_SCOPES = {
 
 @router.post("/tokens", tags=["API Tokens"])
 @limiter.limit("10/minute")
-async def create_api_token(request: Request, body: dict, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def create_api_token(request: Request, body: dict, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Create a new scoped API token for the current user."""
     import secrets
     name = body.get("name", "").strip()
@@ -251,7 +257,7 @@ async def create_api_token(request: Request, body: dict, current_user: dict = De
 
 
 @router.get("/tokens", tags=["API Tokens"])
-async def list_api_tokens(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def list_api_tokens(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """List all API tokens for the current user."""
     rows = db.execute(text(
         "SELECT id, name, token_prefix, scopes, expires_at, last_used_at, created_at "
@@ -265,7 +271,7 @@ async def list_api_tokens(current_user: dict = Depends(require_role("viewer")),
 
 
 @router.delete("/tokens/{token_id}", tags=["API Tokens"])
-async def revoke_api_token(token_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def revoke_api_token(token_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Revoke (delete) an API token."""
     row = db.execute(text("SELECT * FROM api_tokens WHERE id = :id AND user_id = :uid"),
                      {"id": token_id, "uid": current_user["id"]}).fetchone()
@@ -278,13 +284,14 @@ async def revoke_api_token(token_id: int, current_user: dict = Depends(require_r
     db.execute(text("DELETE FROM api_tokens WHERE id = :id"), {"id": token_id})
     log_audit(db, "api_token_revoked", "api_token", token_id, f"Token '{row.name}' revoked")
     db.commit()
+    token_cache.invalidate_token(token_id)
     return {"status": "ok"}
 
 
 # ============== Print Quotas ==============
 
 @router.get("/quotas", tags=["Quotas"])
-async def get_my_quota(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def get_my_quota(current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Get current user's quota config and usage."""
     period = current_user.get("quota_period") or "monthly"
     usage = _get_quota_usage(db, current_user["id"], period)
@@ -299,7 +306,7 @@ async def get_my_quota(current_user: dict = Depends(require_role("viewer")), db:
 
 
 @router.get("/admin/quotas", tags=["Quotas"])
-async def admin_list_quotas(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def admin_list_quotas(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin: list all users' quota config and usage."""
     if _is_superadmin(current_user):
         users = db.execute(text(
@@ -331,7 +338,7 @@ class QuotaUpdateRequest(PydanticBaseModel):
 
 
 @router.put("/admin/quotas/{user_id}", tags=["Quotas"])
-async def admin_set_quota(user_id: int, body: QuotaUpdateRequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def admin_set_quota(user_id: int, body: QuotaUpdateRequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin: set quotas for a user."""
     user = db.execute(text("SELECT id, group_id FROM users WHERE id = :id"), {"id": user_id}).fetchone()
     if not user:
@@ -355,13 +362,14 @@ async def admin_set_quota(user_id: int, body: QuotaUpdateRequest, current_user:
 
     log_audit(db, "quota_updated", "user", user_id, f"Quotas updated: {body_data}")
     db.commit()
+    auth_context.invalidate_user(user_id)
     return {"status": "ok"}
 
 
 # ============== GDPR Data Export & Erasure ==============
 
 @router.get("/users/{user_id}/export", tags=["GDPR"])
-async def export_user_data(user_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
+def export_user_data(user_id: int, current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
     """Export all personal data for a user (GDPR Article 20)."""
     if current_user["id"] != user_id and current_user["role"] != "admin":
         raise HTTPException(status_code=403, detail="Can only export your own data")
@@ -411,7 +419,7 @@ async def export_user_data(user_id: int, current_user: dict = Depends(require_ro
 
 
 @router.delete("/users/{user_id}/erase", tags=["GDPR"])
-async def erase_user_data(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def erase_user_data(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Anonymize user data (GDPR Article 17). Admin only. Preserves job records for analytics."""
     user = db.execute(text("SELECT * FROM users WHERE id = :id"), {"id": user_id}).fetchone()
     if not user:
@@ -439,4 +447,6 @@ async def erase_user_data(user_id: int, current_user: dict = Depends(require_rol
 
     log_audit(db, "gdpr_erasure", "user", user_id, f"User data erased (was: {user.username})")
     db.commit()
+    token_cache.invalidate_user(user_id)
+    auth_context.invalidate_user(user_id)
     return {"status": "ok", "message": f"User {user.username} data erased"}
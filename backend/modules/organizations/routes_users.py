@@ -16,6 +16,7 @@ from core.db import get_db
 from core.db_compat import sql
 from core.dependencies import log_audit
 from core.rbac import require_role, require_superadmin
+from core import auth_context, token_cache
 from core.auth_helpers import _validate_password
 from core.auth import hash_password, UserCreate
 from core.models import SystemConfig
@@ -93,7 +94,7 @@ def _send_odin_email(db, to_email: str, subject: str, html_body: str):
 # ============== Users CRUD ==============
 
 @router.get("/users", tags=["Users"])
-async def list_users(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def list_users(current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     if _is_superadmin(current_user):
         users = db.execute(text("SELECT id, username, email, role, is_active, last_login, created_at, group_id FROM users")).fetchall()
     else:
@@ -106,7 +107,7 @@ async def list_users(current_user: dict = Depends(require_role("admin")), db: Se
 
 
 @router.post("/users", tags=["Users"])
-async def create_user(user: UserCreate, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def create_user(user: UserCreate, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     # Org-scoped admin: enforce group assignment
     if not _is_superadmin(current_user):
         admin_gid = current_user["group_id"]
@@ -159,7 +160,7 @@ async def create_user(user: UserCreate, current_user: dict = Depends(require_rol
 
 
 @router.post("/users/{user_id}/reset-password-email", tags=["Users"])
-async def reset_password_email(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def reset_password_email(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Admin action: generate a new random password and email it to the user."""
     import secrets as _secrets
 
@@ -177,6 +178,7 @@ async def reset_password_email(user_id: int, current_user: dict = Depends(requir
     password_hash = hash_password(new_password)
     db.execute(text("UPDATE users SET password_hash = :h WHERE id = :id"), {"h": password_hash, "id": user_id})
     db.commit()
+    auth_context.invalidate_user(user_id)
 
     html = f"""
     <html><body style="font-family: Arial, sans-serif; padding: 20px; background: #1a1a1a; color: #e0e0e0;">
@@ -210,7 +212,7 @@ class UserUpdateRequest(PydanticBaseModel):
 
 
 @router.patch("/users/{user_id}", tags=["Users"])
-async def update_user(user_id: int, body: UserUpdateRequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def update_user(user_id: int, body: UserUpdateRequest, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     updates = body.model_dump(exclude_unset=True)
 
     # Org-scoped admin: verify target user is in their group
@@ -237,6 +239,7 @@ async def update_user(user_id: int, body: UserUpdateRequest, current_user: dict
 
     password_changed = 'password_hash' in updates
     role_changed = 'role' in updates
+    sessions = []
     if updates:
         set_clause = ", ".join(f"{k} = :{k}" for k in updates.keys())
         updates['id'] = user_id
@@ -255,11 +258,15 @@ async def update_user(user_id: int, body: UserUpdateRequest, current_user: dict
                        {"jti": session.token_jti, "exp": expiry})
         db.execute(text("DELETE FROM active_sessions WHERE user_id = :uid"), {"uid": user_id})
     db.commit()
+    # Role / is_active / group changes must not wait out the auth cache TTL.
+    auth_context.invalidate_user(user_id)
+    for session in sessions:
+        auth_context.mark_revoked(session.token_jti)
     return {"status": "updated"}
 
 
 @router.delete("/users/{user_id}", tags=["Users"])
-async def delete_user(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def delete_user(user_id: int, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     if current_user["id"] == user_id:
         raise HTTPException(status_code=400, detail="Cannot delete yourself")
     target = db.execute(text("SELECT role, group_id FROM users WHERE id = :id"), {"id": user_id}).fetchone()
@@ -280,11 +287,13 @@ async def delete_user(user_id: int, current_user: dict = Depends(require_role("a
               {"deleted_username": target_row.username if target_row else str(user_id),
                "actor_user_id": current_user["id"]})
     db.commit()
+    token_cache.invalidate_user(user_id)
+    auth_context.invalidate_user(user_id)
     return {"status": "deleted"}
 
 
 @router.post("/users/import", tags=["Users"])
-async def import_users_csv(
+def import_users_csv(
     file: UploadFile = File(...),
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
@@ -293,7 +302,7 @@ async def import_users_csv(
     if not file.filename.endswith(".csv"):
         raise HTTPException(status_code=400, detail="Only .csv files are accepted")
 
-    content = await file.read()
+    content = file.file.read()
     try:
         text_content = content.decode("utf-8-sig")
     except UnicodeDecodeError:
@@ -380,7 +389,7 @@ async def import_users_csv(
 # ============== Groups ==============
 
 @router.get("/groups", tags=["Groups"])
-async def list_groups(current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def list_groups(current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     require_feature("user_groups")
     if current_user.get("role") == "admin":
         groups = db.execute(text("""
@@ -404,7 +413,7 @@ async def list_groups(current_user: dict = Depends(require_role("operator")), db
 
 
 @router.post("/groups", tags=["Groups"])
-async def create_group(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def create_group(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     require_feature("user_groups")
     name = body.get("name", "").strip()
     if not name:
@@ -429,7 +438,7 @@ async def create_group(body: dict, current_user: dict = Depends(require_superadm
 
 
 @router.get("/groups/{group_id}", tags=["Groups"])
-async def get_group(group_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def get_group(group_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     require_feature("user_groups")
     if current_user.get("role") != "admin" and current_user.get("group_id") != group_id:
         raise HTTPException(status_code=403, detail="Access denied")
@@ -448,7 +457,7 @@ async def get_group(group_id: int, current_user: dict = Depends(require_role("op
 
 
 @router.patch("/groups/{group_id}", tags=["Groups"])
-async def update_group(group_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def update_group(group_id: int, body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     require_feature("user_groups")
     if not _is_superadmin(current_user) and current_user.get("group_id") != group_id:
         raise HTTPException(status_code=403, detail="Can only manage your own group")
@@ -476,7 +485,7 @@ async def update_group(group_id: int, body: dict, current_user: dict = Depends(r
 
 
 @router.delete("/groups/{group_id}", tags=["Groups"])
-async def delete_group(group_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def delete_group(group_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     require_feature("user_groups")
     existing = db.execute(text("SELECT id FROM groups WHERE id = :id"), {"id": group_id}).fetchone()
     if not existing:
@@ -484,4 +493,5 @@ async def delete_group(group_id: int, current_user: dict = Depends(require_super
     db.execute(text("UPDATE users SET group_id = NULL WHERE group_id = :gid"), {"gid": group_id})
     db.execute(text("DELETE FROM groups WHERE id = :id"), {"id": group_id})
     db.commit()
+    auth_context.invalidate_user()  # every member's group_id changed
     return {"status": "deleted"}
@@ -23,6 +23,9 @@ TABLES = [
     "printer_telemetry",
     "hms_error_history",
     "ams_telemetry",
+    "printer_telemetry_rollup",
+    "ams_telemetry_rollup",
+    "telemetry_rollup_state",
 ]
 
 PUBLISHES = [
@@ -43,10 +46,7 @@ IMPLEMENTS = ["PrinterStateProvider"]
 REQUIRES = ["NotificationDispatcher", "OrgSettingsProvider"]
 
 DAEMONS = [
-    "printers.monitors.mqtt_monitor",
-    "printers.monitors.moonraker_monitor",
-    "printers.monitors.prusalink_monitor",
-    "printers.monitors.elegoo_monitor",
+    "printers.monitors.monitor_host",
 ]
 
 
@@ -64,5 +64,9 @@ def register(app, registry) -> None:
 
 def register_subscribers(bus) -> None:
     """Register all printers module event subscribers."""
-    from modules.printers import smart_plug
+    from core import ws_hub
+    from modules.printers import live_status, smart_plug
     smart_plug.register_subscribers(bus)
+    # Monitor telemetry feeds the live-status snapshots (not a bus event —
+    # it arrives through ws_hub from the monitor daemons).
+    ws_hub.observe("printer_telemetry", live_status.record_monitor_event)
@@ -11,6 +11,8 @@ Connects to Klipper printers via Moonraker REST API for:
 - Nozzle diameter from config
 - Job control (start, pause, resume, cancel)
 - Webcam URL discovery
+- Live status over the websocket (printer.objects.subscribe, see
+  moonraker_ws.py), with HTTP polling whenever the socket is down
 
 Tested with:
 - Anycubic Kobra S1 running Rinkhals (Moonraker on port 80)
@@ -32,13 +34,15 @@ import json
 import os
 import time
 import logging
-from typing import Optional, Dict, Any, List
+from typing import Callable, Optional, Dict, Any, List
 from dataclasses import dataclass, field
 from enum import Enum
 from urllib.request import urlopen, Request
 from urllib.error import URLError, HTTPError
 from urllib.parse import urlencode
 
+from modules.printers.adapters.moonraker_ws import MoonrakerSubscription
+
 log = logging.getLogger("moonraker_adapter")
 
 
@@ -136,7 +140,8 @@ class MoonrakerPrinter:
     Client for Moonraker REST API.
     
     Handles all communication with a single Moonraker-based printer.
-    No persistent connection needed — each call is a simple HTTP request.
+    Each call is a simple HTTP request. Optionally, subscribe() keeps one
+    websocket open so get_status() is served from pushed updates.
     """
     
     # Sensor name patterns that indicate MMU/enclosure environment
@@ -157,6 +162,8 @@ class MoonrakerPrinter:
         self._env_sensors: List[str] = []            # subset of above matching enclosure keywords
         self._filament_sensors: List[str] = []       # filament_switch_sensor / filament_motion_sensor
         self._has_fan: bool = False
+        # Websocket subscription (subscribe())
+        self._subscription = MoonrakerSubscription(self)
     
     # ==================== Connection ====================
     
@@ -189,6 +196,10 @@ class MoonrakerPrinter:
 
             self._connected = True
             log.info(f"Connected to {self._device_type or 'Moonraker'} at {self.host}")
+
+            # Rediscovered objects replace the websocket subscription
+            if self._subscription.running:
+                self._subscription.send_subscribe()
             return True
             
         except Exception as e:
@@ -196,13 +207,19 @@ class MoonrakerPrinter:
             return False
     
     def disconnect(self):
-        """No persistent connection to close, just mark disconnected."""
+        """Mark disconnected and close the websocket, if subscribed."""
         self._connected = False
+        self._subscription.close()
         log.info(f"Disconnected from {self.host}")
     
     @property
     def connected(self) -> bool:
         return self._connected
+
+    @property
+    def subscribed(self) -> bool:
+        """True while get_status() is served from websocket pushes."""
+        return self._subscription.live
     
     # ==================== Object Discovery ====================
 
@@ -258,14 +275,8 @@ class MoonrakerPrinter:
 
     # ==================== Status ====================
     
-    def get_status(self) -> MoonrakerStatus:
-        """Get complete printer status in one call."""
-        status = MoonrakerStatus()
-        status.device_type = self._device_type
-        status.webcam_stream_url = self._webcam_stream
-        status.webcam_snapshot_url = self._webcam_snapshot
-        
-        # Query all objects we care about in one request
+    def _status_objects(self) -> List[str]:
+        """Klipper objects we query (HTTP) or subscribe to (websocket)."""
         objects = [
             "heater_bed",
             "extruder",
@@ -281,115 +292,138 @@ class MoonrakerPrinter:
             objects.append("fan")
         objects.extend(self._temperature_sensors)
         objects.extend(self._filament_sensors)
-        query = "&".join(objects)
-        
+        return objects
+
+    def get_status(self) -> MoonrakerStatus:
+        """Get complete printer status.
+
+        While the websocket subscription is live this is built from the
+        pushed object state, with no request. Otherwise it is one
+        /printer/objects/query call.
+        """
+        snapshot = self._subscription.snapshot()
         try:
+            if snapshot is not None:
+                return self._parse_status(snapshot)
+            query = "&".join(self._status_objects())
             data = self._get(f"/printer/objects/query?{query}")
             if not data or "result" not in data:
+                status = self._new_status()
                 status.state = MoonrakerState.DISCONNECTED
                 status.internal_state = "OFFLINE"
                 return status
-            
-            result = data["result"]["status"]
-            status.raw_data = result
-            
-            # Temperatures
-            bed = result.get("heater_bed", {})
-            status.bed_temp = bed.get("temperature", 0.0)
-            status.bed_target = bed.get("target", 0.0)
-            
-            extruder = result.get("extruder", {})
-            status.nozzle_temp = extruder.get("temperature", 0.0)
-            status.nozzle_target = extruder.get("target", 0.0)
-            
-            # Print stats
-            ps = result.get("print_stats", {})
-            status.filename = ps.get("filename", "")
-            status.print_duration = ps.get("print_duration", 0.0)
-            status.filament_used_mm = ps.get("filament_used", 0.0)
-            
-            layer_info = ps.get("info", {})
-            status.current_layer = layer_info.get("current_layer", 0)
-            status.total_layers = layer_info.get("total_layer", 0)
-            
-            # Progress from virtual_sdcard (more reliable than display_status)
-            vsd = result.get("virtual_sdcard", {})
-            if vsd:
-                status.progress_percent = round(vsd.get("progress", 0.0) * 100, 1)
-            
-            # State mapping
-            print_state = ps.get("state", "standby").lower()
-            idle_state = result.get("idle_timeout", {}).get("state", "").lower()
-            
-            if print_state == "printing":
-                status.state = MoonrakerState.PRINTING
-            elif print_state == "paused":
-                status.state = MoonrakerState.PAUSED
-            elif print_state == "error":
-                status.state = MoonrakerState.ERROR
-            elif print_state in ("standby", "complete", "cancelled"):
-                status.state = MoonrakerState.READY
-            else:
-                status.state = MoonrakerState.STANDBY
-            
-            status.internal_state = MOONRAKER_TO_INTERNAL_STATE.get(
-                status.state, "IDLE"
-            )
-            
-            # MMU / ACE filament slots
-            mmu = result.get("mmu", {})
-            if mmu and mmu.get("enabled"):
-                status.filament_slots = self._parse_mmu_slots(mmu)
-
-            # Fan speed (Klipper reports 0.0-1.0, convert to 0-100)
-            fan_data = result.get("fan", {})
-            if fan_data:
-                status.fan_speed = round(fan_data.get("speed", 0.0) * 100)
-
-            # Speed / extrusion factors
-            gcode_move = result.get("gcode_move", {})
-            if gcode_move:
-                status.speed_factor = gcode_move.get("speed_factor", 1.0)
-                status.extrude_factor = gcode_move.get("extrude_factor", 1.0)
-
-            # Nozzle diameter (cached on connect)
-            status.nozzle_diameter = self._nozzle_diameter
-
-            # Error message from webhooks
-            webhooks = result.get("webhooks", {})
-            if webhooks:
-                status.error_message = webhooks.get("state_message", "")
-
-            # Temperature sensors (chamber + environment)
-            for sensor_name in self._temperature_sensors:
-                sensor_data = result.get(sensor_name, {})
-                if sensor_data:
-                    temp = sensor_data.get("temperature")
-                    if temp is not None:
-                        short_name = sensor_name.split(" ", 1)[1] if " " in sensor_name else sensor_name
-                        # First chamber-like sensor becomes chamber_temp
-                        if status.chamber_temp is None and any(
-                            kw in short_name.lower() for kw in ("chamber", "enclosure")
-                        ):
-                            status.chamber_temp = round(temp, 1)
-                        # All env sensors go into environment_sensors dict
-                        if sensor_name in self._env_sensors:
-                            status.environment_sensors[short_name] = round(temp, 1)
-
-            # Filament sensor(s)
-            for sensor_name in self._filament_sensors:
-                sensor_data = result.get(sensor_name, {})
-                if sensor_data and "filament_detected" in sensor_data:
-                    status.filament_detected = sensor_data["filament_detected"]
-                    break  # Use first sensor found
-
+            return self._parse_status(data["result"]["status"])
         except Exception as e:
             log.error(f"Failed to get status from {self.host}: {e}")
+            status = self._new_status()
             status.state = MoonrakerState.DISCONNECTED
             status.internal_state = "OFFLINE"
+            return status
+
+    def _new_status(self) -> MoonrakerStatus:
+        status = MoonrakerStatus()
+        status.device_type = self._device_type
+        status.webcam_stream_url = self._webcam_stream
+        status.webcam_snapshot_url = self._webcam_snapshot
+        return status
+
+    def _parse_status(self, result: Dict[str, Any]) -> MoonrakerStatus:
+        """Build a MoonrakerStatus from Klipper object state."""
+        status = self._new_status()
+        status.raw_data = result
+
+        # Temperatures
+        bed = result.get("heater_bed", {})
+        status.bed_temp = bed.get("temperature", 0.0)
+        status.bed_target = bed.get("target", 0.0)
+        
+        extruder = result.get("extruder", {})
+        status.nozzle_temp = extruder.get("temperature", 0.0)
+        status.nozzle_target = extruder.get("target", 0.0)
+        
+        # Print stats
+        ps = result.get("print_stats", {})
+        status.filename = ps.get("filename", "")
+        status.print_duration = ps.get("print_duration", 0.0)
+        status.filament_used_mm = ps.get("filament_used", 0.0)
+        
+        layer_info = ps.get("info", {})
+        status.current_layer = layer_info.get("current_layer", 0)
+        status.total_layers = layer_info.get("total_layer", 0)
         
+        # Progress from virtual_sdcard (more reliable than display_status)
+        vsd = result.get("virtual_sdcard", {})
+        if vsd:
+            status.progress_percent = round(vsd.get("progress", 0.0) * 100, 1)
+        
+        # State mapping
+        print_state = ps.get("state", "standby").lower()
+        idle_state = result.get("idle_timeout", {}).get("state", "").lower()
+        
+        if print_state == "printing":
+            status.state = MoonrakerState.PRINTING
+        elif print_state == "paused":
+            status.state = MoonrakerState.PAUSED
+        elif print_state == "error":
+            status.state = MoonrakerState.ERROR
+        elif print_state in ("standby", "complete", "cancelled"):
+            status.state = MoonrakerState.READY
+        else:
+            status.state = MoonrakerState.STANDBY
+        
+        status.internal_state = MOONRAKER_TO_INTERNAL_STATE.get(
+            status.state, "IDLE"
+        )
+        
+        # MMU / ACE filament slots
+        mmu = result.get("mmu", {})
+        if mmu and mmu.get("enabled"):
+            status.filament_slots = self._parse_mmu_slots(mmu)
+
+        # Fan speed (Klipper reports 0.0-1.0, convert to 0-100)
+        fan_data = result.get("fan", {})
+        if fan_data:
+            status.fan_speed = round(fan_data.get("speed", 0.0) * 100)
+
+        # Speed / extrusion factors
+        gcode_move = result.get("gcode_move", {})
+        if gcode_move:
+            status.speed_factor = gcode_move.get("speed_factor", 1.0)
+            status.extrude_factor = gcode_move.get("extrude_factor", 1.0)
+
+        # Nozzle diameter (cached on connect)
+        status.nozzle_diameter = self._nozzle_diameter
+
+        # Error message from webhooks
+        webhooks = result.get("webhooks", {})
+        if webhooks:
+            status.error_message = webhooks.get("state_message", "")
+
+        # Temperature sensors (chamber + environment)
+        for sensor_name in self._temperature_sensors:
+            sensor_data = result.get(sensor_name, {})
+            if sensor_data:
+                temp = sensor_data.get("temperature")
+                if temp is not None:
+                    short_name = sensor_name.split(" ", 1)[1] if " " in sensor_name else sensor_name
+                    # First chamber-like sensor becomes chamber_temp
+                    if status.chamber_temp is None and any(
+                        kw in short_name.lower() for kw in ("chamber", "enclosure")
+                    ):
+                        status.chamber_temp = round(temp, 1)
+                    # All env sensors go into environment_sensors dict
+                    if sensor_name in self._env_sensors:
+                        status.environment_sensors[short_name] = round(temp, 1)
+
+        # Filament sensor(s)
+        for sensor_name in self._filament_sensors:
+            sensor_data = result.get(sensor_name, {})
+            if sensor_data and "filament_detected" in sensor_data:
+                status.filament_detected = sensor_data["filament_detected"]
+                break  # Use first sensor found
+
         return status
-    
+
     def _parse_mmu_slots(self, mmu: Dict) -> List[MoonrakerFilamentSlot]:
         """Parse MMU/ACE gate data into filament slots."""
         slots = []
@@ -414,6 +448,23 @@ class MoonrakerPrinter:
         
         return slots
     
+    # ==================== Subscription ====================
+
+    def subscribe(self, on_change: Optional[Callable[[], None]] = None) -> bool:
+        """Keep status current over Moonraker's JSON-RPC websocket.
+
+        Opens ws://host/websocket and subscribes to the objects get_status()
+        reads. Moonraker then pushes only changed fields, which are merged
+        into the cached object state; get_status() serves that without a
+        request. `on_change` is called on the websocket thread when a job,
+        error or runout field changes.
+
+        Safe to call every poll: a running socket is left alone, a dropped
+        one is reopened at most every RESUBSCRIBE_INTERVAL. Until it is
+        back, get_status() polls over HTTP.
+        """
+        return self._subscription.start(on_change)
+
     # ==================== Job Control ====================
     
     def upload_file(self, local_path: str, remote_filename: str = None) -> bool:
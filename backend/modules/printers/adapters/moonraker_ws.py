@@ -0,0 +1,236 @@
+"""
+O.D.I.N. — Moonraker websocket status subscription
+
+Live status for MoonrakerPrinter over Moonraker's JSON-RPC websocket
+(ws://host/websocket), split out of moonraker.py:
+
+- MoonrakerSubscription subscribes to the objects get_status() reads
+  (printer.objects.subscribe) and merges notify_status_update deltas into
+  cached object state, so get_status() needs no request while it is live.
+  A dropped socket or a Klippy disconnect drops back to HTTP polling;
+  notify_klippy_ready resubscribes. The monitor side is
+  monitors/moonraker_feed.py.
+
+ODIN_MOONRAKER_SUBSCRIBE=0 turns the subscription off (HTTP polling only).
+"""
+
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+log = logging.getLogger("moonraker_adapter")
+
+# Subscribe over the websocket; 0 = HTTP polling only.
+SUBSCRIBE = os.environ.get("ODIN_MOONRAKER_SUBSCRIBE", "1") != "0"
+RESUBSCRIBE_INTERVAL = 30   # seconds between websocket reconnect attempts
+
+# Pushed fields worth processing at once rather than on the next monitor
+# tick: job start/end, pause/resume, klippy errors. Filament sensors'
+# filament_detected is added per printer.
+_PUSH_TRIGGERS = {
+    "print_stats": ("state", "filename"),
+    "idle_timeout": ("state",),
+    "webhooks": ("state",),
+}
+
+
+def _merge(target: Dict[str, Any], delta: Dict[str, Any]):
+    """Merge a Moonraker status delta in place (nested dicts by key)."""
+    for key, value in delta.items():
+        if isinstance(value, dict) and isinstance(target.get(key), dict):
+            _merge(target[key], value)
+        else:
+            target[key] = value
+
+
+class MoonrakerSubscription:
+    """One printer's websocket and the Klipper object state it keeps current."""
+
+    def __init__(self, printer):
+        self.printer = printer               # MoonrakerPrinter
+        self.ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self.objects: Dict[str, Any] = {}    # merged Klipper object state
+        self.live = False                    # subscribed and receiving deltas
+        self._rpc_id = 0
+        self._subscribe_id: Optional[int] = None
+        self._retry_at = 0.0
+        self.on_change: Optional[Callable[[], None]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def snapshot(self) -> Optional[Dict[str, Any]]:
+        """A copy of the object state while live, else None."""
+        with self._lock:
+            return copy.deepcopy(self.objects) if self.live else None
+
+    def start(self, on_change: Optional[Callable[[], None]] = None) -> bool:
+        """Open the websocket unless it is running; see MoonrakerPrinter.subscribe()."""
+        if on_change is not None:
+            self.on_change = on_change
+        if self.running:
+            return True
+        now = time.monotonic()
+        if now < self._retry_at:
+            return False
+        self._retry_at = now + RESUBSCRIBE_INTERVAL
+
+        try:
+            import websocket
+        except ImportError:
+            log.warning("websocket-client not installed; polling Moonraker over HTTP")
+            self._retry_at = float("inf")
+            return False
+
+        host, base_url = self.printer.host, self.printer.base_url
+        ws_url = f"ws://{base_url[len('http://'):]}/websocket"  # nosemgrep: javascript.lang.security.detect-insecure-websocket.detect-insecure-websocket -- by design — Moonraker on the LAN serves plain ws:// alongside its plain http:// API
+        # ITAR guard — same rationale as MoonrakerPrinter._get.
+        try:
+            from core.itar import enforce_request_destination, ItarOutboundBlocked
+            enforce_request_destination(base_url)
+        except ItarOutboundBlocked as exc:
+            log.warning("moonraker: ITAR blocked %s: %s", ws_url, exc)
+            return False
+
+        api_key = self.printer.api_key
+        try:
+            self.ws = websocket.WebSocketApp(
+                ws_url,
+                header=[f"X-Api-Key: {api_key}"] if api_key else None,
+                on_open=self._on_ws_open,
+                on_message=self._on_ws_message,
+                on_error=self._on_ws_error,
+                on_close=self._on_ws_close,
+            )
+            self._thread = threading.Thread(
+                target=self.ws.run_forever,
+                kwargs={"ping_interval": 10, "ping_timeout": 5},
+                name=f"moonraker-ws-{host}",
+                daemon=True,
+            )
+            self._thread.start()
+            return True
+        except Exception as e:
+            log.warning(f"Moonraker websocket failed to {host}: {e}")
+            return False
+
+    def close(self):
+        self._set_live(False)
+        if self.ws is not None:
+            try:
+                self.ws.close()
+            except Exception as e:
+                log.debug(f"Error closing Moonraker websocket: {e}")
+
+    def send_subscribe(self):
+        """(Re)issue printer.objects.subscribe; replaces any earlier one."""
+        ws = self.ws
+        if ws is None:
+            return
+        self._rpc_id += 1
+        self._subscribe_id = self._rpc_id
+        try:
+            ws.send(json.dumps({
+                "jsonrpc": "2.0",
+                "method": "printer.objects.subscribe",
+                "params": {"objects": {name: None for name in self.printer._status_objects()}},
+                "id": self._subscribe_id,
+            }))
+        except Exception as e:
+            log.debug(f"Moonraker subscribe send failed on {self.printer.host}: {e}")
+
+    def _set_live(self, live: bool):
+        with self._lock:
+            self.live = live
+            if not live:
+                self.objects = {}
+
+    def _notify(self):
+        callback = self.on_change
+        if callback is None:
+            return
+        try:
+            callback()
+        except Exception as e:
+            log.warning(f"Moonraker status callback failed for {self.printer.host}: {e}")
+
+    def _on_ws_open(self, ws):
+        log.info(f"Moonraker websocket connected to {self.printer.host}")
+        self.send_subscribe()
+
+    def _on_ws_close(self, ws, close_status_code, close_msg):
+        if self.live:
+            log.info(f"Moonraker websocket to {self.printer.host} closed, polling over HTTP")
+        self._set_live(False)
+
+    def _on_ws_error(self, ws, error):
+        log.debug(f"Moonraker websocket error from {self.printer.host}: {error}")
+
+    def _on_ws_message(self, ws, message):
+        """Dispatch one JSON-RPC message from Moonraker."""
+        try:
+            msg = json.loads(message)
+        except (TypeError, ValueError):
+            return
+        if not isinstance(msg, dict):
+            return
+
+        method = msg.get("method")
+        if method == "notify_status_update":
+            params = msg.get("params") or [{}]
+            if isinstance(params[0], dict):
+                self._apply_delta(params[0])
+        elif method is None and msg.get("id") is not None and msg.get("id") == self._subscribe_id:
+            self._on_subscribed(msg)
+        elif method == "notify_klippy_ready":
+            # Klipper restarted; its subscriptions did not survive.
+            self.send_subscribe()
+        elif method in ("notify_klippy_disconnected", "notify_klippy_shutdown"):
+            self._set_live(False)
+            self._notify()
+
+    def _on_subscribed(self, msg: Dict):
+        result = msg.get("result")
+        if not isinstance(result, dict):
+            # Typically Klippy not ready yet; notify_klippy_ready retries.
+            log.info(f"Moonraker subscribe on {self.printer.host} not accepted: {msg.get('error')}")
+            self._set_live(False)
+            return
+        with self._lock:
+            was_live = self.live
+            self.objects = result.get("status") or {}
+            self.live = True
+        if not was_live:
+            log.info(f"Subscribed to status updates on {self.printer.host}")
+        self._notify()
+
+    def _apply_delta(self, delta: Dict[str, Any]):
+        """Merge a notify_status_update delta into the cached object state."""
+        with self._lock:
+            if not self.live:
+                return
+            significant = self._is_significant(delta)
+            _merge(self.objects, delta)
+        if significant:
+            self._notify()
+
+    def _is_significant(self, delta: Dict[str, Any]) -> bool:
+        triggers = dict(_PUSH_TRIGGERS)
+        for name in self.printer._filament_sensors:
+            triggers[name] = ("filament_detected",)
+        for obj, fields in triggers.items():
+            changed = delta.get(obj)
+            if not changed:
+                continue
+            current = self.objects.get(obj, {})
+            if any(f in changed and changed[f] != current.get(f) for f in fields):
+                return True
+        return False
+
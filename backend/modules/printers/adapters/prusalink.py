@@ -17,6 +17,7 @@ Architecture note:
 
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from requests.auth import HTTPDigestAuth
 from dataclasses import dataclass, field
 from typing import Dict, Any, List, Optional
@@ -24,6 +25,13 @@ from enum import Enum
 
 log = logging.getLogger(__name__)
 
+# One keep-alive pool for every printer's status polls instead of a new
+# TCP connection per request. pool_connections is the number of hosts
+# kept; size it for a large farm.
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=256, pool_maxsize=2))
+_session.mount("https://", HTTPAdapter(pool_connections=256, pool_maxsize=2))
+
 
 class PrusaLinkState(Enum):
     IDLE = "IDLE"
@@ -90,6 +98,9 @@ class PrusaLinkPrinter:
         self.api_key = api_key
         self.base_url = f"http://{host}:{port}"
         self.timeout = 10
+        # Reused so the digest nonce carries over between polls — a fresh
+        # HTTPDigestAuth pays a 401 challenge round trip on every request.
+        self._auth = HTTPDigestAuth(username, password)
 
     def _get(self, path: str) -> Optional[Dict]:
         """Make authenticated GET request to PrusaLink."""
@@ -110,14 +121,10 @@ class PrusaLinkPrinter:
             if self.api_key:
                 # API key auth (X-Api-Key header)
                 headers["X-Api-Key"] = self.api_key
-                resp = requests.get(url, headers=headers, timeout=self.timeout)
+                resp = _session.get(url, headers=headers, timeout=self.timeout)
             else:
                 # HTTP Digest auth (username + password)
-                resp = requests.get(
-                    url,
-                    auth=HTTPDigestAuth(self.username, self.password),
-                    timeout=self.timeout
-                )
+                resp = _session.get(url, auth=self._auth, timeout=self.timeout)
 
             if resp.status_code == 200:
                 return resp.json()
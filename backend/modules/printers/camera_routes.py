@@ -18,6 +18,7 @@ import tempfile
 
 import httpx
 from fastapi import APIRouter, Body, Depends, HTTPException, Query, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -428,8 +429,14 @@ def get_camera_stream(printer_id: int, db: Session = Depends(get_db), current_us
 
 @router.post("/cameras/{printer_id}/webrtc", tags=["Cameras"])
 async def camera_webrtc(printer_id: int, request: Request, db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
-    """Proxy WebRTC signaling to go2rtc."""
-    printer = db.query(Printer).filter(Printer.id == printer_id).first()
+    """Proxy WebRTC signaling to go2rtc.
+
+    Async for the signaling round-trips; the DB reads and go2rtc config
+    sync run in the threadpool so they don't stall the event loop.
+    """
+    printer = await run_in_threadpool(
+        lambda: db.query(Printer).filter(Printer.id == printer_id).first()
+    )
     if not printer:
         raise HTTPException(status_code=404, detail="Printer not found")
     if not check_org_access(current_user, printer.org_id) and not printer.shared:
@@ -453,11 +460,11 @@ async def camera_webrtc(printer_id: int, request: Request, db: Session = Depends
             if streams_resp.status_code == 200:
                 streams = streams_resp.json()
                 if stream_name not in streams:
-                    sync_go2rtc_config(db)
+                    await run_in_threadpool(sync_go2rtc_config, db)
     except Exception:
         # go2rtc not reachable — write config but don't force a restart
         # (it may already be restarting). The client will retry.
-        sync_go2rtc_config(db)
+        await run_in_threadpool(sync_go2rtc_config, db)
 
     try:
         async with httpx.AsyncClient() as client:
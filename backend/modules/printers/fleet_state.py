@@ -0,0 +1,263 @@
+"""Fleet state store — batched, dirty-column writes of live printer state.
+
+Every monitor used to issue its own wide `UPDATE printers SET last_seen=…,
+bed_temp=…, …` per printer every 10 seconds, each in its own transaction
+(and the Bambu monitor read `lights_toggled_at` first). On SQLite that is
+one write lock and one fsync per printer per tick, mostly rewriting
+values that hadn't changed.
+
+Monitors now call `update()` with the values they would have written.
+The store keeps the latest values per printer in memory and, once per
+_FLUSH_INTERVAL, writes every printer's *changed* columns in a single
+transaction:
+
+  - A column is written only if it differs from what this process last
+    wrote for that printer.
+  - `last_seen` is refreshed at most every _LAST_SEEN_REFRESH seconds —
+    comfortably inside the 90s online threshold readers use.
+  - Every printer gets a full rewrite every _FULL_WRITE_INTERVAL, so a
+    column changed by another writer (a route, error_handling, the vision
+    daemon) is brought back in line with the printer within a minute,
+    as it used to be on every tick.
+  - `lights_on` keeps its 20s post-toggle cooldown: the store reads
+    `lights_toggled_at` for the printers whose lights changed, in the
+    same transaction, instead of once per printer per tick.
+
+The store is per process (one per monitor daemon). `snapshot()` serves
+in-process readers; the API process reads the same values from the
+`printer_telemetry` events the monitors push (see live_status.py).
+"""
+
+import atexit
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import text
+
+from core.db_compat import sql
+
+log = logging.getLogger("fleet_state")
+
+_FLUSH_INTERVAL = 10.0
+_LAST_SEEN_REFRESH = 30.0
+_FULL_WRITE_INTERVAL = 60.0
+_LIGHTS_COOLDOWN_SECONDS = 20
+
+# Columns monitors may write through the store. Anything else is a bug.
+COLUMNS = frozenset({
+    "bed_temp", "bed_target_temp", "nozzle_temp", "nozzle_target_temp",
+    "gcode_state", "print_stage", "hms_errors", "lights_on",
+    "nozzle_type", "nozzle_diameter", "fan_speed", "machine_type",
+})
+
+
+class _PrinterState:
+    __slots__ = ("values", "written", "dirty", "seen", "updated", "last_seen_written", "full_written")
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.written: Dict[str, Any] = {}
+        self.dirty: set = set()
+        self.seen = False               # heartbeat since last_seen was written
+        self.updated = 0.0              # monotonic time of the last update()
+        self.last_seen_written = 0.0    # monotonic
+        self.full_written = 0.0         # monotonic
+
+
+class FleetStateStore:
+    def __init__(self, engine=None, autoflush: bool = True):
+        self._engine = engine
+        self._autoflush = autoflush
+        self._printers: Dict[int, _PrinterState] = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # ---- writers ----
+
+    def update(self, printer_id: int, fields: Dict[str, Any], nullable: Iterable[str] = ()) -> None:
+        """Record a heartbeat and the printer's current column values.
+
+        A None value leaves the column as it is, unless the column is in
+        `nullable` — then None is a real value and clears it.
+        """
+        nullable = set(nullable)
+        unknown = set(fields) - COLUMNS
+        if unknown:
+            raise ValueError(f"fleet_state: unknown printers columns {sorted(unknown)}")
+        with self._lock:
+            state = self._printers.setdefault(printer_id, _PrinterState())
+            state.seen = True
+            state.updated = time.monotonic()
+            for col, value in fields.items():
+                if value is None and col not in nullable:
+                    continue
+                state.values[col] = value
+                if col not in state.written or state.written[col] != value:
+                    state.dirty.add(col)
+        self._ensure_flusher()
+
+    def forget(self, printer_id: int) -> None:
+        with self._lock:
+            self._printers.pop(printer_id, None)
+
+    # ---- readers ----
+
+    def snapshot(self, printer_id: Optional[int] = None):
+        """Latest values for one printer (dict) or all of them ({id: dict})."""
+        with self._lock:
+            if printer_id is not None:
+                state = self._printers.get(printer_id)
+                return dict(state.values) if state else None
+            return {pid: dict(s.values) for pid, s in self._printers.items()}
+
+    # ---- flushing ----
+
+    def flush(self) -> int:
+        """Write pending changes in one transaction. Returns rows updated."""
+        with self._flush_lock:
+            now = time.monotonic()
+            with self._lock:
+                batch = self._collect(now)
+            if not batch:
+                return 0
+            try:
+                with self._get_engine().begin() as conn:
+                    self._apply_lights_cooldown(conn, batch)
+                    groups: Dict[tuple, list] = {}
+                    for pid, entry in batch.items():
+                        cols = entry["cols"]
+                        if not cols and not entry["touch"]:
+                            continue
+                        groups.setdefault((tuple(sorted(cols)), entry["touch"]), []).append(
+                            {**cols, "pid": pid}
+                        )
+                    for (cols, touch), rows in groups.items():
+                        sets = [f"{c}=:{c}" for c in cols]
+                        if touch:
+                            sets.insert(0, f"last_seen={sql.now()}")
+                        conn.execute(
+                            text(f"UPDATE printers SET {', '.join(sets)} WHERE id=:pid"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — column names come from the COLUMNS allowlist, values are bound
+                            rows,
+                        )
+            except Exception as e:
+                log.warning(f"fleet state flush failed, will retry: {e}")
+                with self._lock:
+                    self._restore(batch)
+                return 0
+            with self._lock:
+                self._commit(batch, now)
+            return sum(1 for entry in batch.values() if entry["cols"] or entry["touch"])
+
+    def _collect(self, now: float) -> Dict[int, dict]:
+        """Pick what to write for each printer and clear its dirty set."""
+        batch = {}
+        for pid, state in self._printers.items():
+            # Full rewrites only for printers still reporting — a silent
+            # printer must not keep overwriting whatever marked it offline.
+            full = (
+                bool(state.values)
+                and now - state.full_written >= _FULL_WRITE_INTERVAL
+                and now - state.updated < _FULL_WRITE_INTERVAL
+            )
+            cols = dict(state.values) if full else {c: state.values[c] for c in state.dirty}
+            touch = state.seen and now - state.last_seen_written >= _LAST_SEEN_REFRESH
+            if not cols and not touch:
+                continue
+            batch[pid] = {"cols": cols, "touch": touch, "full": full, "held": False}
+            state.dirty.difference_update(cols)
+            if touch:
+                state.seen = False
+        return batch
+
+    def _apply_lights_cooldown(self, conn, batch: Dict[int, dict]) -> None:
+        pids = [pid for pid, entry in batch.items() if "lights_on" in entry["cols"]]
+        if not pids:
+            return
+        params = {f"p{i}": pid for i, pid in enumerate(pids)}
+        rows = conn.execute(
+            text(f"SELECT id, lights_toggled_at FROM printers WHERE id IN ({', '.join(':' + k for k in params)})"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — only generated bind-parameter names are interpolated
+            params,
+        ).fetchall()
+        cutoff = datetime.now(timezone.utc) - timedelta(seconds=_LIGHTS_COOLDOWN_SECONDS)
+        for pid, toggled_at in rows:
+            if toggled_at is None:
+                continue
+            try:
+                if isinstance(toggled_at, str):
+                    toggled_at = datetime.fromisoformat(toggled_at)
+                if toggled_at.tzinfo is None:
+                    toggled_at = toggled_at.replace(tzinfo=timezone.utc)
+            except ValueError as e:
+                log.debug(f"Failed to parse lights toggle cooldown: {e}")
+                continue
+            if toggled_at > cutoff:
+                # Toggled via the API moments ago — don't overwrite it with
+                # a report from before the printer applied the toggle.
+                del batch[pid]["cols"]["lights_on"]
+                batch[pid]["held"] = True
+
+    def _restore(self, batch: Dict[int, dict]) -> None:
+        for pid, entry in batch.items():
+            state = self._printers.get(pid)
+            if state is None:
+                continue
+            state.dirty.update(c for c in entry["cols"] if c in state.values)
+            if entry["held"]:
+                state.dirty.add("lights_on")
+            state.seen = state.seen or entry["touch"]
+
+    def _commit(self, batch: Dict[int, dict], now: float) -> None:
+        for pid, entry in batch.items():
+            state = self._printers.get(pid)
+            if state is None:
+                continue
+            state.written.update(entry["cols"])
+            if entry["held"]:
+                state.dirty.add("lights_on")  # retry after the cooldown
+            if entry["touch"]:
+                state.last_seen_written = now
+            if entry["full"]:
+                state.full_written = now
+
+    # ---- background flusher ----
+
+    def _get_engine(self):
+        if self._engine is None:
+            from core.db import engine
+            self._engine = engine
+        return self._engine
+
+    def _ensure_flusher(self) -> None:
+        if self._flusher is not None or not self._autoflush:
+            return
+        with self._flush_lock:
+            if self._flusher is not None:
+                return
+            self._flusher = threading.Thread(target=self._run, name="fleet-state-flush", daemon=True)
+            self._flusher.start()
+            atexit.register(self.close)
+
+    def _run(self) -> None:
+        while not self._stop.wait(_FLUSH_INTERVAL):
+            try:
+                self.flush()
+            except Exception as e:
+                log.warning(f"fleet state flusher error: {e}")
+
+    def close(self) -> None:
+        """Stop the flusher and write what's pending."""
+        self._stop.set()
+        try:
+            self.flush()
+        except Exception as e:
+            log.debug(f"fleet state final flush failed: {e}")
+
+
+store = FleetStateStore()
+update = store.update
+snapshot = store.snapshot
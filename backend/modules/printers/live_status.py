@@ -0,0 +1,423 @@
+"""Latest live status per printer, held in memory by the API process.
+
+`GET /printers/{id}/live-status` used to open a fresh TLS MQTT session to
+the printer on every request and wait up to 5s for a report. Two sources
+now feed an in-memory snapshot instead:
+
+  - Monitor daemons. Every `printer_telemetry` event they push through
+    ws_hub (about every 10s per printer) is recorded here as it passes
+    the API's WebSocket broadcaster. With ODIN_API_WORKERS > 1 each
+    worker receives every event, so each keeps its own copy.
+  - A pool of long-lived Bambu MQTT connections, used only when the
+    monitor snapshot is missing or older than _FRESH_SECONDS (monitor not
+    running, printer just added). A pooled connection stays open while
+    it keeps being asked for and closes after _IDLE_SECONDS unused, so a
+    dashboard polling live-status holds one MQTT session per printer
+    instead of opening one per request.
+
+Snapshots merge partial reports field by field, the way the monitor
+merges Bambu's delta pushes, and carry the time they were last updated.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+log = logging.getLogger("odin.api")
+
+_FRESH_SECONDS = 30.0       # monitors push every ~10s; allow two misses
+_IDLE_SECONDS = 120.0       # close pooled connections unused this long
+_REAP_INTERVAL = 30.0
+_WARM_RETRY_SECONDS = 30.0  # background connects to a failing printer back off this long
+
+# Bambu `print` section key -> live-status field
+_BAMBU_FIELDS = {
+    "gcode_state": "gcode_state",
+    "subtask_name": "job_name",
+    "mc_percent": "progress",
+    "layer_num": "layer",
+    "total_layer_num": "total_layers",
+    "mc_remaining_time": "time_remaining",
+    "bed_temper": "bed_temp",
+    "bed_target_temper": "bed_target",
+    "nozzle_temper": "nozzle_temp",
+    "nozzle_target_temper": "nozzle_target",
+    "wifi_signal": "wifi_signal",
+}
+
+# Monitor `printer_telemetry` payload key -> live-status field
+_MONITOR_FIELDS = {
+    "state": "gcode_state",
+    "gcode_file": "job_name",
+    "progress": "progress",
+    "current_layer": "layer",
+    "total_layers": "total_layers",
+    "remaining_min": "time_remaining",
+    "bed_temp": "bed_temp",
+    "bed_target": "bed_target",
+    "nozzle_temp": "nozzle_temp",
+    "nozzle_target": "nozzle_target",
+    "wifi_signal": "wifi_signal",
+}
+
+STATUS_FIELDS = tuple(_BAMBU_FIELDS.values())
+
+# live-status field -> printers column, for overlaying DB rows
+_PRINTER_COLUMNS = {
+    "gcode_state": "gcode_state",
+    "bed_temp": "bed_temp",
+    "bed_target": "bed_target_temp",
+    "nozzle_temp": "nozzle_temp",
+    "nozzle_target": "nozzle_target_temp",
+}
+
+
+# ====================================================================
+# Snapshot store
+# ====================================================================
+
+@dataclass
+class Snapshot:
+    status: Dict[str, object] = field(default_factory=dict)
+    updated_at: float = 0.0     # wall clock, for the response
+    updated_mono: float = 0.0   # monotonic, for freshness checks
+    source: str = "monitor"     # "monitor" or "connection"
+
+    def age(self) -> float:
+        return time.monotonic() - self.updated_mono
+
+    def as_response(self, printer_id: int, printer_name: str) -> dict:
+        result = {"printer_id": printer_id, "printer_name": printer_name}
+        result.update({name: self.status.get(name) for name in STATUS_FIELDS})
+        result["updated_at"] = datetime.fromtimestamp(self.updated_at, timezone.utc).isoformat()
+        result["age_seconds"] = round(self.age(), 1)
+        result["source"] = self.source
+        return result
+
+
+class SnapshotStore:
+    """Thread-safe printer_id -> Snapshot map. Readers get copies."""
+
+    def __init__(self):
+        self._snapshots: Dict[int, Snapshot] = {}
+        self._cond = threading.Condition()
+
+    def record(self, printer_id: int, fields: dict, source: str) -> None:
+        updates = {k: v for k, v in fields.items() if v is not None}
+        if not updates:
+            return
+        with self._cond:
+            snap = self._snapshots.setdefault(printer_id, Snapshot())
+            snap.status.update(updates)
+            snap.updated_at = time.time()
+            snap.updated_mono = time.monotonic()
+            snap.source = source
+            self._cond.notify_all()
+
+    def get(self, printer_id: int) -> Optional[Snapshot]:
+        with self._cond:
+            snap = self._snapshots.get(printer_id)
+            return None if snap is None else Snapshot(
+                dict(snap.status), snap.updated_at, snap.updated_mono, snap.source,
+            )
+
+    def wait_for_update(self, printer_id: int, after: float, timeout: float) -> Optional[Snapshot]:
+        """Block until `printer_id` is updated after monotonic time `after`."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                snap = self._snapshots.get(printer_id)
+                if snap is not None and snap.updated_mono > after:
+                    return self.get(printer_id)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._cond.wait(remaining)
+
+    def forget(self, printer_id: int) -> None:
+        with self._cond:
+            self._snapshots.pop(printer_id, None)
+
+    def clear(self) -> None:
+        with self._cond:
+            self._snapshots.clear()
+
+
+store = SnapshotStore()
+
+
+def _map(raw: dict, mapping: dict) -> dict:
+    return {name: raw.get(key) for key, name in mapping.items() if key in raw}
+
+
+def record_bambu_report(printer_id: int, print_section: dict, source: str = "connection") -> None:
+    """Record a Bambu MQTT `print` section (full or delta)."""
+    store.record(printer_id, _map(print_section, _BAMBU_FIELDS), source)
+
+
+def record_monitor_event(data: dict) -> None:
+    """ws_hub observer for `printer_telemetry` events pushed by the monitors."""
+    printer_id = data.get("printer_id") if isinstance(data, dict) else None
+    if printer_id is None:
+        return
+    store.record(int(printer_id), _map(data, _MONITOR_FIELDS), "monitor")
+
+
+# ====================================================================
+# Pooled Bambu connections
+# ====================================================================
+
+Credentials = Tuple[str, str, str]  # (host, serial, access_code)
+
+
+class _PooledConnection:
+    """One long-lived MQTT session feeding the store for one printer."""
+
+    def __init__(self, printer_id: int, creds: Credentials):
+        self.printer_id = printer_id
+        self.creds = creds
+        self.opened_at = time.monotonic()
+        self.last_used = self.opened_at
+        self._v2 = None
+        self._legacy = None
+
+    def open(self) -> bool:
+        from modules.printers.telemetry.feature_flag import is_v2_enabled
+
+        host, serial, access_code = self.creds
+        if is_v2_enabled():
+            # Same import root as the adapter's own events, so the
+            # isinstance check below matches (see telemetry/bambu/session.py).
+            from backend.modules.printers.telemetry.bambu.adapter import (
+                BambuAdapterConfig,
+                BambuTelemetryAdapter,
+            )
+            from backend.modules.printers.telemetry.events import BambuReportEvent
+
+            def emit(item):
+                if isinstance(item, BambuReportEvent):
+                    record_bambu_report(
+                        self.printer_id, item.section.model_dump(mode="json", exclude_none=True),
+                    )
+
+            config = BambuAdapterConfig(
+                printer_id=f"live-status-{self.printer_id}",
+                serial=serial,
+                host=host,
+                access_code=access_code,
+            )
+            adapter = BambuTelemetryAdapter(config, emitter=emit)
+            adapter.start()
+            self._v2 = adapter
+            return True
+
+        from modules.printers.adapters.bambu import BambuPrinter
+
+        printer = BambuPrinter(
+            ip=host,
+            serial=serial,
+            access_code=access_code,
+            on_status_update=lambda s: record_bambu_report(
+                self.printer_id, s.raw_data.get("print", {}),
+            ),
+            client_id=f"odin_live_{self.printer_id}_{int(time.time())}",
+        )
+        if not printer.connect():
+            printer.disconnect()
+            return False
+        self._legacy = printer
+        return True
+
+    def close(self) -> None:
+        try:
+            if self._v2 is not None:
+                self._v2.stop()
+            if self._legacy is not None:
+                self._legacy.disconnect()
+        except Exception as e:
+            log.debug("live-status connection close for printer %s: %s", self.printer_id, e)
+        self._v2 = None
+        self._legacy = None
+
+
+class ConnectionPool:
+    """printer_id -> open MQTT session, reaped after _IDLE_SECONDS unused."""
+
+    def __init__(self):
+        self._conns: Dict[int, _PooledConnection] = {}
+        self._opening: Dict[int, threading.Lock] = {}
+        self._failed_at: Dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._reaper: Optional[threading.Thread] = None
+
+    def opened_at(self, printer_id: int) -> Optional[float]:
+        """Monotonic time the open session for `printer_id` connected, if any."""
+        with self._lock:
+            conn = self._conns.get(printer_id)
+            return None if conn is None else conn.opened_at
+
+    def acquire(self, printer_id: int, creds: Credentials) -> bool:
+        """Make sure a session for `printer_id` is open. Blocks while connecting."""
+        with self._lock:
+            conn = self._conns.get(printer_id)
+            if conn is not None and conn.creds == creds:
+                conn.last_used = time.monotonic()
+                return True
+            opening = self._opening.setdefault(printer_id, threading.Lock())
+
+        with opening:
+            with self._lock:
+                conn = self._conns.get(printer_id)
+                if conn is not None and conn.creds == creds:
+                    conn.last_used = time.monotonic()
+                    return True
+                stale = self._conns.pop(printer_id, None)
+            if stale is not None:
+                # Credentials changed since it was opened.
+                stale.close()
+                store.forget(printer_id)
+
+            conn = _PooledConnection(printer_id, creds)
+            try:
+                opened = conn.open()
+            except Exception as e:
+                log.debug("live-status connect to printer %s failed: %s", printer_id, e, exc_info=True)
+                opened = False
+            if not opened:
+                conn.close()
+                with self._lock:
+                    self._failed_at[printer_id] = time.monotonic()
+                return False
+            with self._lock:
+                self._conns[printer_id] = conn
+                self._failed_at.pop(printer_id, None)
+                self._start_reaper()
+            return True
+
+    def warm(self, printer_id: int, creds: Credentials) -> None:
+        """acquire() in the background, for callers that won't wait.
+
+        Skipped while a connect is already in progress or the last one
+        failed less than _WARM_RETRY_SECONDS ago.
+        """
+        with self._lock:
+            opening = self._opening.get(printer_id)
+            if opening is not None and opening.locked():
+                return
+            failed_at = self._failed_at.get(printer_id)
+            if failed_at is not None and time.monotonic() - failed_at < _WARM_RETRY_SECONDS:
+                return
+        threading.Thread(
+            target=self.acquire, args=(printer_id, creds),
+            name=f"live-status-{printer_id}", daemon=True,
+        ).start()
+
+    def release(self, printer_id: int) -> None:
+        with self._lock:
+            conn = self._conns.pop(printer_id, None)
+            self._failed_at.pop(printer_id, None)
+        if conn is not None:
+            conn.close()
+
+    def close_idle(self, idle_seconds: float = _IDLE_SECONDS) -> int:
+        cutoff = time.monotonic() - idle_seconds
+        with self._lock:
+            idle = [pid for pid, c in self._conns.items() if c.last_used < cutoff]
+            conns = [self._conns.pop(pid) for pid in idle]
+        for conn in conns:
+            conn.close()
+        return len(conns)
+
+    def close_all(self) -> None:
+        with self._lock:
+            conns = list(self._conns.values())
+            self._conns.clear()
+        for conn in conns:
+            conn.close()
+
+    def _start_reaper(self) -> None:
+        # Caller holds self._lock.
+        if self._reaper is not None and self._reaper.is_alive():
+            return
+        self._reaper = threading.Thread(target=self._reap_loop, name="live-status-reaper", daemon=True)
+        self._reaper.start()
+
+    def _reap_loop(self) -> None:
+        while True:
+            time.sleep(_REAP_INTERVAL)
+            self.close_idle()
+            with self._lock:
+                if not self._conns:
+                    self._reaper = None
+                    return
+
+
+pool = ConnectionPool()
+
+
+# ====================================================================
+# Lookup
+# ====================================================================
+
+def get_snapshot(
+    printer_id: int, creds: Credentials, timeout: float = 5.0,
+) -> Tuple[Optional[Snapshot], Optional[str]]:
+    """(snapshot, error) for one printer, connecting through the pool if needed.
+
+    `error` is set when the printer can't be reached or sends nothing
+    within `timeout`.
+    """
+    snap = store.get(printer_id)
+    if snap is not None and _is_current(printer_id, snap):
+        if snap.source == "connection":
+            pool.acquire(printer_id, creds)  # keeps the session from going idle
+        return snap, None
+
+    started = time.monotonic()
+    if not pool.acquire(printer_id, creds):
+        return None, "Connection failed"
+    snap = store.get(printer_id)
+    if snap is not None and _is_current(printer_id, snap):
+        return snap, None
+    snap = store.wait_for_update(printer_id, started, timeout)
+    if snap is None:
+        return None, "Timeout waiting for status"
+    return snap, None
+
+
+def cached_snapshot(printer_id: int) -> Tuple[Optional[Snapshot], bool]:
+    """(snapshot, is_current) without connecting — for the bulk endpoint."""
+    snap = store.get(printer_id)
+    return snap, snap is not None and _is_current(printer_id, snap)
+
+
+def _is_current(printer_id: int, snap: Snapshot) -> bool:
+    # A live pooled session keeps its snapshot current even when the
+    # printer is idle and only pushes on change.
+    opened_at = pool.opened_at(printer_id)
+    if snap.source == "connection" and opened_at is not None and snap.updated_mono >= opened_at:
+        return True
+    return snap.age() <= _FRESH_SECONDS
+
+
+def printer_columns(printer_id: int) -> dict:
+    """Current snapshot values keyed by printers column, plus last_seen.
+
+    Monitors write the printers row in batches (see fleet_state.py), so
+    the row can trail the printer by a flush interval. Readers overlay
+    these values on the row; empty when there is no current snapshot.
+    """
+    snap, current = cached_snapshot(printer_id)
+    if not current:
+        return {}
+    columns = {
+        column: snap.status[name]
+        for name, column in _PRINTER_COLUMNS.items()
+        if snap.status.get(name) is not None
+    }
+    # printers.last_seen is naive UTC
+    columns["last_seen"] = datetime.fromtimestamp(snap.updated_at, timezone.utc).replace(tzinfo=None)
+    return columns
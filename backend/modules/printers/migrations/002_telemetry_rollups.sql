@@ -0,0 +1,54 @@
+-- printers/migrations/002_telemetry_rollups.sql
+-- Telemetry retention tiers. See modules/printers/telemetry_rollups.py.
+-- Raw printer_telemetry / ams_telemetry rows are kept 24h; older data
+-- lives in per-bucket rollups (bucket = unix epoch seconds of the bucket
+-- start, resolution = bucket width in seconds).
+
+-- Chart queries filter on printer (and AMS unit) and a time range.
+CREATE INDEX IF NOT EXISTS idx_printer_telemetry_printer_time ON printer_telemetry(printer_id, recorded_at);
+CREATE INDEX IF NOT EXISTS idx_ams_telemetry_printer_time ON ams_telemetry(printer_id, ams_unit, recorded_at);
+-- 001's single-column printer_id indexes stay: module migrations are
+-- re-applied at every start, so dropping them here would only have 001
+-- recreate them on the next boot.
+
+CREATE TABLE IF NOT EXISTS printer_telemetry_rollup (
+    printer_id INTEGER NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    samples INTEGER NOT NULL,
+    bed_temp REAL,
+    bed_temp_min REAL,
+    bed_temp_max REAL,
+    nozzle_temp REAL,
+    nozzle_temp_min REAL,
+    nozzle_temp_max REAL,
+    bed_target REAL,
+    nozzle_target REAL,
+    fan_speed REAL,
+    PRIMARY KEY (printer_id, resolution, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_printer_telemetry_rollup_bucket ON printer_telemetry_rollup(resolution, bucket);
+
+CREATE TABLE IF NOT EXISTS ams_telemetry_rollup (
+    printer_id INTEGER NOT NULL,
+    ams_unit INTEGER NOT NULL,
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    samples INTEGER NOT NULL,
+    humidity REAL,
+    humidity_min REAL,
+    humidity_max REAL,
+    temperature REAL,
+    temperature_min REAL,
+    temperature_max REAL,
+    PRIMARY KEY (printer_id, ams_unit, resolution, bucket)
+);
+
+CREATE INDEX IF NOT EXISTS idx_ams_telemetry_rollup_bucket ON ams_telemetry_rollup(resolution, bucket);
+
+-- Per tier: raw rows before rolled_until (epoch seconds) are rolled up.
+CREATE TABLE IF NOT EXISTS telemetry_rollup_state (
+    series TEXT PRIMARY KEY,
+    rolled_until BIGINT NOT NULL
+);
@@ -26,7 +26,7 @@ from datetime import datetime, timezone
 from sqlalchemy import text
 
 from core.db import engine
-from core.db_compat import sql
+from modules.printers import fleet_state
 
 # WebSocket push (same as all other monitors)
 try:
@@ -45,6 +45,7 @@ from modules.printers.adapters.elegoo import ElegooPrinter, ElegooStatus, SDCPCu
 log = logging.getLogger(__name__)
 
 RECONNECT_INTERVAL = 30  # seconds between reconnect attempts
+HEALTH_CHECK_INTERVAL = 10  # seconds between connection health checks
 
 
 class ElegooMonitorThread(threading.Thread):
@@ -67,6 +68,8 @@ class ElegooMonitorThread(threading.Thread):
         self._last_telemetry_insert = 0
         self._last_ams_env = 0
         self._marked_offline = False
+        self._camera_discovered = False
+        self._reconnect_at = 0.0
 
         # Register status callback on the adapter
         self.client.on_status(self._on_status_update)
@@ -77,42 +80,48 @@ class ElegooMonitorThread(threading.Thread):
 
     def run(self):
         log.info(f"[{self.name}] Elegoo SDCP monitor started for {self.host}")
-        camera_discovered = False
-
         while self._running:
-            # Connect (or reconnect)
-            if not self.client._connected:
-                log.info(f"[{self.name}] Connecting to {self.host}...")
-                connected = self.client.connect()
-                if not connected:
-                    log.warning(f"[{self.name}] Connection failed, retrying in {RECONNECT_INTERVAL}s")
-                    time.sleep(RECONNECT_INTERVAL)
-                    continue
-                # Auto-discover camera on first connect
-                if not camera_discovered:
-                    self._discover_and_save_camera()
-                    camera_discovered = True
-
+            self.poll_once()
             # WebSocket is event-driven — just sleep and check connection health
-            time.sleep(10)
-
-            # Heartbeat: if no status update for 60s, try reconnecting
-            if self._last_heartbeat > 0 and time.time() - self._last_heartbeat > 60:
-                log.warning(f"[{self.name}] No status update for 60s, reconnecting...")
-                # Mark printer offline in DB (same as Bambu/Moonraker pattern)
-                if not self._marked_offline:
-                    self._marked_offline = True
-                    try:
-                        with engine.begin() as conn:
-                            conn.execute(text("UPDATE printers SET gcode_state='OFFLINE' WHERE id=:pid"), {"pid": self.printer_id})
-                    except Exception as e:
-                        log.debug(f"Failed to mark printer offline: {e}")
-                camera_discovered = False  # Re-discover camera on reconnect
-                self.client.disconnect()
-                time.sleep(2)
-
+            time.sleep(HEALTH_CHECK_INTERVAL)
         log.info(f"[{self.name}] Elegoo SDCP monitor stopped")
 
+    def poll_once(self):
+        """Connect if needed, otherwise check connection health.
+
+        Status itself arrives on the adapter's WebSocket thread; this only
+        supervises it. Also driven by monitor_host.py.
+        """
+        # Connect (or reconnect)
+        if not self.client._connected:
+            if time.time() < self._reconnect_at:
+                return
+            log.info(f"[{self.name}] Connecting to {self.host}...")
+            if not self.client.connect():
+                log.warning(f"[{self.name}] Connection failed, retrying in {RECONNECT_INTERVAL}s")
+                self._reconnect_at = time.time() + RECONNECT_INTERVAL
+                return
+            # Auto-discover camera on first connect
+            if not self._camera_discovered:
+                self._discover_and_save_camera()
+                self._camera_discovered = True
+            return
+
+        # Heartbeat: if no status update for 60s, try reconnecting
+        if self._last_heartbeat > 0 and time.time() - self._last_heartbeat > 60:
+            log.warning(f"[{self.name}] No status update for 60s, reconnecting...")
+            # Mark printer offline in DB (same as Bambu/Moonraker pattern)
+            if not self._marked_offline:
+                self._marked_offline = True
+                fleet_state.store.forget(self.printer_id)  # pending writes must not undo this
+                try:
+                    with engine.begin() as conn:
+                        conn.execute(text("UPDATE printers SET gcode_state='OFFLINE' WHERE id=:pid"), {"pid": self.printer_id})
+                except Exception as e:
+                    log.debug(f"Failed to mark printer offline: {e}")
+            self._camera_discovered = False  # Re-discover camera on reconnect
+            self.client.disconnect()
+
     def _discover_and_save_camera(self):
         """Discover camera URL and save to DB via printer_events."""
         import modules.notifications.event_dispatcher as printer_events
@@ -237,15 +246,13 @@ class ElegooMonitorThread(threading.Thread):
                     else:
                         stage = "Idle"
 
-                    conn.execute(
-                        text(f"UPDATE printers SET last_seen={sql.now()},"  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-                        " bed_temp=COALESCE(:bed_t,bed_temp),bed_target_temp=COALESCE(:bed_tt,bed_target_temp),"
-                        " nozzle_temp=COALESCE(:noz_t,nozzle_temp),nozzle_target_temp=COALESCE(:noz_tt,nozzle_target_temp),"
-                        " gcode_state=COALESCE(:gstate,gcode_state),print_stage=COALESCE(:stage,print_stage),"
-                        " fan_speed=COALESCE(:fan_speed,fan_speed) WHERE id=:pid"),
-                        {"bed_t": bed_t, "bed_tt": bed_tt, "noz_t": noz_t, "noz_tt": noz_tt,
-                         "gstate": gstate, "stage": stage, "fan_speed": fan_speed_val, "pid": self.printer_id}
-                    )
+                    # Batched, changed-columns-only write (see fleet_state.py)
+                    fleet_state.update(self.printer_id, {
+                        "bed_temp": bed_t, "bed_target_temp": bed_tt,
+                        "nozzle_temp": noz_t, "nozzle_target_temp": noz_tt,
+                        "gcode_state": gstate, "print_stage": stage,
+                        "fan_speed": fan_speed_val,
+                    })
 
                     # WebSocket push to frontend
                     ws_push('printer_telemetry', {
@@ -287,7 +294,6 @@ class ElegooMonitorThread(threading.Thread):
                                 text("INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed) VALUES (:pid, :bed_t, :noz_t, :bed_tt, :noz_tt, :fan)"),
                                 {"pid": self.printer_id, "bed_t": bed_t, "noz_t": noz_t, "bed_tt": bed_tt, "noz_tt": noz_tt, "fan": fan_speed_val}
                             )
-                            conn.execute(text(f"DELETE FROM printer_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                         except Exception as e:
                             log.debug(f"[{self.name}] Telemetry insert: {e}")
 
@@ -302,7 +308,6 @@ class ElegooMonitorThread(threading.Thread):
                                     text("INSERT INTO ams_telemetry (printer_id, ams_unit, humidity, temperature) VALUES (:pid, :unit, :hum, :temp)"),
                                     {"pid": self.printer_id, "unit": 0, "hum": None, "temp": box_temp}
                                 )
-                                conn.execute(text(f"DELETE FROM ams_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                         except Exception as e:
                             log.debug(f"[{self.name}] Enclosure env capture: {e}")
 
@@ -315,6 +320,25 @@ class ElegooMonitorThread(threading.Thread):
 # ------------------------------------------------------------------
 # Main — standalone daemon mode
 # ------------------------------------------------------------------
+def monitor_from_row(row) -> ElegooMonitorThread:
+    """Build a (not yet started) monitor from a printers row."""
+    mainboard_id = ""
+    # api_key stores mainboard_id for Elegoo (no auth needed)
+    if row["api_key"]:
+        try:
+            from core.crypto import decrypt
+            mainboard_id = decrypt(row["api_key"])
+        except Exception:
+            mainboard_id = row["api_key"]
+
+    return ElegooMonitorThread(
+        printer_id=row["id"],
+        name=row["name"],
+        host=row["api_host"],
+        mainboard_id=mainboard_id,
+    )
+
+
 def start_elegoo_monitors():
     """
     Load Elegoo printers from DB and start monitor threads.
@@ -328,28 +352,10 @@ def start_elegoo_monitors():
             ).mappings().fetchall()
 
         for row in rows:
-            printer_id = row["id"]
-            name = row["name"]
-            host = row["api_host"]
-            mainboard_id = ""
-
-            # api_key stores mainboard_id for Elegoo (no auth needed)
-            if row["api_key"]:
-                try:
-                    from core.crypto import decrypt
-                    mainboard_id = decrypt(row["api_key"])
-                except Exception:
-                    mainboard_id = row["api_key"]
-
-            t = ElegooMonitorThread(
-                printer_id=printer_id,
-                name=name,
-                host=host,
-                mainboard_id=mainboard_id,
-            )
+            t = monitor_from_row(row)
             t.start()
             threads.append(t)
-            log.info(f"Started Elegoo monitor for {name} ({host})")
+            log.info(f"Started Elegoo monitor for {t.name} ({t.host})")
 
     except Exception as e:
         log.error(f"Failed to start Elegoo monitors: {e}")
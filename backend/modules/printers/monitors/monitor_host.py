@@ -0,0 +1,375 @@
+"""
+Monitor host — every printer protocol in one asyncio process.
+
+Printer monitoring used to be four supervisord programs (mqtt_monitor,
+moonraker_monitor, prusalink_monitor, elegoo_monitor). Each loaded the
+printer list on its own and ran a thread per printer that polled in a
+`time.sleep` loop. That meant four Python interpreters, each importing
+SQLAlchemy, each with its own fleet_state flusher and ws_hub publisher.
+Most of those threads sat in sleep().
+
+This host runs all of them in one process:
+
+  - One event loop. Every printer is a supervisor coroutine that opens
+    the printer, then ticks it on the protocol's interval (Moonraker 3s,
+    PrusaLink 10s, Elegoo health check 10s, Bambu health check 30s).
+  - Shared workers. The adapters are blocking (urllib, requests, paho,
+    websocket-client), so each tick runs on one bounded thread pool
+    (ODIN_MONITOR_WORKERS) rather than a thread per printer. The push
+    protocols keep their library's network thread — paho's loop for
+    Bambu, the SDCP WebSocket for Elegoo, the status subscription for
+    Moonraker — but not a supervisory thread.
+  - Shared writers. One fleet_state store flushes the whole fleet in one
+    transaction; one ws_hub publisher and one PrusaLink HTTP pool serve
+    every printer.
+  - Per-printer backpressure. A printer has at most one tick in flight.
+    A tick that overruns the interval is not followed by a queue of
+    missed ticks: the next one is delayed, doubling up to _MAX_BACKOFF,
+    so a hung printer costs one pool slot per backoff period and can't
+    starve the rest of the fleet.
+  - One printer list. It is reloaded every _RELOAD_INTERVAL. Added
+    printers start, removed or deactivated ones stop, and changed
+    connection settings restart that printer's supervisor.
+  - Telemetry housekeeping. The host writes the telemetry, so it also
+    rolls it up and applies retention (telemetry_rollups.maintain)
+    every _ROLLUP_INTERVAL.
+
+Each protocol's per-printer logic stays in its monitor module. The host
+only calls open / tick / close. Those modules still run standalone
+(`python -m modules.printers.monitors.moonraker_monitor`) for debugging.
+
+Run: python3 -m modules.printers.monitors.monitor_host
+"""
+
+import asyncio
+import logging
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+log = logging.getLogger("monitor_host")
+
+
+def _worker_count() -> int:
+    try:
+        return max(1, int(os.environ.get("ODIN_MONITOR_WORKERS", "16")))
+    except ValueError:
+        return 16
+
+
+WORKERS = _worker_count()
+
+_RELOAD_INTERVAL = 60.0
+_RETRY_OPEN_INTERVAL = 30.0
+_MAX_BACKOFF = 60.0
+_ROLLUP_INTERVAL = 300.0
+
+_HOSTED_TYPES = ("moonraker", "prusalink", "elegoo")
+
+
+# ====================================================================
+# Drivers — the host's view of one printer
+# ====================================================================
+
+class _MonitorDriver:
+    """Adapts a moonraker/prusalink/elegoo monitor to open / tick / close."""
+
+    def __init__(self, monitor, interval: float, open_fn: Callable[[], bool], close_fn: Callable[[], None]):
+        self.monitor = monitor
+        self.interval = interval
+        self._open = open_fn
+        self._close = close_fn
+
+    def open(self) -> bool:
+        return self._open()
+
+    def tick(self) -> None:
+        self.monitor.poll_once()
+
+    def close(self) -> None:
+        self._close()
+
+
+class _BambuDriver:
+    """Bambu printers push over MQTT; the tick only replaces dead sessions."""
+
+    interval = 30.0
+
+    def __init__(self, printer: dict):
+        self.printer = printer
+        self.monitor = None
+
+    def open(self) -> bool:
+        from modules.printers.monitors.mqtt_printer import PrinterMonitor
+        p = self.printer
+        monitor = PrinterMonitor(
+            printer_id=p['id'], name=p['name'], ip=p['ip'],
+            serial=p['serial'], access_code=p['access_code'],
+        )
+        if not monitor.connect():
+            return False
+        self.monitor = monitor
+        return True
+
+    def tick(self) -> None:
+        from modules.printers.monitors.mqtt_monitor import monitor_is_dead
+        if self.monitor is not None and not monitor_is_dead(self.monitor):
+            return
+        log.info(f"[{self.printer['name']}] Connection dead, reconnecting...")
+        self.close()
+        time.sleep(1)  # let old TLS socket fully tear down
+        if not self.open():
+            log.warning(f"[{self.printer['name']}] Reconnection failed, will retry in {self.interval:.0f}s")
+
+    def close(self) -> None:
+        if self.monitor is not None:
+            try:
+                self.monitor.disconnect()
+            except Exception as e:
+                log.debug(f"Error disconnecting Bambu monitor: {e}")
+            self.monitor = None
+
+
+def make_driver(kind: str, row):
+    """Driver for a printers row classified as `kind`, or None."""
+    if kind == "moonraker":
+        from modules.printers.monitors import moonraker_monitor as mod
+        m = mod.monitor_from_row(row)
+        return _MonitorDriver(m, mod.POLL_INTERVAL, lambda: m.connect(threaded=False), m.disconnect)
+    if kind == "prusalink":
+        from modules.printers.monitors import prusalink_monitor as mod
+        m = mod.monitor_from_row(row)
+
+        def open_prusalink() -> bool:
+            m._discover_and_save_camera()
+            return True  # stateless HTTP; failures are counted per poll
+        return _MonitorDriver(m, mod.POLL_INTERVAL, open_prusalink, m.stop)
+    if kind == "elegoo":
+        from modules.printers.monitors import elegoo_monitor as mod
+        m = mod.monitor_from_row(row)
+        return _MonitorDriver(m, mod.HEALTH_CHECK_INTERVAL, lambda: True, m.stop)
+    if kind == "bambu":
+        from modules.printers.monitors.mqtt_monitor import printer_from_row
+        printer = printer_from_row(row)
+        return _BambuDriver(printer) if printer else None
+    return None
+
+
+# ====================================================================
+# Printer list
+# ====================================================================
+
+@dataclass
+class PrinterSpec:
+    id: int
+    kind: str
+    row: dict
+    key: tuple = ()   # connection settings; a change restarts the printer
+
+
+def classify(rows: Iterable[dict]) -> Dict[int, PrinterSpec]:
+    """Pick the protocol for each printers row.
+
+    Same selection the separate daemons made: Moonraker, PrusaLink and
+    Elegoo by api_type (active printers only), Bambu by having encrypted
+    credentials. A printer with a hosted api_type is no longer also
+    tried as Bambu.
+    """
+    specs = {}
+    bambu_enabled = bool(os.environ.get("ENCRYPTION_KEY"))
+    for row in rows:
+        kind = None
+        if row.get("api_type") in _HOSTED_TYPES:
+            if row.get("is_active"):
+                kind = row["api_type"]
+        elif bambu_enabled and row.get("api_key"):
+            kind = "bambu"
+        if kind:
+            key = (kind, row.get("name"), row.get("api_host"), row.get("api_key"))
+            specs[row["id"]] = PrinterSpec(row["id"], kind, dict(row), key)
+    return specs
+
+
+def maintain_telemetry() -> None:
+    from modules.printers import telemetry_rollups
+    telemetry_rollups.maintain()
+
+
+def load_printers() -> Dict[int, PrinterSpec]:
+    """One query for every protocol."""
+    from sqlalchemy import text
+    from core.db import engine
+
+    with engine.connect() as conn:
+        rows = conn.execute(text(
+            "SELECT id, name, api_type, api_host, api_key, is_active FROM printers "
+            "WHERE api_host IS NOT NULL AND api_host != ''"
+        )).mappings().fetchall()
+    return classify(dict(r) for r in rows)
+
+
+# ====================================================================
+# Host
+# ====================================================================
+
+@dataclass
+class _Slot:
+    spec: PrinterSpec
+    driver: object = None
+    task: Optional[asyncio.Task] = None
+    ticks: int = 0
+    overruns: int = 0
+    errors: int = 0
+    opened: bool = False
+
+
+class MonitorHost:
+    def __init__(self, workers: int = WORKERS,
+                 loader: Callable[[], Dict[int, PrinterSpec]] = load_printers,
+                 driver_factory: Callable = make_driver,
+                 housekeeping: Optional[Callable[[], None]] = maintain_telemetry):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="monitor")
+        self._loader = loader
+        self._driver_factory = driver_factory
+        self._housekeeping = housekeeping
+        self.slots: Dict[int, _Slot] = {}
+
+    # ---- blocking calls ----
+
+    async def _call(self, slot: Optional[_Slot], fn: Callable, *args):
+        """Run a blocking call on the shared pool; errors are logged, not raised."""
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(self._executor, fn, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            if slot is not None:
+                slot.errors += 1
+                log.warning(f"[printer {slot.spec.id}] {getattr(fn, '__name__', 'call')} failed: {e}")
+            else:
+                log.warning(f"monitor host: {e}")
+            return None
+
+    # ---- per-printer supervisor ----
+
+    async def _supervise(self, slot: _Slot) -> None:
+        loop = asyncio.get_running_loop()
+        driver = slot.driver = await self._call(slot, self._driver_factory, slot.spec.kind, slot.spec.row)
+        if driver is None:
+            return
+        try:
+            while not await self._call(slot, driver.open):
+                await asyncio.sleep(_RETRY_OPEN_INTERVAL)
+            slot.opened = True
+            delay = driver.interval
+            backoff = 0.0
+            while True:
+                await asyncio.sleep(delay)
+                started = loop.time()
+                await self._call(slot, driver.tick)
+                elapsed = loop.time() - started
+                slot.ticks += 1
+                if elapsed <= driver.interval:
+                    backoff = 0.0
+                    delay = driver.interval - elapsed
+                else:
+                    # Overran (slow printer or a saturated pool): back off
+                    # instead of firing the missed ticks back to back.
+                    if not backoff:
+                        log.info(f"[printer {slot.spec.id}] tick took {elapsed:.1f}s "
+                                 f"(interval {driver.interval:.0f}s), backing off")
+                    slot.overruns += 1
+                    backoff = min(max(backoff * 2, driver.interval), _MAX_BACKOFF)
+                    delay = backoff
+        finally:
+            await asyncio.shield(self._call(slot, driver.close))
+
+    # ---- fleet ----
+
+    def _start(self, spec: PrinterSpec) -> None:
+        slot = _Slot(spec)
+        slot.task = asyncio.get_running_loop().create_task(self._supervise(slot), name=f"printer-{spec.id}")
+        self.slots[spec.id] = slot
+
+    async def _stop(self, printer_id: int) -> None:
+        slot = self.slots.pop(printer_id, None)
+        if slot is None or slot.task is None:
+            return
+        slot.task.cancel()
+        try:
+            await slot.task
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            log.warning(f"[printer {printer_id}] supervisor ended with {e}")
+
+    async def reconcile(self, specs: Dict[int, PrinterSpec]) -> None:
+        """Start, stop and restart supervisors to match `specs`."""
+        for pid in [p for p in self.slots if p not in specs]:
+            log.info(f"[printer {pid}] removed, stopping monitor")
+            await self._stop(pid)
+        for pid, spec in specs.items():
+            slot = self.slots.get(pid)
+            if slot is not None and slot.spec.key == spec.key:
+                continue
+            if slot is not None:
+                log.info(f"[printer {pid}] connection settings changed, restarting monitor")
+                await self._stop(pid)
+            self._start(spec)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        loop = asyncio.get_running_loop()
+        next_housekeeping = loop.time() + _RELOAD_INTERVAL
+        while not stop.is_set():
+            if self._housekeeping is not None and loop.time() >= next_housekeeping:
+                await self._call(None, self._housekeeping)
+                next_housekeeping = loop.time() + _ROLLUP_INTERVAL
+            specs = await self._call(None, self._loader)
+            if specs is not None:
+                await self.reconcile(specs)
+                counts: Dict[str, int] = {}
+                for slot in self.slots.values():
+                    counts[slot.spec.kind] = counts.get(slot.spec.kind, 0) + 1
+                log.debug(f"Monitoring {len(self.slots)} printer(s): {counts}")
+            try:
+                await asyncio.wait_for(stop.wait(), _RELOAD_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+        await self.shutdown()
+
+    async def shutdown(self) -> None:
+        for pid in list(self.slots):
+            await self._stop(pid)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> dict:
+        return {
+            "printers": len(self.slots),
+            "opened": sum(1 for s in self.slots.values() if s.opened),
+            "ticks": sum(s.ticks for s in self.slots.values()),
+            "overruns": sum(s.overruns for s in self.slots.values()),
+            "errors": sum(s.errors for s in self.slots.values()),
+        }
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(name)s] %(message)s")
+
+    async def _main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, stop.set)
+        log.info(f"Monitor host starting ({WORKERS} workers)")
+        await MonitorHost().run(stop)
+
+    asyncio.run(_main())  # fleet_state flushes what's pending at exit
+    log.info("Monitor host stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Moonraker status feed — how MoonrakerMonitor gets status to process.
+
+Each poll (re)opens the adapter's websocket subscription
+(adapters/moonraker_ws.py) and processes the current status; between
+polls, pushed job, error and runout changes are processed at once on the
+websocket thread. A lock keeps the two from running concurrently. A poll
+that fails marks the printer unreachable, and later polls retry the
+connection every RECONNECT_INTERVAL instead of fetching status.
+"""
+
+import logging
+import threading
+import time
+from typing import Any, Callable
+
+from modules.printers.adapters.moonraker_ws import SUBSCRIBE
+
+log = logging.getLogger("moonraker_monitor")
+
+RECONNECT_INTERVAL = 30    # seconds between reconnection attempts
+
+
+class StatusFeed:
+    """Drives one monitor's `process(status)` from polls and websocket pushes.
+
+    `running()` is false once the monitor is stopped; `on_reconnect()` runs
+    after a lost connection comes back.
+    """
+
+    def __init__(self, printer, process: Callable[[Any], None], name: str,
+                 running: Callable[[], bool], on_reconnect: Callable[[], None]):
+        self.printer = printer
+        self.name = name
+        self._process = process
+        self._running = running
+        self._on_reconnect = on_reconnect
+        self._lock = threading.Lock()
+        self.reconnect_at = 0.0  # set while the connection is down
+
+    def subscribe(self):
+        """Open the subscription, or reopen a dropped one (rate-limited)."""
+        if SUBSCRIBE:
+            self.printer.subscribe(self._on_push)
+
+    def poll(self):
+        """One poll: fetch and process status, or retry a lost connection."""
+        if self.reconnect_at:
+            if time.time() >= self.reconnect_at:
+                self._try_reconnect()
+            return
+        self.subscribe()
+        try:
+            with self._lock:
+                self._process(self.printer.get_status())
+        except Exception as e:
+            log.error(f"[{self.name}] Poll error: {e}")
+            self._handle_disconnect()
+
+    def _on_push(self):
+        """A job/error field changed on the websocket — process it now
+        instead of on the next poll."""
+        if not self._running() or self.reconnect_at:
+            return
+        try:
+            with self._lock:
+                self._process(self.printer.get_status())
+        except Exception as e:
+            log.error(f"[{self.name}] Push processing error: {e}")
+
+    def _handle_disconnect(self):
+        """Handle lost connection — schedule a reconnection attempt."""
+        self.printer._connected = False
+        self.reconnect_at = time.time() + RECONNECT_INTERVAL
+        log.warning(f"[{self.name}] Connection lost, retrying in {RECONNECT_INTERVAL}s")
+
+    def _try_reconnect(self):
+        try:
+            if self.printer.connect():
+                self.reconnect_at = 0.0
+                log.info(f"[{self.name}] Reconnected")
+                self._on_reconnect()
+                return
+        except Exception as e:
+            log.debug(f"Reconnect attempt failed: {e}")
+        self.reconnect_at = time.time() + RECONNECT_INTERVAL
+        log.warning(f"[{self.name}] Reconnect failed, retrying...")
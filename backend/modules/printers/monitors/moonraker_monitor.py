@@ -6,7 +6,9 @@ PrinterMonitor subscribes to Bambu MQTT. Designed to plug into
 the existing MQTTMonitorDaemon alongside Bambu monitors.
 
 Handles:
-- Periodic status polling (every 3 seconds)
+- Live status over the Moonraker websocket (state changes processed as
+  they are pushed), with periodic HTTP polling (every 3 seconds) as the
+  fallback while the socket is down
 - Print job start/end detection and DB logging
 - Progress tracking (percent, layers)
 - Fan speed, nozzle diameter, speed/flow factors
@@ -18,7 +20,6 @@ Handles:
 - Reconnection on failure
 """
 
-import os
 import sys
 import time
 import logging
@@ -29,8 +30,10 @@ from typing import Optional, Dict, Any
 from sqlalchemy import text
 
 from modules.printers.adapters.moonraker import MoonrakerPrinter, MoonrakerState
+from modules.printers.monitors.moonraker_feed import StatusFeed
 from core.db import engine
 from core.db_compat import sql
+from modules.printers import fleet_state
 
 # WebSocket push (same as mqtt_monitor)
 try:
@@ -47,7 +50,6 @@ except ImportError:
 log = logging.getLogger("moonraker_monitor")
 
 POLL_INTERVAL = 3          # seconds between status polls
-RECONNECT_INTERVAL = 30    # seconds between reconnection attempts
 PROGRESS_DB_INTERVAL = 5   # seconds between progress DB writes (throttle)
 TELEMETRY_INSERT_INTERVAL = 60   # seconds between timeseries inserts
 SLOT_SYNC_INTERVAL = 60         # seconds between filament slot syncs
@@ -64,7 +66,12 @@ _MATERIAL_MAP = {
 
 class MoonrakerMonitor:
     """
-    Monitors a single Moonraker printer via REST polling.
+    Monitors a single Moonraker printer.
+
+    Status comes from the adapter's websocket subscription when it is up
+    and from REST polling when it is not; either way poll_once() runs on
+    POLL_INTERVAL, and pushed job/error changes are processed at once
+    (moonraker_feed.StatusFeed).
     
     Drop-in complement to the MQTT-based PrinterMonitor class.
     Same DB tables, same state tracking, same job logging.
@@ -88,21 +95,29 @@ class MoonrakerMonitor:
         self._last_slot_sync = 0.0
         self._last_env_telemetry = 0.0
         self._prev_filament_detected: Optional[bool] = None
+        self._feed = StatusFeed(self.printer, self._process_status, name,
+                                running=lambda: self._running, on_reconnect=self._on_reconnect)
     
     # ==================== Lifecycle ====================
     
-    def connect(self) -> bool:
-        """Connect to the printer and start polling thread."""
+    def connect(self, threaded: bool = True) -> bool:
+        """Connect to the printer and start polling thread.
+
+        With threaded=False no thread is started; the caller drives
+        poll_once() itself (monitor_host.py).
+        """
         if self.printer.connect():
             # Auto-discover camera URL and save to DB
             self._discover_and_save_camera()
             self._running = True
-            self._thread = threading.Thread(
-                target=self._poll_loop,
-                name=f"moonraker-{self.name}",
-                daemon=True,
-            )
-            self._thread.start()
+            self._feed.subscribe()
+            if threaded:
+                self._thread = threading.Thread(
+                    target=self._poll_loop,
+                    name=f"moonraker-{self.name}",
+                    daemon=True,
+                )
+                self._thread.start()
             return True
         return False
 
@@ -131,34 +146,18 @@ class MoonrakerMonitor:
     def _poll_loop(self):
         """Main polling loop — runs in its own thread."""
         while self._running:
-            try:
-                status = self.printer.get_status()
-                self._process_status(status)
-            except Exception as e:
-                log.error(f"[{self.name}] Poll error: {e}")
-                # Try to reconnect
-                self._handle_disconnect()
-            
+            self.poll_once()
             time.sleep(POLL_INTERVAL)
-    
-    def _handle_disconnect(self):
-        """Handle lost connection — attempt reconnection."""
-        self.printer._connected = False
-        log.warning(f"[{self.name}] Connection lost, retrying in {RECONNECT_INTERVAL}s")
-        
-        while self._running:
-            time.sleep(RECONNECT_INTERVAL)
-            try:
-                if self.printer.connect():
-                    self._discover_and_save_camera()
-                    log.info(f"[{self.name}] Reconnected")
-                    # Recover job tracking state after reconnect
-                    self._recover_after_reconnect()
-                    return
-            except Exception as e:
-                log.debug(f"Reconnect attempt failed: {e}")
-            log.warning(f"[{self.name}] Reconnect failed, retrying...")
-    
+
+    def poll_once(self):
+        """One poll: fetch and process status, or retry a lost connection."""
+        self._feed.poll()
+
+    def _on_reconnect(self):
+        self._discover_and_save_camera()
+        # Recover job tracking state after reconnect
+        self._recover_after_reconnect()
+
     def _recover_after_reconnect(self):
         """Restore job tracking state after a reconnect."""
         try:
@@ -223,16 +222,13 @@ class MoonrakerMonitor:
                     if remaining_min < 0:
                         remaining_min = 0
 
-                conn.execute(
-                    text(f"UPDATE printers SET last_seen={sql.now()},"  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-                    " bed_temp=COALESCE(:bed_t,bed_temp),bed_target_temp=COALESCE(:bed_tt,bed_target_temp),"
-                    " nozzle_temp=COALESCE(:noz_t,nozzle_temp),nozzle_target_temp=COALESCE(:noz_tt,nozzle_target_temp),"
-                    " gcode_state=COALESCE(:gstate,gcode_state),print_stage=COALESCE(:stage,print_stage),"
-                    " fan_speed=COALESCE(:fan_speed,fan_speed),nozzle_diameter=COALESCE(:noz_dia,nozzle_diameter)"
-                    " WHERE id=:pid"),
-                    {"bed_t": bed_t, "bed_tt": bed_tt, "noz_t": noz_t, "noz_tt": noz_tt,
-                     "gstate": gstate, "stage": stage, "fan_speed": fan_speed_val,
-                     "noz_dia": noz_dia, "pid": self.printer_id})
+                # Batched, changed-columns-only write (see fleet_state.py)
+                fleet_state.update(self.printer_id, {
+                    "bed_temp": bed_t, "bed_target_temp": bed_tt,
+                    "nozzle_temp": noz_t, "nozzle_target_temp": noz_tt,
+                    "gcode_state": gstate, "print_stage": stage,
+                    "fan_speed": fan_speed_val, "nozzle_diameter": noz_dia,
+                })
 
                 # WebSocket push to frontend (same as Bambu monitor)
                 ws_push('printer_telemetry', {
@@ -272,7 +268,6 @@ class MoonrakerMonitor:
                         conn.execute(
                             text("INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed) VALUES (:pid, :bed_t, :noz_t, :bed_tt, :noz_tt, :fan)"),
                             {"pid": self.printer_id, "bed_t": bed_t, "noz_t": noz_t, "bed_tt": bed_tt, "noz_tt": noz_tt, "fan": fan_speed_val})
-                        conn.execute(text(f"DELETE FROM printer_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                     except Exception as e:
                         log.debug(f"[{self.name}] Telemetry insert: {e}")
 
@@ -284,7 +279,6 @@ class MoonrakerMonitor:
                             conn.execute(
                                 text("INSERT INTO ams_telemetry (printer_id, ams_unit, humidity, temperature) VALUES (:pid, :unit, :hum, :temp)"),
                                 {"pid": self.printer_id, "unit": idx, "hum": None, "temp": temp_val})
-                        conn.execute(text(f"DELETE FROM ams_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                     except Exception as e:
                         log.debug(f"[{self.name}] Env telemetry insert: {e}")
 
@@ -700,6 +694,33 @@ class MoonrakerMonitor:
 # ------------------------------------------------------------------
 # Main — standalone daemon mode (supervisor entrypoint)
 # ------------------------------------------------------------------
+def monitor_from_row(row) -> MoonrakerMonitor:
+    """Build a (not yet connected) monitor from a printers row."""
+    api_host = (row["api_host"] or "").strip()
+    api_key_raw = row["api_key"] or ""
+
+    host, port = api_host, 80
+    if ":" in api_host:
+        h, prt = api_host.rsplit(":", 1)
+        host = h.strip() or host
+        try:
+            port = int(prt)
+        except Exception as e:
+            log.debug(f"Failed to parse port '{prt}': {e}")
+            port = 80
+
+    api_key = ""
+    if api_key_raw:
+        try:
+            from core.crypto import decrypt
+            api_key = decrypt(api_key_raw)
+        except Exception as e:
+            log.debug(f"Failed to decrypt API key (using raw): {e}")
+            api_key = api_key_raw
+
+    return MoonrakerMonitor(printer_id=row["id"], name=row["name"], host=host, port=port, api_key=api_key)
+
+
 def start_moonraker_monitors():
     """Load Moonraker printers from DB and start monitors."""
     monitors = []
@@ -711,36 +732,12 @@ def start_moonraker_monitors():
             ).mappings().fetchall()
 
         for row in rows:
-            printer_id = row["id"]
-            name = row["name"]
-            api_host = (row["api_host"] or "").strip()
-            api_key_raw = row["api_key"] or ""
-
-            host, port = api_host, 80
-            if ":" in api_host:
-                h, prt = api_host.rsplit(":", 1)
-                host = h.strip() or host
-                try:
-                    port = int(prt)
-                except Exception as e:
-                    log.debug(f"Failed to parse port '{prt}': {e}")
-                    port = 80
-
-            api_key = ""
-            if api_key_raw:
-                try:
-                    from core.crypto import decrypt
-                    api_key = decrypt(api_key_raw)
-                except Exception as e:
-                    log.debug(f"Failed to decrypt API key (using raw): {e}")
-                    api_key = api_key_raw
-
-            m = MoonrakerMonitor(printer_id=printer_id, name=name, host=host, port=port, api_key=api_key)
+            m = monitor_from_row(row)
             if m.connect():
                 monitors.append(m)
-                log.info(f"Started Moonraker monitor for {name} ({host}:{port})")
+                log.info(f"Started Moonraker monitor for {m.name} ({m.host}:{m.port})")
             else:
-                log.warning(f"Failed to connect Moonraker monitor for {name} ({host}:{port})")
+                log.warning(f"Failed to connect Moonraker monitor for {m.name} ({m.host}:{m.port})")
     except Exception as e:
         log.error(f"Failed to start Moonraker monitors: {e}")
     return monitors
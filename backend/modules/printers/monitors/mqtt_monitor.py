@@ -38,6 +38,37 @@ logging.basicConfig(
 log = logging.getLogger('mqtt_monitor')
 
 
+def printer_from_row(row):
+    """Connection details for a Bambu printers row, or None if it has none."""
+    try:
+        decrypted = crypto.decrypt(row['api_key'])
+        parts = decrypted.split('|')
+        if len(parts) == 2:
+            return {
+                'id': row['id'],
+                'name': row['name'],
+                'ip': row['api_host'],
+                'serial': parts[0],
+                'access_code': parts[1]
+            }
+    except Exception as e:
+        log.warning(f"Could not load {row['name']}: {e}")
+    return None
+
+
+def monitor_is_dead(monitor) -> bool:
+    """True if the MQTT connection dropped or the printer went silent."""
+    if hasattr(monitor, '_bambu') and monitor._bambu:
+        if not monitor._bambu._connected:
+            return True
+
+    # Also check staleness - no heartbeat in 120s
+    if getattr(monitor, '_last_heartbeat', 0) > 0:
+        if time.time() - monitor._last_heartbeat > 120:
+            return True
+    return False
+
+
 class MQTTMonitorDaemon:
     """Main daemon that monitors all printers."""
 
@@ -62,19 +93,9 @@ class MQTTMonitorDaemon:
 
             printers = []
             for row in result.mappings():
-                try:
-                    decrypted = crypto.decrypt(row['api_key'])
-                    parts = decrypted.split('|')
-                    if len(parts) == 2:
-                        printers.append({
-                            'id': row['id'],
-                            'name': row['name'],
-                            'ip': row['api_host'],
-                            'serial': parts[0],
-                            'access_code': parts[1]
-                        })
-                except Exception as e:
-                    log.warning(f"Could not load {row['name']}: {e}")
+                printer = printer_from_row(row)
+                if printer:
+                    printers.append(printer)
 
         return printers
 
@@ -241,18 +262,7 @@ class MQTTMonitorDaemon:
                     log.info(f"[{p['name']}] Reconnected successfully")
                 continue
 
-            # Check if connection is dead
-            is_dead = False
-            if hasattr(monitor, '_bambu') and monitor._bambu:
-                if not monitor._bambu._connected:
-                    is_dead = True
-
-            # Also check staleness - no heartbeat in 60s
-            if not is_dead and getattr(monitor, '_last_heartbeat', 0) > 0:
-                if time.time() - monitor._last_heartbeat > 120:
-                    is_dead = True
-
-            if is_dead:
+            if monitor_is_dead(monitor):
                 log.info(f"[{monitor.name}] Connection dead, reconnecting...")
                 try:
                     monitor.disconnect()
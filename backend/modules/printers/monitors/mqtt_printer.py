@@ -21,6 +21,7 @@ from typing import Dict, Optional, Any
 
 import core.crypto as crypto
 from modules.printers.adapters.bambu import BambuPrinter
+from modules.printers import fleet_state
 from core.db_utils import get_db
 from core.db_compat import sql
 from modules.printers.monitors.mqtt_telemetry import (
@@ -46,6 +47,12 @@ except ImportError:
 
 log = logging.getLogger('mqtt_monitor')
 
+# Columns where a missing value means "clear it" rather than "unchanged".
+_FLEET_NULLABLE = (
+    'bed_temp', 'bed_target_temp', 'nozzle_temp', 'nozzle_target_temp',
+    'gcode_state', 'print_stage', 'hms_errors', 'nozzle_type', 'nozzle_diameter',
+)
+
 
 class PrinterMonitor:
     """Monitors a single printer's MQTT stream."""
@@ -65,6 +72,8 @@ class PrinterMonitor:
         self._last_progress_update: float = 0
         self._last_spool_check: float = 0
         self._camera_discovered: bool = False
+        self._printer_type: Optional[str] = None  # raw MQTT printer_type last written
+        self._machine_type: Optional[str] = None
         self._lock = Lock()
 
     def connect(self) -> bool:
@@ -303,17 +312,7 @@ class PrinterMonitor:
                         import json as _json
                         hms_raw = self._state.get('hms', [])
                         hms_j = _json.dumps(hms_raw) if hms_raw else None
-                        lights_on_raw = parse_lights(self._state.get('lights_report', []))
-                        # Check cooldown — don't overwrite if toggled via API within last 20s
-                        cooldown_row = conn.execute('SELECT lights_toggled_at FROM printers WHERE id=?', (self.printer_id,)).fetchone()
-                        lights_on = lights_on_raw
-                        if cooldown_row and cooldown_row[0]:
-                            from datetime import datetime as _dt
-                            try:
-                                if (_dt.utcnow() - _dt.fromisoformat(cooldown_row[0])).total_seconds() < 20:
-                                    lights_on = None
-                            except Exception as e:
-                                log.debug(f"Failed to parse lights toggle cooldown: {e}")
+                        lights_on = parse_lights(self._state.get('lights_report', []))
                         noz_type = self._state.get('nozzle_type')
                         noz_dia = self._state.get('nozzle_diameter')
                         if isinstance(noz_dia, str):
@@ -322,18 +321,19 @@ class PrinterMonitor:
                             except Exception:
                                 noz_dia = None
                         fan_speed_val = self._state.get('cooling_fan_speed')
-                        conn.execute(
-                            f"UPDATE printers SET last_seen={sql.now()},"
-                            " bed_temp=?,bed_target_temp=?,nozzle_temp=?,nozzle_target_temp=?,"
-                            " gcode_state=?,print_stage=?,hms_errors=?,lights_on=COALESCE(?,lights_on),"
-                            " nozzle_type=?,nozzle_diameter=?,fan_speed=COALESCE(?,fan_speed) WHERE id=?",
-                            (bed_t, bed_tt, noz_t, noz_tt, gstate, stage,
-                             hms_j, lights_on, noz_type, noz_dia, fan_speed_val, self.printer_id))
-                        conn.commit()
+                        # Batched, changed-columns-only write (fleet_state also
+                        # applies the post-toggle lights cooldown).
+                        fleet_state.update(self.printer_id, {
+                            'bed_temp': bed_t, 'bed_target_temp': bed_tt,
+                            'nozzle_temp': noz_t, 'nozzle_target_temp': noz_tt,
+                            'gcode_state': gstate, 'print_stage': stage, 'hms_errors': hms_j,
+                            'lights_on': lights_on, 'nozzle_type': noz_type,
+                            'nozzle_diameter': noz_dia, 'fan_speed': fan_speed_val,
+                        }, nullable=_FLEET_NULLABLE)
 
                         # Auto-detect printer model from MQTT — write once, never overwrite a user-set value
                         raw_pt = self._state.get('printer_type', '')
-                        if raw_pt:
+                        if raw_pt and raw_pt != self._printer_type:
                             try:
                                 from modules.models_library.threemf_parser import _friendly_printer_name
                                 friendly = _friendly_printer_name(raw_pt) or raw_pt
@@ -342,21 +342,13 @@ class PrinterMonitor:
                                     (friendly, self.printer_id)
                                 )
                                 conn.commit()
+                                self._printer_type = raw_pt
+                                # Auto-detect machine_type (H2D, X1C, P1S, etc.) — always update
+                                self._machine_type = friendly
                             except Exception as e:
                                 log.debug(f"[{self.name}] Model auto-detect failed: {e}")
-
-                        # Auto-detect machine_type (H2D, X1C, P1S, etc.) — always update
-                        if raw_pt:
-                            try:
-                                from modules.models_library.threemf_parser import _friendly_printer_name as _fpn
-                                detected_type = _fpn(raw_pt) or raw_pt
-                                conn.execute(
-                                    "UPDATE printers SET machine_type = ? WHERE id = ? AND (machine_type IS NULL OR machine_type != ?)",
-                                    (detected_type, self.printer_id, detected_type)
-                                )
-                                conn.commit()
-                            except Exception as e:
-                                log.debug(f"[{self.name}] machine_type detect failed: {e}")
+                        if self._machine_type:
+                            fleet_state.update(self.printer_id, {'machine_type': self._machine_type})
 
                         # Republish telemetry to external broker
                         if mqtt_republish:
@@ -382,7 +374,6 @@ class PrinterMonitor:
                                     "INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed) VALUES (?, ?, ?, ?, ?, ?)",
                                     (self.printer_id, bed_t, noz_t, bed_tt, noz_tt, fan_speed_val)
                                 )
-                                conn.execute(f"DELETE FROM printer_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}")  # nosemgrep: python.lang.security.audit.formatted-sql-query.formatted-sql-query,python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query -- verified safe — sql.* helpers return constant SQL fragments, no user input
                                 conn.commit()
                             except Exception as e:
                                 log.debug(f"[{self.name}] Telemetry insert: {e}")
@@ -397,9 +388,6 @@ class PrinterMonitor:
                                         "INSERT INTO ams_telemetry (printer_id, ams_unit, humidity, temperature) VALUES (?, ?, ?, ?)",
                                         (self.printer_id, entry['unit_idx'], entry['humidity'], entry['temperature'])
                                     )
-                                conn.execute(  # nosemgrep: python.lang.security.audit.formatted-sql-query.formatted-sql-query,python.sqlalchemy.security.sqlalchemy-execute-raw-query.sqlalchemy-execute-raw-query -- verified safe — sql.* helpers return constant SQL fragments, no user input
-                                    f"DELETE FROM ams_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"
-                                )
                                 conn.commit()
                             except Exception as e:
                                 log.debug(f"[{self.name}] AMS env capture: {e}")
@@ -469,12 +457,15 @@ class PrinterMonitor:
                     # ---- H2D Dual-Nozzle / External Spool Parsing ----
                     h2d_nozzle_data = None
                     external_spools = None
-                    try:
-                        with get_db() as h2d_conn:
-                            mt_row = h2d_conn.execute('SELECT machine_type FROM printers WHERE id=?', (self.printer_id,)).fetchone()
-                            machine_type = mt_row[0] if mt_row else None
-                    except Exception:
-                        machine_type = None
+                    machine_type = self._machine_type
+                    if machine_type is None:
+                        # Not reported over MQTT yet — fall back to the stored value.
+                        try:
+                            with get_db() as h2d_conn:
+                                mt_row = h2d_conn.execute('SELECT machine_type FROM printers WHERE id=?', (self.printer_id,)).fetchone()
+                                machine_type = mt_row[0] if mt_row else None
+                        except Exception:
+                            machine_type = None
 
                     if machine_type == 'H2D':
                         h2d_nozzle_data = parse_h2d_nozzles(self._state)
@@ -494,6 +485,7 @@ class PrinterMonitor:
                         'current_layer': self._state.get('layer_num'),
                         'total_layers': self._state.get('total_layer_num'),
                         'gcode_file': self._state.get('subtask_name') or self._state.get('gcode_file'),
+                        'wifi_signal': self._state.get('wifi_signal'),
                     }
                     if h2d_nozzle_data:
                         ws_payload['h2d_nozzles'] = h2d_nozzle_data
@@ -24,7 +24,7 @@ from datetime import datetime, timezone
 from sqlalchemy import text
 
 from core.db import engine
-from core.db_compat import sql
+from modules.printers import fleet_state
 
 # WebSocket push (same as mqtt_monitor / moonraker_monitor)
 try:
@@ -76,31 +76,36 @@ class PrusaLinkMonitorThread(threading.Thread):
         # Auto-discover camera on startup
         self._discover_and_save_camera()
         while self._running:
-            try:
-                status = self.client.get_status()
-                # If recovering from disconnect, re-discover camera
-                if self._consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
-                    log.info(f"[{self.name}] Connection recovered, re-discovering camera...")
-                    self._discover_and_save_camera()
-                self._consecutive_failures = 0
-                self._marked_offline = False
-                self._process_status(status)
-            except Exception as e:
-                self._consecutive_failures += 1
-                if self._consecutive_failures == MAX_CONSECUTIVE_FAILURES:
-                    log.warning(f"[{self.name}] {MAX_CONSECUTIVE_FAILURES} consecutive failures, treating as disconnect")
-                    # Mark printer offline in DB (same as Bambu/Moonraker pattern)
-                    if not self._marked_offline:
-                        self._marked_offline = True
-                        try:
-                            with engine.begin() as conn:
-                                conn.execute(text("UPDATE printers SET gcode_state='OFFLINE' WHERE id=:pid"), {"pid": self.printer_id})
-                        except Exception as e:
-                            log.debug(f"Failed to mark printer offline: {e}")
-                log.warning(f"[{self.name}] Poll error ({self._consecutive_failures}): {e}")
+            self.poll_once()
             time.sleep(POLL_INTERVAL)
         log.info(f"[{self.name}] PrusaLink monitor stopped")
 
+    def poll_once(self):
+        """One poll of /api/v1/status. Also driven by monitor_host.py."""
+        try:
+            status = self.client.get_status()
+            # If recovering from disconnect, re-discover camera
+            if self._consecutive_failures >= MAX_CONSECUTIVE_FAILURES:
+                log.info(f"[{self.name}] Connection recovered, re-discovering camera...")
+                self._discover_and_save_camera()
+            self._consecutive_failures = 0
+            self._marked_offline = False
+            self._process_status(status)
+        except Exception as e:
+            self._consecutive_failures += 1
+            if self._consecutive_failures == MAX_CONSECUTIVE_FAILURES:
+                log.warning(f"[{self.name}] {MAX_CONSECUTIVE_FAILURES} consecutive failures, treating as disconnect")
+                # Mark printer offline in DB (same as Bambu/Moonraker pattern)
+                if not self._marked_offline:
+                    self._marked_offline = True
+                    fleet_state.store.forget(self.printer_id)  # pending writes must not undo this
+                    try:
+                        with engine.begin() as conn:
+                            conn.execute(text("UPDATE printers SET gcode_state='OFFLINE' WHERE id=:pid"), {"pid": self.printer_id})
+                    except Exception as e:
+                        log.debug(f"Failed to mark printer offline: {e}")
+            log.warning(f"[{self.name}] Poll error ({self._consecutive_failures}): {e}")
+
     def _try_dispatch(self):
         """Attempt auto-dispatch of next scheduled job after print completes."""
         try:
@@ -247,15 +252,13 @@ class PrusaLinkMonitorThread(threading.Thread):
                     else:
                         stage = "Idle"
 
-                    conn.execute(
-                        text(f"UPDATE printers SET last_seen={sql.now()},"  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-                        " bed_temp=COALESCE(:bed_t,bed_temp),bed_target_temp=COALESCE(:bed_tt,bed_target_temp),"
-                        " nozzle_temp=COALESCE(:noz_t,nozzle_temp),nozzle_target_temp=COALESCE(:noz_tt,nozzle_target_temp),"
-                        " gcode_state=COALESCE(:gstate,gcode_state),print_stage=COALESCE(:stage,print_stage),"
-                        " fan_speed=COALESCE(:fan_speed,fan_speed) WHERE id=:pid"),
-                        {"bed_t": bed_t, "bed_tt": bed_tt, "noz_t": noz_t, "noz_tt": noz_tt,
-                         "gstate": gstate, "stage": stage, "fan_speed": fan_speed_val, "pid": self.printer_id}
-                    )
+                    # Batched, changed-columns-only write (see fleet_state.py)
+                    fleet_state.update(self.printer_id, {
+                        "bed_temp": bed_t, "bed_target_temp": bed_tt,
+                        "nozzle_temp": noz_t, "nozzle_target_temp": noz_tt,
+                        "gcode_state": gstate, "print_stage": stage,
+                        "fan_speed": fan_speed_val,
+                    })
 
                     # WebSocket push to frontend
                     ws_push('printer_telemetry', {
@@ -297,7 +300,6 @@ class PrusaLinkMonitorThread(threading.Thread):
                                 text("INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed) VALUES (:pid, :bed_t, :noz_t, :bed_tt, :noz_tt, :fan)"),
                                 {"pid": self.printer_id, "bed_t": bed_t, "noz_t": noz_t, "bed_tt": bed_tt, "noz_tt": noz_tt, "fan": fan_speed_val}
                             )
-                            conn.execute(text(f"DELETE FROM printer_telemetry WHERE recorded_at < {sql.now_offset('-90 days')}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
                         except Exception as e:
                             log.debug(f"[{self.name}] Telemetry insert: {e}")
 
@@ -310,6 +312,37 @@ class PrusaLinkMonitorThread(threading.Thread):
 # ------------------------------------------------------------------
 # Main — standalone daemon mode (like moonraker_monitor.py)
 # ------------------------------------------------------------------
+def monitor_from_row(row) -> PrusaLinkMonitorThread:
+    """Build a (not yet started) monitor from a printers row."""
+    api_key_raw = row["api_key"] or ""
+
+    # Decrypt credentials if encrypted (same as Moonraker)
+    username = "maker"
+    password = ""
+    api_key = ""
+    if api_key_raw:
+        try:
+            from core.crypto import decrypt
+            decrypted = decrypt(api_key_raw)
+            # Format: "username|password" or just "api_key"
+            if "|" in decrypted:
+                username, password = decrypted.split("|", 1)
+            else:
+                api_key = decrypted
+        except Exception:
+            # Not encrypted or decrypt failed — use as raw API key
+            api_key = api_key_raw
+
+    return PrusaLinkMonitorThread(
+        printer_id=row["id"],
+        name=row["name"],
+        host=row["api_host"],
+        username=username,
+        password=password,
+        api_key=api_key,
+    )
+
+
 def start_prusalink_monitors():
     """
     Load PrusaLink printers from DB and start monitor threads.
@@ -323,39 +356,10 @@ def start_prusalink_monitors():
             ).mappings().fetchall()
 
         for row in rows:
-            printer_id = row["id"]
-            name = row["name"]
-            host = row["api_host"]
-            api_key_raw = row["api_key"] or ""
-
-            # Decrypt credentials if encrypted (same as Moonraker)
-            username = "maker"
-            password = ""
-            api_key = ""
-            if api_key_raw:
-                try:
-                    from core.crypto import decrypt
-                    decrypted = decrypt(api_key_raw)
-                    # Format: "username|password" or just "api_key"
-                    if "|" in decrypted:
-                        username, password = decrypted.split("|", 1)
-                    else:
-                        api_key = decrypted
-                except Exception:
-                    # Not encrypted or decrypt failed — use as raw API key
-                    api_key = api_key_raw
-
-            t = PrusaLinkMonitorThread(
-                printer_id=printer_id,
-                name=name,
-                host=host,
-                username=username,
-                password=password,
-                api_key=api_key,
-            )
+            t = monitor_from_row(row)
             t.start()
             threads.append(t)
-            log.info(f"Started PrusaLink monitor for {name} ({host})")
+            log.info(f"Started PrusaLink monitor for {t.name} ({t.host})")
 
     except Exception as e:
         log.error(f"Failed to start PrusaLink monitors: {e}")
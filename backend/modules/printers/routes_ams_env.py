@@ -9,8 +9,8 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from core.db import get_db
-from core.db_compat import sql
 from core.rbac import require_role
+from modules.printers import telemetry_rollups
 from modules.printers.models import Printer, FilamentSlot
 
 log = logging.getLogger("odin.api")
@@ -22,42 +22,24 @@ router = APIRouter()
 # ====================================================================
 
 @router.get("/printers/{printer_id}/ams/environment", tags=["AMS"])
-async def get_ams_environment(
+def get_ams_environment(
     printer_id: int,
-    hours: int = Query(default=24, ge=1, le=168),
+    hours: int = Query(default=24, ge=1, le=2160),
     unit: Optional[int] = None,
+    max_points: int = Query(default=1000, ge=10, le=10000),
     db: Session = Depends(get_db)
 ):
-    """Get AMS humidity/temperature history for charts."""
-    _cutoff = sql.now_offset(f"-{hours} hours")
-    query = f"""
-        SELECT ams_unit, humidity, temperature, recorded_at
-        FROM ams_telemetry
-        WHERE printer_id = :printer_id
-        AND recorded_at >= {_cutoff}
-    """
-    params = {"printer_id": printer_id}
-
-    if unit is not None:
-        query += " AND ams_unit = :unit"
-        params["unit"] = unit
-
-    query += " ORDER BY recorded_at ASC"
-
-    rows = db.execute(text(query), params).fetchall()  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-
-    units = {}
-    for row in rows:
-        u = row[0]
-        if u not in units:
-            units[u] = []
-        units[u].append({"humidity": row[1], "temperature": row[2], "time": row[3]})
+    """Get AMS humidity/temperature history for charts.
 
+    At most `max_points` points per unit; beyond 24h from the 15-minute
+    rollups (see telemetry_rollups.py).
+    """
+    units = telemetry_rollups.ams_series(db, printer_id, hours, max_points, unit)
     return {"printer_id": printer_id, "hours": hours, "units": units}
 
 
 @router.get("/printers/{printer_id}/ams/current", tags=["AMS"])
-async def get_ams_current(printer_id: int, db: Session = Depends(get_db)):
+def get_ams_current(printer_id: int, db: Session = Depends(get_db)):
     """Get latest AMS environmental readings for a printer."""
     rows = db.execute(text("""
         SELECT ams_unit, humidity, temperature, recorded_at
@@ -88,7 +70,7 @@ async def get_ams_current(printer_id: int, db: Session = Depends(get_db)):
 # ====================================================================
 
 @router.post("/printers/{printer_id}/ams/refresh", tags=["AMS"])
-async def refresh_ams_rfid(
+def refresh_ams_rfid(
     printer_id: int,
     current_user: dict = Depends(require_role("operator")),
     db: Session = Depends(get_db),
@@ -113,7 +95,7 @@ class AMSSlotConfigRequest(PydanticBaseModel):
 
 
 @router.put("/printers/{printer_id}/ams/{ams_id}/slots/{slot_id}", tags=["AMS"])
-async def configure_ams_slot(
+def configure_ams_slot(
     printer_id: int,
     ams_id: int,
     slot_id: int,
@@ -92,7 +92,7 @@ async def test_bambu_printer_connection(request: BambuConnectionTest, current_us
 
 
 @router.post("/printers/{printer_id}/bambu/sync-ams", response_model=BambuSyncResult, tags=["Bambu"])
-async def sync_bambu_ams(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def sync_bambu_ams(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Sync AMS filament slots from a Bambu Lab printer."""
     if not BAMBU_AVAILABLE:
         raise HTTPException(status_code=501, detail="Bambu integration not available")
@@ -127,8 +127,8 @@ async def sync_bambu_ams(printer_id: int, current_user: dict = Depends(require_r
         try:
             from core.itar import pin_for_request, should_trust_env
             with pin_for_request(settings.spoolman_url):
-                async with httpx.AsyncClient(trust_env=should_trust_env()) as client:
-                    resp = await client.get(f"{settings.spoolman_url}/api/v1/spool", timeout=5)
+                with httpx.Client(trust_env=should_trust_env()) as client:
+                    resp = client.get(f"{settings.spoolman_url}/api/v1/spool", timeout=5)
                     if resp.status_code == 200:
                         for spool in resp.json():
                             filament = spool.get("filament", {})
@@ -220,7 +220,7 @@ async def list_bambu_filament_types():
 
 
 @router.patch("/printers/{printer_id}/slots/{slot_number}/manual-assign", tags=["Bambu"])
-async def manual_slot_assignment(
+def manual_slot_assignment(
     printer_id: int,
     slot_number: int,
     assignment: ManualSlotAssignment,
@@ -269,7 +269,7 @@ async def manual_slot_assignment(
 
 
 @router.get("/printers/{printer_id}/unmatched-slots", tags=["Bambu"])
-async def get_unmatched_slots(printer_id: int, db: Session = Depends(get_db)):
+def get_unmatched_slots(printer_id: int, db: Session = Depends(get_db)):
     """Get slots that need manual filament assignment."""
     printer = db.query(Printer).filter(Printer.id == printer_id).first()
     if not printer:
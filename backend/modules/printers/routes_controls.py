@@ -30,7 +30,7 @@ router = APIRouter()
 # ====================================================================
 
 @router.post("/printers/{printer_id}/stop", tags=["Printers"])
-async def stop_printer(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def stop_printer(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Emergency stop - cancel current print."""
     printer = db.query(Printer).filter(Printer.id == printer_id).first()
     if not printer:
@@ -47,7 +47,7 @@ async def stop_printer(printer_id: int, current_user: dict = Depends(require_rol
 
 
 @router.post("/printers/{printer_id}/pause", tags=["Printers"])
-async def pause_printer(
+def pause_printer(
     printer_id: int,
     request: Request,
     # Stacked auth (Phase 2 canonical pattern — see
@@ -136,7 +136,7 @@ async def pause_printer(
 
 
 @router.post("/printers/{printer_id}/resume", tags=["Printers"])
-async def resume_printer(
+def resume_printer(
     printer_id: int,
     request: Request,
     # Stacked auth — see pause_printer above for rationale. BOTH deps required.
@@ -220,7 +220,7 @@ async def resume_printer(
 # ====================================================================
 
 @router.post("/printers/{printer_id}/clear-errors", tags=["Printers"])
-async def clear_printer_errors(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def clear_printer_errors(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Clear HMS/print errors on a Bambu printer."""
     printer = db.query(Printer).filter(Printer.id == printer_id).first()
     if not printer:
@@ -235,7 +235,7 @@ async def clear_printer_errors(printer_id: int, current_user: dict = Depends(req
 
 
 @router.post("/printers/{printer_id}/skip-objects", tags=["Printers"])
-async def skip_printer_objects(
+def skip_printer_objects(
     printer_id: int,
     body: dict,
     current_user: dict = Depends(require_role("operator")),
@@ -258,7 +258,7 @@ async def skip_printer_objects(
 
 
 @router.post("/printers/{printer_id}/speed", tags=["Printers"])
-async def set_printer_speed(
+def set_printer_speed(
     printer_id: int,
     body: dict,
     current_user: dict = Depends(require_role("operator")),
@@ -286,7 +286,7 @@ async def set_printer_speed(
 # ====================================================================
 
 @router.post("/printers/{printer_id}/fan", tags=["Printers"])
-async def set_fan_speed(
+def set_fan_speed(
     printer_id: int,
     body: dict,
     current_user: dict = Depends(require_role("operator")),
@@ -405,7 +405,7 @@ def toggle_printer_lights(printer_id: int, current_user: dict = Depends(require_
 # ====================================================================
 
 @router.post("/printers/{printer_id}/plate-cleared", tags=["Printers"])
-async def plate_cleared(
+def plate_cleared(
     printer_id: int,
     current_user: dict = Depends(require_role("operator")),
     db: Session = Depends(get_db),
@@ -23,6 +23,7 @@ from core.rbac import (
     require_role,
 )
 import core.crypto as crypto
+from modules.printers import live_status
 from modules.printers.models import Printer, FilamentSlot
 from modules.printers.schemas import (
     PrinterCreate, PrinterUpdate, PrinterResponse, FilamentSlotUpdate, FilamentSlotResponse,
@@ -67,7 +68,19 @@ def list_printers(
     printers = query.order_by(Printer.display_order, Printer.id).all()
     if tag:
         printers = [p for p in printers if p.tags and tag in p.tags]
-    return printers
+    return [_with_live_columns(p) for p in printers]
+
+
+def _with_live_columns(printer: Printer) -> PrinterResponse:
+    """Response for `printer` with telemetry columns from the live snapshot.
+
+    The ORM object is left untouched so nothing is written back.
+    """
+    response = PrinterResponse.model_validate(printer)
+    columns = live_status.printer_columns(printer.id)
+    if response.last_seen and columns.get("last_seen") and columns["last_seen"] < response.last_seen:
+        del columns["last_seen"]
+    return response.model_copy(update=columns) if columns else response
 
 
 @router.get("/printers/tags", tags=["Printers"])
@@ -173,13 +186,9 @@ def get_all_printers_live_status_early(
     current_user: dict = Depends(require_role("viewer")),
     db: Session = Depends(get_db),
 ):
-    """Get real-time status from all Bambu printers."""
-    from modules.printers.routes_status import _fetch_printer_live_status
-    printers = db.query(Printer).filter(
-        Printer.api_host.isnot(None),
-        Printer.api_key.isnot(None),
-    ).all()
-    return [_fetch_printer_live_status(printer.id, db) for printer in printers]
+    """Get the latest status of all Bambu printers in one call."""
+    from modules.printers.routes_status import _fetch_all_live_status
+    return _fetch_all_live_status(db)
 
 
 @router.get("/printers/{printer_id}", response_model=PrinterResponse, tags=["Printers"])
@@ -281,6 +290,9 @@ def delete_printer(printer_id: int, current_user: dict = Depends(require_role("o
     log_audit(db, "printer.deleted", "printer", printer_id, {"name": printer_name})
     db.commit()
 
+    live_status.pool.release(printer_id)
+    live_status.store.forget(printer_id)
+
 
 # ====================================================================
 # Filament Slots
@@ -350,20 +362,21 @@ def get_overlay_data(printer_id: int, db: Session = Depends(get_db)):
         ),
         {"pid": printer_id},
     ).fetchone()
+    live = live_status.printer_columns(printer_id)
     return {
         "printer_id": printer.id,
         "printer_name": printer.nickname or printer.name,
         "model": printer.model,
-        "gcode_state": printer.gcode_state,
+        "gcode_state": live.get("gcode_state", printer.gcode_state),
         "print_stage": printer.print_stage,
         "print_progress": job_row[1] if job_row else None,
         "current_layer": job_row[2] if job_row else None,
         "total_layers": job_row[3] if job_row else None,
         "time_remaining_min": job_row[4] if job_row else None,
-        "nozzle_temp": printer.nozzle_temp,
-        "nozzle_target_temp": printer.nozzle_target_temp,
-        "bed_temp": printer.bed_temp,
-        "bed_target_temp": printer.bed_target_temp,
+        "nozzle_temp": live.get("nozzle_temp", printer.nozzle_temp),
+        "nozzle_target_temp": live.get("nozzle_target_temp", printer.nozzle_target_temp),
+        "bed_temp": live.get("bed_temp", printer.bed_temp),
+        "bed_target_temp": live.get("bed_target_temp", printer.bed_target_temp),
         "job_name": job_row[0] if job_row else None,
         "camera_url": camera_url,
     }
@@ -374,7 +387,7 @@ def get_overlay_data(printer_id: int, db: Session = Depends(get_db)):
 # ====================================================================
 
 @router.post("/printers/bulk-update", tags=["Printers"])
-async def bulk_update_printers(body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def bulk_update_printers(body: dict, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
     """Bulk update printer fields for multiple printers."""
     printer_ids = body.get("printer_ids", [])
     if not printer_ids or not isinstance(printer_ids, list):
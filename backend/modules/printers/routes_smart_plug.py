@@ -7,6 +7,7 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from core.db import get_db
+from core.dependencies import get_json_body
 from core.db_compat import sql
 from core.rbac import require_role, check_org_access
 import core.crypto as crypto
@@ -38,7 +39,7 @@ def _require_printer_org_access(printer_id: int, current_user: dict, db: Session
 
 
 @router.get("/printers/{printer_id}/plug", tags=["Smart Plug"])
-async def get_plug_config(printer_id: int, db: Session = Depends(get_db)):
+def get_plug_config(printer_id: int, db: Session = Depends(get_db)):
     """Get smart plug configuration for a printer."""
     result = db.execute(text("""
         SELECT plug_type, plug_host, plug_entity_id, plug_auto_on, plug_auto_off,
@@ -63,10 +64,9 @@ async def get_plug_config(printer_id: int, db: Session = Depends(get_db)):
 
 
 @router.put("/printers/{printer_id}/plug", tags=["Smart Plug"])
-async def update_plug_config(printer_id: int, request: Request, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def update_plug_config(printer_id: int, request: Request, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db), data: dict = Depends(get_json_body)):
     """Update smart plug configuration for a printer."""
     _require_printer_org_access(printer_id, current_user, db)
-    data = await request.json()
 
     plug_type = data.get("type")
     if plug_type and plug_type not in ("tasmota", "homeassistant", "mqtt"):
@@ -98,7 +98,7 @@ async def update_plug_config(printer_id: int, request: Request, current_user: di
 
 
 @router.delete("/printers/{printer_id}/plug", tags=["Smart Plug"])
-async def remove_plug_config(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def remove_plug_config(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Remove smart plug configuration from a printer."""
     _require_printer_org_access(printer_id, current_user, db)
     db.execute(text("""
@@ -113,7 +113,7 @@ async def remove_plug_config(printer_id: int, current_user: dict = Depends(requi
 
 
 @router.post("/printers/{printer_id}/plug/on", tags=["Smart Plug"])
-async def plug_power_on(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def plug_power_on(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Turn on a printer's smart plug."""
     _require_printer_org_access(printer_id, current_user, db)
     result = smart_plug.power_on(printer_id)
@@ -123,7 +123,7 @@ async def plug_power_on(printer_id: int, current_user: dict = Depends(require_ro
 
 
 @router.post("/printers/{printer_id}/plug/off", tags=["Smart Plug"])
-async def plug_power_off(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def plug_power_off(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Turn off a printer's smart plug."""
     _require_printer_org_access(printer_id, current_user, db)
     result = smart_plug.power_off(printer_id)
@@ -133,7 +133,7 @@ async def plug_power_off(printer_id: int, current_user: dict = Depends(require_r
 
 
 @router.post("/printers/{printer_id}/plug/toggle", tags=["Smart Plug"])
-async def plug_power_toggle(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def plug_power_toggle(printer_id: int, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Toggle a printer's smart plug."""
     _require_printer_org_access(printer_id, current_user, db)
     result = smart_plug.power_toggle(printer_id)
@@ -161,16 +161,15 @@ async def plug_state(printer_id: int):
 
 
 @router.get("/settings/energy-rate", tags=["Smart Plug"])
-async def get_energy_rate(db: Session = Depends(get_db)):
+def get_energy_rate(db: Session = Depends(get_db)):
     """Get energy cost per kWh."""
     result = db.execute(text("SELECT value FROM system_config WHERE key = 'energy_cost_per_kwh'")).fetchone()
     return {"energy_cost_per_kwh": float(result[0]) if result else 0.12}
 
 
 @router.put("/settings/energy-rate", tags=["Smart Plug"])
-async def set_energy_rate(request: Request, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db)):
+def set_energy_rate(request: Request, current_user: dict = Depends(require_role("admin")), db: Session = Depends(get_db), data: dict = Depends(get_json_body)):
     """Set energy cost per kWh."""
-    data = await request.json()
     rate = data.get("energy_cost_per_kwh", 0.12)
     db.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
         f"{sql.upsert_prefix()} system_config (key, value) VALUES ('energy_cost_per_kwh', :rate)"
@@ -1,7 +1,7 @@
 """Printer status routes — live status, telemetry, HMS error history, nozzle status."""
 
 import logging
-import time
+from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy import text
@@ -11,6 +11,7 @@ from core.db import get_db
 from core.db_compat import sql
 from core.rbac import require_role
 import core.crypto as crypto
+from modules.printers import live_status, telemetry_rollups
 from modules.printers.models import Printer
 
 log = logging.getLogger("odin.api")
@@ -21,121 +22,81 @@ router = APIRouter()
 # Live Status
 # ====================================================================
 
-def _fetch_printer_live_status(printer_id: int, db: Session) -> dict:
-    """Shared logic: fetch real-time status from a single printer via MQTT."""
-    printer = db.query(Printer).filter(Printer.id == printer_id).first()
-    if not printer:
-        raise HTTPException(status_code=404, detail="Printer not found")
-
+def _live_status_credentials(printer):
+    """(host, serial, access_code) for a Bambu printer, or an error dict."""
     if not printer.api_host or not printer.api_key:
-        return {"error": "Printer not configured for MQTT"}
-
+        return None, {"error": "Printer not configured for MQTT"}
     try:
         parts = crypto.decrypt(printer.api_key).split("|")
         if len(parts) != 2:
-            return {"error": "Invalid credentials format"}
+            return None, {"error": "Invalid credentials format"}
         serial, access_code = parts
     except Exception:
-        return {"error": "Could not decrypt credentials"}
-
-    # Route through V2 when ODIN_TELEMETRY_V2=1; legacy path otherwise.
-    from modules.printers.telemetry.feature_flag import is_v2_enabled
-    if is_v2_enabled():
-        return _fetch_live_status_v2(printer_id, printer, serial, access_code)
-    return _fetch_live_status_legacy(printer_id, printer, serial, access_code)
-
-
-def _fetch_live_status_v2(printer_id, printer, serial, access_code) -> dict:
-    """V2 path — uses BambuTelemetryAdapter via read_status_once."""
-    from modules.printers.telemetry.bambu.adapter import BambuAdapterConfig
-    from modules.printers.telemetry.bambu.session import read_status_once
-
-    config = BambuAdapterConfig(
-        printer_id=f"legacy-route-{printer.id}",
-        serial=serial,
-        host=printer.api_host,
-        access_code=access_code,
-    )
-    try:
-        result = read_status_once(config, timeout=5.0)
-    except Exception as e:
-        log.debug("V2 live status fetch error for printer %s: %s", printer_id, e, exc_info=True)
-        return {"error": "Unable to fetch live status"}
-
-    if not result.success:
-        return {"error": result.error or "Connection failed"}
-    if result.section is None:
-        return {"error": "Timeout waiting for status"}
+        return None, {"error": "Could not decrypt credentials"}
+    return (printer.api_host, serial, access_code), None
 
-    s = result.section
-    return {
-        "printer_id": printer_id,
-        "printer_name": printer.name,
-        "gcode_state": s.gcode_state.value if s.gcode_state else None,
-        "job_name": s.subtask_name,
-        "progress": s.mc_percent,
-        "layer": s.layer_num,
-        "total_layers": s.total_layer_num,
-        "time_remaining": s.mc_remaining_time,
-        "bed_temp": s.bed_temper,
-        "bed_target": s.bed_target_temper,
-        "nozzle_temp": s.nozzle_temper,
-        "nozzle_target": s.nozzle_target_temper,
-        "wifi_signal": s.wifi_signal,
-    }
 
+def _fetch_printer_live_status(printer_id: int, db: Session) -> dict:
+    """Shared logic: current status of a single printer.
 
-def _fetch_live_status_legacy(printer_id, printer, serial, access_code) -> dict:
-    """Legacy path — unchanged behavior for ODIN_TELEMETRY_V2=0."""
-    from modules.printers.adapters.bambu import BambuPrinter
+    Answered from the in-memory snapshot the monitors keep fresh; only
+    when that is missing or stale does it go to the printer, through a
+    pooled MQTT session (see live_status.py).
+    """
+    printer = db.query(Printer).filter(Printer.id == printer_id).first()
+    if not printer:
+        raise HTTPException(status_code=404, detail="Printer not found")
 
-    status_data = {}
-    def on_status(s):
-        nonlocal status_data
-        status_data = s.raw_data.get('print', {})
+    creds, error = _live_status_credentials(printer)
+    if error:
+        return error
 
     try:
-        bp = BambuPrinter(
-            ip=printer.api_host,
-            serial=serial,
-            access_code=access_code,
-            on_status_update=on_status,
-        )
-        if bp.connect():
-            timeout = 5
-            start = time.time()
-            while not status_data and (time.time() - start) < timeout:
-                time.sleep(0.2)
-            bp.disconnect()
-
-            if status_data:
-                return {
-                    "printer_id": printer_id,
-                    "printer_name": printer.name,
-                    "gcode_state": status_data.get('gcode_state'),
-                    "job_name": status_data.get('subtask_name'),
-                    "progress": status_data.get('mc_percent'),
-                    "layer": status_data.get('layer_num'),
-                    "total_layers": status_data.get('total_layer_num'),
-                    "time_remaining": status_data.get('mc_remaining_time'),
-                    "bed_temp": status_data.get('bed_temper'),
-                    "bed_target": status_data.get('bed_target_temper'),
-                    "nozzle_temp": status_data.get('nozzle_temper'),
-                    "nozzle_target": status_data.get('nozzle_target_temper'),
-                    "wifi_signal": status_data.get('wifi_signal'),
-                }
-            else:
-                return {"error": "Timeout waiting for status"}
-        else:
-            return {"error": "Connection failed"}
+        snap, error = live_status.get_snapshot(printer_id, creds, timeout=5.0)
     except Exception as e:
         log.debug("Live status fetch error for printer %s: %s", printer_id, e, exc_info=True)
         return {"error": "Unable to fetch live status"}
+    if error:
+        return {"error": error}
+    return snap.as_response(printer_id, printer.name)
+
+
+def _fetch_all_live_status(db: Session) -> list:
+    """Current status of every Bambu printer, without waiting on any of them.
+
+    Printers whose snapshot is missing or stale get a pooled session
+    opened in the background; they report `stale: true` (or an error if
+    nothing has arrived yet) until it delivers.
+    """
+    printers = db.query(Printer).filter(
+        Printer.api_host.isnot(None),
+        Printer.api_key.isnot(None),
+    ).all()
+    results = []
+    for printer in printers:
+        snap, current = live_status.cached_snapshot(printer.id)
+        if not current:
+            creds, error = _live_status_credentials(printer)
+            if error:
+                results.append({"printer_id": printer.id, "printer_name": printer.name, **error})
+                continue
+            live_status.pool.warm(printer.id, creds)
+        if snap is None:
+            results.append({
+                "printer_id": printer.id,
+                "printer_name": printer.name,
+                "error": "No status received yet",
+            })
+            continue
+        entry = snap.as_response(printer.id, printer.name)
+        entry["stale"] = not current
+        results.append(entry)
+    return results
 
 
 @router.get("/printers/{printer_id}/live-status", tags=["Printers"])
 def get_printer_live_status(printer_id: int, db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
-    """Get real-time status from printer via MQTT."""
+    """Get real-time status from printer (monitor snapshot, or a pooled MQTT session)."""
     return _fetch_printer_live_status(printer_id, db)
 
 
@@ -144,17 +105,21 @@ def get_printer_live_status(printer_id: int, db: Session = Depends(get_db), curr
 # ====================================================================
 
 @router.get("/printers/{printer_id}/telemetry", tags=["Telemetry"])
-def get_printer_telemetry(printer_id: int, hours: int = Query(24, ge=1, le=168),
+def get_printer_telemetry(printer_id: int, hours: int = Query(24, ge=1, le=2160),
+                          resolution: Optional[str] = Query(None, pattern="^(raw|1m|15m)$"),
+                          max_points: int = Query(1000, ge=10, le=10000),
                           current_user: dict = Depends(require_role("viewer")), db: Session = Depends(get_db)):
-    """Get timeseries telemetry data for a printer (recorded during prints)."""
-    cutoff_expr = sql.now_offset(f"-{hours} hours")
-    rows = db.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-        f"SELECT recorded_at, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed "
-        f"FROM printer_telemetry WHERE printer_id = :pid AND recorded_at > {cutoff_expr} "
-        f"ORDER BY recorded_at ASC"
-    ), {"pid": printer_id}).fetchall()
-    return [{"recorded_at": r[0], "bed_temp": r[1], "nozzle_temp": r[2],
-             "bed_target": r[3], "nozzle_target": r[4], "fan_speed": r[5]} for r in rows]
+    """Get timeseries telemetry data for a printer (recorded during prints).
+
+    At most `max_points` points, averaged per time bucket with bed/nozzle
+    min and max kept. Served from raw samples (last 24h) or the 1-minute /
+    15-minute rollups, whichever is coarsest for the window unless
+    `resolution` picks one.
+    """
+    try:
+        return telemetry_rollups.printer_series(db, printer_id, hours, max_points, resolution)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # ====================================================================
@@ -0,0 +1,310 @@
+"""Telemetry retention tiers and downsampled chart series.
+
+`printer_telemetry` (one row a minute per printing printer) and
+`ams_telemetry` (one row per AMS unit every 5 minutes) used to keep every
+sample for 90 days, and the chart endpoints returned every row in the
+window — 10k points for a week of one printer.
+
+Data now lives in tiers (migration 002_telemetry_rollups.sql):
+
+  raw   the sample tables, kept RAW_RETENTION (24h)
+  1m    printer_telemetry_rollup, resolution 60, kept 7 days
+  15m   printer_telemetry_rollup / ams_telemetry_rollup, resolution 900,
+        kept 90 days (the old raw retention)
+
+A rollup row holds a bucket's sample count and average, with min and max
+for the measured values (temperatures, humidity) and the max for targets.
+
+`maintain()` runs in the monitor host every 5 minutes. It rolls up
+the complete buckets since each tier's watermark (telemetry_rollup_state)
+straight from the raw rows, then applies retention. Raw rows are never
+deleted before every tier has rolled them up.
+
+`printer_series()` / `ams_series()` answer the chart endpoints. They pick
+the coarsest tier that still gives `max_points / 2` over the window, add the
+raw rows newer than that tier's watermark, and downsample in SQL to at
+most `max_points` buckets — so the response size no longer depends on
+the window, and a week of data is a few hundred index-range rows.
+"""
+
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from core.db_compat import sql
+
+log = logging.getLogger("telemetry_rollups")
+
+MINUTE = 60
+DAY = 86400
+
+RAW_RETENTION = 1 * DAY
+_SETTLE = 10                # seconds a bucket must be closed before rolling up
+
+# Query parameter -> tier resolution (0 = raw samples)
+RESOLUTIONS = {"raw": 0, "1m": MINUTE, "15m": 15 * MINUTE}
+
+
+@dataclass(frozen=True)
+class _Source:
+    table: str
+    rollup_table: str
+    keys: Tuple[str, ...]        # grouping columns besides the bucket
+    measured: Tuple[str, ...]    # rolled up as avg, min, max
+    peak: Tuple[str, ...]        # rolled up as max (setpoints)
+    mean: Tuple[str, ...]        # rolled up as avg
+    tiers: Tuple[Tuple[int, int], ...]   # (resolution, retention seconds)
+
+    def series_name(self, resolution: int) -> str:
+        return f"{self.table}:{resolution}"
+
+    def rollup_columns(self) -> List[str]:
+        cols = []
+        for c in self.measured:
+            cols += [c, f"{c}_min", f"{c}_max"]
+        return cols + list(self.peak) + list(self.mean)
+
+
+PRINTER = _Source(
+    table="printer_telemetry",
+    rollup_table="printer_telemetry_rollup",
+    keys=("printer_id",),
+    measured=("bed_temp", "nozzle_temp"),
+    peak=("bed_target", "nozzle_target"),
+    mean=("fan_speed",),
+    tiers=((MINUTE, 7 * DAY), (15 * MINUTE, 90 * DAY)),
+)
+
+AMS = _Source(
+    table="ams_telemetry",
+    rollup_table="ams_telemetry_rollup",
+    keys=("printer_id", "ams_unit"),
+    measured=("humidity", "temperature"),
+    peak=(),
+    mean=(),
+    tiers=((15 * MINUTE, 90 * DAY),),
+)
+
+SOURCES = (PRINTER, AMS)
+
+
+def _ts(epoch: int) -> str:
+    """Epoch seconds in the format recorded_at is stored in (UTC)."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def _default_engine():
+    from core.db import engine
+    return engine
+
+
+# ====================================================================
+# Maintenance
+# ====================================================================
+
+def _rollup_sql(source: _Source) -> str:
+    aggregates = []
+    for c in source.measured:
+        aggregates += [f"AVG({c})", f"MIN({c})", f"MAX({c})"]
+    aggregates += [f"MAX({c})" for c in source.peak]
+    aggregates += [f"AVG({c})" for c in source.mean]
+    keys = ", ".join(source.keys)
+    columns = ", ".join([*source.keys, "resolution", "bucket", "samples", *source.rollup_columns()])
+    conflict = sql.on_conflict_suffix(
+        f"{keys}, resolution, bucket", ["samples", *source.rollup_columns()],
+    )
+    return (
+        f"{sql.upsert_prefix()} {source.rollup_table} ({columns}) "
+        f"SELECT {keys}, :res, ({sql.epoch('recorded_at')} / :res) * :res AS b, COUNT(*), "
+        f"{', '.join(aggregates)} "
+        f"FROM {source.table} WHERE recorded_at >= :start AND recorded_at < :until "
+        f"GROUP BY {keys}, b{conflict}"
+    )
+
+
+def _watermarks(conn) -> Dict[str, int]:
+    rows = conn.execute(text("SELECT series, rolled_until FROM telemetry_rollup_state")).fetchall()
+    return {r[0]: int(r[1]) for r in rows}
+
+
+def _set_watermark(conn, series: str, rolled_until: int) -> None:
+    conn.execute(text(
+        f"{sql.upsert_prefix()} telemetry_rollup_state (series, rolled_until) "
+        f"VALUES (:series, :until){sql.on_conflict_suffix('series', ['rolled_until'])}"
+    ), {"series": series, "until": rolled_until})
+
+
+def maintain(engine=None, now: Optional[float] = None) -> Dict[str, int]:
+    """Roll up complete buckets, then apply retention. One transaction.
+
+    Returns the number of rollup rows written per series. The first run
+    rolls up whatever raw history exists, so nothing is lost when raw
+    retention drops from 90 days to RAW_RETENTION.
+    """
+    engine = engine or _default_engine()
+    now = int(time.time() if now is None else now)
+    written: Dict[str, int] = {}
+    with engine.begin() as conn:
+        marks = _watermarks(conn)
+        for source in SOURCES:
+            for resolution, _ in source.tiers:
+                name = source.series_name(resolution)
+                until = (now - _SETTLE) // resolution * resolution
+                start = marks.get(name)
+                if start is None:
+                    first = conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table and sql.* fragments are module constants, no user input
+                        f"SELECT MIN({sql.epoch('recorded_at')}) FROM {source.table}"
+                    )).scalar()
+                    start = until if first is None else int(first) // resolution * resolution
+                if start < until:
+                    result = conn.execute(text(_rollup_sql(source)), {  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table and sql.* fragments are module constants, no user input
+                        "res": resolution, "start": _ts(start), "until": _ts(until),
+                    })
+                    written[name] = max(result.rowcount or 0, 0)
+                marks[name] = max(start, until)
+                _set_watermark(conn, name, marks[name])
+
+            # Raw rows go once they are past retention *and* rolled up by every tier.
+            raw_cut = min([now - RAW_RETENTION] + [marks[source.series_name(r)] for r, _ in source.tiers])
+            conn.execute(text(f"DELETE FROM {source.table} WHERE recorded_at < :cut"),  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table is a module constant, params bound
+                         {"cut": _ts(raw_cut)})
+            for resolution, retention in source.tiers:
+                conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table is a module constant, params bound
+                    f"DELETE FROM {source.rollup_table} WHERE resolution = :res AND bucket < :cut"
+                ), {"res": resolution, "cut": now - retention})
+    if any(written.values()):
+        log.debug(f"Telemetry rollups written: {written}")
+    return written
+
+
+# ====================================================================
+# Chart series
+# ====================================================================
+
+def pick_tier(source: _Source, window: int, max_points: int,
+              resolution: Optional[str] = None) -> Tuple[int, int]:
+    """(tier resolution, output bucket width) for a window, both in seconds.
+
+    Without an explicit `resolution`, the coarsest tier that holds data for
+    the whole window and still yields at least half of `max_points` buckets
+    — a week at 1000 points reads 672 15-minute rows rather than 10080
+    one-minute rows regrouped in SQL.
+    Raises ValueError for a resolution this source does not keep.
+    """
+    tiers = [(0, RAW_RETENTION), *source.tiers]
+    wanted = window / max_points
+    if resolution is not None:
+        res = RESOLUTIONS.get(resolution)
+        if res is None or res not in [t[0] for t in tiers]:
+            raise ValueError(f"resolution {resolution!r} is not kept for {source.table}")
+    else:
+        covering = [t for t in tiers if t[1] >= window] or [tiers[-1]]
+        fine_enough = [t[0] for t in covering if t[0] <= 2 * wanted]
+        res = max(fine_enough) if fine_enough else min(t[0] for t in covering)
+    step = max(1, math.ceil(wanted))
+    if res:
+        step = max(res, math.ceil(step / res) * res)
+    return res, step
+
+
+def _series(db, source: _Source, filters: Dict[str, int], hours: int, max_points: int,
+            resolution: Optional[str], now: Optional[float]) -> Tuple[List[str], list]:
+    """Downsampled rows: (*extra keys, bucket, aggregated columns...)."""
+    now = int(time.time() if now is None else now)
+    window = hours * 3600
+    since = now - window
+    res, step = pick_tier(source, window, max_points, resolution)
+
+    extra = [k for k in source.keys if k not in filters]
+    where = " AND ".join(f"{k} = :{k}" for k in filters)
+    params = dict(filters, since=since, step=step, res=res)
+
+    raw_cols, rollup_cols, outer = [], [], []
+    for c in source.measured:
+        raw_cols += [c, f"{c} AS {c}_lo", f"{c} AS {c}_hi"]
+        rollup_cols += [c, f"{c}_min AS {c}_lo", f"{c}_max AS {c}_hi"]
+        outer += [f"AVG({c})", f"MIN({c}_lo)", f"MAX({c}_hi)"]
+    for c in source.peak:
+        raw_cols.append(c)
+        rollup_cols.append(c)
+        outer.append(f"MAX({c})")
+    for c in source.mean:
+        raw_cols.append(c)
+        rollup_cols.append(c)
+        outer.append(f"AVG({c})")
+    lead = "".join(f"{k}, " for k in extra)
+
+    parts = []
+    raw_since = since
+    if res:
+        mark = db.execute(text("SELECT rolled_until FROM telemetry_rollup_state WHERE series = :s"),
+                          {"s": source.series_name(res)}).scalar()
+        mark = int(mark or 0)
+        raw_since = max(since, mark)
+        params["mark"] = mark
+        parts.append(
+            f"SELECT {lead}bucket AS t, {', '.join(rollup_cols)} FROM {source.rollup_table} "
+            f"WHERE {where} AND resolution = :res AND bucket >= :since AND bucket < :mark"
+        )
+    params["raw_since"] = _ts(raw_since)
+    parts.append(
+        f"SELECT {lead}{sql.epoch('recorded_at')} AS t, {', '.join(raw_cols)} FROM {source.table} "
+        f"WHERE {where} AND recorded_at >= :raw_since"
+    )
+    rows = db.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — tables/columns are module constants, params bound
+        f"SELECT {lead}(t / :step) * :step AS b, {', '.join(outer)} "
+        f"FROM ({' UNION ALL '.join(parts)}) s "
+        f"GROUP BY {lead}b ORDER BY {lead}b"
+    ), params).fetchall()
+
+    names = []
+    for c in source.measured:
+        names += [c, f"{c}_min", f"{c}_max"]
+    names += list(source.peak) + list(source.mean)
+    return names, rows
+
+
+def _rounded(names: List[str], values) -> dict:
+    # One comprehension per point: a per-value helper cost as much as the query.
+    return {n: None if v is None else round(float(v), 2) for n, v in zip(names, values)}
+
+
+def printer_series(db, printer_id: int, hours: int, max_points: int = 1000,
+                   resolution: Optional[str] = None, now: Optional[float] = None) -> List[dict]:
+    """Temperature/fan history for one printer, at most `max_points` points.
+
+    Each point carries the bucket's averages plus bed/nozzle min and max,
+    so spikes survive downsampling.
+    """
+    names, rows = _series(db, PRINTER, {"printer_id": printer_id}, hours, max_points, resolution, now)
+    points = []
+    for r in rows:
+        point = {"recorded_at": _ts(int(r[0]))}
+        point.update(_rounded(names, r[1:]))
+        if point["fan_speed"] is not None:
+            point["fan_speed"] = round(point["fan_speed"])
+        points.append(point)
+    return points
+
+
+def ams_series(db, printer_id: int, hours: int, max_points: int = 1000,
+               unit: Optional[int] = None, now: Optional[float] = None) -> Dict[int, List[dict]]:
+    """AMS humidity/temperature history per unit, at most `max_points` per unit."""
+    filters = {"printer_id": printer_id}
+    if unit is not None:
+        filters["ams_unit"] = unit
+    names, rows = _series(db, AMS, filters, hours, max_points, None, now)
+    units: Dict[int, List[dict]] = {}
+    for r in rows:
+        if unit is None:
+            u, b, values = r[0], r[1], r[2:]
+        else:
+            u, b, values = unit, r[0], r[1:]
+        point = _rounded(names, values)
+        point["time"] = _ts(int(b))
+        units.setdefault(u, []).append(point)
+    return units
@@ -41,7 +41,7 @@ def _hash_token(raw: str) -> str:
 
 
 @router.post("/auth/biometric-token", response_model=BiometricTokenResponse)
-async def create_biometric_token(
+def create_biometric_token(
     device_id: str,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -83,7 +83,7 @@ async def create_biometric_token(
 
 
 @router.post("/auth/biometric-refresh", response_model=BiometricRefreshResponse)
-async def refresh_with_biometric_token(
+def refresh_with_biometric_token(
     body: BiometricRefreshRequest,
     db: Session = Depends(get_db),
 ):
@@ -148,7 +148,7 @@ async def refresh_with_biometric_token(
 
 
 @router.delete("/auth/biometric-token", status_code=204)
-async def revoke_biometric_token(
+def revoke_biometric_token(
     device_id: str,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
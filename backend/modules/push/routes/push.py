@@ -33,7 +33,7 @@ router = APIRouter(tags=["Push Notifications"])
 
 
 @router.post("/push/register", response_model=DeviceRegisterResponse, status_code=201)
-async def register_device(
+def register_device(
     body: DeviceRegisterRequest,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -80,7 +80,7 @@ async def register_device(
 
 
 @router.delete("/push/register/{device_id}", status_code=204)
-async def unregister_device(
+def unregister_device(
     device_id: str,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -97,7 +97,7 @@ async def unregister_device(
 
 
 @router.get("/push/preferences")
-async def get_preferences(
+def get_preferences(
     device_id: str,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -128,7 +128,7 @@ async def get_preferences(
 
 
 @router.put("/push/preferences", status_code=200)
-async def update_preferences(
+def update_preferences(
     device_id: str,
     prefs: PushPreferences,
     current_user: dict = Depends(get_current_user),
@@ -155,7 +155,7 @@ async def update_preferences(
 
 
 @router.post("/push/live-activity", status_code=200)
-async def update_live_activity(
+def update_live_activity(
     body: LiveActivityRequest,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -195,7 +195,7 @@ async def update_live_activity(
 
 
 @router.post("/push/test", status_code=200)
-async def send_test_push(
+def send_test_push(
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
 ):
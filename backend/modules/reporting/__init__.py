@@ -8,11 +8,20 @@ ROUTES = [
 
 TABLES = [
     "report_schedules",
+    "analytics_job_rollup",
+    "analytics_print_job_rollup",
+    "analytics_hms_rollup",
+    "analytics_detection_rollup",
+    "analytics_rollup_state",
 ]
 
 PUBLISHES = []
 
-SUBSCRIBES = []
+SUBSCRIBES = [
+    "job.completed",
+    "job.failed",
+    "job.edited",
+]
 
 IMPLEMENTS = []
 
@@ -29,3 +38,9 @@ def register(app, registry) -> None:
 
     app.include_router(routes.router, prefix="/api")
     app.include_router(routes.router, prefix="/api/v1")
+
+
+def register_subscribers(bus) -> None:
+    """Register all reporting module event subscribers."""
+    from modules.reporting import analytics_rollups
+    analytics_rollups.register_subscribers(bus)
@@ -0,0 +1,412 @@
+"""Materialized analytics rollups.
+
+The fleet statistics endpoints (GET /stats printer stats,
+/analytics/failures, /analytics/time-accuracy) and the scheduled failure
+report used to recompute everything from the raw `jobs`, `print_jobs`,
+`hms_error_history` and `vision_detections` rows on every request, so
+their cost grew with the farm's history.
+
+Each source is now also kept as hourly and daily rollups
+(reporting/migrations/002_analytics_rollups.sql): one row per bucket and
+key combination with counts and sums.
+
+  analytics_job_rollup        finished jobs by printer, model, org, status,
+                              filament, fail reason (bucket: actual_end,
+                              else created_at)
+  analytics_print_job_rollup  MQTT-tracked prints by printer, status
+  analytics_hms_rollup        HMS errors by printer, code
+  analytics_detection_rollup  vision detections by printer, type
+
+`maintain()` rolls up complete buckets since each tier's watermark
+(analytics_rollup_state), re-rolling the last REOPEN of already-rolled
+buckets so late rows and edits are picked up, and drops hourly rows past
+HOURLY_RETENTION. The report runner calls it every MAINTAIN_INTERVAL.
+The job.completed / job.failed handlers re-roll a bucket at once when a
+finish lands behind the watermark, and job.edited (published by the job
+reset, edit, complete, fail and delete routes) re-rolls the bucket the
+job was counted in before the change and the one it is counted in now.
+`rebuild()` (python -m modules.reporting.analytics_rollups rebuild)
+recomputes everything, for backfill or after editing the database by
+hand.
+
+`query()` answers a window from whole days of daily rows, hourly rows
+for the partial days, and raw rows only for the partial hours at either
+end and for what is newer than the hourly watermark. The result is exact
+and a request reads at most a few hours of raw rows, whatever the
+history size.
+"""
+
+import argparse
+import logging
+import math
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from core.db_compat import sql
+
+log = logging.getLogger("odin.analytics_rollups")
+
+HOUR = 3600
+DAY = 86400
+TIERS = (HOUR, DAY)
+
+HOURLY_RETENTION = 14 * DAY
+REOPEN = {HOUR: 6 * HOUR, DAY: DAY}   # already-rolled span re-rolled by each maintain()
+MAINTAIN_INTERVAL = 300               # seconds between maintain() runs in the report runner
+_SETTLE = 60                          # seconds a bucket must be closed before rolling up
+
+
+@dataclass(frozen=True)
+class _Source:
+    table: str
+    rollup_table: str
+    time: str                             # raw timestamp the bucket comes from
+    time_range: str                       # raw rows with time in [:lo, :hi), index-friendly
+    where: str                            # raw rows that count
+    keys: Tuple[Tuple[str, str], ...]     # (rollup column, raw expression)
+    metrics: Tuple[Tuple[str, str], ...]  # (rollup column, raw aggregate)
+
+    def columns(self) -> List[str]:
+        return [k for k, _ in self.keys] + [m for m, _ in self.metrics]
+
+    def select_raw(self) -> str:
+        """Raw rows aggregated into rollup columns (bucket first)."""
+        exprs = [f"{e} AS {c}" for c, e in self.keys] + [f"{e} AS {c}" for c, e in self.metrics]
+        group = ", ".join(str(i) for i in range(1, len(self.keys) + 2))
+        return (
+            f"SELECT ({sql.epoch(self.time)} / :res) * :res AS bucket, {', '.join(exprs)} "
+            f"FROM {self.table} WHERE {self.where} AND {self.time_range} GROUP BY {group}"
+        )
+
+
+_END = sql.epoch("actual_end")
+_ACTUAL_H = f"({_END} - {sql.epoch('actual_start')}) / 3600.0"
+_TIMED = (
+    f"status = 'completed' AND actual_start IS NOT NULL AND actual_end IS NOT NULL "
+    f"AND duration_hours > 0 AND {_END} > {sql.epoch('actual_start')}"
+)
+
+JOBS = _Source(
+    table="jobs",
+    rollup_table="analytics_job_rollup",
+    time="COALESCE(actual_end, created_at)",
+    time_range=(
+        "((actual_end >= :lo AND actual_end < :hi) "
+        "OR (actual_end IS NULL AND created_at >= :lo AND created_at < :hi))"
+    ),
+    where="status IN ('completed', 'failed')",
+    keys=(
+        ("printer_id", "COALESCE(printer_id, 0)"),
+        ("model_id", "COALESCE(model_id, 0)"),
+        ("org_id", "COALESCE(charged_to_org_id, 0)"),
+        # Enum columns are native enum types on PostgreSQL
+        ("status", "CAST(status AS TEXT)"),
+        ("filament_type", "COALESCE(CAST(filament_type AS TEXT), '')"),
+        # Jobs without a model are reported under their item name.
+        ("item_name", "CASE WHEN model_id IS NULL THEN COALESCE(item_name, '') ELSE '' END"),
+        ("fail_reason", "CASE WHEN status = 'failed' THEN COALESCE(fail_reason, '') ELSE '' END"),
+    ),
+    metrics=(
+        ("jobs", "COUNT(*)"),
+        ("hours", "SUM(COALESCE(duration_hours, 0))"),
+        # actual_end span, for MTBF: the mean gap between n failures is (last - first) / (n - 1)
+        ("ended", "COUNT(actual_end)"),
+        ("first_end", f"MIN({_END})"),
+        ("last_end", f"MAX({_END})"),
+        # Estimated vs actual time, completed jobs with both timestamps
+        ("timed", f"SUM(CASE WHEN {_TIMED} THEN 1 ELSE 0 END)"),
+        ("est_hours", f"SUM(CASE WHEN {_TIMED} THEN duration_hours ELSE 0 END)"),
+        ("actual_hours", f"SUM(CASE WHEN {_TIMED} THEN {_ACTUAL_H} ELSE 0 END)"),
+        ("accuracy_sum", (
+            f"SUM(CASE WHEN {_TIMED} THEN 100.0 * CASE WHEN duration_hours < {_ACTUAL_H} "
+            f"THEN duration_hours / {_ACTUAL_H} ELSE {_ACTUAL_H} / duration_hours END ELSE 0 END)"
+        )),
+    ),
+)
+
+PRINT_JOBS = _Source(
+    table="print_jobs",
+    rollup_table="analytics_print_job_rollup",
+    time="COALESCE(ended_at, started_at)",
+    time_range=(
+        "((ended_at >= :lo AND ended_at < :hi) "
+        "OR (ended_at IS NULL AND started_at >= :lo AND started_at < :hi))"
+    ),
+    where="status IN ('completed', 'failed')",
+    keys=(("printer_id", "printer_id"), ("status", "status")),
+    metrics=(("jobs", "COUNT(*)"),),
+)
+
+HMS = _Source(
+    table="hms_error_history",
+    rollup_table="analytics_hms_rollup",
+    time="occurred_at",
+    time_range="occurred_at >= :lo AND occurred_at < :hi",
+    where="1 = 1",
+    keys=(("printer_id", "printer_id"), ("code", "code")),
+    metrics=(("events", "COUNT(*)"), ("message", "MAX(message)")),
+)
+
+DETECTIONS = _Source(
+    table="vision_detections",
+    rollup_table="analytics_detection_rollup",
+    time="created_at",
+    time_range="created_at >= :lo AND created_at < :hi",
+    where="1 = 1",
+    keys=(("printer_id", "printer_id"), ("detection_type", "detection_type")),
+    metrics=(("detections", "COUNT(*)"), ("confidence_sum", "SUM(confidence)")),
+)
+
+SOURCES = (JOBS, PRINT_JOBS, HMS, DETECTIONS)
+
+
+def _ts(epoch: int) -> str:
+    """Epoch seconds in the format the source timestamps are stored in (UTC)."""
+    return time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(epoch))
+
+
+def _default_engine():
+    from core.db import engine
+    return engine
+
+
+def _series(source: _Source, resolution: int) -> str:
+    return f"{source.rollup_table}:{resolution}"
+
+
+# ====================================================================
+# Maintenance
+# ====================================================================
+
+def _watermarks(conn) -> Dict[str, int]:
+    rows = conn.execute(text("SELECT series, rolled_until FROM analytics_rollup_state")).fetchall()
+    return {r[0]: int(r[1]) for r in rows}
+
+
+def _set_watermark(conn, series: str, rolled_until: int) -> None:
+    conn.execute(text(
+        f"{sql.upsert_prefix()} analytics_rollup_state (series, rolled_until) "
+        f"VALUES (:series, :until){sql.on_conflict_suffix('series', ['rolled_until'])}"
+    ), {"series": series, "until": rolled_until})
+
+
+def _roll(conn, source: _Source, resolution: int, lo: int, hi: int) -> int:
+    """Recompute the rollup rows of the buckets in [lo, hi)."""
+    conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table is a module constant, params bound
+        f"DELETE FROM {source.rollup_table} WHERE resolution = :res AND bucket >= :lo AND bucket < :hi"
+    ), {"res": resolution, "lo": lo, "hi": hi})
+    result = conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table, columns and sql.* fragments are module constants, params bound
+        f"INSERT INTO {source.rollup_table} (bucket, {', '.join(source.columns())}, resolution) "
+        f"SELECT u.*, :res FROM ({source.select_raw()}) u"
+    ), {"res": resolution, "lo": _ts(lo), "hi": _ts(hi)})
+    return max(result.rowcount or 0, 0)
+
+
+def maintain(engine=None, now: Optional[float] = None) -> Dict[str, int]:
+    """Roll up complete buckets, re-roll the last REOPEN, apply retention.
+
+    One transaction. Returns the rollup rows written per series. The first
+    run rolls up the whole history into the daily tier and the last
+    HOURLY_RETENTION into the hourly tier.
+    """
+    engine = engine or _default_engine()
+    now = int(time.time() if now is None else now)
+    hourly_floor = _ceil(now - HOURLY_RETENTION, HOUR)
+    written: Dict[str, int] = {}
+    with engine.begin() as conn:
+        marks = _watermarks(conn)
+        for source in SOURCES:
+            for resolution in TIERS:
+                name = _series(source, resolution)
+                until = (now - _SETTLE) // resolution * resolution
+                start = marks.get(name)
+                if start is None:
+                    first = conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table and sql.* fragments are module constants
+                        f"SELECT MIN({sql.epoch(source.time)}) FROM {source.table} WHERE {source.where}"
+                    )).scalar()
+                    start = until if first is None else int(first) // resolution * resolution
+                else:
+                    start -= REOPEN[resolution]
+                if resolution == HOUR:
+                    start = max(start, hourly_floor)
+                if start < until:
+                    written[name] = _roll(conn, source, resolution, start, until)
+                _set_watermark(conn, name, max(marks.get(name, until), until))
+            conn.execute(text(  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table is a module constant, params bound
+                f"DELETE FROM {source.rollup_table} WHERE resolution = :res AND bucket < :cut"
+            ), {"res": HOUR, "cut": hourly_floor})
+    if any(written.values()):
+        log.debug(f"Analytics rollups written: {written}")
+    return written
+
+
+def refresh(epochs: Sequence[int], sources: Sequence[_Source] = (JOBS, PRINT_JOBS),
+            engine=None) -> None:
+    """Re-roll the already-rolled buckets that contain these timestamps.
+
+    For rows that land behind the watermark — a finish reported late, a
+    job edited after the fact. Newer rows are read raw until maintain()
+    rolls them up, so they need nothing.
+    """
+    engine = engine or _default_engine()
+    with engine.begin() as conn:
+        marks = _watermarks(conn)
+        for source in sources:
+            for resolution in TIERS:
+                mark = marks.get(_series(source, resolution))
+                for bucket in {e // resolution * resolution for e in epochs if e is not None}:
+                    if mark is not None and bucket < mark:
+                        _roll(conn, source, resolution, bucket, bucket + resolution)
+
+
+def rebuild(engine=None, now: Optional[float] = None) -> Dict[str, int]:
+    """Drop every rollup row and watermark and roll up the history again."""
+    engine = engine or _default_engine()
+    with engine.begin() as conn:
+        for source in SOURCES:
+            conn.execute(text(f"DELETE FROM {source.rollup_table}"))  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — table is a module constant
+        conn.execute(text("DELETE FROM analytics_rollup_state"))
+    return maintain(engine, now)
+
+
+# ====================================================================
+# Queries
+# ====================================================================
+
+def _ceil(t: int, step: int) -> int:
+    return -(-t // step) * step
+
+
+def spans(start: int, end: int, hour_mark: Optional[int], day_mark: Optional[int],
+          hourly_floor: int) -> List[Tuple[int, int, int]]:
+    """Cover [start, end) with (resolution, lo, hi) spans; resolution 0 is raw.
+
+    Daily rows for whole days below the daily watermark, hourly rows for
+    whole hours below the hourly watermark (and within retention), raw
+    rows for the rest.
+    """
+    out: List[Tuple[int, int, int]] = []
+
+    def hourly_or_raw(a: int, b: int):
+        lo = max(_ceil(a, HOUR), hourly_floor)
+        hi = min(b // HOUR * HOUR, hour_mark if hour_mark is not None else -math.inf)
+        if lo < hi:
+            out.extend([(0, a, lo), (HOUR, lo, hi), (0, hi, b)])
+        else:
+            out.append((0, a, b))
+
+    lo = _ceil(start, DAY)
+    hi = min(end // DAY * DAY, day_mark if day_mark is not None else -math.inf)
+    if lo < hi:
+        hourly_or_raw(start, lo)
+        out.append((DAY, lo, hi))
+        hourly_or_raw(hi, end)
+    else:
+        hourly_or_raw(start, end)
+    return [s for s in out if s[1] < s[2]]
+
+
+def query(db, source: _Source, select: str, start: Optional[float] = None,
+          end: Optional[float] = None, where: str = "", group_by: str = "",
+          order_by: str = "", params: Optional[dict] = None) -> list:
+    """Aggregate a source over [start, end) (default: all time until now).
+
+    `select`, `where`, `group_by` and `order_by` are SQL over the rollup
+    columns (see the _Source definitions), e.g.
+    query(db, JOBS, "printer_id, SUM(jobs)", start, group_by="printer_id").
+    Sums combine across buckets; first_end / last_end combine with MIN / MAX.
+    """
+    now = int(time.time())
+    end = int(now if end is None else end)
+    start = int(start or 0)
+    marks = _watermarks(db)
+    parts, bound = [], dict(params or {})
+    span_list = spans(start, end, marks.get(_series(source, HOUR)), marks.get(_series(source, DAY)),
+                      _ceil(now - HOURLY_RETENTION, HOUR))
+    columns = ", ".join(source.columns())
+    for i, (resolution, lo, hi) in enumerate(span_list):
+        if resolution:
+            parts.append(
+                f"SELECT {columns} FROM {source.rollup_table} "
+                f"WHERE resolution = {resolution} AND bucket >= :lo{i} AND bucket < :hi{i}"
+            )
+            bound.update({f"lo{i}": lo, f"hi{i}": hi})
+        else:
+            raw = source.select_raw().replace(":lo", f":lo{i}").replace(":hi", f":hi{i}").replace(":res", f":res{i}")
+            parts.append(f"SELECT {columns} FROM ({raw}) r{i}")
+            bound.update({f"lo{i}": _ts(lo), f"hi{i}": _ts(hi), f"res{i}": HOUR})
+    if not parts:
+        return []
+    stmt = f"SELECT {select} FROM ({' UNION ALL '.join(parts)}) u"
+    if where:
+        stmt += f" WHERE {where}"
+    if group_by:
+        stmt += f" GROUP BY {group_by}"
+    if order_by:
+        stmt += f" ORDER BY {order_by}"
+    return db.execute(text(stmt), bound).fetchall()  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — fragments are module constants or caller-supplied constants, params bound
+
+
+# ====================================================================
+# Event bus
+# ====================================================================
+
+def _on_job_finished(event) -> None:
+    """job.completed / job.failed: re-roll the finish's bucket if already rolled."""
+    data = event.data or {}
+    try:
+        engine = _default_engine()
+        with engine.connect() as conn:
+            epochs = []
+            if data.get("scheduled_job_id"):
+                epochs.append(conn.execute(text(
+                    f"SELECT {sql.epoch('COALESCE(actual_end, created_at)')} FROM jobs WHERE id = :id"
+                ), {"id": data["scheduled_job_id"]}).scalar())
+            if data.get("print_job_id"):
+                epochs.append(conn.execute(text(
+                    f"SELECT {sql.epoch('COALESCE(ended_at, started_at)')} FROM print_jobs WHERE id = :id"
+                ), {"id": data["print_job_id"]}).scalar())
+        refresh([int(e) for e in epochs if e is not None], engine=engine)
+    except Exception as e:
+        log.warning(f"Analytics rollup refresh failed for {event.event_type}: {e}")
+
+
+def _on_job_edited(event) -> None:
+    """job.edited: re-roll the job's old and current buckets if already rolled."""
+    data = event.data or {}
+    try:
+        engine = _default_engine()
+        epochs = [data.get("previous_end")]
+        with engine.connect() as conn:
+            epochs.append(conn.execute(text(
+                f"SELECT {sql.epoch('COALESCE(actual_end, created_at)')} FROM jobs WHERE id = :id"
+            ), {"id": data.get("job_id")}).scalar())
+        refresh([int(e) for e in epochs if e is not None], sources=(JOBS,), engine=engine)
+    except Exception as e:
+        log.warning(f"Analytics rollup refresh failed for {event.event_type}: {e}")
+
+
+def register_subscribers(bus) -> None:
+    from core import events as ev
+
+    bus.subscribe(ev.JOB_COMPLETED, _on_job_finished)
+    bus.subscribe(ev.JOB_FAILED, _on_job_finished)
+    bus.subscribe(ev.JOB_EDITED, _on_job_edited)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    ap = argparse.ArgumentParser(description="Maintain or rebuild the analytics rollup tables.")
+    ap.add_argument("command", choices=["maintain", "rebuild"],
+                    help="maintain: roll up new buckets; rebuild: recompute from the full history")
+    args = ap.parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    started = time.perf_counter()
+    written = rebuild() if args.command == "rebuild" else maintain()
+    log.info(f"{args.command}: {sum(written.values())} rollup rows in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
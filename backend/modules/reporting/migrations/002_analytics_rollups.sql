@@ -0,0 +1,64 @@
+-- reporting/migrations/002_analytics_rollups.sql
+-- Analytics rollups. See modules/reporting/analytics_rollups.py.
+-- Hourly and daily per-bucket counts and sums of finished jobs, MQTT
+-- prints, HMS errors and vision detections (bucket = unix epoch seconds
+-- of the bucket start, resolution = bucket width in seconds). Missing
+-- keys are stored as 0 / '' so every row of a bucket is distinct.
+
+CREATE TABLE IF NOT EXISTS analytics_job_rollup (
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    printer_id INTEGER NOT NULL,
+    model_id INTEGER NOT NULL,
+    org_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    filament_type TEXT NOT NULL,
+    item_name TEXT NOT NULL,
+    fail_reason TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    hours REAL NOT NULL,
+    ended INTEGER NOT NULL,
+    first_end BIGINT,
+    last_end BIGINT,
+    timed INTEGER NOT NULL,
+    est_hours REAL NOT NULL,
+    actual_hours REAL NOT NULL,
+    accuracy_sum REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_job_rollup_bucket ON analytics_job_rollup(resolution, bucket);
+
+CREATE TABLE IF NOT EXISTS analytics_print_job_rollup (
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    printer_id INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    jobs INTEGER NOT NULL,
+    PRIMARY KEY (resolution, bucket, printer_id, status)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_hms_rollup (
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    printer_id INTEGER NOT NULL,
+    code TEXT NOT NULL,
+    events INTEGER NOT NULL,
+    message TEXT,
+    PRIMARY KEY (resolution, bucket, printer_id, code)
+);
+
+CREATE TABLE IF NOT EXISTS analytics_detection_rollup (
+    resolution INTEGER NOT NULL,
+    bucket BIGINT NOT NULL,
+    printer_id INTEGER NOT NULL,
+    detection_type TEXT NOT NULL,
+    detections INTEGER NOT NULL,
+    confidence_sum REAL,
+    PRIMARY KEY (resolution, bucket, printer_id, detection_type)
+);
+
+-- Per series (rollup table:resolution): buckets before rolled_until (epoch seconds) are rolled up.
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    series TEXT PRIMARY KEY,
+    rolled_until BIGINT NOT NULL
+);
@@ -17,6 +17,7 @@ from email.mime.multipart import MIMEMultipart
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from core.db_compat import sql
+from modules.reporting import analytics_rollups
 
 logging.basicConfig(
     level=logging.INFO,
@@ -207,22 +208,19 @@ def generate_filament_consumption(session, filters):
 
 
 def generate_failure_analysis(session, filters):
-    """Detection counts, failure reasons."""
-    rows = session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-        SELECT detection_type, COUNT(*) as cnt, AVG(confidence) as avg_conf
-        FROM vision_detections
-        WHERE created_at >= {sql.now_offset('-30 days')}
-        GROUP BY detection_type ORDER BY cnt DESC
-    """)).fetchall()
+    """Detection counts, failure reasons (from the analytics rollups)."""
+    start = time.time() - 30 * 86400
+    rows = analytics_rollups.query(
+        session, analytics_rollups.DETECTIONS,
+        "detection_type, SUM(detections) AS cnt, SUM(confidence_sum) / SUM(detections)", start,
+        group_by="detection_type", order_by="cnt DESC",
+    )
 
     # Also get job failure reasons
-    fail_rows = session.execute(text(f"""  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
-        SELECT fail_reason, COUNT(*) as cnt
-        FROM jobs
-        WHERE status = 'failed' AND fail_reason IS NOT NULL
-          AND created_at >= {sql.now_offset('-30 days')}
-        GROUP BY fail_reason ORDER BY cnt DESC
-    """)).fetchall()
+    fail_rows = analytics_rollups.query(
+        session, analytics_rollups.JOBS, "fail_reason, SUM(jobs) AS cnt", start,
+        where="status = 'failed' AND fail_reason != ''", group_by="fail_reason", order_by="cnt DESC",
+    )
 
     detect_rows_html = ""
     for r in rows:
@@ -738,7 +736,15 @@ def main_loop():
     """Main polling loop."""
     log.info("Report runner daemon started")
 
+    last_rollup = None
     while True:
+        if last_rollup is None or time.monotonic() - last_rollup >= analytics_rollups.MAINTAIN_INTERVAL:
+            try:
+                analytics_rollups.maintain(engine)
+            except Exception as e:
+                log.error(f"Analytics rollup maintenance failed: {e}")
+            last_rollup = time.monotonic()
+
         try:
             session = SessionLocal()
             try:
@@ -2,7 +2,7 @@
 
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session, joinedload
-from sqlalchemy import text
+from sqlalchemy import case, func, text, true
 from typing import Optional
 from datetime import datetime, timedelta, timezone
 import logging
@@ -15,6 +15,7 @@ from core.base import JobStatus
 from modules.printers.models import Printer
 from modules.models_library.models import Model
 from modules.jobs.models import Job
+from modules.reporting import analytics_rollups
 from license_manager import require_feature
 
 log = logging.getLogger("odin.api")
@@ -25,7 +26,7 @@ router = APIRouter(tags=["Analytics"])
 # ============== Stats ==============
 
 @router.get("/stats")
-async def get_stats(db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
+def get_stats(db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
     """Get dashboard statistics."""
     org = get_org_scope(current_user)
 
@@ -84,8 +85,8 @@ async def get_stats(db: Session = Depends(get_db), current_user: dict = Depends(
         try:
             from core.itar import pin_for_request, should_trust_env
             with pin_for_request(settings.spoolman_url):
-                async with httpx.AsyncClient(trust_env=should_trust_env()) as client:
-                    resp = await client.get(f"{settings.spoolman_url}/api/v1/health", timeout=3)
+                with httpx.Client(trust_env=should_trust_env()) as client:
+                    resp = client.get(f"{settings.spoolman_url}/api/v1/health", timeout=3)
                     spoolman_connected = resp.status_code == 200
         except Exception as e:
             log.debug(f"Spoolman health check failed: {e}")
@@ -96,28 +97,17 @@ async def get_stats(db: Session = Depends(get_db), current_user: dict = Depends(
     if org is not None:
         all_printers_q = all_printers_q.filter((Printer.org_id == org) | (Printer.org_id == None) | (Printer.shared == True))
     all_printers = all_printers_q.all()
+    # Completed / failed counts from the analytics rollups (scheduler jobs
+    # plus MQTT-tracked prints), any org, all time
+    finished = {}
+    for source in (analytics_rollups.JOBS, analytics_rollups.PRINT_JOBS):
+        for pid, status, count in analytics_rollups.query(
+            db, source, "printer_id, status, SUM(jobs)", group_by="printer_id, status",
+        ):
+            finished[(pid, status)] = finished.get((pid, status), 0) + count
     for p in all_printers:
-        # Count completed and failed jobs for this printer
-        completed_jobs = db.query(Job).filter(
-            Job.printer_id == p.id,
-            Job.status == JobStatus.COMPLETED
-        ).count()
-        # Also count MQTT-tracked completed jobs
-        mqtt_completed = db.execute(
-            text("SELECT COUNT(*) FROM print_jobs WHERE printer_id = :pid AND status = 'completed'"),
-            {"pid": p.id}
-        ).scalar() or 0
-        completed_jobs += mqtt_completed
-
-        failed_jobs = db.query(Job).filter(
-            Job.printer_id == p.id,
-            Job.status == JobStatus.FAILED
-        ).count()
-        mqtt_failed = db.execute(
-            text("SELECT COUNT(*) FROM print_jobs WHERE printer_id = :pid AND status = 'failed'"),
-            {"pid": p.id}
-        ).scalar() or 0
-        failed_jobs += mqtt_failed
+        completed_jobs = finished.get((p.id, "completed"), 0)
+        failed_jobs = finished.get((p.id, "failed"), 0)
 
         total_hours = round(p.total_print_hours or 0, 1)
         total_jobs = completed_jobs + failed_jobs
@@ -160,8 +150,6 @@ async def get_stats(db: Session = Depends(get_db), current_user: dict = Depends(
 @router.get("/analytics")
 def get_analytics(db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
     """Get analytics data for dashboard."""
-    from sqlalchemy import func
-
     org = get_org_scope(current_user)
 
     # Get all models with profitability data
@@ -200,87 +188,96 @@ def get_analytics(db: Session = Depends(get_db), current_user: dict = Depends(re
         "build_time_hours": m.build_time_hours,
     } for m in models_by_value_asc]
 
-    # Jobs stats
-    job_query = db.query(Job)
+    # Jobs stats — aggregated in SQL, one row per status. Revenue falls back
+    # to the model's price (markup defaults to 300%) for jobs without a
+    # stored suggested_price, via an outer join instead of a lookup per job.
+    org_jobs = None
     if org is not None:
-        job_query = job_query.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
-    all_jobs = job_query.all()
-    completed_jobs = [j for j in all_jobs if j.status == JobStatus.COMPLETED]
-    pending_jobs = [j for j in all_jobs if j.status in (JobStatus.PENDING, JobStatus.SCHEDULED)]
-
-    # Revenue and costs from completed jobs (use job.suggested_price/estimated_cost when available)
-    total_revenue = 0
-    total_cost = 0
-    total_print_hours = 0
-    jobs_with_cost_data = 0
-
-    for job in completed_jobs:
-        # Use job's stored cost data if available
-        if job.suggested_price:
-            total_revenue += job.suggested_price * job.quantity
-            jobs_with_cost_data += 1
-        elif job.model_id:
-            # Fallback to model data for older jobs
-            model = db.query(Model).filter(Model.id == job.model_id).first()
-            if model and model.cost_per_item:
-                total_revenue += model.cost_per_item * (model.markup_percent or 300) / 100 * job.quantity
-
-        if job.estimated_cost:
-            total_cost += job.estimated_cost * job.quantity
-
-        if job.duration_hours:
-            total_print_hours += job.duration_hours
+        org_jobs = (Job.charged_to_org_id == org) | (Job.charged_to_org_id == None)
+    has_price = func.coalesce(Job.suggested_price, 0) != 0
+    model_price = Model.cost_per_item * func.coalesce(func.nullif(Model.markup_percent, 0), 300) / 100
+    status_q = (
+        db.query(
+            Job.status,
+            func.count(Job.id),
+            func.sum(case(
+                (has_price, Job.suggested_price * Job.quantity),
+                (func.coalesce(Model.cost_per_item, 0) != 0, model_price * Job.quantity),
+                else_=0,
+            )),
+            func.sum(func.coalesce(Job.estimated_cost, 0) * Job.quantity),
+            func.sum(func.coalesce(Job.duration_hours, 0)),
+            func.sum(case((has_price, 1), else_=0)),
+        )
+        .outerjoin(Model, Model.id == Job.model_id)
+        .group_by(Job.status)
+    )
+    if org_jobs is not None:
+        status_q = status_q.filter(org_jobs)
+    by_status = {row[0]: row[1:] for row in status_q}
+
+    def _totals(*statuses):
+        rows = [by_status[st] for st in statuses if st in by_status]
+        return [sum(r[i] or 0 for r in rows) for i in range(5)]
+
+    total_jobs = sum(r[0] for r in by_status.values())
+    completed_count, total_revenue, total_cost, total_print_hours, jobs_with_cost_data = _totals(JobStatus.COMPLETED)
+    pending_count, projected_revenue, projected_cost, _, _ = _totals(JobStatus.PENDING, JobStatus.SCHEDULED)
 
     # Calculate margin
     total_margin = total_revenue - total_cost if total_cost > 0 else 0
     margin_percent = (total_margin / total_revenue * 100) if total_revenue > 0 else 0
 
-    # Projected revenue from pending jobs
-    projected_revenue = 0
-    projected_cost = 0
-    for job in pending_jobs:
-        if job.suggested_price:
-            projected_revenue += job.suggested_price * job.quantity
-        elif job.model_id:
-            model = db.query(Model).filter(Model.id == job.model_id).first()
-            if model and model.cost_per_item:
-                projected_revenue += model.cost_per_item * (model.markup_percent or 300) / 100 * job.quantity
-
-        if job.estimated_cost:
-            projected_cost += job.estimated_cost * job.quantity
-
     # Printer utilization
     printer_q = db.query(Printer).filter(Printer.is_active.is_(True))
     if org is not None:
         printer_q = printer_q.filter((Printer.org_id == org) | (Printer.org_id == None) | (Printer.shared == True))
     printers = printer_q.all()
+    printer_ids = [p.id for p in printers]
+
+    # Completed and failed jobs per printer in one pass. Hours and counts
+    # are org-scoped like the totals above; the success rate counts every
+    # job on the printer, whoever it was charged to.
+    in_org = org_jobs if org_jobs is not None else true()
+    by_printer = {}
+    for pid, status, attempts, n, hours, earliest in (
+        db.query(
+            Job.printer_id,
+            Job.status,
+            func.count(Job.id),
+            func.sum(case((in_org, 1), else_=0)),
+            func.sum(case((in_org, func.coalesce(Job.duration_hours, 0)), else_=0)),
+            func.min(case((in_org, Job.created_at)), type_=Job.created_at.type),
+        )
+        .filter(Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]), Job.printer_id.in_(printer_ids))
+        .group_by(Job.printer_id, Job.status)
+    ):
+        by_printer.setdefault(pid, {})[status] = (attempts, n, hours, earliest)
+
     printer_stats = []
     # Calculate time window for utilization (since first completed job or 30 days)
     now = datetime.now(timezone.utc)
     for printer in printers:
-        printer_jobs = [j for j in completed_jobs if j.printer_id == printer.id]
-        hours = sum(j.duration_hours or 0 for j in printer_jobs)
+        rows = by_printer.get(printer.id, {})
+        completed_attempts, n_completed, hours, earliest = rows.get(JobStatus.COMPLETED, (0, 0, 0, None))
         # Utilization = print hours / available hours (since printer's first job, max 30 days)
-        if printer_jobs:
-            earliest = min(j.created_at for j in printer_jobs if j.created_at)
+        if n_completed and earliest:
             if earliest.tzinfo is None:
                 earliest = earliest.replace(tzinfo=timezone.utc)
             available_hours = min((now - earliest).total_seconds() / 3600, 30 * 24)
             utilization_pct = round((hours / available_hours * 100), 1) if available_hours > 0 else 0
         else:
-            available_hours = 0
             utilization_pct = 0
         # Average job duration
-        avg_hours = round(hours / len(printer_jobs), 1) if printer_jobs else 0
+        avg_hours = round(hours / n_completed, 1) if n_completed else 0
         # Success rate
-        total_printer_jobs = [j for j in db.query(Job).filter(Job.printer_id == printer.id).all()]
-        failed = len([j for j in total_printer_jobs if j.status == JobStatus.FAILED])
-        total_attempted = len([j for j in total_printer_jobs if j.status in (JobStatus.COMPLETED, JobStatus.FAILED)])
+        failed = rows.get(JobStatus.FAILED, (0,))[0]
+        total_attempted = failed + completed_attempts
         success_rate = round(((total_attempted - failed) / total_attempted * 100), 1) if total_attempted > 0 else 100
         printer_stats.append({
             "id": printer.id,
             "name": printer.name,
-            "completed_jobs": len(printer_jobs),
+            "completed_jobs": n_completed,
             "total_hours": round(hours, 1),
             "utilization_pct": utilization_pct,
             "avg_job_hours": avg_hours,
@@ -289,24 +286,21 @@ def get_analytics(db: Session = Depends(get_db), current_user: dict = Depends(re
             "has_plug": bool(getattr(printer, 'plug_type', None)),
         })
 
-    # Jobs over time (last 30 days)
+    # Jobs over time (last 30 days), grouped by day in SQL
     thirty_days_ago = datetime.now(timezone.utc) - timedelta(days=30)
-    recent_jobs_q = db.query(Job).filter(Job.created_at >= thirty_days_ago)
-    if org is not None:
-        recent_jobs_q = recent_jobs_q.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
-    recent_jobs = recent_jobs_q.all()
-
-    # Group by date
-    jobs_by_date = {}
-    for job in recent_jobs:
-        if not job.created_at:
-            continue
-        date_str = job.created_at.strftime("%Y-%m-%d")
-        if date_str not in jobs_by_date:
-            jobs_by_date[date_str] = {"created": 0, "completed": 0}
-        jobs_by_date[date_str]["created"] += 1
-        if job.status == JobStatus.COMPLETED:
-            jobs_by_date[date_str]["completed"] += 1
+    day = func.date(Job.created_at)
+    recent_q = (
+        db.query(day, func.count(Job.id), func.sum(case((Job.status == JobStatus.COMPLETED, 1), else_=0)))
+        .filter(Job.created_at >= thirty_days_ago)
+        .group_by(day)
+        .order_by(day)
+    )
+    if org_jobs is not None:
+        recent_q = recent_q.filter(org_jobs)
+    jobs_by_date = {
+        str(d): {"created": created, "completed": completed or 0}
+        for d, created, completed in recent_q if d is not None
+    }
 
     # Average $/hour across all models
     valid_models = [m for m in models if m.cost_per_item and m.build_time_hours]
@@ -323,9 +317,9 @@ def get_analytics(db: Session = Depends(get_db), current_user: dict = Depends(re
         "worst_performers": worst_performers,
         "summary": {
             "total_models": len(models),
-            "total_jobs": len(all_jobs),
-            "completed_jobs": len(completed_jobs),
-            "pending_jobs": len(pending_jobs),
+            "total_jobs": total_jobs,
+            "completed_jobs": completed_count,
+            "pending_jobs": pending_count,
             "total_revenue": round(total_revenue, 2),
             "total_cost": round(total_cost, 2),
             "total_margin": round(total_margin, 2),
@@ -349,59 +343,64 @@ def get_failure_analytics(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("viewer")),
 ):
-    """Fleet failure analytics — rates by printer, model, filament, common reasons, HMS errors."""
-    org = get_org_scope(current_user)
-    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    """Fleet failure analytics — rates by printer, model, filament, common reasons, HMS errors.
 
-    # All completed + failed jobs in window
-    jobs_q = (
-        db.query(Job)
-        .filter(Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]), Job.created_at >= cutoff)
-    )
+    Jobs count in the window they finished in. Served from the analytics
+    rollups (modules/reporting/analytics_rollups.py).
+    """
+    org = get_org_scope(current_user)
+    start = (datetime.now(timezone.utc) - timedelta(days=days)).timestamp()
+    rollups = analytics_rollups
+    job_where, params = "", {}
     if org is not None:
-        jobs_q = jobs_q.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
-    jobs = jobs_q.all()
+        job_where, params = "(org_id = :org OR org_id = 0)", {"org": org}
 
-    # --- By printer ---
-    by_printer = {}
-    for j in jobs:
-        if not j.printer_id:
-            continue
-        p = by_printer.setdefault(j.printer_id, {"name": j.printer.name if j.printer else str(j.printer_id), "completed": 0, "failed": 0, "fail_timestamps": []})
-        if j.status.value == "completed":
-            p["completed"] += 1
-        else:
-            p["failed"] += 1
-            if j.actual_end:
-                p["fail_timestamps"].append(j.actual_end)
+    def counts(key):
+        out = {}
+        for value, status, count in rollups.query(
+            db, rollups.JOBS, f"{key}, status, SUM(jobs)", start,
+            where=job_where, group_by=f"{key}, status", params=params,
+        ):
+            out.setdefault(value, {"completed": 0, "failed": 0})[status] = count
+        return out
 
+    # --- By printer ---
+    printer_rows = rollups.query(
+        db, rollups.JOBS,
+        "printer_id, SUM(CASE WHEN status = 'completed' THEN jobs ELSE 0 END), "
+        "SUM(CASE WHEN status = 'failed' THEN jobs ELSE 0 END), "
+        "SUM(CASE WHEN status = 'failed' THEN ended ELSE 0 END), "
+        "MIN(CASE WHEN status = 'failed' THEN first_end END), MAX(CASE WHEN status = 'failed' THEN last_end END)",
+        start, where=" AND ".join(filter(None, ["printer_id != 0", job_where])),
+        group_by="printer_id", params=params,
+    )
+    printer_names = dict(
+        db.query(Printer.id, Printer.name).filter(Printer.id.in_([r[0] for r in printer_rows])).all()
+    ) if printer_rows else {}
     printer_stats = []
-    for pid, p in by_printer.items():
-        total = p["completed"] + p["failed"]
-        success_rate = round(p["completed"] / total * 100, 1) if total else 0
+    for pid, completed, failed, ended, first_end, last_end in printer_rows:
+        total = completed + failed
         # MTBF: average time between failures
-        mtbf_hours = None
-        if len(p["fail_timestamps"]) >= 2:
-            ts = sorted(p["fail_timestamps"])
-            gaps = [(ts[i+1] - ts[i]).total_seconds() / 3600 for i in range(len(ts)-1)]
-            mtbf_hours = round(sum(gaps) / len(gaps), 1)
+        mtbf_hours = round((last_end - first_end) / (ended - 1) / 3600, 1) if ended >= 2 else None
         printer_stats.append({
-            "name": p["name"],
-            "completed": p["completed"],
-            "failed": p["failed"],
-            "success_rate": success_rate,
+            "name": printer_names.get(pid, str(pid)),
+            "completed": completed,
+            "failed": failed,
+            "success_rate": round(completed / total * 100, 1) if total else 0,
             "mtbf_hours": mtbf_hours,
         })
 
-    # --- By model ---
+    # --- By model (jobs without a model by item name) ---
+    model_rows = rollups.query(
+        db, rollups.JOBS, "model_id, item_name, status, SUM(jobs)", start,
+        where=job_where, group_by="model_id, item_name, status", params=params,
+    )
+    model_ids = {r[0] for r in model_rows if r[0]}
+    model_names = dict(db.query(Model.id, Model.name).filter(Model.id.in_(model_ids)).all()) if model_ids else {}
     by_model = {}
-    for j in jobs:
-        name = j.model.name if j.model else j.item_name
-        m = by_model.setdefault(name, {"completed": 0, "failed": 0})
-        if j.status.value == "completed":
-            m["completed"] += 1
-        else:
-            m["failed"] += 1
+    for model_id, item_name, status, count in model_rows:
+        name = model_names.get(model_id, item_name) if model_id else item_name
+        by_model.setdefault(name, {"completed": 0, "failed": 0})[status] += count
 
     model_stats = [
         {"name": k, "completed": v["completed"], "failed": v["failed"],
@@ -411,49 +410,35 @@ def get_failure_analytics(
     model_stats.sort(key=lambda x: x["success_rate"])
 
     # --- By filament type ---
-    by_filament = {}
-    for j in jobs:
-        ft = j.filament_type.value if j.filament_type else "unknown"
-        f = by_filament.setdefault(ft, {"completed": 0, "failed": 0})
-        if j.status.value == "completed":
-            f["completed"] += 1
-        else:
-            f["failed"] += 1
-
     filament_stats = [
-        {"type": k, "completed": v["completed"], "failed": v["failed"],
+        {"type": k or "unknown", "completed": v["completed"], "failed": v["failed"],
          "failure_rate": round(v["failed"] / (v["completed"] + v["failed"]) * 100, 1)}
-        for k, v in by_filament.items() if v["completed"] + v["failed"] >= 1
+        for k, v in counts("filament_type").items() if v["completed"] + v["failed"] >= 1
     ]
 
     # --- Failure reasons ---
-    failed_jobs = [j for j in jobs if j.status.value == "failed"]
+    reason_rows = rollups.query(
+        db, rollups.JOBS, "fail_reason, SUM(jobs) AS cnt", start,
+        where=" AND ".join(filter(None, ["status = 'failed'", job_where])),
+        group_by="fail_reason", order_by="cnt DESC", params=params,
+    )
     reason_counts = {}
-    for j in failed_jobs:
-        r = j.fail_reason or "unspecified"
-        reason_counts[r] = reason_counts.get(r, 0) + 1
+    for reason, count in reason_rows:
+        reason_counts[reason or "unspecified"] = reason_counts.get(reason or "unspecified", 0) + count
     top_reasons = sorted(reason_counts.items(), key=lambda x: -x[1])[:10]
 
     # --- HMS error frequency ---
+    hms_where = ""
     if org is not None:
-        hms_rows = db.execute(
-            text(
-                "SELECT h.code, h.message, COUNT(*) as cnt FROM hms_error_history h "
-                "JOIN printers p ON h.printer_id = p.id "
-                "WHERE h.occurred_at >= :cutoff AND (p.org_id = :org OR p.org_id IS NULL OR p.shared = 1) "
-                "GROUP BY h.code ORDER BY cnt DESC LIMIT 10"
-            ),
-            {"cutoff": cutoff.isoformat(), "org": org},
-        ).fetchall()
-    else:
-        hms_rows = db.execute(
-            text("SELECT code, message, COUNT(*) as cnt FROM hms_error_history WHERE occurred_at >= :cutoff GROUP BY code ORDER BY cnt DESC LIMIT 10"),
-            {"cutoff": cutoff.isoformat()},
-        ).fetchall()
+        hms_where = "printer_id IN (SELECT id FROM printers WHERE org_id = :org OR org_id IS NULL OR shared = 1)"
+    hms_rows = rollups.query(
+        db, rollups.HMS, "code, MAX(message), SUM(events) AS cnt", start,
+        where=hms_where, group_by="code", order_by="cnt DESC LIMIT 10", params=params,
+    )
     hms_errors = [{"code": r[0], "message": r[1], "count": r[2]} for r in hms_rows]
 
-    total_completed = sum(1 for j in jobs if j.status.value == "completed")
-    total_failed = len(failed_jobs)
+    total_completed = sum(s["completed"] for s in filament_stats)
+    total_failed = sum(s["failed"] for s in filament_stats)
 
     return {
         "total_completed": total_completed,
@@ -475,78 +460,76 @@ def get_time_accuracy(
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("viewer")),
 ):
-    """Estimated vs actual print time accuracy stats."""
+    """Estimated vs actual print time accuracy stats.
+
+    Totals come from the analytics rollups; only the 50 most recent jobs
+    are read row by row.
+    """
     org = get_org_scope(current_user)
     cutoff = datetime.now(timezone.utc) - timedelta(days=days)
-    completed_q = (
-        db.query(Job)
-        .filter(
-            Job.status == JobStatus.COMPLETED,
-            Job.actual_start.isnot(None),
-            Job.actual_end.isnot(None),
-            Job.duration_hours.isnot(None),
-            Job.duration_hours > 0,
-            Job.actual_end >= cutoff,
+    rollups = analytics_rollups
+    where, params = "timed > 0", {}
+    if org is not None:
+        where, params = "timed > 0 AND (org_id = :org OR org_id = 0)", {"org": org}
+
+    def totals(key):
+        return rollups.query(
+            db, rollups.JOBS, f"{key}, SUM(est_hours), SUM(actual_hours), SUM(timed), SUM(accuracy_sum)",
+            cutoff.timestamp(), where=f"{where} AND {key} != 0", group_by=key, params=params,
         )
+
+    def summarize(rows, names):
+        return [
+            {
+                "name": names.get(key, str(key)),
+                "estimated_hours": round(est, 1),
+                "actual_hours": round(act, 1),
+                "count": count,
+                "accuracy_pct": round(min(est, act) / max(est, act) * 100, 1) if max(est, act) > 0 else 0,
+            }
+            for key, est, act, count, _ in rows
+        ]
+
+    printer_rows, model_rows = totals("printer_id"), totals("model_id")
+    printer_names = dict(
+        db.query(Printer.id, Printer.name).filter(Printer.id.in_([r[0] for r in printer_rows])).all()
+    ) if printer_rows else {}
+    model_names = dict(
+        db.query(Model.id, Model.name).filter(Model.id.in_([r[0] for r in model_rows])).all()
+    ) if model_rows else {}
+    total_jobs, accuracy_sum = rollups.query(
+        db, rollups.JOBS, "SUM(timed), SUM(accuracy_sum)", cutoff.timestamp(), where=where, params=params,
+    )[0]
+    total_jobs, accuracy_sum = total_jobs or 0, accuracy_sum or 0
+
+    recent_q = db.query(Job).filter(
+        Job.status == JobStatus.COMPLETED,
+        Job.actual_start.isnot(None),
+        Job.actual_end.isnot(None),
+        Job.duration_hours > 0,
+        Job.actual_end > Job.actual_start,
+        Job.actual_end >= cutoff,
     )
     if org is not None:
-        completed_q = completed_q.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
-    completed = completed_q.all()
-
-    per_printer = {}
-    per_model = {}
+        recent_q = recent_q.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
     records = []
-
-    for job in completed:
-        actual_sec = (job.actual_end - job.actual_start).total_seconds()
-        if actual_sec <= 0:
-            continue
-        actual_h = actual_sec / 3600
+    for job in reversed(recent_q.order_by(Job.actual_end.desc()).limit(50).all()):
+        actual_h = (job.actual_end - job.actual_start).total_seconds() / 3600
         est_h = float(job.duration_hours)
-        accuracy = min(est_h, actual_h) / max(est_h, actual_h) * 100
-
         records.append({
             "job_id": job.id,
             "date": job.actual_end.strftime("%Y-%m-%d"),
             "estimated_hours": round(est_h, 2),
             "actual_hours": round(actual_h, 2),
-            "accuracy_pct": round(accuracy, 1),
+            "accuracy_pct": round(min(est_h, actual_h) / max(est_h, actual_h) * 100, 1),
         })
 
-        # Aggregate by printer
-        if job.printer_id:
-            p = per_printer.setdefault(job.printer_id, {"name": job.printer.name if job.printer else str(job.printer_id), "est": 0, "act": 0, "count": 0})
-            p["est"] += est_h
-            p["act"] += actual_h
-            p["count"] += 1
-
-        # Aggregate by model
-        if job.model_id:
-            m = per_model.setdefault(job.model_id, {"name": job.model.name if job.model else str(job.model_id), "est": 0, "act": 0, "count": 0})
-            m["est"] += est_h
-            m["act"] += actual_h
-            m["count"] += 1
-
-    def summarize(agg):
-        return [
-            {
-                "name": v["name"],
-                "estimated_hours": round(v["est"], 1),
-                "actual_hours": round(v["act"], 1),
-                "count": v["count"],
-                "accuracy_pct": round(min(v["est"], v["act"]) / max(v["est"], v["act"]) * 100, 1) if max(v["est"], v["act"]) > 0 else 0,
-            }
-            for v in agg.values()
-        ]
-
-    avg_accuracy = round(sum(r["accuracy_pct"] for r in records) / len(records), 1) if records else 0
-
     return {
-        "total_jobs": len(records),
-        "avg_accuracy_pct": avg_accuracy,
-        "by_printer": summarize(per_printer),
-        "by_model": summarize(per_model),
-        "recent": records[-50:],
+        "total_jobs": total_jobs,
+        "avg_accuracy_pct": round(accuracy_sum / total_jobs, 1) if total_jobs else 0,
+        "by_printer": summarize(printer_rows, printer_names),
+        "by_model": summarize(model_rows, model_names),
+        "recent": records,
     }
 
 
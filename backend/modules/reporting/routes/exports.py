@@ -1,17 +1,15 @@
 """O.D.I.N. — CSV Export and Audit Log endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from typing import Optional
 from datetime import datetime, timezone
 import json
 import logging
-import csv
-import io
 
-from core.db import get_db
+from core.csv_stream import csv_response
+from core.db import get_db, YIELD_PER
 from core.rbac import require_role, require_superadmin, get_org_scope
 from core.models import AuditLog
 from modules.jobs.models import Job
@@ -27,32 +25,31 @@ router = APIRouter(tags=["Export"])
 
 @router.get("/export/jobs")
 def export_jobs_csv(
+    request: Request,
     status: Optional[str] = None,
     current_user: dict = Depends(require_role("operator")),
     db: Session = Depends(get_db)
 ):
     """Export jobs as CSV."""
     org = get_org_scope(current_user)
-    query = db.query(Job)
+    query = db.query(
+        Job.id, Job.item_name, Job.model_id, Job.quantity, Job.status, Job.priority,
+        Job.printer_id, Job.duration_hours, Job.estimated_cost, Job.suggested_price,
+        Job.scheduled_start, Job.actual_start, Job.actual_end, Job.created_at,
+    )
     if org is not None:
         query = query.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
     if status:
         query = query.filter(Job.status == status)
-    jobs = query.order_by(Job.created_at.desc()).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
+    jobs = query.order_by(Job.created_at.desc()).yield_per(YIELD_PER)
 
-    # Header
-    writer.writerow([
+    header = [
         "ID", "Item Name", "Model ID", "Quantity", "Status", "Priority",
         "Printer ID", "Duration (hrs)", "Estimated Cost", "Suggested Price",
         "Scheduled Start", "Actual Start", "Actual End", "Created At"
-    ])
-
-    # Data
-    for job in jobs:
-        writer.writerow([
+    ]
+    rows = (
+        [
             job.id,
             job.item_name,
             job.model_id,
@@ -67,38 +64,32 @@ def export_jobs_csv(
             job.actual_start.isoformat() if job.actual_start else "",
             job.actual_end.isoformat() if job.actual_end else "",
             job.created_at.isoformat() if job.created_at else ""
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=jobs_export.csv"}
+        ]
+        for job in jobs
     )
+    return csv_response(header, rows, "jobs_export.csv", request)
 
 
 @router.get("/export/spools")
-def export_spools_csv(current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def export_spools_csv(request: Request, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Export spools as CSV."""
     org = get_org_scope(current_user)
-    sq = db.query(Spool)
+    sq = db.query(
+        Spool.id, Spool.filament_id, Spool.qr_code, Spool.rfid_tag, Spool.color_hex,
+        Spool.initial_weight_g, Spool.remaining_weight_g, Spool.status, Spool.location_printer_id,
+        Spool.location_slot, Spool.storage_location, Spool.vendor, Spool.price, Spool.created_at,
+    )
     if org is not None:
         sq = sq.filter((Spool.org_id == org) | (Spool.org_id == None))
-    spools = sq.order_by(Spool.id).all()
+    spools = sq.order_by(Spool.id).yield_per(YIELD_PER)
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Header
-    writer.writerow([
+    header = [
         "ID", "Filament ID", "QR Code", "RFID Tag", "Color Hex",
         "Initial Weight (g)", "Remaining Weight (g)", "Status",
         "Printer ID", "Slot", "Storage Location", "Vendor", "Price", "Created At"
-    ])
-
-    # Data
-    for spool in spools:
-        writer.writerow([
+    ]
+    rows = (
+        [
             spool.id,
             spool.filament_id,
             spool.qr_code,
@@ -113,75 +104,60 @@ def export_spools_csv(current_user: dict = Depends(require_role("operator")), db
             spool.vendor,
             spool.price,
             spool.created_at.isoformat() if spool.created_at else ""
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=spools_export.csv"}
+        ]
+        for spool in spools
     )
+    return csv_response(header, rows, "spools_export.csv", request)
 
 
 @router.get("/export/filament-usage")
-def export_filament_usage_csv(current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def export_filament_usage_csv(request: Request, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Export filament usage history as CSV."""
     org = get_org_scope(current_user)
-    uq = db.query(SpoolUsage)
+    uq = db.query(
+        SpoolUsage.id, SpoolUsage.spool_id, SpoolUsage.job_id, SpoolUsage.weight_used_g,
+        SpoolUsage.used_at, SpoolUsage.notes,
+    )
     if org is not None:
         uq = uq.join(Spool, SpoolUsage.spool_id == Spool.id).filter(
             (Spool.org_id == org) | (Spool.org_id == None)
         )
-    usage_records = uq.order_by(SpoolUsage.used_at.desc()).all()
-
-    output = io.StringIO()
-    writer = csv.writer(output)
+    usage_records = uq.order_by(SpoolUsage.used_at.desc()).yield_per(YIELD_PER)
 
-    # Header
-    writer.writerow([
-        "ID", "Spool ID", "Job ID", "Weight Used (g)", "Used At", "Notes"
-    ])
-
-    # Data
-    for usage in usage_records:
-        writer.writerow([
+    header = ["ID", "Spool ID", "Job ID", "Weight Used (g)", "Used At", "Notes"]
+    rows = (
+        [
             usage.id,
             usage.spool_id,
             usage.job_id,
             usage.weight_used_g,
             usage.used_at.isoformat() if usage.used_at else "",
             usage.notes
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=filament_usage_export.csv"}
+        ]
+        for usage in usage_records
     )
+    return csv_response(header, rows, "filament_usage_export.csv", request)
 
 
 @router.get("/export/models")
-def export_models_csv(current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
+def export_models_csv(request: Request, current_user: dict = Depends(require_role("operator")), db: Session = Depends(get_db)):
     """Export models as CSV."""
     org = get_org_scope(current_user)
-    mq = db.query(Model)
+    mq = db.query(
+        Model.id, Model.name, Model.category, Model.default_filament_type, Model.build_time_hours,
+        Model.total_filament_grams, Model.cost_per_item, Model.markup_percent, Model.units_per_bed,
+        Model.created_at,
+    )
     if org is not None:
         mq = mq.filter((Model.org_id == org) | (Model.org_id == None))
-    models = mq.order_by(Model.name).all()
+    models = mq.order_by(Model.name).yield_per(YIELD_PER)
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-
-    # Header
-    writer.writerow([
+    header = [
         "ID", "Name", "Category", "Filament Type", "Build Time (hrs)",
         "Total Filament (g)", "Cost Per Item", "Markup %", "Units Per Bed", "Created At"
-    ])
-
-    # Data
-    for model in models:
-        writer.writerow([
+    ]
+    rows = (
+        [
             model.id,
             model.name,
             model.category,
@@ -192,36 +168,33 @@ def export_models_csv(current_user: dict = Depends(require_role("operator")), db
             model.markup_percent,
             model.units_per_bed,
             model.created_at.isoformat() if model.created_at else ""
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": "attachment; filename=models_export.csv"}
+        ]
+        for model in models
     )
+    return csv_response(header, rows, "models_export.csv", request)
 
 
 @router.get("/export/audit-logs")
 def export_audit_logs_csv(
+    request: Request,
     entity_type: Optional[str] = None,
     action: Optional[str] = None,
     current_user: dict = Depends(require_superadmin()),
     db: Session = Depends(get_db)
 ):
     """Export audit logs as CSV. Superadmin only — audit logs span all tenants."""
-    query = db.query(AuditLog).order_by(AuditLog.timestamp.desc())
+    query = db.query(
+        AuditLog.id, AuditLog.timestamp, AuditLog.action, AuditLog.entity_type,
+        AuditLog.entity_id, AuditLog.details, AuditLog.ip_address,
+    ).order_by(AuditLog.timestamp.desc())
     if entity_type:
         query = query.filter(AuditLog.entity_type == entity_type)
     if action:
         query = query.filter(AuditLog.action == action)
-    logs = query.limit(5000).all()
+    logs = query.limit(5000).yield_per(YIELD_PER)
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["ID", "Timestamp", "Action", "Entity Type", "Entity ID", "Details", "IP Address"])
-    for log_entry in logs:
-        writer.writerow([
+    rows = (
+        [
             log_entry.id,
             log_entry.timestamp.isoformat() if log_entry.timestamp else "",
             log_entry.action,
@@ -229,13 +202,12 @@ def export_audit_logs_csv(
             log_entry.entity_id or "",
             json.dumps(log_entry.details) if isinstance(log_entry.details, dict) else (log_entry.details or ""),
             log_entry.ip_address or ""
-        ])
-
-    output.seek(0)
-    return StreamingResponse(
-        iter([output.getvalue()]),
-        media_type="text/csv",
-        headers={"Content-Disposition": f"attachment; filename=audit_logs_{datetime.now(timezone.utc).strftime('%Y%m%d')}.csv"}
+        ]
+        for log_entry in logs
+    )
+    return csv_response(
+        ["ID", "Timestamp", "Action", "Entity Type", "Entity ID", "Details", "IP Address"], rows,
+        f"audit_logs_{datetime.now(timezone.utc).strftime('%Y%m%d')}.csv", request,
     )
 
 
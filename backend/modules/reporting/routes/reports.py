@@ -21,7 +21,7 @@ REPORT_TYPES = ["fleet_utilization", "job_summary", "filament_consumption", "fai
 # ============== Chargeback Report ==============
 
 @router.get("/reports/chargebacks")
-async def chargeback_report(
+def chargeback_report(
     start_date: str = None, end_date: str = None,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db)
@@ -61,7 +61,7 @@ async def chargeback_report(
 # ============== Report Schedules ==============
 
 @router.get("/report-schedules")
-async def list_report_schedules(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def list_report_schedules(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """List all scheduled reports. Superadmin only — system-wide report config."""
     rows = db.execute(text("SELECT * FROM report_schedules ORDER BY created_at DESC")).fetchall()
     return [{
@@ -74,7 +74,7 @@ async def list_report_schedules(current_user: dict = Depends(require_superadmin(
 
 
 @router.post("/report-schedules")
-async def create_report_schedule(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def create_report_schedule(body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Create a new scheduled report. Superadmin only."""
     name = body.get("name", "").strip()
     report_type = body.get("report_type", "")
@@ -116,7 +116,7 @@ async def create_report_schedule(body: dict, current_user: dict = Depends(requir
 
 
 @router.delete("/report-schedules/{schedule_id}")
-async def delete_report_schedule(schedule_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def delete_report_schedule(schedule_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Delete a scheduled report. Superadmin only."""
     row = db.execute(text("SELECT 1 FROM report_schedules WHERE id = :id"), {"id": schedule_id}).fetchone()
     if not row:
@@ -127,7 +127,7 @@ async def delete_report_schedule(schedule_id: int, current_user: dict = Depends(
 
 
 @router.patch("/report-schedules/{schedule_id}")
-async def update_report_schedule(schedule_id: int, body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def update_report_schedule(schedule_id: int, body: dict, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Update a scheduled report. Superadmin only."""
     row = db.execute(text("SELECT 1 FROM report_schedules WHERE id = :id"), {"id": schedule_id}).fetchone()
     if not row:
@@ -150,7 +150,7 @@ async def update_report_schedule(schedule_id: int, body: dict, current_user: dic
 
 
 @router.post("/report-schedules/{schedule_id}/run")
-async def run_report_now(schedule_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def run_report_now(schedule_id: int, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Immediately generate and email a scheduled report. Superadmin only."""
     row = db.execute(text("SELECT * FROM report_schedules WHERE id = :id"), {"id": schedule_id}).fetchone()
     if not row:
@@ -0,0 +1,348 @@
+"""Log reading for the admin log viewer (GET /admin/logs, /admin/logs/stream).
+
+The log endpoint used to read the whole file from the start to keep its
+last N lines, and the live stream polled for new lines every 0.5 s.
+
+  tail_lines()  reads fixed-size blocks backwards from the end of the
+                file until N matching lines are found, so a tail costs a
+                few blocks whatever the file size.
+  LogIndex      a sidecar file (<log>.idx) with one record per ~64 KB
+                block of the log: its byte offset, the timestamp in
+                effect at its start and the levels that occur in it.
+                Each query indexes only what was appended since the last
+                one, and the index starts over when the log is rotated
+                or truncated. Time-window queries read only the blocks
+                of the window; level queries skip blocks without the
+                level. ODIN_LOG_INDEX=0 keeps the index in memory for
+                the request instead of writing the sidecar.
+  follow()      yields lines appended to a log, woken by inotify (a
+                short poll where inotify is unavailable), and reopens
+                the file when it is rotated.
+
+Timestamps are the asctime prefix of ODIN's log lines
+("2026-10-17 14:03:11,207 [INFO] ..."). Lines without one (tracebacks,
+access logs) belong to the timestamp before them. Time windows are
+compared with that wall-clock text, so they are in the log's time zone.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import logging
+import os
+import re
+import struct
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, List, Optional, Tuple
+
+log = logging.getLogger("odin.api")
+
+BLOCK_BYTES = 64 * 1024      # read size backwards from EOF, and index granularity
+FOLLOW_CHECK = 5.0           # seconds between client-disconnect checks while a log is idle
+_POLL_INTERVAL = 0.5         # follow() without inotify
+
+LEVELS = ("DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL")
+_TS = re.compile(rb"^(\d{4}-\d\d-\d\d)[ T](\d\d:\d\d:\d\d)", re.M)
+
+_MAGIC = b"OLX1"
+_HEADER = struct.Struct("<4sQQ19s")  # magic, log inode, bytes indexed, timestamp in effect there
+_RECORD = struct.Struct("<Q19sB")    # block offset, timestamp in effect there, level bitmask
+
+
+def _persist_index() -> bool:
+    try:
+        return int(os.environ.get("ODIN_LOG_INDEX", "1")) != 0
+    except ValueError:
+        return True
+
+
+def line_filter(level: Optional[str] = None, search: Optional[str] = None) -> Optional[Callable[[str], bool]]:
+    """Case-insensitive level and text match on a whole line; None when nothing is filtered."""
+    level_upper = level.upper() if level else None
+    needle = search.lower() if search else None
+    if not level_upper and not needle:
+        return None
+
+    def match(line: str) -> bool:
+        if level_upper and level_upper not in line.upper():
+            return False
+        return not needle or needle in line.lower()
+    return match
+
+
+def parse_time(value: Optional[str]) -> Optional[bytes]:
+    """'YYYY-MM-DD HH:MM[:SS]' (or ISO 8601) as comparable log timestamp text; ValueError if invalid."""
+    if not value:
+        return None
+    return datetime.fromisoformat(value.strip()).strftime("%Y-%m-%d %H:%M:%S").encode()
+
+
+def _decode(raw: bytes) -> str:
+    return raw.rstrip(b"\r").decode("utf-8", "replace")
+
+
+def _timestamp(match) -> bytes:
+    return match.group(1) + b" " + match.group(2)
+
+
+def tail_lines(path: str, n: int, match: Optional[Callable[[str], bool]] = None,
+               block: int = BLOCK_BYTES) -> List[str]:
+    """The last n lines of a file that satisfy `match`, oldest first."""
+    newest_first: List[str] = []
+    with open(path, "rb") as f:
+        pos = os.fstat(f.fileno()).st_size
+        carry = b""        # head of a line cut by the previous block boundary
+        at_eof = True
+        while pos > 0 and len(newest_first) < n:
+            size = min(block, pos)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + carry).split(b"\n")
+            if at_eof and lines[-1] == b"":
+                lines.pop()  # the newline that ends the file
+            at_eof = False
+            carry = lines.pop(0) if pos > 0 else b""
+            for raw in reversed(lines):
+                line = _decode(raw)
+                if match is None or match(line):
+                    newest_first.append(line)
+                    if len(newest_first) == n:
+                        break
+    newest_first.reverse()
+    return newest_first
+
+
+class LogIndex:
+    """Byte offsets of a log by timestamp and level, kept in a sidecar file."""
+
+    def __init__(self, path: str, persist: Optional[bool] = None):
+        self.path = path
+        self.sidecar = path + ".idx"
+        self.persist = _persist_index() if persist is None else persist
+        self.ino = 0
+        self.end = 0          # bytes indexed; always at a line boundary
+        self.last_ts = b""    # timestamp in effect at `end`
+        self.records: List[Tuple[int, bytes, int]] = []
+        if self.persist:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.sidecar, "rb") as f:
+                data = f.read()
+            magic, ino, end, last_ts = _HEADER.unpack_from(data)
+        except (OSError, struct.error):
+            return
+        if magic != _MAGIC:
+            return
+        body = data[_HEADER.size:]
+        body = body[:len(body) - len(body) % _RECORD.size]
+        self.records = [(off, ts.rstrip(b"\0"), mask) for off, ts, mask in _RECORD.iter_unpack(body)]
+        self.ino, self.end, self.last_ts = ino, end, last_ts.rstrip(b"\0")
+
+    def _save(self) -> None:
+        tmp = f"{self.sidecar}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, self.ino, self.end, self.last_ts))
+                f.write(b"".join(_RECORD.pack(*r) for r in self.records))
+            os.replace(tmp, self.sidecar)
+        except OSError as e:
+            log.debug(f"Log index {self.sidecar} not saved: {e}")
+
+    def _reset(self, ino: int) -> None:
+        self.ino, self.end, self.last_ts, self.records = ino, 0, b"", []
+
+    def _add(self, offset: int, block: bytes) -> None:
+        first = _TS.match(block)
+        upper = block.upper()
+        mask = 0
+        for bit, name in enumerate(LEVELS):
+            if name.encode() in upper:
+                mask |= 1 << bit
+        self.records.append((offset, _timestamp(first) if first else self.last_ts, mask))
+        last = None
+        for last in _TS.finditer(block):
+            pass
+        if last is not None:
+            self.last_ts = _timestamp(last)
+
+    def update(self) -> "LogIndex":
+        """Index the complete lines appended since the last update."""
+        st = os.stat(self.path)
+        if st.st_ino != self.ino or st.st_size < self.end:
+            self._reset(st.st_ino)  # rotated or truncated
+        if st.st_size == self.end:
+            return self
+        start = self.end
+        with open(self.path, "rb") as f:
+            f.seek(self.end)
+            pending = b""
+            while True:
+                data = f.read(BLOCK_BYTES)
+                if not data:
+                    break
+                data = pending + data
+                cut = data.rfind(b"\n") + 1
+                if cut == 0:
+                    pending = data  # a line longer than a block
+                    continue
+                self._add(self.end, data[:cut])
+                self.end += cut
+                pending = data[cut:]
+        if self.persist and self.end != start:
+            self._save()
+        return self
+
+    def blocks(self, level: Optional[str] = None, since: Optional[bytes] = None,
+               until: Optional[bytes] = None) -> List[Tuple[int, Optional[int], bytes]]:
+        """(start, end, timestamp at start) of the blocks that can hold matching lines.
+
+        The last entry is the unindexed tail (end None).
+        """
+        bit = 1 << LEVELS.index(level) if level in LEVELS else 0
+        starts = [r[1] for r in self.records[1:]] + [self.last_ts]
+        ends = [r[0] for r in self.records[1:]] + [self.end]
+        out = []
+        for (offset, ts, mask), next_ts, end in zip(self.records, starts, ends):
+            if bit and not mask & bit:
+                continue
+            if since and next_ts and next_ts < since:
+                continue  # every line of the block is older
+            if until and ts and ts > until:
+                break     # this block and all later ones are newer
+            out.append((offset, end, ts))
+        if not (until and self.last_ts and self.last_ts > until):
+            out.append((self.end, None, self.last_ts))
+        return out
+
+
+def read_logs(path: str, n: int, level: Optional[str] = None, search: Optional[str] = None,
+              since: Optional[bytes] = None, until: Optional[bytes] = None) -> List[str]:
+    """The last n lines of a log matching the filters, oldest first.
+
+    A plain or text-filtered tail reads backwards from the end; level and
+    time-window queries go through the LogIndex.
+    """
+    match = line_filter(level, search)
+    if not level and not since and not until:
+        return tail_lines(path, n, match)
+
+    index = LogIndex(path).update()
+    found: List[List[str]] = []
+    total = 0
+    with open(path, "rb") as f:
+        for start, end, ts in reversed(index.blocks(level.upper() if level else None, since, until)):
+            f.seek(start)
+            data = f.read(-1 if end is None else end - start)
+            lines = data.split(b"\n")
+            if lines[-1] == b"":
+                lines.pop()
+            block_lines = []
+            for raw in lines:
+                stamp = _TS.match(raw)
+                if stamp:
+                    ts = _timestamp(stamp)
+                if (since or until) and not ts:
+                    continue
+                if (since and ts < since) or (until and ts > until):
+                    continue
+                line = _decode(raw)
+                if match is None or match(line):
+                    block_lines.append(line)
+            found.append(block_lines)
+            total += len(block_lines)
+            if total >= n:
+                break
+    return [line for block_lines in reversed(found) for line in block_lines][-n:]
+
+
+# ---------------------------------------------------------------------------
+# Following a log
+# ---------------------------------------------------------------------------
+
+_IN_MODIFY = 0x002
+_IN_ATTRIB = 0x004
+_IN_DELETE_SELF = 0x400
+_IN_MOVE_SELF = 0x800
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    _inotify_init1 = _libc.inotify_init1
+    _inotify_add_watch = _libc.inotify_add_watch
+except (OSError, AttributeError, TypeError):
+    _inotify_init1 = None
+
+
+class _Watch:
+    """Wakes when a file changes: inotify on Linux, a short poll elsewhere."""
+
+    def __init__(self, path: str):
+        self.fd = -1
+        if _inotify_init1 is not None:
+            fd = _inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd >= 0 and _inotify_add_watch(
+                fd, os.fsencode(path), _IN_MODIFY | _IN_ATTRIB | _IN_DELETE_SELF | _IN_MOVE_SELF
+            ) >= 0:
+                self.fd = fd
+            elif fd >= 0:
+                os.close(fd)
+
+    async def wait(self, timeout: float) -> None:
+        if self.fd < 0:
+            await asyncio.sleep(min(timeout, _POLL_INTERVAL))
+            return
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        loop.add_reader(self.fd, ready.set)
+        try:
+            await asyncio.wait_for(ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            loop.remove_reader(self.fd)
+        try:
+            while os.read(self.fd, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self) -> None:
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _rotated(f, path: str) -> bool:
+    try:
+        return os.stat(path).st_ino != os.fstat(f.fileno()).st_ino
+    except FileNotFoundError:
+        return False  # mid-rotation; keep the old file until the new one appears
+
+
+async def follow(path: str, stopped: Callable[[], Awaitable[bool]],
+                 check: float = FOLLOW_CHECK) -> AsyncIterator[str]:
+    """Yield each complete line appended to `path` from now on until stopped() is true."""
+    f = open(path, "rb")
+    f.seek(0, os.SEEK_END)
+    watch = _Watch(path)
+    pending = b""
+    try:
+        while not await stopped():
+            data = f.read()
+            if data:
+                *lines, pending = (pending + data).split(b"\n")
+                for raw in lines:
+                    yield _decode(raw)
+                continue
+            if _rotated(f, path):
+                f.close()
+                watch.close()
+                f = open(path, "rb")
+                watch = _Watch(path)
+                pending = b""
+                continue
+            await watch.wait(check)
+    finally:
+        watch.close()
+        f.close()
@@ -25,7 +25,7 @@ from sqlalchemy.orm import Session
 
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import get_current_user, log_audit
+from core.dependencies import get_current_user, get_json_body, log_audit
 from core.rbac import require_role, get_org_scope, check_org_access
 
 log = logging.getLogger("odin.api")
@@ -103,13 +103,13 @@ def list_profiles(
 
 
 @router.post("/profiles", tags=["Profiles"], status_code=201)
-async def create_profile(
+def create_profile(
     request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("operator")),
+    body: dict = Depends(get_json_body),
 ):
     """Create a profile from JSON body."""
-    body = await request.json()
     name = body.get("name")
     slicer = body.get("slicer")
     category = body.get("category")
@@ -195,14 +195,14 @@ def _parse_prusa_ini(content: str) -> dict:
 
 
 @router.post("/profiles/import", tags=["Profiles"], status_code=201)
-async def import_profile(
+def import_profile(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("operator")),
 ):
     """Import profile from file upload (.json, .ini, .3mf)."""
     MAX_SIZE = 50 * 1024 * 1024  # 50 MB
-    content_bytes = await file.read(MAX_SIZE + 1)
+    content_bytes = file.file.read(MAX_SIZE + 1)
     if len(content_bytes) > MAX_SIZE:
         raise HTTPException(status_code=413, detail="File exceeds 50 MB limit")
 
@@ -292,11 +292,12 @@ def get_profile(
 
 
 @router.put("/profiles/{profile_id}", tags=["Profiles"])
-async def update_profile(
+def update_profile(
     profile_id: int,
     request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("operator")),
+    body: dict = Depends(get_json_body),
 ):
     """Update profile metadata."""
     row = db.execute(text("SELECT * FROM printer_profiles WHERE id = :id"), {"id": profile_id}).fetchone()
@@ -307,7 +308,6 @@ async def update_profile(
     # Operator can edit own; admin can edit any
     if current_user.get("role") != "admin" and row.created_by != current_user.get("id"):
         raise HTTPException(status_code=403, detail="Can only edit your own profiles")
-    body = await request.json()
     allowed = {"name", "description", "tags", "is_shared", "printer_id", "filament_type"}
     updates = {k: v for k, v in body.items() if k in allowed}
     if not updates:
@@ -364,11 +364,12 @@ def export_profile(
 
 
 @router.post("/profiles/{profile_id}/apply", tags=["Profiles"])
-async def apply_profile(
+def apply_profile(
     profile_id: int,
     request: Request,
     db: Session = Depends(get_db),
     current_user: dict = Depends(require_role("operator")),
+    body: dict = Depends(get_json_body),
 ):
     """Apply a Klipper profile to a printer via Moonraker GCode API."""
     row = db.execute(text("SELECT * FROM printer_profiles WHERE id = :id"), {"id": profile_id}).fetchone()
@@ -382,7 +383,6 @@ async def apply_profile(
             detail="Only Klipper profiles can be applied directly. Download this profile and import it into your slicer.",
         )
 
-    body = await request.json()
     target_printer_id = body.get("printer_id")
     if not target_printer_id:
         raise HTTPException(status_code=400, detail="printer_id is required")
@@ -11,6 +11,7 @@ from fastapi.responses import StreamingResponse
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
+from core import search_index
 from core.db import get_db
 from core.db_compat import sql
 from core.rbac import require_role, require_superadmin, get_org_scope
@@ -18,6 +19,7 @@ from modules.models_library.models import Model
 from modules.jobs.models import Job
 from modules.inventory.models import Spool, FilamentLibrary
 from modules.printers.models import Printer
+from modules.system import log_tail
 
 log = logging.getLogger("odin.api")
 router = APIRouter()
@@ -27,10 +29,7 @@ router = APIRouter()
 
 _LOG_FILES = {
     "backend": "/data/backend.log",
-    "mqtt": "/data/mqtt_monitor.log",
-    "moonraker": "/data/moonraker_monitor.log",
-    "prusalink": "/data/prusalink_monitor.log",
-    "elegoo": "/data/elegoo_monitor.log",
+    "monitors": "/data/printer_monitors.log",
     "vision": "/data/vision_monitor.log",
     "go2rtc": "/data/go2rtc.log",
     "timelapse": "/data/timelapse_capture.log",
@@ -40,31 +39,25 @@ _LOG_FILES = {
 
 @router.get("/admin/logs", tags=["Admin"])
 def get_logs(
-    source: str = Query("backend", description="Log source: backend, mqtt, moonraker, prusalink, elegoo, vision, go2rtc, timelapse, reports"),
+    source: str = Query("backend", description="Log source: backend, monitors, vision, go2rtc, timelapse, reports"),
     lines: int = Query(200, ge=1, le=5000),
     level: Optional[str] = Query(None, description="Filter by log level: DEBUG, INFO, WARNING, ERROR"),
     search: Optional[str] = Query(None, description="Text filter"),
+    since: Optional[str] = Query(None, description="Only lines logged at or after this time (YYYY-MM-DD HH:MM[:SS], log time zone)"),
+    until: Optional[str] = Query(None, description="Only lines logged at or before this time (YYYY-MM-DD HH:MM[:SS], log time zone)"),
     user=Depends(require_superadmin()),
 ):
     """Return the last N lines from a log file. Superadmin only — exposes server internals."""
     log_path = _LOG_FILES.get(source)
     if not log_path or not os.path.isfile(log_path):
         return {"lines": [], "source": source}
+    try:
+        since_ts, until_ts = log_tail.parse_time(since), log_tail.parse_time(until)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="since/until must be YYYY-MM-DD HH:MM[:SS]")
 
-    import collections
-    result = collections.deque(maxlen=lines)
-    level_upper = level.upper() if level else None
-
-    with open(log_path, "r", errors="replace") as f:
-        for line in f:
-            stripped = line.rstrip("\n")
-            if level_upper and level_upper not in stripped.upper():
-                continue
-            if search and search.lower() not in stripped.lower():
-                continue
-            result.append(stripped)
-
-    return {"lines": list(result), "source": source}
+    result = log_tail.read_logs(log_path, lines, level=level, search=search, since=since_ts, until=until_ts)
+    return {"lines": result, "source": source}
 
 
 @router.get("/admin/logs/stream", tags=["Admin"])
@@ -76,30 +69,16 @@ async def stream_logs(
     user=Depends(require_superadmin()),
 ):
     """SSE endpoint — streams new log lines in real time. Superadmin only."""
-    import asyncio
-
     log_path = _LOG_FILES.get(source)
     if not log_path or not os.path.isfile(log_path):
         raise HTTPException(status_code=404, detail="Log source not found")
 
-    level_upper = level.upper() if level else None
+    match = log_tail.line_filter(level, search)
 
     async def event_generator():
-        with open(log_path, "r", errors="replace") as f:
-            f.seek(0, 2)
-            while True:
-                if await request.is_disconnected():
-                    break
-                line = f.readline()
-                if not line:
-                    await asyncio.sleep(0.5)
-                    continue
-                stripped = line.rstrip("\n")
-                if level_upper and level_upper not in stripped.upper():
-                    continue
-                if search and search.lower() not in stripped.lower():
-                    continue
-                yield f"data: {json.dumps(stripped)}\n\n"
+        async for line in log_tail.follow(log_path, request.is_disconnected):
+            if match is None or match(line):
+                yield f"data: {json.dumps(line)}\n\n"
 
     return StreamingResponse(event_generator(), media_type="text/event-stream")
 
@@ -109,7 +88,6 @@ async def stream_logs(
 @router.get("/admin/support-bundle", tags=["Admin"])
 def download_support_bundle(user=Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Generate a privacy-filtered diagnostic ZIP for issue reporting. Superadmin only."""
-    import collections
     import io
     import platform
     import sqlite3
@@ -169,12 +147,9 @@ def download_support_bundle(user=Depends(require_superadmin()), db: Session = De
         zf.writestr("settings_safe.json", json.dumps(safe_config, indent=2))
 
         log_path = "/data/backend.log"
-        error_lines = collections.deque(maxlen=100)
+        error_lines = []
         if os.path.isfile(log_path):
-            with open(log_path, "r", errors="replace") as f:
-                for line in f:
-                    if "WARNING" in line or "ERROR" in line:
-                        error_lines.append(line.rstrip("\n"))
+            error_lines = log_tail.tail_lines(log_path, 100, lambda line: "WARNING" in line or "ERROR" in line)
         zf.writestr("recent_errors.txt", "\n".join(error_lines))
 
         health = {}
@@ -230,15 +205,21 @@ def global_search(q: str = "", db: Session = Depends(get_db), current_user: dict
     org = get_org_scope(current_user)
     query = f"%{q.lower()}%"
 
-    mq = db.query(Model).filter((Model.name.ilike(query)) | (Model.notes.ilike(query)))
-    if org is not None:
-        mq = mq.filter((Model.org_id == org) | (Model.org_id == None))
-    models = mq.limit(5).all()
-
-    jq = db.query(Job).filter((Job.item_name.ilike(query)) | (Job.notes.ilike(query)))
-    if org is not None:
-        jq = jq.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
-    jobs = jq.order_by(Job.created_at.desc()).limit(5).all()
+    # Models and jobs grow with history: ranked full-text match (core/search_index.py)
+    models, jobs = [], []
+    hits = search_index.hits("models", q)
+    if hits is not None:
+        mq = db.query(Model).join(hits, hits.c.id == Model.id)
+        if org is not None:
+            mq = mq.filter((Model.org_id == org) | (Model.org_id == None))
+        models = mq.order_by(hits.c.rank).limit(5).all()
+
+    hits = search_index.hits("jobs", q)
+    if hits is not None:
+        jq = db.query(Job).join(hits, hits.c.id == Job.id)
+        if org is not None:
+            jq = jq.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))
+        jobs = jq.order_by(hits.c.rank, Job.created_at.desc()).limit(5).all()
 
     sq = db.query(Spool).outerjoin(FilamentLibrary, Spool.filament_id == FilamentLibrary.id).filter(
         (Spool.qr_code.ilike(query)) |
@@ -20,7 +20,7 @@ router = APIRouter()
 
 
 @router.post("/backups/restore", tags=["System"])
-async def restore_backup(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def restore_backup(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Restore database from an uploaded backup file. SQLite only."""
     if sql.is_postgres:
         raise HTTPException(status_code=501, detail="Backup restore is only supported for SQLite databases. Use pg_dump/pg_restore for PostgreSQL.")
@@ -31,7 +31,7 @@ async def restore_backup(file: UploadFile = File(...), current_user: dict = Depe
         raise HTTPException(status_code=400, detail="Only .db files are supported")
 
     MAX_BACKUP_BYTES = 100 * 1024 * 1024  # 100 MB
-    content = await file.read(MAX_BACKUP_BYTES + 1)
+    content = file.file.read(MAX_BACKUP_BYTES + 1)
     if len(content) > MAX_BACKUP_BYTES:
         raise HTTPException(status_code=413, detail="Backup file too large")
 
@@ -11,7 +11,7 @@ from sqlalchemy.orm import Session
 from starlette.responses import Response
 
 from core.db import get_db
-from core.dependencies import log_audit
+from core.dependencies import get_json_body, log_audit
 from core.rbac import require_role, require_superadmin
 import core.crypto as crypto
 
@@ -22,7 +22,7 @@ router = APIRouter()
 # ============== IP Allowlist ==============
 
 @router.get("/config/ip-allowlist", tags=["Config"])
-async def get_ip_allowlist(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def get_ip_allowlist(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Get the IP allowlist configuration."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'ip_allowlist'")).fetchone()
     if not row:
@@ -38,7 +38,7 @@ class IPAllowlistRequest(PydanticBaseModel):
 
 
 @router.put("/config/ip-allowlist", tags=["Config"])
-async def set_ip_allowlist(request: Request, body: IPAllowlistRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def set_ip_allowlist(request: Request, body: IPAllowlistRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Set the IP allowlist. Includes lock-out protection."""
     import ipaddress
     enabled = body.enabled
@@ -80,7 +80,7 @@ RETENTION_DEFAULTS = {
 
 
 @router.get("/config/retention", tags=["Config"])
-async def get_retention_config(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def get_retention_config(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Get data retention policy configuration."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'data_retention'")).fetchone()
     if not row:
@@ -97,7 +97,7 @@ class RetentionConfigRequest(PydanticBaseModel):
 
 
 @router.put("/config/retention", tags=["Config"])
-async def set_retention_config(body: RetentionConfigRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def set_retention_config(body: RetentionConfigRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Set data retention policy configuration."""
     body_data = body.model_dump(exclude_unset=True)
     config = {}
@@ -118,7 +118,7 @@ async def set_retention_config(body: RetentionConfigRequest, current_user: dict
 
 
 @router.post("/admin/retention/cleanup", tags=["Config"])
-async def run_retention_cleanup(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def run_retention_cleanup(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Manually trigger data retention cleanup."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'data_retention'")).fetchone()
     config = {**RETENTION_DEFAULTS}
@@ -160,7 +160,7 @@ async def run_retention_cleanup(current_user: dict = Depends(require_superadmin(
 # ============== Quiet Hours Config ==============
 
 @router.get("/config/quiet-hours")
-async def get_quiet_hours_config(db: Session = Depends(get_db), current_user: dict = Depends(require_superadmin())):
+def get_quiet_hours_config(db: Session = Depends(get_db), current_user: dict = Depends(require_superadmin())):
     """Get quiet hours settings."""
     keys = ["quiet_hours_enabled", "quiet_hours_start", "quiet_hours_end", "quiet_hours_digest"]
     config = {}
@@ -180,9 +180,8 @@ async def get_quiet_hours_config(db: Session = Depends(get_db), current_user: di
 
 
 @router.put("/config/quiet-hours")
-async def update_quiet_hours_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def update_quiet_hours_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db), body: dict = Depends(get_json_body)):
     """Update quiet hours settings. Admin only."""
-    body = await request.json()
     for short_key, value in body.items():
         db_key = f"quiet_hours_{short_key}"
         str_val = str(value).lower() if isinstance(value, bool) else str(value)
@@ -209,7 +208,7 @@ except ImportError:
 
 
 @router.get("/config/mqtt-republish")
-async def get_mqtt_republish_config(db: Session = Depends(get_db), current_user: dict = Depends(require_superadmin())):
+def get_mqtt_republish_config(db: Session = Depends(get_db), current_user: dict = Depends(require_superadmin())):
     """Get MQTT republish settings."""
     keys = [
         "mqtt_republish_enabled", "mqtt_republish_host", "mqtt_republish_port",
@@ -243,9 +242,8 @@ async def get_mqtt_republish_config(db: Session = Depends(get_db), current_user:
 
 
 @router.put("/config/mqtt-republish")
-async def update_mqtt_republish_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def update_mqtt_republish_config(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db), body: dict = Depends(get_json_body)):
     """Update MQTT republish settings. Admin only."""
-    body = await request.json()
     for short_key, value in body.items():
         db_key = f"mqtt_republish_{short_key}"
         if short_key == "password" and value == "••••••••":
@@ -285,7 +283,7 @@ async def test_mqtt_republish(request: Request, current_user: dict = Depends(req
 # ============== Prometheus Metrics ==============
 
 @router.get("/metrics", tags=["Monitoring"])
-async def prometheus_metrics(db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
+def prometheus_metrics(db: Session = Depends(get_db), current_user: dict = Depends(require_role("viewer"))):
     """Prometheus-compatible metrics endpoint. Requires viewer role or API key."""
     lines = []
 
@@ -398,6 +396,24 @@ async def prometheus_metrics(db: Session = Depends(get_db), current_user: dict =
         r = dict(row._mapping)
         lines.append(f'odin_orders_by_status{{status="{r["status"]}"}} {r["cnt"]}')
 
+    runs = db.execute(text(
+        "SELECT mode, duration_ms, delta_size, changed_count FROM scheduler_runs "
+        "WHERE id IN (SELECT MAX(id) FROM scheduler_runs GROUP BY mode)"
+    )).fetchall()
+    runs = [dict(row._mapping) for row in runs]
+    for metric, column, help_text in (
+        ("odin_scheduler_last_run_seconds", "duration_ms", "Latency of the latest scheduler run, by mode"),
+        ("odin_scheduler_last_delta_size", "delta_size", "Plan changes applied by the latest incremental run"),
+        ("odin_scheduler_last_changed_jobs", "changed_count", "Jobs written by the latest scheduler run, by mode"),
+    ):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for r in runs:
+            if r[column] is None:
+                continue
+            value = r[column] / 1000 if column == "duration_ms" else r[column]
+            lines.append(f'{metric}{{mode="{r["mode"] or "full"}"}} {value}')
+
     unread = db.execute(text("SELECT COUNT(*) as cnt FROM alerts WHERE is_read = 0")).fetchone()
     lines.append("# HELP odin_alerts_unread Unread alerts")
     lines.append("# TYPE odin_alerts_unread gauge")
@@ -9,6 +9,7 @@ from typing import Optional
 
 import httpx
 from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel as PydanticBaseModel, field_validator
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -195,13 +196,13 @@ def get_license_info():
 
 
 @router.post("/license/upload", tags=["License"])
-async def upload_license(
+def upload_license(
     file: UploadFile = File(...),
     current_user: dict = Depends(require_superadmin()),
     db: Session = Depends(get_db),
 ):
     """Upload a license file. Admin only."""
-    content = await file.read()
+    content = file.file.read()
     license_text = content.decode("utf-8").strip()
 
     import json as _json
@@ -470,8 +471,12 @@ async def unactivate_license(
     license_manager._cached_license = None
     license_manager._cached_mtime = 0
 
-    log_audit(db, "license.unactivated", "system", details={"key": license_key[:4] + "..."})
-    db.commit()
+    def _audit():
+        log_audit(db, "license.unactivated", "system", details={"key": license_key[:4] + "..."})
+        db.commit()
+
+    # async for the license-server round trip; keep the DB write off the loop.
+    await run_in_threadpool(_audit)
     return {"status": "unactivated", "tier": "community"}
 
 
@@ -530,8 +535,11 @@ async def reactivate_license(
         os.remove(path)
         raise HTTPException(status_code=400, detail=license_info.error)
 
-    log_audit(db, "license.reactivated", "system", details={"tier": license_info.tier, "licensee": license_info.licensee})
-    db.commit()
+    def _audit():
+        log_audit(db, "license.reactivated", "system", details={"tier": license_info.tier, "licensee": license_info.licensee})
+        db.commit()
+
+    await run_in_threadpool(_audit)
     return {
         "status": "reactivated",
         "tier": license_info.tier,
@@ -12,7 +12,7 @@ from sqlalchemy.orm import Session
 
 from core.db import get_db
 from core.db_compat import sql
-from core.dependencies import log_audit
+from core.dependencies import get_json_body, log_audit
 from core.rbac import require_role, require_superadmin
 from modules.organizations.branding import get_or_create_branding, branding_to_dict, UPDATABLE_FIELDS
 
@@ -53,7 +53,7 @@ def _detect_image_type(content: bytes) -> str | None:
 # ============== Branding ==============
 
 @router.get("/branding", tags=["Branding"])
-async def get_branding(db: Session = Depends(get_db)):
+def get_branding(db: Session = Depends(get_db)):
     """Get branding config. PUBLIC - no auth required."""
     return branding_to_dict(get_or_create_branding(db))
 
@@ -84,7 +84,7 @@ class BrandingUpdateRequest(PydanticBaseModel):
 
 
 @router.put("/branding", tags=["Branding"])
-async def update_branding(data: BrandingUpdateRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def update_branding(data: BrandingUpdateRequest, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Update branding config. Admin only."""
     branding = get_or_create_branding(db)
     for key, value in data.model_dump(exclude_unset=True).items():
@@ -97,10 +97,10 @@ async def update_branding(data: BrandingUpdateRequest, current_user: dict = Depe
 
 
 @router.post("/branding/logo", tags=["Branding"])
-async def upload_logo(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def upload_logo(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Upload brand logo. Admin only."""
     import shutil
-    content = await file.read()
+    content = file.file.read()
     detected_type = _detect_image_type(content)
     if detected_type is None:
         raise HTTPException(status_code=400, detail="File type not allowed. Upload PNG, JPEG, SVG, or WebP.")
@@ -119,9 +119,9 @@ async def upload_logo(file: UploadFile = File(...), current_user: dict = Depends
 
 
 @router.post("/branding/favicon", tags=["Branding"])
-async def upload_favicon(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def upload_favicon(file: UploadFile = File(...), current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Upload favicon. Admin only."""
-    content = await file.read()
+    content = file.file.read()
     detected_type = _detect_image_type(content)
     if detected_type is None:
         raise HTTPException(status_code=400, detail="File type not allowed. Upload PNG, JPEG, SVG, or WebP.")
@@ -140,7 +140,7 @@ async def upload_favicon(file: UploadFile = File(...), current_user: dict = Depe
 
 
 @router.delete("/branding/logo", tags=["Branding"])
-async def remove_logo(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def remove_logo(current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
     """Remove brand logo. Admin only."""
     branding = get_or_create_branding(db)
     if branding.logo_url:
@@ -155,16 +155,15 @@ async def remove_logo(current_user: dict = Depends(require_superadmin()), db: Se
 # ============== Education Mode ==============
 
 @router.get("/settings/education-mode", tags=["Settings"])
-async def get_education_mode(db: Session = Depends(get_db)):
+def get_education_mode(db: Session = Depends(get_db)):
     """Get education mode status. Public (frontend needs this at load time)."""
     row = db.execute(text("SELECT value FROM system_config WHERE key = 'education_mode'")).fetchone()
     return {"enabled": row[0] == "true" if row else False}
 
 
 @router.put("/settings/education-mode", tags=["Settings"])
-async def set_education_mode(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def set_education_mode(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db), data: dict = Depends(get_json_body)):
     """Enable or disable education mode. Admin only."""
-    data = await request.json()
     enabled = bool(data.get("enabled", False))
     str_val = "true" if enabled else "false"
     existing = db.execute(text("SELECT 1 FROM system_config WHERE key = 'education_mode'")).fetchone()
@@ -180,16 +179,15 @@ async def set_education_mode(request: Request, current_user: dict = Depends(requ
 # ============== Language / i18n ==============
 
 @router.get("/settings/language", tags=["Settings"])
-async def get_language(db: Session = Depends(get_db)):
+def get_language(db: Session = Depends(get_db)):
     """Get current interface language."""
     result = db.execute(text("SELECT value FROM system_config WHERE key = 'language'")).fetchone()
     return {"language": result[0] if result else "en"}
 
 
 @router.put("/settings/language", tags=["Settings"])
-async def set_language(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db)):
+def set_language(request: Request, current_user: dict = Depends(require_superadmin()), db: Session = Depends(get_db), data: dict = Depends(get_json_body)):
     """Set interface language."""
-    data = await request.json()
     lang = data.get("language", "en")
     supported = ["en", "de", "ja", "es"]
     if lang not in supported:
@@ -12,7 +12,7 @@ from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from core.db import get_db
-from core.dependencies import get_current_user
+from core.dependencies import get_current_user, get_json_body
 from core.rbac import require_role
 from core.auth_helpers import _validate_password
 from core.base import FilamentType
@@ -415,7 +415,7 @@ def setup_mark_complete(current_user: dict = Depends(get_current_user), db: Sess
 
 
 @router.get("/setup/network", tags=["Setup"])
-async def setup_network_info(
+def setup_network_info(
     request: Request,
     current_user: dict = Depends(get_current_user),
     db: Session = Depends(get_db),
@@ -436,11 +436,10 @@ async def setup_network_info(
 
 
 @router.post("/setup/network", tags=["Setup"])
-async def setup_save_network(request: Request, db: Session = Depends(get_db), current_user: dict = Depends(require_role("admin"))):
+def setup_save_network(request: Request, db: Session = Depends(get_db), current_user: dict = Depends(require_role("admin")), data: dict = Depends(get_json_body)):
     """Save host IP for WebRTC camera streaming. Admin only."""
     if _setup_is_complete(db):
         raise HTTPException(status_code=403, detail="Setup already completed")
-    data = await request.json()
     host_ip = data.get("host_ip", "").strip()
     if not host_ip:
         raise HTTPException(status_code=400, detail="host_ip is required")
@@ -1,8 +1,10 @@
 """
 PrinterVisionThread — per-printer detection loop.
 
-Captures frames from go2rtc, runs ONNX inference via VisionInferenceEngine,
-manages confirmation buffers, and dispatches alerts on confirmed detections.
+Captures frames from go2rtc (through the shared frame cache), runs ONNX
+inference via VisionInferenceEngine (one batched request per frame for
+all its detection types), manages confirmation buffers, and dispatches
+alerts on confirmed detections.
 Frame storage delegated to frame_storage module.
 """
 
@@ -19,7 +21,8 @@ from sqlalchemy import text
 
 from core.db import engine
 from core.db_compat import sql
-from modules.vision.inference_engine import VisionInferenceEngine
+from core.frame_cache import FrameCache
+from modules.vision.inference_engine import Detections, VisionInferenceEngine
 from modules.vision import frame_storage
 
 try:
@@ -29,10 +32,12 @@ except ImportError:
 
 log = logging.getLogger('vision_monitor')
 
-GO2RTC_BASE = 'http://127.0.0.1:1984'
 ALERT_COOLDOWN = 60  # minimum seconds between same-type alerts per printer
 DETECTION_TYPES = ['spaghetti', 'first_layer', 'detachment', 'build_plate_empty']
 
+# go2rtc frames, shared by every printer thread and with the timelapse daemon
+camera_frames = FrameCache()
+
 
 class PrinterVisionThread(threading.Thread):
     """Vision monitoring thread for a single actively-printing printer."""
@@ -111,10 +116,21 @@ class PrinterVisionThread(threading.Thread):
         if self.settings.get('detachment_enabled', 1) and layer > 5 and self.engine.has_model('detachment'):
             checks.append(('detachment', self.settings.get('detachment_threshold', 0.70)))
 
+        # Build plate empty detection — runs when printer is IDLE, not during printing
+        plate_check = (self.settings.get('build_plate_empty_enabled', 0)
+                       and self.gcode_state in ('IDLE', 'FINISH', 'FINISHED'))
+
+        # One request for every model this frame needs: the engine batches
+        # it with other printers' frames and preprocesses it once.
+        types = [dt for dt, _ in checks]
+        if plate_check and self.engine.has_model('build_plate_empty'):
+            types.append('build_plate_empty')
+        results = self.engine.detect(frame, types) if types else {}
+
         for detection_type, threshold in checks:
-            detections = self.engine.infer(detection_type, frame)
+            detections = results.get(detection_type)
             # Get best detection above threshold
-            best = max(detections, key=lambda d: d['confidence'], default=None)
+            best = detections.best() if detections is not None else None
             above = best is not None and best['confidence'] >= threshold
 
             self._update_history(detection_type, above)
@@ -124,11 +140,9 @@ class PrinterVisionThread(threading.Thread):
                 # Reset history after triggering
                 self._history[detection_type].clear()
 
-        # Build plate empty detection — runs when printer is IDLE, not during printing
-        if (self.settings.get('build_plate_empty_enabled', 0)
-                and self.gcode_state in ('IDLE', 'FINISH', 'FINISHED')):
+        if plate_check:
             threshold = self.settings.get('build_plate_empty_threshold', 0.70)
-            is_empty, confidence = self._detect_build_plate_empty(frame)
+            is_empty, confidence = self._detect_build_plate_empty(frame, results.get('build_plate_empty'))
             above = is_empty and confidence >= threshold
             self._update_history('build_plate_empty', above)
             if self._should_trigger('build_plate_empty'):
@@ -137,17 +151,19 @@ class PrinterVisionThread(threading.Thread):
                 self._on_detection('build_plate_empty', det, frame)
                 self._history['build_plate_empty'].clear()
 
-    def _detect_build_plate_empty(self, frame: np.ndarray) -> tuple:
+    def _detect_build_plate_empty(self, frame: np.ndarray, detections: Optional[Detections] = None) -> tuple:
         """Heuristic baseline for empty plate detection (Option B).
 
         Crops to center 60% of frame and checks color uniformity.
         Returns (is_empty: bool, confidence: float).
-        If an ONNX model is available for 'build_plate_empty', uses that instead.
+        If an ONNX model is available for 'build_plate_empty', uses that instead
+        (its detections when already run for this frame).
         """
         # Option A: use ONNX model if available
-        if self.engine.has_model('build_plate_empty'):
-            detections = self.engine.infer('build_plate_empty', frame)
-            best = max(detections, key=lambda d: d['confidence'], default=None)
+        if detections is not None or self.engine.has_model('build_plate_empty'):
+            if detections is None:
+                detections = self.engine.infer('build_plate_empty', frame)
+            best = detections.best()
             if best:
                 return (True, best['confidence'])
             return (False, 0.0)
@@ -173,19 +189,12 @@ class PrinterVisionThread(threading.Thread):
         return (False, 0.0)
 
     def _capture_frame(self) -> Optional[np.ndarray]:
-        """Fetch a JPEG frame from go2rtc snapshot API."""
-        import httpx
-        url = f"{GO2RTC_BASE}/api/frame.jpeg?src=printer_{self.printer_id}"
-        try:
-            resp = httpx.get(url, timeout=5)
-            if resp.status_code != 200:
-                return None
-            img_array = np.frombuffer(resp.content, dtype=np.uint8)
-            frame = cv2.imdecode(img_array, cv2.IMREAD_COLOR)
-            return frame
-        except Exception as e:
-            log.debug(f"[{self.printer_name}] Frame capture failed: {e}")
+        """Latest camera frame (shared with the timelapse daemon), decoded."""
+        frame = camera_frames.get(self.printer_id)
+        if frame is None:
+            log.debug(f"[{self.printer_name}] Frame capture failed")
             return None
+        return frame.image
 
     def _update_history(self, detection_type: str, detected: bool):
         """Maintain sliding window of recent detection results."""
@@ -231,7 +240,7 @@ class PrinterVisionThread(threading.Thread):
 
         # Insert detection record
         detection_id = self._insert_detection(
-            detection_type, confidence, frame_path, bbox
+            detection_type, confidence, frame_path, bbox, frame.shape[:2]
         )
 
         # Map detection type to alert type
@@ -286,16 +295,20 @@ class PrinterVisionThread(threading.Thread):
 
     def _insert_detection(
         self, detection_type: str, confidence: float,
-        frame_path: str, bbox: list
+        frame_path: str, bbox: list, frame_shape: Optional[tuple] = None
     ) -> Optional[int]:
-        """Insert detection record into vision_detections table."""
+        """Insert detection record into vision_detections table.
+
+        The frame size goes in metadata_json so the training-data export
+        can normalize boxes without opening the image.
+        """
         try:
             with engine.begin() as conn:
                 insert_sql = (
                     f"INSERT INTO vision_detections"
                     f" (printer_id, print_job_id, detection_type, confidence,"
-                    f"  status, frame_path, bbox_json, created_at)"
-                    f" VALUES (:pid, :jid, :dtype, :conf, 'pending', :fpath, :bbox, {sql.now()})")
+                    f"  status, frame_path, bbox_json, metadata_json, created_at)"
+                    f" VALUES (:pid, :jid, :dtype, :conf, 'pending', :fpath, :bbox, :meta, {sql.now()})")
                 params = {
                     "pid": self.printer_id,
                     "jid": self.print_job_id,
@@ -303,6 +316,8 @@ class PrinterVisionThread(threading.Thread):
                     "conf": confidence,
                     "fpath": frame_path,
                     "bbox": json.dumps(bbox),
+                    "meta": json.dumps({"frame_width": frame_shape[1], "frame_height": frame_shape[0]})
+                    if frame_shape else None,
                 }
                 if sql.is_sqlite:
                     conn.execute(text(insert_sql), params)  # nosemgrep: python.sqlalchemy.security.audit.avoid-sqlalchemy-text.avoid-sqlalchemy-text -- verified safe — see docs/SEMGREP_TRIAGE.md (params bound, f-string interpolates only allowlisted/internal symbols)
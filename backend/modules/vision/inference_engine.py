@@ -3,12 +3,15 @@ Vision Inference Engine.
 
 Loads and caches ONNX models, runs inference for print failure detection.
 Extracted from VisionMonitorDaemon to isolate model lifecycle management.
+Inference runs in batches; see inference_scheduler for how printer
+threads share it.
 """
 
 import os
 import logging
 import time
-from typing import Dict, List, Optional
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from sqlalchemy import text
@@ -28,6 +31,21 @@ from core.db import engine
 log = logging.getLogger('vision_monitor')
 
 VISION_MODELS_DIR = '/data/vision_models'
+CONF_THRESHOLD = 0.3   # candidates below this are dropped before NMS
+IOU_THRESHOLD = 0.45
+
+
+def _threads() -> int:
+    return max(1, int(os.environ.get('ODIN_VISION_THREADS', '0')) or os.cpu_count() or 1)
+
+
+def _has_nms(session) -> bool:
+    """Whether the model was exported with NMS built in (Ultralytics export metadata)."""
+    try:
+        meta = session.get_modelmeta().custom_metadata_map
+    except Exception:
+        return False
+    return "'nms': True" in meta.get('args', '') or meta.get('end2end', '').lower() == 'true'
 
 
 class VisionInferenceEngine:
@@ -37,6 +55,7 @@ class VisionInferenceEngine:
         self._sessions: Dict[str, 'ort.InferenceSession'] = {}
         self._model_info: Dict[str, dict] = {}
         self._last_reload = 0
+        self._scheduler = None
 
     def reload_models(self):
         """Load active ONNX models from DB registry."""
@@ -70,16 +89,11 @@ class VisionInferenceEngine:
                     continue
 
             try:
-                sess_opts = ort.SessionOptions()
-                sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
-                sess_opts.intra_op_num_threads = 2
-                session = ort.InferenceSession(model_path, sess_opts, providers=['CPUExecutionProvider'])
-                self._sessions[dt] = session
-                self._model_info[dt] = {
+                self._load(dt, model_path, {
                     'id': row['id'],
                     'name': row['name'],
                     'input_size': row['input_size'] or 640,
-                }
+                })
                 loaded_types.add(dt)
                 log.info(f"Loaded model for {dt}: {row['name']} ({row['filename']})")
             except Exception as e:
@@ -93,163 +107,235 @@ class VisionInferenceEngine:
 
         self._last_reload = time.time()
 
+    def _load(self, detection_type: str, model, info: dict):
+        """Create the session for a model (path or serialized bytes)."""
+        sess_opts = ort.SessionOptions()
+        sess_opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        # Sessions only run on the scheduler thread, one at a time: let
+        # each use every core instead of a fixed 2 threads per caller.
+        sess_opts.intra_op_num_threads = _threads()
+        sess_opts.inter_op_num_threads = 1
+        sess_opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+        session = ort.InferenceSession(model, sess_opts, providers=['CPUExecutionProvider'])
+        batch_dim = session.get_inputs()[0].shape[0]
+        # A model exported with a fixed batch dimension takes that many frames per run.
+        info['max_batch'] = batch_dim if isinstance(batch_dim, int) and batch_dim > 0 else None
+        info['nms'] = _has_nms(session)
+        self._sessions[detection_type] = session
+        self._model_info[detection_type] = info
+
+    def start(self):
+        """Route detect() through a micro-batching scheduler thread."""
+        from modules.vision.inference_scheduler import InferenceScheduler
+        if self._scheduler is None:
+            self._scheduler = InferenceScheduler(self)
+            self._scheduler.start()
+
+    def stop(self):
+        if self._scheduler is not None:
+            self._scheduler.stop()
+            self._scheduler.join(timeout=5)
+            self._scheduler = None
+
     def has_model(self, detection_type: str) -> bool:
         return detection_type in self._sessions
 
     def get_input_size(self, detection_type: str) -> int:
         return self._model_info.get(detection_type, {}).get('input_size', 640)
 
-    def infer(self, detection_type: str, frame: np.ndarray) -> List[dict]:
+    def detect(self, frame: np.ndarray, detection_types: Sequence[str]) -> Dict[str, 'Detections']:
         """
-        Run inference on a preprocessed frame.
-        Returns list of detections: [{confidence, bbox: [x1,y1,x2,y2], class_id}]
+        Detections per type for one frame.
+        Batched with other printers' frames once start() has been called.
         """
-        session = self._sessions.get(detection_type)
-        if session is None:
-            return []
+        if self._scheduler is not None:
+            return self._scheduler.detect(frame, detection_types)
+        return self.infer_batch([(frame, detection_types)])[0]
 
-        input_size = self.get_input_size(detection_type)
-        blob = self._preprocess(frame, input_size)
+    def infer(self, detection_type: str, frame: np.ndarray) -> 'Detections':
+        """
+        Run inference on a single frame.
+        Returns Detections (arrays of boxes [x1,y1,x2,y2], scores, class ids), best first.
+        """
+        return self.detect(frame, [detection_type]).get(detection_type) or Detections.empty()
 
+    def infer_batch(self, requests: List[Tuple[np.ndarray, Sequence[str]]]) -> List[Dict[str, 'Detections']]:
+        """
+        Run a batch of (frame, detection types) requests.
+
+        Frames are preprocessed once per model input size and each model
+        runs once on every frame that asked for it.
+        """
+        # reload_models() may swap sessions meanwhile: use those loaded now.
+        sessions, model_info = dict(self._sessions), dict(self._model_info)
+        results = [{dt: Detections.empty() for dt in types} for _, types in requests]
+        by_size: Dict[int, List[str]] = {}
+        for dt in dict.fromkeys(dt for _, types in requests for dt in types):
+            if dt in sessions:
+                by_size.setdefault(model_info[dt].get('input_size', 640), []).append(dt)
+
+        for input_size, types in by_size.items():
+            rows = [i for i, (_, wanted) in enumerate(requests) if any(dt in wanted for dt in types)]
+            blob = self._preprocess([requests[i][0] for i in rows], input_size)
+            for dt in types:
+                members = [j for j, i in enumerate(rows) if dt in requests[i][1]]
+                batch = blob if len(members) == len(rows) else blob[members]
+                outputs = self._run(dt, sessions[dt], model_info[dt].get('max_batch'), batch)
+                if outputs is None:
+                    continue
+                output_names = [o.name for o in sessions[dt].get_outputs()]
+                in_model_nms = model_info[dt].get('nms', False)
+                for k, j in enumerate(members):
+                    i = rows[j]
+                    results[i][dt] = self._postprocess([o[k:k + 1] for o in outputs], output_names,
+                                                       requests[i][0].shape, input_size, in_model_nms)
+        return results
+
+    def _run(self, detection_type: str, session, max_batch: Optional[int], batch: np.ndarray) -> Optional[list]:
+        """One session run per batch (per max_batch frames for fixed-batch models)."""
         input_name = session.get_inputs()[0].name
+        step = max_batch or len(batch)
         try:
-            outputs = session.run(None, {input_name: blob})
+            chunks = [session.run(None, {input_name: batch[i:i + step]}) for i in range(0, len(batch), step)]
         except Exception as e:
             log.error(f"Inference failed for {detection_type}: {e}")
-            return []
-
+            return None
+        if len(chunks) == 1:
+            return chunks[0]
+        return [np.concatenate(parts) for parts in zip(*chunks)]
+
+    def _preprocess(self, frames: List[np.ndarray], input_size: int) -> np.ndarray:
+        """Resize, normalize, transpose to one NCHW float32 batch."""
+        blob = np.empty((len(frames), 3, input_size, input_size), dtype=np.float32)
+        for i, frame in enumerate(frames):
+            blob[i] = cv2.resize(frame, (input_size, input_size)).transpose(2, 0, 1)  # HWC -> CHW
+        blob /= 255.0
+        return blob
+
+    def _postprocess(self, outputs: list, output_names: list, orig_shape: tuple, input_size: int,
+                     in_model_nms: bool = False) -> 'Detections':
+        """Detections of one frame from its slice of the batch outputs."""
         # Detect output format and dispatch to appropriate postprocessor
-        output_names = [o.name for o in session.get_outputs()]
         if len(outputs) == 2 and 'boxes' in output_names and 'confs' in output_names:
             # Obico/Darknet format: separate boxes (1,N,1,4) + confs (1,N,1)
-            return self._postprocess_obico(outputs, output_names, frame.shape, input_size)
+            return self._postprocess_obico(outputs, output_names, orig_shape, input_size)
+        elif in_model_nms:
+            # Exported with NMS: (1, N, 6) rows of x1, y1, x2, y2, score, class
+            return self._postprocess_nms(outputs, orig_shape, input_size)
         else:
             # YOLOv8 format: single tensor (1, 5+nc, N)
-            return self._postprocess_yolov8(outputs, frame.shape, input_size)
-
-    def _preprocess(self, frame: np.ndarray, input_size: int) -> np.ndarray:
-        """Resize, normalize, transpose to NCHW float32 batch."""
-        img = cv2.resize(frame, (input_size, input_size))
-        img = img.astype(np.float32) / 255.0
-        img = np.transpose(img, (2, 0, 1))  # HWC -> CHW
-        return np.expand_dims(img, axis=0)   # add batch dim
+            return self._postprocess_yolov8(outputs, orig_shape, input_size)
 
     def _postprocess_obico(
         self, outputs: list, output_names: list,
         orig_shape: tuple, input_size: int,
-    ) -> List[dict]:
+    ) -> 'Detections':
         """
         Parse Obico/Darknet YOLO output.
         boxes: (1, N, 1, 4) — x1, y1, x2, y2 normalized [0..1]
         confs: (1, N, 1) — objectness confidence
         """
-        boxes_idx = output_names.index('boxes')
-        confs_idx = output_names.index('confs')
-        boxes = outputs[boxes_idx].squeeze()  # (N, 4)
-        confs = outputs[confs_idx].squeeze()   # (N,)
+        boxes = outputs[output_names.index('boxes')].reshape(-1, 4)
+        confs = outputs[output_names.index('confs')].reshape(len(boxes), -1)
+        scores = confs.max(axis=1)
+        keep = scores >= CONF_THRESHOLD
+        if not keep.any():
+            return Detections.empty()
 
         h_orig, w_orig = orig_shape[:2]
-
-        detections = []
-        for i in range(len(confs)):
-            conf = float(confs[i])
-            if conf < 0.3:
-                continue
-
-            # Boxes are normalized [0..1], convert to pixel coords
-            x1 = float(boxes[i, 0]) * w_orig
-            y1 = float(boxes[i, 1]) * h_orig
-            x2 = float(boxes[i, 2]) * w_orig
-            y2 = float(boxes[i, 3]) * h_orig
-
-            detections.append({
-                'confidence': conf,
-                'bbox': [x1, y1, x2, y2],
-                'class_id': 0,  # single-class model
-            })
-
-        if detections:
-            detections = self._nms(detections, iou_threshold=0.45)
-
-        return detections
+        # Boxes are normalized [0..1], convert to pixel coords
+        xyxy = boxes[keep].astype(np.float64) * (w_orig, h_orig, w_orig, h_orig)
+        class_ids = confs[keep].argmax(axis=1)  # 0 for the single-class model
+        return Detections.from_candidates(xyxy, scores[keep], class_ids)
 
     def _postprocess_yolov8(
         self, outputs: list, orig_shape: tuple, input_size: int
-    ) -> List[dict]:
-        """Parse YOLOv8 output: (1, 5+nc, num_boxes) -> list of detections."""
+    ) -> 'Detections':
+        """Parse YOLOv8 output: (1, 5+nc, num_boxes) -> detections."""
         output = outputs[0]  # shape: (1, 5+nc, N) or (1, N, 5+nc)
 
         # Handle both transposed and non-transposed output shapes
-        if output.ndim == 3:
-            if output.shape[1] < output.shape[2]:
-                # (1, 5+nc, N) -> transpose to (1, N, 5+nc)
-                output = np.transpose(output, (0, 2, 1))
-            preds = output[0]  # (N, 5+nc)
-        else:
-            return []
+        if output.ndim != 3:
+            return Detections.empty()
+        preds = output[0]
+        if output.shape[1] < output.shape[2]:
+            preds = preds.T  # (5+nc, N) -> (N, 5+nc), a view
+
+        class_scores = preds[:, 4:]
+        scores = class_scores.max(axis=1)
+        keep = scores >= CONF_THRESHOLD  # pre-filter low confidence
+        if not keep.any():
+            return Detections.empty()
 
         h_orig, w_orig = orig_shape[:2]
-        scale_x = w_orig / input_size
-        scale_y = h_orig / input_size
-
-        detections = []
-        for pred in preds:
-            cx, cy, w, h = pred[:4]
-            class_scores = pred[4:]
-            class_id = int(np.argmax(class_scores))
-            confidence = float(class_scores[class_id])
-
-            if confidence < 0.3:  # pre-filter low confidence
-                continue
-
-            x1 = (cx - w / 2) * scale_x
-            y1 = (cy - h / 2) * scale_y
-            x2 = (cx + w / 2) * scale_x
-            y2 = (cy + h / 2) * scale_y
-
-            detections.append({
-                'confidence': confidence,
-                'bbox': [float(x1), float(y1), float(x2), float(y2)],
-                'class_id': class_id,
-            })
-
-        # NMS
-        if detections:
-            detections = self._nms(detections, iou_threshold=0.45)
-
-        return detections
-
-    def _nms(self, detections: List[dict], iou_threshold: float) -> List[dict]:
-        """Non-maximum suppression."""
-        if not detections:
-            return []
-
-        boxes = np.array([d['bbox'] for d in detections])
-        scores = np.array([d['confidence'] for d in detections])
-        order = scores.argsort()[::-1]
-
-        keep = []
-        while order.size > 0:
-            i = order[0]
-            keep.append(i)
-
-            if order.size == 1:
-                break
-
-            xx1 = np.maximum(boxes[i, 0], boxes[order[1:], 0])
-            yy1 = np.maximum(boxes[i, 1], boxes[order[1:], 1])
-            xx2 = np.minimum(boxes[i, 2], boxes[order[1:], 2])
-            yy2 = np.minimum(boxes[i, 3], boxes[order[1:], 3])
-
-            w = np.maximum(0, xx2 - xx1)
-            h = np.maximum(0, yy2 - yy1)
-            inter = w * h
-
-            area_i = (boxes[i, 2] - boxes[i, 0]) * (boxes[i, 3] - boxes[i, 1])
-            area_rest = (boxes[order[1:], 2] - boxes[order[1:], 0]) * (boxes[order[1:], 3] - boxes[order[1:], 1])
-            iou = inter / (area_i + area_rest - inter + 1e-6)
-
-            inds = np.where(iou <= iou_threshold)[0]
-            order = order[inds + 1]
-
-        return [detections[i] for i in keep]
+        cx, cy, w, h = preds[keep, :4].astype(np.float64).T
+        xyxy = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+        xyxy *= (w_orig / input_size, h_orig / input_size) * 2
+        return Detections.from_candidates(xyxy, scores[keep], class_scores[keep].argmax(axis=1))
+
+    def _postprocess_nms(self, outputs: list, orig_shape: tuple, input_size: int) -> 'Detections':
+        """Parse the output of a model exported with NMS: boxes are already final."""
+        rows = outputs[0].reshape(-1, outputs[0].shape[-1])
+        rows = rows[rows[:, 4] >= CONF_THRESHOLD]
+        rows = rows[rows[:, 4].argsort()[::-1]]
+        h_orig, w_orig = orig_shape[:2]
+        xyxy = rows[:, :4].astype(np.float64) * ((w_orig / input_size, h_orig / input_size) * 2)
+        return Detections(xyxy, rows[:, 4].astype(np.float64), rows[:, 5].astype(np.int64))
+
+
+@dataclass(frozen=True)
+class Detections:
+    """
+    Detections of one frame, best first.
+    boxes: (n, 4) x1, y1, x2, y2 in frame pixels; scores: (n,); class_ids: (n,)
+    """
+
+    boxes: np.ndarray
+    scores: np.ndarray
+    class_ids: np.ndarray
+
+    @classmethod
+    def empty(cls) -> 'Detections':
+        return cls(np.zeros((0, 4)), np.zeros(0), np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_candidates(cls, boxes: np.ndarray, scores: np.ndarray, class_ids: np.ndarray,
+                        iou_threshold: float = IOU_THRESHOLD) -> 'Detections':
+        keep = nms(boxes, scores, iou_threshold)
+        return cls(boxes[keep], scores[keep].astype(np.float64), class_ids[keep].astype(np.int64))
+
+    def __len__(self) -> int:
+        return len(self.scores)
+
+    def best(self) -> Optional[dict]:
+        """The highest-confidence detection as {confidence, bbox, class_id}, or None."""
+        return self.to_list()[0] if len(self) else None
+
+    def to_list(self) -> List[dict]:
+        return [
+            {'confidence': score, 'bbox': box, 'class_id': class_id}
+            for box, score, class_id in zip(self.boxes.tolist(), self.scores.tolist(), self.class_ids.tolist())
+        ]
+
+
+def nms(boxes: np.ndarray, scores: np.ndarray, iou_threshold: float) -> np.ndarray:
+    """Non-maximum suppression (class-agnostic); indices kept, best first."""
+    order = scores.argsort()[::-1]
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        if rest.size == 0:
+            break
+
+        w = np.maximum(0, np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]))
+        h = np.maximum(0, np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]))
+        inter = w * h
+        iou = inter / (areas[i] + areas[rest] - inter + 1e-6)
+        order = rest[iou <= iou_threshold]
+
+    return np.array(keep, dtype=np.int64)
@@ -0,0 +1,108 @@
+"""
+Vision Inference Scheduler — micro-batches frames from all printers.
+
+Each PrinterVisionThread used to call VisionInferenceEngine.infer() once
+per detection type per frame: the frame was resized and normalized again
+for every model, and with one thread per camera printer up to 30 session
+runs, each with its own intra-op thread pool, competed for the CPU.
+
+Now printer threads submit a frame with the detection types they need
+and wait. One scheduler thread collects requests for up to
+ODIN_VISION_BATCH_WAIT_MS or ODIN_VISION_BATCH frames, then
+VisionInferenceEngine.infer_batch() preprocesses each frame once per
+model input size and runs one session call per model with the frames
+stacked on the batch dimension. Only this thread runs sessions, so they
+can use every core (ODIN_VISION_THREADS) without oversubscription.
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Sequence
+
+import numpy as np
+
+log = logging.getLogger('vision_monitor')
+
+RESULT_TIMEOUT = 60  # seconds a printer thread waits for its detections
+
+
+def batch_size() -> int:
+    return max(1, int(os.environ.get('ODIN_VISION_BATCH', '8')))
+
+
+def batch_wait() -> float:
+    return max(0, int(os.environ.get('ODIN_VISION_BATCH_WAIT_MS', '50'))) / 1000.0
+
+
+class InferenceScheduler(threading.Thread):
+    """Runs every inference of a VisionInferenceEngine in micro-batches."""
+
+    def __init__(self, engine, max_batch: int = None, max_wait: float = None):
+        super().__init__(daemon=True, name='vision-inference')
+        self.engine = engine
+        self.max_batch = max_batch or batch_size()
+        self.max_wait = batch_wait() if max_wait is None else max_wait
+        self._queue: 'queue.Queue' = queue.Queue()
+        self._running = True
+
+    def submit(self, frame: np.ndarray, detection_types: Sequence[str]) -> Future:
+        future = Future()
+        self._queue.put((frame, list(detection_types), future))
+        return future
+
+    def detect(self, frame: np.ndarray, detection_types: Sequence[str]) -> Dict[str, List[dict]]:
+        """Detections per type for one frame, run in the next batch."""
+        return self.submit(frame, detection_types).result(timeout=RESULT_TIMEOUT)
+
+    def stop(self):
+        self._running = False
+        self._queue.put(None)
+
+    def run(self):
+        log.info(f"Inference scheduler started (batch {self.max_batch}, wait {self.max_wait * 1000:.0f} ms)")
+        while self._running:
+            batch = self._collect()
+            if batch:
+                self._run_batch(batch)
+        # Nobody will run what is still queued.
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None:
+                item[2].set_result({})
+
+    def _collect(self) -> list:
+        """Block for a request, then gather more until the batch is full or the wait is over."""
+        item = self._queue.get()
+        if item is None:
+            return []
+        batch = [item]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._running = False
+                break
+            batch.append(item)
+        return batch
+
+    def _run_batch(self, batch: list):
+        try:
+            results = self.engine.infer_batch([(frame, types) for frame, types, _ in batch])
+        except Exception as e:
+            log.error(f"Batched inference failed: {e}")
+            results = [{} for _ in batch]
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
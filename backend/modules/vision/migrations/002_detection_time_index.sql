@@ -0,0 +1,4 @@
+-- vision/migrations/002_detection_time_index.sql
+-- Analytics rollups read vision detections by time range
+-- (modules/reporting/analytics_rollups.py).
+CREATE INDEX IF NOT EXISTS idx_vision_detections_created ON vision_detections(created_at);
@@ -8,9 +8,11 @@ with the existing alert/event pipeline.
 
 Architecture:
   - One thread per actively-printing printer with camera
-  - Frame capture: GET http://127.0.0.1:1984/api/frame.jpeg?src=printer_{id}
+  - Frame capture: GET http://127.0.0.1:1984/api/frame.jpeg?src=printer_{id},
+    through the frame cache shared with the timelapse daemon (core/frame_cache.py)
   - Preprocessing: cv2.imdecode -> resize 640x640 -> normalize -> NCHW
-  - Inference: onnxruntime.InferenceSession.run()
+  - Inference: one scheduler thread micro-batches frames from all printers,
+    one onnxruntime.InferenceSession.run() per model per batch
   - Post-processing: NMS, confidence filter, alert dispatch
 
 Managed by supervisord (priority 35, after go2rtc).
@@ -73,8 +75,9 @@ class VisionMonitorDaemon:
         signal.signal(signal.SIGINT, self._signal_handler)
         signal.signal(signal.SIGTERM, self._signal_handler)
 
-        # Initial model load
+        # Initial model load; inference from all printer threads is batched
         self._engine.reload_models()
+        self._engine.start()
 
         while self._running:
             try:
@@ -102,6 +105,7 @@ class VisionMonitorDaemon:
             thread.stop()
         for thread in self._threads.values():
             thread.join(timeout=5)
+        self._engine.stop()
         log.info("Vision Monitor stopped")
 
     def _signal_handler(self, signum, frame):
@@ -14,12 +14,15 @@ import logging
 import os
 import re
 
-from core.db import get_db
+from core.db import get_db, YIELD_PER
+from core.dependencies import get_json_body
 from core.rbac import require_role, get_org_scope, check_org_access
 from core.config import settings
+from core.zip_stream import zip_response
 from core.models import SystemConfig
 from modules.printers.models import Printer
 from modules.vision.models import VisionDetection, VisionSettings, VisionModel
+from modules.vision import training_export
 
 log = logging.getLogger("odin.api")
 router = APIRouter()
@@ -71,7 +74,7 @@ def _settings_to_dict(s: VisionSettings) -> dict:
 # ============== Vigil AI: Detections ==============
 
 @router.get("/vision/detections", tags=["Vigil AI"])
-async def list_vision_detections(
+def list_vision_detections(
     printer_id: Optional[int] = None,
     detection_type: Optional[str] = None,
     status_filter: Optional[str] = Query(None, alias="status"),
@@ -119,7 +122,7 @@ async def list_vision_detections(
 
 
 @router.get("/vision/detections/{detection_id}", tags=["Vigil AI"])
-async def get_vision_detection(
+def get_vision_detection(
     detection_id: int,
     current_user: dict = Depends(require_role("viewer")),
     db: Session = Depends(get_db),
@@ -140,14 +143,14 @@ async def get_vision_detection(
 
 
 @router.patch("/vision/detections/{detection_id}", tags=["Vigil AI"])
-async def review_vision_detection(
+def review_vision_detection(
     detection_id: int,
     request: Request,
     current_user: dict = Depends(require_role("operator")),
     db: Session = Depends(get_db),
+    body: dict = Depends(get_json_body),
 ):
     """Review a detection: set status to confirmed or dismissed."""
-    body = await request.json()
     new_status = body.get("status")
     if new_status not in ("confirmed", "dismissed"):
         raise HTTPException(status_code=400, detail="Status must be 'confirmed' or 'dismissed'")
@@ -170,7 +173,7 @@ async def review_vision_detection(
 
 
 @router.post("/vision/detections/{detection_id}/dismiss-and-resume", tags=["Vigil AI"])
-async def dismiss_and_resume(
+def dismiss_and_resume(
     detection_id: int,
     current_user: dict = Depends(require_role("operator")),
     db: Session = Depends(get_db),
@@ -249,7 +252,7 @@ async def dismiss_and_resume(
 # ============== Vigil AI: Per-Printer Vision Settings ==============
 
 @router.get("/printers/{printer_id}/vision", tags=["Vigil AI"])
-async def get_printer_vision_settings(
+def get_printer_vision_settings(
     printer_id: int,
     current_user: dict = Depends(require_role("viewer")),
     db: Session = Depends(get_db),
@@ -278,11 +281,12 @@ async def get_printer_vision_settings(
 
 
 @router.patch("/printers/{printer_id}/vision", tags=["Vigil AI"])
-async def update_printer_vision_settings(
+def update_printer_vision_settings(
     printer_id: int,
     request: Request,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
+    body: dict = Depends(get_json_body),
 ):
     """Update per-printer vision settings."""
     printer = db.query(Printer).filter(Printer.id == printer_id).first()
@@ -291,7 +295,6 @@ async def update_printer_vision_settings(
     if not check_org_access(current_user, printer.org_id):
         raise HTTPException(status_code=404, detail="Printer not found")
 
-    body = await request.json()
     allowed = {
         "enabled", "spaghetti_enabled", "spaghetti_threshold",
         "first_layer_enabled", "first_layer_threshold",
@@ -319,7 +322,7 @@ async def update_printer_vision_settings(
 # ============== Vigil AI: Global Vision Settings ==============
 
 @router.get("/vision/settings", tags=["Vigil AI"])
-async def get_global_vision_settings(
+def get_global_vision_settings(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
 ):
@@ -335,13 +338,13 @@ async def get_global_vision_settings(
 
 
 @router.patch("/vision/settings", tags=["Vigil AI"])
-async def update_global_vision_settings(
+def update_global_vision_settings(
     request: Request,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
+    body: dict = Depends(get_json_body),
 ):
     """Update global vision settings."""
-    body = await request.json()
     allowed = {"enabled", "retention_days"}
     updates = {k: v for k, v in body.items() if k in allowed}
 
@@ -359,7 +362,7 @@ async def update_global_vision_settings(
 # ============== Vigil AI: Frames ==============
 
 @router.get("/vision/frames/{printer_id}/{filename}", tags=["Vigil AI"])
-async def serve_vision_frame(
+def serve_vision_frame(
     printer_id: int,
     filename: str,
     current_user: dict = Depends(require_role("viewer")),
@@ -402,7 +405,7 @@ async def serve_vision_frame(
 # ============== Vigil AI: Stats ==============
 
 @router.get("/vision/stats", tags=["Vigil AI"])
-async def get_vision_stats(
+def get_vision_stats(
     days: int = Query(7, le=90),
     current_user: dict = Depends(require_role("viewer")),
     db: Session = Depends(get_db),
@@ -477,7 +480,7 @@ async def get_vision_stats(
 # ============== Vigil AI: Training Data ==============
 
 @router.get("/vision/training-data", tags=["Vigil AI"])
-async def list_training_data(
+def list_training_data(
     printer_id: Optional[int] = None,
     labeled: Optional[bool] = None,
     limit: int = Query(50, le=200),
@@ -526,14 +529,14 @@ async def list_training_data(
 
 
 @router.post("/vision/training-data/{detection_id}/label", tags=["Vigil AI"])
-async def label_training_data(
+def label_training_data(
     detection_id: int,
     request: Request,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
+    body: dict = Depends(get_json_body),
 ):
     """Save a label (class + bbox) for a training frame."""
-    body = await request.json()
     label_class = body.get("class")  # detection_type
     bbox = body.get("bbox")  # [x1, y1, x2, y2]
 
@@ -548,23 +551,30 @@ async def label_training_data(
     if not det:
         raise HTTPException(status_code=404, detail="Detection not found")
 
-    metadata = json.dumps({"label_class": label_class, "label_bbox": bbox})
-    det.metadata_json = metadata
+    try:
+        metadata = json.loads(det.metadata_json) if det.metadata_json else {}
+    except ValueError:
+        metadata = {}
+    if not isinstance(metadata, dict):
+        metadata = {}
+    # Keep what was recorded at capture (frame size) alongside the label.
+    metadata.update({"label_class": label_class, "label_bbox": bbox})
+    det.metadata_json = json.dumps(metadata)
     det.detection_type = label_class
     db.commit()
     return {"id": detection_id, "labeled": True}
 
 
 @router.get("/vision/training-data/export", tags=["Vigil AI"])
-async def export_training_data(
+def export_training_data(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
 ):
-    """Download labeled dataset as ZIP in YOLO format."""
-    import zipfile
-    import io
-    from fastapi.responses import StreamingResponse
+    """Download labeled dataset as ZIP in YOLO format.
 
+    Streamed: detections are read in batches and each frame is sent as it
+    is added (stored, not recompressed), while the response is written.
+    """
     rows = (
         db.query(
             VisionDetection.id,
@@ -575,56 +585,7 @@ async def export_training_data(
         )
         .filter(VisionDetection.status.in_(["confirmed", "dismissed"]))
         .filter(VisionDetection.frame_path.isnot(None))
-        .all()
-    )
-
-    # Class mapping
-    class_map = {'spaghetti': 0, 'first_layer': 1, 'detachment': 2}
-
-    buf = io.BytesIO()
-    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
-        # Write class names
-        zf.writestr('data.yaml', (
-            "names:\n"
-            "  0: spaghetti\n"
-            "  1: first_layer\n"
-            "  2: detachment\n"
-            f"nc: 3\n"
-            "train: images/\n"
-            "val: images/\n"
-        ))
-
-        for row in rows:
-            frame_abs = os.path.realpath(os.path.join('/data/vision_frames', row.frame_path))
-            if not frame_abs.startswith('/data/vision_frames/'):
-                continue  # skip corrupted or injected entries
-            if not os.path.isfile(frame_abs):
-                continue
-
-            base = os.path.splitext(os.path.basename(row.frame_path))[0]
-            zf.write(frame_abs, f"images/{os.path.basename(row.frame_path)}")
-
-            # YOLO label format: class_id cx cy w h (normalized)
-            bbox = json.loads(row.bbox_json) if row.bbox_json else None
-            dt = row.detection_type
-            class_id = class_map.get(dt, 0)
-
-            if bbox and len(bbox) == 4:
-                # Read image dims for normalization
-                import cv2
-                img = cv2.imread(frame_abs)
-                if img is not None:
-                    ih, iw = img.shape[:2]
-                    x1, y1, x2, y2 = bbox
-                    cx = ((x1 + x2) / 2) / iw
-                    cy = ((y1 + y2) / 2) / ih
-                    w = (x2 - x1) / iw
-                    h = (y2 - y1) / ih
-                    zf.writestr(f"labels/{base}.txt", f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n")
-
-    buf.seek(0)
-    return StreamingResponse(
-        buf,
-        media_type="application/zip",
-        headers={"Content-Disposition": "attachment; filename=odin_training_data.zip"}
+        .order_by(VisionDetection.id)
+        .yield_per(YIELD_PER)
     )
+    return zip_response(training_export.iter_dataset(rows), "odin_training_data.zip")
@@ -16,7 +16,7 @@ router = APIRouter()
 
 
 @router.get("/vision/models", tags=["Vigil AI"])
-async def list_vision_models(
+def list_vision_models(
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
 ):
@@ -39,7 +39,7 @@ async def list_vision_models(
 
 
 @router.post("/vision/models", tags=["Vigil AI"])
-async def upload_vision_model(
+def upload_vision_model(
     file: UploadFile = File(...),
     name: str = Query(...),
     detection_type: str = Query(...),
@@ -57,7 +57,7 @@ async def upload_vision_model(
 
     # Save file
     MAX_ONNX_BYTES = 500 * 1024 * 1024  # 500 MB — ONNX models can be large
-    content = await file.read(MAX_ONNX_BYTES + 1)
+    content = file.file.read(MAX_ONNX_BYTES + 1)
     if len(content) > MAX_ONNX_BYTES:
         raise HTTPException(status_code=413, detail="Model file exceeds 500 MB limit")
     os.makedirs('/data/vision_models', exist_ok=True)
@@ -82,7 +82,7 @@ async def upload_vision_model(
 
 
 @router.patch("/vision/models/{model_id}/activate", tags=["Vigil AI"])
-async def activate_vision_model(
+def activate_vision_model(
     model_id: int,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
@@ -103,7 +103,7 @@ async def activate_vision_model(
 
 
 @router.delete("/vision/models/{model_id}", tags=["Vigil AI"])
-async def delete_vision_model(
+def delete_vision_model(
     model_id: int,
     current_user: dict = Depends(require_role("admin")),
     db: Session = Depends(get_db),
@@ -0,0 +1,111 @@
+"""
+YOLO training-data export for Vigil AI.
+
+Builds the entries of the training dataset ZIP (data.yaml, images/,
+labels/) for core.zip_stream, one detection at a time. Frames are
+added as stored files, and label coordinates are normalized with the
+frame size recorded when the detection was captured (metadata_json
+frame_width / frame_height) or, for older detections, read from the JPEG
+header — images are never decoded.
+"""
+
+import json
+import os
+import struct
+from typing import Iterable, Iterator, Optional, Tuple
+
+# frame_storage.VISION_FRAMES_DIR; not imported, frame_storage pulls in cv2
+VISION_FRAMES_DIR = '/data/vision_frames'
+
+CLASS_MAP = {'spaghetti': 0, 'first_layer': 1, 'detachment': 2}
+
+DATA_YAML = (
+    "names:\n"
+    "  0: spaghetti\n"
+    "  1: first_layer\n"
+    "  2: detachment\n"
+    "nc: 3\n"
+    "train: images/\n"
+    "val: images/\n"
+)
+
+# Start-of-frame markers carry the image size; DHT, JPG and DAC share the range.
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+_STANDALONE_MARKERS = set(range(0xD0, 0xD8)) | {0x01}
+
+
+def jpeg_size(path: str) -> Optional[Tuple[int, int]]:
+    """(width, height) from a JPEG's start-of-frame header; None if not a readable JPEG."""
+    try:
+        with open(path, 'rb') as f:
+            if f.read(2) != b'\xff\xd8':
+                return None
+            while True:
+                byte = f.read(1)
+                while byte and byte != b'\xff':
+                    byte = f.read(1)
+                while byte == b'\xff':  # fill bytes
+                    byte = f.read(1)
+                if not byte:
+                    return None
+                marker = byte[0]
+                if marker in _STANDALONE_MARKERS:
+                    continue
+                if marker in (0xD9, 0xDA):  # end of image / scan data before any frame header
+                    return None
+                length = f.read(2)
+                if len(length) < 2:
+                    return None
+                if marker in _SOF_MARKERS:
+                    header = f.read(5)
+                    if len(header) < 5:
+                        return None
+                    _, height, width = struct.unpack('>BHH', header)
+                    return (width, height) if width and height else None
+                f.seek(struct.unpack('>H', length)[0] - 2, os.SEEK_CUR)
+    except OSError:
+        return None
+
+
+def _recorded_size(metadata_json: Optional[str]) -> Optional[Tuple[int, int]]:
+    try:
+        meta = json.loads(metadata_json) if metadata_json else {}
+        width, height = int(meta['frame_width']), int(meta['frame_height'])
+    except (ValueError, TypeError, KeyError):
+        return None
+    return (width, height) if width > 0 and height > 0 else None
+
+
+def yolo_label(class_id: int, bbox, width: int, height: int) -> str:
+    """YOLO label line: class_id cx cy w h, normalized to the image size."""
+    x1, y1, x2, y2 = bbox
+    cx = ((x1 + x2) / 2) / width
+    cy = ((y1 + y2) / 2) / height
+    w = (x2 - x1) / width
+    h = (y2 - y1) / height
+    return f"{class_id} {cx:.6f} {cy:.6f} {w:.6f} {h:.6f}\n"
+
+
+def iter_dataset(rows: Iterable, frames_dir: Optional[str] = None) -> Iterator[tuple]:
+    """(arcname, bytes | path) ZIP entries for detections with a frame on disk.
+
+    `rows` carry detection_type, frame_path, bbox_json and metadata_json.
+    """
+    root = os.path.realpath(frames_dir or VISION_FRAMES_DIR) + os.sep
+    yield 'data.yaml', DATA_YAML.encode()
+    for row in rows:
+        frame_abs = os.path.realpath(os.path.join(root, row.frame_path))
+        if not frame_abs.startswith(root):
+            continue  # skip corrupted or injected entries
+        if not os.path.isfile(frame_abs):
+            continue
+
+        name = os.path.basename(row.frame_path)
+        yield f"images/{name}", frame_abs
+
+        bbox = json.loads(row.bbox_json) if row.bbox_json else None
+        if bbox and len(bbox) == 4:
+            size = _recorded_size(row.metadata_json) or jpeg_size(frame_abs)
+            if size:
+                label = yolo_label(CLASS_MAP.get(row.detection_type, 0), bbox, *size)
+                yield f"labels/{os.path.splitext(name)[0]}.txt", label.encode()
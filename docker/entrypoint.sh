@@ -339,9 +339,19 @@ echo "  O.D.I.N. is ready!"
 echo "  Web UI: http://localhost:8000"
 echo "========================================="
 
+# ── API worker count ──
+# ODIN_API_WORKERS > 1 runs that many uvicorn workers; they share WebSocket
+# events and cache invalidations through core/workers.py.
+ODIN_API_WORKERS=${ODIN_API_WORKERS:-1}
+case "$ODIN_API_WORKERS" in
+    ''|*[!0-9]*|0) echo "  ✗ ODIN_API_WORKERS must be a positive integer, using 1"; ODIN_API_WORKERS=1 ;;
+esac
+sed -i "s|--workers [0-9]*|--workers ${ODIN_API_WORKERS}|" /etc/supervisor/conf.d/odin.conf
+echo "  ✓ API workers: ${ODIN_API_WORKERS}"
+
 # ── Inject environment into supervisord config ──
 # Supervisord child processes don't inherit shell exports, so we inject them
-ENV_VARS="ENCRYPTION_KEY=\"${ENCRYPTION_KEY}\",JWT_SECRET_KEY=\"${JWT_SECRET_KEY}\",API_KEY=\"${API_KEY:-}\",DATABASE_URL=\"${DATABASE_URL:-sqlite:////data/odin.db}\",DATABASE_PATH=\"/data/odin.db\",BACKEND_PATH=\"/app/backend\",PYTHONUNBUFFERED=\"1\""
+ENV_VARS="ENCRYPTION_KEY=\"${ENCRYPTION_KEY}\",JWT_SECRET_KEY=\"${JWT_SECRET_KEY}\",API_KEY=\"${API_KEY:-}\",DATABASE_URL=\"${DATABASE_URL:-sqlite:////data/odin.db}\",DATABASE_PATH=\"/data/odin.db\",BACKEND_PATH=\"/app/backend\",ODIN_API_WORKERS=\"${ODIN_API_WORKERS}\",PYTHONUNBUFFERED=\"1\""
 
 sed -i "s|environment=PYTHONUNBUFFERED=\"1\"|environment=${ENV_VARS}|g" /etc/supervisor/conf.d/odin.conf
 echo "  ✓ Supervisor environment injected"
@@ -3,10 +3,7 @@ import { adminLogs } from '../../api'
 
 const LOG_SOURCES = [
   { id: 'backend', label: 'Backend' },
-  { id: 'mqtt', label: 'MQTT' },
-  { id: 'moonraker', label: 'Moonraker' },
-  { id: 'prusalink', label: 'PrusaLink' },
-  { id: 'elegoo', label: 'Elegoo' },
+  { id: 'monitors', label: 'Printer Monitors' },
   { id: 'vision', label: 'Vision AI' },
   { id: 'go2rtc', label: 'go2rtc' },
   { id: 'timelapse', label: 'Timelapse' },
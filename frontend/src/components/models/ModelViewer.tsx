@@ -1,6 +1,5 @@
 import { useState, useEffect, useRef, useCallback } from 'react'
 import { X, RotateCcw, ZoomIn, ZoomOut, Maximize2, Box } from 'lucide-react'
-import { fetchAPI } from '../../api'
 import * as THREE from 'three'
 
 /**
@@ -9,6 +8,47 @@ import * as THREE from 'three'
  * Opens as a modal overlay from model cards
  */
 
+/**
+ * Decode the binary mesh served by the mesh endpoints
+ * (backend/modules/models_library/mesh.py): 40-byte header, positions
+ * (uint16 quantized or float32), padding to 4 bytes, indices (uint16 or uint32).
+ */
+function decodeMesh(buf: ArrayBuffer) {
+  const view = new DataView(buf)
+  const flags = view.getUint8(5)
+  const vertexCount = view.getUint32(8, true)
+  const triangleCount = view.getUint32(12, true)
+  const origin = [0, 1, 2].map(i => view.getFloat32(16 + 4 * i, true))
+  const scale = [0, 1, 2].map(i => view.getFloat32(28 + 4 * i, true))
+  let offset = 40
+  const positions = new Float32Array(vertexCount * 3)
+  const stored = flags & 1
+    ? new Uint16Array(buf, offset, vertexCount * 3)
+    : new Float32Array(buf.slice(offset, offset + vertexCount * 12))
+  for (let i = 0; i < positions.length; i++) positions[i] = origin[i % 3] + stored[i] * scale[i % 3]
+  offset += stored.length * ((flags & 1) ? 2 : 4)
+  offset += (4 - offset % 4) % 4
+  const indices = flags & 2
+    ? new Uint16Array(buf, offset, triangleCount * 3)
+    : new Uint32Array(buf, offset, triangleCount * 3)
+  return { positions, indices, vertexCount, triangleCount }
+}
+
+/** Fetch a mesh; waits (202) while an upload's mesh is still being extracted. null if there is none. */
+async function fetchMesh(url: string, isCancelled: () => boolean) {
+  for (let tries = 0; tries < 30 && !isCancelled(); tries++) {
+    const response = await fetch('/api' + url, { credentials: 'include' })
+    if (response.status === 202) {
+      await new Promise(resolve => setTimeout(resolve, 2000))
+      continue
+    }
+    if (response.status === 404) return null
+    if (!response.ok) throw new Error('Failed to load 3D data')
+    return decodeMesh(await response.arrayBuffer())
+  }
+  return null
+}
+
 export default function ModelViewer({ modelId, fileId, modelName, onClose }: { modelId?: number; fileId?: number; modelName?: string; onClose: () => void }) {
   const containerRef = useRef(null)
   const rendererRef = useRef(null)
@@ -178,18 +218,18 @@ export default function ModelViewer({ modelId, fileId, modelName, onClose }: { m
         const meshUrl = fileId
           ? `/print-files/${fileId}/mesh`
           : `/models/${modelId}/mesh`
-        const meshData = await fetchAPI(meshUrl)
+        const meshData = await fetchMesh(meshUrl, () => cancelled)
         if (cancelled) return
         
-        if (!meshData || !meshData.vertices || !meshData.triangles) {
+        if (!meshData || !meshData.triangleCount) {
           setError('No 3D data available for this model')
           setLoading(false)
           return
         }
         
         setMeshInfo({
-          vertices: meshData.vertex_count,
-          triangles: meshData.triangle_count
+          vertices: meshData.vertexCount,
+          triangles: meshData.triangleCount
         })
         
         const container = containerRef.current
@@ -215,11 +255,8 @@ export default function ModelViewer({ modelId, fileId, modelName, onClose }: { m
         
         // Build geometry from mesh data
         const geometry = new THREE.BufferGeometry()
-        const vertices = new Float32Array(meshData.vertices)
-        const indices = new Uint32Array(meshData.triangles)
-        
-        geometry.setAttribute('position', new THREE.BufferAttribute(vertices, 3))
-        geometry.setIndex(new THREE.BufferAttribute(indices, 1))
+        geometry.setAttribute('position', new THREE.BufferAttribute(meshData.positions, 3))
+        geometry.setIndex(new THREE.BufferAttribute(meshData.indices, 1))
         geometry.computeVertexNormals()
         
         // Center and scale the model
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Dashboard analytics benchmark — GET /analytics time, SQL statements and
+peak Python memory on a large job history, per-job Python loops vs SQL
+aggregates.
+
+Seeds a throwaway SQLite database with --printers printers, --models
+priced models and --jobs historical jobs (mostly completed, some failed,
+a queue of pending/scheduled; a share without a stored suggested_price,
+so revenue falls back to the model's price) spread over --days. Then
+times:
+
+  legacy  the old job section of get_analytics(): every job loaded as an
+          ORM object, a Model lookup per unpriced job, every job of each
+          printer re-loaded for its success rate.
+  sql     modules.reporting.routes.analytics.get_analytics() as shipped,
+          with the jobs migration 003 index.
+
+Reports the median time over --repeat runs, the SQL statement count and
+the tracemalloc peak of one more run, and checks both produce the same summary and
+printer stats.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_analytics.py                       # 200k jobs, 50 printers
+    python ops/bench/bench_analytics.py --jobs 20000 --repeat 5
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+MIGRATION = BACKEND_DIR / "modules" / "jobs" / "migrations" / "003_job_analytics_indexes.sql"
+
+ADMIN = {"role": "admin", "group_id": None}
+
+
+def _seed(db, args):
+    from sqlalchemy import insert
+
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+    from modules.models_library.models import Model
+    from modules.printers.models import Printer
+
+    rng = random.Random(args.seed)
+    db.execute(insert(Printer), [{"name": f"bench-{i}", "is_active": True} for i in range(args.printers)])
+    db.execute(insert(Model), [{"name": f"model-{i}", "cost_per_item": rng.uniform(0.5, 10),
+                                "markup_percent": rng.choice([None, 200, 300, 400]),
+                                "build_time_hours": rng.uniform(0.5, 12)} for i in range(args.models)])
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    statuses = [JobStatus.COMPLETED] * 85 + [JobStatus.FAILED] * 8 + [JobStatus.PENDING] * 4 + [JobStatus.SCHEDULED] * 3
+    rows = []
+    for i in range(args.jobs):
+        status = rng.choice(statuses)
+        priced = rng.random() < 0.6
+        rows.append({
+            "item_name": f"part-{i}", "status": status, "quantity": rng.randint(1, 4),
+            "printer_id": rng.randint(1, args.printers) if status in (JobStatus.COMPLETED, JobStatus.FAILED) else None,
+            "model_id": rng.randint(1, args.models),
+            "suggested_price": round(rng.uniform(1, 50), 2) if priced else None,
+            "estimated_cost": round(rng.uniform(0.2, 10), 2) if priced else None,
+            "duration_hours": rng.uniform(0.5, 12),
+            "created_at": now - timedelta(minutes=rng.randrange(args.days * 1440)),
+        })
+        if len(rows) == 10000:
+            db.execute(insert(Job), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Job), rows)
+    db.commit()
+
+
+def _legacy(db, current_user):
+    """The job section of get_analytics() before the SQL aggregates."""
+    from core.base import JobStatus
+    from core.rbac import get_org_scope
+    from modules.jobs.models import Job
+    from modules.models_library.models import Model
+    from modules.printers.models import Printer
+
+    org = get_org_scope(current_user)
+    job_query = db.query(Job)
+    if org is not None:
+        job_query = job_query.filter((Job.charged_to_org_id == org) | (Job.charged_to_org_id == None))  # noqa: E711
+    all_jobs = job_query.all()
+    completed_jobs = [j for j in all_jobs if j.status == JobStatus.COMPLETED]
+    pending_jobs = [j for j in all_jobs if j.status in (JobStatus.PENDING, JobStatus.SCHEDULED)]
+
+    total_revenue = total_cost = total_print_hours = jobs_with_cost_data = 0
+    for job in completed_jobs:
+        if job.suggested_price:
+            total_revenue += job.suggested_price * job.quantity
+            jobs_with_cost_data += 1
+        elif job.model_id:
+            model = db.query(Model).filter(Model.id == job.model_id).first()
+            if model and model.cost_per_item:
+                total_revenue += model.cost_per_item * (model.markup_percent or 300) / 100 * job.quantity
+        if job.estimated_cost:
+            total_cost += job.estimated_cost * job.quantity
+        if job.duration_hours:
+            total_print_hours += job.duration_hours
+
+    projected_revenue = projected_cost = 0
+    for job in pending_jobs:
+        if job.suggested_price:
+            projected_revenue += job.suggested_price * job.quantity
+        elif job.model_id:
+            model = db.query(Model).filter(Model.id == job.model_id).first()
+            if model and model.cost_per_item:
+                projected_revenue += model.cost_per_item * (model.markup_percent or 300) / 100 * job.quantity
+        if job.estimated_cost:
+            projected_cost += job.estimated_cost * job.quantity
+
+    printer_stats = []
+    for printer in db.query(Printer).filter(Printer.is_active.is_(True)).all():
+        printer_jobs = [j for j in completed_jobs if j.printer_id == printer.id]
+        hours = sum(j.duration_hours or 0 for j in printer_jobs)
+        total_printer_jobs = db.query(Job).filter(Job.printer_id == printer.id).all()
+        failed = len([j for j in total_printer_jobs if j.status == JobStatus.FAILED])
+        printer_stats.append((printer.id, len(printer_jobs), round(hours, 1), failed))
+
+    return {
+        "total_jobs": len(all_jobs), "completed_jobs": len(completed_jobs), "pending_jobs": len(pending_jobs),
+        "total_revenue": round(total_revenue, 2), "total_cost": round(total_cost, 2),
+        "projected_revenue": round(projected_revenue, 2), "projected_cost": round(projected_cost, 2),
+        "total_print_hours": round(total_print_hours, 1), "jobs_with_cost_data": jobs_with_cost_data,
+    }, printer_stats
+
+
+def _sql(db, current_user):
+    from modules.reporting.routes.analytics import get_analytics
+
+    out = get_analytics(db=db, current_user=current_user)
+    summary = {k: out["summary"][k] for k in (
+        "total_jobs", "completed_jobs", "pending_jobs", "total_revenue", "total_cost",
+        "projected_revenue", "projected_cost", "total_print_hours", "jobs_with_cost_data")}
+    return summary, [(s["id"], s["completed_jobs"], s["total_hours"], s["failed_jobs"]) for s in out["printer_stats"]]
+
+
+def _measure(fn, Session, repeat):
+    from core.db import count_queries
+
+    times, out = [], None
+    for _ in range(repeat):
+        with Session() as db:
+            started = time.perf_counter()
+            with count_queries() as counter:
+                out = fn(db, ADMIN)
+            times.append(time.perf_counter() - started)
+    # Memory in a separate run: tracemalloc slows allocation-heavy code.
+    with Session() as db:
+        tracemalloc.start()
+        fn(db, ADMIN)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return statistics.median(times), counter.count, peak, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=200_000, help="jobs in the history")
+    ap.add_argument("--printers", type=int, default=50, help="active printers")
+    ap.add_argument("--models", type=int, default=300, help="models in the library")
+    ap.add_argument("--days", type=int, default=365, help="days the history spans")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+    ap.add_argument("--seed", type=int, default=1, help="random seed")
+    ap.add_argument("--skip-legacy", action="store_true", help="only time the SQL aggregates")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+
+    with tempfile.TemporaryDirectory(prefix="odin-analyticsbench-") as workdir:
+        engine = create_engine(f"sqlite:///{workdir}/odin.db")
+        Base.metadata.create_all(bind=engine)
+        with engine.begin() as conn:
+            for statement in MIGRATION.read_text().split(";"):
+                if statement.strip():
+                    conn.exec_driver_sql(statement)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            _seed(db, args)
+
+        print(f"{args.jobs} jobs, {args.printers} printers, {args.models} models over {args.days} days")
+        print(f"{'mode':>7} {'s/req':>8} {'statements':>10} {'peak MB':>8}")
+        outputs = {}
+        modes = [("sql", _sql)] if args.skip_legacy else [("legacy", _legacy), ("sql", _sql)]
+        for name, fn in modes:
+            repeat = 1 if name == "legacy" else args.repeat
+            elapsed, statements, peak, outputs[name] = _measure(fn, Session, repeat)
+            print(f"{name:>7} {elapsed:>8.3f} {statements:>10} {peak / 1e6:>8.1f}")
+        if len(outputs) == 2:
+            print("results identical" if outputs["legacy"] == outputs["sql"] else
+                  f"RESULTS DIFFER\n  legacy {outputs['legacy'][0]}\n  sql    {outputs['sql'][0]}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Analytics rollup benchmark — GET /analytics/failures and
+/analytics/time-accuracy time and SQL statements on a long job history,
+row-by-row vs the analytics rollups (modules/reporting/analytics_rollups.py).
+
+Seeds a throwaway SQLite database (all module migrations applied) with
+--printers printers and --jobs finished jobs spread over --days, plus a
+fifth as many MQTT prints, HMS errors and vision detections. Then times,
+for a --window day window:
+
+  legacy  the old endpoints: every job of the window loaded as an ORM
+          object (with its printer and model) and aggregated in Python.
+  raw     the shipped endpoints before any rollup exists: the same SQL
+          aggregates over raw rows only.
+  rollup  the shipped endpoints after maintain(): daily / hourly rollup
+          rows plus the raw rows of the partial hours at the edges.
+
+Also reports how long the first maintain() (the backfill) and a steady
+state maintain() take, and checks all three modes agree.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_analytics_rollups.py                    # 300k jobs over 2 years
+    python ops/bench/bench_analytics_rollups.py --jobs 50000 --window 365
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+ADMIN = {"role": "admin", "group_id": None}
+REASONS = [None, "spaghetti", "adhesion", "clog", "layer shift"]
+
+
+def _seed(db, args):
+    from sqlalchemy import insert, text
+
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+    from modules.models_library.models import Model
+    from modules.printers.models import Printer
+
+    rng = random.Random(args.seed)
+    db.execute(insert(Printer), [{"name": f"bench-{i}", "is_active": True} for i in range(args.printers)])
+    db.execute(insert(Model), [{"name": f"model-{i}", "build_time_hours": 2} for i in range(args.models)])
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    rows = []
+    for i in range(args.jobs):
+        end = now - timedelta(seconds=rng.randrange(args.days * 86400))
+        failed = rng.random() < 0.08
+        hours = rng.uniform(0.5, 12)
+        rows.append({
+            "item_name": f"part-{i % 500}", "status": JobStatus.FAILED if failed else JobStatus.COMPLETED,
+            "printer_id": rng.randint(1, args.printers),
+            "model_id": rng.randint(1, args.models) if rng.random() < 0.8 else None,
+            "filament_type": rng.choice(["PLA", "PETG", "ABS", None]),
+            "fail_reason": rng.choice(REASONS) if failed else None,
+            "duration_hours": hours, "quantity": 1,
+            "actual_start": end - timedelta(hours=hours * rng.uniform(0.8, 1.3)), "actual_end": end,
+            "created_at": end - timedelta(hours=hours + 1),
+        })
+        if len(rows) == 10000:
+            db.execute(insert(Job), rows)
+            rows = []
+    if rows:
+        db.execute(insert(Job), rows)
+    for i in range(args.jobs // 5):
+        at = (now - timedelta(seconds=rng.randrange(args.days * 86400))).strftime("%Y-%m-%d %H:%M:%S")
+        params = {"p": rng.randint(1, args.printers), "at": at}
+        db.execute(text("INSERT INTO print_jobs (printer_id, started_at, ended_at, status) "
+                        "VALUES (:p, :at, :at, :st)"), {**params, "st": rng.choice(["completed"] * 9 + ["failed"])})
+        db.execute(text("INSERT INTO hms_error_history (printer_id, code, message, occurred_at) "
+                        "VALUES (:p, :c, 'bench', :at)"), {**params, "c": f"0300-{rng.randrange(40)}"})
+        db.execute(text("INSERT INTO vision_detections (printer_id, detection_type, confidence, created_at) "
+                        "VALUES (:p, :t, :c, :at)"), {**params, "t": rng.choice(["spaghetti", "detachment"]),
+                                                       "c": rng.uniform(0.5, 1)})
+    db.commit()
+
+
+def _legacy(db, days):
+    """Totals of the old get_failure_analytics() / get_time_accuracy() loops."""
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+
+    cutoff = datetime.now(timezone.utc) - timedelta(days=days)
+    jobs = db.query(Job).filter(Job.status.in_([JobStatus.COMPLETED, JobStatus.FAILED]),
+                                Job.actual_end >= cutoff).all()
+    by_printer, by_model = {}, {}
+    for j in jobs:
+        p = by_printer.setdefault(j.printer.name, [0, 0])
+        m = by_model.setdefault(j.model.name if j.model else j.item_name, [0, 0])
+        p[j.status.value == "failed"] += 1
+        m[j.status.value == "failed"] += 1
+    timed = [j for j in jobs if j.status.value == "completed" and j.actual_start and j.duration_hours
+             and j.actual_end > j.actual_start]
+    models_listed = min(15, sum(1 for m in by_model.values() if sum(m) >= 2))
+    return (len(jobs), sum(p[1] for p in by_printer.values()), models_listed, len(timed))
+
+
+def _shipped(db, days):
+    from modules.reporting.routes.analytics import get_failure_analytics, get_time_accuracy
+
+    failures = get_failure_analytics(days=days, db=db, current_user=ADMIN)
+    accuracy = get_time_accuracy(days=days, db=db, current_user=ADMIN)
+    return (failures["total_completed"] + failures["total_failed"], failures["total_failed"],
+            len(failures["by_model"]), accuracy["total_jobs"])
+
+
+def _measure(fn, Session, args):
+    from core.db import count_queries
+
+    times, out = [], None
+    for _ in range(args.repeat):
+        with Session() as db:
+            started = time.perf_counter()
+            with count_queries() as counter:
+                out = fn(db, args.window)
+            times.append(time.perf_counter() - started)
+    return statistics.median(times), counter.count, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=300_000, help="finished jobs in the history")
+    ap.add_argument("--printers", type=int, default=60, help="printers")
+    ap.add_argument("--models", type=int, default=400, help="models in the library")
+    ap.add_argument("--days", type=int, default=730, help="days the history spans")
+    ap.add_argument("--window", type=int, default=90, help="analytics window in days")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+    ap.add_argument("--seed", type=int, default=1, help="random seed")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    from core.db import _run_sql_file
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+    from modules.reporting import analytics_rollups
+
+    with tempfile.TemporaryDirectory(prefix="odin-rollupbench-") as workdir:
+        path = f"{workdir}/odin.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        for module in ("printers", "jobs", "reporting", "vision"):
+            for migration in sorted((BACKEND_DIR / "modules" / module / "migrations").glob("*.sql")):
+                _run_sql_file(path, migration)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            _seed(db, args)
+
+        print(f"{args.jobs} jobs, {args.printers} printers over {args.days} days; {args.window}-day window")
+        print(f"{'mode':>7} {'s/req':>8} {'statements':>10}")
+        outputs = {}
+        for name, fn in (("legacy", _legacy), ("raw", _shipped)):
+            elapsed, statements, outputs[name] = _measure(fn, Session, args)
+            print(f"{name:>7} {elapsed:>8.3f} {statements:>10}")
+
+        started = time.perf_counter()
+        written = analytics_rollups.maintain(engine)
+        backfill = time.perf_counter() - started
+        elapsed, statements, outputs["rollup"] = _measure(_shipped, Session, args)
+        print(f"{'rollup':>7} {elapsed:>8.3f} {statements:>10}")
+        started = time.perf_counter()
+        analytics_rollups.maintain(engine)
+        steady = time.perf_counter() - started
+        print(f"backfill maintain() {backfill:.2f}s ({sum(written.values())} rollup rows), "
+              f"steady-state maintain() {steady:.2f}s")
+        print("results identical" if len(set(outputs.values())) == 1 else f"RESULTS DIFFER {outputs}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
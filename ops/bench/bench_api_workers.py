@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+API worker scaling benchmark — req/s of the real app at 1..N uvicorn workers.
+
+Seeds a throwaway SQLite database (schema, one admin, a few printers),
+starts `uvicorn main:app --workers N` with ODIN_API_WORKERS=N for each
+requested worker count, and hammers an authenticated read endpoint from
+several client processes. Reports req/s, latency and scaling efficiency
+relative to the first worker count (1.00 = perfectly linear).
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_api_workers.py                    # 1, 2 and 4 workers
+    python ops/bench/bench_api_workers.py --workers 1 4 --clients 16 --duration 20
+    python ops/bench/bench_api_workers.py --path /api/v1/printers
+
+Scaling is bounded by cores: run on a host with at least as many cores as
+the largest worker count plus a couple for the load generator.
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _env(workdir: str, workers: int) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/odin.db",
+        "DATABASE_PATH": f"{workdir}/odin.db",
+        "JWT_SECRET_KEY": "bench-secret-" + "x" * 32,
+        "ENCRYPTION_KEY": "",
+        "API_KEY": "",
+        "ODIN_API_WORKERS": str(workers),
+        "ODIN_WS_SOCKET": f"{workdir}/hub.sock",
+        "ODIN_LOCK_DIR": workdir,
+        "ADMIN_USERNAME": "",
+        "ADMIN_PASSWORD": "",
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+def _seed(workdir: str, printers: int) -> str:
+    """Create the schema and an admin in a child process; return a bearer token."""
+    code = f"""
+import sys
+sys.path.insert(0, {str(BACKEND_DIR)!r})
+from pathlib import Path
+from core.base import Base
+import core.models
+for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+            "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{{mod}}.models")
+from sqlalchemy import text
+from core.db import engine, run_core_migrations, run_module_migrations
+Base.metadata.create_all(bind=engine)
+run_core_migrations()
+run_module_migrations(Path({str(BACKEND_DIR / "modules")!r}))
+from core.auth import create_access_token, hash_password
+with engine.begin() as conn:
+    conn.execute(text("INSERT INTO users (username, email, password_hash, role, is_active) "
+                      "VALUES ('bench', 'bench@example.com', :h, 'admin', 1)"),
+                 {{"h": hash_password("bench-password")}})
+    for i in range({printers}):
+        conn.execute(text("INSERT INTO printers (name, model, slot_count, is_active) "
+                          "VALUES (:n, 'X1C', 4, 1)"), {{"n": f"bench-{{i}}"}})
+print(create_access_token({{"sub": "bench", "role": "admin"}}))
+"""
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(workdir, 1),
+        check=True, capture_output=True, text=True,
+    )
+    return out.stdout.strip().splitlines()[-1]
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ready(base: str, timeout: float = 60.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{base}/health", timeout=2).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError("API did not come up")
+
+
+def _client(base: str, path: str, token: str, start_at: float, stop_at: float, out):
+    import httpx
+
+    latencies = []
+    errors = 0
+    headers = {"Authorization": f"Bearer {token}"}
+    with httpx.Client(base_url=base, headers=headers, timeout=30) as client:
+        while time.time() < start_at:
+            time.sleep(0.001)
+        while time.time() < stop_at:
+            t0 = time.perf_counter()
+            try:
+                ok = client.get(path).status_code == 200
+            except httpx.HTTPError:
+                ok = False
+            latencies.append(time.perf_counter() - t0)
+            errors += not ok
+    out.put((latencies, errors))
+
+
+def run(workdir: str, token: str, workers: int, clients: int, duration: float, path: str) -> dict:
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+         "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=_env(workdir, workers),
+    )
+    try:
+        _wait_ready(base)
+        time.sleep(1.0)  # let every worker finish its lifespan startup
+        ctx = multiprocessing.get_context("spawn")
+        out = ctx.Queue()
+        start_at = time.time() + 1.0
+        stop_at = start_at + duration
+        procs = [
+            ctx.Process(target=_client, args=(base, path, token, start_at, stop_at, out))
+            for _ in range(clients)
+        ]
+        for p in procs:
+            p.start()
+        results = [out.get() for _ in procs]
+        for p in procs:
+            p.join()
+    finally:
+        server.terminate()
+        server.wait(timeout=30)
+
+    latencies = sorted(x * 1000 for lat, _ in results for x in lat) or [0.0]
+    errors = sum(e for _, e in results)
+
+    def pct(p):
+        return latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+
+    return {
+        "workers": workers,
+        "rps": len(latencies) / duration,
+        "errors": errors,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": pct(0.99),
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="worker counts to compare")
+    ap.add_argument("--clients", type=int, default=8, help="load-generator processes")
+    ap.add_argument("--duration", type=float, default=10, help="seconds of load per worker count")
+    ap.add_argument("--path", default="/api/v1/printers", help="authenticated GET endpoint to load")
+    ap.add_argument("--printers", type=int, default=20, help="printers seeded into the database")
+    args = ap.parse_args()
+
+    print(f"cpu cores: {os.cpu_count()}")
+    with tempfile.TemporaryDirectory(prefix="odin-workerbench-") as workdir:
+        token = _seed(workdir, args.printers)
+        print(f"{'workers':>7} {'req/s':>9} {'p50 ms':>9} {'p99 ms':>9} {'errors':>7} {'scaling':>8}")
+        baseline = None
+        for workers in args.workers:
+            r = run(workdir, token, workers, args.clients, args.duration, args.path)
+            baseline = baseline or (r["rps"] / r["workers"])
+            scaling = r["rps"] / (baseline * r["workers"]) if baseline else float("nan")
+            print(
+                f"{r['workers']:>7} {r['rps']:>9.0f} {r['p50_ms']:>9.2f} {r['p99_ms']:>9.2f} "
+                f"{r['errors']:>7} {scaling:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Event-loop blocking benchmark — sync DB work in `async def` vs `def` handlers.
+
+Serves a two-endpoint FastAPI app with uvicorn in a child process, backed by
+a throwaway SQLite file, and drives a mixed load against it:
+
+  - /slow  — a deliberately expensive query (the reports/analytics shape)
+  - /fast  — a primary-key lookup (the dashboard-poll shape)
+
+Both endpoints take `db: Session = Depends(get_db)` like the routes do. In
+`async` mode they are declared `async def`, so SQLAlchemy runs on the event
+loop; in `def` mode FastAPI runs them in its threadpool. Reports the /fast
+latency distribution while /slow calls are in flight — the number that
+regressed when one slow query froze every other request.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_async_db.py
+    python ops/bench/bench_async_db.py --mode def --duration 20
+    python ops/bench/bench_async_db.py --fast-clients 32 --slow-clients 4 --rows 400000
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import socket
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+SLOW_SQL = (
+    "SELECT a.bucket, COUNT(*), AVG(b.value) FROM bench_rows a "
+    "JOIN bench_rows b ON a.bucket = b.bucket AND b.id % 50 = 0 "
+    "GROUP BY a.bucket"
+)
+
+
+def _seed(path: str, rows: int):
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE bench_rows (id INTEGER PRIMARY KEY, bucket INTEGER, value REAL)")
+    conn.executemany(
+        "INSERT INTO bench_rows (id, bucket, value) VALUES (?, ?, ?)",
+        ((i, i % 97, (i * 7919) % 1000 / 10.0) for i in range(1, rows + 1)),
+    )
+    conn.commit()
+    conn.close()
+
+
+def _serve(mode: str, db_path: str, port: int):
+    import uvicorn
+    from fastapi import Depends, FastAPI
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import Session, sessionmaker
+
+    engine = create_engine(
+        f"sqlite:///{db_path}", connect_args={"check_same_thread": False}, pool_size=40
+    )
+    SessionLocal = sessionmaker(bind=engine)
+
+    def get_db():
+        db = SessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def slow(db: Session):
+        return {"buckets": len(db.execute(text(SLOW_SQL)).fetchall())}
+
+    def fast(row_id: int, db: Session):
+        row = db.execute(text("SELECT value FROM bench_rows WHERE id = :id"), {"id": row_id}).fetchone()
+        return {"value": row[0] if row else None}
+
+    app = FastAPI()
+    if mode == "async":
+        @app.get("/slow")
+        async def slow_async(db: Session = Depends(get_db)):
+            return slow(db)
+
+        @app.get("/fast/{row_id}")
+        async def fast_async(row_id: int, db: Session = Depends(get_db)):
+            return fast(row_id, db)
+    else:
+        @app.get("/slow")
+        def slow_sync(db: Session = Depends(get_db)):
+            return slow(db)
+
+        @app.get("/fast/{row_id}")
+        def fast_sync(row_id: int, db: Session = Depends(get_db)):
+            return fast(row_id, db)
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def _wait_ready(base: str, timeout: float = 30.0):
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient() as client:
+        while time.monotonic() < deadline:
+            try:
+                await client.get(f"{base}/fast/1")
+                return
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+    raise RuntimeError("server did not come up")
+
+
+async def _drive(base: str, duration: float, fast_clients: int, slow_clients: int, rows: int):
+    import httpx
+
+    fast_lat: list[float] = []
+    slow_lat: list[float] = []
+    stop_at = time.monotonic() + duration
+    limits = httpx.Limits(max_connections=fast_clients + slow_clients + 4)
+
+    async with httpx.AsyncClient(base_url=base, timeout=120, limits=limits) as client:
+        async def fast_loop(seed: int):
+            i = seed
+            while time.monotonic() < stop_at:
+                t0 = time.perf_counter()
+                await client.get(f"/fast/{i % rows + 1}")
+                fast_lat.append(time.perf_counter() - t0)
+                i += 7919
+                await asyncio.sleep(0.01)
+
+        async def slow_loop():
+            while time.monotonic() < stop_at:
+                t0 = time.perf_counter()
+                await client.get("/slow")
+                slow_lat.append(time.perf_counter() - t0)
+
+        await asyncio.gather(
+            *(fast_loop(n) for n in range(fast_clients)),
+            *(slow_loop() for _ in range(slow_clients)),
+        )
+    return fast_lat, slow_lat
+
+
+def run(mode: str, db_path: str, duration: float, fast_clients: int, slow_clients: int, rows: int) -> dict:
+    port = _free_port()
+    ctx = multiprocessing.get_context("spawn")
+    proc = ctx.Process(target=_serve, args=(mode, db_path, port), daemon=True)
+    proc.start()
+    base = f"http://127.0.0.1:{port}"
+    try:
+        asyncio.run(_wait_ready(base))
+        fast_lat, slow_lat = asyncio.run(_drive(base, duration, fast_clients, slow_clients, rows))
+    finally:
+        proc.terminate()
+        proc.join()
+
+    lat_ms = sorted(x * 1000 for x in fast_lat) or [0.0]
+
+    def pct(p):
+        return lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * p))]
+
+    return {
+        "mode": mode,
+        "fast_rps": len(fast_lat) / duration,
+        "slow_done": len(slow_lat),
+        "slow_avg_ms": statistics.mean(slow_lat) * 1000 if slow_lat else float("nan"),
+        "p50_ms": statistics.median(lat_ms),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": lat_ms[-1],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mode", choices=["async", "def", "both"], default="both")
+    ap.add_argument("--duration", type=float, default=10, help="seconds of load per mode")
+    ap.add_argument("--fast-clients", type=int, default=16, help="concurrent /fast pollers")
+    ap.add_argument("--slow-clients", type=int, default=2, help="concurrent /slow callers")
+    ap.add_argument("--rows", type=int, default=200_000, help="rows in the bench table (scales /slow)")
+    args = ap.parse_args()
+
+    modes = ["async", "def"] if args.mode == "both" else [args.mode]
+    with tempfile.TemporaryDirectory(prefix="odin-dbbench-") as workdir:
+        db_path = os.path.join(workdir, "bench.db")
+        _seed(db_path, args.rows)
+        print(
+            f"{'mode':<6} {'fast rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} "
+            f"{'max ms':>9} {'slow n':>7} {'slow ms':>9}"
+        )
+        for mode in modes:
+            r = run(mode, db_path, args.duration, args.fast_clients, args.slow_clients, args.rows)
+            print(
+                f"{r['mode']:<6} {r['fast_rps']:>9.0f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                f"{r['p99_ms']:>9.2f} {r['max_ms']:>9.2f} {r['slow_done']:>7} {r['slow_avg_ms']:>9.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
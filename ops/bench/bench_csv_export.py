@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+CSV export benchmark — GET /export/jobs time to first byte, total time
+and peak Python memory on a large job history, whole-file rendering vs
+the streaming exports (core/csv_stream.py).
+
+Seeds a throwaway SQLite database with --jobs jobs, then times:
+
+  legacy  the old export: every job loaded as an ORM object with .all(),
+          the whole CSV written into an io.StringIO, sent as one chunk.
+  stream  modules.reporting.routes.exports.export_jobs_csv() as shipped:
+          yield_per column rows rendered and sent in 64 KB chunks.
+  gzip    the same with Accept-Encoding: gzip.
+
+The body is consumed the way the ASGI server would and discarded.
+Memory is measured in a separate run: tracemalloc slows allocation-heavy
+code.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_csv_export.py                  # 500k jobs
+    python ops/bench/bench_csv_export.py --jobs 1000000
+"""
+
+import argparse
+import asyncio
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+ADMIN = {"role": "admin", "group_id": None}
+
+
+def _seed(engine, jobs):
+    from sqlalchemy import insert
+
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+
+    start = datetime(2024, 1, 1)
+    with engine.begin() as conn:
+        for first in range(0, jobs, 20000):
+            conn.execute(insert(Job), [{
+                "item_name": f"part-{i}", "status": JobStatus.COMPLETED, "quantity": 1, "priority": 3,
+                "printer_id": i % 50 + 1, "model_id": i % 300 + 1, "duration_hours": 2.5,
+                "estimated_cost": 1.25, "suggested_price": 9.5,
+                "actual_start": start + timedelta(minutes=i), "actual_end": start + timedelta(minutes=i + 150),
+                "created_at": start + timedelta(minutes=i),
+            } for i in range(first, min(jobs, first + 20000))])
+
+
+def _legacy(db, request):
+    """export_jobs_csv() before streaming."""
+    from fastapi.responses import StreamingResponse
+
+    from modules.jobs.models import Job
+
+    jobs = db.query(Job).order_by(Job.created_at.desc()).all()
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["ID", "Item Name", "Model ID", "Quantity", "Status", "Priority", "Printer ID",
+                     "Duration (hrs)", "Estimated Cost", "Suggested Price", "Scheduled Start",
+                     "Actual Start", "Actual End", "Created At"])
+    for job in jobs:
+        writer.writerow([
+            job.id, job.item_name, job.model_id, job.quantity, job.status.value if job.status else "",
+            job.priority, job.printer_id, job.duration_hours, job.estimated_cost, job.suggested_price,
+            job.scheduled_start.isoformat() if job.scheduled_start else "",
+            job.actual_start.isoformat() if job.actual_start else "",
+            job.actual_end.isoformat() if job.actual_end else "",
+            job.created_at.isoformat() if job.created_at else "",
+        ])
+    output.seek(0)
+    return StreamingResponse(iter([output.getvalue()]), media_type="text/csv")
+
+
+def _stream(db, request):
+    from modules.reporting.routes.exports import export_jobs_csv
+
+    return export_jobs_csv(request=request, status=None, current_user=ADMIN, db=db)
+
+
+def _request(gzip):
+    from starlette.requests import Request
+
+    headers = [(b"accept-encoding", b"gzip")] if gzip else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def _consume(fn, db, gzip):
+    """Seconds to the first body chunk, seconds in total, bytes sent."""
+    async def run():
+        started = time.perf_counter()
+        response = fn(db, _request(gzip))
+        first, size = None, 0
+        async for chunk in response.body_iterator:
+            if first is None:
+                first = time.perf_counter() - started
+            size += len(chunk)
+        return first, time.perf_counter() - started, size
+    return asyncio.run(run())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--jobs", type=int, default=500_000, help="jobs in the history")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+
+    with tempfile.TemporaryDirectory(prefix="odin-csvbench-") as workdir:
+        engine = create_engine(f"sqlite:///{workdir}/odin.db")
+        Base.metadata.create_all(bind=engine)
+        _seed(engine, args.jobs)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{args.jobs} jobs")
+        print(f"{'mode':>7} {'first byte s':>12} {'total s':>8} {'MB sent':>8} {'peak MB':>8}")
+        for name, fn, gzip in (("legacy", _legacy, False), ("stream", _stream, False), ("gzip", _stream, True)):
+            with Session() as db:
+                first, total, size = _consume(fn, db, gzip)
+            with Session() as db:
+                tracemalloc.start()
+                _consume(fn, db, gzip)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{name:>7} {first:>12.3f} {total:>8.2f} {size / 1e6:>8.1f} {peak / 1e6:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Camera frame benchmark — go2rtc frame requests when the vision and
+timelapse daemons both watch the same printers, each fetching on its own
+vs through the shared frame cache (core/frame_cache.py).
+
+A local stand-in for go2rtc serves a 720p JPEG per printer after
+--latency-ms. For every printer a vision thread takes a frame every
+10 s and decodes it; a timelapse loop takes every printer's frame every
+30 s. Time runs --speed times faster than real time.
+
+  direct  each consumer GETs /api/frame.jpeg itself (as before).
+  cache   vision: FrameCache.get() with the default 5 s max age;
+          timelapse: FrameCache.aget() accepting frames up to 10 s old.
+
+Usage (from the repo root, no container needed; needs cv2):
+    python ops/bench/bench_frame_cache.py
+    python ops/bench/bench_frame_cache.py --printers 40 --minutes 5
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+from bench_timelapse_capture import FakeGo2rtc  # noqa: E402
+
+VISION_INTERVAL = 10
+TIMELAPSE_INTERVAL = 30
+
+
+class Counting(FakeGo2rtc):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.requests = 0
+
+    async def _handle(self, reader, writer):
+        self.requests += 1
+        await super()._handle(reader, writer)
+
+
+def _direct(base):
+    import cv2
+    import httpx
+    import numpy as np
+
+    def vision(pid):
+        resp = httpx.get(f"{base}/api/frame.jpeg?src=printer_{pid}", timeout=5)
+        return cv2.imdecode(np.frombuffer(resp.content, dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    async def timelapse(pid, client):
+        return (await client.get(f"{base}/api/frame.jpeg?src=printer_{pid}")).content
+
+    return vision, timelapse
+
+
+def _cached(base, root, speed):
+    from core.frame_cache import FrameCache, default_max_age
+
+    cache = FrameCache(root, base=base)
+
+    def vision(pid):
+        return cache.get(pid, max_age=default_max_age() / speed).image
+
+    async def timelapse(pid, client):
+        return (await cache.aget(pid, client, max_age=TIMELAPSE_INTERVAL / 3 / speed)).jpeg
+
+    return vision, timelapse
+
+
+def _run(vision, timelapse, printers, seconds, speed):
+    import httpx
+
+    stop = threading.Event()
+    served = {"vision": 0, "timelapse": 0}
+
+    def vision_thread(pid):
+        time.sleep(pid % VISION_INTERVAL / speed)  # printers start at different times
+        while not stop.is_set():
+            vision(pid)
+            served["vision"] += 1
+            stop.wait(VISION_INTERVAL / speed)
+
+    async def timelapse_loop():
+        async with httpx.AsyncClient() as client:
+            while not stop.is_set():
+                await asyncio.gather(*(timelapse(pid, client) for pid in range(1, printers + 1)))
+                served["timelapse"] += printers
+                await asyncio.sleep(TIMELAPSE_INTERVAL / speed)
+
+    threads = [threading.Thread(target=vision_thread, args=(pid,), daemon=True) for pid in range(1, printers + 1)]
+    loop = threading.Thread(target=lambda: asyncio.run(asyncio.wait_for(timelapse_loop(), seconds + 5)), daemon=True)
+    for t in threads + [loop]:
+        t.start()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads + [loop]:
+        t.join()
+    return served
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=20, help="printers watched by both daemons")
+    ap.add_argument("--minutes", type=float, default=3, help="simulated minutes per mode")
+    ap.add_argument("--speed", type=float, default=10, help="simulated seconds per real second")
+    ap.add_argument("--latency-ms", type=float, default=150, help="go2rtc time to grab a frame (real time)")
+    args = ap.parse_args()
+
+    import cv2
+    import numpy as np
+
+    logging.getLogger().setLevel(logging.WARNING)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    ok, jpeg = cv2.imencode(".jpg", np.random.default_rng(0).integers(0, 256, (720, 1280, 3), dtype=np.uint8))
+    seconds = args.minutes * 60 / args.speed
+
+    print(f"{args.printers} printers, vision every {VISION_INTERVAL}s + timelapse every {TIMELAPSE_INTERVAL}s, "
+          f"{args.minutes:g} simulated minutes")
+    print(f"{'mode':>7} {'vision frames':>14} {'timelapse frames':>17} {'go2rtc requests':>16} {'per frame':>10}")
+    for name in ("direct", "cache"):
+        server = Counting(args.latency_ms / 1000, jpeg.tobytes(), set())
+        server.start()
+        server.ready.wait()
+        base = f"http://127.0.0.1:{server.port}"
+        with tempfile.TemporaryDirectory() as tmp:
+            consumers = _direct(base) if name == "direct" else _cached(base, tmp, args.speed)
+            served = _run(*consumers, args.printers, seconds, args.speed)
+        per_frame = server.requests / (served["vision"] + served["timelapse"])
+        print(f"{name:>7} {served['vision']:>14} {served['timelapse']:>17} {server.requests:>16} {per_frame:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
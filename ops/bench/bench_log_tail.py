@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Log viewer benchmark — GET /admin/logs latency on a large log, full-file
+reads vs backwards tails and the block index (modules/system/log_tail.py).
+
+Writes a throwaway log of --mb megabytes in ODIN's format (mostly INFO,
+some DEBUG/WARNING, rare ERROR, occasional tracebacks), then times each
+query --repeat times:
+
+  legacy  the old read: every line of the file through a deque(maxlen=N)
+          with the level and text filters.
+  tail    read_logs() as shipped; the first indexed query also builds the
+          sidecar index, which is reported separately.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_log_tail.py              # 200 MB log
+    python ops/bench/bench_log_tail.py --mb 1000
+"""
+
+import argparse
+import collections
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+START = 1_700_000_000
+
+
+def _write_log(path, mb):
+    rng = random.Random(0)
+    levels = ["INFO"] * 40 + ["DEBUG"] * 10 + ["WARNING"] * 3 + ["ERROR"]
+    target = mb * 1024 * 1024
+    written = i = 0
+    with open(path, "w") as f:
+        while written < target:
+            chunk = []
+            for _ in range(10000):
+                stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(START + i // 4))
+                level = rng.choice(levels) if rng.random() < 0.999 else "CRITICAL"
+                chunk.append(f"{stamp},{i % 1000:03d} [{level}] odin.api: GET /api/printers/{rng.randint(1, 40)} "
+                             f"200 {rng.randint(1, 90)}ms request {i}\n")
+                if rng.random() < 0.002:
+                    chunk.append("Traceback (most recent call last):\n  File \"x.py\", line 1\nValueError: boom\n")
+                i += 1
+            data = "".join(chunk)
+            f.write(data)
+            written += len(data)
+    return i
+
+
+def _legacy(path, n, level=None, search=None):
+    result = collections.deque(maxlen=n)
+    level_upper = level.upper() if level else None
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            stripped = line.rstrip("\n")
+            if level_upper and level_upper not in stripped.upper():
+                continue
+            if search and search.lower() not in stripped.lower():
+                continue
+            result.append(stripped)
+    return list(result)
+
+
+def _legacy_window(path, n, since, until):
+    """What a time window cost before: a full read, keeping lines by their timestamp."""
+    result = collections.deque(maxlen=n)
+    ts = None
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            if line[:4].isdigit():
+                ts = line[:19]
+            if ts and since <= ts <= until:
+                result.append(line.rstrip("\n"))
+    return list(result)
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--mb", type=int, default=200, help="log size in MB")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per query (median reported)")
+    args = ap.parse_args()
+
+    from modules.system import log_tail
+
+    with tempfile.TemporaryDirectory(prefix="odin-logbench-") as workdir:
+        path = f"{workdir}/backend.log"
+        lines = _write_log(path, args.mb)
+        mid = START + lines // 8
+        since = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(mid))
+        until = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(mid + 600))
+
+        started = time.perf_counter()
+        log_tail.LogIndex(path).update()
+        built = time.perf_counter() - started
+        print(f"{args.mb} MB, {lines} lines; index built in {built:.1f}s "
+              f"({Path(path + '.idx').stat().st_size // 1024} KB sidecar)")
+        print(f"{'query':>34} {'legacy ms':>10} {'tail ms':>8}")
+        cases = [
+            ("lines=200", lambda: _legacy(path, 200), lambda: log_tail.read_logs(path, 200)),
+            ("lines=200&search=printers/7 ", lambda: _legacy(path, 200, search="printers/7 "),
+             lambda: log_tail.read_logs(path, 200, search="printers/7 ")),
+            ("lines=200&level=ERROR", lambda: _legacy(path, 200, level="ERROR"),
+             lambda: log_tail.read_logs(path, 200, level="ERROR")),
+            ("lines=200&level=CRITICAL", lambda: _legacy(path, 200, level="CRITICAL"),
+             lambda: log_tail.read_logs(path, 200, level="CRITICAL")),
+            ("10-minute since/until window", lambda: _legacy_window(path, 5000, since, until),
+             lambda: log_tail.read_logs(path, 5000, since=since.encode(), until=until.encode())),
+        ]
+        for label, legacy, tail in cases:
+            print(f"{label:>34} {_time(legacy, args.repeat):>10.1f} {_time(tail, args.repeat):>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
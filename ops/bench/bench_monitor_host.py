@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Monitor soak benchmark — memory and threads for N simulated printers,
+thread-per-printer daemons vs the single asyncio monitor host.
+
+Starts a fake PrusaLink farm (one HTTP server answering /api/v1/status
+for every printer on its own 127.0.0.x address), seeds a throwaway
+SQLite database with N PrusaLink printers, and soaks each mode in its
+own process for --duration seconds:
+
+  legacy  start_prusalink_monitors(): one polling thread per printer,
+          as the prusalink_monitor daemon ran.
+  host    monitor_host.MonitorHost: supervisor coroutines, ticks on
+          the shared ODIN_MONITOR_WORKERS pool.
+  idle    one monitor daemon with no printers. Under supervisord the
+          legacy layout ran four such processes (Bambu, Moonraker,
+          PrusaLink, Elegoo); the host runs one, so the legacy farm
+          estimate adds 3 x idle RSS.
+
+Reports peak RSS, OS threads, status polls served and the poll rate
+against the ideal (N / POLL_INTERVAL).
+
+Usage (from the repo root, no container needed; Linux, for /proc and
+127.0.0.x loopback addresses):
+    python ops/bench/bench_monitor_host.py                   # 200 printers, 60s per mode
+    python ops/bench/bench_monitor_host.py --printers 500 --duration 120
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _env(workdir: str) -> dict:
+    env = dict(os.environ)
+    env.update({
+        "DATABASE_URL": f"sqlite:///{workdir}/odin.db",
+        "DATABASE_PATH": f"{workdir}/odin.db",
+        "JWT_SECRET_KEY": "bench-secret-" + "x" * 32,
+        "ENCRYPTION_KEY": "",
+        "ODIN_WS_SOCKET": f"{workdir}/hub.sock",
+        "ODIN_WS_DURABLE": "0",   # no API listening; drop, don't queue
+        "PYTHONUNBUFFERED": "1",
+    })
+    return env
+
+
+def _host_ip(i: int) -> str:
+    return f"127.0.{1 + i // 250}.{1 + i % 250}"
+
+
+def _seed(workdir: str, printers: int) -> None:
+    hosts = [_host_ip(i) for i in range(printers)]
+    code = f"""
+import sys
+sys.path.insert(0, {str(BACKEND_DIR)!r})
+from pathlib import Path
+from core.base import Base
+import core.models
+for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+            "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{{mod}}.models")
+from sqlalchemy import text
+from core.db import engine, run_core_migrations, run_module_migrations
+Base.metadata.create_all(bind=engine)
+run_core_migrations()
+run_module_migrations(Path({str(BACKEND_DIR / "modules")!r}))
+with engine.begin() as conn:
+    for i, host in enumerate({hosts!r}):
+        conn.execute(text("INSERT INTO printers (name, model, slot_count, is_active, api_type, api_host, api_key) "
+                          "VALUES (:n, 'MK4', 1, 1, 'prusalink', :h, 'bench-key')"),
+                     {{"n": f"bench-{{i}}", "h": host}})
+"""
+    subprocess.run([sys.executable, "-c", code], cwd=BACKEND_DIR, env=_env(workdir),
+                   check=True, capture_output=True, text=True)
+
+
+# ---------------------------------------------------------------- fake farm
+
+class _Farm(BaseHTTPRequestHandler):
+    polls = 0
+    lock = threading.Lock()
+    body = json.dumps({
+        "printer": {"state": "IDLE", "temp_bed": 22.5, "target_bed": 0.0,
+                    "temp_nozzle": 24.0, "target_nozzle": 0.0, "fan_print": 0},
+    }).encode()
+
+    def do_GET(self):
+        if self.path == "/api/v1/status":
+            with _Farm.lock:
+                _Farm.polls += 1
+            self._send(200, _Farm.body)
+        elif self.path == "/__polls":
+            self._send(200, str(_Farm.polls).encode())
+        else:
+            self._send(404, b"{}")
+
+    do_HEAD = do_GET
+
+    def _send(self, code, body):
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def _start_farm() -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer(("0.0.0.0", 0), _Farm)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _polls(port: int) -> int:
+    from urllib.request import urlopen
+    with urlopen(f"http://127.0.0.1:{port}/__polls", timeout=5) as resp:
+        return int(resp.read())
+
+
+# ---------------------------------------------------------------- child
+
+def _proc_status() -> dict:
+    out = {}
+    with open("/proc/self/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM", "Threads"):
+                out[key] = int(value.split()[0])
+    return out
+
+
+def _child(mode: str, duration: float, farm_port: int) -> None:
+    import logging
+    logging.basicConfig(level=logging.ERROR)
+    peak_threads = 0
+
+    # Every simulated printer answers on the farm's port, not 80.
+    from modules.printers.monitors import prusalink_monitor
+
+    class FarmPrinter(prusalink_monitor.PrusaLinkPrinter):
+        def __init__(self, host, **kwargs):
+            kwargs["port"] = farm_port
+            super().__init__(host, **kwargs)
+
+    prusalink_monitor.PrusaLinkPrinter = FarmPrinter
+
+    def sample():
+        nonlocal peak_threads
+        peak_threads = max(peak_threads, _proc_status()["Threads"])
+
+    if mode == "legacy":
+        threads = prusalink_monitor.start_prusalink_monitors()
+        deadline = time.monotonic() + duration
+        while time.monotonic() < deadline:
+            sample()
+            time.sleep(1)
+        for t in threads:
+            t.stop()
+    elif mode == "host":
+        import asyncio
+        from modules.printers.monitors import monitor_host
+
+        async def soak():
+            stop = asyncio.Event()
+            runner = asyncio.create_task(monitor_host.MonitorHost().run(stop))
+            deadline = time.monotonic() + duration
+            while time.monotonic() < deadline:
+                sample()
+                await asyncio.sleep(1)
+            stop.set()
+            await runner
+
+        asyncio.run(soak())
+    else:  # idle daemon: same imports, no printers
+        from modules.printers import fleet_state  # noqa: F401
+        for _ in range(3):
+            sample()
+            time.sleep(1)
+
+    status = _proc_status()
+    print(json.dumps({"rss_kb": status["VmHWM"], "threads": peak_threads}))
+
+
+def _run_child(mode: str, workdir: str, port: int, duration: float) -> dict:
+    before = _polls(port)
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", mode, "--duration", str(duration), "--port", str(port)],
+        cwd=BACKEND_DIR, env=_env(workdir), check=True, capture_output=True, text=True,
+    )
+    result = json.loads(out.stdout.strip().splitlines()[-1])
+    result["polls"] = _polls(port) - before
+    return result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=200, help="simulated PrusaLink printers")
+    ap.add_argument("--duration", type=float, default=60, help="seconds of soak per mode")
+    ap.add_argument("--child", choices=["legacy", "host", "idle"], help=argparse.SUPPRESS)
+    ap.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.child:
+        _child(args.child, args.duration, args.port)
+        return
+
+    from modules.printers.monitors.prusalink_monitor import POLL_INTERVAL
+
+    farm = _start_farm()
+    port = farm.server_address[1]
+    ideal = args.printers * args.duration / POLL_INTERVAL
+    with tempfile.TemporaryDirectory(prefix="odin-monitorbench-") as workdir:
+        _seed(workdir, args.printers)
+        idle = _run_child("idle", workdir, port, 3)
+        print(f"{args.printers} printers, {args.duration:.0f}s soak, idle daemon RSS {idle['rss_kb'] / 1024:.1f} MB")
+        print(f"{'mode':>7} {'RSS MB':>8} {'farm MB':>8} {'threads':>8} {'polls':>7} {'of ideal':>9}")
+        for mode in ("legacy", "host"):
+            r = _run_child(mode, workdir, port, args.duration)
+            farm_kb = r["rss_kb"] + (3 * idle["rss_kb"] if mode == "legacy" else 0)
+            print(
+                f"{mode:>7} {r['rss_kb'] / 1024:>8.1f} {farm_kb / 1024:>8.1f} {r['threads']:>8} "
+                f"{r['polls']:>7} {r['polls'] / ideal:>9.2f}"
+            )
+    farm.shutdown()
+
+
+if __name__ == "__main__":
+    main()
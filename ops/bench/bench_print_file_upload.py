@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Print file upload benchmark — POST /print-files/upload latency and peak
+Python memory for a large .3mf, everything-in-the-request vs streamed
+ingestion with background extraction (modules/models_library/ingest.py).
+
+Builds a sliced .3mf whose model holds --triangles triangles, then times:
+
+  legacy   the old request: upload read into memory and hashed, written
+           to a temp file, zip opened for the bomb check, parse_3mf
+           (which parsed the whole model XML for the project name),
+           plate objects, mesh extraction, copy to the files directory,
+           bed size — four zip opens.
+  upload   upload_3mf() as shipped: streamed to disk and hashed, one zip
+           open for the metadata, file renamed into place.
+  worker   the background half: IngestQueue.process() for that file
+           (the mesh).
+
+Memory is measured in a separate run: tracemalloc slows XML parsing.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_print_file_upload.py                    # 300k triangles
+    python ops/bench/bench_print_file_upload.py --triangles 1000000
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+OPERATOR = {"id": 1, "role": "operator", "group_id": None}
+NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+
+def _build_3mf(triangles):
+    side = int((triangles / 2) ** 0.5) + 1
+    parts = [f'<?xml version="1.0" encoding="UTF-8"?><model unit="millimeter" xmlns="{NS}">'
+             '<metadata name="Title">Bench Part</metadata><resources><object id="1" type="model"><mesh><vertices>']
+    parts += [f'<vertex x="{i % side}.125" y="{i // side}.5" z="{(i * 7) % 13}.25"/>' for i in range(side * side)]
+    parts.append("</vertices><triangles>")
+    for t in range(triangles):
+        a = (t // 2) % (side * side - side - 1)
+        parts.append(f'<triangle v1="{a}" v2="{a + 1}" v3="{a + side}"/>' if t % 2 else
+                     f'<triangle v1="{a + 1}" v2="{a + side + 1}" v3="{a + side}"/>')
+    parts.append("</triangles></mesh></object></resources></model>")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("3D/3dmodel.model", "".join(parts))
+        zf.writestr("Metadata/plate_1.gcode", "G28\n" * 10000)
+        zf.writestr("Metadata/plate_1.png", os.urandom(200_000))
+        zf.writestr("Metadata/slice_info.config", (
+            '<config><plate><metadata key="prediction" value="7200"/><metadata key="weight" value="40"/>'
+            '<filament id="1" type="PLA" color="#FF0000" used_m="12" used_g="40"/></plate></config>'))
+        zf.writestr("Metadata/plate_1.json", json.dumps({"bed_type": "textured_plate",
+                                                         "bbox_objects": [{"name": "Bench Part"}]}))
+    return buf.getvalue()
+
+
+def _legacy(data, files_dir):
+    """upload_3mf() before streaming, minus the database writes."""
+    from defusedxml import ElementTree as ET
+
+    from modules.models_library import print_file_meta as pfm
+    from modules.models_library.threemf_parser import extract_objects_from_plate, parse_3mf
+
+    from bench_viewer_mesh import _legacy as legacy_mesh  # the old DOM mesh extraction
+
+    content = io.BytesIO(data).read(100 * 1024 * 1024 + 1)
+    hashlib.sha256(content).hexdigest()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=".3mf") as tmp:
+        tmp.write(content)
+        tmp_path = tmp.name
+    try:
+        with zipfile.ZipFile(tmp_path) as z:
+            sum(e.file_size for e in z.infolist())
+        parse_3mf(tmp_path)
+        with zipfile.ZipFile(tmp_path) as zf:
+            ET.fromstring(zf.read("3D/3dmodel.model").decode("utf-8"))  # the old extract_project_name
+            extract_objects_from_plate(zf)
+        with zipfile.ZipFile(tmp_path) as zf:
+            legacy_mesh(zf)
+        stored = os.path.join(files_dir, "legacy.3mf")
+        shutil.copy2(tmp_path, stored)
+        pfm.extract_print_file_meta(stored, ".3mf")
+    finally:
+        os.unlink(tmp_path)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--triangles", type=int, default=300_000, help="triangles in the model")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+    args = ap.parse_args()
+
+    from fastapi import UploadFile
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    from core.db import _run_sql_file
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+    from modules.models_library import ingest
+    from modules.models_library.routes.print_files import upload_3mf
+
+    data = _build_3mf(args.triangles)
+    with tempfile.TemporaryDirectory(prefix="odin-uploadbench-") as workdir:
+        path = f"{workdir}/odin.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        for migration in sorted((BACKEND_DIR / "modules" / "jobs" / "migrations").glob("*.sql")):
+            _run_sql_file(path, migration)
+        Session = sessionmaker(bind=engine)
+        ingest.PRINT_FILES_DIR = f"{workdir}/print_files"
+        os.makedirs(ingest.PRINT_FILES_DIR)
+        queue = ingest.IngestQueue(engine=engine)
+        submitted = []
+        queue.submit = submitted.append
+        ingest.queue = queue
+
+        def upload():
+            with Session() as db:
+                upload_3mf.__wrapped__(request=None, file=UploadFile(file=io.BytesIO(data), filename="bench.3mf"),
+                                       current_user=OPERATOR, db=db)
+
+        def worker():
+            queue.process(submitted[-1])
+
+        modes = (("legacy", lambda: _legacy(data, ingest.PRINT_FILES_DIR)), ("upload", upload), ("worker", worker))
+        print(f"{args.triangles} triangles, {len(data) / 1e6:.1f} MB .3mf")
+        print(f"{'mode':>7} {'s':>8} {'peak MB':>8}")
+        for name, fn in modes:
+            times = []
+            for _ in range(args.repeat):
+                if name == "worker":
+                    upload()
+                started = time.perf_counter()
+                fn()
+                times.append(time.perf_counter() - started)
+            if name == "worker":
+                upload()
+            tracemalloc.start()
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            print(f"{name:>7} {statistics.median(times):>8.3f} {peak / 1e6:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
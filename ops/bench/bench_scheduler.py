@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Scheduler benchmark — runs/sec and assignment quality for a synthetic
+fleet and queue, linear slot probing vs the bitset slot allocator.
+
+Seeds a throwaway SQLite database with --printers printers (random
+loaded colors, a few tags) and a queue of --jobs pending jobs (random
+durations, colors, priorities), plus --locked already-scheduled jobs
+scattered over the horizon so free time is fragmented. Then runs
+Scheduler.run() over the same queue in two modes:
+
+  legacy  the old _find_first_available_slot(): every start slot probed
+          in turn, blackout re-checked with datetime arithmetic, every
+          slot of the job looked up.
+  bitset  SlotOccupancy.first_fit(): per-printer int bitsets and a
+          blackout start mask computed once per run.
+
+The queue is reset between runs. Reports the median run time, runs/sec
+and the assignment quality (scheduled / skipped, setup blocks, average
+color match, makespan), and checks both modes made the same assignments.
+
+Then times IncrementalScheduler on the bitset plan: after one full run,
+each trigger adds a job and cancels a scheduled one, and the run applies
+just that delta. Reports its latency, delta size and jobs written.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_scheduler.py                           # 80 printers, 1500 jobs, 7 days
+    python ops/bench/bench_scheduler.py --printers 200 --jobs 5000 --skip-legacy
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+COLORS = ["black", "white", "red", "blue", "green", "orange", "grey", "yellow"]
+TAGS = ["Room A", "Room B", "PETG"]
+
+
+def _seed(db, args, start):
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+    from modules.printers.models import FilamentSlot, Printer
+
+    rng = random.Random(args.seed)
+    printers = []
+    for i in range(args.printers):
+        p = Printer(name=f"bench-{i}", model="X1C", slot_count=4, is_active=True,
+                    api_type="bambu", tags=rng.sample(TAGS, rng.randint(0, 2)))
+        db.add(p)
+        printers.append(p)
+    db.flush()
+    for p in printers:
+        for n, color in enumerate(rng.sample(COLORS, 4), start=1):
+            db.add(FilamentSlot(printer_id=p.id, slot_number=n, color=color))
+
+    horizon_hours = args.days * 24
+    for _ in range(args.locked):
+        begin = start + timedelta(minutes=15 * rng.randrange(horizon_hours * 4))
+        hours = rng.choice([1, 2, 4, 8])
+        db.add(Job(item_name="locked", status=JobStatus.SCHEDULED, notes="locked",
+                   printer_id=rng.choice(printers).id, duration_hours=hours,
+                   scheduled_start=begin, scheduled_end=begin + timedelta(hours=hours)))
+    for i in range(args.jobs):
+        db.add(Job(item_name=f"part-{i}", status=JobStatus.PENDING, priority=rng.randint(1, 5),
+                   duration_hours=rng.choice([0.5, 1, 1.5, 2, 3, 5, 8, 12]),
+                   colors_required=",".join(rng.sample(COLORS, rng.choice([0, 1, 1, 2]))),
+                   required_tags=rng.sample(TAGS, 1) if rng.random() < 0.1 else []))
+    db.commit()
+
+
+def _reset(db):
+    from core.base import JobStatus
+    from modules.jobs.models import Job, SchedulerRun
+
+    db.query(Job).filter(Job.notes.is_(None)).update({
+        Job.status: JobStatus.PENDING, Job.printer_id: None, Job.scheduled_start: None,
+        Job.scheduled_end: None, Job.match_score: None,
+    }, synchronize_session=False)
+    db.query(SchedulerRun).delete()
+    db.commit()
+    db.expunge_all()
+
+
+def _legacy_scheduler(config):
+    from modules.jobs.scheduler import Scheduler
+
+    class LegacyScheduler(Scheduler):
+        """The pre-bitset probe loop, on top of the same occupancy data."""
+
+        def run(self, db, start_date=None):
+            self._start_date = start_date
+            return super().run(db, start_date)
+
+        def _find_first_available_slot(self, printer_id, duration_slots, occupancy, search_start=0):
+            for start_slot in range(search_start, occupancy.total_slots - duration_slots + 1):
+                if self._is_blackout_time(self._slot_to_time(start_slot, self._start_date)):
+                    continue
+                if not any(occupancy.is_busy(printer_id, s)
+                           for s in range(start_slot, start_slot + duration_slots)):
+                    return start_slot
+            return None
+
+    return LegacyScheduler(config)
+
+
+def _measure(make_scheduler, Session, start, repeat):
+    times, result = [], None
+    for _ in range(repeat):
+        with Session() as db:
+            _reset(db)
+            scheduler = make_scheduler()
+            started = time.perf_counter()
+            result = scheduler.run(db, start_date=start)
+            times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def _measure_incremental(config, Session, repeat):
+    from core.base import JobStatus
+    from modules.jobs.models import Job, SchedulerRun
+    from modules.jobs.scheduler_incremental import IncrementalScheduler
+
+    planner = IncrementalScheduler(config)
+    times, runs = [], []
+    with Session() as db:
+        _reset(db)
+        planner.run(db, full=True)
+        for i in range(repeat):
+            victim = db.query(Job).filter(Job.status == JobStatus.SCHEDULED, Job.notes.is_(None)).first()
+            victim.status = JobStatus.CANCELLED
+            db.add(Job(item_name=f"late-{i}", status=JobStatus.PENDING, duration_hours=2, colors_required="black"))
+            db.commit()
+            started = time.perf_counter()
+            planner.run(db)
+            times.append(time.perf_counter() - started)
+            runs.append(db.query(SchedulerRun).order_by(SchedulerRun.id.desc()).first())
+    return statistics.median(times), runs[-1]
+
+
+def _quality(result, slot_minutes):
+    makespan = max((a.end_slot for a in result.assignments), default=0) * slot_minutes / 60
+    return (f"{result.scheduled_count:>5}/{result.skipped_count:<5} {result.setup_blocks:>6} "
+            f"{result.avg_match_score:>6.1f} {makespan:>8.1f}h")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=80, help="active printers")
+    ap.add_argument("--jobs", type=int, default=1500, help="pending jobs in the queue")
+    ap.add_argument("--locked", type=int, default=400, help="already-scheduled jobs fragmenting the horizon")
+    ap.add_argument("--days", type=int, default=7, help="scheduling horizon in days")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+    ap.add_argument("--seed", type=int, default=1, help="random seed for the fleet and queue")
+    ap.add_argument("--skip-legacy", action="store_true", help="only time the bitset allocator")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+    from modules.jobs.scheduler import Scheduler, SchedulerConfig
+
+    config = SchedulerConfig(horizon_days=args.days)
+    start = (datetime.utcnow() + timedelta(hours=1)).replace(minute=0, second=0, microsecond=0)
+    modes = [("bitset", lambda: Scheduler(config))]
+    if not args.skip_legacy:
+        modes.insert(0, ("legacy", lambda: _legacy_scheduler(config)))
+
+    with tempfile.TemporaryDirectory(prefix="odin-schedbench-") as workdir:
+        engine = create_engine(f"sqlite:///{workdir}/odin.db")
+        Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+        with Session() as db:
+            _seed(db, args, start)
+
+        print(f"{args.printers} printers, {args.jobs} pending + {args.locked} locked jobs, "
+              f"{args.days}-day horizon")
+        print(f"{'mode':>7} {'s/run':>8} {'runs/s':>7} {'sched/skip':>11} {'setups':>6} "
+              f"{'match':>6} {'makespan':>9}")
+        placements = {}
+        for name, make in modes:
+            repeat = 1 if name == "legacy" else args.repeat
+            elapsed, result = _measure(make, Session, start, repeat)
+            placements[name] = [(a.job_id, a.printer_id, a.start_slot) for a in result.assignments]
+            print(f"{name:>7} {elapsed:>8.2f} {1 / elapsed:>7.2f} {_quality(result, config.slot_duration_minutes)}")
+        if len(placements) == 2:
+            same = placements["legacy"] == placements["bitset"]
+            print("assignments identical" if same else "ASSIGNMENTS DIFFER")
+
+        elapsed, run = _measure_incremental(config, Session, args.repeat)
+        print(f"incremental (1 job added, 1 cancelled): {elapsed * 1000:.1f} ms, "
+              f"delta {run.delta_size}, {run.changed_count} job(s) written")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
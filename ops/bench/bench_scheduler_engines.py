@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Scheduler engine benchmark — greedy first-fit vs the lookahead optimizer
+on the same queue: setup blocks (color changes), makespan, average color
+match, priority order kept, and run time.
+
+The queue is either synthetic (--printers / --jobs, colors interleaved
+at random, as a busy farm's queue is) or recorded:
+
+  --record-from odin.db --queue q.json   write the active printers and the
+                                         pending/scheduled jobs of an ODIN
+                                         SQLite database (a backup copy is
+                                         fine) to q.json, then benchmark it
+  --queue q.json                         benchmark a recorded queue
+
+Every job is scheduled from scratch, as pending, in both engines. Each
+engine runs in a throwaway SQLite database seeded from the queue.
+
+"inversions" counts jobs that start after a less urgent job on the same
+printer — the price of reordering within lookahead windows.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_scheduler_engines.py                        # 40 printers, 600 jobs
+    python ops/bench/bench_scheduler_engines.py --lookahead 64 --budget-ms 5000
+    python ops/bench/bench_scheduler_engines.py --record-from /data/odin.db --queue queue.json
+"""
+
+import argparse
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+COLORS = ["black", "white", "red", "blue", "green", "orange", "grey", "yellow", "purple", "pink"]
+
+
+def _synthetic(printers: int, jobs: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    return {
+        "printers": [{"name": f"bench-{i}", "model": "", "tags": [], "colors": rng.sample(COLORS, 1)}
+                     for i in range(printers)],
+        "jobs": [{"item_name": f"part-{i}", "priority": rng.choice([2, 3, 3, 3, 4]),
+                  "hours": rng.choice([0.5, 1, 1.5, 2, 3, 4, 6]),
+                  "colors": rng.sample(COLORS, rng.choice([1, 1, 1, 2])), "tags": []}
+                 for i in range(jobs)],
+    }
+
+
+def _record(db_path: str) -> dict:
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    printers = []
+    for pid, name, model, tags in conn.execute(
+        "SELECT id, name, model, tags FROM printers WHERE is_active = 1 ORDER BY id"
+    ):
+        colors = [r[0].lower() for r in conn.execute(
+            "SELECT color FROM filament_slots WHERE printer_id = ? AND color IS NOT NULL AND color != ''", (pid,))]
+        printers.append({"name": name, "model": model or "", "tags": json.loads(tags or "[]"), "colors": colors})
+    jobs = []
+    for name, priority, hours, quantity, colors, tags in conn.execute(
+        "SELECT item_name, priority, duration_hours, quantity, colors_required, required_tags FROM jobs "
+        "WHERE status IN ('pending', 'scheduled') AND (hold IS NULL OR hold = 0) "
+        "ORDER BY priority, created_at"
+    ):
+        jobs.append({"item_name": name, "priority": priority or 3,
+                     "hours": (hours or 1.0) * (quantity or 1),
+                     "colors": [c.strip().lower() for c in (colors or "").split(",") if c.strip()],
+                     "tags": json.loads(tags or "[]")})
+    conn.close()
+    return {"printers": printers, "jobs": jobs}
+
+
+def _run(queue: dict, config, workdir: str, name: str):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base, JobStatus
+    from modules.jobs.models import Job
+    from modules.jobs.scheduler import make_scheduler
+    from modules.printers.models import FilamentSlot, Printer
+
+    engine = create_engine(f"sqlite:///{workdir}/{name}.db")
+    Base.metadata.create_all(bind=engine)
+    Session = sessionmaker(bind=engine)
+    created = datetime(2026, 1, 1)
+    with Session() as db:
+        for spec in queue["printers"]:
+            printer = Printer(name=spec["name"], model=spec["model"], tags=spec["tags"], slot_count=4, is_active=True)
+            db.add(printer)
+            db.flush()
+            for n, color in enumerate(spec["colors"], start=1):
+                db.add(FilamentSlot(printer_id=printer.id, slot_number=n, color=color))
+        for i, spec in enumerate(queue["jobs"]):
+            db.add(Job(item_name=spec["item_name"], status=JobStatus.PENDING, priority=spec["priority"],
+                       duration_hours=spec["hours"], colors_required=",".join(spec["colors"]),
+                       required_tags=spec["tags"], created_at=created + timedelta(seconds=i)))
+        db.commit()
+
+        scheduler = make_scheduler(config)
+        started = time.perf_counter()
+        result = scheduler.run(db)
+        elapsed = time.perf_counter() - started
+        priorities = {j.id: j.priority for j in db.query(Job)}
+    engine.dispose()
+    return elapsed, result, priorities
+
+
+def _inversions(result, priorities) -> int:
+    by_printer = {}
+    for a in result.assignments:
+        by_printer.setdefault(a.printer_id, []).append((a.start_slot, priorities[a.job_id]))
+    count = 0
+    for rows in by_printer.values():
+        rows.sort()
+        worst = 0
+        for _, priority in rows:
+            if priority < worst:
+                count += 1
+            worst = max(worst, priority)
+    return count
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=40, help="printers in the synthetic fleet")
+    ap.add_argument("--jobs", type=int, default=600, help="jobs in the synthetic queue")
+    ap.add_argument("--seed", type=int, default=1, help="random seed for the synthetic queue")
+    ap.add_argument("--queue", help="recorded queue JSON to benchmark (written first with --record-from)")
+    ap.add_argument("--record-from", help="ODIN SQLite database to record the queue from")
+    ap.add_argument("--lookahead", type=int, default=32, help="optimizer window (jobs)")
+    ap.add_argument("--budget-ms", type=int, default=2000, help="optimizer time budget")
+    ap.add_argument("--days", type=int, default=7, help="scheduling horizon in days")
+    args = ap.parse_args()
+
+    if args.record_from:
+        if not args.queue:
+            ap.error("--record-from needs --queue to write to")
+        Path(args.queue).write_text(json.dumps(_record(args.record_from), indent=1))
+    if args.queue:
+        queue = json.loads(Path(args.queue).read_text())
+        source = args.queue
+    else:
+        queue = _synthetic(args.printers, args.jobs, args.seed)
+        source = "synthetic"
+
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+    from modules.jobs.scheduler import SchedulerConfig
+
+    print(f"{source}: {len(queue['printers'])} printers, {len(queue['jobs'])} jobs, {args.days}-day horizon")
+    print(f"{'engine':>9} {'s/run':>7} {'sched/skip':>11} {'setups':>6} {'match':>6} {'makespan':>9} {'inversions':>10}")
+    with tempfile.TemporaryDirectory(prefix="odin-enginebench-") as workdir:
+        for engine in ("greedy", "optimize"):
+            config = SchedulerConfig.from_time_strings(
+                horizon_days=args.days, engine=engine,
+                lookahead_jobs=args.lookahead, time_budget_ms=args.budget_ms,
+            )
+            elapsed, result, priorities = _run(queue, config, workdir, engine)
+            makespan = max((a.end_slot for a in result.assignments), default=0) * config.slot_duration_minutes / 60
+            print(f"{engine:>9} {elapsed:>7.2f} {result.scheduled_count:>5}/{result.skipped_count:<5} "
+                  f"{result.setup_blocks:>6} {result.avg_match_score:>6.1f} {makespan:>8.1f}h "
+                  f"{_inversions(result, priorities):>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Search benchmark — GET /search and GET /archives?search= / ?tag= latency
+on a large history, LIKE scans vs the full-text index
+(core/search_index.py) and the normalized archive tags
+(modules/archives/archive_tags.py).
+
+Seeds a throwaway SQLite database with --archives print archives (names
+from a ~1750-word vocabulary, 0-3 of 12 tags, notes on 30%), as many
+jobs and a tenth as many models, then times each query --repeat times:
+
+  legacy  the old queries: ILIKE '%q%' on names and notes, tags matched
+          with four LIKE patterns against the comma-separated column.
+  index   global_search() and list_archives() as shipped.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_search_index.py                  # 200k archives
+    python ops/bench/bench_search_index.py --archives 1000000
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+ADMIN = {"id": 1, "role": "admin", "group_id": None}
+
+WORDS = ("bracket benchy gridfinity vase hook gear housing clip mount lid box panel hinge spool "
+         "holder cable organizer knob plate adapter stand tray shelf fan duct").split()
+# Part names in a real history are far more varied than WORDS: pad the
+# vocabulary with made-up words so a query term matches well under 1% of rows.
+_SYLLABLES = "ka ro mi te su lo na vi de po ra ze".split()
+VOCAB = WORDS + [a + b + c for a in _SYLLABLES for b in _SYLLABLES for c in _SYLLABLES]
+TAGS = ("calibration PLA PETG ABS TPU prototype customer rework storage functional "
+        "gift display").split()
+
+
+def _seed(engine, path, archives):
+    from sqlalchemy import insert
+
+    from core.base import JobStatus
+    from modules.jobs.models import Job
+    from modules.models_library.models import Model
+
+    rng = random.Random(0)
+
+    def name(i):
+        return f"{rng.choice(VOCAB).title()} {rng.choice(VOCAB)} v{i % 9}"
+
+    def notes():
+        return " ".join(rng.choice(VOCAB) for _ in range(8)) if rng.random() < 0.3 else None
+
+    conn = sqlite3.connect(path)
+    for sql_file in sorted((BACKEND_DIR / "modules" / "archives" / "migrations").glob("*.sql")):
+        conn.executescript(sql_file.read_text())
+    conn.executemany(
+        "INSERT INTO print_archives (print_name, tags, notes, status) VALUES (?, ?, ?, 'completed')",
+        ((name(i), ", ".join(rng.sample(TAGS, rng.randint(0, 3))), notes()) for i in range(archives)),
+    )
+    conn.commit()
+    conn.close()
+    with engine.begin() as conn:
+        conn.execute(insert(Model), [{"name": name(i), "notes": notes()} for i in range(archives // 10)])
+        for first in range(0, archives, 20000):
+            conn.execute(insert(Job), [{"item_name": name(i), "notes": notes(), "status": JobStatus.COMPLETED,
+                                        "quantity": 1, "priority": 3}
+                                       for i in range(first, min(archives, first + 20000))])
+
+
+def _legacy_search(db, q):
+    from modules.jobs.models import Job
+    from modules.models_library.models import Model
+
+    query = f"%{q.lower()}%"
+    db.query(Model).filter((Model.name.ilike(query)) | (Model.notes.ilike(query))).limit(5).all()
+    db.query(Job).filter((Job.item_name.ilike(query)) | (Job.notes.ilike(query))) \
+        .order_by(Job.created_at.desc()).limit(5).all()
+
+
+def _legacy_archives(db, search=None, tag=None):
+    from sqlalchemy import text
+
+    conditions, params = [], {}
+    if search:
+        conditions.append("a.print_name LIKE :search")
+        params["search"] = f"%{search}%"
+    if tag:
+        conditions.append("(a.tags = :tag_exact OR a.tags LIKE :tag_start "
+                          "OR a.tags LIKE :tag_mid OR a.tags LIKE :tag_end)")
+        params.update(tag_exact=tag, tag_start=f"{tag},%", tag_mid=f"%, {tag},%", tag_end=f"%, {tag}")
+    where = " AND ".join(conditions)
+    db.execute(text(f"SELECT COUNT(*) FROM print_archives a WHERE {where}"), params).scalar()
+    db.execute(text(f"SELECT a.*, p.name AS printer_name, p.nickname AS printer_nickname "
+                    f"FROM print_archives a LEFT JOIN printers p ON p.id = a.printer_id "
+                    f"WHERE {where} ORDER BY a.created_at DESC LIMIT 50 OFFSET 0"), params).fetchall()
+
+
+def _index_archives(db, search=None, tag=None):
+    from modules.archives.routes.archives_crud import list_archives
+
+    list_archives(page=1, per_page=50, printer_id=None, status=None, search=search,
+                  start_date=None, end_date=None, tag=tag, user=ADMIN, db=db)
+
+
+def _time(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--archives", type=int, default=200_000, help="print archives (and jobs)")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per query (median reported)")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core import search_index
+    from core.base import Base
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+    from modules.archives import archive_tags
+    from modules.system.routes_admin import global_search
+
+    with tempfile.TemporaryDirectory(prefix="odin-searchbench-") as workdir:
+        path = f"{workdir}/odin.db"
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        _seed(engine, path, args.archives)
+        started = time.perf_counter()
+        search_index.ensure_schema(engine)
+        archive_tags.backfill(engine)
+        built = time.perf_counter() - started
+
+        print(f"{args.archives} archives and jobs, {args.archives // 10} models; "
+              f"index + tag table built in {built:.1f}s")
+        print(f"{'query':>28} {'legacy ms':>10} {'index ms':>9}")
+        with sessionmaker(bind=engine)() as db:
+            cases = [
+                ("GET /search?q=gridfin", lambda: _legacy_search(db, "gridfin"),
+                 lambda: global_search(q="gridfin", db=db, current_user=ADMIN)),
+                ("GET /search?q=zzz (no hit)", lambda: _legacy_search(db, "zzz"),
+                 lambda: global_search(q="zzz", db=db, current_user=ADMIN)),
+                ("GET /archives?search=hinge", lambda: _legacy_archives(db, search="hinge"),
+                 lambda: _index_archives(db, search="hinge")),
+                ("GET /archives?tag=rework", lambda: _legacy_archives(db, tag="rework"),
+                 lambda: _index_archives(db, tag="rework")),
+            ]
+            for label, legacy, index in cases:
+                print(f"{label:>28} {_time(legacy, args.repeat):>10.1f} {_time(index, args.repeat):>9.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
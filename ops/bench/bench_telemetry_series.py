@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Telemetry chart benchmark — GET /printers/{id}/telemetry query time and
+response size, raw rows vs rollups + SQL downsampling.
+
+Seeds two throwaway SQLite databases with --days of one-a-minute samples
+for --printers printers (what a farm printing around the clock writes):
+
+  legacy   the old layout: single-column printer_id / recorded_at
+           indexes, every sample kept, the route's old SELECT returning
+           every row in the window.
+  rollups  printers migrations 001 + 002, telemetry_rollups.maintain()
+           run once, telemetry_rollups.printer_series() per request.
+
+For each chart window (1h, 24h, 7d, and 30d for rollups only — the old
+route capped at 7 days) reports the median query time over --repeat runs
+and the JSON size of the response.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_telemetry_series.py                  # 50 printers, 7 days
+    python ops/bench/bench_telemetry_series.py --printers 200 --days 30
+"""
+
+import argparse
+import json
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+MIGRATIONS = BACKEND_DIR / "modules" / "printers" / "migrations"
+
+LEGACY_SCHEMA = """
+CREATE TABLE printer_telemetry (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    printer_id INTEGER NOT NULL,
+    bed_temp REAL, nozzle_temp REAL, bed_target REAL, nozzle_target REAL,
+    fan_speed INTEGER,
+    recorded_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX idx_printer_telemetry_printer ON printer_telemetry(printer_id);
+CREATE INDEX idx_printer_telemetry_recorded ON printer_telemetry(recorded_at);
+"""
+
+
+def _seed(conn, printers: int, days: int, now: int) -> None:
+    from modules.printers.telemetry_rollups import _ts
+    start = now - days * 86400
+    rows = (
+        (pid, 60.0 + (t // 60) % 3, 215.0 + (t // 60) % 5, 60.0, 215.0, 50, _ts(t))
+        for t in range(start, now, 60)
+        for pid in range(1, printers + 1)
+    )
+    conn.executemany(
+        "INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, "
+        "fan_speed, recorded_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows,
+    )
+    conn.commit()
+
+
+def _legacy_query(conn, hours: int) -> list:
+    rows = conn.execute(
+        f"SELECT recorded_at, bed_temp, nozzle_temp, bed_target, nozzle_target, fan_speed "
+        f"FROM printer_telemetry WHERE printer_id = ? AND recorded_at > datetime('now', '-{hours} hours') "
+        f"ORDER BY recorded_at ASC", (1,),
+    ).fetchall()
+    return [{"recorded_at": r[0], "bed_temp": r[1], "nozzle_temp": r[2],
+             "bed_target": r[3], "nozzle_target": r[4], "fan_speed": r[5]} for r in rows]
+
+
+def _time(fn, repeat: int):
+    times, result = [], None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times), result
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=50, help="printers with telemetry")
+    ap.add_argument("--days", type=int, default=7, help="days of one-a-minute samples")
+    ap.add_argument("--max-points", type=int, default=1000, help="max_points for the rollup series")
+    ap.add_argument("--repeat", type=int, default=5, help="runs per measurement (median reported)")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from modules.printers import telemetry_rollups
+
+    now = int(time.time())
+    windows = [h for h in (1, 24, 168, 720) if h <= args.days * 24] or [1]
+    with tempfile.TemporaryDirectory(prefix="odin-telemetrybench-") as workdir:
+        legacy = sqlite3.connect(f"{workdir}/legacy.db")
+        legacy.executescript(LEGACY_SCHEMA)
+        _seed(legacy, args.printers, args.days, now)
+
+        path = f"{workdir}/rollups.db"
+        conn = sqlite3.connect(path)
+        for migration in sorted(MIGRATIONS.glob("*.sql")):
+            conn.executescript(migration.read_text())
+        _seed(conn, args.printers, args.days, now)
+        conn.close()
+        engine = create_engine(f"sqlite:///{path}")
+        started = time.perf_counter()
+        telemetry_rollups.maintain(engine, now=now)
+        first_maintain = time.perf_counter() - started
+        started = time.perf_counter()
+        telemetry_rollups.maintain(engine, now=now + 300)
+        steady_maintain = time.perf_counter() - started
+
+        total = args.printers * args.days * 1440
+        print(f"{args.printers} printers x {args.days} days = {total:,} samples; "
+              f"maintain(): first run {first_maintain:.2f}s, then {steady_maintain * 1000:.0f} ms per 5 min")
+        print(f"{'window':>7} {'mode':>8} {'points':>7} {'ms':>9} {'JSON KB':>9}")
+        for hours in windows:
+            if hours <= 168:
+                elapsed, points = _time(lambda: _legacy_query(legacy, hours), args.repeat)
+                size = len(json.dumps(points)) / 1024
+                print(f"{hours:>6}h {'legacy':>8} {len(points):>7} {elapsed * 1000:>9.1f} {size:>9.1f}")
+            with engine.connect() as db:
+                elapsed, points = _time(
+                    lambda: telemetry_rollups.printer_series(db, 1, hours, args.max_points, now=now),
+                    args.repeat,
+                )
+            size = len(json.dumps(points)) / 1024
+            print(f"{hours:>6}h {'rollups':>8} {len(points):>7} {elapsed * 1000:>9.1f} {size:>9.1f}")
+        legacy.close()
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
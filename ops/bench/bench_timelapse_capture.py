@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Timelapse capture benchmark — one capture tick across a fleet of camera
+printers, the sequential daemon loop vs CaptureScheduler
+(modules/archives/timelapse_capture.py).
+
+A local stand-in for go2rtc serves a --kb JPEG per printer after
+--latency-ms; --hung cameras never answer. Every timelapse already has
+--frames frames on disk (a print --frames x 30 s in).
+
+  legacy     the old loop: one blocking 5 s fetch per printer in turn,
+             frame number from listing the frames directory, one
+             frame_count UPDATE + commit per frame.
+  scheduler  CaptureScheduler.tick(): all fetches at once, each with its
+             own 5 s deadline, frame numbers from a counter, one UPDATE
+             per tick.
+
+"skew" is how long after the tick started a healthy printer's frame was
+taken: with a sequential loop, printers late in the list (and everything
+after a hung camera) are captured seconds late and drift.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_timelapse_capture.py
+    python ops/bench/bench_timelapse_capture.py --printers 60 --hung 5 --frames 2000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+
+class FakeGo2rtc(threading.Thread):
+    """Minimal HTTP server answering /api/frame.jpeg?src=printer_N."""
+
+    def __init__(self, latency, body, hung):
+        super().__init__(daemon=True)
+        self.latency, self.body, self.hung = latency, body, hung
+        self.served = {}  # printer_id -> monotonic time the frame was sent
+        self.ready = threading.Event()
+
+    async def _handle(self, reader, writer):
+        request = await reader.readuntil(b"\r\n\r\n")
+        pid = int(request.split(b" ", 2)[1].rsplit(b"printer_", 1)[1])
+        await asyncio.sleep(3600 if pid in self.hung else self.latency)
+        self.served[pid] = time.monotonic()
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: image/jpeg\r\nContent-Length: %d\r\n\r\n" % len(self.body))
+        writer.write(self.body)
+        await writer.drain()
+        writer.close()
+
+    def run(self):
+        async def serve():
+            server = await asyncio.start_server(self._handle, "127.0.0.1", 0, backlog=512)
+            self.port = server.sockets[0].getsockname()[1]
+            self.ready.set()
+            await server.serve_forever()
+        asyncio.run(serve())
+
+
+def _legacy_tick(tc, base, targets):
+    """The capture half of the old main_loop body."""
+    import httpx
+    from sqlalchemy import text
+
+    session = tc.SessionLocal()
+    try:
+        for pid, tid in targets:
+            try:
+                resp = httpx.get(f"{base}/api/frame.jpeg?src=printer_{pid}", timeout=tc.CAPTURE_TIMEOUT)
+                if resp.status_code != 200 or len(resp.content) < 1000:
+                    continue
+                frame_dir = tc.TIMELAPSE_DIR / str(tid) / "frames"
+                frame_dir.mkdir(parents=True, exist_ok=True)
+                frame_num = len(list(frame_dir.glob("*.jpg"))) + 1
+                (frame_dir / f"frame_{frame_num:06d}.jpg").write_bytes(resp.content)
+            except Exception:
+                continue
+            session.execute(text("UPDATE timelapses SET frame_count = frame_count + 1 WHERE id = :tid"),
+                            {"tid": tid})
+            session.commit()
+    finally:
+        session.close()
+
+
+def _setup(tc, root, printers, frames, body):
+    from sqlalchemy import create_engine, text
+    from sqlalchemy.orm import sessionmaker
+
+    eng = create_engine(f"sqlite:///{root / 'odin.db'}", connect_args={"check_same_thread": False})
+    with eng.begin() as conn:
+        conn.execute(text("CREATE TABLE printers (id INTEGER PRIMARY KEY, name TEXT, timelapse_enabled INTEGER, "
+                          "is_active INTEGER, gcode_state TEXT)"))
+        conn.execute(text("CREATE TABLE jobs (id INTEGER PRIMARY KEY, printer_id INTEGER, item_name TEXT, "
+                          "status TEXT, actual_start DATETIME)"))
+        conn.execute(text("CREATE TABLE timelapses (id INTEGER PRIMARY KEY, printer_id INTEGER, "
+                          "print_job_id INTEGER, filename TEXT, frame_count INTEGER, status TEXT, "
+                          "created_at DATETIME, completed_at DATETIME, duration_seconds REAL, file_size_mb REAL)"))
+        for pid in range(1, printers + 1):
+            conn.execute(text("INSERT INTO printers VALUES (:id, :n, 1, 1, 'RUNNING')"), {"id": pid, "n": f"P{pid}"})
+            conn.execute(text("INSERT INTO jobs VALUES (:id, :id, 'part', 'printing', CURRENT_TIMESTAMP)"),
+                         {"id": pid})
+            conn.execute(text("INSERT INTO timelapses VALUES (:id, :id, :id, 'x.mp4', :n, 'capturing', "
+                              "CURRENT_TIMESTAMP, NULL, NULL, NULL)"), {"id": pid, "n": frames})
+    tc.SessionLocal = sessionmaker(bind=eng)
+    tc.TIMELAPSE_DIR = root / "timelapses"
+    for tid in range(1, printers + 1):
+        frame_dir = tc.frame_dir(tid)
+        frame_dir.mkdir(parents=True)
+        for n in range(1, frames + 1):
+            (frame_dir / f"frame_{n:06d}.jpg").write_bytes(body)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=30, help="capturing printers")
+    ap.add_argument("--hung", type=int, default=2, help="cameras that never answer")
+    ap.add_argument("--latency-ms", type=float, default=150, help="go2rtc time to grab a frame")
+    ap.add_argument("--frames", type=int, default=1000, help="frames already captured per timelapse")
+    ap.add_argument("--kb", type=int, default=60, help="JPEG size")
+    args = ap.parse_args()
+
+    import httpx
+
+    from core.frame_cache import FrameCache
+    from modules.archives import timelapse_capture as tc
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    body = b"\xff\xd8" + os.urandom(args.kb * 1024)
+    hung = set(range(1, args.printers + 1, max(1, args.printers // max(1, args.hung))))
+    hung = set(sorted(hung)[:args.hung])
+    server = FakeGo2rtc(args.latency_ms / 1000, body, hung)
+    server.start()
+    server.ready.wait()
+    base = f"http://127.0.0.1:{server.port}"
+
+    print(f"{args.printers} printers ({len(hung)} hung), {args.latency_ms:.0f} ms/frame, "
+          f"{args.frames} frames each on disk")
+    print(f"{'mode':>10} {'tick s':>7} {'skew p50 s':>11} {'skew max s':>11} {'frames':>7}")
+    targets = [(pid, pid) for pid in range(1, args.printers + 1)]
+    with tempfile.TemporaryDirectory() as tmp:
+        _setup(tc, Path(tmp), args.printers, args.frames, body)
+
+        async def scheduler_tick():
+            scheduler = tc.CaptureScheduler(camera=FrameCache(Path(tmp) / "cache", base=base))
+            scheduler._ticks = 1  # no stale sweep in the measured tick
+            scheduler.active = {(pid, pid): tid for pid, tid in targets}
+            async with httpx.AsyncClient() as client:
+                return await scheduler.tick(client)
+
+        modes = (("legacy", lambda: _legacy_tick(tc, base, targets)), ("scheduler", lambda: asyncio.run(scheduler_tick())))
+        for name, tick in modes:
+            server.served.clear()
+            started = time.monotonic()
+            tick()
+            elapsed = time.monotonic() - started
+            skew = sorted(t - started for t in server.served.values())
+            print(f"{name:>10} {elapsed:>7.2f} {statistics.median(skew):>11.2f} {skew[-1]:>11.2f} {len(skew):>7}")
+
+
+if __name__ == "__main__":
+    main()
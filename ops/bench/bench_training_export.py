@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Training-data export benchmark — GET /vision/training-data/export time
+to first byte, total time and peak Python memory for a large labeled
+dataset, in-memory ZIP vs the streaming export (core/zip_stream.py,
+modules/vision/training_export.py).
+
+Writes --frames 720p JPEG detection frames and their vision_detections
+rows (confirmed, with a bbox, no recorded frame size, like detections
+from before sizes were recorded) to a throwaway directory, then times:
+
+  legacy  the old export: every frame deflated into an io.BytesIO ZIP
+          and decoded with cv2.imread for its size, sent as one chunk.
+  stream  export_training_data() as shipped: rows read with yield_per,
+          frames stored as is and sent in 256 KB chunks, sizes from the
+          JPEG header.
+
+The body is consumed the way the ASGI server would and discarded.
+Memory is measured in a separate run.
+
+Usage (from the repo root, no container needed; needs cv2):
+    python ops/bench/bench_training_export.py                  # 2000 frames
+    python ops/bench/bench_training_export.py --frames 10000
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+ADMIN = {"id": 1, "role": "admin", "group_id": None}
+
+
+def _seed(engine, frames_dir, frames):
+    import cv2
+    import numpy as np
+    from sqlalchemy import insert
+
+    from modules.vision.models import VisionDetection
+
+    # A smooth plate with some texture: about the size of a real 720p frame.
+    yy, xx = np.mgrid[0:720, 0:1280]
+    base = np.dstack([(xx // 5) % 256, (yy // 3) % 256, (xx + yy) // 8 % 256]).astype(np.uint8)
+    rng = np.random.default_rng(0)
+    rows = []
+    for i in range(frames):
+        if i % 50 == 0:
+            img = np.clip(base + rng.normal(0, 12, base.shape), 0, 255).astype(np.uint8)
+            ok, jpeg = cv2.imencode(".jpg", img, [cv2.IMWRITE_JPEG_QUALITY, 85])
+        rel = f"{i % 20 + 1}/{i:06d}_spaghetti.jpg"
+        path = Path(frames_dir) / rel
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(jpeg.tobytes())
+        rows.append({"printer_id": i % 20 + 1, "detection_type": "spaghetti", "confidence": 0.8,
+                     "status": "confirmed", "frame_path": rel, "bbox_json": json.dumps([100, 120, 400, 380])})
+    with engine.begin() as conn:
+        conn.execute(insert(VisionDetection), rows)
+    return len(jpeg)
+
+
+def _legacy(db, frames_dir):
+    """export_training_data() before streaming."""
+    import zipfile
+
+    import cv2
+    from fastapi.responses import StreamingResponse
+
+    from modules.vision.models import VisionDetection
+
+    rows = (
+        db.query(VisionDetection.id, VisionDetection.detection_type, VisionDetection.frame_path,
+                 VisionDetection.bbox_json, VisionDetection.metadata_json)
+        .filter(VisionDetection.status.in_(["confirmed", "dismissed"]))
+        .filter(VisionDetection.frame_path.isnot(None))
+        .all()
+    )
+    class_map = {'spaghetti': 0, 'first_layer': 1, 'detachment': 2}
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, 'w', zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr('data.yaml', "names:\n  0: spaghetti\n  1: first_layer\n  2: detachment\n"
+                                 "nc: 3\ntrain: images/\nval: images/\n")
+        for row in rows:
+            frame_abs = os.path.realpath(os.path.join(frames_dir, row.frame_path))
+            if not frame_abs.startswith(frames_dir + '/') or not os.path.isfile(frame_abs):
+                continue
+            base = os.path.splitext(os.path.basename(row.frame_path))[0]
+            zf.write(frame_abs, f"images/{os.path.basename(row.frame_path)}")
+            bbox = json.loads(row.bbox_json) if row.bbox_json else None
+            if bbox and len(bbox) == 4:
+                img = cv2.imread(frame_abs)
+                if img is not None:
+                    ih, iw = img.shape[:2]
+                    x1, y1, x2, y2 = bbox
+                    zf.writestr(f"labels/{base}.txt", f"{class_map.get(row.detection_type, 0)} "
+                                f"{((x1 + x2) / 2) / iw:.6f} {((y1 + y2) / 2) / ih:.6f} "
+                                f"{(x2 - x1) / iw:.6f} {(y2 - y1) / ih:.6f}\n")
+    buf.seek(0)
+    return StreamingResponse(buf, media_type="application/zip")
+
+
+def _stream(db, frames_dir):
+    from modules.vision import training_export
+    from modules.vision.routes.detections import export_training_data
+
+    training_export.VISION_FRAMES_DIR = frames_dir
+    return export_training_data(current_user=ADMIN, db=db)
+
+
+def _consume(fn, db, frames_dir):
+    """Seconds to the first body chunk, seconds in total, bytes sent."""
+    async def run():
+        started = time.perf_counter()
+        response = fn(db, frames_dir)
+        first, size = None, 0
+        async for chunk in response.body_iterator:
+            if first is None:
+                first = time.perf_counter() - started
+            size += len(chunk)
+        return first, time.perf_counter() - started, size
+    return asyncio.run(run())
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--frames", type=int, default=2000, help="labeled detection frames")
+    args = ap.parse_args()
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from core.base import Base
+    import core.models  # noqa: F401
+    for mod in ("printers", "jobs", "inventory", "models_library", "vision",
+                "notifications", "orders", "archives", "system"):
+        __import__(f"modules.{mod}.models")
+
+    with tempfile.TemporaryDirectory(prefix="odin-zipbench-") as workdir:
+        frames_dir = os.path.realpath(os.path.join(workdir, "frames"))
+        engine = create_engine(f"sqlite:///{workdir}/odin.db")
+        Base.metadata.create_all(bind=engine)
+        frame_bytes = _seed(engine, frames_dir, args.frames)
+        Session = sessionmaker(bind=engine)
+
+        print(f"{args.frames} frames of ~{frame_bytes / 1024:.0f} KB")
+        print(f"{'mode':>7} {'first byte s':>12} {'total s':>8} {'MB sent':>8} {'peak MB':>8}")
+        for name, fn in (("legacy", _legacy), ("stream", _stream)):
+            with Session() as db:
+                first, total, size = _consume(fn, db, frames_dir)
+            with Session() as db:
+                tracemalloc.start()
+                _consume(fn, db, frames_dir)
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            print(f"{name:>7} {first:>12.3f} {total:>8.2f} {size / 1e6:>8.1f} {peak / 1e6:>8.1f}")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
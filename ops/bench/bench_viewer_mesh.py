@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+3D viewer mesh benchmark — extraction time, peak Python memory and
+stored/served size for a large .3mf model, DOM + JSON vs streamed
+NumPy extraction + binary buffer (modules/models_library/mesh.py).
+
+Builds a .3mf holding a closed UV sphere of about --triangles triangles,
+then times:
+
+  legacy  the old extract_mesh_from_3mf(): the whole .model parsed into
+          a DOM, every vertex/triangle walked into Python lists, every
+          Nth triangle kept, floats rounded one by one, json.dumps().
+  binary  mesh.extract() as shipped: expat into arrays, vertex
+          clustering, quantized binary buffer.
+
+Memory is measured in a separate run: tracemalloc slows XML parsing.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_viewer_mesh.py                      # 500k triangles
+    python ops/bench/bench_viewer_mesh.py --triangles 2000000
+"""
+
+import argparse
+import io
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import zipfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+
+def _build_3mf(triangles):
+    import numpy as np
+
+    n = int((triangles / 2) ** 0.5) + 1
+    th, ph = np.meshgrid(np.linspace(0.01, np.pi - 0.01, n), np.linspace(0, 2 * np.pi, n, endpoint=False),
+                         indexing="ij")
+    v = np.stack([np.sin(th) * np.cos(ph), np.sin(th) * np.sin(ph), np.cos(th)], -1).reshape(-1, 3) * 60
+    idx = np.arange(n * n).reshape(n, n)
+    a, b = idx[:-1], idx[1:]
+    c, d = np.roll(b, -1, 1), np.roll(a, -1, 1)
+    t = np.concatenate([np.stack([a, b, c], -1).reshape(-1, 3), np.stack([a, c, d], -1).reshape(-1, 3)])
+    parts = [f'<?xml version="1.0" encoding="UTF-8"?><model unit="millimeter" xmlns="{NS}">'
+             '<resources><object id="1" type="model"><mesh><vertices>']
+    parts += [f'<vertex x="{x:.6f}" y="{y:.6f}" z="{z:.6f}"/>' for x, y, z in v.tolist()]
+    parts.append("</vertices><triangles>")
+    parts += [f'<triangle v1="{p}" v2="{q}" v3="{r}"/>' for p, q, r in t.tolist()]
+    parts.append("</triangles></mesh></object></resources></model>")
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("3D/3dmodel.model", "".join(parts))
+    return buf.getvalue(), len(t)
+
+
+def _legacy(zf):
+    """extract_mesh_from_3mf() before streaming, returning the stored JSON."""
+    from defusedxml import ElementTree as ET
+
+    ns = {"m": NS}
+    root = ET.fromstring(zf.read("3D/3dmodel.model").decode("utf-8"))
+    all_vertices, all_triangles, offset = [], [], 0
+    for mesh in root.findall(".//m:mesh", ns):
+        local = []
+        for v in mesh.find("m:vertices", ns).findall("m:vertex", ns):
+            local.extend([float(v.get("x", 0)), float(v.get("y", 0)), float(v.get("z", 0))])
+        for t in mesh.find("m:triangles", ns).findall("m:triangle", ns):
+            all_triangles.extend([int(t.get("v1", 0)) + offset, int(t.get("v2", 0)) + offset,
+                                  int(t.get("v3", 0)) + offset])
+        all_vertices.extend(local)
+        offset += len(local) // 3
+    num_tris = len(all_triangles) // 3
+    if num_tris > 50000:
+        step = (num_tris // 50000) + 1
+        decimated, used = [], set()
+        for i in range(0, len(all_triangles), step * 3):
+            if i + 2 < len(all_triangles):
+                tri = all_triangles[i:i + 3]
+                decimated.extend(tri)
+                used.update(tri)
+        vert_map, compact = {}, []
+        for new_idx, old_idx in enumerate(sorted(used)):
+            vert_map[old_idx] = new_idx
+            compact.extend(all_vertices[old_idx * 3:old_idx * 3 + 3])
+        all_vertices, all_triangles = compact, [vert_map.get(t, 0) for t in decimated]
+    all_vertices = [round(v, 3) for v in all_vertices]
+    return json.dumps({"vertices": all_vertices, "triangles": all_triangles,
+                       "vertex_count": len(all_vertices) // 3, "triangle_count": len(all_triangles) // 3}).encode()
+
+
+def _binary(zf):
+    from modules.models_library import mesh
+
+    return mesh.extract(zf)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--triangles", type=int, default=500_000, help="triangles in the model")
+    ap.add_argument("--repeat", type=int, default=3, help="runs per mode (median reported)")
+    args = ap.parse_args()
+
+    import gzip
+
+    data, triangles = _build_3mf(args.triangles)
+    print(f"{triangles} triangles, {len(data) / 1e6:.1f} MB .3mf")
+    print(f"{'mode':>7} {'s':>8} {'peak MB':>8} {'stored KB':>10} {'gzip KB':>8}")
+    for name, fn in (("legacy", _legacy), ("binary", _binary)):
+        times = []
+        for _ in range(args.repeat):
+            with zipfile.ZipFile(io.BytesIO(data)) as zf:
+                started = time.perf_counter()
+                out = fn(zf)
+                times.append(time.perf_counter() - started)
+        with zipfile.ZipFile(io.BytesIO(data)) as zf:
+            tracemalloc.start()
+            fn(zf)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        print(f"{name:>7} {statistics.median(times):>8.2f} {peak / 1e6:>8.1f} {len(out) / 1e3:>10.0f} "
+              f"{len(gzip.compress(out)) / 1e3:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
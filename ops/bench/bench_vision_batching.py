@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Vision inference benchmark — frames/sec and per-frame latency for many
+camera printers, per-thread inference vs the batching scheduler
+(modules/vision/inference_scheduler.py).
+
+--printers threads each analyse frames back to back (720p, three
+detection models of one input size), for --seconds per mode:
+
+  legacy   the old path: every thread calls infer() once per model, each
+           call resizing and normalizing the frame again and running its
+           own session call with 2 intra-op threads.
+  batched  engine.start() + detect(): one request per frame, micro-
+           batched across threads, one session call per model per batch
+           using every core.
+
+The models are YOLOv8-shaped convolution stacks written out as ONNX by
+this script (no onnx package needed), lighter than a real detector;
+--width sets their compute per frame. Per-frame postprocessing is the
+same in both modes.
+
+Usage (from the repo root, no container needed; needs onnxruntime, cv2):
+    python ops/bench/bench_vision_batching.py                       # 30 printers
+    python ops/bench/bench_vision_batching.py --printers 8 --width 32
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+TYPES = ["spaghetti", "first_layer", "detachment"]
+
+
+# Minimal protobuf writer for the few ONNX messages the model needs.
+
+def _varint(n):
+    out = bytearray()
+    while True:
+        b, n = n & 0x7F, n >> 7
+        out.append(b | 0x80 if n else b)
+        if not n:
+            return bytes(out)
+
+
+def _field(num, value):
+    """Protobuf field: int -> varint, bytes/str -> length-delimited."""
+    if isinstance(value, int):
+        return _varint(num << 3) + _varint(value)
+    if isinstance(value, str):
+        value = value.encode()
+    return _varint(num << 3 | 2) + _varint(len(value)) + value
+
+
+def _tensor(name, arr, data_type=1):  # TensorProto: dims, data_type, name, raw_data
+    return (b"".join(_field(1, d) for d in arr.shape) + _field(2, data_type) + _field(8, name)
+            + _field(9, arr.tobytes()))
+
+
+def _value_info(name, dims):  # ValueInfoProto -> TypeProto.Tensor(float, shape)
+    shape = b"".join(_field(1, _field(1, d) if isinstance(d, int) else _field(2, d)) for d in dims)
+    return _field(1, name) + _field(2, _field(1, _field(1, 1) + _field(2, shape)))
+
+
+def _node(op, inputs, outputs, **ints):  # NodeProto with INTS attributes
+    out = b"".join(_field(1, i) for i in inputs) + b"".join(_field(2, o) for o in outputs) + _field(4, op)
+    for k, v in ints.items():
+        out += _field(5, _field(1, k) + b"".join(_field(8, x) for x in v) + _field(20, 7))
+    return out
+
+
+def yolo_model(width, seed, stride=8):
+    """Conv/ReLU stack ending in a YOLOv8-style (batch, 4+1, boxes) output."""
+    rng = np.random.default_rng(seed)
+    weights = {
+        "w1": rng.standard_normal((width, 3, stride, stride)).astype(np.float32) * 0.05,
+        "w2": rng.standard_normal((width, width, 3, 3)).astype(np.float32) * 0.05,
+        "w3": rng.standard_normal((5, width, 1, 1)).astype(np.float32) * 0.05,
+    }
+    weights["w3"][4] = -np.abs(weights["w3"][4]) * 1000  # low scores: a healthy print, few boxes
+    nodes = [
+        _node("Conv", ["images", "w1"], ["c1"], strides=[stride, stride]),
+        _node("Relu", ["c1"], ["r1"]),
+        _node("Conv", ["r1", "w2"], ["c2"], pads=[1, 1, 1, 1]),
+        _node("Relu", ["c2"], ["r2"]),
+        _node("Conv", ["r2", "w3"], ["c3"]),
+        _node("Reshape", ["c3", "shape"], ["flat"]),
+        _node("Sigmoid", ["flat"], ["output0"]),
+    ]
+    initializers = [_tensor(k, v) for k, v in weights.items()]
+    initializers.append(_tensor("shape", np.array([0, 5, -1], dtype=np.int64), data_type=7))
+    graph = (b"".join(_field(1, n) for n in nodes) + _field(2, "bench")
+             + b"".join(_field(5, t) for t in initializers)
+             + _field(11, _value_info("images", ["batch", 3, "height", "width"]))
+             + _field(12, _value_info("output0", ["batch", 5, "boxes"])))
+    return _field(1, 7) + _field(7, graph) + _field(8, _field(2, 13))  # ir_version 7, opset 13
+
+
+def _legacy_engine(models, input_size):
+    """infer() as it was: per-call preprocessing, 2 intra-op threads per session."""
+    import cv2
+    import onnxruntime as ort
+
+    from modules.vision.inference_engine import VisionInferenceEngine
+
+    sessions = {}
+    for dt, model in models.items():
+        opts = ort.SessionOptions()
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        opts.intra_op_num_threads = 2
+        sessions[dt] = ort.InferenceSession(model, opts, providers=["CPUExecutionProvider"])
+    post = VisionInferenceEngine()
+
+    def analyse(frame, types):
+        out = {}
+        for dt in types:
+            img = cv2.resize(frame, (input_size, input_size)).astype(np.float32) / 255.0
+            blob = np.expand_dims(np.transpose(img, (2, 0, 1)), axis=0)
+            outputs = sessions[dt].run(None, {"images": blob})
+            out[dt] = post._postprocess_yolov8(outputs, frame.shape, input_size)
+        return out
+
+    return analyse, lambda: None
+
+
+def _batched_engine(models, input_size):
+    from modules.vision.inference_engine import VisionInferenceEngine
+
+    engine = VisionInferenceEngine()
+    for dt, model in models.items():
+        engine._load(dt, model, {"id": 1, "name": dt, "input_size": input_size})
+    engine.start()
+    return engine.detect, engine.stop
+
+
+def _run(analyse, printers, seconds, frames):
+    latencies = [[] for _ in range(printers)]
+    stop = threading.Event()
+    barrier = threading.Barrier(printers + 1)
+
+    def printer(i):
+        barrier.wait()
+        n = 0
+        while not stop.is_set():
+            started = time.perf_counter()
+            analyse(frames[(i + n) % len(frames)], TYPES)
+            latencies[i].append(time.perf_counter() - started)
+            n += 1
+
+    threads = [threading.Thread(target=printer, args=(i,), daemon=True) for i in range(printers)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    started = time.perf_counter()
+    time.sleep(seconds)
+    stop.set()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - started
+    flat = sorted(x for per in latencies for x in per)
+    return len(flat) / elapsed, flat
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--printers", type=int, default=30, help="concurrent printer threads")
+    ap.add_argument("--seconds", type=float, default=15, help="run time per mode")
+    ap.add_argument("--input-size", type=int, default=640, help="model input size")
+    ap.add_argument("--width", type=int, default=48, help="model channels (compute per frame)")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (720, 1280, 3), dtype=np.uint8) for _ in range(4)]
+    models = {dt: yolo_model(args.width, seed) for seed, dt in enumerate(TYPES)}
+
+    print(f"{args.printers} printers, {len(TYPES)} models at {args.input_size}px, {os.cpu_count()} CPUs")
+    print(f"{'mode':>8} {'frames/s':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for name, factory in (("legacy", _legacy_engine), ("batched", _batched_engine)):
+        analyse, close = factory(models, args.input_size)
+        try:
+            rate, lat = _run(analyse, args.printers, args.seconds, frames)
+        finally:
+            close()
+        p50 = statistics.median(lat) * 1000
+        p95 = lat[int(len(lat) * 0.95)] * 1000
+        print(f"{name:>8} {rate:>9.1f} {p50:>8.0f} {p95:>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+#!/usr/bin/env python3
+"""
+Vision post-processing micro-benchmark — time per frame to turn model
+output into detections, per-box Python loops vs the vectorized
+VisionInferenceEngine post-processing, for both output formats:
+
+  yolov8  (1, 4+nc, 8400) tensor, 640px input, 3 classes
+  obico   boxes (1, 10647, 1, 4) + confs (1, 10647, 1), 416px input
+
+Each format is timed on two frames: "quiet", where nothing reaches the
+0.3 confidence floor (a healthy print), and "busy", where --candidates
+overlapping boxes do and NMS has work to do.
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_vision_postprocess.py
+    python ops/bench/bench_vision_postprocess.py --candidates 2000
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+os.environ.setdefault("JWT_SECRET_KEY", "bench-only")
+
+FRAME = (720, 1280, 3)
+
+
+def _legacy_nms(detections, iou_threshold=0.45):
+    """_nms() as it was: boxes and scores rebuilt from the list of dicts."""
+    boxes = np.array([d['bbox'] for d in detections])
+    scores = np.array([d['confidence'] for d in detections])
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        if order.size == 1:
+            break
+        xx1 = np.maximum(boxes[i, 0], boxes[order[1:], 0])
+        yy1 = np.maximum(boxes[i, 1], boxes[order[1:], 1])
+        xx2 = np.minimum(boxes[i, 2], boxes[order[1:], 2])
+        yy2 = np.minimum(boxes[i, 3], boxes[order[1:], 3])
+        inter = np.maximum(0, xx2 - xx1) * np.maximum(0, yy2 - yy1)
+        area_i = (boxes[i, 2] - boxes[i, 0]) * (boxes[i, 3] - boxes[i, 1])
+        area_rest = (boxes[order[1:], 2] - boxes[order[1:], 0]) * (boxes[order[1:], 3] - boxes[order[1:], 1])
+        iou = inter / (area_i + area_rest - inter + 1e-6)
+        order = order[np.where(iou <= iou_threshold)[0] + 1]
+    return [detections[i] for i in keep]
+
+
+def _legacy_yolov8(outputs, orig_shape, input_size):
+    output = outputs[0]
+    if output.shape[1] < output.shape[2]:
+        output = np.transpose(output, (0, 2, 1))
+    h_orig, w_orig = orig_shape[:2]
+    scale_x, scale_y = w_orig / input_size, h_orig / input_size
+    detections = []
+    for pred in output[0]:
+        cx, cy, w, h = pred[:4]
+        class_scores = pred[4:]
+        class_id = int(np.argmax(class_scores))
+        confidence = float(class_scores[class_id])
+        if confidence < 0.3:
+            continue
+        detections.append({
+            'confidence': confidence,
+            'bbox': [float((cx - w / 2) * scale_x), float((cy - h / 2) * scale_y),
+                     float((cx + w / 2) * scale_x), float((cy + h / 2) * scale_y)],
+            'class_id': class_id,
+        })
+    return _legacy_nms(detections) if detections else detections
+
+
+def _legacy_obico(outputs, orig_shape, input_size):
+    boxes, confs = outputs[0].squeeze(), outputs[1].squeeze()
+    h_orig, w_orig = orig_shape[:2]
+    detections = []
+    for i in range(len(confs)):
+        conf = float(confs[i])
+        if conf < 0.3:
+            continue
+        detections.append({
+            'confidence': conf,
+            'bbox': [float(boxes[i, 0]) * w_orig, float(boxes[i, 1]) * h_orig,
+                     float(boxes[i, 2]) * w_orig, float(boxes[i, 3]) * h_orig],
+            'class_id': 0,
+        })
+    return _legacy_nms(detections) if detections else detections
+
+
+def _yolov8_output(candidates, rng, n=8400, classes=3):
+    preds = np.zeros((n, 4 + classes), dtype=np.float32)
+    preds[:, :2] = rng.uniform(0, 640, (n, 2))
+    preds[:, 2:4] = rng.uniform(10, 60, (n, 2))
+    preds[:, 4:] = rng.uniform(0, 0.25, (n, classes))
+    hot = rng.choice(n, candidates, replace=False)
+    centers = rng.uniform(100, 540, (max(1, candidates // 20), 2))
+    preds[hot, :2] = centers[np.arange(candidates) % len(centers)] + rng.normal(0, 6, (candidates, 2))
+    preds[hot, 2:4] = 70 + rng.normal(0, 5, (candidates, 2))
+    preds[hot, 4 + rng.integers(0, classes, candidates)] = rng.uniform(0.3, 0.99, candidates)
+    return [preds.T[None].copy()]
+
+
+def _obico_output(candidates, rng, n=10647):
+    xy = rng.uniform(0, 0.85, (n, 2))
+    boxes = np.concatenate([xy, xy + rng.uniform(0.02, 0.1, (n, 2))], axis=1).astype(np.float32)
+    confs = rng.uniform(0, 0.25, n).astype(np.float32)
+    hot = rng.choice(n, candidates, replace=False)
+    centers = rng.uniform(0.1, 0.8, (max(1, candidates // 20), 2))
+    at = centers[np.arange(candidates) % len(centers)] + rng.normal(0, 0.01, (candidates, 2))
+    boxes[hot] = np.concatenate([at, at + 0.1], axis=1)
+    confs[hot] = rng.uniform(0.3, 0.99, candidates)
+    return [boxes.reshape(1, n, 1, 4), confs.reshape(1, n, 1)]
+
+
+def _time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - started)
+    return statistics.median(times) * 1000, len(out)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--candidates", type=int, default=400, help="boxes above the confidence floor in a busy frame")
+    ap.add_argument("--repeat", type=int, default=20, help="runs per case (median reported)")
+    args = ap.parse_args()
+
+    from modules.vision.inference_engine import VisionInferenceEngine
+
+    engine = VisionInferenceEngine()
+    rng = np.random.default_rng(0)
+    cases = [
+        ("yolov8", 640, _yolov8_output, ["output0"], _legacy_yolov8),
+        ("obico", 416, _obico_output, ["boxes", "confs"], _legacy_obico),
+    ]
+    print(f"{'format':>7} {'frame':>6} {'legacy ms':>10} {'vector ms':>10} {'speedup':>8} {'detections':>11}")
+    for name, size, make, names, legacy in cases:
+        for frame, candidates in (("quiet", 0), ("busy", args.candidates)):
+            outputs = make(candidates, rng)
+            old_ms, old_n = _time(lambda: legacy(outputs, FRAME, size), args.repeat)
+            new_ms, new_n = _time(lambda: engine._postprocess(outputs, names, FRAME, size), args.repeat)
+            assert old_n == new_n, (old_n, new_n)
+            print(f"{name:>7} {frame:>6} {old_ms:>10.2f} {new_ms:>10.3f} {old_ms / new_ms:>7.0f}x {new_n:>11}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+ws_hub transport benchmark — end-to-end event latency and throughput.
+
+Runs the real publisher (push_event) in separate processes, the way the
+monitor daemons do, and the real consumer (ws_hub.consume) in this process,
+the way the API broadcaster does. Reports per-transport:
+
+  - events/sec delivered to the consumer
+  - publish → handler latency (p50 / p95 / p99 / max)
+
+Usage (from the repo root, no container needed):
+    python ops/bench/bench_ws_hub.py
+    python ops/bench/bench_ws_hub.py --events 5000 --publishers 4
+    python ops/bench/bench_ws_hub.py --transport socket --rate 200
+
+--rate paces each publisher (events/sec per process, 0 = as fast as
+possible). A paced run measures latency the way a farm sees it; an
+unpaced run measures the transport's ceiling.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+
+def _configure(transport: str, workdir: str):
+    os.environ["DATABASE_PATH"] = os.path.join(workdir, "odin.db")
+    os.environ["ODIN_WS_SOCKET"] = os.path.join(workdir, "hub.sock")
+    os.environ["ODIN_WS_TRANSPORT"] = transport
+    os.environ["ODIN_WS_DURABLE"] = "1"
+
+    from core import db_utils, ws_hub
+
+    db_utils.DB_PATH = os.environ["DATABASE_PATH"]
+    ws_hub.SOCKET_PATH = os.environ["ODIN_WS_SOCKET"]
+    ws_hub.TRANSPORT = transport
+    ws_hub.DURABLE_FALLBACK = True
+    ws_hub._local_listener = None
+    return ws_hub
+
+
+def _publisher(transport: str, workdir: str, worker: int, count: int, rate: float, start_at: float):
+    ws_hub = _configure(transport, workdir)
+    while time.time() < start_at:
+        time.sleep(0.001)
+    interval = 1.0 / rate if rate else 0.0
+    next_send = time.monotonic()
+    for seq in range(count):
+        if interval:
+            delay = next_send - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            next_send += interval
+        ws_hub.push_event("bench", {"w": worker, "seq": seq, "t": time.time()})
+
+
+async def _consume(ws_hub, expected: int, timeout: float):
+    latencies = []
+    done = asyncio.Event()
+    first = last = None
+
+    async def handler(evt):
+        nonlocal first, last
+        now = time.time()
+        if evt.get("type") != "bench":
+            return
+        first = first or now
+        last = now
+        latencies.append(now - evt["data"]["t"])
+        if len(latencies) >= expected:
+            done.set()
+
+    task = asyncio.create_task(ws_hub.consume(handler))
+    await asyncio.sleep(0.2)  # let the listener bind before publishers start
+    try:
+        await asyncio.wait_for(done.wait(), timeout)
+    except asyncio.TimeoutError:
+        pass
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return latencies, first, last
+
+
+def run(transport: str, events: int, publishers: int, rate: float, timeout: float) -> dict:
+    with tempfile.TemporaryDirectory(prefix="odin-wsbench-") as workdir:
+        ws_hub = _configure(transport, workdir)
+        ws_hub.ensure_table()
+
+        per_worker = events // publishers
+        expected = per_worker * publishers
+        start_at = time.time() + 0.5
+        ctx = multiprocessing.get_context("spawn")
+        procs = [
+            ctx.Process(
+                target=_publisher,
+                args=(transport, workdir, w, per_worker, rate, start_at),
+            )
+            for w in range(publishers)
+        ]
+        for p in procs:
+            p.start()
+        latencies, first, last = asyncio.run(_consume(ws_hub, expected, timeout))
+        for p in procs:
+            p.join()
+
+    received = len(latencies)
+    span = (last - first) if received > 1 else 0.0
+    lat_ms = sorted(x * 1000 for x in latencies) or [0.0]
+
+    def pct(p):
+        return lat_ms[min(len(lat_ms) - 1, int(len(lat_ms) * p))]
+
+    return {
+        "transport": transport,
+        "sent": expected,
+        "received": received,
+        "events_per_sec": received / span if span else float("nan"),
+        "p50_ms": statistics.median(lat_ms),
+        "p95_ms": pct(0.95),
+        "p99_ms": pct(0.99),
+        "max_ms": lat_ms[-1],
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--transport", choices=["socket", "sqlite", "both"], default="both")
+    ap.add_argument("--events", type=int, default=2000, help="total events across all publishers")
+    ap.add_argument("--publishers", type=int, default=4, help="publisher processes (≈ monitor daemons)")
+    ap.add_argument("--rate", type=float, default=0, help="events/sec per publisher, 0 = unpaced")
+    ap.add_argument("--timeout", type=float, default=120, help="give up after this many seconds")
+    args = ap.parse_args()
+
+    transports = ["socket", "sqlite"] if args.transport == "both" else [args.transport]
+    print(f"{'transport':<10} {'sent':>7} {'recv':>7} {'ev/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    for transport in transports:
+        r = run(transport, args.events, args.publishers, args.rate, args.timeout)
+        print(
+            f"{r['transport']:<10} {r['sent']:>7} {r['received']:>7} {r['events_per_sec']:>10.0f} "
+            f"{r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['max_ms']:>9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
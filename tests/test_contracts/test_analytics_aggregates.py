@@ -0,0 +1,163 @@
+"""
+Contract test — SQL-aggregated dashboard analytics (GET /analytics).
+
+get_analytics() used to load every job into Python and look up the
+model of each unpriced job and the jobs of each printer one query at a
+time. It now asks the database for grouped aggregates.
+
+Covers:
+  1. Revenue uses the job's suggested_price, else its model's price with
+     the markup (300% when unset); cost and hours are summed per status.
+  2. Per-printer completed jobs, hours, failures and success rate; the
+     success rate counts jobs charged to any org.
+  3. Jobs created in the last 30 days are grouped by day.
+  4. Org-scoped callers only see jobs charged to their org or to none.
+  5. The number of SQL statements does not grow with jobs, models or
+     printers.
+
+Run without container: pytest tests/test_contracts/test_analytics_aggregates.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.base import Base, JobStatus  # noqa: E402
+from core.db import count_queries  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.jobs.models import Job  # noqa: E402
+from modules.models_library.models import Model  # noqa: E402
+from modules.printers.models import Printer  # noqa: E402
+from modules.reporting.routes.analytics import get_analytics  # noqa: E402
+
+ADMIN = {"role": "admin", "group_id": None}
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'odin.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _seed(db, org=None):
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    p1 = Printer(name="p1", is_active=True)
+    p2 = Printer(name="p2", is_active=True)
+    priced = Model(name="priced", cost_per_item=2.0, markup_percent=200, build_time_hours=1)
+    default_markup = Model(name="default", cost_per_item=1.0, markup_percent=None, build_time_hours=2)
+    db.add_all([p1, p2, priced, default_markup])
+    db.flush()
+
+    def job(status, **kwargs):
+        kwargs.setdefault("created_at", now - timedelta(days=1))
+        db.add(Job(item_name="x", status=status, quantity=kwargs.pop("quantity", 1), **kwargs))
+
+    # Completed on p1: stored price; model price (markup 200%); default markup
+    job(JobStatus.COMPLETED, printer_id=p1.id, suggested_price=10.0, estimated_cost=3.0,
+        quantity=2, duration_hours=4, created_at=now - timedelta(hours=12))
+    job(JobStatus.COMPLETED, printer_id=p1.id, model_id=priced.id, quantity=3, duration_hours=2)
+    job(JobStatus.COMPLETED, printer_id=p2.id, model_id=default_markup.id, duration_hours=1)
+    job(JobStatus.FAILED, printer_id=p1.id)
+    # Charged to another org: hidden from org-scoped totals, still in success rate
+    job(JobStatus.FAILED, printer_id=p2.id, charged_to_org_id=99)
+    job(JobStatus.COMPLETED, printer_id=p2.id, charged_to_org_id=99, suggested_price=100.0,
+        duration_hours=10)
+    # Queue
+    job(JobStatus.PENDING, suggested_price=5.0, estimated_cost=1.0)
+    job(JobStatus.SCHEDULED, model_id=priced.id, quantity=2)
+    job(JobStatus.PENDING, created_at=now - timedelta(days=40))
+    db.commit()
+    return p1, p2
+
+
+class TestTotals:
+    def test_revenue_cost_hours(self, db):
+        _seed(db)
+        summary = get_analytics(db=db, current_user=ADMIN)["summary"]
+        assert summary["total_jobs"] == 9
+        assert summary["completed_jobs"] == 4
+        assert summary["pending_jobs"] == 3
+        # 10*2 + (2*200%)*3 + (1*300%)*1 + 100
+        assert summary["total_revenue"] == 20 + 12 + 3 + 100
+        assert summary["total_cost"] == 6
+        assert summary["total_print_hours"] == 17
+        assert summary["jobs_with_cost_data"] == 2
+        assert summary["projected_revenue"] == 5 + 4 * 2
+        assert summary["projected_cost"] == 1
+
+    def test_org_scope(self, db):
+        _seed(db)
+        summary = get_analytics(db=db, current_user={"role": "viewer", "group_id": 7})["summary"]
+        assert summary["total_jobs"] == 7
+        assert summary["completed_jobs"] == 3
+        assert summary["total_revenue"] == 35
+
+
+class TestPrinters:
+    def test_per_printer(self, db):
+        p1, p2 = _seed(db)
+        stats = {s["id"]: s for s in get_analytics(db=db, current_user={"role": "viewer", "group_id": 7})["printer_stats"]}
+        assert (stats[p1.id]["completed_jobs"], stats[p1.id]["total_hours"], stats[p1.id]["failed_jobs"]) == (2, 6, 1)
+        assert stats[p1.id]["avg_job_hours"] == 3
+        assert stats[p1.id]["success_rate"] == 66.7
+        assert stats[p1.id]["utilization_pct"] > 0
+        # The org-99 jobs are not this org's work but do count toward success rate
+        assert (stats[p2.id]["completed_jobs"], stats[p2.id]["failed_jobs"]) == (1, 1)
+        assert stats[p2.id]["success_rate"] == 66.7
+
+    def test_printer_without_jobs(self, db):
+        idle = Printer(name="idle", is_active=True)
+        db.add(idle)
+        db.commit()
+        stats = get_analytics(db=db, current_user=ADMIN)["printer_stats"]
+        assert stats == [{"id": idle.id, "name": "idle", "completed_jobs": 0, "total_hours": 0,
+                          "utilization_pct": 0, "avg_job_hours": 0, "success_rate": 100,
+                          "failed_jobs": 0, "has_plug": False}]
+
+
+class TestByDate:
+    def test_last_30_days(self, db):
+        _seed(db)
+        by_date = get_analytics(db=db, current_user=ADMIN)["jobs_by_date"]
+        assert sum(d["created"] for d in by_date.values()) == 8
+        assert sum(d["completed"] for d in by_date.values()) == 4
+        assert all(len(k) == 10 and k[4] == "-" for k in by_date)
+
+
+class TestQueryBudget:
+    def test_constant_statement_count(self, db):
+        _seed(db)
+        with count_queries() as small:
+            get_analytics(db=db, current_user=ADMIN)
+        printers = [Printer(name=f"extra-{i}", is_active=True) for i in range(20)]
+        models = [Model(name=f"m{i}", cost_per_item=1.0, build_time_hours=1) for i in range(20)]
+        db.add_all(printers + models)
+        db.flush()
+        for i in range(400):
+            db.add(Job(item_name="bulk", status=JobStatus.COMPLETED if i % 3 else JobStatus.PENDING,
+                       printer_id=printers[i % 20].id, model_id=models[i % 20].id, quantity=1))
+        db.commit()
+        db.expire_all()
+        with count_queries() as large:
+            get_analytics(db=db, current_user=ADMIN)
+        assert large.count == small.count
+        assert large.count <= 6
@@ -0,0 +1,280 @@
+"""
+Contract test — materialized analytics rollups
+(modules/reporting/analytics_rollups.py, reporting migration 002).
+
+Finished jobs, MQTT prints, HMS errors and vision detections are kept as
+hourly and daily rollups; the failure / time-accuracy analytics, the
+per-printer dashboard stats and the failure report read them instead of
+the raw history.
+
+Covers:
+  1. Answers are identical before and after maintain(): rollups plus
+     raw edges cover a window exactly.
+  2. spans() tiles [start, end) with daily, hourly and raw spans that
+     respect the watermarks and hourly retention.
+  3. MTBF from the rolled-up first/last failure times.
+  4. Org-scoped callers only see jobs charged to their org or to none.
+  5. A job.completed event re-rolls a bucket that is already rolled up;
+     resetting, editing or deleting a job re-rolls the bucket it was
+     counted in; rebuild() recomputes everything.
+  6. The number of SQL statements does not grow with the history.
+
+Run without container: pytest tests/test_contracts/test_analytics_rollups.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.base import Base, JobStatus  # noqa: E402
+from core.db import _run_sql_file, count_queries  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.jobs.models import Job  # noqa: E402
+from modules.models_library.models import Model  # noqa: E402
+from modules.printers.models import Printer  # noqa: E402
+from modules.reporting import analytics_rollups as ar  # noqa: E402
+from modules.reporting.routes.analytics import (  # noqa: E402
+    get_failure_analytics, get_stats, get_time_accuracy,
+)
+
+MODULES = BACKEND_DIR / "modules"
+ADMIN = {"role": "admin", "group_id": None}
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    path = tmp_path / "odin.db"
+    eng = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=eng)
+    for module in ("printers", "jobs", "reporting", "vision"):
+        for migration in sorted((MODULES / module / "migrations").glob("*.sql")):
+            _run_sql_file(str(path), migration)
+    monkeypatch.setattr(ar, "_default_engine", lambda: eng)
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _now():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _job(db, status, end, printer=None, start_hours=None, **kwargs):
+    """A finished job; end is a datetime, start_hours the actual run time."""
+    kwargs.setdefault("item_name", "part")
+    job = Job(status=status, printer_id=printer.id if printer else None, actual_end=end,
+              actual_start=end - timedelta(hours=start_hours) if start_hours else None,
+              created_at=end - timedelta(hours=(start_hours or 1) + 1), **kwargs)
+    db.add(job)
+    return job
+
+
+def _seed(db):
+    now = _now()
+    p1, p2 = Printer(name="p1", is_active=True), Printer(name="p2", is_active=True, org_id=7)
+    benchy = Model(name="benchy", build_time_hours=1)
+    db.add_all([p1, p2, benchy])
+    db.flush()
+    for i in range(120):
+        end = now - timedelta(hours=i * 7 + 0.25)
+        failed = i % 4 == 0
+        _job(db, JobStatus.FAILED if failed else JobStatus.COMPLETED, end, printer=(p1, p2)[i % 2],
+             start_hours=1 + i % 3, duration_hours=1.5 + i % 2,
+             model_id=benchy.id if i % 3 else None, item_name=f"item-{i % 5}",
+             filament_type=("PLA", "PETG", None)[i % 3],
+             fail_reason=("spaghetti", None, "adhesion")[i % 3] if failed else None,
+             charged_to_org_id=(None, 7, 99)[i % 3])
+    for i in range(40):
+        at = (now - timedelta(hours=i * 11 + 0.5)).strftime("%Y-%m-%d %H:%M:%S")
+        db.execute(text(
+            "INSERT INTO print_jobs (printer_id, started_at, ended_at, status) VALUES (:p, :s, :e, :st)"
+        ), {"p": (p1, p2)[i % 2].id, "s": at, "e": at, "st": ("completed", "failed")[i % 5 == 0]})
+        db.execute(text(
+            "INSERT INTO hms_error_history (printer_id, code, message, occurred_at) VALUES (:p, :c, :m, :at)"
+        ), {"p": (p1, p2)[i % 2].id, "c": f"0300-{i % 3}", "m": f"msg {i % 3}", "at": at})
+        db.execute(text(
+            "INSERT INTO vision_detections (printer_id, detection_type, confidence, status, created_at) "
+            "VALUES (:p, :t, :c, 'pending', :at)"
+        ), {"p": (p1, p2)[i % 2].id, "t": ("spaghetti", "detachment")[i % 2], "c": 0.5 + i % 5 / 10, "at": at})
+    db.commit()
+    return p1, p2
+
+
+def _answers(db, user=ADMIN):
+    from modules.reporting.report_runner import generate_failure_analysis
+
+    failures = get_failure_analytics(days=30, db=db, current_user=user)
+    for key in ("by_printer", "by_model", "by_filament"):
+        failures[key] = sorted(failures[key], key=lambda r: str(r.get("name", r.get("type"))))
+    accuracy = get_time_accuracy(days=30, db=db, current_user=user)
+    for key in ("by_printer", "by_model"):
+        accuracy[key] = sorted(accuracy[key], key=lambda r: r["name"])
+    stats = get_stats(db=db, current_user=user)["printer_stats"]
+    return failures, accuracy, stats, generate_failure_analysis(db, {})
+
+
+class TestExactness:
+    def test_same_answers_before_and_after_maintain(self, engine, db):
+        _seed(db)
+        viewer = {"role": "viewer", "group_id": 7}
+        raw, raw_viewer = _answers(db), _answers(db, viewer)
+        written = ar.maintain(engine)
+        assert written[ar._series(ar.JOBS, ar.DAY)] > 0
+        assert written[ar._series(ar.JOBS, ar.HOUR)] > 0
+        assert _answers(db) == raw
+        assert _answers(db, viewer) == raw_viewer
+
+    def test_values(self, engine, db):
+        _seed(db)
+        ar.maintain(engine)
+        failures = get_failure_analytics(days=30, db=db, current_user=ADMIN)
+        in_window = [i for i in range(120) if i * 7 + 0.25 < 30 * 24]
+        assert failures["total_failed"] == sum(1 for i in in_window if i % 4 == 0)
+        assert failures["total_completed"] == sum(1 for i in in_window if i % 4)
+        reasons = {r["reason"]: r["count"] for r in failures["top_failure_reasons"]}
+        assert reasons["unspecified"] == sum(1 for i in in_window if i % 4 == 0 and i % 3 == 1)
+        assert {r["code"] for r in failures["hms_errors"]} == {"0300-0", "0300-1", "0300-2"}
+        assert {r["type"] for r in failures["by_filament"]} == {"PLA", "PETG", "unknown"}
+
+        stats = {s["name"]: s for s in get_stats(db=db, current_user=ADMIN)["printer_stats"]}
+        assert stats["p1"]["completed_jobs"] + stats["p2"]["completed_jobs"] == 90 + 32
+        assert stats["p1"]["failed_jobs"] + stats["p2"]["failed_jobs"] == 30 + 8
+
+
+class TestSpans:
+    @pytest.mark.parametrize("start,end,hour_mark,day_mark", [
+        (1000, 10 * ar.DAY + 5000, 9 * ar.DAY + 7200, 9 * ar.DAY),
+        (1000, 10 * ar.DAY + 5000, None, None),
+        (ar.DAY + 10, 3 * ar.DAY, 3 * ar.DAY, 2 * ar.DAY),
+        (5, 3000, 3600, 0),
+    ])
+    def test_tiles_window(self, start, end, hour_mark, day_mark):
+        floor = 5 * ar.DAY
+        spans = ar.spans(start, end, hour_mark, day_mark, floor)
+        assert spans[0][1] == start and spans[-1][2] == end
+        assert all(a[2] == b[1] for a, b in zip(spans, spans[1:]))
+        for resolution, lo, hi in spans:
+            if resolution:
+                assert lo % resolution == 0 and hi % resolution == 0
+            if resolution == ar.DAY:
+                assert hi <= day_mark
+            if resolution == ar.HOUR:
+                assert lo >= floor and hi <= hour_mark
+
+    def test_long_window_reads_days(self):
+        spans = ar.spans(1000, 10 * ar.DAY + 5000, 10 * ar.DAY + 3600, 10 * ar.DAY, 0)
+        assert [r for r, _, _ in spans] == [0, ar.HOUR, ar.DAY, ar.HOUR, 0]
+
+
+class TestMtbf:
+    def test_mean_gap_between_failures(self, engine, db):
+        printer = Printer(name="p", is_active=True)
+        db.add(printer)
+        db.flush()
+        base = _now() - timedelta(days=3)
+        for hours in (0, 2, 6, 30):
+            _job(db, JobStatus.FAILED, base + timedelta(hours=hours), printer=printer)
+        db.commit()
+        ar.maintain(engine)
+        row = get_failure_analytics(days=30, db=db, current_user=ADMIN)["by_printer"][0]
+        assert (row["failed"], row["mtbf_hours"]) == (4, 10.0)
+
+
+class TestOrgScope:
+    def test_other_orgs_hidden(self, engine, db):
+        _seed(db)
+        ar.maintain(engine)
+        scoped = get_failure_analytics(days=30, db=db, current_user={"role": "viewer", "group_id": 7})
+        in_window = [i for i in range(120) if i * 7 + 0.25 < 30 * 24 and i % 3 != 2]
+        assert scoped["total_completed"] + scoped["total_failed"] == len(in_window)
+
+
+class TestRefresh:
+    def test_late_finish_rerolls_bucket(self, engine, db):
+        from core import events as ev
+        from core.event_bus import Event
+
+        printer = Printer(name="p", is_active=True)
+        db.add(printer)
+        db.commit()
+        ar.maintain(engine)
+        late = _job(db, JobStatus.FAILED, _now() - timedelta(days=2), printer=printer)
+        db.commit()
+        assert get_failure_analytics(days=30, db=db, current_user=ADMIN)["total_failed"] == 0
+        ar._on_job_finished(Event(event_type=ev.JOB_FAILED, source_module="jobs", data={"scheduled_job_id": late.id}))
+        assert get_failure_analytics(days=30, db=db, current_user=ADMIN)["total_failed"] == 1
+
+    def test_job_edits_reroll_old_bucket(self, engine, db, monkeypatch):
+        from core.event_bus import InMemoryEventBus
+        from modules.jobs import job_events
+        from modules.jobs.routes import jobs_crud, jobs_lifecycle
+        from modules.jobs.schemas import JobUpdate
+
+        bus = InMemoryEventBus()
+        ar.register_subscribers(bus)
+        monkeypatch.setattr(job_events, "get_event_bus", lambda: bus)
+        p1, p2 = _seed(db)
+        old = _now() - timedelta(days=2)
+        reset, edited, relabelled, deleted = [
+            _job(db, JobStatus.FAILED, old, printer=p1, fail_reason="adhesion") for _ in range(4)
+        ]
+        db.commit()
+        ar.maintain(engine)
+
+        jobs_lifecycle.reset_job(reset.id, current_user=ADMIN, db=db)
+        jobs_crud.update_job(edited.id, JobUpdate(status=JobStatus.COMPLETED, printer_id=p2.id),
+                             current_user=ADMIN, db=db)
+        jobs_lifecycle.update_job_failure(relabelled.id, request=None, current_user=ADMIN, db=db,
+                                          data={"fail_reason": "spaghetti"})
+        jobs_crud.delete_job(deleted.id, current_user=ADMIN, db=db)
+
+        rolled = _answers(db)
+        ar.rebuild(engine)
+        assert rolled == _answers(db)
+
+    def test_rebuild(self, engine, db):
+        _seed(db)
+        ar.maintain(engine)
+        before = _answers(db)
+        db.execute(text("UPDATE analytics_job_rollup SET jobs = jobs * 2"))
+        db.commit()
+        assert _answers(db) != before
+        ar.rebuild(engine)
+        assert _answers(db) == before
+
+
+class TestQueryBudget:
+    def test_constant_statement_count(self, engine, db):
+        p1, p2 = _seed(db)
+        ar.maintain(engine)
+        with count_queries() as small:
+            get_failure_analytics(days=30, db=db, current_user=ADMIN)
+        for i in range(500):
+            _job(db, JobStatus.COMPLETED, _now() - timedelta(hours=i + 1), printer=(p1, p2)[i % 2],
+                 model_id=None, item_name=f"bulk-{i}")
+        db.commit()
+        ar.maintain(engine)
+        with count_queries() as large:
+            get_failure_analytics(days=30, db=db, current_user=ADMIN)
+        assert large.count == small.count
@@ -0,0 +1,179 @@
+"""
+Contract test — verified scoped-token cache (core/token_cache.py).
+
+Every `odin_` request used to bcrypt-verify (12 rounds, ~250 ms) each
+`api_tokens` row sharing the token's 10-char prefix — once in
+get_current_user and again in the idempotency middleware — and commit a
+`last_used_at` UPDATE. This pins:
+
+  1. bcrypt runs once per token per TTL, not once per request.
+  2. A revoked or re-hashed token is rejected on the next request even
+     while its verification is cached.
+  3. TTL expiry and explicit invalidation force re-verification.
+  4. last_used_at writes are batched and throttled.
+  5. dependencies.py and the idempotency middleware both go through the
+     shared resolver.
+
+Run without container: pytest tests/test_contracts/test_api_token_cache.py -v
+"""
+
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy", reason="SQLAlchemy not installed")
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core import token_cache  # noqa: E402
+from core.auth import hash_password  # noqa: E402
+
+TOKEN = "odin_" + "a" * 43
+OTHER = "odin_" + "b" * 43
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE api_tokens (id INTEGER PRIMARY KEY, user_id INTEGER, name TEXT, "
+            "token_hash TEXT, token_prefix TEXT, scopes TEXT, expires_at DATETIME, "
+            "last_used_at DATETIME)"
+        ))
+        conn.execute(
+            text("INSERT INTO api_tokens (id, user_id, name, token_hash, token_prefix, scopes) "
+                 "VALUES (1, 7, 't', :h, :p, '[\"agent:read\"]')"),
+            {"h": hash_password(TOKEN), "p": TOKEN[:10]},
+        )
+    session = sessionmaker(bind=engine)()
+    token_cache.clear()
+    yield session
+    session.close()
+    token_cache.clear()
+
+
+def _counting_verify():
+    from core import auth
+    real = auth.verify_password
+    calls = []
+
+    def verify(plain, hashed):
+        calls.append(plain)
+        return real(plain, hashed)
+
+    return patch.object(auth, "verify_password", verify), calls
+
+
+class TestResolve:
+    def test_bcrypt_runs_once_per_token(self, db):
+        patcher, calls = _counting_verify()
+        with patcher:
+            for _ in range(5):
+                row = token_cache.resolve_api_token(db, TOKEN)
+                assert row is not None and row.user_id == 7
+        assert len(calls) == 1
+
+    def test_wrong_token_not_cached(self, db):
+        patcher, calls = _counting_verify()
+        with patcher:
+            assert token_cache.resolve_api_token(db, OTHER) is None
+            assert token_cache.resolve_api_token(db, OTHER) is None
+        # Different prefix — no candidate rows, so bcrypt never runs.
+        assert calls == []
+        assert token_cache._cache == {}
+
+    def test_non_odin_key_is_ignored(self, db):
+        assert token_cache.resolve_api_token(db, "global-api-key") is None
+
+    def test_revoked_token_rejected_while_cached(self, db):
+        assert token_cache.resolve_api_token(db, TOKEN) is not None
+        db.execute(text("DELETE FROM api_tokens WHERE id = 1"))
+        db.commit()
+        assert token_cache.resolve_api_token(db, TOKEN) is None
+        assert token_cache._cache == {}
+
+    def test_rehashed_row_forces_reverify(self, db):
+        assert token_cache.resolve_api_token(db, TOKEN) is not None
+        db.execute(text("UPDATE api_tokens SET token_hash = :h WHERE id = 1"),
+                   {"h": hash_password(OTHER)})
+        db.commit()
+        assert token_cache.resolve_api_token(db, TOKEN) is None
+
+    def test_ttl_expiry_reverifies(self, db):
+        patcher, calls = _counting_verify()
+        with patcher:
+            token_cache.resolve_api_token(db, TOKEN)
+            with patch.object(token_cache, "_TOKEN_CACHE_TTL_SECONDS", 0):
+                token_cache.resolve_api_token(db, TOKEN)
+        assert len(calls) == 2
+
+    def test_invalidate_token_and_user(self, db):
+        patcher, calls = _counting_verify()
+        with patcher:
+            token_cache.resolve_api_token(db, TOKEN)
+            token_cache.invalidate_token(1)
+            token_cache.resolve_api_token(db, TOKEN)
+            token_cache.invalidate_user(7)
+            token_cache.resolve_api_token(db, TOKEN)
+            token_cache.invalidate_user(99)  # unrelated user — no effect
+            token_cache.resolve_api_token(db, TOKEN)
+        assert len(calls) == 3
+
+    def test_cache_is_bounded(self, db):
+        with patch.object(token_cache, "_TOKEN_CACHE_MAX_ENTRIES", 2):
+            row = db.execute(text("SELECT * FROM api_tokens")).fetchone()
+            for i in range(5):
+                token_cache._cache_put(f"digest-{i}", row)
+            assert list(token_cache._cache) == ["digest-3", "digest-4"]
+
+    def test_raw_token_not_used_as_key(self, db):
+        token_cache.resolve_api_token(db, TOKEN)
+        assert TOKEN not in token_cache._cache
+        assert all(len(k) == 64 for k in token_cache._cache)
+
+
+class TestUsageBatching:
+    def test_first_flush_writes_then_throttles(self, db):
+        token_cache.record_token_use(1)
+        assert token_cache.flush_token_usage(db) == 1
+        assert db.execute(text("SELECT last_used_at FROM api_tokens")).scalar() is not None
+
+        token_cache.record_token_use(1)
+        assert token_cache.flush_token_usage(db) == 0  # within interval
+        assert token_cache.flush_token_usage(db, force=True) == 1
+
+    def test_repeat_uses_collapse_to_one_row(self, db):
+        for _ in range(50):
+            token_cache.record_token_use(1)
+        assert token_cache.flush_token_usage(db, force=True) == 1
+
+    def test_failed_flush_requeues(self, db):
+        token_cache.record_token_use(1)
+        with patch.object(db, "execute", side_effect=RuntimeError("database is locked")):
+            assert token_cache.flush_token_usage(db, force=True) == 0
+        assert 1 in token_cache._pending_usage
+        assert token_cache.flush_token_usage(db, force=True) == 1
+
+
+class TestCallersShareResolver:
+    """Source-level — both auth layers must use the cached resolver."""
+
+    def test_dependencies_uses_resolver(self):
+        src = (BACKEND_DIR / "core" / "dependencies.py").read_text()
+        assert "resolve_api_token(db, api_key)" in src
+        assert "verify_password(" not in src
+        assert "UPDATE api_tokens SET last_used_at" not in src
+
+    def test_idempotency_uses_resolver(self):
+        src = (BACKEND_DIR / "core" / "middleware" / "idempotency.py").read_text()
+        assert src.count("resolve_api_token(db,") == 2
+        assert "verify_password(" not in src
+        assert "dateutil" not in src
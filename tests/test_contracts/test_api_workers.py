@@ -0,0 +1,208 @@
+"""
+Contract test — multi-worker API coordination (core/workers.py).
+
+With ODIN_API_WORKERS > 1 every uvicorn worker binds its own ws_hub socket
+and relies on core/workers.py for what used to be implicitly shared by a
+single process.
+
+Covers:
+  1. Single-worker mode: listener binds ODIN_WS_SOCKET itself, propagate()
+     sends nothing, startup_lock() is a no-op and the worker is the leader.
+  2. Multi-worker mode: a monitor event reaches every worker's socket.
+  3. Sockets left behind by dead workers are removed by publishers.
+  4. Control messages run the registered handler and never reach the
+     WebSocket queue; handlers don't echo them back.
+  5. Only one worker holds the leader lock.
+
+Run without container: pytest tests/test_contracts/test_api_workers.py -v
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core import db_utils, workers, ws_hub  # noqa: E402
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    """Point ws_hub at a throwaway DB and socket path, single worker."""
+    monkeypatch.setattr(db_utils, "DB_PATH", str(tmp_path / "odin.db"))
+    monkeypatch.setattr(ws_hub, "SOCKET_PATH", str(tmp_path / "hub.sock"))
+    monkeypatch.setattr(ws_hub, "TRANSPORT", "socket")
+    monkeypatch.setattr(ws_hub, "DURABLE_FALLBACK", True)
+    monkeypatch.setattr(ws_hub, "_local_listener", None)
+    monkeypatch.setattr(workers, "WORKERS", 1)
+    monkeypatch.setattr(workers, "LOCK_DIR", str(tmp_path))
+    monkeypatch.setattr(workers, "_leader_fd", None)
+    monkeypatch.setattr(workers, "_handlers", {})
+    ws_hub.ensure_table()
+    ws_hub._publisher._targets_at = 0.0
+    yield ws_hub
+    ws_hub._publisher.close()
+    if workers._leader_fd is not None:
+        os.close(workers._leader_fd)
+        workers._leader_fd = None
+
+
+@pytest.fixture
+def multi(hub, monkeypatch):
+    monkeypatch.setattr(workers, "WORKERS", 2)
+    return hub
+
+
+def _publish_from_monitor(hub, event_type, data):
+    listener = hub._local_listener
+    hub._local_listener = None
+    try:
+        hub.push_event(event_type, data)
+    finally:
+        hub._local_listener = listener
+
+
+class TestSingleWorker:
+    def test_listener_binds_shared_path(self, hub):
+        assert hub.listener_path() == hub.SOCKET_PATH
+
+    def test_propagate_sends_nothing(self, hub, monkeypatch):
+        sent = []
+        monkeypatch.setattr(ws_hub, "send_to_workers", sent.append)
+        workers.propagate("anything", 1)
+        assert sent == []
+
+    def test_is_leader_without_lock_file(self, hub, tmp_path):
+        assert workers.is_leader()
+        assert workers._leader_fd is None
+        with workers.startup_lock():
+            pass
+        assert not list(tmp_path.glob("*.lock"))
+
+
+class TestMultiWorkerFanOut:
+    def test_listener_path_is_per_worker(self, multi):
+        assert multi.listener_path() == f"{multi.SOCKET_PATH}.{os.getpid()}"
+
+    def test_event_reaches_every_worker(self, multi):
+        async def run():
+            a = multi.EventListener(f"{multi.SOCKET_PATH}.101")
+            b = multi.EventListener(f"{multi.SOCKET_PATH}.102")
+            a.start()
+            b.start()
+            try:
+                _publish_from_monitor(multi, "printer_telemetry", {"printer_id": 7})
+                return await a.next_batch(timeout=2), await b.next_batch(timeout=2)
+            finally:
+                a.close()
+                b.close()
+
+        got_a, got_b = asyncio.run(run())
+        expected = [{"type": "printer_telemetry", "data": {"printer_id": 7}}]
+        assert got_a == expected
+        assert got_b == expected
+
+    def test_in_process_publish_reaches_siblings_once(self, multi):
+        async def run():
+            sibling = multi.EventListener(f"{multi.SOCKET_PATH}.101")
+            sibling.start()
+            own = multi.EventListener(f"{multi.SOCKET_PATH}.102")
+            own.start()
+            try:
+                assert multi._local_listener is own
+                multi.push_event("alert_new", {"id": 3})
+                return await own.next_batch(timeout=2), await sibling.next_batch(timeout=2)
+            finally:
+                own.close()
+                sibling.close()
+
+        own_batch, sibling_batch = asyncio.run(run())
+        assert own_batch == [{"type": "alert_new", "data": {"id": 3}}]
+        assert sibling_batch == [{"type": "alert_new", "data": {"id": 3}}]
+
+    def test_dead_worker_socket_is_removed(self, multi):
+        stale = f"{multi.SOCKET_PATH}.999"
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        sock.bind(stale)
+        sock.close()  # bound path left behind, nobody reading
+
+        _publish_from_monitor(multi, "job_started", {"job_id": 1})
+        assert not Path(stale).exists()
+        # Nobody listening at all: durable fallback still applies.
+        events, _ = multi.read_events_since(0)
+        assert [e["type"] for e in events] == ["job_started"]
+
+
+class TestControlMessages:
+    def _control(self, name, *args, origin=0):
+        return json.dumps({
+            "type": workers.CONTROL_EVENT,
+            "data": {"name": name, "args": list(args), "origin": origin},
+        })
+
+    def test_control_runs_handler_not_websocket(self, multi):
+        calls = []
+        workers.on("test.invalidate", calls.append)
+
+        async def run():
+            listener = multi.EventListener(f"{multi.SOCKET_PATH}.101")
+            listener.start()
+            try:
+                multi._publisher.send(self._control("test.invalidate", 42).encode(), listener.path)
+                return await listener.next_batch(timeout=0.3)
+            finally:
+                listener.close()
+
+        assert asyncio.run(run()) == []
+        assert calls == [42]
+
+    def test_own_messages_are_ignored(self, multi):
+        calls = []
+        workers.on("test.invalidate", calls.append)
+        workers.apply({"name": "test.invalidate", "args": [1], "origin": os.getpid()})
+        assert calls == []
+
+    def test_handler_does_not_echo(self, multi, monkeypatch):
+        sent = []
+        monkeypatch.setattr(ws_hub, "send_to_workers", sent.append)
+
+        def handler(user_id):
+            workers.propagate("test.invalidate", user_id)
+
+        workers.on("test.invalidate", handler)
+        workers.apply({"name": "test.invalidate", "args": [5], "origin": 0})
+        assert sent == []
+        handler(5)
+        assert len(sent) == 1
+
+    def test_failing_handler_is_contained(self, multi):
+        def boom():
+            raise RuntimeError("nope")
+
+        workers.on("test.boom", boom)
+        workers.apply({"name": "test.boom", "args": [], "origin": 0})
+        workers.apply({"name": "test.unknown", "args": [], "origin": 0})
+        workers.apply("not a dict")
+
+
+class TestLeader:
+    def test_only_one_leader(self, multi, tmp_path):
+        pytest.importorskip("fcntl")
+        assert workers.is_leader()
+        # A second worker process would find the lock held.
+        import fcntl
+
+        fd = os.open(tmp_path / "odin_api_leader.lock", os.O_RDWR)
+        try:
+            with pytest.raises(OSError):
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        finally:
+            os.close(fd)
+        assert workers.is_leader()
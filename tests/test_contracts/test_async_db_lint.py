@@ -0,0 +1,167 @@
+"""
+Contract test — no synchronous database work on the event loop.
+
+FastAPI runs plain `def` handlers and dependencies in its threadpool but
+runs `async def` ones directly on the event loop. ~170 route handlers
+were declared `async def` while doing blocking SQLAlchemy work (often
+only because they awaited `request.json()` or `file.read()`), so one slow
+SQLite query stalled every other request, the WebSocket broadcaster and
+the monitors' event bus. This gate pins:
+
+  1. No `async def` anywhere in backend/ calls a Session method
+     (db.execute / query / commit / ...) directly, or hands `db` to a
+     helper, except through run_in_threadpool / asyncio.to_thread.
+     Nested `def`s and lambdas are skipped — they are what gets offloaded.
+  2. The scanner actually catches the patterns it is meant to catch.
+  3. get_json_body lets a plain-`def` handler take a free-form JSON body.
+
+Run without container: pytest tests/test_contracts/test_async_db_lint.py -v
+"""
+
+import ast
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_SESSION_NAMES = {"db", "_db", "session"}
+_SESSION_METHODS = {
+    "execute", "query", "commit", "add", "add_all", "flush", "get", "delete",
+    "refresh", "rollback", "scalar", "scalars", "merge", "close",
+}
+_OFFLOADERS = {"run_in_threadpool", "to_thread", "run_sync", "run_in_executor"}
+
+
+def _loop_nodes(fn: ast.AsyncFunctionDef):
+    """Nodes that execute on the event loop when `fn` runs.
+
+    Nested functions, lambdas and classes are skipped: their bodies only
+    run when called, and calling them from the coroutine is itself a node
+    we do visit.
+    """
+    stack = list(fn.body)
+    while stack:
+        node = stack.pop()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+            continue
+        yield node
+        stack.extend(ast.iter_child_nodes(node))
+
+
+def _violations(source: str) -> list[tuple[int, str, str]]:
+    """Return [(line, function, offending call)] for blocking DB use in coroutines."""
+    tree = ast.parse(source)
+    found = []
+    for fn in ast.walk(tree):
+        if not isinstance(fn, ast.AsyncFunctionDef):
+            continue
+        for node in _loop_nodes(fn):
+            if not isinstance(node, ast.Call):
+                continue
+            func = node.func
+            name = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+            if name in _OFFLOADERS:
+                continue
+            direct = (
+                isinstance(func, ast.Attribute)
+                and isinstance(func.value, ast.Name)
+                and func.value.id in _SESSION_NAMES
+                and func.attr in _SESSION_METHODS
+            )
+            passes_session = any(
+                isinstance(arg, ast.Name) and arg.id in _SESSION_NAMES
+                for arg in list(node.args) + [kw.value for kw in node.keywords]
+            )
+            if direct or passes_session:
+                found.append((node.lineno, fn.name, ast.get_source_segment(source, node) or name))
+    return found
+
+
+class TestNoBlockingDbInCoroutines:
+    def test_backend_is_clean(self):
+        offenders = []
+        for py in sorted(BACKEND_DIR.rglob("*.py")):
+            if "tests" in py.parts:
+                continue
+            try:
+                source = py.read_text()
+            except Exception:
+                continue
+            if "async def" not in source:
+                continue
+            for line, fn, call in _violations(source):
+                offenders.append(f"{py.relative_to(BACKEND_DIR)}:{line} {fn}(): {call[:80]}")
+        assert not offenders, (
+            "Synchronous SQLAlchemy work inside `async def` blocks the event loop. "
+            "Make the handler a plain `def` (use Depends(get_json_body) for JSON "
+            "bodies, file.file.read() for uploads), or wrap the DB work in "
+            "`await run_in_threadpool(...)`:\n  " + "\n  ".join(offenders)
+        )
+
+
+class TestScannerSelfCheck:
+    def test_flags_direct_session_call(self):
+        src = (
+            "async def handler(db=None):\n"
+            "    body = await something()\n"
+            "    db.execute('SELECT 1')\n"
+        )
+        assert [v[1] for v in _violations(src)] == ["handler"]
+
+    def test_flags_session_passed_to_helper(self):
+        src = (
+            "async def handler(db=None):\n"
+            "    log_audit(db, 'x')\n"
+            "    load(session=db)\n"
+        )
+        assert len(_violations(src)) == 2
+
+    def test_allows_offloaded_and_nested_work(self):
+        src = (
+            "async def handler(db=None):\n"
+            "    def _tail():\n"
+            "        db.commit()\n"
+            "    await run_in_threadpool(_tail)\n"
+            "    await run_in_threadpool(lambda: db.query(X).all())\n"
+            "    await asyncio.to_thread(prune, db)\n"
+            "def sync_handler(db=None):\n"
+            "    db.execute('SELECT 1')\n"
+        )
+        assert _violations(src) == []
+
+
+class TestJsonBodyDependency:
+    def test_sync_handler_receives_body(self):
+        fastapi = pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+
+        from core.dependencies import get_json_body
+
+        app = fastapi.FastAPI()
+
+        @app.post("/echo")
+        def echo(body: dict = fastapi.Depends(get_json_body)):
+            return {"got": body}
+
+        resp = TestClient(app).post("/echo", json={"a": 1, "b": [2, 3]})
+        assert resp.json() == {"got": {"a": 1, "b": [2, 3]}}
+
+    def test_body_is_free_form_not_a_query_param(self):
+        """Depends(get_json_body) must not make FastAPI expect ?body=..."""
+        fastapi = pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+
+        from core.dependencies import get_json_body
+
+        app = fastapi.FastAPI()
+
+        @app.put("/cfg")
+        def put_cfg(data: dict = fastapi.Depends(get_json_body)):
+            return sorted(data)
+
+        resp = TestClient(app).put("/cfg", json={"z": 1, "y": 2})
+        assert resp.status_code == 200 and resp.json() == ["y", "z"]
@@ -0,0 +1,276 @@
+"""
+Contract test — per-request auth memoization (core/auth_context.py).
+
+An authenticated mutating request used to decode its JWT up to four times
+and run the token_blacklist and users lookups twice (idempotency
+middleware, then get_current_user). This pins:
+
+  1. Within one request, every layer shares one decode, one blacklist
+     lookup and one users lookup via request.state.auth.
+  2. Across requests, blacklist misses and user rows are served from a
+     short-TTL cache; logout / revocation and user changes (role,
+     password, MFA) invalidate it.
+  3. count_queries() counts statements, including those run from worker
+     threads, and the app exposes it per request.
+  4. request.state is shared between @app.middleware layers and
+     dependencies (the assumption the memo relies on).
+
+Run without container: pytest tests/test_contracts/test_auth_context.py -v
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+pytest.importorskip("sqlalchemy", reason="SQLAlchemy not installed")
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+from core import auth_context  # noqa: E402
+from core.auth import create_access_token  # noqa: E402
+from core.db import count_queries  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False}
+    )
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, username TEXT, role TEXT, "
+            "group_id INTEGER, is_active INTEGER DEFAULT 1)"
+        ))
+        conn.execute(text("CREATE TABLE token_blacklist (jti TEXT PRIMARY KEY, expires_at TEXT)"))
+        conn.execute(text(
+            "CREATE TABLE active_sessions (id INTEGER PRIMARY KEY, user_id INTEGER, "
+            "token_jti TEXT, last_seen_at DATETIME)"
+        ))
+        conn.execute(text(
+            "INSERT INTO users (id, username, role, group_id, is_active) "
+            "VALUES (1, 'alice', 'operator', NULL, 1)"
+        ))
+    session = sessionmaker(bind=engine)()
+    auth_context.clear()
+    yield session
+    session.close()
+    auth_context.clear()
+
+
+class _Headers(dict):
+    def get(self, key, default=None):
+        return super().get(key, default)
+
+
+def _request(token=None, cookie=None):
+    headers = _Headers()
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return SimpleNamespace(
+        headers=headers,
+        cookies={"session": cookie} if cookie else {},
+        state=SimpleNamespace(),
+    )
+
+
+def _current_user(req, db, token=None):
+    from core.dependencies import get_current_user
+    return get_current_user(req, token=token, db=db)
+
+
+@pytest.fixture(autouse=True)
+def _no_last_seen_writes():
+    # The gated last_seen UPDATE is covered by test_last_seen_batching;
+    # keep it out of the query counts here.
+    with patch("core.dependencies._should_write_last_seen", return_value=False):
+        yield
+
+
+class TestPerRequestMemo:
+    def test_jwt_decoded_once_per_request(self):
+        token = create_access_token({"sub": "alice"})
+        req = _request()
+        with patch.object(auth_context.jwt, "decode", wraps=auth_context.jwt.decode) as dec:
+            for _ in range(4):
+                assert auth_context.decode_jwt(token, req)["sub"] == "alice"
+        assert dec.call_count == 1
+
+    def test_invalid_token_memoized_as_none(self):
+        req = _request()
+        assert auth_context.decode_jwt("garbage", req) is None
+        assert req.state.auth.jwt == {"garbage": None}
+
+    def test_request_without_state_still_works(self, db):
+        token = create_access_token({"sub": "alice"})
+        assert auth_context.decode_jwt(token, object())["sub"] == "alice"
+
+    def test_idempotency_then_dependency_share_lookups(self, db):
+        """Mutating request: idempotency resolves the user, then the route
+        dependency does. Second layer must not touch the database."""
+        from core.middleware.idempotency import _resolve_user_context
+
+        token = create_access_token({"sub": "alice"})
+        req = _request(token=token)
+        with count_queries() as middleware_layer:
+            ctx = _resolve_user_context(req, db)
+        with count_queries() as dependency_layer:
+            user = _current_user(req, db, token=token)
+
+        assert ctx["id"] == 1 and user["username"] == "alice"
+        # Previously: blacklist + users(username) + users(id) here, then
+        # blacklist + users again in get_current_user.
+        assert middleware_layer.count == 2
+        assert dependency_layer.count == 0
+
+    def test_returned_user_is_a_copy(self, db):
+        token = create_access_token({"sub": "alice"})
+        req = _request(token=token)
+        _current_user(req, db, token=token)["role"] = "admin"
+        assert _current_user(req, db, token=token)["role"] == "operator"
+
+
+class TestCrossRequestCache:
+    def test_repeat_requests_hit_cache(self, db):
+        token = create_access_token({"sub": "alice"})
+        _current_user(_request(token=token), db, token=token)
+        with count_queries() as counter:
+            for _ in range(5):
+                assert _current_user(_request(token=token), db, token=token)["id"] == 1
+        assert counter.count == 0
+
+    def test_ttl_expiry_requeries(self, db):
+        token = create_access_token({"sub": "alice"})
+        _current_user(_request(token=token), db, token=token)
+        with patch.object(auth_context, "_AUTH_CACHE_TTL_SECONDS", 0):
+            with count_queries() as counter:
+                _current_user(_request(token=token), db, token=token)
+        assert counter.count == 2
+
+    def test_mark_revoked_rejects_next_request(self, db):
+        token = create_access_token({"sub": "alice"})
+        jti = auth_context.decode_jwt(token)["jti"]
+        assert _current_user(_request(token=token), db, token=token) is not None
+
+        db.execute(text("INSERT INTO token_blacklist (jti) VALUES (:j)"), {"j": jti})
+        db.commit()
+        auth_context.mark_revoked(jti)
+        assert _current_user(_request(token=token), db, token=token) is None
+
+    def test_blacklisted_jti_found_without_mark(self, db):
+        """A jti revoked by another process is picked up after the TTL."""
+        token = create_access_token({"sub": "alice"})
+        jti = auth_context.decode_jwt(token)["jti"]
+        db.execute(text("INSERT INTO token_blacklist (jti) VALUES (:j)"), {"j": jti})
+        db.commit()
+        assert _current_user(_request(token=token), db, token=token) is None
+        assert jti in auth_context._revoked
+
+    def test_invalidate_user_sees_role_change(self, db):
+        token = create_access_token({"sub": "alice"})
+        _current_user(_request(token=token), db, token=token)
+        db.execute(text("UPDATE users SET role = 'viewer', is_active = 0 WHERE id = 1"))
+        db.commit()
+        assert _current_user(_request(token=token), db, token=token)["role"] == "operator"
+
+        auth_context.invalidate_user(1)
+        user = _current_user(_request(token=token), db, token=token)
+        assert user["role"] == "viewer" and not user["is_active"]
+
+    def test_mfa_changes_invalidate_cached_user(self, db):
+        pytest.importorskip("fastapi")
+        from modules.organizations import routes_auth
+
+        db.execute(text("ALTER TABLE users ADD COLUMN mfa_enabled INTEGER DEFAULT 0"))
+        db.execute(text("ALTER TABLE users ADD COLUMN mfa_secret TEXT"))
+        db.execute(text("UPDATE users SET mfa_enabled = 1, mfa_secret = 'x' WHERE id = 1"))
+        db.commit()
+        token = create_access_token({"sub": "alice"})
+        user = _current_user(_request(token=token), db, token=token)
+        assert routes_auth.mfa_status(current_user=user, db=db) == {"mfa_enabled": True}
+
+        with patch.object(routes_auth, "log_audit"):
+            routes_auth.admin_mfa_disable(1, current_user={"id": 9, "role": "admin"}, db=db)
+        user = _current_user(_request(token=token), db, token=token)
+        assert routes_auth.mfa_status(current_user=user, db=db) == {"mfa_enabled": False}
+
+    def test_invalidate_user_drops_only_that_user(self, db):
+        db.execute(text("INSERT INTO users (id, username, role) VALUES (2, 'bob', 'viewer')"))
+        db.commit()
+        auth_context.get_user_by_username(db, "alice")
+        auth_context.get_user_by_username(db, "bob")
+        auth_context.invalidate_user(1)
+        assert set(auth_context._users) == {("username", "bob"), ("id", 2)}
+
+    def test_cache_is_bounded(self):
+        with patch.object(auth_context, "_AUTH_CACHE_MAX_ENTRIES", 2):
+            for i in range(5):
+                auth_context._bounded_put(auth_context._not_blacklisted, f"jti-{i}", 0.0)
+        assert list(auth_context._not_blacklisted) == ["jti-3", "jti-4"]
+
+
+class TestQueryCounter:
+    def test_counts_statements(self, db):
+        with count_queries() as counter:
+            db.execute(text("SELECT 1")).fetchall()
+            db.execute(text("SELECT 2")).fetchall()
+        assert counter.count == 2
+
+    def test_counts_worker_threads(self, db):
+        async def run():
+            with count_queries() as counter:
+                await asyncio.to_thread(lambda: db.execute(text("SELECT 1")).fetchall())
+            return counter.count
+
+        assert asyncio.run(run()) == 1
+
+    def test_no_counting_outside_block(self, db):
+        with count_queries() as counter:
+            pass
+        db.execute(text("SELECT 1")).fetchall()
+        assert counter.count == 0
+
+    def test_query_count_middleware_registered_outermost(self):
+        import ast
+
+        src = (BACKEND_DIR / "core" / "app.py").read_text()
+        tree = ast.parse(src)
+        fn = next(
+            n for n in ast.walk(tree)
+            if isinstance(n, ast.FunctionDef) and n.name == "_register_http_middleware"
+        )
+        registered = [
+            n.name for n in fn.body
+            if isinstance(n, ast.AsyncFunctionDef) and n.decorator_list
+        ]
+        assert registered[-1] == "query_count"
+        assert "X-Query-Count" in ast.get_source_segment(src, fn)
+
+
+class TestStateSharedAcrossLayers:
+    def test_middleware_memo_visible_to_dependency(self):
+        fastapi = pytest.importorskip("fastapi")
+        from fastapi.testclient import TestClient
+
+        app = fastapi.FastAPI()
+        token = create_access_token({"sub": "alice"})
+
+        @app.middleware("http")
+        async def perimeter(request, call_next):
+            auth_context.decode_jwt(token, request)
+            return await call_next(request)
+
+        @app.get("/probe")
+        async def probe(request: fastapi.Request):
+            return {"memoized": token in request.state.auth.jwt}
+
+        assert TestClient(app).get("/probe").json() == {"memoized": True}
@@ -0,0 +1,183 @@
+"""
+Contract test — streaming CSV exports (core/csv_stream.py).
+
+CSV exports used to render the whole file into memory before sending a
+byte. They now page through the query with yield_per and send the CSV
+in chunks as rows arrive, gzip-encoded when the client accepts it.
+
+Covers:
+  1. iter_csv() renders the same bytes as csv.writer over the whole
+     table, in chunks of about CHUNK_BYTES.
+  2. A 1M-row export is rendered in bounded memory.
+  3. iter_gzip() output decompresses to the input; csv_response() only
+     compresses when the client sends Accept-Encoding: gzip.
+  4. GET /export/jobs streams from the request's session after the
+     endpoint returned, and its peak memory does not grow with the
+     number of jobs.
+
+Run without container: pytest tests/test_contracts/test_csv_streaming.py -v
+"""
+
+import asyncio
+import csv
+import gzip
+import io
+import os
+import sys
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from fastapi import FastAPI  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+from sqlalchemy import create_engine, insert  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from core import csv_stream  # noqa: E402
+from core.base import Base, JobStatus  # noqa: E402
+from core.db import get_db  # noqa: E402
+from core.dependencies import get_current_user  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.jobs.models import Job  # noqa: E402
+from modules.reporting.routes.exports import export_jobs_csv, router  # noqa: E402
+
+ADMIN = {"id": 1, "role": "admin", "group_id": None}
+
+
+def _request(accept_encoding=None):
+    headers = [(b"accept-encoding", accept_encoding.encode())] if accept_encoding else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers, "query_string": b""})
+
+
+def _drain(response, keep=False):
+    """Consume a StreamingResponse body the way the server would."""
+    async def run():
+        chunks = []
+        async for chunk in response.body_iterator:
+            if keep:
+                chunks.append(chunk)
+        return b"".join(chunks)
+    return asyncio.run(run())
+
+
+def _rows(n):
+    return ([i, f"part-{i}", 1.5] for i in range(n))
+
+
+def _rss():
+    return int(Path("/proc/self/statm").read_text().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'odin.db'}")
+    Base.metadata.create_all(bind=eng)
+    yield eng
+    eng.dispose()
+
+
+def _seed_jobs(engine, n):
+    with engine.begin() as conn:
+        for start in range(0, n, 10000):
+            conn.execute(insert(Job), [{"item_name": f"part-{i}", "status": JobStatus.COMPLETED, "quantity": 1,
+                                        "priority": 3, "created_at": datetime(2026, 1, 1)}
+                                       for i in range(start, min(n, start + 10000))])
+
+
+class TestRendering:
+    def test_same_bytes_as_csv_writer(self):
+        expected = io.StringIO()
+        writer = csv.writer(expected)
+        writer.writerow(["ID", "Item Name"])
+        writer.writerows([[i, f"a,b \"{i}\""] for i in range(5000)])
+        chunks = list(csv_stream.iter_csv(["ID", "Item Name"], ([i, f"a,b \"{i}\""] for i in range(5000)),
+                                          chunk_bytes=4096))
+        assert b"".join(chunks).decode() == expected.getvalue()
+        assert len(chunks) > 10
+        assert all(len(c) < 4096 + 200 for c in chunks)
+
+    @pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="needs /proc")
+    def test_million_rows_bounded_memory(self):
+        # RSS rather than tracemalloc, which slows a million-row render down ~6x.
+        start = peak = _rss()
+        size = 0
+        for n, chunk in enumerate(csv_stream.iter_csv(["ID", "Item Name", "Hours"], _rows(1_000_000))):
+            size += len(chunk)
+            if n % 50 == 0:
+                peak = max(peak, _rss())
+        # ~24 MB of CSV went through; the stream never held more than a chunk of it.
+        assert size > 20_000_000
+        assert peak - start < 8 * 1024 * 1024
+
+
+class TestGzip:
+    def test_round_trip(self):
+        data = [b"x" * 1000, b"", b"hello,world\r\n" * 500]
+        assert gzip.decompress(b"".join(csv_stream.iter_gzip(iter(data)))) == b"".join(data)
+
+    def test_negotiation(self):
+        plain = csv_stream.csv_response(["a"], [[1]], "t.csv", _request("br"))
+        assert "content-encoding" not in plain.headers
+        assert _drain(plain, keep=True) == b"a\r\n1\r\n"
+        zipped = csv_stream.csv_response(["a"], [[1]], "t.csv", _request("deflate, gzip;q=0.8"))
+        assert zipped.headers["content-encoding"] == "gzip"
+        assert gzip.decompress(_drain(zipped, keep=True)) == b"a\r\n1\r\n"
+        assert zipped.headers["content-disposition"] == "attachment; filename=t.csv"
+
+
+class TestJobsExport:
+    def test_streams_from_request_session(self, engine):
+        _seed_jobs(engine, 2500)
+        Session = sessionmaker(bind=engine)
+        closed = []
+
+        def override_db():
+            db = Session()
+            try:
+                yield db
+            finally:
+                closed.append(True)
+                db.close()
+
+        app = FastAPI()
+        app.include_router(router, prefix="/api")
+        app.dependency_overrides[get_db] = override_db
+        app.dependency_overrides[get_current_user] = lambda: ADMIN
+        with TestClient(app) as client:
+            resp = client.get("/api/export/jobs", headers={"Accept-Encoding": "gzip"})
+        assert resp.status_code == 200
+        assert resp.headers["content-encoding"] == "gzip"
+        lines = resp.text.splitlines()
+        assert lines[0].startswith("ID,Item Name,")
+        assert len(lines) == 2501
+        assert closed == [True]
+
+    def test_memory_does_not_grow_with_jobs(self, engine):
+        Session = sessionmaker(bind=engine)
+
+        def peak_for(total):
+            _seed_jobs(engine, total - peak_for.seeded)
+            peak_for.seeded = total
+            with Session() as db:
+                tracemalloc.start()
+                _drain(export_jobs_csv(request=_request(), status=None, current_user=ADMIN, db=db))
+                peak = tracemalloc.get_traced_memory()[1]
+                tracemalloc.stop()
+            return peak
+        peak_for.seeded = 0
+
+        small, large = peak_for(2_000), peak_for(20_000)
+        assert large < small * 1.5
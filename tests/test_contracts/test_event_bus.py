@@ -7,6 +7,7 @@ Verifies publish/subscribe/unsubscribe behaviour of InMemoryEventBus including:
 - Handlers for different event types are not cross-triggered.
 - Wildcard ("*") subscribers receive all events.
 - Exceptions in one handler do not block other handlers.
+- ws_hub forwards events to the browser, except bus-internal ones.
 - The singleton get_event_bus() is stable.
 
 These tests run without a container: pytest tests/test_contracts/test_event_bus.py -v
@@ -276,11 +277,13 @@ ALL_EVENT_CONSTANTS = {
 # Events published by the codebase (source -> event_type):
 #   notifications/job_events.py: JOB_STARTED, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
 #   notifications/alert_dispatch.py: "notifications.alert_dispatched" (not in events.py — ad-hoc)
+#   jobs/job_events.py: JOB_EDITED
 PUBLISHED_EVENTS = {
     ev.JOB_STARTED,
     ev.JOB_COMPLETED,
     ev.JOB_FAILED,
     ev.JOB_CANCELLED,
+    ev.JOB_EDITED,
     "notifications.alert_dispatched",
 }
 
@@ -290,11 +293,13 @@ PUBLISHED_EVENTS = {
 #   mqtt_republish: PRINTER_STATE_CHANGED, PRINTER_CONNECTED, PRINTER_DISCONNECTED,
 #                   JOB_STARTED, JOB_COMPLETED, JOB_FAILED, "notifications.alert_dispatched"
 #   archive: JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
+#   analytics_rollups: JOB_COMPLETED, JOB_FAILED, JOB_EDITED
 SUBSCRIBED_EVENTS = {
     ev.JOB_STARTED,
     ev.JOB_COMPLETED,
     ev.JOB_FAILED,
     ev.JOB_CANCELLED,
+    ev.JOB_EDITED,
     ev.PRINTER_STATE_CHANGED,
     ev.PRINTER_CONNECTED,
     ev.PRINTER_DISCONNECTED,
@@ -374,3 +379,15 @@ class TestEventWiring:
         # Verify bus has handlers registered
         assert len(bus._handlers) > 0, "No event handlers registered after wiring"
         assert len(bus._wildcard_handlers) > 0, "No wildcard handlers registered"
+
+    def test_ws_hub_skips_internal_events(self, monkeypatch):
+        """job.edited is for the analytics rollups only; it is not pushed to browsers."""
+        import core.ws_hub as ws_hub
+
+        pushed = []
+        monkeypatch.setattr(ws_hub, "push_event", lambda event_type, data: pushed.append(event_type))
+        bus = _fresh_bus()
+        ws_hub.subscribe_to_bus(bus)
+        bus.publish(_make_event(ev.JOB_EDITED, data={"job_id": 1, "previous_end": None}))
+        bus.publish(_make_event(ev.PRINTER_CONNECTED, data={"printer_id": 1}))
+        assert pushed == [ev.PRINTER_CONNECTED]
@@ -0,0 +1,204 @@
+"""
+Contract test — batched fleet state writes (modules/printers/fleet_state.py).
+
+Monitors no longer UPDATE the printers row per printer per heartbeat. They
+record values in a per-process FleetStateStore that writes only changed
+columns, for every printer, in one transaction per flush.
+
+Covers:
+  1. Only columns that changed since the last write are written.
+  2. One flush is one transaction, however many printers changed.
+  3. last_seen is refreshed at most every _LAST_SEEN_REFRESH seconds.
+  4. A printer still reporting gets a full rewrite every
+     _FULL_WRITE_INTERVAL; a silent one does not.
+  5. lights_on respects the post-toggle cooldown and is retried after it.
+  6. None leaves a column alone unless it is declared nullable.
+  7. A failed flush keeps the changes pending.
+
+Run without container: pytest tests/test_contracts/test_fleet_state.py -v
+"""
+
+import sys
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+
+from modules.printers import fleet_state  # noqa: E402
+
+
+@pytest.fixture
+def engine(tmp_path):
+    eng = create_engine(f"sqlite:///{tmp_path / 'fleet.db'}")
+    with eng.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE printers (id INTEGER PRIMARY KEY, last_seen DATETIME, "
+            "bed_temp REAL, bed_target_temp REAL, nozzle_temp REAL, nozzle_target_temp REAL, "
+            "gcode_state TEXT, print_stage TEXT, hms_errors TEXT, lights_on BOOLEAN, "
+            "lights_toggled_at DATETIME, nozzle_type TEXT, nozzle_diameter REAL, "
+            "fan_speed INTEGER, machine_type TEXT)"
+        ))
+        for pid in (1, 2, 3):
+            conn.execute(text("INSERT INTO printers (id) VALUES (:id)"), {"id": pid})
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def store(engine):
+    return fleet_state.FleetStateStore(engine=engine, autoflush=False)
+
+
+def _updates(engine):
+    """Capture the UPDATE statements and their row counts."""
+    seen = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("UPDATE"):
+            seen.append((statement, len(parameters) if executemany else 1))
+
+    return seen
+
+
+def _row(engine, pid):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT * FROM printers WHERE id=:id"), {"id": pid}).mappings().one()
+
+
+def _backdate(store, pid, seconds):
+    state = store._printers[pid]
+    state.last_seen_written -= seconds
+    state.full_written -= seconds
+
+
+class TestDirtyColumns:
+    def test_first_flush_writes_values_and_last_seen(self, store, engine):
+        store.update(1, {"bed_temp": 60.0, "gcode_state": "RUNNING"})
+        assert store.flush() == 1
+        row = _row(engine, 1)
+        assert row["bed_temp"] == 60.0
+        assert row["gcode_state"] == "RUNNING"
+        assert row["last_seen"] is not None
+
+    def test_unchanged_values_are_not_rewritten(self, store, engine):
+        store.update(1, {"bed_temp": 60.0, "gcode_state": "RUNNING"})
+        store.flush()
+        statements = _updates(engine)
+        store.update(1, {"bed_temp": 60.0, "gcode_state": "RUNNING"})
+        assert store.flush() == 0
+        store.update(1, {"bed_temp": 61.0, "gcode_state": "RUNNING"})
+        assert store.flush() == 1
+        assert len(statements) == 1
+        assert "bed_temp" in statements[0][0]
+        assert "gcode_state" not in statements[0][0]
+        assert "last_seen" not in statements[0][0]
+
+    def test_unknown_column_is_rejected(self, store):
+        with pytest.raises(ValueError):
+            store.update(1, {"api_key": "x"})
+
+    def test_none_keeps_column_unless_nullable(self, store, engine):
+        store.update(1, {"gcode_state": "RUNNING", "hms_errors": "[1]"})
+        store.flush()
+        store.update(1, {"gcode_state": None, "hms_errors": None}, nullable=("hms_errors",))
+        store.flush()
+        row = _row(engine, 1)
+        assert row["gcode_state"] == "RUNNING"
+        assert row["hms_errors"] is None
+
+
+class TestBatching:
+    def test_many_printers_one_transaction(self, store, engine):
+        commits = []
+        event.listen(engine, "commit", lambda conn: commits.append(1))
+        statements = _updates(engine)
+        for pid in (1, 2, 3):
+            store.update(pid, {"bed_temp": 20.0 + pid, "gcode_state": "IDLE"})
+        assert store.flush() == 3
+        assert len(commits) == 1
+        # Same column set -> one executemany
+        assert statements == [(statements[0][0], 3)]
+
+    def test_last_seen_refresh_interval(self, store, engine):
+        store.update(1, {"gcode_state": "IDLE"})
+        store.flush()
+        store.update(1, {"gcode_state": "IDLE"})
+        assert store.flush() == 0
+        store._printers[1].last_seen_written -= fleet_state._LAST_SEEN_REFRESH
+        statements = _updates(engine)
+        assert store.flush() == 1
+        assert statements[0][0].startswith("UPDATE printers SET last_seen=")
+
+    def test_full_rewrite_restores_external_changes(self, store, engine):
+        store.update(1, {"gcode_state": "RUNNING"})
+        store.flush()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE printers SET gcode_state='PAUSE' WHERE id=1"))
+        store.update(1, {"gcode_state": "RUNNING"})
+        store.flush()
+        assert _row(engine, 1)["gcode_state"] == "PAUSE"
+        _backdate(store, 1, fleet_state._FULL_WRITE_INTERVAL)
+        store.flush()
+        assert _row(engine, 1)["gcode_state"] == "RUNNING"
+
+    def test_silent_printer_is_not_rewritten(self, store, engine):
+        store.update(1, {"gcode_state": "RUNNING"})
+        store.flush()
+        with engine.begin() as conn:
+            conn.execute(text("UPDATE printers SET gcode_state='OFFLINE' WHERE id=1"))
+        _backdate(store, 1, fleet_state._FULL_WRITE_INTERVAL)
+        store._printers[1].updated -= fleet_state._FULL_WRITE_INTERVAL
+        assert store.flush() == 0
+        assert _row(engine, 1)["gcode_state"] == "OFFLINE"
+
+
+class TestLightsCooldown:
+    def _toggle(self, engine, seconds_ago):
+        at = (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).replace(tzinfo=None)
+        with engine.begin() as conn:
+            conn.execute(
+                text("UPDATE printers SET lights_on=1, lights_toggled_at=:at WHERE id=1"),
+                {"at": at.isoformat()},
+            )
+
+    def test_recent_toggle_holds_lights(self, store, engine):
+        self._toggle(engine, seconds_ago=1)
+        store.update(1, {"lights_on": False, "bed_temp": 30.0})
+        store.flush()
+        row = _row(engine, 1)
+        assert row["lights_on"] == 1
+        assert row["bed_temp"] == 30.0
+        # Still pending: written on a later flush once the cooldown passes.
+        assert "lights_on" in store._printers[1].dirty
+
+    def test_old_toggle_does_not_hold(self, store, engine):
+        self._toggle(engine, seconds_ago=fleet_state._LIGHTS_COOLDOWN_SECONDS + 5)
+        store.update(1, {"lights_on": False})
+        store.flush()
+        assert _row(engine, 1)["lights_on"] == 0
+
+
+class TestFailure:
+    def test_failed_flush_keeps_changes(self, store, engine, monkeypatch):
+        store.update(1, {"bed_temp": 55.0})
+
+        class Broken:
+            def begin(self):
+                raise sqlalchemy.exc.OperationalError("UPDATE", {}, Exception("locked"))
+
+        monkeypatch.setattr(store, "_engine", Broken())
+        assert store.flush() == 0
+        monkeypatch.setattr(store, "_engine", engine)
+        assert store.flush() == 1
+        assert _row(engine, 1)["bed_temp"] == 55.0
+        assert _row(engine, 1)["last_seen"] is not None
+
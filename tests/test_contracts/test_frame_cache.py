@@ -0,0 +1,170 @@
+"""
+Contract test — shared camera frame cache (core/frame_cache.py).
+
+The vision and timelapse daemons get camera frames through one cache
+shared across processes, instead of each fetching /api/frame.jpeg from
+go2rtc on its own.
+
+Covers:
+  1. A frame younger than max_age is served without a fetch, from any
+     FrameCache on the same directory (i.e. any process); an older one
+     is fetched again and republished.
+  2. Consumers that ask at the same time share a single fetch, sync and
+     asyncio alike.
+  3. Error responses and failed fetches give None and publish nothing.
+  4. The JPEG is decoded lazily, once, and re-reading an unchanged frame
+     keeps the decoded image.
+
+Run without container: pytest tests/test_contracts/test_frame_cache.py -v
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("httpx")
+
+from core import frame_cache  # noqa: E402
+from core.frame_cache import FrameCache  # noqa: E402
+
+
+def _jpeg(value=0):
+    cv2 = pytest.importorskip("cv2")
+    np = pytest.importorskip("numpy")
+    rng = np.random.default_rng(value)
+    ok, buf = cv2.imencode(".jpg", rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+    return buf.tobytes()
+
+
+class FakeGo2rtc:
+    """Stands in for httpx.get / AsyncClient.get, counting requests."""
+
+    def __init__(self, body=None, status=200, delay=0.0):
+        self.body = body if body is not None else b"\xff\xd8" + b"\0" * 2000
+        self.status, self.delay = status, delay
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def _respond(self):
+        with self._lock:
+            self.requests += 1
+        return SimpleNamespace(status_code=self.status, content=self.body)
+
+    def get(self, url, timeout=None):
+        time.sleep(self.delay)
+        return self._respond()
+
+    async def aget(self, url):
+        await asyncio.sleep(self.delay)
+        return self._respond()
+
+
+@pytest.fixture
+def go2rtc(monkeypatch):
+    server = FakeGo2rtc()
+    monkeypatch.setattr(frame_cache.httpx, "get", server.get)
+    return server
+
+
+class TestFreshness:
+    def test_served_from_cache_within_max_age(self, tmp_path, go2rtc):
+        vision, timelapse = FrameCache(tmp_path), FrameCache(tmp_path)
+        first = vision.get(1, max_age=5)
+        assert go2rtc.requests == 1 and first.jpeg == go2rtc.body
+        again = timelapse.get(1, max_age=5)  # another process, same directory
+        assert go2rtc.requests == 1
+        assert again.jpeg == first.jpeg and again.captured_at == pytest.approx(first.captured_at)
+        assert 0 <= again.age < 5
+
+    def test_refetched_when_too_old(self, tmp_path, go2rtc):
+        cache = FrameCache(tmp_path)
+        cache.get(1, max_age=5)
+        go2rtc.body = b"\xff\xd8new" + b"\0" * 2000
+        assert cache.get(1, max_age=0).jpeg == go2rtc.body
+        assert go2rtc.requests == 2
+        assert FrameCache(tmp_path).peek(1).jpeg == go2rtc.body  # republished
+
+    def test_default_max_age_from_env(self, tmp_path, go2rtc, monkeypatch):
+        cache = FrameCache(tmp_path)
+        cache.get(1)
+        monkeypatch.setenv("ODIN_FRAME_MAX_AGE", "0")
+        cache.get(1)
+        assert go2rtc.requests == 2
+
+
+class TestSingleFlight:
+    def test_concurrent_threads_share_one_fetch(self, tmp_path, go2rtc):
+        go2rtc.delay = 0.3
+        results = [None] * 4
+        barrier = threading.Barrier(4)
+
+        def consumer(i):
+            cache = FrameCache(tmp_path)  # one per consumer, like separate processes
+            barrier.wait()
+            results[i] = cache.get(7, max_age=5)
+
+        threads = [threading.Thread(target=consumer, args=(i,)) for i in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=5)
+        assert go2rtc.requests == 1
+        assert all(r is not None and r.jpeg == go2rtc.body for r in results)
+
+    def test_async_waits_for_a_fetch_in_progress(self, tmp_path, go2rtc):
+        go2rtc.delay = 0.3
+        thread = threading.Thread(target=lambda: FrameCache(tmp_path).get(7, max_age=5))
+        thread.start()
+        time.sleep(0.1)  # the thread holds the camera lock now
+        client = SimpleNamespace(get=go2rtc.aget)
+        frame = asyncio.run(FrameCache(tmp_path).aget(7, client, max_age=5))
+        thread.join(timeout=5)
+        assert go2rtc.requests == 1 and frame.jpeg == go2rtc.body
+
+    def test_async_fetch(self, tmp_path, go2rtc):
+        client = SimpleNamespace(get=go2rtc.aget)
+        cache = FrameCache(tmp_path)
+        first = asyncio.run(cache.aget(3, client, max_age=5))
+        assert asyncio.run(cache.aget(3, client, max_age=5)) is first
+        assert go2rtc.requests == 1
+
+
+class TestFailures:
+    @pytest.mark.parametrize("status, body", [(500, b"\xff" * 2000), (200, b"error")])
+    def test_bad_response(self, tmp_path, go2rtc, status, body):
+        go2rtc.status, go2rtc.body = status, body
+        cache = FrameCache(tmp_path)
+        assert cache.get(1) is None
+        assert cache.peek(1) is None
+
+    def test_unreachable(self, tmp_path, monkeypatch):
+        def refuse(url, timeout=None):
+            raise OSError("connection refused")
+
+        monkeypatch.setattr(frame_cache.httpx, "get", refuse)
+        assert FrameCache(tmp_path).get(1) is None
+
+
+class TestDecode:
+    def test_lazy_and_kept(self, tmp_path, go2rtc, monkeypatch):
+        cv2 = pytest.importorskip("cv2")
+        go2rtc.body = _jpeg()
+        decodes = []
+        real = cv2.imdecode
+        monkeypatch.setattr(cv2, "imdecode", lambda *a: decodes.append(1) or real(*a))
+
+        cache = FrameCache(tmp_path)
+        frame = cache.get(1, max_age=5)
+        assert decodes == []
+        assert frame.image.shape == (48, 64, 3)
+        assert cache.get(1, max_age=5).image is frame.image
+        assert decodes == [1]
@@ -119,7 +119,9 @@ def _fake_db(conn: sqlite3.Connection):
 
 @pytest.fixture
 def conn():
-    c = sqlite3.connect(":memory:")
+    # The middleware runs its DB helpers in the threadpool; production
+    # engines set check_same_thread=False for the same reason.
+    c = sqlite3.connect(":memory:", check_same_thread=False)
     _seed_schema(c)
     yield c
     c.close()
@@ -799,7 +801,7 @@ def test_middleware_degrades_when_table_missing(monkeypatch):
     import core.db as db_mod
 
     # Fresh SQLite connection with NO migrations applied (no table).
-    empty_conn = sqlite3.connect(":memory:")
+    empty_conn = sqlite3.connect(":memory:", check_same_thread=False)
     empty_db = _fake_db(empty_conn)
     monkeypatch.setattr(db_mod, "SessionLocal", lambda: empty_db)
 
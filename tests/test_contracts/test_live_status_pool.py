@@ -0,0 +1,184 @@
+"""
+Contract test — live-status snapshots and pooled Bambu sessions.
+
+`GET /printers/{id}/live-status` used to open a new MQTT session per
+request. It now answers from an in-memory snapshot fed by monitor
+telemetry events, and only falls back to a pooled, long-lived session
+when that snapshot is missing or stale.
+
+Covers:
+  1. Monitor `printer_telemetry` events (via ws_hub observers) fill the
+     snapshot; partial reports merge field by field.
+  2. A fresh monitor snapshot is served without connecting.
+  3. A stale or missing snapshot opens one pooled session, reused by
+     later requests and closed once idle.
+  4. Connect failures and silent printers return the legacy error strings.
+  5. Background warm-up backs off after a failed connect.
+  6. printer_columns() maps a current snapshot onto printers columns for
+     readers overlaying the batched printers row.
+
+Run without container: pytest tests/test_contracts/test_live_status_pool.py -v
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core import ws_hub  # noqa: E402
+from modules.printers import live_status  # noqa: E402
+
+CREDS = ("10.0.0.5", "SERIAL", "CODE")
+
+
+class FakeConnection:
+    """Stands in for _PooledConnection — no MQTT, optional first report."""
+
+    opened = []
+    closed = []
+    report = {"gcode_state": "RUNNING", "mc_percent": 42, "bed_temper": 60.0}
+    succeed = True
+
+    def __init__(self, printer_id, creds):
+        self.printer_id = printer_id
+        self.creds = creds
+        self.opened_at = time.monotonic()
+        self.last_used = self.opened_at
+
+    def open(self):
+        FakeConnection.opened.append(self.printer_id)
+        if FakeConnection.succeed and FakeConnection.report:
+            live_status.record_bambu_report(self.printer_id, FakeConnection.report)
+        return FakeConnection.succeed
+
+    def close(self):
+        FakeConnection.closed.append(self.printer_id)
+
+
+@pytest.fixture
+def fresh(monkeypatch):
+    monkeypatch.setattr(live_status, "store", live_status.SnapshotStore())
+    monkeypatch.setattr(live_status, "pool", live_status.ConnectionPool())
+    monkeypatch.setattr(live_status, "_PooledConnection", FakeConnection)
+    monkeypatch.setattr(FakeConnection, "opened", [])
+    monkeypatch.setattr(FakeConnection, "closed", [])
+    monkeypatch.setattr(FakeConnection, "succeed", True)
+    monkeypatch.setattr(FakeConnection, "report", dict(FakeConnection.report))
+    yield live_status
+    live_status.pool.close_all()
+
+
+def _age(printer_id, seconds):
+    snap = live_status.store._snapshots[printer_id]
+    snap.updated_mono -= seconds
+
+
+class TestMonitorSnapshots:
+    def test_observer_records_monitor_event(self, fresh, monkeypatch):
+        monkeypatch.setattr(ws_hub, "_observers", {})
+        ws_hub.observe("printer_telemetry", fresh.record_monitor_event)
+        ws_hub._notify_observers({"type": "printer_telemetry", "data": {
+            "printer_id": 3, "state": "RUNNING", "progress": 10,
+            "current_layer": 5, "gcode_file": "benchy.3mf", "nozzle_temp": 220,
+        }})
+        snap = fresh.store.get(3)
+        body = snap.as_response(3, "P3")
+        assert body["gcode_state"] == "RUNNING"
+        assert body["layer"] == 5
+        assert body["job_name"] == "benchy.3mf"
+        assert body["source"] == "monitor"
+        assert body["age_seconds"] < 1
+
+    def test_partial_reports_merge(self, fresh):
+        fresh.record_bambu_report(1, {"gcode_state": "RUNNING", "mc_percent": 10, "bed_temper": 60})
+        fresh.record_bambu_report(1, {"mc_percent": 11})
+        status = fresh.store.get(1).status
+        assert status == {"gcode_state": "RUNNING", "progress": 11, "bed_temp": 60}
+
+    def test_fresh_monitor_snapshot_skips_connection(self, fresh):
+        fresh.record_monitor_event({"printer_id": 1, "state": "IDLE"})
+        snap, error = fresh.get_snapshot(1, CREDS, timeout=0.1)
+        assert error is None
+        assert snap.status["gcode_state"] == "IDLE"
+        assert FakeConnection.opened == []
+
+
+class TestPooledSessions:
+    def test_stale_snapshot_connects_once_and_reuses(self, fresh):
+        fresh.record_monitor_event({"printer_id": 1, "state": "IDLE"})
+        _age(1, fresh._FRESH_SECONDS + 1)
+
+        snap, error = fresh.get_snapshot(1, CREDS, timeout=0.5)
+        assert error is None
+        assert snap.source == "connection"
+        assert snap.status["gcode_state"] == "RUNNING"
+
+        # Quiet printer, session still open: no new connect, still current.
+        _age(1, fresh._FRESH_SECONDS + 1)
+        fresh.pool._conns[1].opened_at -= fresh._FRESH_SECONDS + 1
+        snap, error = fresh.get_snapshot(1, CREDS, timeout=0.1)
+        assert error is None
+        assert FakeConnection.opened == [1]
+
+    def test_idle_sessions_are_closed(self, fresh):
+        fresh.get_snapshot(1, CREDS, timeout=0.5)
+        assert fresh.pool.close_idle(idle_seconds=3600) == 0
+        assert fresh.pool.close_idle(idle_seconds=0) == 1
+        assert FakeConnection.closed == [1]
+        assert fresh.pool.opened_at(1) is None
+
+    def test_changed_credentials_reconnect(self, fresh):
+        fresh.pool.acquire(1, CREDS)
+        fresh.pool.acquire(1, ("10.0.0.6", "SERIAL", "CODE"))
+        assert FakeConnection.opened == [1, 1]
+        assert FakeConnection.closed == [1]
+
+    def test_connect_failure(self, fresh):
+        FakeConnection.succeed = False
+        assert fresh.get_snapshot(1, CREDS, timeout=0.1) == (None, "Connection failed")
+
+    def test_silent_printer_times_out(self, fresh):
+        FakeConnection.report = {}
+        assert fresh.get_snapshot(1, CREDS, timeout=0.1) == (None, "Timeout waiting for status")
+
+
+class TestWarm:
+    def test_warm_connects_in_background(self, fresh):
+        fresh.pool.warm(1, CREDS)
+        deadline = time.monotonic() + 2
+        while fresh.pool.opened_at(1) is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        snap, current = fresh.cached_snapshot(1)
+        assert current
+        assert snap.status["progress"] == 42
+
+    def test_warm_backs_off_after_failure(self, fresh):
+        FakeConnection.succeed = False
+        assert fresh.pool.acquire(1, CREDS) is False
+        fresh.pool.warm(1, CREDS)
+        time.sleep(0.05)
+        assert FakeConnection.opened == [1]
+
+
+class TestPrinterColumns:
+    def test_current_snapshot_maps_to_columns(self, fresh):
+        assert fresh.printer_columns(1) == {}
+        fresh.record_monitor_event({
+            "printer_id": 1, "state": "RUNNING", "bed_temp": 60.0, "nozzle_target": 220.0,
+        })
+        columns = fresh.printer_columns(1)
+        assert columns["gcode_state"] == "RUNNING"
+        assert columns["bed_temp"] == 60.0
+        assert columns["nozzle_target_temp"] == 220.0
+        assert "nozzle_temp" not in columns
+        assert columns["last_seen"].tzinfo is None
+
+    def test_stale_snapshot_is_not_overlaid(self, fresh):
+        fresh.record_monitor_event({"printer_id": 1, "state": "RUNNING"})
+        _age(1, fresh._FRESH_SECONDS + 1)
+        assert fresh.printer_columns(1) == {}
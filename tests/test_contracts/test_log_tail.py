@@ -0,0 +1,273 @@
+"""
+Contract test — admin log viewer reads (modules/system/log_tail.py).
+
+GET /admin/logs read the whole log from the start to keep the last N
+lines, and /admin/logs/stream polled for new lines every 0.5 s. Tails
+now read backwards from EOF, level and time-window queries go through a
+sidecar index of block offsets, and the stream is woken by inotify.
+
+Covers:
+  1. tail_lines() returns what the old full-file deque read returned,
+     across block boundaries, blank and over-long lines, CRLF, invalid
+     UTF-8 and a missing final newline, and reads only the end of a big
+     file.
+  2. read_logs() level and since/until queries match a full forward
+     scan; lines without a timestamp belong to the one before them.
+  3. LogIndex indexes only appended bytes, persists in the sidecar, and
+     starts over after rotation or truncation.
+  4. GET /admin/logs rejects a malformed since/until.
+  5. follow() yields appended lines promptly, keeps partial lines until
+     they are complete, and follows a rotated log.
+
+Run without container: pytest tests/test_contracts/test_log_tail.py -v
+"""
+
+import asyncio
+import collections
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("fastapi")
+
+from fastapi import HTTPException  # noqa: E402
+
+from modules.system import log_tail  # noqa: E402
+
+
+def _legacy_tail(path, n, level=None, search=None):
+    """GET /admin/logs before this change."""
+    result = collections.deque(maxlen=n)
+    level_upper = level.upper() if level else None
+    with open(path, "r", errors="replace") as f:
+        for line in f:
+            stripped = line.rstrip("\n")
+            if level_upper and level_upper not in stripped.upper():
+                continue
+            if search and search.lower() not in stripped.lower():
+                continue
+            result.append(stripped)
+    return list(result)
+
+
+def _scan(path, n, level=None, search=None, since=None, until=None):
+    """Forward reference scan with timestamps carried to continuation lines."""
+    match = log_tail.line_filter(level, search)
+    result = collections.deque(maxlen=n)
+    ts = None
+    for raw in Path(path).read_bytes().split(b"\n")[:-1]:
+        line = raw.decode("utf-8", "replace")
+        if line[:4].isdigit() and line[4] == "-":
+            ts = line[:19].encode()
+        if (since or until) and ts is None:
+            continue
+        if (since and ts < since) or (until and ts > until):
+            continue
+        if match is None or match(line):
+            result.append(line)
+    return list(result)
+
+
+def _write_log(path, n, seed=0, start=1_700_000_000):
+    rng = random.Random(seed)
+    levels = ["INFO"] * 40 + ["DEBUG"] * 10 + ["WARNING"] * 3 + ["ERROR"]
+    out = []
+    for i in range(n):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.gmtime(start + i * 7))
+        out.append(f"{stamp},{i % 1000:03d} [{rng.choice(levels)}] odin.api: request {i} printer {rng.randint(1, 40)}")
+        if rng.random() < 0.02:
+            out.append("Traceback (most recent call last):\n  File \"x.py\", line 1\nValueError: boom")
+    Path(path).write_text("\n".join(out) + "\n")
+
+
+class TestTail:
+    def test_matches_full_read(self, tmp_path):
+        rng = random.Random(1)
+        lines = []
+        for i in range(3000):
+            kind = rng.random()
+            if kind < 0.05:
+                lines.append("")
+            elif kind < 0.07:
+                lines.append("x" * rng.randint(5000, 20000) + " ERROR long")
+            else:
+                lines.append(f"2026-10-17 10:00:{i % 60:02d},000 [{rng.choice(['INFO', 'ERROR', 'warning'])}] line {i} ünïcode")
+        body = "\r\n".join(lines[:100]).encode() + b"\r\n" + "\n".join(lines[100:]).encode() + b"\n\xff\xfe bad utf8"
+        path = tmp_path / "backend.log"
+        path.write_bytes(body)
+        for block in (64, 4096, log_tail.BLOCK_BYTES):
+            for n, level, search in ((1, None, None), (200, None, None), (5000, None, None),
+                                     (50, "warning", None), (30, None, "LINE 29"), (10, "error", "long")):
+                got = log_tail.tail_lines(str(path), n, log_tail.line_filter(level, search), block=block)
+                assert got == _legacy_tail(path, n, level, search), (block, n, level, search)
+
+    def test_trailing_newline_and_empty_file(self, tmp_path):
+        path = tmp_path / "a.log"
+        path.write_text("")
+        assert log_tail.tail_lines(str(path), 5) == []
+        path.write_text("one\n\ntwo\n")
+        assert log_tail.tail_lines(str(path), 5) == _legacy_tail(path, 5) == ["one", "", "two"]
+
+    def test_reads_only_the_end(self, tmp_path, monkeypatch):
+        path = tmp_path / "big.log"
+        _write_log(path, 60_000)
+        read = []
+        real_open = open
+
+        def counting_open(*args, **kwargs):
+            f = real_open(*args, **kwargs)
+            real_read = f.read
+
+            class Counting:
+                def __getattr__(self, name):
+                    return getattr(f, name)
+
+                def __enter__(self):
+                    return self
+
+                def __exit__(self, *exc):
+                    f.close()
+
+                def read(self, size=-1):
+                    data = real_read(size)
+                    read.append(len(data))
+                    return data
+            return Counting()
+
+        monkeypatch.setattr("builtins.open", counting_open)
+        assert len(log_tail.tail_lines(str(path), 200)) == 200
+        assert sum(read) <= 2 * log_tail.BLOCK_BYTES < path.stat().st_size / 20
+
+
+class TestIndexedQueries:
+    def test_level_and_window_match_forward_scan(self, tmp_path):
+        path = tmp_path / "backend.log"
+        _write_log(path, 40_000)
+        p = str(path)
+        since, until = b"2023-11-15 02:00:00", b"2023-11-15 09:30:00"
+        cases = [
+            dict(level="ERROR"), dict(level="error", search="printer 7"),
+            dict(since=since), dict(until=until), dict(since=since, until=until),
+            dict(level="WARNING", since=since, until=until), dict(level="WARN", since=since),
+            dict(since=b"2030-01-01 00:00:00"), dict(until=b"2000-01-01 00:00:00"),
+        ]
+        for persist in (True, False):
+            os.environ["ODIN_LOG_INDEX"] = "1" if persist else "0"
+            try:
+                for kwargs in cases:
+                    for n in (5, 500):
+                        assert log_tail.read_logs(p, n, **kwargs) == _scan(p, n, **kwargs), (kwargs, n)
+            finally:
+                del os.environ["ODIN_LOG_INDEX"]
+        assert (tmp_path / "backend.log.idx").exists()
+
+    def test_window_reads_few_blocks(self, tmp_path):
+        path = tmp_path / "backend.log"
+        _write_log(path, 40_000)
+        index = log_tail.LogIndex(str(path)).update()
+        window = index.blocks(since=b"2023-11-15 02:00:00", until=b"2023-11-15 02:30:00")
+        assert 1 <= len(window) <= 4
+        errors = index.blocks(level="ERROR")
+        assert len(errors) <= len(index.records) + 1
+
+    def test_parse_time(self):
+        assert log_tail.parse_time("2026-10-17 14:03") == b"2026-10-17 14:03:00"
+        assert log_tail.parse_time("2026-10-17T14:03:11Z") == b"2026-10-17 14:03:11"
+        assert log_tail.parse_time(None) is None
+        with pytest.raises(ValueError):
+            log_tail.parse_time("yesterday")
+
+
+class TestLogIndex:
+    def test_incremental_persistent_and_rotation(self, tmp_path):
+        path = tmp_path / "backend.log"
+        _write_log(path, 5000)
+        index = log_tail.LogIndex(str(path)).update()
+        size = path.stat().st_size
+        assert index.end == size and len(index.records) >= size // log_tail.BLOCK_BYTES
+
+        with open(path, "a") as f:
+            f.write("2030-01-01 00:00:00,000 [ERROR] appended\n2030-01-01 00:00:01,000 [INFO] partial")
+        reloaded = log_tail.LogIndex(str(path))
+        assert (reloaded.end, reloaded.records) == (index.end, index.records)
+        reloaded.update()
+        assert reloaded.records[:len(index.records)] == index.records
+        assert reloaded.end == size + len("2030-01-01 00:00:00,000 [ERROR] appended\n")
+        assert reloaded.last_ts == b"2030-01-01 00:00:00"
+        assert log_tail.read_logs(str(path), 2, level="error")[-1] == "2030-01-01 00:00:00,000 [ERROR] appended"
+        assert log_tail.read_logs(str(path), 1, since=b"2030-01-01 00:00:01") == \
+            ["2030-01-01 00:00:01,000 [INFO] partial"]
+
+        path.rename(tmp_path / "backend.log.1")
+        path.write_text("2031-01-01 00:00:00,000 [INFO] fresh\n")
+        assert log_tail.read_logs(str(path), 10, level="info") == ["2031-01-01 00:00:00,000 [INFO] fresh"]
+        assert log_tail.LogIndex(str(path)).end == path.stat().st_size
+
+        path.write_text("")
+        assert log_tail.read_logs(str(path), 10, level="info") == []
+
+    def test_corrupt_sidecar_ignored(self, tmp_path):
+        path = tmp_path / "backend.log"
+        _write_log(path, 100)
+        (tmp_path / "backend.log.idx").write_bytes(b"junk")
+        assert log_tail.read_logs(str(path), 3, level="INFO") == _scan(str(path), 3, level="INFO")
+
+
+class TestRoute:
+    def test_bad_window(self, tmp_path, monkeypatch):
+        from modules.system import routes_admin
+
+        path = tmp_path / "backend.log"
+        _write_log(path, 100)
+        monkeypatch.setitem(routes_admin._LOG_FILES, "backend", str(path))
+        kwargs = dict(source="backend", lines=5, level=None, search=None, user=None)
+        with pytest.raises(HTTPException) as exc:
+            routes_admin.get_logs(since="last tuesday", until=None, **kwargs)
+        assert exc.value.status_code == 400
+        assert routes_admin.get_logs(since=None, until=None, **kwargs)["lines"] == _legacy_tail(path, 5)
+
+
+class TestFollow:
+    def test_appends_partial_lines_and_rotation(self, tmp_path):
+        path = tmp_path / "backend.log"
+        path.write_text("old line\n")
+
+        async def run():
+            stop = asyncio.Event()
+            got = []
+
+            async def stopped():
+                return stop.is_set()
+
+            async def reader():
+                async for line in log_tail.follow(str(path), stopped, check=0.2):
+                    got.append((line, time.monotonic()))
+                    if line == "after rotation":
+                        stop.set()
+
+            task = asyncio.create_task(reader())
+            await asyncio.sleep(0.1)
+            with open(path, "a") as f:
+                f.write("first\nsec")
+                f.flush()
+                written = time.monotonic()
+                await asyncio.sleep(0.3)
+                f.write("ond\n")
+            await asyncio.sleep(0.3)
+            path.rename(tmp_path / "backend.log.1")
+            path.write_text("after rotation\n")
+            await asyncio.wait_for(task, 5)
+            return got, written
+
+        got, written = asyncio.run(run())
+        assert [line for line, _ in got] == ["first", "second", "after rotation"]
+        if log_tail._inotify_init1 is not None:
+            assert got[0][1] - written < 0.1
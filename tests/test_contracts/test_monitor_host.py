@@ -0,0 +1,185 @@
+"""
+Contract test — single asyncio monitor host (modules/printers/monitors/monitor_host.py).
+
+All printer protocols run as supervisor coroutines in one process, with
+blocking adapter calls on one bounded thread pool.
+
+Covers:
+  1. Printers rows are classified the way the separate daemons selected
+     them, and a hosted api_type is never also tried as Bambu.
+  2. The fleet is reconciled on reload: added printers start, removed
+     ones stop (and are closed), changed settings restart.
+  3. Ticks run on the shared pool, never more than one in flight per
+     printer; an overrunning printer backs off.
+  4. A hung printer does not starve the rest of the fleet.
+  5. A failed open is retried.
+
+Run without container: pytest tests/test_contracts/test_monitor_host.py -v
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from modules.printers.monitors import monitor_host  # noqa: E402
+
+INTERVAL = 0.02
+
+
+class FakeDriver:
+    """Counts calls; `tick_seconds` makes a printer slow."""
+
+    def __init__(self, kind, row, tick_seconds=0.0, open_results=None):
+        self.row = row
+        self.interval = INTERVAL
+        self.tick_seconds = tick_seconds
+        self.open_results = list(open_results or [])
+        self.opens = 0
+        self.ticks = 0
+        self.closed = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.threads = set()
+        self._lock = threading.Lock()
+
+    def open(self):
+        self.opens += 1
+        return self.open_results.pop(0) if self.open_results else True
+
+    def tick(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        self.threads.add(threading.current_thread().name)
+        time.sleep(self.tick_seconds)
+        with self._lock:
+            self.in_flight -= 1
+            self.ticks += 1
+
+    def close(self):
+        self.closed += 1
+
+
+def _spec(pid, kind="moonraker", host="10.0.0.1"):
+    row = {"id": pid, "name": f"p{pid}", "api_type": kind, "api_host": host, "api_key": "", "is_active": 1}
+    return monitor_host.PrinterSpec(pid, kind, row, (kind, row["name"], host, ""))
+
+
+@pytest.fixture
+def fast(monkeypatch):
+    monkeypatch.setattr(monitor_host, "_RETRY_OPEN_INTERVAL", INTERVAL)
+    monkeypatch.setattr(monitor_host, "_MAX_BACKOFF", 0.2)
+
+
+def _host(drivers, workers=4, overrides=None):
+    overrides = overrides or {}
+
+    def factory(kind, row):
+        driver = FakeDriver(kind, row, **overrides.get(row["id"], {}))
+        drivers.setdefault(row["id"], []).append(driver)
+        return driver
+    return monitor_host.MonitorHost(workers=workers, loader=dict, driver_factory=factory)
+
+
+async def _run_for(host, specs, seconds):
+    await host.reconcile(specs)
+    await asyncio.sleep(seconds)
+    stats = host.stats()
+    await host.shutdown()
+    return stats
+
+
+class TestClassify:
+    def test_protocols_by_row(self, monkeypatch):
+        monkeypatch.setenv("ENCRYPTION_KEY", "k")
+        rows = [
+            {"id": 1, "name": "a", "api_type": "moonraker", "api_host": "h", "api_key": None, "is_active": 1},
+            {"id": 2, "name": "b", "api_type": "prusalink", "api_host": "h", "api_key": "enc", "is_active": 1},
+            {"id": 3, "name": "c", "api_type": "elegoo", "api_host": "h", "api_key": None, "is_active": 0},
+            {"id": 4, "name": "d", "api_type": "bambu", "api_host": "h", "api_key": "enc", "is_active": 1},
+            {"id": 5, "name": "e", "api_type": None, "api_host": "h", "api_key": "enc", "is_active": 1},
+            {"id": 6, "name": "f", "api_type": "bambu", "api_host": "h", "api_key": "", "is_active": 1},
+        ]
+        kinds = {pid: spec.kind for pid, spec in monitor_host.classify(rows).items()}
+        assert kinds == {1: "moonraker", 2: "prusalink", 4: "bambu", 5: "bambu"}
+
+    def test_bambu_needs_encryption_key(self, monkeypatch):
+        monkeypatch.delenv("ENCRYPTION_KEY", raising=False)
+        rows = [{"id": 1, "name": "a", "api_type": "bambu", "api_host": "h", "api_key": "enc", "is_active": 1}]
+        assert monitor_host.classify(rows) == {}
+
+
+class TestReconcile:
+    def test_start_stop_restart(self, fast):
+        drivers = {}
+
+        async def run():
+            host = _host(drivers)
+            await host.reconcile({1: _spec(1), 2: _spec(2)})
+            await asyncio.sleep(0.05)
+            await host.reconcile({1: _spec(1, host="10.0.0.9")})
+            await asyncio.sleep(0.05)
+            assert set(host.slots) == {1}
+            await host.shutdown()
+
+        asyncio.run(run())
+        assert len(drivers[1]) == 2           # restarted on the host change
+        assert drivers[2][0].closed == 1      # removed printer closed
+        assert all(d.closed == 1 for d in drivers[1])
+
+    def test_unchanged_spec_keeps_supervisor(self, fast):
+        drivers = {}
+
+        async def run():
+            host = _host(drivers)
+            await host.reconcile({1: _spec(1)})
+            await host.reconcile({1: _spec(1)})
+            await asyncio.sleep(0.03)
+            await host.shutdown()
+
+        asyncio.run(run())
+        assert len(drivers[1]) == 1
+
+
+class TestTicks:
+    def test_ticks_on_shared_pool(self, fast):
+        drivers = {}
+        stats = asyncio.run(_run_for(_host(drivers, workers=2), {i: _spec(i) for i in range(10)}, 0.3))
+        assert stats["printers"] == 10
+        assert all(d[0].ticks >= 3 for d in drivers.values())
+        threads = set().union(*(d[0].threads for d in drivers.values()))
+        assert len(threads) <= 2
+        assert all(t.startswith("monitor") for t in threads)
+
+    def test_one_tick_in_flight_and_backoff(self, fast):
+        drivers = {}
+        stats = asyncio.run(_run_for(
+            _host(drivers, overrides={1: {"tick_seconds": INTERVAL * 3}}), {1: _spec(1)}, 0.5,
+        ))
+        slow = drivers[1][0]
+        assert slow.max_in_flight == 1
+        assert stats["overruns"] >= 1
+        # Backoff: far fewer ticks than back-to-back execution would allow.
+        assert slow.ticks < 0.5 / (INTERVAL * 3)
+
+    def test_hung_printer_does_not_starve_fleet(self, fast):
+        drivers = {}
+        specs = {i: _spec(i) for i in range(1, 6)}
+        asyncio.run(_run_for(_host(drivers, workers=2, overrides={1: {"tick_seconds": 0.4}}), specs, 0.35))
+        assert drivers[1][0].ticks <= 1
+        assert all(drivers[i][0].ticks >= 3 for i in range(2, 6))
+
+    def test_failed_open_is_retried(self, fast):
+        drivers = {}
+        asyncio.run(_run_for(_host(drivers, overrides={1: {"open_results": [False, False]}}), {1: _spec(1)}, 0.2))
+        driver = drivers[1][0]
+        assert driver.opens == 3
+        assert driver.ticks >= 1
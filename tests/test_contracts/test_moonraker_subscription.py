@@ -0,0 +1,203 @@
+"""
+Contract test — Moonraker websocket subscription (modules/printers/adapters/moonraker_ws.py).
+
+MoonrakerPrinter.subscribe() keeps one JSON-RPC websocket per printer,
+subscribed to the objects get_status() reads. Pushed deltas are merged
+into cached object state, and get_status() serves that instead of a
+/printer/objects/query request.
+
+Covers:
+  1. The subscribe request names every object get_status() parses.
+  2. The subscribe response seeds the cache; get_status() makes no request.
+  3. Deltas merge field by field, including nested dicts (print_stats.info).
+  4. Job/error/runout changes fire the on_change callback; temperature
+     noise does not.
+  5. A closed socket or a Klippy disconnect falls back to HTTP polling;
+     notify_klippy_ready resubscribes.
+  6. The monitor's StatusFeed ignores pushes while the printer is
+     unreachable and retries the connection on later polls.
+
+Messages are fed to the websocket callbacks directly, so websocket-client
+and a printer are not needed.
+
+Run without container: pytest tests/test_contracts/test_moonraker_subscription.py -v
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from modules.printers.adapters.moonraker import MoonrakerPrinter, MoonrakerState  # noqa: E402
+from modules.printers.monitors import moonraker_feed  # noqa: E402
+
+SEED = {
+    "heater_bed": {"temperature": 22.1, "target": 0.0},
+    "extruder": {"temperature": 24.0, "target": 0.0},
+    "print_stats": {"state": "standby", "filename": "", "print_duration": 0.0,
+                    "filament_used": 0.0, "info": {"current_layer": 0, "total_layer": 0}},
+    "virtual_sdcard": {"progress": 0.0},
+    "idle_timeout": {"state": "Idle"},
+    "webhooks": {"state": "ready", "state_message": ""},
+    "filament_switch_sensor runout": {"filament_detected": True, "enabled": True},
+}
+
+
+class FakeSocket:
+    def __init__(self):
+        self.sent = []
+
+    def send(self, payload):
+        self.sent.append(json.loads(payload))
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def printer(monkeypatch):
+    p = MoonrakerPrinter(host="10.0.0.5")
+    p._filament_sensors = ["filament_switch_sensor runout"]
+    p._subscription.ws = FakeSocket()
+    p.http_calls = []
+
+    def fake_get(path, timeout=5):
+        p.http_calls.append(path)
+        return {"result": {"status": {
+            "print_stats": {"state": "printing", "filename": "http.gcode"},
+        }}}
+
+    monkeypatch.setattr(p, "_get", fake_get)
+    p.changes = []
+    p._subscription.on_change = lambda: p.changes.append(p.get_status().internal_state)
+    return p
+
+
+def _push(printer, message):
+    sub = printer._subscription
+    sub._on_ws_message(sub.ws, json.dumps(message))
+
+
+def _subscribe(printer, status=None):
+    sub = printer._subscription
+    sub._on_ws_open(sub.ws)
+    request = sub.ws.sent[-1]
+    _push(printer, {"jsonrpc": "2.0", "id": request["id"],
+                    "result": {"eventtime": 1.0, "status": json.loads(json.dumps(status or SEED))}})
+    return request
+
+
+def _update(printer, delta):
+    _push(printer, {"jsonrpc": "2.0", "method": "notify_status_update", "params": [delta, 2.0]})
+
+
+class TestSubscribe:
+    def test_request_covers_queried_objects(self, printer):
+        request = _subscribe(printer)
+        assert request["method"] == "printer.objects.subscribe"
+        assert set(request["params"]["objects"]) == set(printer._status_objects())
+        assert "filament_switch_sensor runout" in request["params"]["objects"]
+
+    def test_seeded_status_served_without_request(self, printer):
+        _subscribe(printer)
+        assert printer.subscribed
+        status = printer.get_status()
+        assert printer.http_calls == []
+        assert status.state == MoonrakerState.READY
+        assert status.bed_temp == 22.1
+        assert status.filament_detected is True
+
+
+class TestDeltas:
+    def test_nested_merge_keeps_other_fields(self, printer):
+        _subscribe(printer)
+        _update(printer, {"print_stats": {"info": {"current_layer": 7}}})
+        _update(printer, {"extruder": {"temperature": 210.5}})
+        status = printer.get_status()
+        assert status.current_layer == 7
+        assert status.nozzle_temp == 210.5
+        assert status.nozzle_target == 0.0
+        assert status.state == MoonrakerState.READY
+        assert printer.http_calls == []
+
+    def test_cached_state_is_not_shared(self, printer):
+        _subscribe(printer)
+        printer.get_status().raw_data["heater_bed"]["temperature"] = 99.0
+        assert printer.get_status().bed_temp == 22.1
+
+    def test_state_change_fires_callback(self, printer):
+        _subscribe(printer)
+        printer.changes.clear()
+        _update(printer, {"heater_bed": {"temperature": 22.3}})
+        _update(printer, {"print_stats": {"print_duration": 1.5}})
+        assert printer.changes == []
+        _update(printer, {"print_stats": {"state": "printing", "filename": "cube.gcode"}})
+        assert printer.changes == ["RUNNING"]
+        _update(printer, {"print_stats": {"state": "printing"}})
+        assert printer.changes == ["RUNNING"]
+        _update(printer, {"filament_switch_sensor runout": {"filament_detected": False}})
+        assert len(printer.changes) == 2
+
+    def test_deltas_before_subscribe_response_are_ignored(self, printer):
+        _update(printer, {"heater_bed": {"temperature": 50.0}})
+        assert not printer.subscribed
+        assert printer._subscription.objects == {}
+
+
+class TestFallback:
+    def test_socket_close_falls_back_to_http(self, printer):
+        _subscribe(printer)
+        printer._subscription._on_ws_close(printer._subscription.ws, 1006, "")
+        assert not printer.subscribed
+        status = printer.get_status()
+        assert len(printer.http_calls) == 1
+        assert status.filename == "http.gcode"
+
+    def test_klippy_restart_resubscribes(self, printer):
+        first = _subscribe(printer)
+        _push(printer, {"jsonrpc": "2.0", "method": "notify_klippy_disconnected"})
+        assert not printer.subscribed
+        assert printer.changes == ["IDLE", "RUNNING"]   # seed, then the HTTP fallback
+        _push(printer, {"jsonrpc": "2.0", "method": "notify_klippy_ready"})
+        second = printer._subscription.ws.sent[-1]
+        assert second["method"] == "printer.objects.subscribe"
+        assert second["id"] != first["id"]
+        _push(printer, {"jsonrpc": "2.0", "id": second["id"], "result": {"status": SEED}})
+        assert printer.subscribed
+
+    def test_rejected_subscribe_stays_on_http(self, printer):
+        printer._subscription._on_ws_open(printer._subscription.ws)
+        request = printer._subscription.ws.sent[-1]
+        _push(printer, {"jsonrpc": "2.0", "id": request["id"],
+                        "error": {"code": 503, "message": "Klippy Host not connected"}})
+        assert not printer.subscribed
+        printer.get_status()
+        assert len(printer.http_calls) == 1
+
+
+class TestStatusFeed:
+    def test_pushes_ignored_while_reconnecting(self, printer, monkeypatch):
+        processed, reconnected = [], []
+        monkeypatch.setattr(printer, "subscribe", lambda on_change=None: True)
+        feed = moonraker_feed.StatusFeed(printer, lambda s: processed.append(s.internal_state), "p",
+                                         running=lambda: True, on_reconnect=lambda: reconnected.append(1))
+        feed.poll()
+        assert processed == ["RUNNING"]
+
+        monkeypatch.setattr(printer, "get_status", lambda: 1 / 0)
+        feed.poll()
+        assert feed.reconnect_at and not printer.connected
+        feed._on_push()
+        assert processed == ["RUNNING"]
+
+        monkeypatch.setattr(printer, "connect", lambda: True)
+        feed.poll()                      # not due yet
+        assert reconnected == []
+        feed.reconnect_at = 1.0
+        feed.poll()
+        assert reconnected == [1] and feed.reconnect_at == 0.0
@@ -0,0 +1,252 @@
+"""
+Contract test — streamed print file uploads with background extraction
+(modules/models_library/ingest.py, jobs migration 005).
+
+POST /print-files/upload streams the upload to disk with an incremental
+SHA-256, opens a .3mf once for the metadata and thumbnail it needs and
+leaves the mesh to a background queue, tracked by
+print_files.metadata_status.
+
+Covers:
+  1. receive() hashes what it writes and enforces the size limit without
+     leaving a partial file behind.
+  2. A .3mf upload opens the zip once, returns pending with the
+     thumbnail, the new model gets the thumbnail, and the stored file
+     is the received one (no temp copy left over).
+  3. The mesh endpoint answers 202 until the queue has run, then the
+     mesh.
+  4. The project name is read from the model file without parsing the
+     mesh that follows it.
+  5. A failed extraction is recorded; resume() re-queues files a restart
+     interrupted. .gcode uploads are ready immediately.
+
+Run without container: pytest tests/test_contracts/test_print_file_ingest.py -v
+"""
+
+import base64
+import hashlib
+import io
+import json
+import os
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+pytest.importorskip("defusedxml")
+
+from fastapi import HTTPException, UploadFile  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.base import Base  # noqa: E402
+from core.db import _run_sql_file  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.models_library import ingest, mesh  # noqa: E402
+from modules.models_library.routes import print_files as routes  # noqa: E402
+from modules.models_library.threemf_parser import extract_project_name  # noqa: E402
+
+MODULES = BACKEND_DIR / "modules"
+OPERATOR = {"id": 1, "role": "operator", "group_id": None}
+NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 64
+
+upload = routes.upload_3mf.__wrapped__  # past the rate limiter
+
+
+def _model_xml(triangles=2, title="Benchy"):
+    verts = "".join(f'<vertex x="{i}" y="{i * 2}" z="{i * 3}"/>' for i in range(triangles + 2))
+    tris = "".join(f'<triangle v1="{i}" v2="{i + 1}" v3="{i + 2}"/>' for i in range(triangles))
+    return (f'<?xml version="1.0" encoding="UTF-8"?><model unit="millimeter" xmlns="{NS}">'
+            f'<metadata name="Title">{title}</metadata>'
+            f'<resources><object id="1" type="model"><mesh><vertices>{verts}</vertices>'
+            f'<triangles>{tris}</triangles></mesh></object></resources></model>')
+
+
+def _3mf(model_xml=None):
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("3D/3dmodel.model", model_xml or _model_xml())
+        zf.writestr("Metadata/plate_1.gcode", "G28\n")
+        zf.writestr("Metadata/plate_1.png", PNG)
+        zf.writestr("Metadata/slice_info.config", (
+            '<config><plate><metadata key="prediction" value="7200"/><metadata key="weight" value="12.5"/>'
+            '<metadata key="printer_model_id" value="C11"/>'
+            '<filament id="1" type="PLA" color="#FF0000" used_m="4.1" used_g="12.5"/></plate></config>'))
+        zf.writestr("Metadata/model_settings.config", "bed_shape = 0x0,256x0,256x256,0x256\n")
+        zf.writestr("Metadata/plate_1.json", json.dumps({
+            "bed_type": "textured_plate", "bbox_objects": [{"name": "Benchy", "layer_height": 0.2}]}))
+    return buf.getvalue()
+
+
+@pytest.fixture
+def engine(tmp_path, monkeypatch):
+    path = tmp_path / "odin.db"
+    eng = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=eng)
+    for migration in sorted((MODULES / "jobs" / "migrations").glob("*.sql")):
+        _run_sql_file(str(path), migration)
+    monkeypatch.setattr(ingest, "PRINT_FILES_DIR", str(tmp_path / "print_files"))
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def queue(engine, monkeypatch):
+    q = ingest.IngestQueue(engine=engine)
+    submitted = []
+    monkeypatch.setattr(q, "submit", submitted.append)
+    monkeypatch.setattr(ingest, "queue", q)
+    q.submitted = submitted
+    return q
+
+
+@pytest.fixture
+def db(engine):
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _upload(db, data, filename="Benchy (X1C).3mf"):
+    return upload(request=None, file=UploadFile(file=io.BytesIO(data), filename=filename),
+                  current_user=OPERATOR, db=db)
+
+
+def _request():
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+
+
+def _row(db, file_id):
+    return db.execute(text("SELECT * FROM print_files WHERE id = :id"), {"id": file_id}).mappings().one()
+
+
+class TestReceive:
+    def test_hash_and_copy(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(ingest, "CHUNK_BYTES", 1000)
+        data = os.urandom(10_500)
+        path, digest = ingest.receive(io.BytesIO(data), ".3mf", directory=str(tmp_path))
+        assert digest == hashlib.sha256(data).hexdigest()
+        assert Path(path).read_bytes() == data and Path(path).parent == tmp_path
+
+    def test_too_large_leaves_nothing(self, tmp_path):
+        with pytest.raises(ingest.UploadTooLarge):
+            ingest.receive(io.BytesIO(b"x" * 5000), ".3mf", directory=str(tmp_path), max_bytes=4096)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_endpoint_413(self, db, queue, monkeypatch):
+        monkeypatch.setattr(ingest, "MAX_UPLOAD_BYTES", 1024)
+        with pytest.raises(HTTPException) as exc:
+            _upload(db, b"x" * 2048, "big.gcode")
+        assert exc.value.status_code == 413
+        assert os.listdir(ingest.PRINT_FILES_DIR) == []
+
+
+class TestUpload:
+    def test_one_zip_open_and_pending(self, db, queue, monkeypatch):
+        data = _3mf()
+        opens = []
+
+        class CountingZipFile(zipfile.ZipFile):
+            def __init__(self, *args, **kwargs):
+                opens.append(args[0])
+                super().__init__(*args, **kwargs)
+
+        monkeypatch.setattr(zipfile, "ZipFile", CountingZipFile)
+        resp = _upload(db, data)
+        assert len(opens) == 1
+        assert resp["metadata_status"] == "pending" and resp["has_mesh"] is False
+        assert (resp["project_name"], resp["print_time_seconds"], resp["bed_x_mm"]) == ("Benchy", 7200, 256)
+        assert resp["objects"] == [{"name": "Benchy", "is_wipe_tower": False, "checked": True}]
+        assert base64.b64decode(resp["thumbnail_b64"]) == PNG
+        assert queue.submitted == [resp["id"]]
+
+        row = _row(db, resp["id"])
+        assert row["metadata_status"] == "pending" and row["mesh_data"] is None
+        assert row["thumbnail_b64"] == resp["thumbnail_b64"]
+        thumb = db.execute(text("SELECT thumbnail_b64 FROM models WHERE id = :id"),
+                           {"id": resp["model_id"]}).scalar()
+        assert thumb == resp["thumbnail_b64"]
+        assert row["file_hash"] == hashlib.sha256(data).hexdigest()
+        assert row["original_filename"] == "Benchy (X1C).3mf"
+        assert os.listdir(ingest.PRINT_FILES_DIR) == [f"{resp['id']}_Benchy__X1C_.3mf"]
+        assert Path(row["stored_path"]).read_bytes() == data
+
+    def test_mesh_after_background_extraction(self, db, queue):
+        resp = _upload(db, _3mf())
+        pending = routes.get_print_file_mesh(resp["id"], _request(), current_user=OPERATOR, db=db)
+        assert pending.status_code == 202 and json.loads(pending.body) == {"metadata_status": "pending"}
+
+        assert queue.process(resp["id"]) == "ready"
+        assert queue.process(resp["id"]) is None  # claimed once
+        db.expire_all()
+        served = routes.get_print_file_mesh(resp["id"], _request(), current_user=OPERATOR, db=db)
+        vertices, triangles = mesh.decode(served.body)
+        assert (len(vertices), len(triangles)) == (4, 2)
+        assert routes.get_model_mesh(resp["model_id"], _request(), current_user=OPERATOR, db=db).body == served.body
+
+    def test_real_queue_runs_in_background(self, engine, db, monkeypatch):
+        q = ingest.IngestQueue(engine=engine, workers=1)
+        monkeypatch.setattr(ingest, "queue", q)
+        resp = _upload(db, _3mf())
+        q.shutdown(wait=True)
+        assert _row(db, resp["id"])["metadata_status"] == "ready"
+
+    def test_bad_zip_rejected(self, db, queue):
+        with pytest.raises(HTTPException) as exc:
+            _upload(db, b"not a zip", "broken.3mf")
+        assert exc.value.status_code == 400
+        assert os.listdir(ingest.PRINT_FILES_DIR) == []
+        assert db.execute(text("SELECT COUNT(*) FROM print_files")).scalar() == 0
+
+    def test_gcode_ready_immediately(self, db, queue):
+        resp = _upload(db, b"; bed_size_x = 250\n; bed_size_y = 210\nG28\n", "part.gcode")
+        assert resp["metadata_status"] == "ready" and queue.submitted == []
+        assert (resp["bed_x_mm"], resp["bed_y_mm"]) == (250, 210)
+        assert _row(db, resp["id"])["metadata_status"] == "ready"
+
+
+class TestProjectName:
+    def test_stops_before_mesh(self):
+        # Everything after <resources> is cut off: a full parse would fail.
+        xml = _model_xml(triangles=50_000, title="Big")
+        truncated = xml[:xml.index("<resources>") + 5000]
+        buf = io.BytesIO()
+        with zipfile.ZipFile(buf, "w") as zf:
+            zf.writestr("3D/3dmodel.model", truncated)
+        with zipfile.ZipFile(buf) as zf:
+            assert extract_project_name(zf) == "Big"
+
+
+class TestFailureAndResume:
+    def test_failed_extraction(self, db, queue):
+        resp = _upload(db, _3mf())
+        os.unlink(_row(db, resp["id"])["stored_path"])
+        assert queue.process(resp["id"]) == "failed"
+        db.expire_all()
+        row = _row(db, resp["id"])
+        assert row["metadata_status"] == "failed" and row["metadata_error"]
+        with pytest.raises(HTTPException) as exc:
+            routes.get_print_file_mesh(resp["id"], _request(), current_user=OPERATOR, db=db)
+        assert exc.value.status_code == 404
+
+    def test_resume(self, db, queue):
+        first, second = _upload(db, _3mf()), _upload(db, _3mf(_model_xml(title="Other")))
+        db.execute(text("UPDATE print_files SET metadata_status = 'processing' WHERE id = :id"), {"id": first["id"]})
+        db.commit()
+        queue.submitted.clear()
+        assert queue.resume() == 2
+        assert sorted(queue.submitted) == sorted([first["id"], second["id"]])
+        for file_id in queue.submitted:
+            assert queue.process(file_id) == "ready"
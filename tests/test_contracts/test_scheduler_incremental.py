@@ -0,0 +1,215 @@
+"""
+Contract test — incremental scheduling (modules/jobs/scheduler_incremental.py).
+
+IncrementalScheduler keeps the last full run's plan in memory and, on
+each run, applies only what changed in the database since.
+
+Covers:
+  1. The first run is a full re-plan; a run with nothing changed writes
+     nothing. Every run is logged with mode, delta size, jobs written and
+     latency, and /metrics exports the latest of each mode.
+  2. A new pending job is placed around the kept bookings and is the
+     only job written.
+  3. A cancelled job frees its slots and a job that did not fit is
+     retried into them; a completed job keeps its slots.
+  4. Deactivating a printer moves its scheduled jobs to another printer.
+  5. A forced full re-plan after a series of deltas books every job
+     where the incremental runs left it; a config change re-plans.
+
+Run without container: pytest tests/test_contracts/test_scheduler_incremental.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.base import Base, JobStatus  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.jobs.models import Job, SchedulerRun  # noqa: E402
+from modules.jobs.scheduler import SchedulerConfig  # noqa: E402
+from modules.jobs.scheduler_incremental import IncrementalScheduler  # noqa: E402
+from modules.printers.models import Printer  # noqa: E402
+
+# No blackout, two-day horizon: placements depend only on occupancy.
+CONFIG = SchedulerConfig.from_time_strings("00:00", "00:00", horizon_days=2)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'odin.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _printers(db, n):
+    printers = [Printer(name=f"p{i}", is_active=True, slot_count=1) for i in range(n)]
+    db.add_all(printers)
+    db.commit()
+    return printers
+
+
+def _job(db, hours, priority=3):
+    job = Job(item_name=f"{hours}h", status=JobStatus.PENDING, duration_hours=hours,
+              priority=priority, colors_required="")
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _last_run(db):
+    return db.query(SchedulerRun).order_by(SchedulerRun.id.desc()).first()
+
+
+def _bookings(db):
+    return {j.id: (j.printer_id, j.scheduled_start) for j in
+            db.query(Job).filter(Job.status == JobStatus.SCHEDULED)}
+
+
+class TestRuns:
+    def test_first_full_then_empty_delta(self, db):
+        _printers(db, 2)
+        for _ in range(3):
+            _job(db, 2)
+        planner = IncrementalScheduler(CONFIG)
+        first = planner.run(db)
+        assert first.scheduled_count == 3
+        assert _last_run(db).mode == "full"
+        second = planner.run(db)
+        run = _last_run(db)
+        assert second.scheduled_count == 0
+        assert (run.mode, run.delta_size, run.changed_count) == ("incremental", 0, 0)
+        assert run.duration_ms is not None
+
+    def test_metrics_by_mode(self, db):
+        pytest.importorskip("fastapi")
+        from modules.system.routes_config import prometheus_metrics
+
+        _printers(db, 1)
+        _job(db, 2)
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        planner.run(db)
+        body = prometheus_metrics(db=db, current_user={"role": "viewer"}).body.decode()
+        scheduler = [line for line in body.splitlines() if "odin_scheduler_" in line]
+        families = [line.split()[2] for line in scheduler if line.startswith("# HELP")]
+        assert families == ["odin_scheduler_last_run_seconds", "odin_scheduler_last_delta_size",
+                            "odin_scheduler_last_changed_jobs"]
+        for family in families:
+            # Full runs have no delta size.
+            modes = ["incremental"] if family.endswith("delta_size") else ["full", "incremental"]
+            samples = [line for line in scheduler if line.startswith(family + "{")]
+            assert sorted(line.split("}")[0] for line in samples) == [f'{family}{{mode="{m}"' for m in modes]
+            # HELP, TYPE, then the family's samples
+            start = scheduler.index(f"# TYPE {family} gauge")
+            assert scheduler[start + 1:start + 1 + len(samples)] == samples
+
+    def test_new_job_placed_around_bookings(self, db):
+        _printers(db, 1)
+        a = _job(db, 3)
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        b = _job(db, 2)
+        result = planner.run(db)
+        assert [x.job_id for x in result.assignments] == [b.id]
+        db.refresh(a)
+        db.refresh(b)
+        assert b.scheduled_start >= a.scheduled_end
+        run = _last_run(db)
+        assert (run.delta_size, run.changed_count) == (1, 1)
+
+
+class TestReleases:
+    def test_cancelled_frees_slots_for_unplaced(self, db):
+        _printers(db, 1)
+        big = _job(db, 40, priority=1)
+        waiting = _job(db, 40, priority=2)   # does not fit behind `big`
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        db.refresh(waiting)
+        assert waiting.status == JobStatus.PENDING
+        start = big.scheduled_start
+        big.status = JobStatus.CANCELLED
+        db.commit()
+        result = planner.run(db)
+        assert [x.job_id for x in result.assignments] == [waiting.id]
+        db.refresh(waiting)
+        assert waiting.scheduled_start == start
+
+    def test_completed_keeps_slots(self, db):
+        _printers(db, 1)
+        done = _job(db, 4)
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        done.status = JobStatus.COMPLETED
+        db.commit()
+        late = _job(db, 1)
+        planner.run(db)
+        db.refresh(late)
+        assert late.scheduled_start >= done.scheduled_end
+
+
+class TestPrinters:
+    def test_deactivated_printer_jobs_move(self, db):
+        p0, p1 = _printers(db, 2)
+        jobs = [_job(db, 2) for _ in range(4)]
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        on_p0 = [j.id for j in jobs if j.printer_id == p0.id]
+        assert on_p0
+        p0.is_active = False
+        db.commit()
+        planner.run(db)
+        for job in jobs:
+            db.refresh(job)
+            assert job.status == JobStatus.SCHEDULED
+            assert job.printer_id == p1.id
+        starts = sorted(j.scheduled_start for j in jobs)
+        assert all(b - a >= (jobs[0].scheduled_end - jobs[0].scheduled_start)
+                   for a, b in zip(starts, starts[1:]))
+
+
+class TestConsistency:
+    def test_full_replan_matches_incremental_state(self, db):
+        _printers(db, 3)
+        jobs = [_job(db, h) for h in (1, 3, 5, 2)]
+        planner = IncrementalScheduler(CONFIG)
+        planner.run(db)
+        jobs[1].status = JobStatus.CANCELLED
+        db.commit()
+        jobs += [_job(db, h) for h in (4, 1)]
+        planner.run(db)
+        before = _bookings(db)
+        planner.run(db, full=True)
+        assert _last_run(db).mode == "full"
+        assert _bookings(db) == before
+        kept = {j: (b.printer_id, b.job_slot) for j, b in planner.plan.bookings.items()}
+        assert set(kept) == set(before)
+
+    def test_config_change_replans(self, db):
+        from modules.jobs import scheduler_incremental
+        _printers(db, 1)
+        _job(db, 1)
+        scheduler_incremental._planner = None
+        scheduler_incremental.run_incremental(db, CONFIG)
+        scheduler_incremental.run_incremental(db, CONFIG)
+        assert _last_run(db).mode == "incremental"
+        other = SchedulerConfig.from_time_strings("00:00", "00:00", horizon_days=3)
+        scheduler_incremental.run_incremental(db, other)
+        assert _last_run(db).mode == "full"
+        scheduler_incremental._planner = None
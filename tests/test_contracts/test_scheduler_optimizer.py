@@ -0,0 +1,169 @@
+"""
+Contract test — lookahead scheduler engine (modules/jobs/scheduler_optimizer.py).
+
+OptimizingScheduler fills the same SchedulerResult as the greedy engine
+but commits the cheapest (job, printer) pair of a whole queue window at
+a time.
+
+Covers:
+  1. make_scheduler() picks the engine from SchedulerConfig.engine.
+  2. On a queue of interleaved colours it groups same-colour jobs and
+     needs fewer colour changes than greedy, without overlaps.
+  3. Model / tag constraints are honoured; ineligible jobs are skipped
+     with the greedy engine's error text; priority 0 goes first.
+  4. Stored match scores equal Scheduler._calculate_color_score().
+  5. With no time budget the whole queue is placed by the greedy engine.
+
+Run without container: pytest tests/test_contracts/test_scheduler_optimizer.py -v
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("numpy")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core.base import Base, JobStatus  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.jobs.models import Job  # noqa: E402
+from modules.jobs.scheduler import Scheduler, SchedulerConfig, make_scheduler  # noqa: E402
+from modules.jobs.scheduler_optimizer import OptimizingScheduler  # noqa: E402
+from modules.printers.models import FilamentSlot, Printer  # noqa: E402
+
+
+def _config(engine="optimize", **kwargs):
+    # No blackout: placements depend only on occupancy and colours.
+    return SchedulerConfig.from_time_strings("00:00", "00:00", horizon_days=3, engine=engine, **kwargs)
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'odin.db'}")
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+    engine.dispose()
+
+
+def _printer(db, name, colors, **kwargs):
+    printer = Printer(name=name, is_active=True, slot_count=4, **kwargs)
+    db.add(printer)
+    db.flush()
+    for n, color in enumerate(colors, start=1):
+        db.add(FilamentSlot(printer_id=printer.id, slot_number=n, color=color))
+    db.commit()
+    return printer
+
+
+def _job(db, colors, hours=1, **kwargs):
+    job = Job(item_name=colors or "plain", status=JobStatus.PENDING, duration_hours=hours,
+              colors_required=colors, **kwargs)
+    db.add(job)
+    db.commit()
+    return job
+
+
+def _interleaved(db):
+    _printer(db, "p0", ["black"])
+    _printer(db, "p1", ["black"])
+    for i in range(12):
+        _job(db, ("red", "blue", "green")[i % 3], hours=2)
+
+
+def _reset(db):
+    db.query(Job).update({Job.status: JobStatus.PENDING, Job.printer_id: None,
+                          Job.scheduled_start: None, Job.scheduled_end: None})
+    db.commit()
+
+
+class TestEngineSelection:
+    def test_make_scheduler(self):
+        assert type(make_scheduler(_config("greedy"))) is Scheduler
+        assert isinstance(make_scheduler(_config("optimize")), OptimizingScheduler)
+
+
+class TestQuality:
+    def test_fewer_colour_changes_than_greedy(self, db):
+        _interleaved(db)
+        greedy = Scheduler(_config("greedy")).run(db)
+        _reset(db)
+        optimized = make_scheduler(_config()).run(db)
+        assert optimized.scheduled_count == greedy.scheduled_count == 12
+        assert optimized.setup_blocks < greedy.setup_blocks
+
+    def test_no_overlaps(self, db):
+        _interleaved(db)
+        result = make_scheduler(_config()).run(db)
+        by_printer = {}
+        for a in result.assignments:
+            by_printer.setdefault(a.printer_id, []).append((a.start_slot, a.end_slot))
+        for spans in by_printer.values():
+            spans.sort()
+            assert all(prev_end <= start for (_, prev_end), (start, _) in zip(spans, spans[1:]))
+
+
+class TestConstraints:
+    def test_tags_respected(self, db):
+        _printer(db, "plain", ["red"])
+        tagged = _printer(db, "room-b", ["blue"], tags=["Room B"])
+        job = _job(db, "red", required_tags=["Room B"])
+        make_scheduler(_config()).run(db)
+        db.refresh(job)
+        assert job.printer_id == tagged.id
+
+    def test_ineligible_skipped(self, db):
+        _printer(db, "plain", ["red"])
+        job = _job(db, "red", required_tags=["Room Z"])
+        result = make_scheduler(_config()).run(db)
+        assert result.skipped_count == 1
+        assert result.errors == [f"Could not schedule job {job.id}: {job.item_name}"]
+        db.refresh(job)
+        assert job.status == JobStatus.PENDING
+
+
+    def test_priority_zero_first(self, db):
+        _printer(db, "p0", ["red"])
+        later = _job(db, "red", priority=1)
+        urgent = _job(db, "red", priority=0)
+        make_scheduler(_config()).run(db)
+        db.refresh(later)
+        db.refresh(urgent)
+        assert urgent.scheduled_start < later.scheduled_start
+
+
+class TestScores:
+    def test_match_score_as_greedy_computes_it(self, db):
+        loaded = ["red", "blue", "white"]
+        _printer(db, "p0", loaded)
+        scorer = Scheduler(_config("greedy"))
+        for colors in ("red", "red,green", "red,green,black", "", "blue,white"):
+            job = _job(db, colors)
+            make_scheduler(_config()).run(db)
+            db.refresh(job)
+            assert job.match_score == scorer._calculate_color_score(loaded, job.colors_list)
+            job.status = JobStatus.COMPLETED
+            job.scheduled_start = job.scheduled_end = None
+            db.commit()
+
+
+class TestBudget:
+    def test_zero_budget_is_greedy(self, db):
+        _interleaved(db)
+        greedy = Scheduler(_config("greedy")).run(db)
+        _reset(db)
+        fallback = make_scheduler(_config(time_budget_ms=0)).run(db)
+        assert ([(a.job_id, a.printer_id, a.start_slot) for a in fallback.assignments]
+                == [(a.job_id, a.printer_id, a.start_slot) for a in greedy.assignments])
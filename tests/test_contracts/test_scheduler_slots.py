@@ -0,0 +1,146 @@
+"""
+Contract test — scheduler slot allocator (modules/jobs/scheduler.py).
+
+Slot occupancy is one int bitset per printer, and the blackout window is
+a start mask computed once per run, instead of a {(printer, slot): job}
+dict probed slot by slot.
+
+Covers:
+  1. SlotOccupancy.first_fit() agrees with a brute-force probe on random
+     fleets: start outside blackout, every slot of the job free, at or
+     after search_start, inside the horizon.
+  2. mark() clips jobs that started before the horizon or run past it.
+  3. The start mask matches _is_blackout_time() for overnight and
+     same-day blackout windows.
+  4. _find_best_fit() / _apply_assignment() place jobs after busy
+     blocks, add the setup slot on a color change, and book it.
+
+Run without container: pytest tests/test_contracts/test_scheduler_slots.py -v
+"""
+
+import random
+import sys
+from datetime import datetime
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+
+from modules.jobs.scheduler import (  # noqa: E402
+    PrinterState, Scheduler, SchedulerConfig, SlotOccupancy,
+)
+
+START = datetime(2026, 3, 2, 8, 0)   # Monday 08:00
+DAY_SLOTS = 24 * 4
+
+
+def _reference(busy: set, start_ok: set, total: int, duration: int, search_start: int):
+    for s in range(search_start, total - duration + 1):
+        if s in start_ok and not any(x in busy for x in range(s, s + duration)):
+            return s
+    return None
+
+
+def _printer(pid, colors=()):
+    return PrinterState(SimpleNamespace(id=pid, name=f"p{pid}", loaded_colors=list(colors),
+                                        model="", tags=[]))
+
+
+def _job(hours=1.0, colors=(), priority=3):
+    return SimpleNamespace(id=1, item_name="part", colors_list=list(colors), required_tags=[],
+                           effective_duration=hours, priority=priority,
+                           target_type="specific", target_filter=None)
+
+
+class TestFirstFit:
+    def test_matches_brute_force(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            total = rng.randint(1, 200)
+            busy = {s for s in range(total) if rng.random() < rng.choice([0.1, 0.4, 0.8])}
+            start_ok = {s for s in range(total) if rng.random() < 0.7}
+            occ = SlotOccupancy(total, sum(1 << s for s in start_ok))
+            for s in busy:
+                occ.mark(1, s, s + 1)
+            duration = rng.randint(1, 40)
+            search_start = rng.randint(0, total)
+            assert occ.first_fit(1, duration, search_start) == \
+                _reference(busy, start_ok, total, duration, search_start)
+
+    def test_job_may_run_through_blackout(self):
+        occ = SlotOccupancy(20, 0b11)          # may only start in slots 0 and 1
+        occ.mark(1, 0, 1)
+        assert occ.first_fit(1, 10) == 1
+        assert occ.first_fit(1, 20) is None
+
+    def test_unknown_printer_is_free(self):
+        occ = SlotOccupancy(8, 0xFF)
+        assert occ.first_fit(42, 8) == 0
+        assert occ.first_fit(42, 9) is None
+
+
+class TestMark:
+    def test_clipped_to_horizon(self):
+        occ = SlotOccupancy(10, (1 << 10) - 1)
+        occ.mark(1, -4, 2)      # started before the run
+        occ.mark(1, 8, 30)      # runs past the horizon
+        assert occ.busy[1] == 0b1100000011
+        occ.mark(2, 12, 20)     # entirely outside
+        assert 2 not in occ.busy
+        assert occ.is_busy(1, 0) and not occ.is_busy(1, 2)
+
+
+class TestStartMask:
+    @pytest.mark.parametrize("blackout", [("22:30", "05:30"), ("12:00", "13:15"), ("00:00", "00:00")])
+    def test_matches_blackout_check(self, blackout):
+        scheduler = Scheduler(SchedulerConfig.from_time_strings(*blackout))
+        mask = scheduler._start_mask(START, 2 * DAY_SLOTS)
+        for slot in range(2 * DAY_SLOTS):
+            allowed = not scheduler._is_blackout_time(scheduler._slot_to_time(slot, START))
+            assert bool(mask >> slot & 1) == allowed
+
+
+class TestBestFit:
+    def _run(self, scheduler, states, occupancy, job):
+        fit = scheduler._find_best_fit(job=job, printer_states=states, occupancy=occupancy,
+                                       start_date=START)
+        if fit:
+            scheduler._apply_assignment(job=job, fit=fit, printer_states=states, occupancy=occupancy)
+        return fit
+
+    def test_places_after_busy_block_and_books_it(self):
+        scheduler = Scheduler()
+        total = DAY_SLOTS
+        occupancy = SlotOccupancy(total, scheduler._start_mask(START, total))
+        occupancy.mark(1, 0, 8)                  # 08:00-10:00 taken
+        states = {1: _printer(1, ["black"])}
+        fit = self._run(scheduler, states, occupancy, _job(2.0, ["black"]))
+        assert (fit["start_slot"], fit["end_slot"]) == (8, 16)
+        assert fit["start_time"] == datetime(2026, 3, 2, 10, 0)
+        assert fit["end_time"] == datetime(2026, 3, 2, 12, 0)
+        assert all(occupancy.is_busy(1, s) for s in range(8, 16))
+        second = self._run(scheduler, states, occupancy, _job(1.0, ["black"]))
+        assert second["start_slot"] == 16
+
+    def test_color_change_adds_setup_slot(self):
+        scheduler = Scheduler()
+        occupancy = SlotOccupancy(DAY_SLOTS, scheduler._start_mask(START, DAY_SLOTS))
+        states = {1: _printer(1, ["black"])}
+        fit = self._run(scheduler, states, occupancy, _job(1.0, ["red"]))
+        assert fit["requires_setup"]
+        assert (fit["start_slot"], fit["job_start_slot"], fit["end_slot"]) == (0, 1, 5)
+        assert occupancy.busy[1] == (1 << 5) - 1
+        assert states[1].colors == ["red"]
+
+    def test_no_start_inside_blackout(self):
+        scheduler = Scheduler()
+        occupancy = SlotOccupancy(DAY_SLOTS, scheduler._start_mask(START, DAY_SLOTS))
+        occupancy.mark(1, 0, 58)                 # busy until 22:30, blackout until 05:30
+        fit = self._run(scheduler, {1: _printer(1)}, occupancy, _job(1.0))
+        assert fit["start_time"] == datetime(2026, 3, 3, 5, 30)
@@ -20,7 +20,8 @@ ORM-managed tables (Base.metadata.create_all):
   modules/jobs/models.py:
     - jobs (30+ columns)
     - scheduler_runs (id, run_at, total_jobs, scheduled_count, skipped_count,
-                      setup_blocks, avg_match_score, avg_job_duration, notes)
+                      setup_blocks, avg_match_score, avg_job_duration, notes,
+                      mode, delta_size, changed_count, duration_ms)
     - print_presets (id, name, model_id, item_name, quantity, priority,
                      duration_hours, colors_required, filament_type, required_tags,
                      notes, created_at)
@@ -0,0 +1,216 @@
+"""
+Contract test — full-text search index (core/search_index.py) and
+normalized archive tags (modules/archives/archive_tags.py).
+
+Global search and the archive `search` filter used LIKE '%q%' scans,
+and tag filters matched four LIKE patterns against the comma-separated
+tags column. Archives, models and jobs now have an FTS5 index kept in
+sync by triggers, and archive tags are also stored one row per tag.
+
+Covers:
+  1. match_query() turns search text into prefix terms and never passes
+     FTS syntax through; text without words gives None.
+  2. The index follows inserts, updates and deletes made with raw SQL,
+     matches word prefixes in any column, ignores diacritics and ranks
+     name matches above notes matches.
+  3. ensure_schema() indexes rows that existed before it ran and is
+     safe to run again.
+  4. GET /search returns ranked, org-scoped models and jobs by prefix.
+  5. GET /archives `search` matches name, tags and notes; `tag` is an
+     exact match through print_archive_tags.
+  6. Tag edits, renames and deletes keep print_archive_tags in sync with
+     print_archives.tags; backfill() fills it for older archives.
+
+Run without container: pytest tests/test_contracts/test_search_index.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core import search_index  # noqa: E402
+from core.base import Base, JobStatus  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.archives import archive_tags  # noqa: E402
+from modules.archives.routes.archives_crud import (  # noqa: E402
+    TagsUpdate, delete_archive, list_archives, update_archive_tags,
+)
+from modules.archives.routes.tags import TagRename, delete_tag, list_tags, rename_tag  # noqa: E402
+from modules.jobs.models import Job  # noqa: E402
+from modules.models_library.models import Model  # noqa: E402
+from modules.system.routes_admin import global_search  # noqa: E402
+
+ADMIN = {"id": 1, "role": "admin", "group_id": None}
+MIGRATIONS = BACKEND_DIR / "modules" / "archives" / "migrations"
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "odin.db"
+    eng = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=eng)
+    conn = sqlite3.connect(path)
+    for sql_file in sorted(MIGRATIONS.glob("*.sql")):
+        conn.executescript(sql_file.read_text())
+    conn.close()
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    search_index.ensure_schema(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def _archive(db, name, tags="", notes=None, printer_id=None):
+    archive_id = db.execute(
+        text("INSERT INTO print_archives (print_name, tags, notes, printer_id, status) "
+             "VALUES (:name, :tags, :notes, :pid, 'completed')"),
+        {"name": name, "tags": tags, "notes": notes, "pid": printer_id},
+    ).lastrowid
+    db.commit()
+    return archive_id
+
+
+def _matches(db, table, q):
+    rows = db.execute(text(search_index.hits_sql(table) + " ORDER BY rank"),
+                      {"search_q": search_index.match_query(q)}).fetchall()
+    return [r.id for r in rows]
+
+
+def _list(db, user=ADMIN, search=None, tag=None):
+    result = list_archives(page=1, per_page=50, printer_id=None, status=None, search=search,
+                           start_date=None, end_date=None, tag=tag, user=user, db=db)
+    return sorted(item["print_name"] for item in result["items"])
+
+
+class TestMatchQuery:
+    def test_prefix_terms(self):
+        assert search_index.match_query("Spag  PLATE-2") == '"spag"* "plate"* "2"*'
+        assert search_index.match_query('a"b OR c* NEAR(d)') == '"a"* "b"* "or"* "c"* "near"* "d"*'
+        assert search_index.match_query("snake_case") == '"snake"* "case"*'
+
+    def test_no_words(self):
+        assert search_index.match_query("  %% -- ") is None
+        assert len(search_index.match_query("w " * 100).split()) == search_index.MAX_TERMS
+
+
+class TestIndexMaintenance:
+    def test_follows_raw_writes(self, db):
+        a = _archive(db, "Benchy calibration", tags="PETG, speed", notes="stringing on the hull")
+        b = _archive(db, "Crème brûlée mold", notes="benchy-sized")
+        assert _matches(db, "print_archives", "bench") == [a, b]   # name match ranks first
+        assert _matches(db, "print_archives", "creme") == [b]
+        assert _matches(db, "print_archives", "pet spe") == [a]
+        assert _matches(db, "print_archives", "pet hull") == [a]
+        assert _matches(db, "print_archives", "pet mold") == []
+
+        db.execute(text("UPDATE print_archives SET print_name = 'Hull test', notes = NULL WHERE id = :id"),
+                   {"id": b})
+        db.execute(text("DELETE FROM print_archives WHERE id = :id"), {"id": a})
+        db.commit()
+        assert _matches(db, "print_archives", "bench") == []
+        assert _matches(db, "print_archives", "hull") == [b]
+        db.execute(text("INSERT INTO print_archives_fts(print_archives_fts) VALUES ('integrity-check')"))
+
+    def test_existing_rows_indexed_once(self, engine):
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO models (name, notes) VALUES ('Gear housing', 'M3 inserts')"))
+        search_index.ensure_schema(engine)
+        search_index.ensure_schema(engine)
+        with sessionmaker(bind=engine)() as db:
+            assert len(_matches(db, "models", "gear")) == 1
+            assert len(_matches(db, "models", "insert")) == 1
+
+
+class TestGlobalSearch:
+    def test_ranked_prefix_and_org_scoped(self, db):
+        db.add_all([
+            Model(name="Bracket mount", notes=None, org_id=None),
+            Model(name="Wall hook", notes="replaces the old bracket", org_id=None),
+            Model(name="Bracket v2", org_id=7),
+            Job(item_name="Bracket mount x4", status=JobStatus.PENDING, quantity=1, priority=3),
+            Job(item_name="Shelf", notes="bracket set", status=JobStatus.COMPLETED, quantity=1,
+                priority=3, charged_to_org_id=7),
+        ])
+        db.commit()
+
+        result = global_search(q="brack", db=db, current_user=ADMIN)
+        assert [m["name"] for m in result["models"]][-1] == "Wall hook"
+        assert {m["name"] for m in result["models"]} == {"Bracket mount", "Bracket v2", "Wall hook"}
+        assert [j["name"] for j in result["jobs"]] == ["Bracket mount x4", "Shelf"]
+
+        scoped = global_search(q="brack", db=db, current_user={"id": 2, "role": "viewer", "group_id": 3})
+        assert [m["name"] for m in scoped["models"]] == ["Bracket mount", "Wall hook"]
+        assert [j["name"] for j in scoped["jobs"]] == ["Bracket mount x4"]
+
+        assert global_search(q="?!", db=db, current_user=ADMIN)["models"] == []
+
+
+class TestArchiveFilters:
+    def test_search_and_tag(self, db):
+        _archive(db, "Benchy", tags="calibration, PETG")
+        _archive(db, "Vase", tags="PETG-CF", notes="calibration print for flow")
+        _archive(db, "Gridfinity bin", tags="storage")
+        for name, tags in (("Benchy", ["calibration", "PETG"]), ("Vase", ["PETG-CF"]),
+                           ("Gridfinity bin", ["storage"])):
+            archive_id = db.execute(text("SELECT id FROM print_archives WHERE print_name = :n"),
+                                    {"n": name}).scalar()
+            archive_tags.set_tags(db, archive_id, tags)
+        db.commit()
+
+        assert _list(db, search="calib") == ["Benchy", "Vase"]
+        assert _list(db, search="grid bin") == ["Gridfinity bin"]
+        assert _list(db, search="%") == []
+        assert _list(db, tag="PETG") == ["Benchy"]
+        assert _list(db, tag="PETG", search="calibration") == ["Benchy"]
+
+
+class TestTags:
+    def _tag_rows(self, db):
+        return sorted(tuple(r) for r in db.execute(text("SELECT archive_id, tag FROM print_archive_tags")))
+
+    def test_writes_keep_table_in_sync(self, db):
+        a = _archive(db, "A")
+        b = _archive(db, "B")
+        assert update_archive_tags(a, TagsUpdate(tags=[" red ", "blue", "red", ""]), user=ADMIN, db=db) == \
+            {"tags": ["red", "blue"]}
+        update_archive_tags(b, TagsUpdate(tags=["blue"]), user=ADMIN, db=db)
+        assert list_tags(user=ADMIN, db=db) == {"tags": [{"name": "blue", "count": 2}, {"name": "red", "count": 1}]}
+
+        assert rename_tag(TagRename(old="blue", new="red"), user=ADMIN, db=db) == {"updated": 2}
+        assert self._tag_rows(db) == [(a, "red"), (b, "red")]
+        assert db.execute(text("SELECT tags FROM print_archives WHERE id = :id"), {"id": a}).scalar() == "red"
+
+        assert delete_tag("red", user=ADMIN, db=db) == {"updated": 2}
+        assert self._tag_rows(db) == []
+        update_archive_tags(a, TagsUpdate(tags=["green"]), user=ADMIN, db=db)
+        delete_archive(a, user=ADMIN, db=db)
+        assert self._tag_rows(db) == []
+
+    def test_backfill(self, db, engine):
+        a = _archive(db, "Old", tags="calibration, PLA")
+        b = _archive(db, "Tagged", tags="")
+        archive_tags.set_tags(db, b, ["PLA"])
+        db.commit()
+        assert archive_tags.backfill(engine) == 1
+        assert archive_tags.backfill(engine) == 0
+        assert self._tag_rows(db) == sorted([(a, "calibration"), (a, "PLA"), (b, "PLA")])
@@ -0,0 +1,250 @@
+"""
+Contract test — telemetry retention tiers and downsampled series
+(modules/printers/telemetry_rollups.py, printers migration 002).
+
+Raw printer_telemetry / ams_telemetry rows are kept 24h; 1-minute and
+15-minute rollups hold older data, and chart series are downsampled in
+SQL to at most max_points buckets.
+
+Covers:
+  1. The printers migrations apply cleanly, add the composite indexes
+     and leave the schema unchanged when re-applied.
+  2. maintain() rolls up complete buckets (avg/min/max, sample count)
+     including the existing history, and is idempotent.
+  3. Retention: raw rows past 24h are dropped only after every tier has
+     rolled them up; rollups expire per tier.
+  4. Tier choice: raw for short windows, rollups for long ones; an
+     explicit resolution the source does not keep is rejected.
+  5. Series never exceed max_points, keep spikes in min/max, and include
+     raw rows newer than the tier's watermark.
+
+Run without container: pytest tests/test_contracts/test_telemetry_rollups.py -v
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+sqlalchemy = pytest.importorskip("sqlalchemy")
+
+from sqlalchemy import create_engine, text  # noqa: E402
+
+from modules.printers import telemetry_rollups as tr  # noqa: E402
+
+MIGRATIONS = BACKEND_DIR / "modules" / "printers" / "migrations"
+NOW = 1_800_000_000 - 1_800_000_000 % 900 + 300   # 5 minutes into a 15-minute bucket
+HOUR = 3600
+
+
+@pytest.fixture
+def engine(tmp_path):
+    path = tmp_path / "telemetry.db"
+    conn = sqlite3.connect(path)
+    for migration in sorted(MIGRATIONS.glob("*.sql")):
+        conn.executescript(migration.read_text())
+    conn.close()
+    eng = create_engine(f"sqlite:///{path}")
+    yield eng
+    eng.dispose()
+
+
+def _sample(conn, at, printer_id=1, bed=60.0, nozzle=210.0, target=215.0, fan=50):
+    conn.execute(text(
+        "INSERT INTO printer_telemetry (printer_id, bed_temp, nozzle_temp, bed_target, nozzle_target, "
+        "fan_speed, recorded_at) VALUES (:pid, :bed, :noz, 60, :target, :fan, :at)"
+    ), {"pid": printer_id, "bed": bed, "noz": nozzle, "target": target, "fan": fan, "at": tr._ts(at)})
+
+
+def _ams(conn, at, unit=0, humidity=3.0, temperature=25.0):
+    conn.execute(text(
+        "INSERT INTO ams_telemetry (printer_id, ams_unit, humidity, temperature, recorded_at) "
+        "VALUES (1, :unit, :h, :t, :at)"
+    ), {"unit": unit, "h": humidity, "t": temperature, "at": tr._ts(at)})
+
+
+def _fill(engine, start, end, every=60, **kwargs):
+    with engine.begin() as conn:
+        for at in range(start, end, every):
+            _sample(conn, at, **kwargs)
+
+
+def _count(engine, table, where="1=1"):
+    with engine.connect() as conn:
+        return conn.execute(text(f"SELECT COUNT(*) FROM {table} WHERE {where}")).scalar()
+
+
+class TestMigration:
+    def test_composite_indexes(self, engine, tmp_path):
+        def indexes():
+            with engine.connect() as conn:
+                return {r[0] for r in conn.execute(text("SELECT name FROM sqlite_master WHERE type='index'"))}
+
+        names = indexes()
+        assert "idx_printer_telemetry_printer_time" in names
+        assert "idx_ams_telemetry_printer_time" in names
+        # Migrations are re-applied at every start; the schema must not change.
+        conn = sqlite3.connect(tmp_path / "telemetry.db")
+        for migration in sorted(MIGRATIONS.glob("*.sql")):
+            conn.executescript(migration.read_text())
+        conn.close()
+        assert indexes() == names
+
+    def test_series_query_uses_composite_index(self, engine):
+        with engine.connect() as conn:
+            plan = " ".join(str(r[-1]) for r in conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT * FROM printer_telemetry WHERE printer_id = 1 AND recorded_at >= '2026'"
+            )))
+        assert "idx_printer_telemetry_printer_time" in plan
+
+
+class TestMaintain:
+    def test_rolls_up_history_with_min_max(self, engine):
+        start = NOW - 2 * HOUR
+        _fill(engine, start, NOW)
+        with engine.begin() as conn:
+            _sample(conn, start + 30, nozzle=250.0)   # spike inside the first minute
+        written = tr.maintain(engine, now=NOW + 30)
+        assert written["printer_telemetry:60"] == 120
+        assert written["printer_telemetry:900"] == 8
+        with engine.connect() as conn:
+            first = conn.execute(text(
+                "SELECT samples, nozzle_temp, nozzle_temp_min, nozzle_temp_max, nozzle_target "
+                "FROM printer_telemetry_rollup WHERE resolution = 60 ORDER BY bucket LIMIT 1"
+            )).one()
+        assert first.samples == 2
+        assert first.nozzle_temp == pytest.approx(230.0)
+        assert (first.nozzle_temp_min, first.nozzle_temp_max) == (210.0, 250.0)
+        assert first.nozzle_target == 215.0
+
+    def test_idempotent_and_incremental(self, engine):
+        _fill(engine, NOW - HOUR, NOW)
+        tr.maintain(engine, now=NOW)
+        assert tr.maintain(engine, now=NOW) == {}
+        rows = _count(engine, "printer_telemetry_rollup", "resolution = 60")
+        _fill(engine, NOW, NOW + 600)
+        tr.maintain(engine, now=NOW + 600)
+        assert _count(engine, "printer_telemetry_rollup", "resolution = 60") == rows + 10
+
+    def test_only_closed_buckets(self, engine):
+        _fill(engine, NOW - 600, NOW)
+        tr.maintain(engine, now=NOW)
+        with engine.connect() as conn:
+            mark = conn.execute(text(
+                "SELECT rolled_until FROM telemetry_rollup_state WHERE series = 'printer_telemetry:900'"
+            )).scalar()
+        assert mark == NOW - 300      # the open 15-minute bucket is left for later
+        assert _count(engine, "printer_telemetry_rollup", "resolution = 900") == 1
+
+    def test_retention(self, engine):
+        _fill(engine, NOW - 3 * 86400, NOW, every=900)
+        with engine.begin() as conn:
+            _ams(conn, NOW - 2 * 86400)
+            _ams(conn, NOW - HOUR)
+        tr.maintain(engine, now=NOW)
+        assert _count(engine, "printer_telemetry", f"recorded_at < '{tr._ts(NOW - tr.RAW_RETENTION)}'") == 0
+        assert _count(engine, "printer_telemetry") == 24 * 4
+        assert _count(engine, "ams_telemetry") == 1
+        assert _count(engine, "ams_telemetry_rollup") == 2
+        # Rollups expire per tier.
+        tr.maintain(engine, now=NOW + 8 * 86400)
+        assert _count(engine, "printer_telemetry_rollup", "resolution = 60") == 0
+        assert _count(engine, "printer_telemetry_rollup", "resolution = 900") == 3 * 24 * 4
+
+    def test_raw_kept_until_rolled_up(self, engine, monkeypatch):
+        _fill(engine, NOW - 2 * 86400, NOW - 86400 - HOUR, every=300)
+        # Watermarks stuck two days back (as if maintain() had not
+        # managed to roll anything up since).
+        with engine.begin() as conn:
+            conn.execute(text(
+                "INSERT INTO telemetry_rollup_state (series, rolled_until) VALUES "
+                "('printer_telemetry:60', :early), ('printer_telemetry:900', :early)"
+            ), {"early": NOW - 2 * 86400 - HOUR})
+        monkeypatch.setattr(tr, "_SETTLE", 3 * 86400)
+        tr.maintain(engine, now=NOW)
+        assert _count(engine, "printer_telemetry_rollup") == 0
+        assert _count(engine, "printer_telemetry") == 23 * 12
+
+
+class TestTiers:
+    @pytest.mark.parametrize("hours,max_points,expected", [
+        (6, 1000, 0),
+        (24, 1000, 60),      # 87s buckets: the 1m tier is fine enough
+        (48, 1000, 60),
+        (168, 1000, 900),    # 672 points from the 15m tier beats 10080 regrouped rows
+        (168, 300, 900),
+        (720, 1000, 900),
+        (48, 10000, 60),     # raw would be finer, but raw doesn't cover 48h
+    ])
+    def test_pick_tier(self, hours, max_points, expected):
+        res, step = tr.pick_tier(tr.PRINTER, hours * HOUR, max_points)
+        assert res == expected
+        assert hours * HOUR / step <= max_points
+        if res:
+            assert step % res == 0
+
+    def test_resolution_not_kept(self):
+        with pytest.raises(ValueError):
+            tr.pick_tier(tr.AMS, 24 * HOUR, 100, "1m")
+
+
+class TestSeries:
+    def test_week_downsampled_to_max_points(self, engine):
+        _fill(engine, NOW - 7 * 86400, NOW)
+        _fill(engine, NOW - 7 * 86400, NOW, printer_id=2, bed=99.0)
+        tr.maintain(engine, now=NOW)
+        with engine.connect() as conn:
+            points = tr.printer_series(conn, 1, hours=168, max_points=500, now=NOW)
+        assert 250 <= len(points) <= 500
+        assert all(p["bed_temp"] == 60.0 for p in points)     # printer 2 not mixed in
+        assert set(points[0]) == {
+            "recorded_at", "bed_temp", "bed_temp_min", "bed_temp_max", "nozzle_temp",
+            "nozzle_temp_min", "nozzle_temp_max", "bed_target", "nozzle_target", "fan_speed",
+        }
+
+    def test_spike_survives_downsampling(self, engine):
+        _fill(engine, NOW - 86400, NOW)
+        with engine.begin() as conn:
+            _sample(conn, NOW - 5 * HOUR + 1, nozzle=300.0)
+        tr.maintain(engine, now=NOW)
+        with engine.connect() as conn:
+            points = tr.printer_series(conn, 1, hours=24, max_points=50, now=NOW)
+        assert len(points) <= 50
+        assert max(p["nozzle_temp_max"] for p in points) == 300.0
+        assert max(p["nozzle_temp"] for p in points) < 300.0
+
+    def test_recent_raw_rows_after_watermark(self, engine):
+        _fill(engine, NOW - 2 * 86400, NOW)
+        tr.maintain(engine, now=NOW)
+        _fill(engine, NOW, NOW + 240, nozzle=180.0)   # not rolled up yet
+        with engine.connect() as conn:
+            points = tr.printer_series(conn, 1, hours=48, max_points=2880, now=NOW + 240)
+        assert points[-1]["nozzle_temp"] == 180.0
+        assert len(points) == 2 * 24 * 60
+
+    def test_raw_resolution(self, engine):
+        _fill(engine, NOW - HOUR, NOW)
+        with engine.connect() as conn:
+            points = tr.printer_series(conn, 1, hours=1, max_points=1000, resolution="raw", now=NOW)
+        assert len(points) == 60
+        assert points[0]["recorded_at"] == tr._ts(NOW - HOUR)
+
+    def test_ams_series_per_unit(self, engine):
+        with engine.begin() as conn:
+            for at in range(NOW - 3 * 86400, NOW, 300):
+                _ams(conn, at, unit=0, humidity=2.0)
+                _ams(conn, at, unit=1, humidity=4.0)
+        tr.maintain(engine, now=NOW)
+        with engine.connect() as conn:
+            units = tr.ams_series(conn, 1, hours=72, max_points=100, now=NOW)
+            one = tr.ams_series(conn, 1, hours=72, max_points=100, unit=1, now=NOW)
+        assert set(units) == {0, 1}
+        assert all(len(v) <= 100 for v in units.values())
+        assert all(p["humidity"] == 2.0 for p in units[0])
+        assert set(one) == {1}
+        assert one[1] == units[1]
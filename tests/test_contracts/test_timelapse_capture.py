@@ -0,0 +1,203 @@
+"""
+Contract test — concurrent timelapse capture
+(modules/archives/timelapse_capture.py).
+
+Each tick fetches every capturing printer's frame concurrently with a
+per-printer deadline, numbers frames from an in-memory counter instead of
+listing the frames directory, and hands finished prints to a bounded
+encode pool instead of running ffmpeg in the capture loop.
+
+Covers:
+  1. A hung camera costs its own deadline, not the other printers' frames.
+  2. Frames are numbered 1..n from the counter; frame_count is written
+     once per tick with the counter value.
+  3. A capture resumed after a restart continues after the frames on disk.
+  4. Failed or too-small frames neither advance the counter nor leave gaps.
+  5. A frame the vision daemon just put in the shared frame cache is used
+     instead of fetching the camera again.
+  6. An ended print is queued for encoding once, off the capture loop,
+     even when the stale sweep finds it too.
+
+Run without container: pytest tests/test_contracts/test_timelapse_capture.py -v
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("httpx")
+
+from sqlalchemy import create_engine, event, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from modules.archives import timelapse_capture  # noqa: E402
+
+JPEG = b"\xff\xd8" + b"\0" * 2000
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    eng = create_engine(f"sqlite:///{tmp_path / 'odin.db'}", connect_args={"check_same_thread": False})
+    with eng.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE printers (id INTEGER PRIMARY KEY, name TEXT, timelapse_enabled INTEGER, "
+            "is_active INTEGER, gcode_state TEXT)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE jobs (id INTEGER PRIMARY KEY, printer_id INTEGER, item_name TEXT, "
+            "status TEXT, actual_start DATETIME)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE timelapses (id INTEGER PRIMARY KEY, printer_id INTEGER, print_job_id INTEGER, "
+            "filename TEXT, frame_count INTEGER, status TEXT, created_at DATETIME, completed_at DATETIME, "
+            "duration_seconds REAL, file_size_mb REAL)"
+        ))
+        for pid in (1, 2, 3):
+            conn.execute(text("INSERT INTO printers VALUES (:id, :name, 1, 1, 'RUNNING')"),
+                         {"id": pid, "name": f"P{pid}"})
+            conn.execute(text("INSERT INTO jobs VALUES (:id, :id, 'part', 'printing', CURRENT_TIMESTAMP)"),
+                         {"id": pid})
+    monkeypatch.setattr(timelapse_capture, "SessionLocal", sessionmaker(bind=eng))
+    monkeypatch.setattr(timelapse_capture, "TIMELAPSE_DIR", tmp_path / "timelapses")
+    monkeypatch.setenv("ODIN_FRAME_CACHE_DIR", str(tmp_path / "frames"))
+    yield eng
+    eng.dispose()
+
+
+@pytest.fixture
+def encoded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(timelapse_capture, "encode_timelapse",
+                        lambda tid: calls.append((tid, threading.current_thread().name)))
+    return calls
+
+
+class FakeClient:
+    """go2rtc stand-in: a JPEG per printer, hanging or failing on request."""
+
+    def __init__(self, hang=(), fail=()):
+        self.hang, self.fail = set(hang), set(fail)
+        self.requested = []
+
+    async def get(self, url):
+        pid = int(url.rsplit("printer_", 1)[1])
+        self.requested.append(pid)
+        if pid in self.hang:
+            await asyncio.sleep(30)
+        if pid in self.fail:
+            return SimpleNamespace(status_code=200, content=b"oops")
+        return SimpleNamespace(status_code=200, content=JPEG)
+
+
+def _frames(tid):
+    return sorted(p.name for p in timelapse_capture.frame_dir(tid).iterdir())
+
+
+def _frame_counts(db):
+    with db.connect() as conn:
+        return dict(conn.execute(text("SELECT printer_id, frame_count FROM timelapses ORDER BY printer_id")).all())
+
+
+def _scheduler(**kwargs):
+    """Scheduler that fetches on every tick (ticks here are milliseconds apart)."""
+    return timelapse_capture.CaptureScheduler(frame_age=0, **kwargs)
+
+
+def _tick(scheduler, client):
+    return asyncio.run(scheduler.tick(client))
+
+
+class TestTick:
+    def test_hung_camera_does_not_hold_up_the_fleet(self, db, encoded):
+        scheduler = _scheduler(timeout=0.3)
+        started = time.monotonic()
+        assert _tick(scheduler, FakeClient(hang={2})) == 2
+        assert time.monotonic() - started < 2
+        assert _frame_counts(db) == {1: 1, 2: 0, 3: 1}
+
+    def test_counter_numbers_frames(self, db, encoded, monkeypatch):
+        scheduler = _scheduler(timeout=1)
+        _tick(scheduler, FakeClient())
+        listed = []
+        monkeypatch.setattr(timelapse_capture, "count_frames", lambda tid: listed.append(tid) or 0)
+        updates = []
+
+        @event.listens_for(db, "before_cursor_execute")
+        def capture(conn, cursor, statement, parameters, context, executemany):
+            if statement.startswith("UPDATE timelapses"):
+                updates.append(len(parameters) if executemany else 1)
+
+        for _ in range(3):
+            _tick(scheduler, FakeClient())
+        assert listed == []  # the directory is not listed again
+        assert updates == [3, 3, 3]  # one statement per tick for all printers
+        assert _frame_counts(db) == {1: 4, 2: 4, 3: 4}
+        tid = scheduler.active[(1, 1)]
+        assert _frames(tid) == [f"frame_{n:06d}.jpg" for n in range(1, 5)]
+
+    def test_resumes_after_restart(self, db, encoded):
+        first = _scheduler(timeout=1)
+        for _ in range(2):
+            _tick(first, FakeClient())
+        restarted = _scheduler(timeout=1)
+        _tick(restarted, FakeClient())
+        tid = restarted.active[(1, 1)]
+        assert tid == first.active[(1, 1)]
+        assert _frames(tid)[-1] == "frame_000003.jpg"
+        assert _frame_counts(db)[1] == 3
+
+    def test_bad_frames_leave_no_gaps(self, db, encoded):
+        scheduler = _scheduler(timeout=1)
+        _tick(scheduler, FakeClient())
+        _tick(scheduler, FakeClient(fail={1}))
+        _tick(scheduler, FakeClient())
+        tid = scheduler.active[(1, 1)]
+        assert _frames(tid) == ["frame_000001.jpg", "frame_000002.jpg"]
+        assert _frame_counts(db) == {1: 2, 2: 3, 3: 3}
+
+    def test_uses_recent_vision_frame(self, db, encoded):
+        from core.frame_cache import FrameCache
+
+        vision_jpeg = b"\xff\xd8vision" + b"\1" * 2000
+        FrameCache().publish(2, vision_jpeg)  # the vision daemon just fetched printer 2
+        scheduler = timelapse_capture.CaptureScheduler(timeout=1)
+        client = FakeClient()
+        assert _tick(scheduler, client) == 3
+        assert sorted(client.requested) == [1, 3]
+        tid = scheduler.active[(2, 2)]
+        assert (timelapse_capture.frame_dir(tid) / "frame_000001.jpg").read_bytes() == vision_jpeg
+
+
+class TestEncode:
+    def test_ended_print_encoded_once_in_pool(self, db, monkeypatch):
+        scheduler = _scheduler(timeout=1)
+        _tick(scheduler, FakeClient())
+        tid = scheduler.active[(2, 2)]
+        with db.begin() as conn:
+            conn.execute(text("UPDATE jobs SET status = 'completed' WHERE id = 2"))
+
+        release, encoded = threading.Event(), []
+
+        def slow_encode(t):
+            release.wait(5)
+            encoded.append((t, threading.current_thread().name))
+
+        monkeypatch.setattr(timelapse_capture, "encode_timelapse", slow_encode)
+        _tick(scheduler, FakeClient())  # returns while the encode is still running
+        assert (2, 2) not in scheduler.active and tid in scheduler.encoding
+        timelapse_capture.finalize_stale_timelapses(scheduler.encode)  # the sweep finds it too
+        release.set()
+        scheduler._pool.shutdown(wait=True)
+        assert [t for t, _ in encoded] == [tid]
+        assert encoded[0][1].startswith("timelapse-encode")
+        assert tid not in scheduler.encoding
@@ -0,0 +1,180 @@
+"""
+Contract test — streaming training-data export (core/zip_stream.py,
+modules/vision/training_export.py).
+
+GET /vision/training-data/export used to build the whole YOLO dataset
+ZIP in memory and decode every image with cv2.imread to learn its size.
+It now streams the archive as detections are read, stores frames
+without recompression, and takes image sizes from metadata recorded at
+capture or from the JPEG header.
+
+Covers:
+  1. jpeg_size() reads the same size cv2 decodes, past EXIF/APP segments
+     and for progressive JPEGs; non-JPEGs and truncated files give None.
+  2. iter_zip() streams a valid archive in chunks: files stored, bytes
+     deflated, unreadable files left out.
+  3. The export holds the same images and labels as the in-memory
+     version, skips frames outside the frames directory, and uses the
+     recorded frame size without opening the image.
+  4. Labeling a detection keeps the frame size recorded at capture.
+
+Run without container: pytest tests/test_contracts/test_training_export.py -v
+"""
+
+import asyncio
+import io
+import json
+import sys
+import zipfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+from core import zip_stream  # noqa: E402
+from core.base import Base  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.vision import training_export  # noqa: E402
+from modules.vision.models import VisionDetection  # noqa: E402
+from modules.vision.routes.detections import export_training_data, label_training_data  # noqa: E402
+
+ADMIN = {"id": 1, "role": "admin", "group_id": None}
+
+
+def _jpeg(path, w, h, params=()):
+    img = np.random.default_rng(w).integers(0, 256, (h, w, 3), dtype=np.uint8)
+    ok, buf = cv2.imencode(".jpg", img, list(params))
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_bytes(buf.tobytes())
+    return buf.tobytes()
+
+
+def _drain(response):
+    async def run():
+        return [chunk async for chunk in response.body_iterator]
+    return asyncio.run(run())
+
+
+class TestJpegSize:
+    def test_matches_decode(self, tmp_path):
+        cases = [
+            (_jpeg(tmp_path / "a.jpg", 64, 48), (64, 48)),
+            (_jpeg(tmp_path / "b.jpg", 33, 97, [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]), (33, 97)),
+        ]
+        exif = b"\xff\xe1" + (2 + 300).to_bytes(2, "big") + b"Exif\0\0" + b"\xff" * 294
+        (tmp_path / "c.jpg").write_bytes(cases[0][0][:2] + exif + cases[0][0][2:])
+        for name, (_, size) in zip("ab", cases):
+            img = cv2.imread(str(tmp_path / f"{name}.jpg"))
+            assert training_export.jpeg_size(str(tmp_path / f"{name}.jpg")) == size == img.shape[1::-1]
+        assert training_export.jpeg_size(str(tmp_path / "c.jpg")) == (64, 48)
+
+    def test_not_a_jpeg(self, tmp_path):
+        (tmp_path / "x.png").write_bytes(b"\x89PNG\r\n" + b"\0" * 100)
+        (tmp_path / "short.jpg").write_bytes(_jpeg(tmp_path / "full.jpg", 64, 48)[:40])
+        assert training_export.jpeg_size(str(tmp_path / "x.png")) is None
+        assert training_export.jpeg_size(str(tmp_path / "short.jpg")) is None
+        assert training_export.jpeg_size(str(tmp_path / "missing.jpg")) is None
+
+
+class TestZipStream:
+    def test_streams_valid_archive(self, tmp_path):
+        big = tmp_path / "big.jpg"
+        big.write_bytes(np.random.default_rng(0).bytes(600_000))
+        chunks = list(zip_stream.iter_zip(
+            [("notes.txt", b"hello " * 1000), ("images/big.jpg", big), ("gone.jpg", tmp_path / "gone.jpg")],
+            chunk_bytes=64 * 1024))
+        assert len(chunks) > 5
+        assert max(len(c) for c in chunks) < 2 * 64 * 1024
+        zf = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+        assert zf.testzip() is None
+        info = {i.filename: i for i in zf.infolist()}
+        assert list(info) == ["notes.txt", "images/big.jpg"]
+        assert info["images/big.jpg"].compress_type == zipfile.ZIP_STORED
+        assert info["notes.txt"].compress_type == zipfile.ZIP_DEFLATED
+        assert zf.read("images/big.jpg") == big.read_bytes()
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    eng = create_engine(f"sqlite:///{tmp_path / 'odin.db'}")
+    Base.metadata.create_all(bind=eng)
+    monkeypatch.setattr(training_export, "VISION_FRAMES_DIR", str(tmp_path / "frames"))
+    session = sessionmaker(bind=eng)()
+    yield session
+    session.close()
+    eng.dispose()
+
+
+def _detection(db, frame_path, status="confirmed", dtype="spaghetti", bbox=(10, 20, 30, 40), meta=None):
+    det = VisionDetection(printer_id=1, detection_type=dtype, confidence=0.9, status=status,
+                          frame_path=frame_path, bbox_json=json.dumps(list(bbox)) if bbox else None,
+                          metadata_json=json.dumps(meta) if meta else None)
+    db.add(det)
+    db.commit()
+    return det
+
+
+def _legacy_label(path, class_id, bbox):
+    """What the in-memory export wrote: size from a full cv2.imread."""
+    ih, iw = cv2.imread(str(path)).shape[:2]
+    x1, y1, x2, y2 = bbox
+    return f"{class_id} {((x1 + x2) / 2) / iw:.6f} {((y1 + y2) / 2) / ih:.6f} {(x2 - x1) / iw:.6f} {(y2 - y1) / ih:.6f}\n"
+
+
+class TestExport:
+    def test_same_dataset_streamed(self, db, tmp_path):
+        frames = tmp_path / "frames"
+        _jpeg(frames / "1/a_spaghetti.jpg", 128, 96)
+        _jpeg(frames / "2/b_detachment.jpg", 160, 90)
+        _jpeg(frames / "2/c_first_layer.jpg", 64, 64)
+        _jpeg(tmp_path / "outside.jpg", 64, 64)
+        _detection(db, "1/a_spaghetti.jpg")
+        _detection(db, "2/b_detachment.jpg", dtype="detachment", status="dismissed", bbox=(0, 0, 80, 45))
+        _detection(db, "2/c_first_layer.jpg", dtype="first_layer", bbox=None)
+        _detection(db, "2/c_first_layer.jpg", status="pending")
+        _detection(db, "../outside.jpg")
+        _detection(db, "1/missing.jpg")
+
+        response = export_training_data(current_user=ADMIN, db=db)
+        assert response.headers["content-disposition"] == "attachment; filename=odin_training_data.zip"
+        zf = zipfile.ZipFile(io.BytesIO(b"".join(_drain(response))))
+        assert sorted(zf.namelist()) == [
+            "data.yaml", "images/a_spaghetti.jpg", "images/b_detachment.jpg", "images/c_first_layer.jpg",
+            "labels/a_spaghetti.txt", "labels/b_detachment.txt",
+        ]
+        assert zf.read("data.yaml").decode() == training_export.DATA_YAML
+        assert zf.read("images/b_detachment.jpg") == (frames / "2/b_detachment.jpg").read_bytes()
+        assert zf.getinfo("images/a_spaghetti.jpg").compress_type == zipfile.ZIP_STORED
+        assert zf.read("labels/a_spaghetti.txt").decode() == _legacy_label(frames / "1/a_spaghetti.jpg", 0, (10, 20, 30, 40))
+        assert zf.read("labels/b_detachment.txt").decode() == _legacy_label(frames / "2/b_detachment.jpg", 2, (0, 0, 80, 45))
+
+    def test_recorded_size_skips_the_image(self, db, tmp_path, monkeypatch):
+        _jpeg(tmp_path / "frames/1/a.jpg", 128, 96)
+        _detection(db, "1/a.jpg", meta={"frame_width": 1280, "frame_height": 960})
+        monkeypatch.setattr(training_export, "jpeg_size", lambda path: pytest.fail("header read"))
+        zf = zipfile.ZipFile(io.BytesIO(b"".join(_drain(export_training_data(current_user=ADMIN, db=db)))))
+        assert zf.read("labels/a.txt").decode() == "0 0.015625 0.031250 0.015625 0.020833\n"
+
+
+class TestLabel:
+    def test_keeps_capture_metadata(self, db):
+        det = _detection(db, "1/a.jpg", meta={"frame_width": 1280, "frame_height": 720})
+        label_training_data(det.id, request=None, current_user=ADMIN, db=db,
+                            body={"class": "detachment", "bbox": [1, 2, 3, 4]})
+        db.refresh(det)
+        assert json.loads(det.metadata_json) == {"frame_width": 1280, "frame_height": 720,
+                                                 "label_class": "detachment", "label_bbox": [1, 2, 3, 4]}
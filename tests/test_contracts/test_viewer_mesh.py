@@ -0,0 +1,240 @@
+"""
+Contract test — binary 3D viewer meshes (modules/models_library/mesh.py,
+jobs migration 006).
+
+Meshes are read from the .3mf with a streaming parser into NumPy arrays,
+decimated by vertex clustering and stored as a compact binary buffer
+(print_files.mesh_bin) served as application/octet-stream with an ETag.
+
+Covers:
+  1. read_model() yields the same mesh as a DOM walk, across objects,
+     with or without the 3MF namespace, without building the tree;
+     DTDs (entity expansion) are refused.
+  2. cluster() brings a large mesh under MAX_TRIANGLES and keeps its
+     shape; no collapsed, repeated or dangling triangles.
+  3. encode() / decode() round-trip within the quantization step; index
+     width follows the vertex count.
+  4. The mesh endpoints serve the buffer with an ETag and answer 304 to
+     If-None-Match; JSON for clients that only accept it; JSON meshes
+     of earlier versions are converted on first read.
+
+Run without container: pytest tests/test_contracts/test_viewer_mesh.py -v
+"""
+
+import io
+import json
+import struct
+import sys
+import tracemalloc
+import xml.etree.ElementTree as StdET
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+pytest.importorskip("fastapi")
+pytest.importorskip("defusedxml")
+
+from defusedxml import DTDForbidden  # noqa: E402
+from sqlalchemy import create_engine, text  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+
+from core.base import Base  # noqa: E402
+from core.db import _run_sql_file  # noqa: E402
+import core.models  # noqa: E402,F401
+for _mod in ("printers", "jobs", "inventory", "models_library", "vision",
+             "notifications", "orders", "archives", "system"):
+    __import__(f"modules.{_mod}.models")
+from modules.models_library import mesh  # noqa: E402
+from modules.models_library.routes import print_files as routes  # noqa: E402
+
+MODULES = BACKEND_DIR / "modules"
+VIEWER = {"id": 1, "role": "viewer", "group_id": None}
+NS = "http://schemas.microsoft.com/3dmanufacturing/core/2015/02"
+
+
+def _sphere(n=120, radius=50.0):
+    th, ph = np.meshgrid(np.linspace(0.05, np.pi - 0.05, n), np.linspace(0, 2 * np.pi, n, endpoint=False),
+                         indexing="ij")
+    v = np.stack([np.sin(th) * np.cos(ph), np.sin(th) * np.sin(ph), np.cos(th)], -1).reshape(-1, 3) * radius
+    idx = np.arange(n * n).reshape(n, n)
+    a, b = idx[:-1], idx[1:]
+    c, d = np.roll(b, -1, 1), np.roll(a, -1, 1)
+    t = np.concatenate([np.stack([a, b, c], -1).reshape(-1, 3), np.stack([a, c, d], -1).reshape(-1, 3)])
+    return v, t
+
+
+def _model_xml(objects, namespace=True):
+    """objects: list of (vertices, triangles) with per-object indices."""
+    out = [f'<model xmlns="{NS}">' if namespace else "<model>", '<metadata name="Title">t</metadata><resources>']
+    for i, (v, t) in enumerate(objects):
+        out.append(f'<object id="{i + 1}"><mesh><vertices>')
+        out += [f'<vertex x="{x!r}" y="{y!r}" z="{z!r}"/>' for x, y, z in v.tolist()]
+        out.append("</vertices><triangles>")
+        out += [f'<triangle v1="{a}" v2="{b}" v3="{c}"/>' for a, b, c in t.tolist()]
+        out.append("</triangles></mesh></object>")
+    out.append("</resources></model>")
+    return "".join(out).encode()
+
+
+def _dom(xml):
+    """The old extractor's walk, on a full DOM."""
+    verts, tris, offset = [], [], 0
+    for m in StdET.fromstring(xml).iter():
+        if m.tag.rpartition("}")[2] != "mesh":
+            continue
+        local = [[float(e.get(k)) for k in "xyz"] for e in m.iter() if e.tag.endswith("vertex")]
+        tris += [[int(e.get(k)) + offset for k in ("v1", "v2", "v3")] for e in m.iter() if e.tag.endswith("triangle")]
+        verts += local
+        offset += len(local)
+    return np.array(verts), np.array(tris)
+
+
+class TestReadModel:
+    @pytest.mark.parametrize("namespace", [True, False])
+    def test_matches_dom(self, namespace):
+        v1, t1 = _sphere(8)
+        v2, t2 = _sphere(6, radius=10)
+        xml = _model_xml([(v1, t1), (v2 + 100, t2)], namespace)
+        v, t = mesh.read_model(io.BytesIO(xml))
+        dv, dt = _dom(xml)
+        assert np.array_equal(v, dv) and np.array_equal(t, dt)
+        assert t.max() == len(v) - 1
+
+    def test_drops_dangling_triangles(self):
+        v, t = _sphere(6)
+        bad = np.vstack([t, [[0, 1, len(v)]]])  # points into the next object
+        xml = _model_xml([(v, bad), (v, t)])
+        _, got = mesh.read_model(io.BytesIO(xml))
+        assert len(got) == 2 * len(t)
+
+    def test_refuses_entities(self):
+        xml = (b'<?xml version="1.0"?><!DOCTYPE model [<!ENTITY a "1.0">]>'
+               b'<model><resources><object><mesh><vertices><vertex x="&a;" y="0" z="0"/>'
+               b'</vertices></mesh></object></resources></model>')
+        with pytest.raises(DTDForbidden):
+            mesh.read_model(io.BytesIO(xml))
+
+    def test_does_not_build_the_tree(self):
+        v, t = _sphere(100)
+        xml = _model_xml([(v, t)])
+        tracemalloc.start()
+        mesh.read_model(io.BytesIO(xml))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # The arrays themselves take 24 bytes per vertex and per triangle
+        # (grown by doubling); a DOM takes several hundred.
+        assert peak < 80 * (len(v) + len(t))
+
+
+class TestCluster:
+    def test_small_mesh_untouched(self):
+        v, t = _sphere(20)
+        cv, ct = mesh.cluster(v, t, max_triangles=len(t))
+        assert cv is v and ct is t
+
+    def test_decimates_and_keeps_shape(self):
+        v, t = _sphere(250)
+        cv, ct = mesh.cluster(v, t, max_triangles=5000)
+        assert 1000 < len(ct) <= 5000
+        radius = np.linalg.norm(cv, axis=1)
+        assert radius.max() <= 50.0 + 1e-9 and radius.min() > 47.0
+        assert ct.min() == 0 and ct.max() == len(cv) - 1
+        assert (ct[:, 0] != ct[:, 1]).all() and (ct[:, 1] != ct[:, 2]).all() and (ct[:, 0] != ct[:, 2]).all()
+        assert len(np.unique(np.sort(ct, axis=1), axis=0)) == len(ct)
+
+
+class TestEncoding:
+    def test_round_trip_quantized(self):
+        v, t = _sphere(40)
+        buf = mesh.encode(v, t)
+        dv, dt = mesh.decode(buf)
+        step = np.ptp(v, axis=0) / 65535
+        assert (np.abs(dv - v) <= step * 0.51 + 1e-4).all()
+        assert np.array_equal(dt, t)
+        # 40-byte header, 6 bytes per vertex, 2 bytes per index (+ padding)
+        assert len(buf) <= 40 + 6 * len(v) + 3 + 6 * len(t)
+
+    def test_float_positions_and_wide_indices(self):
+        v = np.random.default_rng(1).random((70_000, 3)) * 100
+        t = np.array([[0, 1, 69_999], [5, 6, 7]])
+        buf = mesh.encode(v, t, quantize=False)
+        flags = struct.unpack_from("<B", buf, 5)[0]
+        assert flags == 0
+        dv, dt = mesh.decode(buf)
+        assert np.array_equal(dv, v.astype(np.float32)) and np.array_equal(dt, t)
+        assert (len(buf) - 6 * 4) % 4 == 0  # indices stay 4-byte aligned
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "odin.db"
+    eng = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=eng)
+    for migration in sorted((MODULES / "jobs" / "migrations").glob("*.sql")):
+        _run_sql_file(str(path), migration)
+    session = sessionmaker(bind=eng)()
+    yield session
+    session.close()
+    eng.dispose()
+
+
+def _request(**headers):
+    raw = [(k.replace("_", "-").lower().encode(), v.encode()) for k, v in headers.items()]
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": raw, "query_string": b""})
+
+
+def _file(db, **cols):
+    cols.setdefault("metadata_status", "ready")
+    names = ", ".join(cols)
+    db.execute(text(f"INSERT INTO print_files (filename, {names}) VALUES ('f.3mf', "
+                    + ", ".join(f":{c}" for c in cols) + ")"), cols)
+    db.commit()
+    return db.execute(text("SELECT MAX(id) FROM print_files")).scalar()
+
+
+class TestEndpoints:
+    def test_binary_with_etag(self, db):
+        buf = mesh.encode(*_sphere(10))
+        file_id = _file(db, mesh_bin=buf, mesh_etag=mesh.etag(buf))
+        resp = routes.get_print_file_mesh(file_id, _request(), current_user=VIEWER, db=db)
+        assert resp.status_code == 200 and resp.media_type == "application/octet-stream"
+        assert resp.body == buf
+        etag = resp.headers["etag"]
+        assert etag == f'"{mesh.etag(buf)}"'
+        again = routes.get_print_file_mesh(file_id, _request(if_none_match=f'W/"x", {etag}'),
+                                           current_user=VIEWER, db=db)
+        assert again.status_code == 304 and again.body == b""
+
+    def test_json_for_json_clients(self, db):
+        v, t = _sphere(10)
+        buf = mesh.encode(v, t)
+        file_id = _file(db, mesh_bin=buf, mesh_etag=mesh.etag(buf))
+        resp = routes.get_print_file_mesh(file_id, _request(accept="application/json"), current_user=VIEWER, db=db)
+        data = json.loads(resp.body)
+        assert (data["vertex_count"], data["triangle_count"]) == (len(v), len(t))
+        assert np.allclose(np.array(data["vertices"]).reshape(-1, 3), v, atol=2e-3)
+
+    def test_legacy_json_converted(self, db):
+        v, t = _sphere(10)
+        legacy = json.dumps({"vertices": v.round(3).ravel().tolist(), "triangles": t.ravel().tolist(),
+                             "vertex_count": len(v), "triangle_count": len(t)})
+        file_id = _file(db, mesh_data=legacy)
+        resp = routes.get_print_file_mesh(file_id, _request(), current_user=VIEWER, db=db)
+        dv, dt = mesh.decode(resp.body)
+        assert np.array_equal(dt, t) and np.allclose(dv, v, atol=2e-3)
+        row = db.execute(text("SELECT mesh_data, mesh_etag FROM print_files WHERE id = :id"), {"id": file_id}).one()
+        assert row[0] is None and f'"{row[1]}"' == resp.headers["etag"]
+
+    def test_listing_omits_buffer(self, db):
+        buf = mesh.encode(*_sphere(10))
+        file_id = _file(db, mesh_bin=buf, mesh_etag=mesh.etag(buf), print_time_seconds=60)
+        assert "mesh_bin" not in routes.get_print_file(file_id, current_user=VIEWER, db=db)
+        assert all("mesh_bin" not in f for f in routes.list_print_files(limit=20, include_scheduled=True,
+                                                                         current_user=VIEWER, db=db))
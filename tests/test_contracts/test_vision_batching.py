@@ -0,0 +1,234 @@
+"""
+Contract test — batched vision inference across printers
+(modules/vision/inference_engine.py, modules/vision/inference_scheduler.py).
+
+Printer threads submit one request per frame for every detection type
+they need. The scheduler batches requests from all printers; the engine
+preprocesses each frame once per model input size and runs one session
+call per model with the frames on the batch dimension.
+
+Covers:
+  1. infer_batch() runs each model once per batch, on exactly the frames
+     that asked for it, preprocessing each frame once per input size;
+     every frame gets the detections of its own slice of the output.
+  2. Models with a fixed batch dimension run in chunks of that size; a
+     failing model only empties its own detections.
+  3. The scheduler folds concurrently submitted frames into one batch.
+  4. A printer thread makes one detect() call per frame.
+
+Run without container: pytest tests/test_contracts/test_vision_batching.py -v
+"""
+
+import sys
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+np = pytest.importorskip("numpy")
+cv2 = pytest.importorskip("cv2")
+pytest.importorskip("sqlalchemy")
+
+from modules.vision import inference_engine  # noqa: E402
+from modules.vision.detection_thread import PrinterVisionThread  # noqa: E402
+from modules.vision.inference_engine import Detections, VisionInferenceEngine  # noqa: E402
+from modules.vision.inference_scheduler import InferenceScheduler  # noqa: E402
+
+
+class FakeSession:
+    """YOLOv8-shaped output: one box per frame, confidence = mean input value."""
+
+    def __init__(self, batch="batch", fail=False):
+        self.batch = batch
+        self.fail = fail
+        self.runs = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name="images", shape=[self.batch, 3, "height", "width"])]
+
+    def get_outputs(self):
+        return [SimpleNamespace(name="output0")]
+
+    def run(self, _names, feeds):
+        x = feeds["images"]
+        self.runs.append(x.shape)
+        if self.fail:
+            raise RuntimeError("boom")
+        out = np.zeros((len(x), 5, 8), dtype=np.float32)
+        out[:, :4, 0] = [[20, 20, 8, 8]] * len(x)
+        out[:, 4, 0] = x.reshape(len(x), -1).mean(axis=1)
+        return [out]
+
+
+def _engine(**models):
+    engine = VisionInferenceEngine()
+    for dt, (session, size) in models.items():
+        batch = session.get_inputs()[0].shape[0]
+        engine._sessions[dt] = session
+        engine._model_info[dt] = {"id": 1, "name": dt, "input_size": size,
+                                  "max_batch": batch if isinstance(batch, int) else None}
+    return engine
+
+
+def _frame(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def _conf(result):
+    return round(result.best()["confidence"], 3) if len(result) else None
+
+
+class TestInferBatch:
+    def test_one_run_per_model(self, monkeypatch):
+        resizes = []
+        real_resize = cv2.resize
+
+        def counting_resize(img, size, *args, **kwargs):
+            resizes.append(size)
+            return real_resize(img, size, *args, **kwargs)
+
+        monkeypatch.setattr(inference_engine.cv2, "resize", counting_resize)
+        spaghetti, first_layer, detachment = FakeSession(), FakeSession(), FakeSession()
+        engine = _engine(spaghetti=(spaghetti, 64), first_layer=(first_layer, 64), detachment=(detachment, 32))
+        a, b, c = _frame(102), _frame(153), _frame(204)
+        results = engine.infer_batch([
+            (a, ["spaghetti", "first_layer", "detachment"]),
+            (b, ["spaghetti"]),
+            (c, ["first_layer", "detachment", "build_plate_empty"]),  # no model loaded for the last
+        ])
+
+        assert spaghetti.runs == [(2, 3, 64, 64)]
+        assert first_layer.runs == [(2, 3, 64, 64)]
+        assert detachment.runs == [(2, 3, 32, 32)]
+        # once per frame per input size, not once per model
+        assert sorted(resizes) == [(32, 32)] * 2 + [(64, 64)] * 3
+
+        assert {dt: _conf(r) for dt, r in results[0].items()} == {
+            "spaghetti": 0.4, "first_layer": 0.4, "detachment": 0.4}
+        assert {dt: _conf(r) for dt, r in results[1].items()} == {"spaghetti": 0.6}
+        assert {dt: _conf(r) for dt, r in results[2].items()} == {
+            "first_layer": 0.8, "detachment": 0.8, "build_plate_empty": None}
+        # boxes scaled back to each frame's own size
+        assert results[0]["spaghetti"].best()["bbox"] == [16.0, 12.0, 24.0, 18.0]
+
+    def test_matches_single_frame_preprocessing(self):
+        frame = np.random.default_rng(3).integers(0, 256, (90, 160, 3), dtype=np.uint8)
+        expected = cv2.resize(frame, (64, 64)).astype(np.float32) / 255.0
+        blob = VisionInferenceEngine()._preprocess([frame, frame], 64)
+        assert blob.shape == (2, 3, 64, 64) and blob.dtype == np.float32
+        assert np.array_equal(blob[1], np.transpose(expected, (2, 0, 1)))
+
+    def test_fixed_batch_and_failures(self):
+        fixed, broken = FakeSession(batch=1), FakeSession(fail=True)
+        engine = _engine(spaghetti=(fixed, 32), detachment=(broken, 32))
+        frames = [_frame(v) for v in (102, 153, 204)]
+        results = engine.infer_batch([(f, ["spaghetti", "detachment"]) for f in frames])
+        assert fixed.runs == [(1, 3, 32, 32)] * 3
+        assert [_conf(r["spaghetti"]) for r in results] == [0.4, 0.6, 0.8]
+        assert [len(r["detachment"]) for r in results] == [0, 0, 0]
+
+    def test_infer_single_frame(self):
+        session = FakeSession()
+        engine = _engine(spaghetti=(session, 32))
+        assert _conf(engine.infer("spaghetti", _frame(102))) == 0.4
+        assert len(engine.infer("first_layer", _frame(102))) == 0
+
+
+class TestScheduler:
+    def test_concurrent_frames_share_a_batch(self):
+        session = FakeSession()
+        engine = _engine(spaghetti=(session, 32))
+        scheduler = InferenceScheduler(engine, max_batch=8, max_wait=0.5)
+        futures = [scheduler.submit(_frame(v), ["spaghetti"]) for v in (102, 153, 204, 255)]
+        scheduler.start()
+        try:
+            assert [_conf(f.result(timeout=5)["spaghetti"]) for f in futures] == [0.4, 0.6, 0.8, 1.0]
+            assert session.runs == [(4, 3, 32, 32)]
+        finally:
+            scheduler.stop()
+            scheduler.join(timeout=5)
+        assert not scheduler.is_alive()
+
+    def test_batch_size_limit(self):
+        session = FakeSession()
+        engine = _engine(spaghetti=(session, 32))
+        scheduler = InferenceScheduler(engine, max_batch=2, max_wait=0.5)
+        futures = [scheduler.submit(_frame(51), ["spaghetti"]) for _ in range(5)]
+        scheduler.start()
+        try:
+            for f in futures:
+                f.result(timeout=5)
+            assert [shape[0] for shape in session.runs] == [2, 2, 1]
+        finally:
+            scheduler.stop()
+            scheduler.join(timeout=5)
+
+    def test_engine_detect_goes_through_scheduler(self, monkeypatch):
+        monkeypatch.setenv("ODIN_VISION_BATCH_WAIT_MS", "300")
+        session = FakeSession()
+        engine = _engine(spaghetti=(session, 32))
+        engine.start()
+        try:
+            results = [None] * 3
+            barrier = threading.Barrier(3)
+
+            def worker(i):
+                barrier.wait()
+                results[i] = engine.detect(_frame(51 * (i + 2)), ["spaghetti"])
+
+            threads = [threading.Thread(target=worker, args=(i,)) for i in range(3)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join(timeout=5)
+            assert [_conf(r["spaghetti"]) for r in results] == [0.4, 0.6, 0.8]
+            assert sum(shape[0] for shape in session.runs) == 3 and len(session.runs) < 3
+        finally:
+            engine.stop()
+
+
+class TestPrinterThread:
+    def test_one_request_per_frame(self):
+        calls = []
+
+        class Engine:
+            def has_model(self, dt):
+                return dt in ("spaghetti", "first_layer", "build_plate_empty")
+
+            def detect(self, frame, types):
+                calls.append(list(types))
+                return {dt: Detections(np.zeros((1, 4)), np.array([0.62]), np.zeros(1, dtype=int)) for dt in types}
+
+            def infer(self, dt, frame):
+                raise AssertionError("one detect() call per frame")
+
+        settings = {"spaghetti_threshold": 0.5, "first_layer_threshold": 0.7, "build_plate_empty_enabled": 0}
+        thread = PrinterVisionThread(1, "P1", Engine(), settings, current_layer=1, print_job_id=None)
+        thread._capture_frame = lambda: _frame(10)
+        thread._capture_and_analyze()
+        assert calls == [["spaghetti", "first_layer"]]
+        # each type judged against its own threshold
+        assert thread._history["spaghetti"] == [True] and thread._history["first_layer"] == [False]
+
+    def test_plate_check_in_the_same_request(self):
+        calls = []
+
+        class Engine:
+            def has_model(self, dt):
+                return True
+
+            def detect(self, frame, types):
+                calls.append(list(types))
+                return {dt: Detections.empty() for dt in types}
+
+        thread = PrinterVisionThread(1, "P1", Engine(), {"build_plate_empty_enabled": 1},
+                                     current_layer=0, print_job_id=None, gcode_state="IDLE")
+        thread._capture_frame = lambda: _frame(10)
+        thread._capture_and_analyze()
+        assert calls == [["spaghetti", "first_layer", "build_plate_empty"]]
+        assert thread._history["build_plate_empty"] == [False]
@@ -0,0 +1,177 @@
+"""
+Contract test — vectorized detection post-processing
+(modules/vision/inference_engine.py).
+
+YOLOv8 and Obico outputs are filtered, scaled and suppressed with NumPy
+array operations and returned as a Detections (boxes, scores, class ids,
+best first) instead of a list of dicts built box by box.
+
+Covers:
+  1. YOLOv8 output (either orientation) and Obico output give the same
+     detections as the per-box loops they replace.
+  2. nms() keeps the best box of each overlapping group, best first.
+  3. Models exported with NMS (Ultralytics metadata) skip it: their rows
+     are only filtered and scaled.
+  4. Detections.best() / to_list() give the dicts alerts are built from.
+
+Run without container: pytest tests/test_contracts/test_vision_postprocess.py -v
+"""
+
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("sqlalchemy")
+
+from modules.vision.inference_engine import (  # noqa: E402
+    Detections, VisionInferenceEngine, _has_nms, nms,
+)
+
+FRAME = (720, 1280, 3)
+
+
+def _legacy_nms(dets, thr=0.45):
+    boxes = np.array([d["bbox"] for d in dets])
+    order = np.array([d["confidence"] for d in dets]).argsort()[::-1]
+    keep = []
+    while order.size:
+        i, rest = order[0], order[1:]
+        keep.append(i)
+        w = np.maximum(0, np.minimum(boxes[i, 2], boxes[rest, 2]) - np.maximum(boxes[i, 0], boxes[rest, 0]))
+        h = np.maximum(0, np.minimum(boxes[i, 3], boxes[rest, 3]) - np.maximum(boxes[i, 1], boxes[rest, 1]))
+        area = lambda b: (b[..., 2] - b[..., 0]) * (b[..., 3] - b[..., 1])  # noqa: E731
+        iou = w * h / (area(boxes[i]) + area(boxes[rest]) - w * h + 1e-6)
+        order = rest[iou <= thr]
+    return [dets[i] for i in keep]
+
+
+def _legacy_yolov8(output, input_size=640):
+    """The per-box loop _postprocess_yolov8 used to run."""
+    if output.shape[1] < output.shape[2]:
+        output = np.transpose(output, (0, 2, 1))
+    sx, sy = FRAME[1] / input_size, FRAME[0] / input_size
+    dets = []
+    for pred in output[0]:
+        cx, cy, w, h = pred[:4]
+        cid = int(np.argmax(pred[4:]))
+        conf = float(pred[4:][cid])
+        if conf >= 0.3:
+            dets.append({"confidence": conf, "class_id": cid, "bbox": [
+                float((cx - w / 2) * sx), float((cy - h / 2) * sy), float((cx + w / 2) * sx), float((cy + h / 2) * sy)]})
+    return _legacy_nms(dets) if dets else []
+
+
+def _legacy_obico(boxes, confs):
+    boxes, confs = boxes.squeeze(), confs.squeeze()
+    dets = []
+    for i in range(len(confs)):
+        if float(confs[i]) >= 0.3:
+            b = boxes[i]
+            dets.append({"confidence": float(confs[i]), "class_id": 0, "bbox": [
+                float(b[0]) * FRAME[1], float(b[1]) * FRAME[0], float(b[2]) * FRAME[1], float(b[3]) * FRAME[0]]})
+    return _legacy_nms(dets) if dets else []
+
+
+def _yolo_output(n=8400, classes=3, seed=0):
+    """(1, 4+nc, n): a few clusters of confident, overlapping boxes among noise."""
+    rng = np.random.default_rng(seed)
+    preds = np.zeros((n, 4 + classes), dtype=np.float32)
+    preds[:, :2] = rng.uniform(0, 640, (n, 2))
+    preds[:, 2:4] = rng.uniform(10, 60, (n, 2))
+    preds[:, 4:] = rng.uniform(0, 0.29, (n, classes))
+    hot = rng.choice(n, 60, replace=False)
+    centers = rng.uniform(100, 540, (6, 2))
+    preds[hot, :2] = centers[np.arange(60) % 6] + rng.normal(0, 4, (60, 2))
+    preds[hot, 2:4] = 80 + rng.normal(0, 3, (60, 2))
+    preds[hot, 4 + rng.integers(0, classes, 60)] = rng.uniform(0.5, 0.99, 60)
+    return preds.T[None].copy()
+
+
+def _same(detections, legacy):
+    assert len(detections) == len(legacy)
+    for got, want in zip(detections.to_list(), legacy):
+        assert got["class_id"] == want["class_id"]
+        assert got["confidence"] == pytest.approx(want["confidence"], abs=1e-6)
+        assert got["bbox"] == pytest.approx(want["bbox"], abs=1e-3)
+
+
+class TestYolov8:
+    def test_matches_loop(self):
+        output = _yolo_output()
+        got = VisionInferenceEngine()._postprocess_yolov8([output], FRAME, 640)
+        want = _legacy_yolov8(output)
+        assert 6 <= len(want) < 60  # the clusters survive, their duplicates do not
+        _same(got, want)
+
+    def test_transposed_output(self):
+        output = _yolo_output(seed=1)
+        engine = VisionInferenceEngine()
+        _same(engine._postprocess_yolov8([output.transpose(0, 2, 1).copy()], FRAME, 640),
+              _legacy_yolov8(output))
+
+    def test_nothing_confident(self):
+        output = _yolo_output()
+        output[:, 4:] = 0.1
+        assert len(VisionInferenceEngine()._postprocess_yolov8([output], FRAME, 640)) == 0
+
+
+class TestObico:
+    @pytest.mark.parametrize("n", [10647, 7])
+    def test_matches_loop(self, n):
+        rng = np.random.default_rng(n)
+        xy = rng.uniform(0, 0.8, (n, 2))
+        boxes = np.concatenate([xy, xy + rng.uniform(0.05, 0.2, (n, 2))], axis=1).astype(np.float32)
+        confs = rng.uniform(0, 0.5, n).astype(np.float32)
+        confs[rng.choice(n, 5, replace=False)] = 0.9
+        outputs = [boxes.reshape(1, n, 1, 4), confs.reshape(1, n, 1)]
+        got = VisionInferenceEngine()._postprocess([o.copy() for o in outputs], ["boxes", "confs"], FRAME, 416)
+        _same(got, _legacy_obico(*outputs))
+
+    def test_single_box(self):
+        outputs = [np.array([[[[0.1, 0.2, 0.3, 0.4]]]], dtype=np.float32), np.array([[[0.8]]], dtype=np.float32)]
+        got = VisionInferenceEngine()._postprocess(outputs, ["boxes", "confs"], FRAME, 416)
+        assert got.best()["bbox"] == pytest.approx([128, 144, 384, 288])
+
+
+class TestNms:
+    def test_keeps_best_of_each_group(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60], [0, 0, 10, 10.5], [52, 52, 61, 61]], float)
+        scores = np.array([0.6, 0.9, 0.5, 0.7, 0.8])
+        assert nms(boxes, scores, 0.45).tolist() == [1, 4]
+        assert nms(boxes, scores, 0.99).tolist() == [1, 4, 3, 0, 2]
+        assert nms(np.zeros((0, 4)), np.zeros(0), 0.45).tolist() == []
+
+
+class TestInModelNms:
+    def _session(self, meta):
+        return SimpleNamespace(get_modelmeta=lambda: SimpleNamespace(custom_metadata_map=meta))
+
+    def test_detects_export_flag(self):
+        assert _has_nms(self._session({"args": "{'batch': 1, 'nms': True}"}))
+        assert _has_nms(self._session({"end2end": "True"}))
+        assert not _has_nms(self._session({"args": "{'batch': 1, 'nms': False}"}))
+        assert not _has_nms(self._session({}))
+
+    def test_rows_used_as_is(self):
+        rows = np.array([[[10, 10, 20, 20, 0.5, 1], [0, 0, 64, 64, 0.9, 0], [5, 5, 6, 6, 0.1, 2],
+                          [0, 0, 0, 0, 0, 0]]], dtype=np.float32)
+        got = VisionInferenceEngine()._postprocess([rows], ["output0"], FRAME, 64, in_model_nms=True)
+        assert got.scores.tolist() == pytest.approx([0.9, 0.5])
+        assert got.class_ids.tolist() == [0, 1]
+        assert got.boxes[0].tolist() == [0, 0, 1280, 720]
+
+
+class TestDetections:
+    def test_best_and_list(self):
+        d = Detections(np.array([[1.0, 2, 3, 4], [5, 6, 7, 8]]), np.array([0.9, 0.4]), np.array([2, 0]))
+        assert len(d) == 2
+        assert d.best() == {"confidence": 0.9, "bbox": [1.0, 2.0, 3.0, 4.0], "class_id": 2}
+        assert [x["class_id"] for x in d.to_list()] == [2, 0]
+        assert Detections.empty().best() is None and Detections.empty().to_list() == []
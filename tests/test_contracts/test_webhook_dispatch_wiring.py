@@ -44,6 +44,7 @@ ALLOWED_RAW_HTTPX = {
     # printer snapshot endpoint, not a user-supplied webhook target.
     "backend/modules/vision/detection_thread.py",
     "backend/modules/archives/timelapse_capture.py",
+    "backend/core/frame_cache.py",
 }
 
 # Patterns that count as a "raw" outbound httpx call.
@@ -0,0 +1,209 @@
+"""
+Contract test — ws_hub push transport.
+
+Monitors used to INSERT every WebSocket event into the shared `ws_events`
+table and the API polled it once a second. The socket transport pushes each
+event as a Unix datagram the API awaits; the table is only a durable
+fallback for events the socket can't deliver.
+
+Covers:
+  1. Socket transport: a published event reaches the listener without
+     touching ws_events.
+  2. No listener bound: the event falls back to ws_events (durable mode)
+     or is dropped (ODIN_WS_DURABLE=0).
+  3. Oversized payloads go through the table instead of the socket.
+  4. In-process publishes short-circuit into the listener queue.
+  5. sqlite transport keeps the legacy INSERT + poll behaviour.
+  6. consume() drains both sources, and drains the table at the legacy
+     cadence while publishers that can't reach the socket keep writing it.
+
+Run without container: pytest tests/test_contracts/test_ws_hub_transport.py -v
+"""
+
+import asyncio
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2] / "backend"
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+from core import db_utils, ws_hub  # noqa: E402
+
+
+@pytest.fixture
+def hub(tmp_path, monkeypatch):
+    """Point ws_hub at a throwaway DB and socket path."""
+    db_path = str(tmp_path / "odin.db")
+    monkeypatch.setattr(db_utils, "DB_PATH", db_path)
+    monkeypatch.setattr(ws_hub, "SOCKET_PATH", str(tmp_path / "hub.sock"))
+    monkeypatch.setattr(ws_hub, "TRANSPORT", "socket")
+    monkeypatch.setattr(ws_hub, "DURABLE_FALLBACK", True)
+    monkeypatch.setattr(ws_hub, "_local_listener", None)
+    ws_hub.ensure_table()
+    yield ws_hub
+    ws_hub._publisher.close()
+
+
+def _table_rows(hub):
+    with sqlite3.connect(db_utils.DB_PATH) as conn:
+        return conn.execute("SELECT event_type FROM ws_events ORDER BY id").fetchall()
+
+
+def _publish_from_other_process_view(hub, event_type, data):
+    """Publish without the in-process shortcut, like a monitor daemon would."""
+    listener = hub._local_listener
+    hub._local_listener = None
+    try:
+        hub.push_event(event_type, data)
+    finally:
+        hub._local_listener = listener
+
+
+class TestSocketTransport:
+    def test_event_reaches_listener_without_db_write(self, hub):
+        async def run():
+            listener = hub.EventListener()
+            listener.start()
+            try:
+                assert listener.listening
+                _publish_from_other_process_view(hub, "printer_telemetry", {"printer_id": 7})
+                return await listener.next_batch(timeout=2)
+            finally:
+                listener.close()
+
+        batch = asyncio.run(run())
+        assert batch == [{"type": "printer_telemetry", "data": {"printer_id": 7}}]
+        assert _table_rows(hub) == []
+
+    def test_no_listener_falls_back_to_table(self, hub):
+        hub.push_event("job_started", {"job_id": 1})
+        assert _table_rows(hub) == [("job_started",)]
+
+    def test_no_listener_without_durable_drops(self, hub, monkeypatch):
+        monkeypatch.setattr(ws_hub, "DURABLE_FALLBACK", False)
+        hub.push_event("job_started", {"job_id": 1})
+        assert _table_rows(hub) == []
+
+    def test_oversized_payload_uses_table(self, hub):
+        async def run():
+            listener = hub.EventListener()
+            listener.start()
+            try:
+                big = {"blob": "x" * (hub._MAX_DATAGRAM + 1)}
+                _publish_from_other_process_view(hub, "big_event", big)
+                return await listener.next_batch(timeout=0.2)
+            finally:
+                listener.close()
+
+        assert asyncio.run(run()) == []
+        assert _table_rows(hub) == [("big_event",)]
+
+    def test_in_process_publish_uses_local_listener(self, hub):
+        async def run():
+            listener = hub.EventListener()
+            listener.start()
+            try:
+                assert hub._local_listener is listener
+                hub.push_event("alert_new", {"id": 3})
+                return await listener.next_batch(timeout=2)
+            finally:
+                listener.close()
+
+        assert asyncio.run(run()) == [{"type": "alert_new", "data": {"id": 3}}]
+        assert hub._local_listener is None
+
+    def test_queue_overflow_drops_oldest(self, hub):
+        async def run():
+            listener = hub.EventListener(maxsize=3)
+            listener.start()
+            try:
+                for i in range(5):
+                    listener._put({"seq": i})
+                return listener.dropped, await listener.next_batch(timeout=1)
+            finally:
+                listener.close()
+
+        dropped, batch = asyncio.run(run())
+        assert dropped == 2
+        assert [e["seq"] for e in batch] == [2, 3, 4]
+
+
+class TestSqliteTransport:
+    def test_push_writes_table_and_read_returns_it(self, hub, monkeypatch):
+        monkeypatch.setattr(ws_hub, "TRANSPORT", "sqlite")
+        hub.push_event("printer_telemetry", {"printer_id": 1})
+        hub.push_event("printer_telemetry", {"printer_id": 2})
+        events, last_id = hub.read_events_since(0)
+        assert [e["data"]["printer_id"] for e in events] == [1, 2]
+        assert hub.read_events_since(last_id) == ([], last_id)
+
+    def test_listener_does_not_bind(self, hub, monkeypatch):
+        monkeypatch.setattr(ws_hub, "TRANSPORT", "sqlite")
+
+        async def run():
+            listener = hub.EventListener()
+            listener.start()
+            try:
+                return listener.listening
+            finally:
+                listener.close()
+
+        assert asyncio.run(run()) is False
+        assert not Path(hub.SOCKET_PATH).exists()
+
+
+class TestConsume:
+    def test_consume_delivers_socket_and_fallback_events(self, hub):
+        # Written to the table before the API came up.
+        hub.push_event("queued_while_down", {})
+
+        async def run():
+            received = []
+            done = asyncio.Event()
+
+            async def handler(evt):
+                received.append(evt["type"])
+                if len(received) == 2:
+                    done.set()
+
+            listener = hub.EventListener()
+            task = asyncio.create_task(hub.consume(handler, listener))
+            await asyncio.sleep(0.05)
+            _publish_from_other_process_view(hub, "live", {})
+            await asyncio.wait_for(done.wait(), timeout=3)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return received, listener
+
+        received, listener = asyncio.run(run())
+        assert sorted(received) == ["live", "queued_while_down"]
+        assert not listener.listening
+        assert not Path(hub.SOCKET_PATH).exists()
+
+    def test_table_drained_every_second_while_rows_arrive(self, hub, monkeypatch):
+        monkeypatch.setattr(hub, "_SQLITE_POLL_INTERVAL", 0.05)
+        monkeypatch.setattr(hub, "_FALLBACK_POLL_INTERVAL", 30.0)
+        # A publisher in another container without the socket volume.
+        hub._insert_event("from_other_container", '{"type": "from_other_container"}')
+
+        async def run():
+            received = []
+
+            async def handler(evt):
+                received.append(evt["type"])
+
+            task = asyncio.create_task(hub.consume(handler, hub.EventListener()))
+            await asyncio.sleep(0.1)
+            hub._insert_event("next_from_other_container", '{"type": "next_from_other_container"}')
+            await asyncio.sleep(0.3)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+            return received
+
+        assert asyncio.run(run()) == ["from_other_container", "next_from_other_container"]
@@ -8,7 +8,6 @@ the branches are wired correctly without requiring a live backend.
 from __future__ import annotations
 
 import sys
-from unittest.mock import patch
 
 import pytest
 
@@ -20,46 +19,36 @@ def _clear_cached_modules():
 
 
 class TestFlagRoutingRoutesStatus:
-    def test_v2_branch_calls_read_status_once(self, monkeypatch):
-        """routes_status._fetch_printer_live_status routes through V2
-        when flag is on."""
-        from modules.printers import routes_status
+    def test_v2_branch_opens_telemetry_adapter(self, monkeypatch):
+        """live-status pooled sessions (live_status._PooledConnection)
+        use the V2 BambuTelemetryAdapter when flag is on."""
+        from backend.modules.printers.telemetry.bambu import adapter as v2_adapter
+        from modules.printers import live_status
+        from modules.printers.adapters import bambu as legacy_bambu
         from modules.printers.telemetry import feature_flag
 
-        called = {"v2": False}
+        started = {"v2": False}
         monkeypatch.setattr(feature_flag, "is_v2_enabled", lambda: True)
 
-        def fake_v2(*a, **k):
-            called["v2"] = True
-            return {"ok": True}
+        class FakeAdapter:
+            def __init__(self, config, emitter):
+                self.config = config
 
-        monkeypatch.setattr(routes_status, "_fetch_live_status_v2", fake_v2)
-        monkeypatch.setattr(routes_status, "_fetch_live_status_legacy",
-                            lambda *a, **k: pytest.fail("should not call legacy"))
-
-        class FakePrinter:
-            id = 1
-            name = "x"
-            api_host = "127.0.0.1"
-            api_key = "encrypted"
+            def start(self):
+                started["v2"] = True
 
-        fake_printer = FakePrinter()
+            def stop(self):
+                pass
 
-        class FakeDB:
-            def query(self, model):
-                class Q:
-                    def filter(self, *a, **k):
-                        class F:
-                            def first(self2):
-                                return fake_printer
-                        return F()
-                return Q()
+        monkeypatch.setattr(v2_adapter, "BambuTelemetryAdapter", FakeAdapter)
+        monkeypatch.setattr(legacy_bambu, "BambuPrinter",
+                            lambda *a, **k: pytest.fail("should not call legacy"))
 
-        with patch("core.crypto.decrypt", return_value="serial|code"):
-            result = routes_status._fetch_printer_live_status(1, FakeDB())
+        conn = live_status._PooledConnection(1, ("127.0.0.1", "serial", "code"))
+        assert conn.open() is True
+        conn.close()
 
-        assert called["v2"] is True
-        assert result == {"ok": True}
+        assert started["v2"] is True
 
 
 class TestFlagRoutingRouteUtils: